@@ -4,13 +4,14 @@ Usage tracking and optimization decision dashboard
 """
 
 import logging
-from typing import List, Dict, Any
+from datetime import date, timedelta
+from typing import List, Dict, Any, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import JSONResponse
 
-from app.models.usage_tracking import UsageDashboard, RetentionMetrics
+from app.models.usage_tracking import UsageDashboard, RetentionMatrix, RetentionMetrics
 from app.services.usage_tracking_service import usage_tracking
 from app.api.dependencies.auth import require_admin, get_current_user
 from app.models.user import User
@@ -80,6 +81,37 @@ async def get_retention_metrics(admin_user: User = Depends(require_admin)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/retention/cohorts", response_model=RetentionMatrix)
+async def get_retention_cohorts(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    granularity: str = "day",
+    periods: List[int] = Query(default=[1, 7, 30]),
+    admin_user: User = Depends(require_admin)
+):
+    """
+    Get a cohort retention matrix
+
+    Args:
+        start: First cohort date (default: 90 days ago)
+        end: Last cohort date (default: today)
+        granularity: day or week
+        periods: Day/week offsets to report, up to 90 days out (default: 1, 7, 30)
+
+    **Admin only**
+    """
+    end = end or date.today()
+    start = start or end - timedelta(days=90)
+    try:
+        return await usage_tracking.get_retention_matrix(start, end, granularity, periods)
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"❌ Failed to get retention cohorts: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.get("/user/{user_id}", response_model=Dict[str, Any])
 async def get_user_activity(
     user_id: UUID,
@@ -3,10 +3,20 @@ MAPBOX API Proxy Endpoints
 Secure proxy for all Mapbox API requests to prevent token exposure in frontend.
 """
 
-from fastapi import APIRouter, HTTPException, Query, Path
+from fastapi import APIRouter, HTTPException, Query, Path, Request, Response
 from typing import Optional, Dict, Any
 import httpx
 import os
+import re
+from app.core.proxy_cache import ProxyCache, to_response
+from app.services.geocoding import (
+    forward_key,
+    geocoding_cache,
+    geocoding_service,
+    quantize_point,
+    quantize_proximity,
+    reverse_key,
+)
 from app.core.logging import setup_logging, get_logger
 
 router = APIRouter()
@@ -32,37 +42,61 @@ else:
 # Mapbox API base URL
 MAPBOX_BASE_URL = "https://api.mapbox.com"
 
+# Directions and isochrones for the same trip are requested by many clients at once
+mapbox_proxy = ProxyCache("mapbox")
+DIRECTIONS_TTL = 600
+ISOCHRONE_TTL = 3600
+STYLE_TTL = 3600
+
+# v5 places endpoints: "mapbox.places/{search_text}.json"
+PLACES_ENDPOINT = re.compile(r"^(mapbox\.places(?:-permanent)?)/([^/]+)\.json$")
+COORDINATE_PAIR = re.compile(r"^\s*(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)\s*$")
+
 async def proxy_mapbox_request(endpoint: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
     """
     Generic proxy function for Mapbox API requests
+    Identical concurrent requests share one upstream call.
     """
+    result = await _fetch_mapbox(endpoint, params, use_cache=False)
+    return result[0].json()
+
+async def proxy_mapbox_response(
+    endpoint: str, params: Dict[str, Any], request: Request, ttl: Optional[int] = None
+) -> Response:
+    """
+    Proxy a Mapbox request through the response cache, passing the upstream body through as received
+    """
+    return to_response(await _fetch_mapbox(endpoint, params, ttl=ttl), request)
+
+async def _fetch_mapbox(endpoint: str, params: Optional[Dict[str, Any]], ttl: Optional[int] = None, use_cache: bool = True):
     if not MAPBOX_TOKEN:
         raise HTTPException(status_code=500, detail="Mapbox token not configured on server")
     
-    # Add access token to parameters
-    if params is None:
-        params = {}
+    # Add access token to parameters (it is not part of the cache key)
+    params = dict(params or {})
     params["access_token"] = MAPBOX_TOKEN
     
-    async with httpx.AsyncClient() as client:
-        try:
-            url = f"{MAPBOX_BASE_URL}/{endpoint}"
-            logger.info(f"Proxying Mapbox request to: {url}")
-            
-            response = await client.get(url, params=params, timeout=30.0)
-            response.raise_for_status()
-            
-            return response.json()
-            
-        except httpx.TimeoutException:
-            logger.error(f"Timeout error for Mapbox request: {endpoint}")
-            raise HTTPException(status_code=504, detail="Mapbox API timeout")
-        except httpx.HTTPStatusError as e:
-            logger.error(f"Mapbox API error: {e.response.status_code} - {e.response.text}")
-            raise HTTPException(status_code=e.response.status_code, detail=f"Mapbox API error: {e.response.text}")
-        except Exception as e:
-            logger.error(f"Unexpected error in Mapbox proxy: {str(e)}")
-            raise HTTPException(status_code=500, detail="Internal server error")
+    try:
+        logger.info(f"Proxying Mapbox request to: {MAPBOX_BASE_URL}/{endpoint}")
+        result = await mapbox_proxy.fetch("GET", f"/{endpoint}", params=params, ttl=ttl, use_cache=use_cache)
+    except httpx.TimeoutException:
+        logger.error(f"Timeout error for Mapbox request: {endpoint}")
+        raise HTTPException(status_code=504, detail="Mapbox API timeout")
+    except Exception as e:
+        logger.error(f"Unexpected error in Mapbox proxy: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    
+    entry = result[0]
+    if entry.status_code >= 400:
+        logger.error(f"Mapbox API error: {entry.status_code} - {entry.text()}")
+        raise HTTPException(status_code=entry.status_code, detail=f"Mapbox API error: {entry.text()}")
+    return result
+
+async def cached_geocoding_request(key: str, endpoint: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Serve a geocoding request from the geocoding cache, proxying on a miss
+    """
+    return await geocoding_cache.get_or_fetch(key, lambda: proxy_mapbox_request(endpoint, dict(params)))
 
 @router.get("/geocoding/v5/{endpoint:path}")
 async def geocoding_proxy(
@@ -92,11 +126,30 @@ async def geocoding_proxy(
     }.items():
         if value is not None:
             params[key] = value
+    if "proximity" in params:
+        params["proximity"] = quantize_proximity(params["proximity"])
     
-    return await proxy_mapbox_request(f"geocoding/v5/{endpoint}", params)
+    match = PLACES_ENDPOINT.match(endpoint)
+    if not match:
+        return await proxy_mapbox_request(f"geocoding/v5/{endpoint}", params)
+    
+    dataset, search_text = match.groups()
+    coordinates = COORDINATE_PAIR.match(search_text)
+    if coordinates:
+        # Reverse geocode: nearby fixes share the geohash cell and its centre is queried
+        longitude, latitude = float(coordinates.group(1)), float(coordinates.group(2))
+        precision = geocoding_service.reverse_precision
+        key = reverse_key(latitude, longitude, precision, namespace=dataset, **params)
+        latitude, longitude = quantize_point(latitude, longitude, precision)
+        endpoint = f"{dataset}/{longitude},{latitude}.json"
+    else:
+        key = forward_key(search_text, namespace=dataset, **params)
+    
+    return await cached_geocoding_request(key, f"geocoding/v5/{endpoint}", params)
 
 @router.get("/directions/v5/{profile}/{coordinates}")
 async def directions_proxy(
+    request: Request,
     profile: str = Path(..., description="Routing profile (driving, walking, cycling, etc.)"),
     coordinates: str = Path(..., description="Semicolon-separated coordinates"),
     alternatives: Optional[bool] = Query(None, description="Include alternative routes"),
@@ -135,10 +188,11 @@ async def directions_proxy(
         if value is not None:
             params[key] = value
     
-    return await proxy_mapbox_request(f"directions/v5/mapbox/{profile}/{coordinates}", params)
+    return await proxy_mapbox_response(f"directions/v5/mapbox/{profile}/{coordinates}", params, request, DIRECTIONS_TTL)
 
 @router.get("/styles/v1/{username}/{style_id}")
 async def styles_proxy(
+    request: Request,
     username: str = Path(..., description="Mapbox username"),
     style_id: str = Path(..., description="Style ID"),
     draft: Optional[bool] = Query(None, description="Use draft version"),
@@ -150,10 +204,11 @@ async def styles_proxy(
     if draft is not None:
         params["draft"] = draft
     
-    return await proxy_mapbox_request(f"styles/v1/{username}/{style_id}", params)
+    return await proxy_mapbox_response(f"styles/v1/{username}/{style_id}", params, request, STYLE_TTL)
 
 @router.get("/isochrone/v1/{profile}")
 async def isochrone_proxy(
+    request: Request,
     profile: str = Path(..., description="Routing profile"),
     coordinates: str = Query(..., description="Center coordinates"),
     contours_minutes: Optional[str] = Query(None, description="Time contours in minutes"),
@@ -178,7 +233,7 @@ async def isochrone_proxy(
         if value is not None:
             params[key] = value
     
-    return await proxy_mapbox_request(f"isochrone/v1/mapbox/{profile}", params)
+    return await proxy_mapbox_response(f"isochrone/v1/mapbox/{profile}", params, request, ISOCHRONE_TTL)
 
 @router.get("/search/geocode/v6/forward")
 async def forward_geocoding_proxy(
@@ -206,8 +261,12 @@ async def forward_geocoding_proxy(
     }.items():
         if value is not None:
             params[key] = value
+    if "proximity" in params:
+        params["proximity"] = quantize_proximity(params["proximity"])
     
-    return await proxy_mapbox_request("search/geocode/v6/forward", params)
+    options = {k: v for k, v in params.items() if k != "q"}
+    key = forward_key(q, namespace="v6", **options)
+    return await cached_geocoding_request(key, "search/geocode/v6/forward", params)
 
 @router.get("/search/geocode/v6/reverse")
 async def reverse_geocoding_proxy(
@@ -219,6 +278,12 @@ async def reverse_geocoding_proxy(
     """
     Proxy for Mapbox Reverse Geocoding API (v6)
     """
+    precision = geocoding_service.reverse_precision
+    options = {"types": types, "language": language}
+    key = reverse_key(latitude, longitude, precision, namespace="v6", **options)
+    
+    # Nearby fixes share the geohash cell; its centre is what gets queried
+    latitude, longitude = quantize_point(latitude, longitude, precision)
     params = {
         "longitude": longitude,
         "latitude": latitude
@@ -230,10 +295,11 @@ async def reverse_geocoding_proxy(
     if language is not None:
         params["language"] = language
     
-    return await proxy_mapbox_request("search/geocode/v6/reverse", params)
+    return await cached_geocoding_request(key, "search/geocode/v6/reverse", params)
 
 @router.get("/directions/advanced")
 async def enhanced_directions_proxy(
+    request: Request,
     coordinates: str = Query(..., description="Semicolon-separated coordinates"),
     profile: str = Query("driving", description="Routing profile"),
     alternatives: Optional[bool] = Query(True, description="Include alternative routes"),
@@ -275,7 +341,7 @@ async def enhanced_directions_proxy(
     # Log enhanced directions request for debugging
     logger.info(f"Enhanced directions request - Coordinates: {coordinates}, Profile: {profile}, Magnetic routing: {bool(radiuses)}")
     
-    return await proxy_mapbox_request(f"directions/v5/mapbox/{profile}/{coordinates}", params)
+    return await proxy_mapbox_response(f"directions/v5/mapbox/{profile}/{coordinates}", params, request, DIRECTIONS_TTL)
 
 @router.get("/health")
 async def mapbox_proxy_health():
@@ -286,5 +352,7 @@ async def mapbox_proxy_health():
         "status": "healthy",
         "service": "mapbox-proxy",
         "token_configured": bool(MAPBOX_TOKEN),
+        "geocode_cache": geocoding_cache.get_stats(),
+        "proxy_cache": mapbox_proxy.get_stats(),
         "timestamp": "2025-01-20T22:00:00Z"
     }
\ No newline at end of file
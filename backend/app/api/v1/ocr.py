@@ -8,24 +8,23 @@ Endpoints:
   POST /ocr/jobs       - Async job creation (multi-page PDFs)
   GET  /ocr/jobs/{id}  - Poll async job status
   GET  /ocr/stats      - Admin: success rate, method distribution, cache hit rate
+
+Async jobs are stored in the durable OCR job queue (services/ocr/job_queue.py)
+and processed by the background OCR worker started in the app lifespan.
 """
-import asyncio
 import time
-import uuid
-from typing import Dict, Any
+from typing import Dict
 
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query, status
 
 from app.api.deps import verify_supabase_jwt_token
 from app.core.logging import get_logger
+from app.services.ocr.job_queue import ocr_job_queue
 from app.services.ocr.service import OCRService
 
 router = APIRouter()
 logger = get_logger(__name__)
 
-# In-memory job store (lightweight - jobs expire after 1 hour)
-_ocr_jobs: Dict[str, Dict[str, Any]] = {}
-
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
 ALLOWED_MIME_TYPES = {
     "image/jpeg",
@@ -144,29 +143,6 @@ async def extract_text(
         )
 
 
-async def _run_ocr_job(job_id: str, file_bytes: bytes, filename: str, sensitivity: str):
-    """Background task that processes an OCR job and stores the result."""
-    service = OCRService()
-    try:
-        _ocr_jobs[job_id]["status"] = "processing"
-        result = await service.extract_text(
-            file_bytes=file_bytes,
-            filename=filename,
-            sensitivity=sensitivity,
-        )
-        _ocr_jobs[job_id].update({
-            "status": "completed",
-            "result": result.model_dump(),
-            "completed_at": time.time(),
-        })
-    except Exception as e:
-        _ocr_jobs[job_id].update({
-            "status": "failed",
-            "error": str(e),
-            "completed_at": time.time(),
-        })
-
-
 @router.post("/ocr/jobs")
 async def create_ocr_job(
     file: UploadFile = File(...),
@@ -196,30 +172,19 @@ async def create_ocr_job(
     if sensitivity not in ("standard", "high"):
         sensitivity = "standard"
 
-    job_id = str(uuid.uuid4())
-    _ocr_jobs[job_id] = {
-        "job_id": job_id,
-        "status": "queued",
-        "created_at": time.time(),
-        "user_id": user_id,
-        "filename": file.filename or "unknown",
-    }
-
-    # Launch background task
-    asyncio.create_task(_run_ocr_job(job_id, file_bytes, file.filename or "unknown", sensitivity))
-
-    # Evict old jobs (>1 hour) and enforce max count to prevent memory leak
-    cutoff = time.time() - 3600
-    stale = [k for k, v in _ocr_jobs.items() if v.get("created_at", 0) < cutoff]
-    for k in stale:
-        _ocr_jobs.pop(k, None)
+    # Content-hash dedup: files already in ocr_cache complete without queueing
+    file_hash, cached = await OCRService().lookup_cached(file_bytes)
 
-    if len(_ocr_jobs) > 1000:
-        oldest = sorted(_ocr_jobs, key=lambda k: _ocr_jobs[k].get("created_at", 0))
-        for k in oldest[:len(_ocr_jobs) - 1000]:
-            _ocr_jobs.pop(k, None)
+    job = await ocr_job_queue.submit(
+        user_id=user_id,
+        filename=file.filename or "unknown",
+        file_bytes=file_bytes,
+        sensitivity=sensitivity,
+        file_hash=file_hash,
+        cached_result=cached,
+    )
 
-    return {"job_id": job_id, "status": "queued"}
+    return {"job_id": job["job_id"], "status": job["status"]}
 
 
 @router.get("/ocr/jobs/{job_id}")
@@ -229,7 +194,7 @@ async def get_ocr_job(
 ):
     """Poll an async OCR job for status and results."""
     user_id = current_user.get("sub")
-    job = _ocr_jobs.get(job_id)
+    job = await ocr_job_queue.get_job(job_id)
 
     if not job:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
@@ -283,7 +248,7 @@ async def ocr_stats(
         }
 
         # Active async jobs
-        active_jobs = sum(1 for j in _ocr_jobs.values() if j["status"] in ("queued", "processing"))
+        active_jobs = await ocr_job_queue.active_count()
 
         return {
             "total_cached_results": total_cached,
@@ -3,12 +3,13 @@ OpenRoute Service API Proxy Endpoints
 Secure proxy for OpenRoute Service API requests with RV-specific routing.
 """
 
-from fastapi import APIRouter, HTTPException, Query, Path
+from fastapi import APIRouter, HTTPException, Query, Path, Request, Response
 from typing import Optional, Dict, Any
 import httpx
 import os
 import json
 from app.core.logging import setup_logging, get_logger
+from app.core.proxy_cache import ProxyCache, to_response
 
 router = APIRouter()
 setup_logging()
@@ -29,10 +30,28 @@ else:
 # OpenRoute Service API base URL
 OPENROUTE_BASE_URL = "https://api.openrouteservice.org"
 
+openroute_proxy = ProxyCache("openroute")
+DIRECTIONS_TTL = 600
+ISOCHRONES_TTL = 3600
+ELEVATION_TTL = 24 * 3600
+
 async def proxy_openroute_request(endpoint: str, params: Dict[str, Any] = None, method: str = "GET", json_data: Dict[str, Any] = None) -> Dict[str, Any]:
     """
     Generic proxy function for OpenRoute Service API requests
     """
+    result = await _fetch_openroute(endpoint, params, method, json_data)
+    return result[0].json()
+
+async def proxy_openroute_response(
+    endpoint: str, json_data: Dict[str, Any], request: Request, ttl: Optional[int] = None
+) -> Response:
+    """
+    Proxy an OpenRoute Service POST through the response cache, passing the upstream body through as received
+    """
+    return to_response(await _fetch_openroute(endpoint, None, "POST", json_data, ttl=ttl), request)
+
+async def _fetch_openroute(endpoint: str, params: Optional[Dict[str, Any]], method: str,
+                           json_data: Optional[Dict[str, Any]], ttl: Optional[int] = None):
     if not OPENROUTE_API_KEY:
         raise HTTPException(status_code=500, detail="OpenRoute Service API key not configured on server")
     
@@ -41,31 +60,27 @@ async def proxy_openroute_request(endpoint: str, params: Dict[str, Any] = None,
         "Content-Type": "application/json"
     }
     
-    async with httpx.AsyncClient() as client:
-        try:
-            url = f"{OPENROUTE_BASE_URL}/{endpoint}"
-            logger.info(f"Proxying OpenRoute Service {method} request to: {url}")
-            
-            if method.upper() == "GET":
-                response = await client.get(url, params=params, headers=headers, timeout=45.0)
-            else:
-                response = await client.post(url, params=params, json=json_data, headers=headers, timeout=45.0)
-            
-            response.raise_for_status()
-            return response.json()
-            
-        except httpx.TimeoutException:
-            logger.error(f"Timeout error for OpenRoute Service request: {endpoint}")
-            raise HTTPException(status_code=504, detail="OpenRoute Service API timeout")
-        except httpx.HTTPStatusError as e:
-            logger.error(f"OpenRoute Service API error: {e.response.status_code} - {e.response.text}")
-            raise HTTPException(status_code=e.response.status_code, detail=f"OpenRoute Service API error: {e.response.text}")
-        except Exception as e:
-            logger.error(f"Unexpected error in OpenRoute Service proxy: {str(e)}")
-            raise HTTPException(status_code=500, detail="Internal server error")
+    try:
+        logger.info(f"Proxying OpenRoute Service {method} request to: {OPENROUTE_BASE_URL}/{endpoint}")
+        # Directions, isochrones and elevation are pure lookups, so POSTs are cached and coalesced too
+        result = await openroute_proxy.fetch(method, f"/{endpoint}", params=params, json_body=json_data,
+                                             headers=headers, ttl=ttl)
+    except httpx.TimeoutException:
+        logger.error(f"Timeout error for OpenRoute Service request: {endpoint}")
+        raise HTTPException(status_code=504, detail="OpenRoute Service API timeout")
+    except Exception as e:
+        logger.error(f"Unexpected error in OpenRoute Service proxy: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error")
+    
+    entry = result[0]
+    if entry.status_code >= 400:
+        logger.error(f"OpenRoute Service API error: {entry.status_code} - {entry.text()}")
+        raise HTTPException(status_code=entry.status_code, detail=f"OpenRoute Service API error: {entry.text()}")
+    return result
 
 @router.get("/directions")
 async def directions_proxy(
+    request: Request,
     coordinates: str = Query(..., description="JSON array of coordinates"),
     profile: str = Query("driving-hgv", description="Routing profile"),
     preference: str = Query("recommended", description="Route preference"),
@@ -180,10 +195,11 @@ async def directions_proxy(
     
     logger.info(f"OpenRoute Service directions request - Coordinates: {len(coord_list)}, Profile: {profile}, RV optimized: {bool(vehicle_type)}")
     
-    return await proxy_openroute_request("v2/directions/driving-hgv", method="POST", json_data=request_body)
+    return await proxy_openroute_response("v2/directions/driving-hgv", request_body, request, DIRECTIONS_TTL)
 
 @router.get("/elevation/line")
 async def elevation_line_proxy(
+    request: Request,
     coordinates: str = Query(..., description="JSON array of coordinates"),
     format_in: str = Query("geojson", description="Input format"),
     format_out: str = Query("geojson", description="Output format"),
@@ -204,10 +220,11 @@ async def elevation_line_proxy(
     
     logger.info(f"OpenRoute Service elevation request - Coordinates: {len(coord_list)}")
     
-    return await proxy_openroute_request("elevation/line", method="POST", json_data=request_body)
+    return await proxy_openroute_response("elevation/line", request_body, request, ELEVATION_TTL)
 
 @router.get("/isochrones")
 async def isochrones_proxy(
+    request: Request,
     coordinates: str = Query(..., description="JSON array of coordinates"),
     profile: str = Query("driving-hgv", description="Routing profile"),
     range_type: str = Query("time", description="Range type (time or distance)"),
@@ -245,7 +262,7 @@ async def isochrones_proxy(
     
     logger.info(f"OpenRoute Service isochrones request - Locations: {len(coord_list)}, Profile: {profile}")
     
-    return await proxy_openroute_request("v2/isochrones/driving-hgv", method="POST", json_data=request_body)
+    return await proxy_openroute_response("v2/isochrones/driving-hgv", request_body, request, ISOCHRONES_TTL)
 
 @router.get("/health")
 async def openroute_proxy_health():
@@ -256,6 +273,7 @@ async def openroute_proxy_health():
         "status": "healthy",
         "service": "openroute-proxy",
         "api_key_configured": bool(OPENROUTE_API_KEY),
+        "proxy_cache": openroute_proxy.get_stats(),
         "base_url": OPENROUTE_BASE_URL,
         "timestamp": "2025-01-12T22:00:00Z"
     }
\ No newline at end of file
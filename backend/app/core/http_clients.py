@@ -0,0 +1,331 @@
+"""Pooled outbound HTTP clients, one per upstream service.
+
+Creating an ``httpx.AsyncClient`` per request pays a TCP and TLS handshake
+every time. The registry here keeps one long-lived client per upstream
+(HTTP/2 when the ``h2`` package is installed) with keep-alive connection
+pooling, a per-upstream concurrency limit, timeouts and a retry budget.
+Clients are closed by ``close_http_clients()`` on application shutdown.
+
+Every request is recorded per upstream: latency (Prometheus histogram via the
+monitoring service), status, retries, and whether it opened a new connection,
+from which the connection reuse rate is derived.
+
+Usage::
+
+    client = get_http_client("mapbox")
+    response = await client.get("/geocoding/v5/mapbox.places/Dubbo.json", params=params)
+"""
+
+import asyncio
+import os
+import random
+import time
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+# Failures where the request never reached the upstream, safe to retry for any method
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+MAX_RETRY_DELAY = 2.0
+
+
+@dataclass(frozen=True)
+class UpstreamConfig:
+    """Connection pool, timeout and retry settings for one upstream."""
+
+    base_url: str = ""
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    max_concurrency: int = 20
+    timeout: float = 10.0
+    connect_timeout: float = 5.0
+    retries: int = 2
+    retry_backoff: float = 0.1
+    # Retries allowed per request on average once the initial burst is spent
+    retry_budget_ratio: float = 0.2
+    retry_budget_burst: float = 10.0
+    http2: bool = True
+    headers: Dict[str, str] = field(default_factory=dict)
+
+
+UPSTREAMS: Dict[str, UpstreamConfig] = {
+    "mapbox": UpstreamConfig(base_url="https://api.mapbox.com", max_concurrency=50, timeout=30.0),
+    # OpenRouteService's plans are rate limited per minute; keep concurrency low
+    "openroute": UpstreamConfig(base_url="https://api.openrouteservice.org", max_concurrency=10, timeout=45.0),
+    "edamam": UpstreamConfig(base_url="https://api.edamam.com", timeout=30.0),
+    "rapidapi": UpstreamConfig(base_url="https://real-time-product-search.p.rapidapi.com", timeout=30.0),
+    "unsplash": UpstreamConfig(base_url="https://api.unsplash.com"),
+    "google_places": UpstreamConfig(base_url="https://maps.googleapis.com"),
+    "wikipedia": UpstreamConfig(base_url="https://en.wikipedia.org", max_concurrency=10),
+    "openmeteo": UpstreamConfig(base_url="https://api.open-meteo.com", max_concurrency=10, timeout=15.0),
+    # Nominatim's usage policy allows one request at a time
+    "nominatim": UpstreamConfig(
+        base_url="https://nominatim.openstreetmap.org", max_connections=2, max_keepalive_connections=1,
+        max_concurrency=1,
+    ),
+    "google_search": UpstreamConfig(base_url="https://www.googleapis.com", timeout=30.0),
+    "bing_search": UpstreamConfig(base_url="https://api.bing.microsoft.com", timeout=30.0),
+    # DuckDuckGo's HTML endpoint is scraped politely: few connections, no HTTP/2
+    "duckduckgo": UpstreamConfig(
+        base_url="https://html.duckduckgo.com", max_connections=5, max_keepalive_connections=5,
+        max_concurrency=5, timeout=30.0, http2=False,
+    ),
+}
+
+
+def _env_overrides(name: str, config: UpstreamConfig) -> UpstreamConfig:
+    """Apply HTTP_CLIENT_<NAME>_<FIELD> environment overrides (numeric fields)."""
+    prefix = f"HTTP_CLIENT_{name.upper()}_"
+    overrides = {}
+    for key in ("max_connections", "max_keepalive_connections", "max_concurrency", "retries"):
+        value = os.getenv(prefix + key.upper())
+        if value:
+            overrides[key] = int(value)
+    for key in ("timeout", "connect_timeout"):
+        value = os.getenv(prefix + key.upper())
+        if value:
+            overrides[key] = float(value)
+    return replace(config, **overrides) if overrides else config
+
+
+class RetryBudget:
+    """Token bucket limiting retries to a fraction of recent requests.
+
+    Each request deposits ``ratio`` tokens (up to ``burst``) and each retry
+    spends one, so an upstream outage cannot multiply the load sent to it.
+    """
+
+    def __init__(self, ratio: float, burst: float):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = burst
+
+    def deposit(self) -> None:
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+@dataclass
+class UpstreamStats:
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    retries_denied: int = 0
+    connections_opened: int = 0
+    total_seconds: float = 0.0
+    in_flight: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "retries_denied": self.retries_denied,
+            "connections_opened": self.connections_opened,
+            "connection_reuse_rate": (
+                round(1 - self.connections_opened / self.requests, 4) if self.requests else None
+            ),
+            "mean_latency_ms": round(self.total_seconds / self.requests * 1000, 2) if self.requests else None,
+            "in_flight": self.in_flight,
+        }
+
+
+class UpstreamClient:
+    """A pooled ``httpx.AsyncClient`` for one upstream with limits, retries and metrics."""
+
+    def __init__(self, name: str, config: UpstreamConfig, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.name = name
+        self.config = config
+        self._transport = transport
+        self.stats = UpstreamStats()
+        self._semaphore = asyncio.Semaphore(config.max_concurrency)
+        self._retry_budget = RetryBudget(config.retry_budget_ratio, config.retry_budget_burst)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        # Pooled connections belong to the loop that opened them
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            self._client = httpx.AsyncClient(
+                base_url=self.config.base_url,
+                http2=self.config.http2 and HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=self.config.max_connections,
+                    max_keepalive_connections=self.config.max_keepalive_connections,
+                    keepalive_expiry=self.config.keepalive_expiry,
+                ),
+                timeout=httpx.Timeout(self.config.timeout, connect=self.config.connect_timeout),
+                headers=self.config.headers,
+                transport=self._transport,
+            )
+            self._loop = loop
+        return self._client
+
+    async def request(self, method: str, url: str, stream: bool = False, **kwargs: Any) -> httpx.Response:
+        """Send a request, retrying transient failures within the retry budget.
+
+        Returns the final response whatever its status (call
+        ``raise_for_status()`` as before); transport errors are raised once
+        retries are exhausted. With ``stream=True`` the body is left unread
+        (e.g. for ``aiter_raw()`` passthrough) and the caller must
+        ``aclose()`` the response.
+        """
+        method = method.upper()
+        client = self._get_client()
+        opened = []
+
+        async def trace(event_name: str, info: Dict[str, Any]) -> None:
+            if event_name == "connection.connect_tcp.complete":
+                opened.append(event_name)
+
+        send_options = {k: kwargs.pop(k) for k in ("auth", "follow_redirects") if k in kwargs}
+        extensions = dict(kwargs.pop("extensions", None) or {})
+        extensions["trace"] = trace
+        self._retry_budget.deposit()
+
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            status = "error"
+            try:
+                async with self._semaphore:
+                    self.stats.in_flight += 1
+                    try:
+                        request = client.build_request(method, url, extensions=extensions, **kwargs)
+                        response = await client.send(request, stream=stream, **send_options)
+                    finally:
+                        self.stats.in_flight -= 1
+                status = str(response.status_code)
+            except httpx.TransportError as e:
+                if not self._should_retry(method, attempt, error=e):
+                    self.stats.errors += 1
+                    raise
+                delay = self._backoff(attempt)
+            else:
+                if response.status_code not in RETRY_STATUSES or not self._should_retry(method, attempt):
+                    if response.status_code >= 500:
+                        self.stats.errors += 1
+                    return response
+                delay = self._backoff(attempt, response.headers.get("retry-after"))
+                await response.aclose()
+            finally:
+                self._record(status, time.perf_counter() - start, len(opened))
+                opened.clear()
+
+            attempt += 1
+            self.stats.retries += 1
+            logger.debug(f"Retrying {method} {self.name} request in {delay:.2f}s (attempt {attempt})")
+            await asyncio.sleep(delay)
+
+    async def get(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs: Any) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    def _should_retry(self, method: str, attempt: int, error: Optional[Exception] = None) -> bool:
+        if attempt >= self.config.retries:
+            return False
+        if method not in IDEMPOTENT_METHODS and not isinstance(error, NOT_SENT_ERRORS):
+            return False
+        if not self._retry_budget.try_spend():
+            self.stats.retries_denied += 1
+            return False
+        return True
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), MAX_RETRY_DELAY)
+            except ValueError:
+                pass
+        delay = self.config.retry_backoff * (2 ** attempt)
+        return min(delay * (0.5 + random.random()), MAX_RETRY_DELAY)
+
+    def _record(self, status: str, duration: float, connections_opened: int) -> None:
+        self.stats.requests += 1
+        self.stats.total_seconds += duration
+        self.stats.connections_opened += connections_opened
+        monitoring = _monitoring_service()
+        if monitoring is not None:
+            monitoring.record_outbound_request(self.name, status, duration, connections_opened)
+
+    async def aclose(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            try:
+                await self._client.aclose()
+            except RuntimeError:
+                # Client was opened on an event loop that has since closed
+                pass
+        self._client = None
+
+
+_monitoring = None
+
+
+def _monitoring_service():
+    """Monitoring service, imported on first use (it pulls in the service layer)."""
+    global _monitoring
+    if _monitoring is None:
+        try:
+            from app.services.monitoring_service import monitoring_service
+            _monitoring = monitoring_service
+        except Exception:
+            _monitoring = False
+    return _monitoring or None
+
+
+class HTTPClientRegistry:
+    """Lazily created ``UpstreamClient`` instances keyed by upstream name."""
+
+    def __init__(self, upstreams: Optional[Dict[str, UpstreamConfig]] = None):
+        self.upstreams = dict(UPSTREAMS if upstreams is None else upstreams)
+        self._clients: Dict[str, UpstreamClient] = {}
+
+    def get(self, name: str, base_url: Optional[str] = None) -> UpstreamClient:
+        client = self._clients.get(name)
+        if client is None:
+            config = self.upstreams.get(name) or UpstreamConfig(base_url=base_url or "")
+            client = self._clients[name] = UpstreamClient(name, _env_overrides(name, config))
+        return client
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: client.stats.to_dict() for name, client in self._clients.items()}
+
+    async def close(self) -> None:
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+
+http_clients = HTTPClientRegistry()
+
+
+def get_http_client(upstream: str, base_url: Optional[str] = None) -> UpstreamClient:
+    """Return the shared pooled client for an upstream (configured in UPSTREAMS)."""
+    return http_clients.get(upstream, base_url)
+
+
+async def close_http_clients() -> None:
+    """Close every pooled client (called on application shutdown)."""
+    await http_clients.close()
@@ -0,0 +1,378 @@
+"""Response cache and request coalescing for the upstream API proxies.
+
+The Mapbox and OpenRouteService proxies see bursts of identical requests
+(many clients opening the same route or isochrone at once). ``ProxyCache``
+sits between a proxy route and its pooled ``UpstreamClient``:
+
+- requests are canonicalized (sorted params, coordinates rounded to
+  ``PROXY_CACHE_COORDINATE_DECIMALS``, JSON bodies with sorted keys, access
+  tokens left out of the key) and the canonical form is what gets sent
+- concurrent identical requests share one upstream call
+- successful responses are cached in a byte-bounded in-process LRU and in
+  Redis, honouring upstream ``Cache-Control`` (``no-store``/``private`` are
+  never stored, ``max-age`` caps the TTL) and revalidating stale entries
+  with ``If-None-Match`` when the upstream sent an ``ETag``
+- bodies are requested gzip-compressed and kept exactly as received;
+  ``to_response()`` passes them through to clients that accept gzip and
+  only decompresses for those that do not
+
+Usage::
+
+    result = await mapbox_proxy.fetch("GET", "/directions/v5/mapbox/driving/...", params=params, ttl=600)
+    return to_response(result, request)
+"""
+
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import Request, Response
+
+from app.core.http_clients import UpstreamClient, get_http_client
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_TTL = int(os.getenv("PROXY_CACHE_DEFAULT_TTL", "600"))
+MAX_TTL = int(os.getenv("PROXY_CACHE_MAX_TTL", str(24 * 3600)))
+LRU_BYTES = int(os.getenv("PROXY_CACHE_LRU_BYTES", str(32 * 1024 * 1024)))
+COORDINATE_DECIMALS = int(os.getenv("PROXY_CACHE_COORDINATE_DECIMALS", "5"))
+# How long an entry with an ETag is kept in Redis after it goes stale, for revalidation
+STALE_GRACE = int(os.getenv("PROXY_CACHE_STALE_GRACE", "3600"))
+
+SYNTHETIC_ETAG_PREFIX = 'W/"pc-'
+
+SECRET_PARAMS = frozenset({"access_token", "api_key", "key"})
+COORDINATE_PARAMS = frozenset({"coordinates", "proximity", "locations"})
+COORDINATE_FIELDS = frozenset({"coordinates", "locations"})
+
+_DECIMAL = re.compile(r"-?\d+\.\d+")
+
+
+def round_coordinates_text(text: str, decimals: int = COORDINATE_DECIMALS) -> str:
+    """Round every decimal number in a path or parameter (e.g. "151.2093123,-33.86")."""
+    def _round(match: "re.Match[str]") -> str:
+        value = match.group(0)
+        if len(value.split(".")[1]) <= decimals:
+            return value
+        return repr(round(float(value), decimals))
+    return _DECIMAL.sub(_round, text)
+
+
+def _round_json(value: Any, decimals: int) -> Any:
+    if isinstance(value, float):
+        return round(value, decimals)
+    if isinstance(value, list):
+        return [_round_json(item, decimals) for item in value]
+    return value
+
+
+def canonical_request(method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                      json_body: Optional[Any] = None,
+                      decimals: int = COORDINATE_DECIMALS) -> Tuple[str, Dict[str, str], Optional[bytes], str]:
+    """Canonical (path, params, body) to send upstream and the cache key identity string."""
+    path = round_coordinates_text(path, decimals)
+    canonical_params = {}
+    for key in sorted(params or {}):
+        value = params[key]
+        if value is None:
+            continue
+        value = str(value).lower() if isinstance(value, bool) else str(value)
+        if key in COORDINATE_PARAMS:
+            value = round_coordinates_text(value, decimals)
+        canonical_params[key] = value
+
+    body = None
+    if json_body is not None:
+        if isinstance(json_body, dict):
+            json_body = {k: _round_json(v, decimals) if k in COORDINATE_FIELDS else v
+                         for k, v in json_body.items()}
+        body = json.dumps(json_body, sort_keys=True, separators=(",", ":")).encode()
+
+    keyed_params = "&".join(f"{k}={v}" for k, v in canonical_params.items() if k not in SECRET_PARAMS)
+    identity = f"{method.upper()} {path}?{keyed_params}\n" + (body or b"").decode()
+    return path, canonical_params, body, identity
+
+
+def _parse_cache_control(value: Optional[str]) -> Dict[str, Optional[str]]:
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') or None
+    return directives
+
+
+@dataclass
+class CachedResponse:
+    """An upstream response kept as received (body possibly gzip-encoded)."""
+
+    status_code: int
+    body: bytes
+    content_type: str = "application/json"
+    content_encoding: Optional[str] = None
+    etag: Optional[str] = None
+    cache_control: Optional[str] = None
+    expires_at: float = 0.0
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) < self.expires_at
+
+    def decoded_body(self) -> bytes:
+        return gzip.decompress(self.body) if self.content_encoding == "gzip" else self.body
+
+    def json(self) -> Any:
+        return json.loads(self.decoded_body())
+
+    def text(self) -> str:
+        return self.decoded_body().decode(errors="replace")
+
+    def to_cache(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["body"] = base64.b64encode(self.body).decode()
+        return data
+
+    @classmethod
+    def from_cache(cls, data: Dict[str, Any]) -> "CachedResponse":
+        return cls(**{**data, "body": base64.b64decode(data["body"])})
+
+
+class ResponseLRU:
+    """In-process LRU bounded by total body bytes."""
+
+    def __init__(self, max_bytes: int = LRU_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        if len(entry.body) > self.max_bytes:
+            return
+        self.pop(key)
+        self._entries[key] = entry
+        self.bytes += len(entry.body)
+        while self.bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.bytes -= len(evicted.body)
+
+    def pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= len(entry.body)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ProxyCache:
+    """Canonicalizing, coalescing, two-tier response cache for one upstream."""
+
+    def __init__(self, upstream: str, client: Optional[UpstreamClient] = None, redis_cache: Any = None,
+                 default_ttl: int = DEFAULT_TTL, max_ttl: int = MAX_TTL, lru_bytes: int = LRU_BYTES,
+                 decimals: int = COORDINATE_DECIMALS):
+        self.upstream = upstream
+        self._client = client
+        self._redis_cache = redis_cache
+        self.default_ttl = default_ttl
+        self.max_ttl = max_ttl
+        self.decimals = decimals
+        self.local = ResponseLRU(lru_bytes)
+        self._inflight: Dict[str, "asyncio.Task[CachedResponse]"] = {}
+        self.stats = {
+            "requests": 0, "local_hits": 0, "redis_hits": 0, "coalesced": 0,
+            "upstream_requests": 0, "revalidated": 0, "not_stored": 0, "upstream_bytes": 0,
+        }
+
+    @property
+    def client(self) -> UpstreamClient:
+        return self._client or get_http_client(self.upstream)
+
+    @property
+    def redis_cache(self):
+        if self._redis_cache is None:
+            from app.services.cache_service import cache_service
+            self._redis_cache = cache_service
+        return self._redis_cache
+
+    async def fetch(self, method: str, path: str, params: Optional[Dict[str, Any]] = None,
+                    json_body: Optional[Any] = None, headers: Optional[Dict[str, str]] = None,
+                    ttl: Optional[int] = None, use_cache: bool = True) -> Tuple[CachedResponse, str]:
+        """Return ``(response, cache_status)``; status is HIT, MISS, COALESCED or REVALIDATED.
+
+        Upstream error responses are returned (never cached); transport
+        errors propagate to every coalesced caller.
+        """
+        self.stats["requests"] += 1
+        path, params, body, identity = canonical_request(method, path, params, json_body, self.decimals)
+        key = f"proxy:{self.upstream}:{hashlib.sha256(identity.encode()).hexdigest()}"
+
+        stale = None
+        if use_cache:
+            entry = self.local.get(key)
+            if entry is not None and entry.is_fresh():
+                self.stats["local_hits"] += 1
+                return entry, "HIT"
+            # Another worker may have refreshed the entry in Redis
+            shared = await self._redis_get(key)
+            if shared is not None and shared.is_fresh():
+                self.local.set(key, shared)
+                self.stats["redis_hits"] += 1
+                return shared, "HIT"
+            stale = shared or entry
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+            entry, status = await asyncio.shield(task)
+            return entry, "COALESCED" if status == "MISS" else status
+
+        task = asyncio.ensure_future(
+            self._fetch_upstream(key, method, path, params, body, headers, ttl, stale, use_cache)
+        )
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+
+    def _done(self, key: str, task: "asyncio.Task") -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # retrieved here so an unawaited failure is not logged as lost
+
+    async def _fetch_upstream(self, key: str, method: str, path: str, params: Dict[str, str],
+                              body: Optional[bytes], headers: Optional[Dict[str, str]], ttl: Optional[int],
+                              stale: Optional[CachedResponse], use_cache: bool) -> Tuple[CachedResponse, str]:
+        request_headers = {"Accept-Encoding": "gzip", **(headers or {})}
+        if body is not None:
+            request_headers.setdefault("Content-Type", "application/json")
+        if stale is not None and stale.etag and not stale.etag.startswith(SYNTHETIC_ETAG_PREFIX):
+            request_headers["If-None-Match"] = stale.etag
+
+        self.stats["upstream_requests"] += 1
+        response = await self.client.request(method, path, params=params, content=body,
+                                              headers=request_headers, stream=True)
+        try:
+            if response.status_code == 304 and stale is not None:
+                self.stats["revalidated"] += 1
+                cache_control = response.headers.get("cache-control") or stale.cache_control
+                entry = replace(stale, cache_control=cache_control,
+                                expires_at=time.time() + self._ttl(cache_control, ttl))
+                status = "REVALIDATED"
+            else:
+                raw = b"".join([chunk async for chunk in response.aiter_raw()])
+                self.stats["upstream_bytes"] += len(raw)
+                encoding = response.headers.get("content-encoding")
+                cache_control = response.headers.get("cache-control")
+                entry = CachedResponse(
+                    status_code=response.status_code,
+                    body=raw,
+                    content_type=response.headers.get("content-type", "application/json"),
+                    content_encoding=encoding.lower() if encoding else None,
+                    etag=response.headers.get("etag"),
+                    cache_control=cache_control,
+                    expires_at=time.time() + self._ttl(cache_control, ttl),
+                )
+                status = "MISS"
+        finally:
+            await response.aclose()
+
+        if use_cache and entry.status_code == 200:
+            if self._storable(entry):
+                await self._store(key, entry)
+            else:
+                self.stats["not_stored"] += 1
+        return entry, status
+
+    def _ttl(self, cache_control: Optional[str], ttl: Optional[int]) -> float:
+        directives = _parse_cache_control(cache_control)
+        if "no-cache" in directives or "no-store" in directives:
+            return 0.0
+        max_age = directives.get("s-maxage") or directives.get("max-age")
+        route_ttl = self.default_ttl if ttl is None else ttl
+        if max_age is not None and max_age.isdigit():
+            return float(min(int(max_age), route_ttl, self.max_ttl))
+        return float(min(route_ttl, self.max_ttl))
+
+    @staticmethod
+    def _storable(entry: CachedResponse) -> bool:
+        directives = _parse_cache_control(entry.cache_control)
+        if "no-store" in directives or "private" in directives:
+            return False
+        # no-cache entries are only useful with an ETag to revalidate against
+        return entry.is_fresh() or bool(entry.etag)
+
+    async def _store(self, key: str, entry: CachedResponse) -> None:
+        revalidatable = entry.etag is not None
+        if entry.etag is None:
+            # Lets clients revalidate against the proxy; never sent upstream
+            entry.etag = f'{SYNTHETIC_ETAG_PREFIX}{hashlib.sha1(entry.body).hexdigest()[:20]}"'
+        self.local.set(key, entry)
+        redis_ttl = int(entry.expires_at - time.time()) + (STALE_GRACE if revalidatable else 0)
+        if redis_ttl > 0:
+            await self.redis_cache.set(key, entry.to_cache(), ttl=redis_ttl)
+
+    async def _redis_get(self, key: str) -> Optional[CachedResponse]:
+        data = await self.redis_cache.get(key)
+        if not data:
+            return None
+        try:
+            return CachedResponse.from_cache(data)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Discarding unreadable proxy cache entry {key}: {e}")
+            return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        requests = self.stats["requests"]
+        served = self.stats["local_hits"] + self.stats["redis_hits"] + self.stats["coalesced"]
+        return {
+            **self.stats,
+            "local_entries": len(self.local),
+            "local_bytes": self.local.bytes,
+            "in_flight": len(self._inflight),
+            # Share of proxied requests that did not cause an upstream request
+            "upstream_request_reduction": round(served / requests, 4) if requests else None,
+        }
+
+
+def _accepts(request: Optional[Request], encoding: str) -> bool:
+    if request is None:
+        return False
+    return encoding in request.headers.get("accept-encoding", "").lower()
+
+
+def _etag_matches(request: Optional[Request], etag: Optional[str]) -> bool:
+    if request is None or not etag:
+        return False
+    candidates = [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]
+    return etag in candidates or "*" in candidates
+
+
+def to_response(result: Tuple[CachedResponse, str], request: Optional[Request] = None) -> Response:
+    """Render a cached upstream response for a client, passing gzip through when accepted."""
+    entry, cache_status = result
+    remaining = max(0, int(entry.expires_at - time.time()))
+    headers = {"X-Cache": cache_status, "Vary": "Accept-Encoding", "Cache-Control": f"private, max-age={remaining}"}
+    if entry.etag:
+        headers["ETag"] = entry.etag
+
+    if _etag_matches(request, entry.etag):
+        return Response(status_code=304, headers=headers)
+    if entry.content_encoding == "gzip" and _accepts(request, "gzip"):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=entry.body, status_code=entry.status_code,
+                        media_type=entry.content_type, headers=headers)
+    return Response(content=entry.decoded_body(), status_code=entry.status_code,
+                    media_type=entry.content_type, headers=headers)
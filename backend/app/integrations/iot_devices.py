@@ -22,7 +22,14 @@ import serial
 import time
 
 from app.core.config import get_settings
+from app.core.database_pool import db_pool
 from app.services.database import get_database
+from app.integrations.iot_telemetry import (
+    AlertEvaluator,
+    AsyncpgTelemetrySink,
+    DeviceAlertSink,
+    TelemetryPipeline,
+)
 from app.core.security import generate_device_token, validate_device_token
 
 settings = get_settings()
@@ -184,6 +191,17 @@ class PAMIoTDeviceSystem:
         
         # Automation engine
         self.automation_rules: Dict[str, AutomationRule] = {}
+
+        # Telemetry: buffered reading writes, rollups and off-path threshold alerts
+        self.telemetry = TelemetryPipeline(
+            sink=AsyncpgTelemetrySink(db_pool),
+            flush_samples=int(getattr(settings, 'IOT_TELEMETRY_FLUSH_SAMPLES', 5000)),
+            flush_seconds=float(getattr(settings, 'IOT_TELEMETRY_FLUSH_SECONDS', 2.0)),
+        )
+        self.alert_sink = DeviceAlertSink(db_pool, owner_of=self._device_owner, notify=self._send_alert_notification)
+        self.alert_evaluator = AlertEvaluator(
+            self.telemetry, on_alert=self.alert_sink.on_alert, on_resolve=self.alert_sink.on_resolve
+        )
         
         # Device type configurations
         self.device_configs = {
@@ -250,6 +268,10 @@ class PAMIoTDeviceSystem:
             
             # Start automation engine
             await self._start_automation_engine()
+
+            # Start telemetry flusher and alert evaluator
+            self.telemetry.start()
+            self.alert_evaluator.start()
             
             logger.info("IoT device system initialized")
             
@@ -826,14 +848,9 @@ class PAMIoTDeviceSystem:
                     # Get sensor readings
                     readings = await self._collect_device_readings(device)
                     
-                    # Store readings
-                    for reading in readings:
-                        await self._store_device_reading(reading)
-                    
-                    # Check for alerts
-                    alerts = await self._check_device_alerts(device, readings)
-                    for alert in alerts:
-                        await self._process_device_alert(alert)
+                    # Buffer readings; the telemetry pipeline batches the writes and
+                    # the alert evaluator checks thresholds off this loop
+                    self.telemetry.record_many(device.device_id, readings)
                     
                     # Update device status
                     device.last_seen = datetime.utcnow()
@@ -854,6 +871,41 @@ class PAMIoTDeviceSystem:
         except Exception as e:
             logger.error(f"Error in device monitoring: {e}")
 
+    def _device_owner(self, device_id: str) -> Optional[str]:
+        device = self.connected_devices.get(device_id)
+        return device.user_id if device else None
+
+    async def _send_alert_notification(self, user_id: str, alert: Dict[str, Any]):
+        """Push a stored threshold alert to the owner's open WebSocket connections"""
+        from app.core.websocket_manager import manager
+
+        message = {
+            "type": "device_alert",
+            "alert_id": str(alert["alert_id"]),
+            "device_id": alert["device_id"],
+            "alert_type": alert["alert_type"],
+            "severity": alert["severity"],
+            "recommendations": alert["recommendations"],
+            "timestamp": alert["triggered_at"].isoformat(),
+            "action": "show_notification",
+            "notification": {
+                "title": alert["title"],
+                "body": alert["description"],
+                "requireInteraction": alert["severity"] in ("high", "critical"),
+                "tag": f"device-alert-{alert['device_id']}-{alert['alert_type']}",
+            }
+        }
+        await manager.send_message_to_user(message=json.dumps(message), user_id=user_id)
+
+    async def shutdown(self):
+        """Stop monitoring and flush buffered telemetry"""
+        for task in getattr(self, 'monitoring_tasks', {}).values():
+            task.cancel()
+        await self.alert_evaluator.stop()
+        await self.telemetry.stop()
+        if self.session:
+            await self.session.close()
+
 
 # Global IoT device system instance
 iot_device_system = PAMIoTDeviceSystem()
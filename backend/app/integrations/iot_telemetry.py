@@ -0,0 +1,497 @@
+"""
+IoT Telemetry Pipeline
+Buffered ingestion for device sensor readings.
+
+Readings are recorded in O(1) into per-sensor ring buffers and a pending
+batch; a background flusher writes the batch every N samples or T seconds
+(whichever comes first) with a single COPY, instead of one INSERT per
+sample per device. Numeric readings also feed 1-minute and 1-hour
+min/max/avg rollups, written once per bucket when it closes.
+
+Threshold alerts are evaluated by a separate AlertEvaluator task that reads
+the in-memory ring buffers of devices that reported since its last pass, so
+alerting never sits on the ingestion path. DeviceAlertSink stores the
+alerts it raises in pam_device_alerts, resolves them when readings recover
+and notifies the device's owner.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from array import array
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUFFER_CAPACITY = 120       # samples kept per device sensor (2 min at 1 Hz)
+DEFAULT_FLUSH_SAMPLES = 5000
+DEFAULT_FLUSH_SECONDS = 2.0
+DEFAULT_MAX_PENDING = 200_000       # raw samples held while the database is slow
+ROLLUP_RESOLUTIONS = {"1m": 60, "1h": 3600}
+EVALUATION_YIELD_EVERY = 1000
+
+SensorKey = Tuple[str, str]  # (device_id, sensor_type)
+
+
+class RingBuffer:
+    """Fixed-capacity buffer of (timestamp, value) pairs backed by typed arrays"""
+
+    __slots__ = ("capacity", "_ts", "_values", "_next", "_size")
+
+    def __init__(self, capacity: int = DEFAULT_BUFFER_CAPACITY):
+        self.capacity = capacity
+        self._ts = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        self._next = 0
+        self._size = 0
+
+    def append(self, ts: float, value: float) -> None:
+        self._ts[self._next] = ts
+        self._values[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        if self._size < self.capacity:
+            self._size += 1
+
+    def __len__(self) -> int:
+        return self._size
+
+    def latest(self, count: int = 1) -> List[float]:
+        """Most recent values, newest first"""
+        count = min(count, self._size)
+        return [self._values[(self._next - 1 - i) % self.capacity] for i in range(count)]
+
+    def last_timestamp(self) -> Optional[float]:
+        return self._ts[(self._next - 1) % self.capacity] if self._size else None
+
+    def since(self, cutoff: float) -> List[Tuple[float, float]]:
+        """(timestamp, value) pairs newer than cutoff, oldest first"""
+        items = []
+        for i in range(self._size):
+            idx = (self._next - 1 - i) % self.capacity
+            if self._ts[idx] <= cutoff:
+                break
+            items.append((self._ts[idx], self._values[idx]))
+        items.reverse()
+        return items
+
+
+class RollupBucket:
+    """Running min/max/sum/count for one sensor over one time bucket"""
+
+    __slots__ = ("start", "minimum", "maximum", "total", "count")
+
+    def __init__(self, start: float, value: float):
+        self.start = start
+        self.minimum = value
+        self.maximum = value
+        self.total = value
+        self.count = 1
+
+    def add(self, value: float) -> None:
+        if value < self.minimum:
+            self.minimum = value
+        elif value > self.maximum:
+            self.maximum = value
+        self.total += value
+        self.count += 1
+
+
+@dataclass
+class ThresholdRule:
+    """Alert when a sensor stays outside [min_value, max_value] for sustain_samples readings"""
+    sensor_type: str
+    alert_type: str
+    severity: str
+    title: str
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
+    sustain_samples: int = 3
+    recommendations: List[str] = field(default_factory=list)
+
+    def breached(self, value: float) -> bool:
+        return (self.min_value is not None and value < self.min_value) or (
+            self.max_value is not None and value > self.max_value
+        )
+
+
+# Defaults for the RV sensors PAM monitors; callers can pass their own rules
+DEFAULT_THRESHOLD_RULES = [
+    ThresholdRule("battery_voltage", "battery_low", "high", "House battery voltage low",
+                  min_value=11.8, recommendations=["Reduce loads", "Start charging"]),
+    ThresholdRule("voltage", "battery_low", "high", "Battery voltage low",
+                  min_value=11.8, recommendations=["Reduce loads", "Start charging"]),
+    ThresholdRule("coolant_temp", "engine_temp_high", "critical", "Engine coolant temperature high",
+                  max_value=110, recommendations=["Pull over safely", "Let the engine cool"]),
+    ThresholdRule("water_level", "low_water", "medium", "Fresh water tank low",
+                  min_value=10, recommendations=["Refill at the next water point"]),
+    ThresholdRule("fuel_level", "low_fuel", "medium", "Fuel level low",
+                  min_value=15, recommendations=["Find a fuel station on your route"]),
+]
+
+
+class AsyncpgTelemetrySink:
+    """Writes batches to Postgres through a pool exposing acquire() (asyncpg or DatabasePool)"""
+
+    READING_COLUMNS = ("device_id", "sensor_type", "value", "unit", "timestamp", "quality")
+    ROLLUP_COLUMNS = ("device_id", "sensor_type", "resolution", "bucket_start",
+                      "min_value", "max_value", "sample_sum", "sample_count")
+
+    def __init__(self, pool, readings_table: str = "pam_device_readings",
+                 rollups_table: str = "pam_device_reading_rollups"):
+        self.pool = pool
+        self.readings_table = readings_table
+        self.rollups_table = rollups_table
+
+    async def write_readings(self, rows: List[Tuple]) -> None:
+        records = [
+            (device_id, sensor, json.dumps(value), unit, _to_datetime(ts), quality)
+            for device_id, sensor, value, unit, ts, quality in rows
+        ]
+        async with self.pool.acquire() as conn:
+            await conn.copy_records_to_table(
+                self.readings_table, records=records, columns=list(self.READING_COLUMNS)
+            )
+
+    async def write_rollups(self, rows: List[Tuple]) -> None:
+        # Buckets may be flushed more than once (restart, several workers): merge, don't overwrite
+        columns = ", ".join(self.ROLLUP_COLUMNS)
+        placeholders = ", ".join(f"${i}" for i in range(1, len(self.ROLLUP_COLUMNS) + 1))
+        t = self.rollups_table
+        records = [(d, s, r, _to_datetime(b), mn, mx, sm, c) for d, s, r, b, mn, mx, sm, c in rows]
+        async with self.pool.acquire() as conn:
+            await conn.executemany(
+                f"INSERT INTO {t} ({columns}) VALUES ({placeholders}) "
+                f"ON CONFLICT (device_id, sensor_type, resolution, bucket_start) DO UPDATE SET "
+                f"min_value = LEAST({t}.min_value, EXCLUDED.min_value), "
+                f"max_value = GREATEST({t}.max_value, EXCLUDED.max_value), "
+                f"sample_sum = {t}.sample_sum + EXCLUDED.sample_sum, "
+                f"sample_count = {t}.sample_count + EXCLUDED.sample_count",
+                records,
+            )
+
+
+class DeviceAlertSink:
+    """AlertEvaluator callbacks that persist alerts and notify the device owner
+
+    owner_of maps a device ID to its user ID (None for devices no longer
+    connected, whose alerts are dropped). notify receives the user ID and the
+    stored alert as a dict.
+    """
+
+    def __init__(
+        self,
+        pool,
+        owner_of: Callable[[str], Optional[str]],
+        notify: Optional[Callable[[str, Dict[str, Any]], Awaitable[None]]] = None,
+        table: str = "pam_device_alerts",
+    ):
+        self.pool = pool
+        self.owner_of = owner_of
+        self.notify = notify
+        self.table = table
+
+    async def on_alert(self, device_id: str, rule: ThresholdRule, value: float, ts: float) -> None:
+        user_id = self.owner_of(device_id)
+        if user_id is None:
+            logger.warning(f"Dropping {rule.alert_type} alert for unknown device {device_id}")
+            return
+        alert = {
+            "device_id": device_id,
+            "user_id": user_id,
+            "alert_type": rule.alert_type,
+            "severity": rule.severity,
+            "title": rule.title,
+            "description": f"{rule.sensor_type} reading {value:g} has been out of range "
+                           f"for {rule.sustain_samples} samples",
+            "recommendations": rule.recommendations,
+            "triggered_at": _to_datetime(ts),
+            "metadata": {"sensor_type": rule.sensor_type, "value": value,
+                         "min_value": rule.min_value, "max_value": rule.max_value},
+        }
+        async with self.pool.acquire() as conn:
+            alert["alert_id"] = await conn.fetchval(
+                f"INSERT INTO {self.table} (device_id, user_id, alert_type, severity, title, description, "
+                f"recommendations, triggered_at, metadata) "
+                f"VALUES ($1, $2, $3, $4, $5, $6, $7::jsonb, $8, $9::jsonb) RETURNING alert_id",
+                device_id, user_id, rule.alert_type, rule.severity, rule.title, alert["description"],
+                json.dumps(rule.recommendations), alert["triggered_at"], json.dumps(alert["metadata"]),
+            )
+        if self.notify is not None:
+            await self.notify(user_id, alert)
+
+    async def on_resolve(self, device_id: str, rule: ThresholdRule, value: float, ts: float) -> None:
+        async with self.pool.acquire() as conn:
+            await conn.execute(
+                f"UPDATE {self.table} SET resolved_at = $4 "
+                f"WHERE device_id = $1 AND alert_type = $2 AND metadata->>'sensor_type' = $3 "
+                f"AND resolved_at IS NULL",
+                device_id, rule.alert_type, rule.sensor_type, _to_datetime(ts),
+            )
+
+
+def _to_datetime(ts: float) -> datetime:
+    return datetime.fromtimestamp(ts, tz=timezone.utc)
+
+
+def _numeric(value: Any) -> Optional[float]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value)
+
+
+@dataclass
+class TelemetryStats:
+    recorded: int = 0
+    flushed: int = 0
+    dropped: int = 0
+    flushes: int = 0
+    failed_flushes: int = 0
+    rollups_written: int = 0
+    last_flush_ms: float = 0.0
+
+
+class TelemetryPipeline:
+    """Ring buffers, batched raw writes and rollups for device readings"""
+
+    def __init__(
+        self,
+        sink=None,
+        buffer_capacity: int = DEFAULT_BUFFER_CAPACITY,
+        flush_samples: int = DEFAULT_FLUSH_SAMPLES,
+        flush_seconds: float = DEFAULT_FLUSH_SECONDS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.sink = sink
+        self.buffer_capacity = buffer_capacity
+        self.flush_samples = flush_samples
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self.clock = clock
+
+        self.buffers: Dict[SensorKey, RingBuffer] = {}
+        self.dirty: Set[SensorKey] = set()
+        self.stats = TelemetryStats()
+
+        self._pending: List[Tuple] = []
+        self._open_buckets: Dict[str, Dict[SensorKey, RollupBucket]] = {r: {} for r in ROLLUP_RESOLUTIONS}
+        self._closed_rollups: List[Tuple] = []
+        self._flush_event = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def record(
+        self,
+        device_id: str,
+        sensor_type: str,
+        value: Any,
+        ts: Optional[float] = None,
+        unit: Optional[str] = None,
+        quality: float = 1.0,
+    ) -> None:
+        """Record one reading; never awaits or touches the database"""
+        ts = self.clock() if ts is None else ts
+        self.stats.recorded += 1
+
+        if len(self._pending) >= self.max_pending:
+            # Database is behind: shed the oldest raw samples, rollups stay exact
+            del self._pending[: self.flush_samples]
+            self.stats.dropped += self.flush_samples
+        self._pending.append((device_id, sensor_type, value, unit, ts, quality))
+        if len(self._pending) >= self.flush_samples:
+            self._flush_event.set()
+
+        number = _numeric(value)
+        if number is None:
+            return
+
+        key = (device_id, sensor_type)
+        buffer = self.buffers.get(key)
+        if buffer is None:
+            buffer = self.buffers[key] = RingBuffer(self.buffer_capacity)
+        buffer.append(ts, number)
+        self.dirty.add(key)
+
+        for resolution, seconds in ROLLUP_RESOLUTIONS.items():
+            start = ts - ts % seconds
+            buckets = self._open_buckets[resolution]
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = RollupBucket(start, number)
+            elif bucket.start == start:
+                bucket.add(number)
+            elif start > bucket.start:
+                self._close(resolution, key, bucket)
+                buckets[key] = RollupBucket(start, number)
+            # Readings older than the open bucket only reach the raw table
+
+    def record_many(self, device_id: str, readings: Iterable[Any]) -> None:
+        """Record DeviceReading-like objects (sensor_type, value, unit, timestamp, quality)"""
+        for reading in readings:
+            timestamp = reading.timestamp
+            if isinstance(timestamp, datetime):
+                if timestamp.tzinfo is None:
+                    timestamp = timestamp.replace(tzinfo=timezone.utc)
+                timestamp = timestamp.timestamp()
+            self.record(device_id, reading.sensor_type, reading.value, timestamp,
+                        reading.unit, reading.quality)
+
+    def _close(self, resolution: str, key: SensorKey, bucket: RollupBucket) -> None:
+        self._closed_rollups.append((
+            key[0], key[1], resolution, bucket.start,
+            bucket.minimum, bucket.maximum, bucket.total, bucket.count,
+        ))
+
+    def _close_expired_buckets(self, now: float, force: bool = False) -> None:
+        for resolution, seconds in ROLLUP_RESOLUTIONS.items():
+            buckets = self._open_buckets[resolution]
+            expired = [k for k, b in buckets.items() if force or b.start + seconds <= now]
+            for key in expired:
+                self._close(resolution, key, buckets.pop(key))
+
+    async def flush(self, force_rollups: bool = False) -> int:
+        """Write pending raw samples and closed rollup buckets; returns raw rows written"""
+        async with self._flush_lock:
+            self._close_expired_buckets(self.clock(), force=force_rollups)
+            batch, self._pending = self._pending, []
+            rollups, self._closed_rollups = self._closed_rollups, []
+            if not batch and not rollups:
+                return 0
+            if self.sink is None:
+                self.stats.flushed += len(batch)
+                return len(batch)
+
+            start = time.perf_counter()
+            try:
+                if batch:
+                    await self.sink.write_readings(batch)
+                if rollups:
+                    await self.sink.write_rollups(rollups)
+            except Exception as e:
+                self.stats.failed_flushes += 1
+                logger.error(f"Telemetry flush of {len(batch)} readings failed: {e}")
+                # Put the batch back in front of anything recorded meanwhile
+                self._pending = (batch + self._pending)[-self.max_pending:]
+                self._closed_rollups = rollups + self._closed_rollups
+                return 0
+
+            self.stats.flushes += 1
+            self.stats.flushed += len(batch)
+            self.stats.rollups_written += len(rollups)
+            self.stats.last_flush_ms = round((time.perf_counter() - start) * 1000, 2)
+            return len(batch)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            await self.flush()
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Stop the flusher and write everything still in memory, open buckets included"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush(force_rollups=True)
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+
+AlertCallback = Callable[[str, ThresholdRule, float, float], Awaitable[None]]
+
+
+class AlertEvaluator:
+    """Evaluates threshold rules against ring buffers off the ingestion path
+
+    Only sensors that received readings since the previous pass are checked.
+    An alert fires once when a rule has been breached for sustain_samples
+    consecutive readings and resolves when the latest reading is back in range.
+    """
+
+    def __init__(
+        self,
+        pipeline: TelemetryPipeline,
+        rules: Optional[List[ThresholdRule]] = None,
+        on_alert: Optional[AlertCallback] = None,
+        on_resolve: Optional[AlertCallback] = None,
+        interval: float = 1.0,
+    ):
+        self.pipeline = pipeline
+        self.rules: Dict[str, List[ThresholdRule]] = {}
+        for rule in rules if rules is not None else DEFAULT_THRESHOLD_RULES:
+            self.rules.setdefault(rule.sensor_type, []).append(rule)
+        self.on_alert = on_alert
+        self.on_resolve = on_resolve
+        self.interval = interval
+        self.active: Dict[Tuple[str, str, str], float] = {}  # (device, sensor, alert_type) -> since
+        self._task: Optional[asyncio.Task] = None
+
+    async def evaluate(self) -> int:
+        """One pass over dirty sensors; returns the number of state changes"""
+        dirty, self.pipeline.dirty = self.pipeline.dirty, set()
+        changes = 0
+        for checked, key in enumerate(dirty, 1):
+            if checked % EVALUATION_YIELD_EVERY == 0:
+                await asyncio.sleep(0)  # keep large fleets from stalling the loop
+            rules = self.rules.get(key[1])
+            if not rules:
+                continue
+            buffer = self.pipeline.buffers[key]
+            for rule in rules:
+                alert_key = (key[0], key[1], rule.alert_type)
+                recent = buffer.latest(rule.sustain_samples)
+                if alert_key not in self.active:
+                    if len(recent) == rule.sustain_samples and all(rule.breached(v) for v in recent):
+                        self.active[alert_key] = buffer.last_timestamp()
+                        changes += 1
+                        await self._notify(self.on_alert, key[0], rule, recent[0], buffer.last_timestamp())
+                elif not rule.breached(recent[0]):
+                    del self.active[alert_key]
+                    changes += 1
+                    await self._notify(self.on_resolve, key[0], rule, recent[0], buffer.last_timestamp())
+        return changes
+
+    async def _notify(self, callback, device_id, rule, value, ts) -> None:
+        if callback is None:
+            return
+        try:
+            await callback(device_id, rule, value, ts)
+        except Exception as e:
+            logger.error(f"Alert callback failed for {device_id}/{rule.alert_type}: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.evaluate()
+            except Exception as e:
+                logger.error(f"Alert evaluation pass failed: {e}")
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -501,6 +501,37 @@ async def lifespan(app: FastAPI):
             logger.warning(f"⚠️ Universal Site Access initialization failed: {usa_error}")
             logger.info("💡 PAM will operate without browser automation capabilities")
 
+        # Start durable OCR job worker (Redis-backed queue, process-pool CPU work)
+        try:
+            from app.services.ocr.job_queue import ocr_job_worker
+
+            await ocr_job_worker.start()
+            app.state.ocr_job_worker = ocr_job_worker
+            logger.info("✅ OCR job worker started")
+        except Exception as ocr_worker_error:
+            logger.warning(f"⚠️ OCR job worker failed to start: {ocr_worker_error}")
+
+        # Start batched analytics writer (events are queued by PamAnalytics.track_event)
+        try:
+            from app.services.analytics.pipeline import get_analytics_pipeline
+
+            analytics_pipeline = get_analytics_pipeline()
+            analytics_pipeline.start()
+            app.state.analytics_pipeline = analytics_pipeline
+            logger.info("✅ Analytics pipeline started")
+        except Exception as analytics_error:
+            logger.warning(f"⚠️ Analytics pipeline failed to start: {analytics_error}")
+
+        # Train the local intent model (about 1.5 s of CPU) off the event loop,
+        # so intent requests only read the built classifier
+        try:
+            from app.services.pam.intent_classifier import get_intent_classifier
+
+            intent_classifier = await asyncio.to_thread(get_intent_classifier)
+            logger.info(f"✅ Intent classifier ready (AI fallback below {intent_classifier.model.threshold:.2f})")
+        except Exception as intent_error:
+            logger.warning(f"⚠️ Intent classifier failed to load: {intent_error}")
+
         logger.info("✅ WebSocket manager ready")
         logger.info("✅ Monitoring service ready")
 
@@ -605,6 +636,68 @@ async def lifespan(app: FastAPI):
         except Exception as usa_shutdown_error:
             logger.warning(f"⚠️ Error shutting down Universal Site Access: {usa_shutdown_error}")
 
+        # Shutdown OCR job worker and its process pool
+        try:
+            if hasattr(app.state, 'ocr_job_worker'):
+                await app.state.ocr_job_worker.stop()
+                await app.state.ocr_job_worker.queue.close()
+            from app.workers.ocr_cpu import shutdown_process_pool
+            shutdown_process_pool()
+            logger.info("✅ OCR job worker shutdown completed")
+        except Exception as ocr_shutdown_error:
+            logger.warning(f"⚠️ Error shutting down OCR job worker: {ocr_shutdown_error}")
+
+        # Shutdown the knowledge ingestion parser pool
+        try:
+            from app.services.knowledge.ingestion_engine import shutdown_parse_pool
+            shutdown_parse_pool()
+            logger.info("✅ Knowledge parser pool shutdown completed")
+        except Exception as parse_pool_shutdown_error:
+            logger.warning(f"⚠️ Error shutting down knowledge parser pool: {parse_pool_shutdown_error}")
+
+        # Stop dynamic tool sandbox workers
+        try:
+            from app.services.dynamic_tools.worker_pool import close_tool_worker_pool
+            await close_tool_worker_pool()
+            logger.info("✅ Dynamic tool worker pool shutdown completed")
+        except Exception as tool_pool_shutdown_error:
+            logger.warning(f"⚠️ Error shutting down dynamic tool worker pool: {tool_pool_shutdown_error}")
+
+        # Flush queued analytics events and rollups
+        try:
+            if hasattr(app.state, 'analytics_pipeline'):
+                await app.state.analytics_pipeline.stop()
+                logger.info("✅ Analytics pipeline flushed and stopped")
+        except Exception as analytics_shutdown_error:
+            logger.warning(f"⚠️ Error stopping analytics pipeline: {analytics_shutdown_error}")
+
+        # Flush buffered IoT telemetry (only if the IoT system was loaded;
+        # importing it here would start it)
+        try:
+            import sys
+            iot_devices = sys.modules.get("app.integrations.iot_devices")
+            if iot_devices is not None:
+                await iot_devices.iot_device_system.shutdown()
+                logger.info("✅ IoT telemetry flushed and device monitoring stopped")
+        except Exception as iot_shutdown_error:
+            logger.warning(f"⚠️ Error shutting down IoT device system: {iot_shutdown_error}")
+
+        # Stop the auth session expiry sweeper (only started once sessions were used)
+        try:
+            from app.services.auth.session_manager import close_session_manager
+            await close_session_manager()
+            logger.info("✅ Session manager shutdown completed")
+        except Exception as session_shutdown_error:
+            logger.warning(f"⚠️ Error shutting down session manager: {session_shutdown_error}")
+
+        # Close pooled outbound HTTP clients
+        try:
+            from app.core.http_clients import close_http_clients
+            await close_http_clients()
+            logger.info("✅ Outbound HTTP clients closed")
+        except Exception as http_shutdown_error:
+            logger.warning(f"⚠️ Error closing outbound HTTP clients: {http_shutdown_error}")
+
         # Shutdown Knowledge Tool (if initialized)
         try:
             from app.tools.knowledge_tool import knowledge_tool
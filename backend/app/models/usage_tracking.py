@@ -5,7 +5,7 @@ Track conversation minutes, tool calls, costs, and retention metrics
 
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from uuid import UUID
 from pydantic import BaseModel, Field
 
@@ -74,6 +74,23 @@ class RetentionMetrics(BaseModel):
     cohort_size: int = Field(description="Number of users in cohort")
 
 
+class RetentionCohort(BaseModel):
+    """One cohort row of a retention matrix"""
+    cohort_start: date
+    cohort_size: int
+    retained: Dict[int, Optional[int]] = Field(
+        description="Users active in each period; None if the period hasn't started yet"
+    )
+    rates: Dict[int, Optional[float]] = Field(description="retained / cohort_size per period (0-1)")
+
+
+class RetentionMatrix(BaseModel):
+    """Cohort retention matrix (daily or weekly cohorts)"""
+    granularity: str = Field(description="day or week")
+    periods: List[int]
+    cohorts: List[RetentionCohort]
+
+
 # Cost estimation constants (OpenAI Realtime API pricing)
 COST_PER_MILLION_INPUT_TOKENS = Decimal('32.00')  # $32 per million audio input tokens
 COST_PER_MILLION_OUTPUT_TOKENS = Decimal('64.00')  # $64 per million audio output tokens
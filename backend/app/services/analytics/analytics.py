@@ -1,11 +1,21 @@
 import asyncio
 import time
 import json
-from datetime import datetime, timedelta
+import uuid
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, List, Optional, Union
 from enum import Enum
 from dataclasses import dataclass, asdict
 from app.core.database import get_supabase_client
+from app.services.analytics.pipeline import (
+    ALL_EVENTS,
+    HOURLY_RPC,
+    SUMMARY_RPC,
+    bucket_floor,
+    choose_resolution,
+    get_analytics_pipeline,
+    summarize_rollups,
+)
 try:
     from app.core.logging import setup_logging, get_logger  # type: ignore
 except Exception:  # pragma: no cover - fallback without optional deps
@@ -82,12 +92,12 @@ class PamAnalytics:
         self.start_times: Dict[str, float] = {}  # Track operation start times
         
     async def track_event(self, event: AnalyticsEvent) -> bool:
-        """Store analytics event in database"""
+        """Queue analytics event for the batched writer (see analytics.pipeline)"""
         try:
             # Convert event to database format
             event_data = {
                 "event_type": event.event_type.value,
-                "user_id": event.user_id,
+                "user_id": _uuid_or_none(event.user_id),
                 "timestamp": event.timestamp.isoformat(),
                 "session_id": event.session_id,
                 "response_time_ms": event.response_time_ms,
@@ -96,19 +106,18 @@ class PamAnalytics:
                 "event_data": event.event_data,
                 "metadata": event.metadata or {}
             }
-            
-            # Insert into analytics table
-            result = self.supabase.table("pam_analytics_logs").insert(event_data).execute()
-            
-            if result.data:
-                logger.info(f"✅ Analytics event stored: {event.event_type.value} for user {event.user_id}")
+            if event_data["user_id"] is None and event.user_id:
+                # Non-UUID actors such as "system" would fail the whole batch insert
+                event_data["metadata"] = {**event_data["metadata"], "user_ref": str(event.user_id)}
+
+            if get_analytics_pipeline().submit(event_data):
+                logger.debug(f"Analytics event queued: {event.event_type.value} for user {event.user_id}")
                 return True
-            else:
-                logger.warning(f"⚠️ No data returned from analytics insert for user {event.user_id}")
-                return False
-            
+            logger.warning(f"⚠️ Analytics queue full, dropped {event.event_type.value} for user {event.user_id}")
+            return False
+
         except Exception as e:
-            logger.error(f"❌ Error storing analytics event in database: {str(e)}")
+            logger.error(f"❌ Error queueing analytics event: {str(e)}")
             # Fall back to logging for now
             logger.info(f"📊 Analytics event (fallback): {event.event_type.value} for user {event.user_id}")
             return False
@@ -317,6 +326,19 @@ class PamAnalytics:
             logger.error(f"Error tracking error event: {str(e)}")
     
     # Analytics query methods
+    # Aggregate dashboards read pam_analytics_rollups through the summary RPCs,
+    # so their cost depends on the window's bucket count, not on event volume.
+    def _rollup_summaries(self, resolution: str, start: Optional[datetime], end: datetime,
+                          event_types: Optional[List[str]] = None, include_dimensions: bool = True):
+        result = self.supabase.rpc(SUMMARY_RPC, {
+            "p_resolution": resolution,
+            "p_start": bucket_floor(start, resolution).isoformat() if start else None,
+            "p_end": _utc(end).isoformat(),
+            "p_event_types": event_types,
+            "p_include_dimensions": include_dimensions,
+        }).execute()
+        return summarize_rollups(result.data or [])
+
     async def get_usage_metrics(self, user_id: str = None, 
                               start_date: datetime = None,
                               end_date: datetime = None) -> Dict[str, Any]:
@@ -327,98 +349,127 @@ class PamAnalytics:
                 start_date = datetime.now() - timedelta(days=30)
             if not end_date:
                 end_date = datetime.now()
-            
-            query = self.supabase.table("pam_analytics_logs")\
-                .select("*")\
-                .gte("timestamp", start_date.isoformat())\
-                .lte("timestamp", end_date.isoformat())
-            
+
             if user_id:
-                query = query.eq("user_id", user_id)
-            
-            result = query.execute()
-            events = result.data
-            
-            # Calculate metrics
+                return self._user_usage_metrics(user_id, start_date, end_date)
+
+            resolution = choose_resolution(start_date, end_date)
+            summaries = self._rollup_summaries(resolution, start_date, end_date, include_dimensions=False)
+            totals = summaries.get((ALL_EVENTS, ""))
+
             metrics = {
-                "total_events": len(events),
-                "unique_users": len(set(e["user_id"] for e in events)),
-                "event_types": {},
-                "average_response_time": 0,
-                "success_rate": 0,
+                "total_events": totals.events if totals else 0,
+                "unique_users": 0,
+                "event_types": {
+                    event_type: summary.events
+                    for (event_type, _), summary in summaries.items()
+                    if event_type != ALL_EVENTS
+                },
+                "average_response_time": totals.average_latency if totals else 0,
+                "success_rate": (totals.successes / totals.events) * 100 if totals and totals.events else 0,
                 "most_used_features": {},
                 "peak_usage_hours": {},
                 "error_rate_by_type": {}
             }
-            
-            # Calculate event type distribution
-            for event in events:
-                event_type = event.get("event_type", "unknown")
-                metrics["event_types"][event_type] = metrics["event_types"].get(event_type, 0) + 1
-            
-            # Calculate response times
-            response_times = [e["response_time_ms"] for e in events if e.get("response_time_ms")]
-            if response_times:
-                metrics["average_response_time"] = sum(response_times) / len(response_times)
-            
-            # Calculate success rate
-            success_events = sum(1 for e in events if e.get("success", True))
-            metrics["success_rate"] = (success_events / len(events)) * 100 if events else 0
-            
-            # Calculate peak usage hours
-            for event in events:
-                try:
-                    hour = datetime.fromisoformat(event["timestamp"]).hour
-                    metrics["peak_usage_hours"][hour] = metrics["peak_usage_hours"].get(hour, 0) + 1
-                except:
-                    continue
-            
+
+            # Unique users are only sketched on hourly and daily rollups
+            users = totals.users if totals else None
+            if resolution == "1m":
+                hourly = self._rollup_summaries("1h", start_date, end_date, [ALL_EVENTS], include_dimensions=False)
+                users = hourly[(ALL_EVENTS, "")].users if (ALL_EVENTS, "") in hourly else None
+            metrics["unique_users"] = users.estimate() if users else 0
+
+            hours = self.supabase.rpc(HOURLY_RPC, {
+                "p_start": bucket_floor(start_date, "1h").isoformat(),
+                "p_end": _utc(end_date).isoformat(),
+            }).execute()
+            for row in hours.data or []:
+                metrics["peak_usage_hours"][int(row["hour"])] = int(row["event_count"])
+
             return metrics
             
         except Exception as e:
             logger.error(f"Error getting usage metrics: {str(e)}")
             return {}
+
+    def _user_usage_metrics(self, user_id: str, start_date: datetime, end_date: datetime) -> Dict[str, Any]:
+        """Per-user metrics come from the raw log (bounded by that user's volume)"""
+        result = self.supabase.table("pam_analytics_logs")\
+            .select("event_type,timestamp,response_time_ms,success")\
+            .eq("user_id", user_id)\
+            .gte("timestamp", start_date.isoformat())\
+            .lte("timestamp", end_date.isoformat())\
+            .execute()
+        events = result.data
+
+        metrics = {
+            "total_events": len(events),
+            "unique_users": 1 if events else 0,
+            "event_types": {},
+            "average_response_time": 0,
+            "success_rate": 0,
+            "most_used_features": {},
+            "peak_usage_hours": {},
+            "error_rate_by_type": {}
+        }
+
+        for event in events:
+            event_type = event.get("event_type", "unknown")
+            metrics["event_types"][event_type] = metrics["event_types"].get(event_type, 0) + 1
+
+        response_times = [e["response_time_ms"] for e in events if e.get("response_time_ms")]
+        if response_times:
+            metrics["average_response_time"] = sum(response_times) / len(response_times)
+
+        success_events = sum(1 for e in events if e.get("success", True))
+        metrics["success_rate"] = (success_events / len(events)) * 100 if events else 0
+
+        for event in events:
+            try:
+                hour = datetime.fromisoformat(event["timestamp"]).hour
+                metrics["peak_usage_hours"][hour] = metrics["peak_usage_hours"].get(hour, 0) + 1
+            except:
+                continue
+
+        return metrics
     
     async def get_feature_adoption_metrics(self, feature_category: str = None) -> Dict[str, Any]:
         """Get feature adoption and usage statistics"""
         try:
-            query = self.supabase.table("pam_analytics_logs")\
-                .select("*")\
-                .eq("event_type", EventType.FEATURE_USAGE.value)
-            
-            result = query.execute()
-            events = result.data
-            
+            summaries = self._rollup_summaries(
+                "1d", None, datetime.now(timezone.utc), [EventType.FEATURE_USAGE.value]
+            )
+            total = summaries.get((EventType.FEATURE_USAGE.value, ""))
+
             adoption_metrics = {
-                "total_feature_uses": len(events),
+                "total_feature_uses": total.events if total else 0,
                 "features_by_category": {},
                 "feature_popularity": {},
                 "user_adoption_rate": {},
                 "feature_success_rate": {}
             }
-            
-            for event in events:
-                event_data = event.get("event_data", {})
-                feature_name = event_data.get("feature_name", "unknown")
-                category = event_data.get("feature_category", "unknown")
-                
-                if not feature_category or category == feature_category:
-                    # Track by category
-                    if category not in adoption_metrics["features_by_category"]:
-                        adoption_metrics["features_by_category"][category] = {}
-                    adoption_metrics["features_by_category"][category][feature_name] = \
-                        adoption_metrics["features_by_category"][category].get(feature_name, 0) + 1
-                    
-                    # Track popularity
-                    adoption_metrics["feature_popularity"][feature_name] = \
-                        adoption_metrics["feature_popularity"].get(feature_name, 0) + 1
-                    
-                    # Track success rate
-                    if feature_name not in adoption_metrics["feature_success_rate"]:
-                        adoption_metrics["feature_success_rate"][feature_name] = {"total": 0, "success": 0}
-                    adoption_metrics["feature_success_rate"][feature_name]["total"] += 1
-                    if event.get("success", True):
-                        adoption_metrics["feature_success_rate"][feature_name]["success"] += 1
+
+            features = []
+            for (_, dimension), summary in summaries.items():
+                if dimension:
+                    category, _, feature_name = dimension.partition(":")
+                    features.append((category, feature_name, summary.events, summary.successes))
+            # Events without a feature name/category (e.g. metric updates) are only in the total
+            unattributed_events = (total.events if total else 0) - sum(f[2] for f in features)
+            if unattributed_events > 0:
+                unattributed_successes = (total.successes if total else 0) - sum(f[3] for f in features)
+                features.append(("unknown", "unknown", unattributed_events, unattributed_successes))
+
+            for category, feature_name, uses, successes in features:
+                if feature_category and category != feature_category:
+                    continue
+                by_category = adoption_metrics["features_by_category"].setdefault(category, {})
+                by_category[feature_name] = by_category.get(feature_name, 0) + uses
+                adoption_metrics["feature_popularity"][feature_name] = \
+                    adoption_metrics["feature_popularity"].get(feature_name, 0) + uses
+                stats = adoption_metrics["feature_success_rate"].setdefault(feature_name, {"total": 0, "success": 0})
+                stats["total"] += uses
+                stats["success"] += successes
             
             # Calculate success percentages
             for feature, stats in adoption_metrics["feature_success_rate"].items():
@@ -434,15 +485,14 @@ class PamAnalytics:
     async def get_performance_metrics(self) -> Dict[str, Any]:
         """Get system performance metrics"""
         try:
-            # Get events from last 24 hours
-            start_time = datetime.now() - timedelta(hours=24)
-            
-            result = self.supabase.table("pam_analytics_logs")\
-                .select("*")\
-                .gte("timestamp", start_time.isoformat())\
-                .execute()
-            
-            events = result.data
+            # Last 24 hours from hourly rollups
+            end_time = datetime.now(timezone.utc)
+            start_time = end_time - timedelta(hours=24)
+            summaries = self._rollup_summaries(
+                "1h", start_time, end_time,
+                [ALL_EVENTS, EventType.NODE_EXECUTION.value, EventType.API_CALL.value],
+            )
+            totals = summaries.get((ALL_EVENTS, ""))
             
             performance_metrics = {
                 "average_response_time": 0,
@@ -453,44 +503,33 @@ class PamAnalytics:
                 "node_performance": {},
                 "api_performance": {}
             }
-            
-            # Calculate response time metrics
-            response_times = [e["response_time_ms"] for e in events if e.get("response_time_ms")]
-            if response_times:
-                response_times.sort()
-                performance_metrics["average_response_time"] = sum(response_times) / len(response_times)
-                performance_metrics["p95_response_time"] = response_times[int(len(response_times) * 0.95)]
-                performance_metrics["p99_response_time"] = response_times[int(len(response_times) * 0.99)]
-            
-            # Calculate error rate
-            error_events = sum(1 for e in events if not e.get("success", True))
-            performance_metrics["error_rate"] = (error_events / len(events)) * 100 if events else 0
-            
-            # Calculate throughput
-            performance_metrics["throughput_per_hour"] = len(events) / 24
-            
-            # Node performance breakdown
-            node_events = [e for e in events if e.get("event_type") == EventType.NODE_EXECUTION.value]
-            for event in node_events:
-                event_data = event.get("event_data", {})
-                node_name = event_data.get("node_name", "unknown")
-                response_time = event.get("response_time_ms", 0)
-                
-                if node_name not in performance_metrics["node_performance"]:
-                    performance_metrics["node_performance"][node_name] = {
-                        "calls": 0, "total_time": 0, "errors": 0
-                    }
-                
-                performance_metrics["node_performance"][node_name]["calls"] += 1
-                performance_metrics["node_performance"][node_name]["total_time"] += response_time
-                if not event.get("success", True):
-                    performance_metrics["node_performance"][node_name]["errors"] += 1
-            
-            # Calculate average times for nodes
-            for node, stats in performance_metrics["node_performance"].items():
-                if stats["calls"] > 0:
-                    stats["average_time"] = stats["total_time"] / stats["calls"]
-                    stats["error_rate"] = (stats["errors"] / stats["calls"]) * 100
+            if not totals:
+                return performance_metrics
+
+            # Percentiles come from the merged latency sketch (~2% relative error)
+            performance_metrics["average_response_time"] = totals.average_latency
+            performance_metrics["p95_response_time"] = totals.quantile(0.95)
+            performance_metrics["p99_response_time"] = totals.quantile(0.99)
+            performance_metrics["error_rate"] = (totals.errors / totals.events) * 100 if totals.events else 0
+            performance_metrics["throughput_per_hour"] = totals.events / 24
+
+            for (event_type, dimension), summary in summaries.items():
+                if not dimension:
+                    continue
+                if event_type == EventType.NODE_EXECUTION.value:
+                    target = performance_metrics["node_performance"]
+                elif event_type == EventType.API_CALL.value:
+                    target = performance_metrics["api_performance"]
+                else:
+                    continue
+                target[dimension] = {
+                    "calls": summary.events,
+                    "total_time": summary.latency_sum,
+                    "errors": summary.errors,
+                    "average_time": summary.latency_sum / summary.events if summary.events else 0,
+                    "error_rate": (summary.errors / summary.events) * 100 if summary.events else 0,
+                    "p95_time": summary.quantile(0.95),
+                }
             
             return performance_metrics
             
@@ -560,6 +599,17 @@ class PamAnalytics:
         except Exception as e:
             logger.error(f"Error updating metric {metric_name}: {str(e)}")
 
+def _uuid_or_none(value: Any) -> Optional[str]:
+    try:
+        return str(uuid.UUID(str(value)))
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def _utc(moment: datetime) -> datetime:
+    # Event timestamps are naive server time (UTC in deployment)
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
 # Context managers for automatic tracking
 class PerformanceTracker:
     """Context manager for tracking operation performance"""
@@ -0,0 +1,444 @@
+"""
+Buffered analytics ingestion and rollups.
+
+track_event used to insert one pam_analytics_logs row per event on the
+request path. Events now go into a bounded in-process queue and are written
+by a background flusher as one multi-row insert per batch (by size or time).
+
+At submit time each event also updates in-memory rollup accumulators for
+1m / 1h / 1d buckets, keyed by event type and an optional dimension (node,
+API, feature, intent or error type). Every flush sends the accumulated
+deltas to merge_pam_analytics_rollups, which adds counts and merges the
+latency sketches and unique-user HyperLogLogs server side, so any number of
+workers can flush the same bucket.
+
+Dashboards read the rollups: the rows scanned depend on the window and
+resolution, not on how many raw events were logged.
+"""
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services.analytics.sketches import HyperLogLog, LatencySketch
+
+logger = logging.getLogger(__name__)
+
+EVENTS_TABLE = "pam_analytics_logs"
+ROLLUPS_TABLE = "pam_analytics_rollups"
+MERGE_RPC = "merge_pam_analytics_rollups"
+SUMMARY_RPC = "pam_analytics_rollup_summary"
+HOURLY_RPC = "pam_analytics_hourly_counts"
+
+DEFAULT_MAX_QUEUE = 50_000
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_SECONDS = 2.0
+# Consecutive failed writes of the same events before they are dropped
+MAX_WRITE_ATTEMPTS = 3
+
+RESOLUTIONS = {"1m": 60, "1h": 3600, "1d": 86400}
+ALL_EVENTS = "*"
+# Unique users are tracked on the all-events row at these resolutions only
+HLL_RESOLUTIONS = ("1h", "1d")
+
+# event_data field used as the rollup dimension for each event type
+DIMENSION_FIELDS = {
+    "node_execution": ("node_name",),
+    "api_call": ("api_name",),
+    "feature_usage": ("feature_category", "feature_name"),
+    "intent_detected": ("intent",),
+    "error_occurred": ("error_type",),
+}
+
+RollupKey = Tuple[str, int, str, str]  # (resolution, bucket epoch, event_type, dimension)
+
+
+def event_dimension(event_type: str, event_data: Optional[Dict[str, Any]]) -> str:
+    fields = DIMENSION_FIELDS.get(event_type)
+    if not fields or not event_data:
+        return ""
+    values = [event_data.get(f) for f in fields]
+    if any(v is None for v in values):
+        return ""
+    return ":".join(str(v) for v in values)
+
+
+def _epoch(value: Any) -> float:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    if isinstance(value, str):
+        return _epoch(datetime.fromisoformat(value.replace("Z", "+00:00")))
+    return float(value)
+
+
+class RollupAccumulator:
+    """Counts, latency sketch and (optionally) unique users for one rollup key"""
+
+    __slots__ = ("events", "successes", "errors", "latency_count", "latency_sum", "sketch", "users")
+
+    def __init__(self, track_users: bool = False):
+        self.events = 0
+        self.successes = 0
+        self.errors = 0
+        self.latency_count = 0
+        self.latency_sum = 0
+        self.sketch = LatencySketch()
+        self.users = HyperLogLog() if track_users else None
+
+    def add(self, success: bool, latency: Optional[Tuple[int, int]], user_slot: Optional[Tuple[int, int]]) -> None:
+        """latency is (sketch bucket, ms); user_slot is HyperLogLog.slot_of(user_id)"""
+        self.events += 1
+        if success:
+            self.successes += 1
+        else:
+            self.errors += 1
+        if latency is not None:
+            self.latency_count += 1
+            self.latency_sum += latency[1]
+            self.sketch.add_bucket(*latency)
+        if self.users is not None and user_slot is not None:
+            self.users.add_slot(*user_slot)
+
+    def to_row(self, key: RollupKey) -> Dict[str, Any]:
+        resolution, bucket, event_type, dimension = key
+        return {
+            "resolution": resolution,
+            "bucket_start": datetime.fromtimestamp(bucket, tz=timezone.utc).isoformat(),
+            "event_type": event_type,
+            "dimension": dimension,
+            "event_count": self.events,
+            "success_count": self.successes,
+            "error_count": self.errors,
+            "latency_count": self.latency_count,
+            "latency_sum": self.latency_sum,
+            "latency_sketch": self.sketch.to_json(),
+            "users_hll": self.users.to_json() if self.users is not None else None,
+        }
+
+
+class SupabaseAnalyticsSink:
+    """Multi-row insert and rollup merge RPC through the Supabase client"""
+
+    def __init__(self, supabase):
+        self.supabase = supabase
+
+    async def write_events(self, rows: List[Dict[str, Any]]) -> None:
+        from postgrest.types import ReturnMethod
+
+        await asyncio.to_thread(
+            lambda: self.supabase.table(EVENTS_TABLE).insert(rows, returning=ReturnMethod.minimal).execute()
+        )
+
+    async def merge_rollups(self, rows: List[Dict[str, Any]]) -> None:
+        await asyncio.to_thread(lambda: self.supabase.rpc(MERGE_RPC, {"p_rows": rows}).execute())
+
+
+class AsyncpgAnalyticsSink:
+    """COPY for raw events and the same merge function, over asyncpg (benchmarks, bulk backfills)"""
+
+    EVENT_COLUMNS = ("event_type", "user_id", "timestamp", "session_id", "response_time_ms",
+                     "success", "error_message", "event_data", "metadata")
+
+    def __init__(self, pool, schema: str = "public", events_table: str = EVENTS_TABLE, merge_function: str = MERGE_RPC):
+        self.pool = pool
+        self.schema = schema
+        self.events_table = events_table
+        self.merge_function = merge_function
+
+    async def write_events(self, rows: List[Dict[str, Any]]) -> None:
+        records = [
+            (
+                row["event_type"], row["user_id"], datetime.fromtimestamp(_epoch(row["timestamp"]), tz=timezone.utc),
+                row.get("session_id"), row.get("response_time_ms"), row.get("success", True),
+                row.get("error_message"), json.dumps(row.get("event_data") or {}),
+                json.dumps(row.get("metadata") or {}),
+            )
+            for row in rows
+        ]
+        async with self.pool.acquire() as conn:
+            await conn.copy_records_to_table(
+                self.events_table, records=records, columns=list(self.EVENT_COLUMNS), schema_name=self.schema
+            )
+
+    async def merge_rollups(self, rows: List[Dict[str, Any]]) -> None:
+        async with self.pool.acquire() as conn:
+            await conn.execute(f"SELECT {self.schema}.{self.merge_function}($1::jsonb)", json.dumps(rows))
+
+
+@dataclass
+class PipelineStats:
+    submitted: int = 0
+    written: int = 0
+    dropped: int = 0
+    flushes: int = 0
+    failed_flushes: int = 0
+    rollup_rows: int = 0
+
+
+class AnalyticsPipeline:
+    """Bounded event queue with batched writes and in-memory rollup deltas"""
+
+    def __init__(
+        self,
+        sink=None,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_seconds: float = DEFAULT_FLUSH_SECONDS,
+    ):
+        self.sink = sink
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.stats = PipelineStats()
+        self._queue: List[Dict[str, Any]] = []
+        self._write_failures = 0
+        self._rollups: Dict[RollupKey, RollupAccumulator] = {}
+        self._flush_event: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+
+    def submit(self, row: Dict[str, Any]) -> bool:
+        """Queue one pam_analytics_logs row. Returns False if it was shed."""
+        self.stats.submitted += 1
+        if len(self._queue) >= self.max_queue:
+            # Analytics is best-effort: shed new events rather than grow without bound
+            self.stats.dropped += 1
+            return False
+
+        self._queue.append(row)
+        self._accumulate(row)
+        self._ensure_started()
+        if len(self._queue) >= self.batch_size and self._flush_event is not None:
+            self._flush_event.set()
+        return True
+
+    def _accumulate(self, row: Dict[str, Any]) -> None:
+        ts = _epoch(row["timestamp"])
+        event_type = row["event_type"]
+        dimension = event_dimension(event_type, row.get("event_data"))
+        success = row.get("success", True) is not False
+        response_time_ms = row.get("response_time_ms")
+        latency = None
+        if response_time_ms is not None:
+            latency = (LatencySketch.bucket_of(response_time_ms), int(response_time_ms))
+        user_id = row.get("user_id")
+        user_slot = HyperLogLog.slot_of(str(user_id)) if user_id else None
+
+        for resolution, seconds in RESOLUTIONS.items():
+            bucket = int(ts - ts % seconds)
+            keys = [(resolution, bucket, ALL_EVENTS, ""), (resolution, bucket, event_type, "")]
+            if dimension:
+                keys.append((resolution, bucket, event_type, dimension))
+            for key in keys:
+                acc = self._rollups.get(key)
+                if acc is None:
+                    track_users = key[2] == ALL_EVENTS and resolution in HLL_RESOLUTIONS
+                    acc = self._rollups[key] = RollupAccumulator(track_users)
+                acc.add(success, latency, user_slot)
+
+    def _ensure_started(self) -> None:
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No loop (sync caller); events wait for the next flush()
+        self._flush_event = asyncio.Event()
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        self._task = loop.create_task(self._flush_loop())
+
+    async def flush(self) -> int:
+        """Write queued events in batches and merge rollup deltas; returns events written"""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            events, self._queue = self._queue, []
+            rollups, self._rollups = self._rollups, {}
+            if not events and not rollups:
+                return 0
+            if self.sink is None:
+                self.stats.written += len(events)
+                return len(events)
+
+            written = 0
+            failed = False
+            try:
+                for start in range(0, len(events), self.batch_size):
+                    await self.sink.write_events(events[start:start + self.batch_size])
+                    written += min(self.batch_size, len(events) - start)
+            except Exception as e:
+                failed = True
+                self._write_failures += 1
+                unwritten = events[written:]
+                if self._write_failures >= MAX_WRITE_ATTEMPTS:
+                    # Don't let one bad batch wedge the queue forever
+                    self.stats.dropped += len(unwritten)
+                    self._write_failures = 0
+                    logger.error(f"Analytics dropping {len(unwritten)} events after {MAX_WRITE_ATTEMPTS} failed writes: {e}")
+                else:
+                    self._requeue(unwritten)
+                    logger.error(f"Analytics event write failed after {written}/{len(events)} events: {e}")
+            else:
+                self._write_failures = 0
+
+            rows = [acc.to_row(key) for key, acc in rollups.items()]
+            try:
+                if rows:
+                    await self.sink.merge_rollups(rows)
+                    self.stats.rollup_rows += len(rows)
+            except Exception as e:
+                failed = True
+                # Deltas are additive, so fold them back in and merge them with the next flush
+                for key, acc in rollups.items():
+                    self._restore_accumulator(key, acc)
+                logger.error(f"Analytics rollup merge failed for {len(rows)} rows: {e}")
+
+            self.stats.written += written
+            if failed:
+                self.stats.failed_flushes += 1
+            else:
+                self.stats.flushes += 1
+            return written
+
+    def _requeue(self, events: List[Dict[str, Any]]) -> None:
+        """Put unwritten events back in front of newer ones, shedding the oldest past the bound"""
+        combined = events + self._queue
+        overflow = len(combined) - self.max_queue
+        if overflow > 0:
+            self.stats.dropped += overflow
+            combined = combined[overflow:]
+        self._queue = combined
+
+    def _restore_accumulator(self, key: RollupKey, acc: RollupAccumulator) -> None:
+        current = self._rollups.get(key)
+        if current is None:
+            self._rollups[key] = acc
+            return
+        current.events += acc.events
+        current.successes += acc.successes
+        current.errors += acc.errors
+        current.latency_count += acc.latency_count
+        current.latency_sum += acc.latency_sum
+        current.sketch.merge(acc.sketch)
+        if current.users is not None and acc.users is not None:
+            current.users.merge(acc.users)
+
+    async def _flush_loop(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._flush_event.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_event.clear()
+            if self._stopping:
+                break
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Analytics flush loop error: {e}")
+
+    def start(self) -> None:
+        """Start the background flusher (otherwise it starts on the first submit)"""
+        self._ensure_started()
+
+    async def stop(self) -> None:
+        """Stop the flusher and write whatever is still queued"""
+        if self._task is not None:
+            # Wake the loop and let it exit rather than cancelling it mid-flush
+            self._stopping = True
+            self._flush_event.set()
+            await self._task
+            self._task = None
+            self._stopping = False
+        await self.flush()
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+
+_pipeline: Optional[AnalyticsPipeline] = None
+
+
+def get_analytics_pipeline() -> AnalyticsPipeline:
+    """Process-wide pipeline shared by every PamAnalytics instance"""
+    global _pipeline
+    if _pipeline is None:
+        from app.core.config import settings
+        from app.core.database import get_supabase_client
+
+        _pipeline = AnalyticsPipeline(
+            sink=SupabaseAnalyticsSink(get_supabase_client()),
+            max_queue=int(getattr(settings, "ANALYTICS_MAX_QUEUE", DEFAULT_MAX_QUEUE)),
+            batch_size=int(getattr(settings, "ANALYTICS_BATCH_SIZE", DEFAULT_BATCH_SIZE)),
+            flush_seconds=float(getattr(settings, "ANALYTICS_FLUSH_SECONDS", DEFAULT_FLUSH_SECONDS)),
+        )
+    return _pipeline
+
+
+def choose_resolution(start: datetime, end: datetime) -> str:
+    """Coarsest resolution that still resolves the window reasonably"""
+    span = end - start
+    if span <= timedelta(hours=6):
+        return "1m"
+    if span <= timedelta(days=2):
+        return "1h"
+    return "1d"
+
+
+def bucket_floor(moment: datetime, resolution: str) -> datetime:
+    """Start of the bucket containing moment (windows are widened to whole buckets)"""
+    seconds = RESOLUTIONS[resolution]
+    ts = _epoch(moment)
+    return datetime.fromtimestamp(ts - ts % seconds, tz=timezone.utc)
+
+
+@dataclass
+class RollupSummary:
+    """Merged view over a set of rollup rows for one (event_type, dimension)"""
+    events: int = 0
+    successes: int = 0
+    errors: int = 0
+    latency_count: int = 0
+    latency_sum: int = 0
+    sketch: Optional[LatencySketch] = None
+    users: Optional[HyperLogLog] = None
+
+    @property
+    def average_latency(self) -> float:
+        return self.latency_sum / self.latency_count if self.latency_count else 0
+
+    def quantile(self, q: float) -> float:
+        value = self.sketch.quantile(q) if self.sketch else None
+        return round(value, 1) if value is not None else 0
+
+
+def summarize_rollups(rows: List[Dict[str, Any]]) -> Dict[Tuple[str, str], RollupSummary]:
+    """Merge rollup rows by (event_type, dimension)"""
+    summaries: Dict[Tuple[str, str], RollupSummary] = {}
+    for row in rows:
+        key = (row["event_type"], row.get("dimension") or "")
+        summary = summaries.get(key)
+        if summary is None:
+            summary = summaries[key] = RollupSummary(sketch=LatencySketch())
+        summary.events += int(row.get("event_count") or 0)
+        summary.successes += int(row.get("success_count") or 0)
+        summary.errors += int(row.get("error_count") or 0)
+        summary.latency_count += int(row.get("latency_count") or 0)
+        summary.latency_sum += int(row.get("latency_sum") or 0)
+        sketch = row.get("latency_sketch")
+        if sketch:
+            if isinstance(sketch, str):
+                sketch = json.loads(sketch)
+            summary.sketch.merge(LatencySketch.from_json(sketch))
+        hll = HyperLogLog.from_json(row.get("users_hll"))
+        if hll is not None:
+            summary.users = hll if summary.users is None else summary.users.merge(hll)
+    return summaries
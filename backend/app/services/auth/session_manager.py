@@ -1,11 +1,17 @@
 """
 Secure Session Management Service
 Implements Redis-based server-side session tracking with JWT ID management
+
+Expiry is indexed in one sorted set (session_expiry, scored by expires_at), so
+cleanup sweeps the due head of the index in small server-side batches instead
+of walking every user's sessions with KEYS.
 """
 
 import os
 import json
 import uuid
+import time
+import asyncio
 import redis.asyncio as redis
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Dict, Any, List
@@ -14,6 +20,32 @@ from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Removes up to ARGV[2] sessions whose expiry score is <= ARGV[1] from the
+# expiry index, their session keys and their user_sessions sets. Members are
+# "<session_id>:<user_id>"; key names are built from ARGV, so this expects a
+# single (non-cluster) Redis like the rest of this module.
+SWEEP_EXPIRED_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+if #due == 0 then
+  return 0
+end
+for _, member in ipairs(due) do
+  local sep = string.find(member, ':', 1, true)
+  if sep then
+    local session_id = string.sub(member, 1, sep - 1)
+    local user_key = ARGV[4] .. string.sub(member, sep + 1)
+    redis.call('DEL', ARGV[3] .. session_id)
+    redis.call('ZREM', user_key, session_id)
+    if redis.call('ZCARD', user_key) == 0 then
+      redis.call('DEL', user_key)
+    end
+  end
+end
+redis.call('ZREM', KEYS[1], unpack(due))
+return #due
+"""
+
+
 @dataclass
 class SessionInfo:
     """Session information stored in Redis"""
@@ -60,12 +92,19 @@ class SecureSessionManager:
         self.max_sessions_per_user = int(os.getenv('MAX_SESSIONS_PER_USER', '3'))
         self.session_timeout = timedelta(hours=int(os.getenv('SESSION_TIMEOUT_HOURS', '24')))
         self.cleanup_interval = timedelta(hours=1)
+        self.sweep_interval = float(os.getenv('SESSION_SWEEP_INTERVAL_SECONDS', '60'))
+        self.sweep_batch_size = int(os.getenv('SESSION_SWEEP_BATCH_SIZE', '100'))
 
         # Redis key prefixes
         self.session_prefix = "session:"
         self.user_sessions_prefix = "user_sessions:"
         self.blacklist_prefix = "blacklist_jti:"
         self.cleanup_key = "session_cleanup:last_run"
+        self.expiry_key = "session_expiry"
+        self.expiry_backfill_key = "session_expiry:backfilled"
+
+        self._sweep_script = None
+        self._sweeper_task: Optional[asyncio.Task] = None
 
     async def initialize(self) -> bool:
         """Initialize Redis connection"""
@@ -79,9 +118,11 @@ class SecureSessionManager:
             # Test connection
             await self.redis_client.ping()
             logger.info("✅ Session manager Redis connection established")
+            self._sweep_script = self.redis_client.register_script(SWEEP_EXPIRED_SCRIPT)
 
             # Schedule cleanup if needed
             await self._schedule_cleanup_if_needed()
+            self._start_sweeper()
 
             return True
 
@@ -117,23 +158,21 @@ class SecureSessionManager:
             expires_at=expires_at
         )
 
-        # Store session
-        session_key = f"{self.session_prefix}{session_id}"
-        await self.redis_client.setex(
-            session_key,
-            int(self.session_timeout.total_seconds()),
-            json.dumps(session_info.to_dict())
-        )
-
-        # Track session for user
+        # Store session, track it for the user and index its expiry in one round trip
         user_sessions_key = f"{self.user_sessions_prefix}{user_id}"
-        await self.redis_client.zadd(
-            user_sessions_key,
-            {session_id: now.timestamp()}
-        )
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.setex(
+                f"{self.session_prefix}{session_id}",
+                int(self.session_timeout.total_seconds()),
+                json.dumps(session_info.to_dict())
+            )
+            pipe.zadd(user_sessions_key, {session_id: now.timestamp()})
+            pipe.zadd(self.expiry_key, {self._expiry_member(session_id, user_id): expires_at.timestamp()})
+            pipe.zcard(user_sessions_key)
+            *_, session_count = await pipe.execute()
 
         # Enforce session limit
-        await self._enforce_session_limit(user_id)
+        await self._enforce_session_limit(user_id, session_count)
 
         logger.info(f"✅ Session created for user {user_id}: {session_id}")
         return session_info
@@ -145,7 +184,10 @@ class SecureSessionManager:
 
         session_key = f"{self.session_prefix}{session_id}"
         session_data = await self.redis_client.get(session_key)
+        return self._parse_session(session_id, session_data)
 
+    @staticmethod
+    def _parse_session(session_id: str, session_data: Optional[str]) -> Optional[SessionInfo]:
         if not session_data:
             return None
 
@@ -155,6 +197,11 @@ class SecureSessionManager:
             logger.warning(f"Invalid session data for {session_id}: {e}")
             return None
 
+    @staticmethod
+    def _expiry_member(session_id: str, user_id: str) -> str:
+        """Expiry index member; carries the user so the sweep can clean user_sessions"""
+        return f"{session_id}:{user_id}"
+
     async def update_session_activity(self, session_id: str) -> bool:
         """Update last activity timestamp for session"""
         if not self.redis_client:
@@ -164,14 +211,21 @@ class SecureSessionManager:
         if not session_info:
             return False
 
+        # Activity slides the expiry window; keep the index in step with the key TTL
         session_info.last_activity = datetime.now(timezone.utc)
+        session_info.expires_at = session_info.last_activity + self.session_timeout
 
-        session_key = f"{self.session_prefix}{session_id}"
-        await self.redis_client.setex(
-            session_key,
-            int(self.session_timeout.total_seconds()),
-            json.dumps(session_info.to_dict())
-        )
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.setex(
+                f"{self.session_prefix}{session_id}",
+                int(self.session_timeout.total_seconds()),
+                json.dumps(session_info.to_dict())
+            )
+            pipe.zadd(
+                self.expiry_key,
+                {self._expiry_member(session_id, session_info.user_id): session_info.expires_at.timestamp()}
+            )
+            await pipe.execute()
 
         return True
 
@@ -180,23 +234,48 @@ class SecureSessionManager:
         if not self.redis_client:
             return False
 
-        session_info = await self.get_session(session_id)
-        if not session_info:
+        if not await self.invalidate_sessions([session_id]):
             return False
 
-        # Remove session
-        session_key = f"{self.session_prefix}{session_id}"
-        await self.redis_client.delete(session_key)
+        logger.info(f"🔒 Session invalidated: {session_id}")
+        return True
 
-        # Remove from user sessions
-        user_sessions_key = f"{self.user_sessions_prefix}{session_info.user_id}"
-        await self.redis_client.zrem(user_sessions_key, session_id)
+    async def invalidate_sessions(self, session_ids: List[str]) -> int:
+        """
+        Invalidate a batch of sessions and blacklist their JWTs
 
-        # Blacklist the JWT
-        await self.blacklist_jwt(session_info.jti)
+        One MGET to load the sessions and one pipeline for every delete and
+        blacklist entry, however many sessions are passed.
 
-        logger.info(f"🔒 Session invalidated: {session_id}")
-        return True
+        Returns:
+            Number of sessions that existed and were invalidated
+        """
+        if not self.redis_client or not session_ids:
+            return 0
+
+        session_keys = [f"{self.session_prefix}{session_id}" for session_id in session_ids]
+        sessions = [
+            session_info
+            for session_info in (
+                self._parse_session(session_id, session_data)
+                for session_id, session_data in zip(session_ids, await self.redis_client.mget(session_keys))
+            )
+            if session_info
+        ]
+        if not sessions:
+            return 0
+
+        async with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.delete(*(f"{self.session_prefix}{s.session_id}" for s in sessions))
+            for session_info in sessions:
+                pipe.zrem(f"{self.user_sessions_prefix}{session_info.user_id}", session_info.session_id)
+                pipe.setex(f"{self.blacklist_prefix}{session_info.jti}", 86400, "1")
+            pipe.zrem(self.expiry_key, *(self._expiry_member(s.session_id, s.user_id) for s in sessions))
+            await pipe.execute()
+
+        for session_info in sessions:
+            logger.info(f"🚫 JWT blacklisted: {session_info.jti}")
+        return len(sessions)
 
     async def invalidate_all_user_sessions(self, user_id: str) -> int:
         """Invalidate all sessions for a user (logout all devices)"""
@@ -206,10 +285,7 @@ class SecureSessionManager:
         user_sessions_key = f"{self.user_sessions_prefix}{user_id}"
         session_ids = await self.redis_client.zrange(user_sessions_key, 0, -1)
 
-        invalidated_count = 0
-        for session_id in session_ids:
-            if await self.invalidate_session(session_id):
-                invalidated_count += 1
+        invalidated_count = await self.invalidate_sessions(session_ids)
 
         logger.info(f"🔒 All sessions invalidated for user {user_id}: {invalidated_count}")
         return invalidated_count
@@ -221,10 +297,13 @@ class SecureSessionManager:
 
         user_sessions_key = f"{self.user_sessions_prefix}{user_id}"
         session_ids = await self.redis_client.zrange(user_sessions_key, 0, -1)
+        if not session_ids:
+            return []
 
+        session_keys = [f"{self.session_prefix}{session_id}" for session_id in session_ids]
         sessions = []
-        for session_id in session_ids:
-            session_info = await self.get_session(session_id)
+        for session_id, session_data in zip(session_ids, await self.redis_client.mget(session_keys)):
+            session_info = self._parse_session(session_id, session_data)
             if session_info:
                 sessions.append(session_info)
 
@@ -263,13 +342,14 @@ class SecureSessionManager:
         exists = await self.redis_client.exists(blacklist_key)
         return bool(exists)
 
-    async def _enforce_session_limit(self, user_id: str) -> None:
+    async def _enforce_session_limit(self, user_id: str, session_count: Optional[int] = None) -> None:
         """Enforce maximum sessions per user by removing oldest sessions"""
         if not self.redis_client:
             return
 
         user_sessions_key = f"{self.user_sessions_prefix}{user_id}"
-        session_count = await self.redis_client.zcard(user_sessions_key)
+        if session_count is None:
+            session_count = await self.redis_client.zcard(user_sessions_key)
 
         if session_count > self.max_sessions_per_user:
             # Remove oldest sessions
@@ -278,9 +358,10 @@ class SecureSessionManager:
                 user_sessions_key, 0, sessions_to_remove - 1
             )
 
-            for session_id in oldest_sessions:
-                await self.invalidate_session(session_id)
-                logger.info(f"🔄 Removed oldest session for user {user_id}: {session_id}")
+            await self.invalidate_sessions(oldest_sessions)
+            # Drop ids whose session key had already expired as well
+            await self.redis_client.zrem(user_sessions_key, *oldest_sessions)
+            logger.info(f"🔄 Removed {len(oldest_sessions)} oldest session(s) for user {user_id}")
 
     async def _schedule_cleanup_if_needed(self) -> None:
         """Schedule cleanup of expired sessions if not done recently"""
@@ -298,34 +379,15 @@ class SecureSessionManager:
                 await self._cleanup_expired_sessions()
 
     async def _cleanup_expired_sessions(self) -> None:
-        """Clean up expired sessions and blacklisted JWTs"""
+        """Clean up expired sessions (one full sweep of the expiry index)"""
         if not self.redis_client:
             return
 
         try:
             now = datetime.now(timezone.utc)
 
-            # Find all user session keys
-            user_session_keys = await self.redis_client.keys(f"{self.user_sessions_prefix}*")
-
-            cleaned_sessions = 0
-            for user_sessions_key in user_session_keys:
-                # Get all sessions for this user
-                session_ids = await self.redis_client.zrange(user_sessions_key, 0, -1)
-
-                for session_id in session_ids:
-                    session_info = await self.get_session(session_id)
-
-                    # If session doesn't exist or is expired, remove it
-                    if not session_info or (
-                        session_info.expires_at and session_info.expires_at < now
-                    ):
-                        await self.redis_client.zrem(user_sessions_key, session_id)
-                        cleaned_sessions += 1
-
-                # Remove empty user session sets
-                if await self.redis_client.zcard(user_sessions_key) == 0:
-                    await self.redis_client.delete(user_sessions_key)
+            await self._backfill_expiry_index()
+            cleaned_sessions = await self.sweep_expired_sessions()
 
             # Update cleanup timestamp
             await self.redis_client.setex(
@@ -339,23 +401,118 @@ class SecureSessionManager:
         except Exception as e:
             logger.error(f"❌ Session cleanup error: {e}")
 
+    async def sweep_expired_sessions(self, max_batches: Optional[int] = None) -> int:
+        """
+        Remove sessions whose expiry has passed, oldest first
+
+        Each batch is one Lua call over at most sweep_batch_size index entries,
+        so Redis is never held for more than a few milliseconds; the event loop
+        gets a turn between batches. Swept entries leave the index, so its
+        head is the cursor and an interrupted sweep resumes where it stopped.
+
+        Args:
+            max_batches: Stop after this many batches (None: until nothing is due)
+
+        Returns:
+            Number of sessions removed
+        """
+        if not self.redis_client:
+            return 0
+        if self._sweep_script is None:
+            self._sweep_script = self.redis_client.register_script(SWEEP_EXPIRED_SCRIPT)
+
+        now = time.time()
+        removed = batches = 0
+        while max_batches is None or batches < max_batches:
+            swept = await self._sweep_script(
+                keys=[self.expiry_key],
+                args=[now, self.sweep_batch_size, self.session_prefix, self.user_sessions_prefix]
+            )
+            removed += swept
+            batches += 1
+            if swept < self.sweep_batch_size:
+                break
+            await asyncio.sleep(0)
+        return removed
+
+    async def _backfill_expiry_index(self) -> None:
+        """
+        Index sessions created before the expiry index existed (runs once)
+
+        Walks user_sessions:* with SCAN rather than KEYS; ids whose session
+        key is gone are dropped, live ones are indexed at their key's TTL.
+        """
+        if not self.redis_client or await self.redis_client.exists(self.expiry_backfill_key):
+            return
+
+        now = time.time()
+        indexed = 0
+        async for user_sessions_key in self.redis_client.scan_iter(f"{self.user_sessions_prefix}*", count=1000):
+            user_id = user_sessions_key[len(self.user_sessions_prefix):]
+            session_ids = await self.redis_client.zrange(user_sessions_key, 0, -1)
+            if not session_ids:
+                continue
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for session_id in session_ids:
+                    pipe.ttl(f"{self.session_prefix}{session_id}")
+                ttls = await pipe.execute()
+            live = {
+                self._expiry_member(session_id, user_id): now + ttl
+                for session_id, ttl in zip(session_ids, ttls) if ttl > 0
+            }
+            gone = [session_id for session_id, ttl in zip(session_ids, ttls) if ttl <= 0]
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                if live:
+                    pipe.zadd(self.expiry_key, live, nx=True)
+                if gone:
+                    pipe.zrem(user_sessions_key, *gone)
+                    if len(gone) == len(session_ids):
+                        pipe.delete(user_sessions_key)
+                await pipe.execute()
+            indexed += len(live)
+
+        await self.redis_client.set(self.expiry_backfill_key, datetime.now(timezone.utc).isoformat())
+        logger.info(f"🗂️ Session expiry index backfilled: {indexed} sessions")
+
+    def _start_sweeper(self) -> None:
+        if self._sweeper_task is None or self._sweeper_task.done():
+            self._sweeper_task = asyncio.create_task(self._sweep_loop())
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                removed = await self.sweep_expired_sessions()
+                if removed:
+                    logger.info(f"🧹 Swept {removed} expired sessions")
+            except Exception as e:
+                logger.error(f"❌ Session sweep error: {e}")
+
+    async def close(self) -> None:
+        """Stop the expiry sweeper and close the Redis connection"""
+        if self._sweeper_task:
+            self._sweeper_task.cancel()
+            try:
+                await self._sweeper_task
+            except asyncio.CancelledError:
+                pass
+            self._sweeper_task = None
+        if self.redis_client:
+            await self.redis_client.close()
+            self.redis_client = None
+
     async def get_session_stats(self) -> Dict[str, Any]:
         """Get session statistics for monitoring"""
         if not self.redis_client:
             return {}
 
         try:
-            # Count total sessions
-            session_keys = await self.redis_client.keys(f"{self.session_prefix}*")
-            total_sessions = len(session_keys)
-
-            # Count users with sessions
-            user_session_keys = await self.redis_client.keys(f"{self.user_sessions_prefix}*")
-            active_users = len(user_session_keys)
+            # Count total sessions (indexed and not yet expired)
+            total_sessions = await self.redis_client.zcount(self.expiry_key, time.time(), '+inf')
 
-            # Count blacklisted tokens
-            blacklist_keys = await self.redis_client.keys(f"{self.blacklist_prefix}*")
-            blacklisted_tokens = len(blacklist_keys)
+            # Count users with sessions and blacklisted tokens (SCAN, not KEYS)
+            active_users = await self._count_keys(f"{self.user_sessions_prefix}*")
+            blacklisted_tokens = await self._count_keys(f"{self.blacklist_prefix}*")
 
             return {
                 "total_sessions": total_sessions,
@@ -370,6 +527,12 @@ class SecureSessionManager:
             logger.error(f"❌ Error getting session stats: {e}")
             return {"redis_connected": False, "error": str(e)}
 
+    async def _count_keys(self, pattern: str) -> int:
+        count = 0
+        async for _ in self.redis_client.scan_iter(pattern, count=1000):
+            count += 1
+        return count
+
 # Global session manager instance
 _session_manager: Optional[SecureSessionManager] = None
 
@@ -381,4 +544,12 @@ async def get_session_manager() -> SecureSessionManager:
         _session_manager = SecureSessionManager()
         await _session_manager.initialize()
 
-    return _session_manager
\ No newline at end of file
+    return _session_manager
+
+async def close_session_manager() -> None:
+    """Stop the session manager's sweeper and Redis connection, if it was created"""
+    global _session_manager
+
+    if _session_manager is not None:
+        await _session_manager.close()
+        _session_manager = None
@@ -0,0 +1,32 @@
+"""
+Budget Analytics Services Module
+Incrementally maintained spending and savings aggregates for budget tools
+"""
+
+from .daily_aggregates import (
+    EXPENSE_DAILY_COLUMNS,
+    EXPENSE_DAILY_TABLE,
+    SAVINGS_DAILY_TABLE,
+    TREND_WINDOW_DAYS,
+    CategoryTotal,
+    MonthWindow,
+    expense_category_totals,
+    month_window,
+    savings_category_totals,
+    spending_trend,
+    summarize_daily_rows,
+)
+
+__all__ = [
+    'EXPENSE_DAILY_COLUMNS',
+    'EXPENSE_DAILY_TABLE',
+    'SAVINGS_DAILY_TABLE',
+    'TREND_WINDOW_DAYS',
+    'CategoryTotal',
+    'MonthWindow',
+    'expense_category_totals',
+    'month_window',
+    'savings_category_totals',
+    'spending_trend',
+    'summarize_daily_rows',
+]
@@ -0,0 +1,129 @@
+"""
+Budget Daily Aggregates
+Range queries over the trigger-maintained per-user/category/day totals
+
+expense_daily_totals and savings_daily_totals (see the
+budget_daily_aggregates migration) hold one row per (user, category, day),
+so every read here costs O(days x categories) instead of O(expenses).
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+EXPENSE_DAILY_TABLE = "expense_daily_totals"
+SAVINGS_DAILY_TABLE = "savings_daily_totals"
+EXPENSE_DAILY_COLUMNS = "category, day, total, expense_count"
+
+# Recent window compared with the month-to-date rate for trends
+TREND_WINDOW_DAYS = 7
+TREND_TOLERANCE = 0.1
+
+
+@dataclass
+class CategoryTotal:
+    """Summed buckets for one category over a date range"""
+    category: str
+    total: Decimal = Decimal("0")
+    count: int = 0
+    active_days: int = 0
+
+    @property
+    def average(self) -> Decimal:
+        return self.total / self.count if self.count else Decimal("0")
+
+
+@dataclass
+class MonthWindow:
+    """The current calendar month as seen from `today`"""
+    start: date
+    end: date
+    days_elapsed: int
+    days_in_month: int
+
+
+def month_window(today: date) -> MonthWindow:
+    start = today.replace(day=1)
+    next_month = (start + timedelta(days=32)).replace(day=1)
+    return MonthWindow(start, next_month - timedelta(days=1), today.day, (next_month - start).days)
+
+
+def summarize_daily_rows(
+    rows: Iterable[Dict[str, Any]],
+    since: Optional[date] = None
+) -> Dict[str, CategoryTotal]:
+    """
+    Fold expense_daily_totals rows into per-category totals, optionally
+    only counting days on or after `since`.
+    """
+    totals: Dict[str, CategoryTotal] = {}
+    for row in rows:
+        if since is not None and date.fromisoformat(str(row["day"])[:10]) < since:
+            continue
+        category = row.get("category") or "other"
+        entry = totals.setdefault(category, CategoryTotal(category))
+        entry.total += Decimal(str(row.get("total", 0)))
+        entry.count += int(row.get("expense_count", 0))
+        entry.active_days += 1
+    return totals
+
+
+def spending_trend(month_rate: float, recent_rate: float) -> str:
+    if month_rate <= 0:
+        return "increasing" if recent_rate > 0 else "steady"
+    change = (recent_rate - month_rate) / month_rate
+    if change > TREND_TOLERANCE:
+        return "increasing"
+    if change < -TREND_TOLERANCE:
+        return "decreasing"
+    return "steady"
+
+
+def _rpc_totals(rows, total_column: str, count_column: str) -> Dict[str, CategoryTotal]:
+    return {
+        row["category"]: CategoryTotal(
+            row["category"],
+            Decimal(str(row.get(total_column) or 0)),
+            int(row.get(count_column) or 0),
+            int(row.get("active_days") or 0),
+        )
+        for row in rows or []
+    }
+
+
+def expense_category_totals(
+    client,
+    user_id: str,
+    start: date,
+    end: date,
+    category: Optional[str] = None
+) -> Dict[str, CategoryTotal]:
+    """Per-category expense totals for start..end (inclusive), one grouped query"""
+    result = client.rpc("expense_category_totals", {
+        "p_user_id": user_id,
+        "p_start": start.isoformat(),
+        "p_end": end.isoformat(),
+        "p_category": category,
+    }).execute()
+    return _rpc_totals(result.data, "total", "expense_count")
+
+
+def savings_category_totals(
+    client,
+    user_id: str,
+    start: date,
+    end: date,
+    category: Optional[str] = None
+) -> Dict[str, CategoryTotal]:
+    """Per-category actual savings for start..end (inclusive), one grouped query"""
+    result = client.rpc("savings_category_totals", {
+        "p_user_id": user_id,
+        "p_start": start.isoformat(),
+        "p_end": end.isoformat(),
+        "p_category": category,
+    }).execute()
+    return _rpc_totals(result.data, "total_savings", "event_count")
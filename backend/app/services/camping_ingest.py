@@ -0,0 +1,302 @@
+"""
+Bulk Camping Site Ingestion
+Normalizes, deduplicates and upserts scraped camping sites in batches.
+
+Each site is keyed by a natural key derived from its coordinates (the same
+identity the scraper used for its per-row lookups) and fingerprinted with a
+content hash, so unchanged sites are skipped instead of rewritten.
+
+Two sinks are provided:
+- SupabaseCampingSink: batched PostgREST upsert on natural_key (production path)
+- AsyncpgCampingSink: COPY into a temp staging table, then a single
+  INSERT ... ON CONFLICT DO UPDATE (direct Postgres, used for large refreshes
+  and local benchmarks)
+"""
+
+import hashlib
+import json
+import logging
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TABLE_NAME = "camping_locations"
+DEFAULT_BATCH_SIZE = 500
+COORDINATE_PRECISION = 6  # camping_locations stores DECIMAL(10,6)
+
+# Columns written by the scraper; content_hash covers all of them
+CONTENT_COLUMNS = (
+    "name",
+    "location_type",
+    "country",
+    "latitude",
+    "longitude",
+    "address",
+    "is_free",
+    "price_per_night",
+    "max_rig_length",
+    "amenities",
+    "seasonal_info",
+    "source_url",
+    "data_source",
+)
+ROW_COLUMNS = CONTENT_COLUMNS + ("natural_key", "content_hash", "last_scraped")
+
+
+@dataclass
+class IngestStats:
+    """Counters for one ingestion run"""
+    received: int = 0
+    invalid: int = 0
+    duplicates: int = 0
+    unchanged: int = 0
+    upserted: int = 0
+    failed: int = 0
+    batches: int = 0
+    round_trips: int = 0
+    elapsed_seconds: float = 0.0
+
+    @property
+    def rows_per_sec(self) -> float:
+        processed = self.received - self.invalid
+        return round(processed / self.elapsed_seconds, 1) if self.elapsed_seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["rows_per_sec"] = self.rows_per_sec
+        return data
+
+
+def natural_key(latitude: float, longitude: float) -> str:
+    """Stable identity for a site: coordinates rounded to the column precision"""
+    return f"{round(float(latitude), COORDINATE_PRECISION):.{COORDINATE_PRECISION}f},{round(float(longitude), COORDINATE_PRECISION):.{COORDINATE_PRECISION}f}"
+
+
+def content_hash(row: Dict[str, Any]) -> str:
+    """SHA-256 over the content columns, independent of key order"""
+    payload = {column: row.get(column) for column in CONTENT_COLUMNS}
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def normalize_site(site: Dict[str, Any], data_source: str, default_country: str) -> Optional[Dict[str, Any]]:
+    """Map a scraped site onto camping_locations columns. Returns None if unusable."""
+    try:
+        latitude = float(site["latitude"])
+        longitude = float(site["longitude"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180) or (latitude == 0 and longitude == 0):
+        return None
+
+    name = (site.get("name") or "").strip()
+    if not name:
+        return None
+
+    price = site.get("price_per_night")
+    address = site.get("address")
+    row = {
+        "name": " ".join(name.split()),
+        "location_type": site.get("location_type") or site.get("type"),
+        "country": site.get("country") or default_country,
+        "latitude": round(latitude, COORDINATE_PRECISION),
+        "longitude": round(longitude, COORDINATE_PRECISION),
+        "address": " ".join(str(address).split()) if address else None,
+        "is_free": bool(site.get("is_free", False)),
+        "price_per_night": float(price) if price is not None else None,
+        "max_rig_length": site.get("max_rig_length"),
+        "amenities": site.get("amenities") or {},
+        "seasonal_info": site.get("seasonal_info"),
+        "source_url": site.get("source_url"),
+        "data_source": data_source,
+    }
+    row["natural_key"] = natural_key(latitude, longitude)
+    row["content_hash"] = content_hash(row)
+    row["last_scraped"] = site.get("last_scraped") or datetime.utcnow().isoformat()
+    return row
+
+
+def prepare_rows(
+    sites: Iterable[Dict[str, Any]],
+    data_source: str,
+    default_country: str,
+    stats: IngestStats,
+) -> List[Dict[str, Any]]:
+    """Normalize and dedup in memory; later duplicates of a key replace earlier ones"""
+    rows: Dict[str, Dict[str, Any]] = {}
+    for site in sites:
+        stats.received += 1
+        row = normalize_site(site, data_source, default_country)
+        if row is None:
+            stats.invalid += 1
+            continue
+        if row["natural_key"] in rows:
+            stats.duplicates += 1
+        rows[row["natural_key"]] = row
+    return list(rows.values())
+
+
+def _batches(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class SupabaseCampingSink:
+    """Batched upsert through the Supabase client (one request per batch)"""
+
+    def __init__(self, supabase, table: str = TABLE_NAME):
+        self.supabase = supabase
+        self.table = table
+
+    async def existing_hashes(self, keys: List[str]) -> Dict[str, str]:
+        response = (
+            self.supabase.table(self.table)
+            .select("natural_key, content_hash")
+            .in_("natural_key", keys)
+            .execute()
+        )
+        return {row["natural_key"]: row.get("content_hash") for row in (response.data or [])}
+
+    async def upsert(self, rows: List[Dict[str, Any]]) -> int:
+        from postgrest.types import ReturnMethod
+
+        now = datetime.utcnow().isoformat()
+        payload = [{**row, "updated_at": now} for row in rows]
+        self.supabase.table(self.table).upsert(
+            payload, on_conflict="natural_key", returning=ReturnMethod.minimal
+        ).execute()
+        return len(rows)
+
+    async def touch(self, keys: List[str], last_scraped: str) -> None:
+        self.supabase.table(self.table).update(
+            {"last_scraped": last_scraped}
+        ).in_("natural_key", keys).execute()
+
+
+class AsyncpgCampingSink:
+    """COPY into a temp staging table, then one INSERT ... ON CONFLICT per batch.
+
+    The conflict clause also skips rows whose content_hash is unchanged, so a
+    concurrent refresh of the same sites stays a no-op.
+    """
+
+    def __init__(self, connection, table: str = TABLE_NAME):
+        self.connection = connection
+        self.table = table
+
+    async def existing_hashes(self, keys: List[str]) -> Dict[str, str]:
+        rows = await self.connection.fetch(
+            f"SELECT natural_key, content_hash FROM {self.table} WHERE natural_key = ANY($1::text[])",
+            keys,
+        )
+        return {row["natural_key"]: row["content_hash"] for row in rows}
+
+    async def upsert(self, rows: List[Dict[str, Any]]) -> int:
+        columns = ROW_COLUMNS
+        records = [tuple(self._copy_value(c, row[c]) for c in columns) for row in rows]
+        column_list = ", ".join(columns)
+        updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns if c != "natural_key")
+
+        async with self.connection.transaction():
+            await self.connection.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS camping_locations_staging "
+                f"(LIKE {self.table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+            )
+            await self.connection.copy_records_to_table(
+                "camping_locations_staging", records=records, columns=list(columns)
+            )
+            status = await self.connection.execute(
+                f"INSERT INTO {self.table} ({column_list}) "
+                f"SELECT {column_list} FROM camping_locations_staging "
+                f"ON CONFLICT (natural_key) DO UPDATE SET {updates}, updated_at = now() "
+                f"WHERE {self.table}.content_hash IS DISTINCT FROM EXCLUDED.content_hash"
+            )
+        # Status is "INSERT 0 <rows>"
+        return int(status.split()[-1])
+
+    @staticmethod
+    def _copy_value(column: str, value: Any) -> Any:
+        """Convert a row value to the type asyncpg's binary COPY expects"""
+        if value is None:
+            return None
+        if column == "amenities":
+            return json.dumps(value)
+        if column in ("latitude", "longitude", "price_per_night"):
+            return Decimal(str(value))
+        if column == "last_scraped" and isinstance(value, str):
+            return datetime.fromisoformat(value)
+        return value
+
+    async def touch(self, keys: List[str], last_scraped: str) -> None:
+        await self.connection.execute(
+            f"UPDATE {self.table} SET last_scraped = $2 WHERE natural_key = ANY($1::text[])",
+            keys,
+            datetime.fromisoformat(last_scraped),
+        )
+
+
+class CampingSiteIngestor:
+    """Bulk ingestion pipeline: normalize -> dedup -> hash diff -> batched upsert"""
+
+    def __init__(self, sink, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.sink = sink
+        self.batch_size = batch_size
+
+    async def ingest(
+        self,
+        sites: Iterable[Dict[str, Any]],
+        data_source: str,
+        default_country: str = "US",
+        touch_unchanged: bool = True,
+    ) -> IngestStats:
+        """
+        Ingest scraped sites
+
+        Args:
+            sites: Raw scraped site dicts
+            data_source: Source label stored on each row
+            default_country: Country used when a site has none
+            touch_unchanged: Refresh last_scraped on unchanged rows (one request per batch)
+
+        Returns:
+            IngestStats with skipped-unchanged counts and rows/sec
+        """
+        stats = IngestStats()
+        start = time.perf_counter()
+        rows = prepare_rows(sites, data_source, default_country, stats)
+        scraped_at = datetime.utcnow().isoformat()
+
+        for batch in _batches(rows, self.batch_size):
+            stats.batches += 1
+            try:
+                changed, unchanged_keys = await self._diff(batch, stats)
+                stats.unchanged += len(unchanged_keys)
+
+                if changed:
+                    stats.round_trips += 1
+                    await self.sink.upsert(changed)
+                    stats.upserted += len(changed)
+
+                if unchanged_keys and touch_unchanged:
+                    stats.round_trips += 1
+                    await self.sink.touch(unchanged_keys, scraped_at)
+
+            except Exception as e:
+                stats.failed += len(batch)
+                logger.error(f"Camping ingest batch {stats.batches} failed: {e}")
+
+        stats.elapsed_seconds = time.perf_counter() - start
+        logger.info(f"Camping ingest ({data_source}) complete: {stats.to_dict()}")
+        return stats
+
+    async def _diff(self, batch: List[Dict[str, Any]], stats: IngestStats) -> Tuple[List[Dict[str, Any]], List[str]]:
+        stats.round_trips += 1
+        existing = await self.sink.existing_hashes([row["natural_key"] for row in batch])
+        changed = [row for row in batch if existing.get(row["natural_key"]) != row["content_hash"]]
+        unchanged = [row["natural_key"] for row in batch if existing.get(row["natural_key"]) == row["content_hash"]]
+        return changed, unchanged
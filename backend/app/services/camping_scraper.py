@@ -6,13 +6,14 @@ Scrapes free camping locations from various sources to populate the database
 import asyncio
 import logging
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional
 import aiohttp
 from bs4 import BeautifulSoup
 import json
 from decimal import Decimal
 
 from app.core.database import get_supabase_client
+from app.services.camping_ingest import CampingSiteIngestor, IngestStats, SupabaseCampingSink
 
 logger = logging.getLogger(__name__)
 
@@ -22,6 +23,8 @@ class CampingScraperService:
     
     def __init__(self):
         self.supabase = get_supabase_client()
+        self.ingestor = CampingSiteIngestor(SupabaseCampingSink(self.supabase))
+        self.last_ingest_stats: Optional[IngestStats] = None
         self.session = None
         self.headers = {
             'User-Agent': 'Wheels&Wins Bot 1.0 (Camping Data Aggregator)'
@@ -68,6 +71,7 @@ class CampingScraperService:
                         site_data = {
                             'name': listing.find('h3').text.strip() if listing.find('h3') else 'Unknown',
                             'type': 'free_camping',
+                            'country': 'US',
                             'latitude': float(listing.get('data-lat', 0)),
                             'longitude': float(listing.get('data-lng', 0)),
                             'address': listing.find('span', class_='address').text.strip() if listing.find('span', class_='address') else None,
@@ -108,6 +112,7 @@ class CampingScraperService:
                         site_data = {
                             'name': area.get('name', 'BLM Dispersed Camping'),
                             'type': 'blm_dispersed',
+                            'country': 'US',
                             'latitude': area.get('coordinates', {}).get('lat'),
                             'longitude': area.get('coordinates', {}).get('lng'),
                             'address': area.get('location_description'),
@@ -182,47 +187,38 @@ class CampingScraperService:
                 
         return amenities
     
-    async def update_database(self, camping_sites: List[Dict]) -> int:
-        """Update the database with scraped camping sites"""
-        updated_count = 0
-        
-        for site in camping_sites:
-            try:
-                # Check if site already exists based on coordinates
-                existing = self.supabase.table('camping_locations').select('id').eq(
-                    'latitude', site['latitude']
-                ).eq(
-                    'longitude', site['longitude']
-                ).execute()
-                
-                if existing.data:
-                    # Update existing record
-                    result = self.supabase.table('camping_locations').update({
-                        'is_free': site.get('is_free', False),
-                        'source_url': site.get('source_url'),
-                        'last_scraped': site.get('last_scraped'),
-                        'amenities': site.get('amenities', {}),
-                        'updated_at': datetime.utcnow().isoformat()
-                    }).eq('id', existing.data[0]['id']).execute()
-                else:
-                    # Insert new record
-                    result = self.supabase.table('camping_locations').insert(site).execute()
-                    
-                if result.data:
-                    updated_count += 1
-                    
-            except Exception as e:
-                logger.error(f"Error updating database for site {site.get('name')}: {str(e)}")
-                
-        return updated_count
-    
-    async def run_full_scrape(self) -> Dict[str, int]:
+    async def update_database(
+        self,
+        camping_sites: List[Dict],
+        data_source: str = 'scraper',
+        default_country: str = 'US'
+    ) -> int:
+        """
+        Update the database with scraped camping sites using batched upserts
+
+        Sites are normalized and deduplicated in memory, unchanged sites (same
+        content hash) are skipped, and the rest are upserted on natural_key in
+        batches instead of one select plus one write per site.
+
+        Returns:
+            Number of sites now current in the database (written or unchanged)
+        """
+        stats = await self.ingestor.ingest(
+            camping_sites,
+            data_source=data_source,
+            default_country=default_country
+        )
+        self.last_ingest_stats = stats
+        return stats.upserted + stats.unchanged
+
+    async def run_full_scrape(self) -> Dict[str, Any]:
         """Run a full scraping session across all sources"""
         results = {
             'freecampsites_net': 0,
             'blm': 0,
             'australia': 0,
-            'total': 0
+            'total': 0,
+            'ingest_stats': {}
         }
         
         logger.info("Starting full camping scrape session")
@@ -230,8 +226,9 @@ class CampingScraperService:
         # Scrape US free camping sites
         us_sites = await self.scrape_freecampsites_net()
         if us_sites:
-            count = await self.update_database(us_sites)
+            count = await self.update_database(us_sites, data_source='freecampsites_net')
             results['freecampsites_net'] = count
+            results['ingest_stats']['freecampsites_net'] = self.last_ingest_stats.to_dict()
             results['total'] += count
             
         # Add delay between sources
@@ -240,8 +237,9 @@ class CampingScraperService:
         # Scrape BLM dispersed camping
         blm_sites = await self.scrape_blm_dispersed_camping()
         if blm_sites:
-            count = await self.update_database(blm_sites)
+            count = await self.update_database(blm_sites, data_source='blm')
             results['blm'] = count
+            results['ingest_stats']['blm'] = self.last_ingest_stats.to_dict()
             results['total'] += count
             
         # Add delay between sources
@@ -250,8 +248,9 @@ class CampingScraperService:
         # Scrape Australian sites
         au_sites = await self.scrape_australian_free_camps()
         if au_sites:
-            count = await self.update_database(au_sites)
+            count = await self.update_database(au_sites, data_source='australia', default_country='AU')
             results['australia'] = count
+            results['ingest_stats']['australia'] = self.last_ingest_stats.to_dict()
             results['total'] += count
             
         logger.info(f"Scraping session complete. Results: {results}")
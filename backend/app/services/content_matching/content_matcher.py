@@ -1,13 +1,28 @@
 from __future__ import annotations
 
 import re
+from collections import Counter
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
 from pydantic import BaseModel
 
 from app.services.script_analysis.openai_script_analyzer import ScriptAnalysis
 
+# Optional C implementation of bounded Levenshtein; the bit-parallel fallback
+# below returns the same distances.
+try:
+    from rapidfuzz import process as _rf_process
+    from rapidfuzz.distance import Levenshtein as _rf_levenshtein
+    RAPIDFUZZ_AVAILABLE = True
+except ImportError:
+    _rf_process = None
+    _rf_levenshtein = None
+    RAPIDFUZZ_AVAILABLE = False
+
+QGRAM_SIZE = 3
+
 
 @dataclass
 class MatchResult:
@@ -38,12 +53,131 @@ class TranscribedMedia(BaseModel):
     segments: List[TranscribedSegment]
 
 
+def _normalize(text: str) -> str:
+    return re.sub(r"\W+", " ", text).lower().strip()
+
+
+def _qgrams(text: str) -> Counter:
+    return Counter([text[i:i + QGRAM_SIZE] for i in range(len(text) - QGRAM_SIZE + 1)])
+
+
+def bounded_levenshtein(a: str, b: str, max_distance: int) -> int:
+    """
+    Levenshtein distance if it is <= max_distance, otherwise max_distance + 1.
+
+    Bit-parallel (Myers/Hyyro) over Python ints: one pass over the shorter
+    string with word-level operations per character, stopping as soon as the
+    last-row value minus the remaining columns exceeds max_distance (the
+    Ukkonen cutoff).
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if len(a) < len(b):
+        a, b = b, a
+    m, n = len(a), len(b)
+    if n == 0:
+        return m if m <= max_distance else max_distance + 1
+
+    peq: Dict[str, int] = {}
+    for i, ch in enumerate(a):
+        peq[ch] = peq.get(ch, 0) | (1 << i)
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    for j, ch in enumerate(b):
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = ((((eq & pv) + pv) & mask) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+        if score - (n - j - 1) > max_distance:
+            return max_distance + 1
+    return score if score <= max_distance else max_distance + 1
+
+
+class SegmentIndex:
+    """
+    Normalized transcript segments with a q-gram inverted index.
+
+    Candidate selection is lossless: if ed(x, y) <= k then x and y share at
+    least max(|x|, |y|) - q + 1 - k*q q-grams (Ukkonen's q-gram lemma), so
+    segments below that count, or whose length alone rules out the threshold,
+    can be skipped without changing any result.
+    """
+
+    def __init__(self, media_files: Sequence[TranscribedMedia]):
+        self.entries: List[Tuple[TranscribedMedia, TranscribedSegment]] = []
+        self.texts: List[str] = []
+        # Lower-cased speaker -> code; 0 means no speaker (matches any)
+        self.speaker_codes: Dict[str, int] = {"": 0}
+        speakers: List[int] = []
+        grams: List[str] = []
+        gram_counts: List[int] = []
+        gram_segments: List[int] = []
+        for media in media_files:
+            for seg in media.segments:
+                idx = len(self.entries)
+                text = _normalize(seg.text)
+                self.entries.append((media, seg))
+                self.texts.append(text)
+                speaker = seg.speaker.lower() if seg.speaker else ""
+                speakers.append(self.speaker_codes.setdefault(speaker, len(self.speaker_codes)))
+                counts = _qgrams(text)
+                grams.extend(counts.keys())
+                gram_counts.extend(counts.values())
+                gram_segments.extend([idx] * len(counts))
+        self.lengths = np.fromiter((len(t) for t in self.texts), dtype=np.int64, count=len(self.texts))
+        self.speakers = np.array(speakers, dtype=np.int64)
+
+        # Posting lists: (segment ids, occurrence counts) per q-gram, segment ids ascending
+        vocabulary: Dict[str, int] = {}
+        gram_ids = np.array([vocabulary.setdefault(g, len(vocabulary)) for g in grams], dtype=np.int64)
+        order = np.argsort(gram_ids, kind="stable")
+        bounds = np.searchsorted(gram_ids[order], np.arange(len(vocabulary) + 1))
+        segment_ids = np.array(gram_segments, dtype=np.int64)[order]
+        occurrences = np.array(gram_counts, dtype=np.int64)[order]
+        self.postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+            gram: (segment_ids[bounds[i]:bounds[i + 1]], occurrences[bounds[i]:bounds[i + 1]])
+            for gram, i in vocabulary.items()
+        }
+
+    def candidates(self, quote: str, threshold: float, speaker: Optional[str] = None) -> np.ndarray:
+        """Indices (in media/segment order) of segments that could score >= threshold"""
+        if not self.entries:
+            return np.zeros(0, dtype=np.int64)
+        max_len = np.maximum(self.lengths, len(quote))
+        max_dist = ((1 - threshold) * max_len).astype(np.int64) + 1
+        keep = np.abs(self.lengths - len(quote)) <= max_dist
+
+        required = max_len - QGRAM_SIZE + 1 - max_dist * QGRAM_SIZE
+        if (required > 0).any():
+            shared = np.zeros(len(self.entries), dtype=np.int64)
+            for gram, count in _qgrams(quote).items():
+                posting = self.postings.get(gram)
+                if posting is not None:
+                    ids, counts = posting
+                    shared[ids] += np.minimum(counts, count)
+            keep &= (required <= 0) | (shared >= required)
+
+        if speaker:
+            keep &= (self.speakers == 0) | (self.speakers == self.speaker_codes.get(speaker.lower(), -1))
+        return np.flatnonzero(keep)
+
+
 class ContentMatcher:
     """Match script segments to transcribed media."""
 
     @staticmethod
     def _normalize(text: str) -> str:
-        return re.sub(r"\W+", " ", text).lower().strip()
+        return _normalize(text)
 
     @staticmethod
     def _levenshtein(a: str, b: str) -> int:
@@ -77,23 +211,48 @@ class ContentMatcher:
         media_files: List[TranscribedMedia],
         threshold: float = 0.85,
         speaker: Optional[str] = None,
+        index: Optional[SegmentIndex] = None,
     ) -> Optional[MatchResult]:
-        best: Optional[MatchResult] = None
-        best_score = threshold
-        for media in media_files:
-            for seg in media.segments:
-                if speaker and seg.speaker and seg.speaker.lower() != speaker.lower():
-                    continue
-                score = self._similarity(quote, seg.text)
-                if score >= best_score:
-                    best = MatchResult(
-                        file_id=media.file_id,
-                        start_time=seg.start,
-                        end_time=seg.end,
-                        score=score,
-                    )
-                    best_score = score
-        return best
+        """
+        Best-scoring segment with similarity >= threshold (the last one on ties),
+        same result as comparing the quote against every segment.
+        """
+        index = index or SegmentIndex(media_files)
+        quote_norm = _normalize(quote)
+        candidates = index.candidates(quote_norm, threshold, speaker)
+        if not len(candidates):
+            return None
+
+        texts = [index.texts[i] for i in candidates]
+        max_lens = np.maximum(index.lengths[candidates], len(quote_norm))
+        distances = self._bounded_distances(quote_norm, texts, max_lens, threshold)
+        scores = 1 - distances / np.maximum(max_lens, 1)
+
+        best_score = scores.max()
+        if best_score < threshold:
+            return None
+        pos = len(scores) - 1 - int(np.argmax(scores[::-1] == best_score))
+        media, seg = index.entries[candidates[pos]]
+        return MatchResult(
+            file_id=media.file_id,
+            start_time=seg.start,
+            end_time=seg.end,
+            score=float(best_score),
+        )
+
+    @staticmethod
+    def _bounded_distances(quote: str, texts: List[str], max_lens: np.ndarray, threshold: float) -> np.ndarray:
+        """Exact distances wherever the pair can reach the threshold, larger values elsewhere"""
+        limits = ((1 - threshold) * max_lens).astype(np.int64) + 1
+        if RAPIDFUZZ_AVAILABLE:
+            return _rf_process.cdist(
+                [quote], texts, scorer=_rf_levenshtein.distance,
+                score_cutoff=int(limits.max()), dtype=np.int64,
+            )[0]
+        return np.fromiter(
+            (bounded_levenshtein(quote, text, int(limit)) for text, limit in zip(texts, limits)),
+            dtype=np.int64, count=len(texts),
+        )
 
     def _match_by_keywords(
         self,
@@ -126,14 +285,18 @@ class ContentMatcher:
         media_files: List[TranscribedMedia],
     ) -> List[MediaMatch]:
         matches: List[MediaMatch] = []
+        index: Optional[SegmentIndex] = None
         for idx, segment in enumerate(script.segments):
             seg_id = str(idx)
             if segment.type == "soundbite" and segment.quote:
+                # Normalize and index the transcripts once for all quotes
+                index = index or SegmentIndex(media_files)
                 match = self._find_best_quote_match(
                     segment.quote,
                     media_files,
                     threshold=0.85,
                     speaker=segment.speaker,
+                    index=index,
                 )
                 if match:
                     matches.append(
@@ -11,6 +11,7 @@ Components:
 - code_generator: Claude-powered code generation
 - code_validator: AST-based security validation and compilation
 - sandbox_executor: Safe execution environment with resource limits
+- worker_pool: Pre-forked, rlimited worker processes that run the sandbox
 - network_controller: Network access validation and rate limiting
 - pattern_learner: Caching and learning from tool patterns
 - generator: Main orchestrator tying everything together
@@ -78,6 +79,13 @@ from app.services.dynamic_tools.sandbox_executor import (
     EXECUTION_TIMEOUT_S,
 )
 
+# Worker Pool
+from app.services.dynamic_tools.worker_pool import (
+    ToolWorkerPool,
+    get_tool_worker_pool,
+    close_tool_worker_pool,
+)
+
 # Network Controller
 from app.services.dynamic_tools.network_controller import (
     NetworkAccessController,
@@ -135,6 +143,11 @@ __all__ = [
     "MEMORY_LIMIT_MB",
     "EXECUTION_TIMEOUT_S",
 
+    # Worker Pool
+    "ToolWorkerPool",
+    "get_tool_worker_pool",
+    "close_tool_worker_pool",
+
     # Network Controller
     "NetworkAccessController",
     "get_network_controller",
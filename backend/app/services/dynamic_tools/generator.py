@@ -18,6 +18,7 @@ from app.services.dynamic_tools.templates import get_template_selector
 from app.services.dynamic_tools.code_generator import get_code_generator
 from app.services.dynamic_tools.code_validator import get_safe_compiler
 from app.services.dynamic_tools.sandbox_executor import get_sandboxed_executor
+from app.services.dynamic_tools.worker_pool import get_tool_worker_pool
 from app.services.dynamic_tools.pattern_learner import get_pattern_learner
 from app.services.dynamic_tools.network_controller import get_network_controller
 
@@ -54,6 +55,7 @@ class DynamicToolGenerator:
         self.code_generator = None
         self.safe_compiler = None
         self.sandboxed_executor = None
+        self.worker_pool = None
         self.pattern_learner = None
         self.network_controller = None
 
@@ -82,6 +84,8 @@ class DynamicToolGenerator:
             self.code_generator = await get_code_generator()
             self.safe_compiler = get_safe_compiler()
             self.sandboxed_executor = get_sandboxed_executor()
+            # Pre-forked sandbox workers; None means tools run in-process
+            self.worker_pool = await get_tool_worker_pool()
             self.pattern_learner = await get_pattern_learner()
             self.network_controller = get_network_controller()
 
@@ -269,8 +273,9 @@ class DynamicToolGenerator:
             }
 
         try:
-            # Execute the compiled code
-            result = await self.sandboxed_executor.execute_compiled_code(
+            # Execute the compiled code in a sandbox worker when the pool is up
+            executor = self.worker_pool or self.sandboxed_executor
+            result = await executor.execute_compiled_code(
                 compiled_code=tool_result["compiled_code"],
                 tool_name=tool_result["tool_name"],
                 user_id=user_id,
@@ -387,7 +392,8 @@ class DynamicToolGenerator:
             "is_initialized": self.is_initialized,
             "registered_tools": len(self.registered_tools),
             "pattern_learner_stats": self.pattern_learner.get_stats() if self.pattern_learner else {},
-            "executor_stats": self.sandboxed_executor.get_stats() if self.sandboxed_executor else {}
+            "executor_stats": self.sandboxed_executor.get_stats() if self.sandboxed_executor else {},
+            "worker_pool_stats": self.worker_pool.get_stats() if self.worker_pool else {}
         }
 
 
@@ -5,6 +5,7 @@ Security hardened to prevent sandbox escape via dunder attribute access.
 """
 import ast
 import asyncio
+import builtins
 import signal
 import time
 from typing import Dict, Any, Optional, Type, Set
@@ -584,6 +585,9 @@ class SandboxedExecutor:
             'True': True,
             'False': False,
             'None': None,
+            # Needed to define the tool class itself
+            '__build_class__': builtins.__build_class__,
+            'super': super,
             'abs': abs,
             'all': all,
             'any': any,
@@ -623,6 +627,7 @@ class SandboxedExecutor:
 
         return {
             '__builtins__': safe_builtins,
+            '__name__': 'dynamic_tool',
             # Allowed modules
             'aiohttp': aiohttp,
             'json': json,
@@ -0,0 +1,537 @@
+"""
+Dynamic Tool Worker Pool - Generated tools run in warm, resource-limited processes
+
+SandboxedExecutor on its own exec's generated code inside the serving process,
+so a CPU-heavy or runaway tool stalls the event loop and isolation rests on
+the AST checks alone. The pool keeps a few worker processes ready; each call
+sends the marshalled code object plus its inputs over a pipe and the worker
+runs it through its own SandboxedExecutor, so the restricted globals, AST
+rules and result conversion are unchanged.
+
+Workers are forked from a forkserver that has already imported this module
+(and with it the service layer), so starting or replacing a worker costs a
+fork rather than the multi-second import. (Before Python 3.12 the forkserver
+resolves those imports against the working directory, which is the backend
+root under uvicorn; elsewhere workers still start, just slower.) Code objects are marshalled once
+per code hash in the parent, and each worker keeps the unmarshalled code for
+the hashes it has seen; warm calls send only the hash.
+
+Inside a worker:
+- RLIMIT_DATA caps heap growth at MEMORY_LIMIT_MB above the worker's footprint
+- RLIMIT_CPU is re-armed for every call (SIGXCPU -> ExecutionTimeoutError)
+- RLIMIT_CORE is 0: no core dumps
+- an audit hook refuses process creation, file writes, unix sockets and
+  DNS for hosts outside the allowlist (the NetworkAccessController's
+  ALLOWED_APIS by default). Connections by IP are only allowed to public
+  addresses the worker has itself resolved for an allowlisted host, so the
+  only network a tool can reach is the vetted APIs. Denials are
+  PermissionErrors, which aiohttp surfaces to the tool as ordinary
+  connection errors
+
+The parent enforces wall-clock time: a worker that has not answered within
+the call timeout plus KILL_GRACE_S is killed and replaced.
+"""
+import asyncio
+import hashlib
+import ipaddress
+import marshal
+import math
+import multiprocessing
+import os
+import resource
+import signal
+import socket
+import sys
+import time
+from collections import OrderedDict
+from types import CodeType
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from app.core.logging import get_logger
+from app.services.dynamic_tools.models import ToolExecutionResult
+from app.services.dynamic_tools.network_controller import ALLOWED_APIS
+from app.services.dynamic_tools.sandbox_executor import (
+    EXECUTION_TIMEOUT_S,
+    MEMORY_LIMIT_MB,
+    SandboxedExecutor,
+    _timeout_handler,
+)
+
+logger = get_logger(__name__)
+
+
+# Extra wall-clock time before the parent kills an unresponsive worker
+KILL_GRACE_S = 1.0
+# The first worker waits for the forkserver to import the service layer
+WORKER_START_TIMEOUT_S = 60.0
+# Workers are replaced after this many calls to bound leaked state
+MAX_CALLS_PER_WORKER = 500
+# Code objects kept per worker and marshalled code kept in the parent
+CODE_CACHE_SIZE = 128
+
+_BLOCKED_EVENTS = frozenset({
+    "os.system",
+    "os.exec",
+    "os.posix_spawn",
+    "os.spawn",
+    "os.fork",
+    "os.forkpty",
+    "os.kill",
+    "os.killpg",
+    "subprocess.Popen",
+    "ctypes.dlopen",
+    "ctypes.dlsym",
+    "socket.bind",
+})
+_WRITE_FLAGS = os.O_WRONLY | os.O_RDWR | os.O_APPEND | os.O_CREAT | os.O_TRUNC
+
+
+def _default_workers() -> int:
+    configured = os.environ.get("DYNAMIC_TOOL_WORKERS")
+    if configured:
+        return max(0, int(configured))
+    return max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+def code_fingerprint(code_bytes: bytes) -> str:
+    return hashlib.sha256(code_bytes).hexdigest()[:32]
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+def _vm_data_bytes() -> int:
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmData:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _apply_limits(memory_limit_mb: int) -> None:
+    limit = _vm_data_bytes() + memory_limit_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_DATA, (limit, limit))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+
+def _cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _arm_cpu_limit(seconds: float) -> None:
+    hard = resource.getrlimit(resource.RLIMIT_CPU)[1]
+    resource.setrlimit(resource.RLIMIT_CPU, (int(_cpu_seconds() + math.ceil(seconds)) + 1, hard))
+
+
+def _disarm_cpu_limit() -> None:
+    hard = resource.getrlimit(resource.RLIMIT_CPU)[1]
+    resource.setrlimit(resource.RLIMIT_CPU, (hard, hard))
+
+
+def _host_name(host: Any) -> str:
+    if isinstance(host, bytes):
+        host = host.decode("idna", "replace")
+    return (host or "").lower().rstrip(".")
+
+
+def _ip_key(address: Any) -> Optional[str]:
+    try:
+        return str(ipaddress.ip_address(address))
+    except ValueError:
+        return None
+
+
+def _record_resolved(resolved: Set[str]) -> None:
+    """
+    Wrap socket.getaddrinfo so the addresses it returns are added to
+    resolved. The audit hook has already refused lookups of hosts outside
+    the allowlist, so only allowlisted hosts' addresses are recorded.
+    """
+    getaddrinfo = socket.getaddrinfo
+
+    def recording_getaddrinfo(*args, **kwargs):
+        infos = getaddrinfo(*args, **kwargs)
+        for info in infos:
+            key = _ip_key(info[4][0])
+            if key:
+                resolved.add(key)
+        return infos
+
+    socket.getaddrinfo = recording_getaddrinfo
+
+
+def _sandbox_audit_hook(allowed_hosts: Set[str], resolved: Set[str]):
+    def hook(event: str, args: Tuple[Any, ...]) -> None:
+        if event in _BLOCKED_EVENTS:
+            raise PermissionError(f"'{event}' is forbidden in sandbox")
+        if event == "open":
+            mode, flags = args[1], args[2]
+            if (isinstance(mode, str) and any(c in mode for c in "wax+")) or (flags or 0) & _WRITE_FLAGS:
+                raise PermissionError("Writing files is forbidden in sandbox")
+        elif event in ("socket.getaddrinfo", "socket.gethostbyname", "socket.gethostbyname_ex"):
+            host = _host_name(args[0])
+            if host not in allowed_hosts:
+                raise PermissionError(f"Network access to '{host}' is forbidden in sandbox")
+        elif event == "socket.connect":
+            address = args[1]
+            if not isinstance(address, tuple):
+                raise PermissionError("Local sockets are forbidden in sandbox")
+            key = _ip_key(address[0])
+            if key is None:
+                allowed = _host_name(address[0]) in allowed_hosts
+            else:
+                allowed = key in resolved and ipaddress.ip_address(key).is_global
+            if not allowed:
+                raise PermissionError(f"Connection to '{address[0]}' is forbidden in sandbox")
+    return hook
+
+
+def _worker_main(conn, memory_limit_mb: int, allowed_hosts: Tuple[str, ...]) -> None:
+    """Worker loop: (hash, code bytes or None, tool, user, params, timeout) -> reply"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGXCPU, _timeout_handler)
+    sys.dont_write_bytecode = True
+    executor = SandboxedExecutor()
+    # Import everything tools are given before the audit hook goes in
+    executor._create_restricted_globals()
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    codes: "OrderedDict[str, CodeType]" = OrderedDict()
+
+    _apply_limits(memory_limit_mb)
+    resolved: Set[str] = set()
+    _record_resolved(resolved)
+    sys.addaudithook(_sandbox_audit_hook({_host_name(h) for h in allowed_hosts}, resolved))
+    conn.send(("ready", os.getpid()))
+
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            break
+        if request is None:
+            break
+
+        code_hash, code_bytes, tool_name, user_id, parameters, timeout = request
+        code = codes.get(code_hash)
+        if code is None:
+            if code_bytes is None:
+                conn.send(("missing", None))
+                continue
+            code = codes[code_hash] = marshal.loads(code_bytes)
+            while len(codes) > CODE_CACHE_SIZE:
+                codes.popitem(last=False)
+        else:
+            codes.move_to_end(code_hash)
+
+        _arm_cpu_limit(timeout)
+        try:
+            result = loop.run_until_complete(executor.execute_compiled_code(
+                compiled_code=code,
+                tool_name=tool_name,
+                user_id=user_id,
+                parameters=parameters,
+                timeout=timeout
+            ))
+        except BaseException as e:
+            # SIGXCPU or MemoryError outside the executor's own handlers
+            result = ToolExecutionResult(
+                success=False,
+                tool_name=tool_name,
+                error=f"Execution error: {e}",
+                metadata={"exception_type": type(e).__name__}
+            )
+        finally:
+            _disarm_cpu_limit()
+
+        payload = result.model_dump()
+        try:
+            conn.send(("done", payload))
+        except Exception as e:
+            # Tool returned data that cannot cross the pipe
+            conn.send(("done", {**payload, "success": False, "data": None,
+                                "error": f"Tool result is not serializable: {e}"}))
+
+
+# ---------------------------------------------------------------------------
+# Parent side
+# ---------------------------------------------------------------------------
+
+class _Worker:
+    __slots__ = ("process", "conn", "calls")
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.calls = 0
+
+
+class ToolWorkerPool:
+    """
+    Pool of pre-forked sandbox workers.
+
+    execute_compiled_code has the same signature and result type as
+    SandboxedExecutor.execute_compiled_code. Calls beyond the pool size
+    wait for a free worker.
+    """
+
+    def __init__(
+        self,
+        size: Optional[int] = None,
+        memory_limit_mb: int = MEMORY_LIMIT_MB,
+        allowed_hosts: Optional[Iterable[str]] = None,
+        max_calls_per_worker: int = MAX_CALLS_PER_WORKER,
+        default_timeout: float = EXECUTION_TIMEOUT_S
+    ):
+        self.logger = get_logger(__name__)
+        self.size = size if size is not None else _default_workers()
+        self.memory_limit_mb = memory_limit_mb
+        self.allowed_hosts = tuple(ALLOWED_APIS if allowed_hosts is None else allowed_hosts)
+        self.max_calls_per_worker = max_calls_per_worker
+        self.default_timeout = default_timeout
+        self._context = multiprocessing.get_context("forkserver")
+        # aiohttp is the one heavy import the tool globals add on top of this module
+        self._context.set_forkserver_preload([__name__, "aiohttp"])
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: Set[_Worker] = set()
+        self._known: Dict[_Worker, Set[str]] = {}
+        self._code_cache: "OrderedDict[CodeType, Tuple[str, bytes]]" = OrderedDict()
+        self._closed = False
+        self._replacements: Set[asyncio.Task] = set()
+        self.stats = {
+            "calls": 0,
+            "code_transfers": 0,
+            "timeouts_killed": 0,
+            "worker_crashes": 0,
+            "workers_started": 0,
+        }
+
+    async def start(self) -> None:
+        """Fork the workers (the first start also boots the forkserver)"""
+        self._idle = asyncio.Queue()
+        for _ in range(self.size):
+            self._idle.put_nowait(await asyncio.to_thread(self._spawn))
+        self.logger.info(
+            "Dynamic tool worker pool started",
+            extra={"workers": self.size, "allowed_hosts": len(self.allowed_hosts)}
+        )
+
+    def _spawn(self) -> _Worker:
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.memory_limit_mb, self.allowed_hosts),
+            name="dynamic-tool-worker",
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        if not parent_conn.poll(WORKER_START_TIMEOUT_S):
+            process.kill()
+            raise RuntimeError("Dynamic tool worker did not start")
+        parent_conn.recv()
+        worker = _Worker(process, parent_conn)
+        self._workers.add(worker)
+        self._known[worker] = set()
+        self.stats["workers_started"] += 1
+        return worker
+
+    def _retire(self, worker: _Worker, kill: bool = False) -> None:
+        self._workers.discard(worker)
+        self._known.pop(worker, None)
+        try:
+            if kill:
+                worker.process.kill()
+            else:
+                worker.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        worker.conn.close()
+        worker.process.join(timeout=1)
+        if worker.process.is_alive():
+            worker.process.kill()
+            worker.process.join()
+
+    def _marshalled(self, code: CodeType) -> Tuple[str, bytes]:
+        entry = self._code_cache.get(code)
+        if entry is None:
+            code_bytes = marshal.dumps(code)
+            entry = self._code_cache[code] = (code_fingerprint(code_bytes), code_bytes)
+            while len(self._code_cache) > CODE_CACHE_SIZE:
+                self._code_cache.popitem(last=False)
+        else:
+            self._code_cache.move_to_end(code)
+        return entry
+
+    async def _reply(self, worker: _Worker, timeout: float):
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        fd = worker.conn.fileno()
+        loop.add_reader(fd, lambda: ready.done() or ready.set_result(None))
+        try:
+            await asyncio.wait_for(ready, timeout)
+        finally:
+            loop.remove_reader(fd)
+        return worker.conn.recv()
+
+    async def _call(self, worker: _Worker, code: CodeType, request: Tuple, wait: float):
+        code_hash, code_bytes = self._marshalled(code)
+        known = self._known[worker]
+        send_code = code_hash not in known
+        worker.conn.send((code_hash, code_bytes if send_code else None, *request))
+        status, payload = await self._reply(worker, wait)
+        if status == "missing":
+            # The worker evicted this code since we last sent it
+            send_code = True
+            worker.conn.send((code_hash, code_bytes, *request))
+            status, payload = await self._reply(worker, wait)
+        if send_code:
+            self.stats["code_transfers"] += 1
+            known.add(code_hash)
+            if len(known) > CODE_CACHE_SIZE:
+                known.clear()
+        return payload
+
+    async def execute_compiled_code(
+        self,
+        compiled_code: Any,
+        tool_name: str,
+        user_id: str,
+        parameters: Dict[str, Any],
+        timeout: Optional[float] = None
+    ) -> ToolExecutionResult:
+        """Run pre-compiled tool code in a worker, killing it past the timeout"""
+        if self._idle is None or self._closed:
+            raise RuntimeError("Tool worker pool is not running")
+
+        execution_timeout = timeout or self.default_timeout
+        worker = await self._idle.get()
+        start_time = time.time()
+        recycle = kill = False
+        self.stats["calls"] += 1
+        try:
+            payload = await self._call(
+                worker, compiled_code,
+                (tool_name, user_id, parameters, execution_timeout),
+                execution_timeout + KILL_GRACE_S
+            )
+            worker.calls += 1
+            recycle = worker.calls >= self.max_calls_per_worker
+            payload.setdefault("metadata", {})["worker_pid"] = worker.process.pid
+            return ToolExecutionResult(**payload)
+
+        except asyncio.TimeoutError:
+            self.stats["timeouts_killed"] += 1
+            recycle = kill = True
+            self.logger.error(
+                "Dynamic tool worker killed after wall-clock timeout",
+                extra={"tool_name": tool_name, "timeout": execution_timeout, "pid": worker.process.pid}
+            )
+            return ToolExecutionResult(
+                success=False,
+                tool_name=tool_name,
+                error=f"Execution timed out after {execution_timeout} seconds",
+                execution_time_ms=(time.time() - start_time) * 1000,
+                metadata={"user_id": user_id, "timeout_exceeded": True, "worker_killed": True}
+            )
+
+        except (EOFError, OSError) as e:
+            # Worker died mid-call (rlimit kill, OOM killer, crash in C code)
+            self.stats["worker_crashes"] += 1
+            recycle = kill = True
+            self.logger.error(
+                "Dynamic tool worker exited during execution",
+                extra={"tool_name": tool_name, "exitcode": worker.process.exitcode, "error": str(e)}
+            )
+            return ToolExecutionResult(
+                success=False,
+                tool_name=tool_name,
+                error="Tool worker exited during execution",
+                execution_time_ms=(time.time() - start_time) * 1000,
+                metadata={"user_id": user_id, "exitcode": worker.process.exitcode}
+            )
+
+        except BaseException:
+            # Caller cancelled mid-call: the worker may still answer this request,
+            # and that reply must never reach the next caller
+            recycle = kill = True
+            raise
+
+        finally:
+            if recycle and not self._closed:
+                # Replace in the background so this caller isn't charged for the fork
+                task = asyncio.create_task(self._replace(worker, kill))
+                self._replacements.add(task)
+                task.add_done_callback(self._replacements.discard)
+            elif not self._closed:
+                self._idle.put_nowait(worker)
+
+    async def _replace(self, worker: _Worker, kill: bool) -> None:
+        await asyncio.to_thread(self._retire, worker, kill)
+        while not self._closed:
+            try:
+                self._idle.put_nowait(await asyncio.to_thread(self._spawn))
+                return
+            except Exception as e:
+                self.logger.error(f"Failed to replace dynamic tool worker: {e}")
+                await asyncio.sleep(1)
+
+    async def close(self) -> None:
+        """Stop all workers (the forkserver exits with the parent)"""
+        self._closed = True
+        for task in list(self._replacements):
+            task.cancel()
+        for worker in list(self._workers):
+            await asyncio.to_thread(self._retire, worker)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "workers": len(self._workers),
+            "idle_workers": self._idle.qsize() if self._idle else 0,
+            "memory_limit_mb": self.memory_limit_mb,
+            "max_calls_per_worker": self.max_calls_per_worker,
+        }
+
+
+_pool: Optional[ToolWorkerPool] = None
+_pool_lock: Optional[asyncio.Lock] = None
+
+
+async def get_tool_worker_pool() -> Optional[ToolWorkerPool]:
+    """
+    Shared pool, started on first use. None when disabled
+    (DYNAMIC_TOOL_WORKERS=0) or when worker processes cannot be started here,
+    in which case callers run tools in-process with SandboxedExecutor.
+    """
+    global _pool, _pool_lock
+    if _pool is not None:
+        return _pool
+    if _pool_lock is None:
+        _pool_lock = asyncio.Lock()
+    async with _pool_lock:
+        if _pool is None:
+            pool = ToolWorkerPool()
+            if pool.size == 0:
+                return None
+            try:
+                await pool.start()
+            except Exception as e:
+                logger.warning(f"Dynamic tool worker pool unavailable, running tools in-process: {e}")
+                await pool.close()
+                return None
+            _pool = pool
+    return _pool
+
+
+async def close_tool_worker_pool() -> None:
+    """Stop the shared pool (called on application shutdown)"""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
@@ -20,10 +20,12 @@ Date: January 2026
 
 import os
 import logging
-import aiohttp
+import httpx
 from typing import Any, Dict, List, Optional
 from dataclasses import dataclass
 
+from app.core.http_clients import get_http_client
+
 logger = logging.getLogger(__name__)
 
 # RapidAPI configuration
@@ -87,72 +89,71 @@ async def search_products(
             "limit": str(max_results)
         }
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{BASE_URL}/search",
-                headers=headers,
-                params=params,
-                timeout=aiohttp.ClientTimeout(total=30)
-            ) as response:
-                if response.status == 200:
-                    data = await response.json()
-
-                    # Parse and standardize results
-                    products = []
-                    for item in data.get("data", []):
-                        try:
-                            price = _parse_price(item.get("offer", {}).get("price", "0"))
-
-                            # Apply price filters
-                            if min_price and price < min_price:
-                                continue
-                            if max_price and price > max_price:
-                                continue
-
-                            product = ProductResult(
-                                title=item.get("product_title", "Unknown"),
-                                price=price,
-                                currency=_get_currency(country),
-                                store=item.get("offer", {}).get("store_name", "Unknown"),
-                                url=item.get("offer", {}).get("offer_page_url", ""),
-                                image_url=item.get("product_photos", [""])[0] if item.get("product_photos") else None,
-                                rating=item.get("product_rating"),
-                                reviews_count=item.get("product_num_reviews"),
-                                in_stock=item.get("offer", {}).get("in_stock", True)
-                            )
-                            products.append(product)
-                        except Exception as e:
-                            logger.debug(f"Error parsing product: {e}")
-                            continue
-
-                    logger.info(f"RapidAPI search for '{query}' returned {len(products)} products")
-
-                    return {
-                        "success": True,
-                        "query": query,
-                        "country": country,
-                        "products_found": len(products),
-                        "products": [_product_to_dict(p) for p in products]
-                    }
-
-                elif response.status == 429:
-                    logger.warning("RapidAPI rate limit exceeded")
-                    return {
-                        "success": False,
-                        "error": "Rate limit exceeded. Try again later.",
-                        "products": []
-                    }
-
-                else:
-                    error_text = await response.text()
-                    logger.error(f"RapidAPI error {response.status}: {error_text}")
-                    return {
-                        "success": False,
-                        "error": f"API error: {response.status}",
-                        "products": []
-                    }
-
-    except aiohttp.ClientError as e:
+        response = await get_http_client("rapidapi").get(
+            f"{BASE_URL}/search",
+            headers=headers,
+            params=params,
+        )
+
+        if response.status_code == 200:
+            data = response.json()
+
+            # Parse and standardize results
+            products = []
+            for item in data.get("data", []):
+                try:
+                    price = _parse_price(item.get("offer", {}).get("price", "0"))
+
+                    # Apply price filters
+                    if min_price and price < min_price:
+                        continue
+                    if max_price and price > max_price:
+                        continue
+
+                    product = ProductResult(
+                        title=item.get("product_title", "Unknown"),
+                        price=price,
+                        currency=_get_currency(country),
+                        store=item.get("offer", {}).get("store_name", "Unknown"),
+                        url=item.get("offer", {}).get("offer_page_url", ""),
+                        image_url=item.get("product_photos", [""])[0] if item.get("product_photos") else None,
+                        rating=item.get("product_rating"),
+                        reviews_count=item.get("product_num_reviews"),
+                        in_stock=item.get("offer", {}).get("in_stock", True)
+                    )
+                    products.append(product)
+                except Exception as e:
+                    logger.debug(f"Error parsing product: {e}")
+                    continue
+
+            logger.info(f"RapidAPI search for '{query}' returned {len(products)} products")
+
+            return {
+                "success": True,
+                "query": query,
+                "country": country,
+                "products_found": len(products),
+                "products": [_product_to_dict(p) for p in products]
+            }
+
+        elif response.status_code == 429:
+            logger.warning("RapidAPI rate limit exceeded")
+            return {
+                "success": False,
+                "error": "Rate limit exceeded. Try again later.",
+                "products": []
+            }
+
+        else:
+            error_text = response.text
+            logger.error(f"RapidAPI error {response.status_code}: {error_text}")
+            return {
+                "success": False,
+                "error": f"API error: {response.status_code}",
+                "products": []
+            }
+
+    except httpx.RequestError as e:
         logger.error(f"RapidAPI connection error: {e}")
         return {
             "success": False,
@@ -45,7 +45,13 @@ from .schemas import (
 )
 
 from .browser_engine import BrowserEngine, shutdown_browser_pool
-from .browser_pool import BrowserPool, get_browser_pool, close_browser_pool
+from .browser_pool import (
+    BrowserPool,
+    get_browser_pool,
+    close_browser_pool,
+    PRIORITY_INTERACTIVE,
+    PRIORITY_BACKGROUND,
+)
 from .dom_analyzer import DOMAnalyzer
 from .content_classifier import ContentClassifier
 from .semantic_extractor import SemanticExtractor
@@ -82,6 +88,8 @@ __all__ = [
     "BrowserPool",
     "get_browser_pool",
     "close_browser_pool",
+    "PRIORITY_INTERACTIVE",
+    "PRIORITY_BACKGROUND",
     "shutdown_browser_pool",
     "DOMAnalyzer",
     "ContentClassifier",
@@ -147,7 +147,8 @@ class BrowserEngine:
         url: str,
         wait_for_network_idle: bool = True,
         timeout_ms: int = 30000,
-        take_screenshot: bool = False
+        take_screenshot: bool = False,
+        user_id: Optional[str] = None
     ) -> PageState:
         """
         Capture complete page state including HTML and accessibility snapshot
@@ -157,6 +158,7 @@ class BrowserEngine:
             wait_for_network_idle: Wait for network to be idle
             timeout_ms: Navigation timeout in milliseconds
             take_screenshot: Whether to capture a screenshot
+            user_id: Requesting user, for fair queuing in the browser pool
 
         Returns:
             PageState with rendered HTML, accessibility snapshot, and metadata
@@ -178,7 +180,7 @@ class BrowserEngine:
 
         if self._use_pool:
             return await self._capture_page_state_with_pool(
-                url, wait_for_network_idle, timeout_ms, take_screenshot
+                url, wait_for_network_idle, timeout_ms, take_screenshot, user_id
             )
         else:
             return await self._capture_page_state_legacy(
@@ -190,32 +192,20 @@ class BrowserEngine:
         url: str,
         wait_for_network_idle: bool,
         timeout_ms: int,
-        take_screenshot: bool
+        take_screenshot: bool,
+        user_id: Optional[str] = None
     ) -> PageState:
-        """Capture page state using browser pool for improved performance."""
+        """Capture page state using a warm, reset context from the browser pool."""
         pool = await get_browser_pool()
         start_time = datetime.utcnow()
 
-        async with pool.acquire() as browser:
-            # Create a fresh context for isolation
-            context = await browser.new_context(
-                viewport={"width": 1920, "height": 1080},
-                user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+        # Screenshots need the page as rendered; text extraction doesn't
+        async with pool.page(user_id=user_id, block_resources=not take_screenshot) as page:
+            return await self._do_capture_page_state(
+                page, url, wait_for_network_idle, timeout_ms,
+                take_screenshot, start_time
             )
 
-            try:
-                page = await context.new_page()
-
-                try:
-                    return await self._do_capture_page_state(
-                        page, url, wait_for_network_idle, timeout_ms,
-                        take_screenshot, start_time
-                    )
-                finally:
-                    await page.close()
-            finally:
-                await context.close()
-
     async def _capture_page_state_legacy(
         self,
         url: str,
@@ -575,7 +565,9 @@ class BrowserEngine:
                     "pool_size": pool_health.get("pool_size", 0),
                     "created_count": pool_health.get("created_count", 0),
                     "max_browsers": pool_health.get("max_browsers", 0),
-                    "utilization": pool_health.get("utilization", "0/0")
+                    "utilization": pool_health.get("utilization", "0/0"),
+                    "waiting": pool_health.get("waiting", 0),
+                    "fleet_rss_mb": pool_health.get("fleet_rss_mb", 0.0)
                 }
             else:
                 # Legacy mode health check
@@ -1,14 +1,36 @@
 """
-Browser Instance Pool for Site-Agnostic Data Extraction
-Manages a pool of reusable Playwright browser instances to avoid the overhead
-of creating new browser instances per request.
+Browser Fleet for Site-Agnostic Data Extraction
+Manages a fleet of Playwright browsers and reusable browser contexts so that
+extractions neither launch a browser nor build a fresh context per request.
+
+- Pages are leased from warm contexts; on release the context is reset and
+  handed to the next request. Every origin the lease sent a request to has
+  all of its storage cleared over CDP (local storage, IndexedDB, Cache
+  Storage, service workers, cookies...), then pages are closed and cookies
+  and permissions cleared. A context that can't be cleared is closed
+  instead. A context is retired after CONTEXT_MAX_USES.
+- Browsers are launched on demand up to max_browsers, and only while the
+  fleet's measured RSS leaves room for another one. A browser is drained and
+  replaced once its RSS passes BROWSER_MAX_RSS_MB or it has served
+  BROWSER_MAX_NAVIGATIONS navigations; idle extra browsers are closed.
+- Images, fonts and media are aborted at the context's route by default,
+  which cuts page weight and network-idle waits for text extraction.
+- When every context slot is busy, requests wait in a priority queue that is
+  fair across users: within a priority, users are served round-robin rather
+  than in arrival order, so one user's batch can't starve another's request.
 """
 
 import asyncio
+import heapq
+import itertools
+import os
+import time
 from contextlib import asynccontextmanager
-from typing import Optional, Dict, Any, TYPE_CHECKING
+from typing import Optional, Dict, Any, List, Set, Tuple, TYPE_CHECKING
+from urllib.parse import urlsplit
 
 from app.core.logging import get_logger
+from .exceptions import BrowserInitializationError
 
 logger = get_logger(__name__)
 
@@ -21,52 +43,188 @@ except ImportError:
     async_playwright = None
     logger.warning("Playwright not installed - browser pool will be unavailable")
 
+# psutil is only needed for memory-aware recycling
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    psutil = None
+    PSUTIL_AVAILABLE = False
+
 # Type hints for when Playwright is not installed
 if TYPE_CHECKING:
-    from playwright.async_api import Browser, Playwright
+    from playwright.async_api import BrowserContext, Route
 
 
-class BrowserPool:
+CONTEXTS_PER_BROWSER = 4
+CONTEXT_MAX_USES = 25
+BROWSER_MAX_NAVIGATIONS = 300
+BROWSER_MAX_RSS_MB = 800
+# Assumed footprint of a browser that hasn't been measured yet
+DEFAULT_BROWSER_RSS_MB = 250
+FLEET_MEMORY_BUDGET_MB = int(os.environ.get("BROWSER_POOL_MEMORY_MB", "3072"))
+IDLE_BROWSER_TTL_S = 300
+RSS_SAMPLE_INTERVAL_S = 2.0
+
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+LAUNCH_ARGS = [
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--disable-setuid-sandbox",
+    "--no-sandbox",
+    "--disable-web-security",
+    "--single-process",  # Better for container environments
+]
+
+CONTEXT_OPTIONS = {
+    "viewport": {"width": 1920, "height": 1080},
+    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+}
+
+# Storage.clearDataForOrigin storage types; "all" includes service workers and Cache Storage
+CLEARED_STORAGE_TYPES = "all"
+
+
+class FairRequestQueue:
+    """
+    Waiting requests ordered by priority, then start-time fair queuing.
+
+    Each user's requests get consecutive tags starting no earlier than the
+    tag currently being served, so within one priority level users take
+    turns regardless of how many requests each has queued.
     """
-    Pool of reusable browser instances for improved performance.
 
-    Instead of creating a new browser for each request (slow, resource-intensive),
-    this pool maintains a set of pre-initialized browser instances that can be
-    acquired and released efficiently.
+    def __init__(self):
+        self._heap: List[Tuple[int, int, int, str, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._virtual_time = 0
+        self._last_tag: Dict[str, int] = {}
+
+    def push(self, priority: int, user_key: str) -> asyncio.Future:
+        tag = max(self._virtual_time, self._last_tag.get(user_key, 0)) + 1
+        self._last_tag[user_key] = tag
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._heap, (priority, tag, next(self._seq), user_key, future))
+        return future
+
+    def pop(self) -> Optional[asyncio.Future]:
+        """Next waiter that is still waiting, or None"""
+        while self._heap:
+            _, tag, _, user_key, future = heapq.heappop(self._heap)
+            self._virtual_time = max(self._virtual_time, tag)
+            if self._last_tag.get(user_key) == tag:
+                del self._last_tag[user_key]
+            if not future.done():
+                return future
+        return None
+
+    def __len__(self) -> int:
+        return sum(1 for entry in self._heap if not entry[-1].done())
+
+
+class _BrowserSlot:
+    """A launched (or launching) browser and its bookkeeping"""
+
+    def __init__(self):
+        self.browser: Optional["Browser"] = None
+        self.ready = asyncio.Event()
+        self.launch_error: Optional[BaseException] = None
+        self.pids: Set[int] = set()
+        self.idle_contexts: List["_ContextSlot"] = []
+        self.leased = 0
+        self.navigations = 0
+        self.rss_bytes = 0
+        self.rss_sampled_at = 0.0
+        self.draining = False
+        self.closed = False
+        self.last_released = time.monotonic()
+
+
+class _ContextSlot:
+    """A reusable context; block_resources is read by its route handler"""
+
+    def __init__(self, browser_slot: _BrowserSlot):
+        self.browser_slot = browser_slot
+        self.context: Optional["BrowserContext"] = None
+        self.uses = 0
+        self.block_resources = True
+        # Origins requested during the current lease, whose storage is cleared on release
+        self.origins: Set[str] = set()
 
-    Features:
-    - Queue-based pool with configurable max size
-    - Async context manager for safe acquisition/release
-    - Graceful handling of crashed browsers
-    - Thread-safe operations with asyncio.Lock
+
+class BrowserPool:
+    """
+    Fleet of reusable browsers and contexts for improved performance.
 
     Usage:
         pool = BrowserPool(max_browsers=5)
         await pool.initialize()
 
-        async with pool.acquire() as browser:
-            context = await browser.new_context()
-            page = await context.new_page()
+        async with pool.page(user_id=user_id) as page:
+            await page.goto(url)
             # Use page...
-            await context.close()
 
         await pool.close()
+
+    acquire() still yields a bare Browser for callers that manage their own
+    contexts; it takes a slot on that browser like a page lease does.
     """
 
-    def __init__(self, max_browsers: int = 5):
+    def __init__(
+        self,
+        max_browsers: int = 5,
+        contexts_per_browser: int = CONTEXTS_PER_BROWSER,
+        memory_budget_mb: int = FLEET_MEMORY_BUDGET_MB,
+        browser_max_rss_mb: int = BROWSER_MAX_RSS_MB,
+        browser_max_navigations: int = BROWSER_MAX_NAVIGATIONS,
+        context_max_uses: int = CONTEXT_MAX_USES,
+        launch_options: Optional[Dict[str, Any]] = None
+    ):
         """
         Initialize the browser pool.
 
         Args:
-            max_browsers: Maximum number of browser instances in the pool
+            max_browsers: Maximum number of browser instances in the fleet
+            contexts_per_browser: Concurrent leases served by one browser
+            memory_budget_mb: No new browser is launched past this fleet RSS
+            browser_max_rss_mb: A browser above this RSS is recycled
+            browser_max_navigations: A browser is recycled after this many navigations
+            context_max_uses: A context is closed after this many leases
+            launch_options: Extra chromium.launch() options (e.g. executable_path)
         """
         self._max_browsers = max_browsers
-        self._pool: asyncio.Queue = asyncio.Queue(maxsize=max_browsers)
-        self._created_count = 0
+        self._contexts_per_browser = contexts_per_browser
+        self._memory_budget = memory_budget_mb * 1024 * 1024
+        self._browser_max_rss = browser_max_rss_mb * 1024 * 1024
+        self._browser_max_navigations = browser_max_navigations
+        self._context_max_uses = context_max_uses
+        self._launch_options = {"headless": True, "args": LAUNCH_ARGS, **(launch_options or {})}
+        self._browsers: List[_BrowserSlot] = []
+        self._waiters = FairRequestQueue()
         self._lock = asyncio.Lock()
+        self._launch_lock = asyncio.Lock()
+        self._background: Set[asyncio.Task] = set()
         self._playwright: Optional["Playwright"] = None
         self._initialized = False
         self._closing = False
+        self.stats = {
+            "leases": 0,
+            "queued": 0,
+            "max_queue_depth": 0,
+            "contexts_created": 0,
+            "contexts_reused": 0,
+            "browsers_launched": 0,
+            "recycled_rss": 0,
+            "recycled_navigations": 0,
+            "recycled_idle": 0,
+            "recycled_crashed": 0,
+            "blocked_requests": 0,
+            "peak_fleet_rss_mb": 0.0,
+        }
 
         logger.info(f"BrowserPool created with max_browsers={max_browsers}")
 
@@ -93,62 +251,47 @@ class BrowserPool:
             self._initialized = True
             logger.info("Playwright runtime initialized successfully")
 
-    async def _create_browser(self) -> "Browser":
-        """
-        Create a new browser instance with optimized settings.
-
-        Returns:
-            New Playwright Browser instance
-        """
-        if not self._playwright:
-            raise RuntimeError("BrowserPool not initialized. Call initialize() first.")
-
-        logger.info(f"Creating new browser instance (current count: {self._created_count})")
-
-        browser = await self._playwright.chromium.launch(
-            headless=True,
-            args=[
-                "--disable-gpu",
-                "--disable-dev-shm-usage",
-                "--disable-setuid-sandbox",
-                "--no-sandbox",
-                "--disable-web-security",
-                "--single-process",  # Better for container environments
-            ]
-        )
-
-        self._created_count += 1
-        logger.info(f"Browser instance created successfully (total: {self._created_count})")
-
-        return browser
+    # ------------------------------------------------------------------
+    # Leasing
+    # ------------------------------------------------------------------
 
-    def _is_browser_healthy(self, browser: "Browser") -> bool:
+    @asynccontextmanager
+    async def page(
+        self,
+        user_id: Optional[str] = None,
+        priority: int = PRIORITY_INTERACTIVE,
+        block_resources: bool = True
+    ):
         """
-        Check if a browser instance is still usable.
+        Lease a fresh page in a warm context.
 
         Args:
-            browser: Browser instance to check
+            user_id: Requesting user, for fair queuing (None shares one lane)
+            priority: Lower is served first (PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND)
+            block_resources: Abort image, font and media requests
 
-        Returns:
-            True if browser is connected and healthy
+        Yields:
+            Page ready for navigation; closed and its context reset on exit
         """
+        slot = await self._lease(user_id, priority)
+        context_slot: Optional[_ContextSlot] = None
         try:
-            return browser.is_connected()
-        except Exception as e:
-            logger.warning(f"Browser health check failed: {e}")
-            return False
+            context_slot = await self._checkout_context(slot)
+            context_slot.block_resources = block_resources
+            page = await context_slot.context.new_page()
+            page.on("framenavigated", lambda frame: self._count_navigation(slot, frame))
+            yield page
+        finally:
+            await self._release(slot, context_slot)
 
     @asynccontextmanager
-    async def acquire(self):
+    async def acquire(
+        self,
+        user_id: Optional[str] = None,
+        priority: int = PRIORITY_INTERACTIVE
+    ):
         """
-        Acquire a browser from the pool.
-
-        This is an async context manager that:
-        1. Tries to get an existing browser from the pool (non-blocking)
-        2. If pool is empty and under limit, creates a new browser
-        3. If at limit, waits for an available browser
-        4. Returns the browser to the pool when done (in finally block)
-        5. Discards crashed browsers instead of returning them
+        Acquire a browser from the pool; the caller manages its own contexts.
 
         Usage:
             async with pool.acquire() as browser:
@@ -158,128 +301,285 @@ class BrowserPool:
         Yields:
             Browser instance ready for use
         """
+        slot = await self._lease(user_id, priority)
+        try:
+            yield slot.browser
+        finally:
+            await self._release(slot, None)
+
+    async def _lease(self, user_id: Optional[str], priority: int) -> _BrowserSlot:
         if not self._initialized:
             await self.initialize()
 
         if self._closing:
             raise RuntimeError("BrowserPool is closing, cannot acquire new browsers")
 
-        browser: Optional["Browser"] = None
-        browser_acquired_from_pool = False
-
-        try:
-            # Try to get browser from pool (non-blocking)
+        self.stats["leases"] += 1
+        # Nobody jumps the queue: with waiters present, join it and dispatch in order
+        slot = self._grant() if not len(self._waiters) else None
+        if slot is None:
+            waiter = self._waiters.push(priority, user_id or "")
+            self.stats["queued"] += 1
+            self.stats["max_queue_depth"] = max(self.stats["max_queue_depth"], len(self._waiters))
+            self._dispatch()
             try:
-                browser = self._pool.get_nowait()
-                browser_acquired_from_pool = True
-                logger.debug(f"Acquired browser from pool (pool size: {self._pool.qsize()})")
-
-                # Verify browser is still healthy
-                if not self._is_browser_healthy(browser):
-                    logger.warning("Acquired browser is unhealthy, creating new one")
-                    async with self._lock:
-                        self._created_count -= 1
-                    try:
-                        await browser.close()
-                    except Exception:
-                        pass
-                    browser = None
-                    browser_acquired_from_pool = False
-
-            except asyncio.QueueEmpty:
-                pass
-
-            # If no browser from pool, try to create new one
-            if browser is None:
-                async with self._lock:
-                    if self._created_count < self._max_browsers:
-                        browser = await self._create_browser()
-                    else:
-                        # At limit, must wait for available browser
-                        logger.info(
-                            f"Pool at capacity ({self._created_count}/{self._max_browsers}), "
-                            "waiting for available browser"
-                        )
-
-            # If still no browser, wait for one from pool
-            if browser is None:
-                browser = await self._pool.get()
-                browser_acquired_from_pool = True
-                logger.debug(f"Acquired browser after waiting (pool size: {self._pool.qsize()})")
-
-                # Verify browser is still healthy
-                if not self._is_browser_healthy(browser):
-                    logger.warning("Waited browser is unhealthy, creating new one")
-                    async with self._lock:
-                        self._created_count -= 1
-                    try:
-                        await browser.close()
-                    except Exception:
-                        pass
-                    browser = await self._create_browser()
-                    browser_acquired_from_pool = False
-
-            yield browser
+                slot = await waiter
+            except asyncio.CancelledError:
+                # Granted and cancelled at the same time: hand the slot back
+                if waiter.done() and not waiter.cancelled():
+                    await self._release(waiter.result(), None)
+                raise
+
+        await slot.ready.wait()
+        if slot.launch_error is not None:
+            await self._release(slot, None)
+            raise BrowserInitializationError(str(slot.launch_error))
+        return slot
+
+    def _grant(self) -> Optional[_BrowserSlot]:
+        """Take a slot on a browser with room, launching one if allowed (no awaits)"""
+        open_slots = [
+            b for b in self._browsers
+            if not b.draining and not b.closed and b.leased < self._contexts_per_browser
+        ]
+        if open_slots:
+            # Pack onto the busiest browser so idle ones can be closed
+            slot = max(open_slots, key=lambda b: b.leased)
+        elif self._can_launch():
+            slot = _BrowserSlot()
+            self._browsers.append(slot)
+            self._spawn(self._launch(slot))
+        else:
+            return None
+        slot.leased += 1
+        return slot
+
+    def _can_launch(self) -> bool:
+        live = [b for b in self._browsers if not b.closed]
+        if len(live) >= self._max_browsers:
+            return False
+        if not live or not PSUTIL_AVAILABLE:
+            return True
+        measured = [b.rss_bytes for b in live if b.rss_bytes]
+        estimate = max(measured, default=DEFAULT_BROWSER_RSS_MB * 1024 * 1024)
+        return sum(b.rss_bytes for b in live) + estimate <= self._memory_budget
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiters in fair order"""
+        while len(self._waiters):
+            slot = self._grant()
+            if slot is None:
+                return
+            waiter = self._waiters.pop()
+            if waiter is None:
+                slot.leased -= 1
+                return
+            waiter.set_result(slot)
+
+    async def _checkout_context(self, slot: _BrowserSlot) -> _ContextSlot:
+        if slot.idle_contexts:
+            context_slot = slot.idle_contexts.pop()
+            self.stats["contexts_reused"] += 1
+        else:
+            context_slot = _ContextSlot(slot)
+            context_slot.context = await slot.browser.new_context(**CONTEXT_OPTIONS)
+
+            async def handle(route: "Route") -> None:
+                await self._route(context_slot, route)
+            await context_slot.context.route("**/*", handle)
+            self.stats["contexts_created"] += 1
+        context_slot.uses += 1
+        return context_slot
+
+    async def _route(self, context_slot: _ContextSlot, route: "Route") -> None:
+        parts = urlsplit(route.request.url)
+        if parts.scheme in ("http", "https") and parts.netloc:
+            context_slot.origins.add(f"{parts.scheme}://{parts.netloc}")
+        if context_slot.block_resources and route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+            self.stats["blocked_requests"] += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    def _count_navigation(self, slot: _BrowserSlot, frame: Any) -> None:
+        if frame.parent_frame is None:
+            slot.navigations += 1
+
+    async def _reset_context(self, context_slot: _ContextSlot) -> bool:
+        """Clear what one lease could leave behind for the next; False if unusable"""
+        context = context_slot.context
+        try:
+            if context_slot.origins:
+                # CDP sessions attach to a page; the lease may have closed its own
+                page = context.pages[0] if context.pages else await context.new_page()
+                session = await context.new_cdp_session(page)
+                for origin in sorted(context_slot.origins):
+                    await session.send("Storage.clearDataForOrigin", {
+                        "origin": origin,
+                        "storageTypes": CLEARED_STORAGE_TYPES,
+                    })
+                await session.detach()
+                context_slot.origins.clear()
+            for page in list(context.pages):
+                await page.close()
+            await context.clear_cookies()
+            await context.clear_permissions()
+            return True
+        except Exception as e:
+            logger.debug(f"Context reset failed, discarding context: {e}")
+            return False
 
+    async def _release(self, slot: _BrowserSlot, context_slot: Optional[_ContextSlot]) -> None:
+        if context_slot is not None and context_slot.context is not None:
+            reusable = (
+                not slot.draining
+                and context_slot.uses < self._context_max_uses
+                and self._is_browser_healthy(slot.browser)
+                and await self._reset_context(context_slot)
+            )
+            if reusable:
+                slot.idle_contexts.append(context_slot)
+            else:
+                self._spawn(self._close_quietly(context_slot.context))
+
+        slot.leased -= 1
+        slot.last_released = time.monotonic()
+        if slot.browser is not None and not slot.closed:
+            self._check_recycle(slot)
+        if slot.draining and slot.leased == 0 and not slot.closed:
+            self._retire(slot)
+        self._reap_idle()
+        self._dispatch()
+
+    # ------------------------------------------------------------------
+    # Browser lifecycle
+    # ------------------------------------------------------------------
+
+    async def _launch(self, slot: _BrowserSlot) -> None:
+        try:
+            if not self._playwright:
+                raise RuntimeError("BrowserPool not initialized. Call initialize() first.")
+            # Serialized so the new browser's processes can be told apart
+            async with self._launch_lock:
+                before = _browser_roots()
+                logger.info(f"Creating new browser instance (current count: {self.created_count})")
+                slot.browser = await self._playwright.chromium.launch(**self._launch_options)
+                slot.pids = _browser_roots() - before
+            self.stats["browsers_launched"] += 1
+            logger.info(f"Browser instance created successfully (total: {self.created_count})")
+        except Exception as e:
+            logger.error(f"Browser launch failed: {e}")
+            slot.launch_error = e
+            slot.closed = True
+            if slot in self._browsers:
+                self._browsers.remove(slot)
         finally:
-            # Return browser to pool if it's still healthy
-            if browser is not None:
-                if self._closing:
-                    # Pool is closing, close the browser instead of returning
-                    logger.debug("Pool closing, closing browser instead of returning")
-                    async with self._lock:
-                        self._created_count -= 1
-                    try:
-                        await browser.close()
-                    except Exception as e:
-                        logger.warning(f"Error closing browser during pool shutdown: {e}")
-                elif self._is_browser_healthy(browser):
-                    try:
-                        self._pool.put_nowait(browser)
-                        logger.debug(f"Returned browser to pool (pool size: {self._pool.qsize()})")
-                    except asyncio.QueueFull:
-                        # Pool is full (shouldn't happen normally), close the browser
-                        logger.warning("Pool full, closing excess browser")
-                        async with self._lock:
-                            self._created_count -= 1
-                        await browser.close()
-                else:
-                    # Browser crashed during use, don't return to pool
-                    logger.warning("Browser crashed during use, not returning to pool")
-                    async with self._lock:
-                        self._created_count -= 1
-                    try:
-                        await browser.close()
-                    except Exception:
-                        pass  # Browser already dead
+            slot.ready.set()
+
+    def _check_recycle(self, slot: _BrowserSlot) -> None:
+        if slot.draining:
+            return
+        if not self._is_browser_healthy(slot.browser):
+            reason = "recycled_crashed"
+        elif slot.navigations >= self._browser_max_navigations:
+            reason = "recycled_navigations"
+        elif self._sample_rss(slot) > self._browser_max_rss:
+            reason = "recycled_rss"
+        else:
+            return
+        slot.draining = True
+        self.stats[reason] += 1
+        logger.info(
+            "Recycling browser",
+            extra={"reason": reason, "navigations": slot.navigations, "rss_mb": round(slot.rss_bytes / 2**20, 1)}
+        )
+
+    def _sample_rss(self, slot: _BrowserSlot) -> int:
+        now = time.monotonic()
+        if not PSUTIL_AVAILABLE or not slot.pids or now - slot.rss_sampled_at < RSS_SAMPLE_INTERVAL_S:
+            return slot.rss_bytes
+        slot.rss_sampled_at = now
+        slot.rss_bytes = sum(_tree_rss(pid) for pid in slot.pids)
+        fleet = sum(b.rss_bytes for b in self._browsers if not b.closed)
+        self.stats["peak_fleet_rss_mb"] = max(self.stats["peak_fleet_rss_mb"], round(fleet / 2**20, 1))
+        return slot.rss_bytes
+
+    def _reap_idle(self) -> None:
+        """Close idle browsers beyond the first after IDLE_BROWSER_TTL_S"""
+        live = [b for b in self._browsers if not b.closed and not b.draining and b.browser is not None]
+        now = time.monotonic()
+        for slot in live[1:]:
+            if slot.leased == 0 and now - slot.last_released > IDLE_BROWSER_TTL_S:
+                self.stats["recycled_idle"] += 1
+                self._retire(slot)
+
+    def _retire(self, slot: _BrowserSlot) -> None:
+        slot.closed = True
+        if slot in self._browsers:
+            self._browsers.remove(slot)
+        contexts, slot.idle_contexts = slot.idle_contexts, []
+        self._spawn(self._close_browser(slot.browser, contexts))
+
+    async def _close_browser(self, browser: "Browser", contexts: List[_ContextSlot]) -> None:
+        for context_slot in contexts:
+            await self._close_quietly(context_slot.context)
+        await self._close_quietly(browser)
+
+    @staticmethod
+    async def _close_quietly(closable: Any) -> None:
+        try:
+            await closable.close()
+        except Exception as e:
+            logger.debug(f"Error closing browser resource: {e}")
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def _is_browser_healthy(self, browser: Optional["Browser"]) -> bool:
+        """
+        Check if a browser instance is still usable.
+
+        Args:
+            browser: Browser instance to check
+
+        Returns:
+            True if browser is connected and healthy
+        """
+        try:
+            return browser is not None and browser.is_connected()
+        except Exception as e:
+            logger.warning(f"Browser health check failed: {e}")
+            return False
 
     async def close(self) -> None:
         """
         Close all browsers and shutdown Playwright.
 
-        This drains the pool and closes all browser instances, then stops
-        the Playwright runtime. After calling this, the pool cannot be used
-        until initialize() is called again.
+        After calling this, the pool cannot be used until initialize() is
+        called again.
         """
         async with self._lock:
             if not self._initialized:
                 return
 
             self._closing = True
-            logger.info(f"Closing browser pool (closing {self._created_count} browsers)")
+            logger.info(f"Closing browser pool (closing {self.created_count} browsers)")
+
+        while len(self._waiters):
+            self._waiters.pop().set_exception(RuntimeError("BrowserPool is closing"))
 
-        # Drain and close all browsers in pool
         closed_count = 0
-        while True:
-            try:
-                browser = self._pool.get_nowait()
-                try:
-                    await browser.close()
-                    closed_count += 1
-                except Exception as e:
-                    logger.warning(f"Error closing browser: {e}")
-            except asyncio.QueueEmpty:
-                break
+        for slot in list(self._browsers):
+            await slot.ready.wait()
+            if slot.browser is not None and not slot.closed:
+                slot.closed = True
+                await self._close_browser(slot.browser, slot.idle_contexts)
+                closed_count += 1
+        self._browsers.clear()
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
 
         # Stop Playwright
         if self._playwright:
@@ -289,10 +589,24 @@ class BrowserPool:
         async with self._lock:
             self._initialized = False
             self._closing = False
-            self._created_count = 0
 
         logger.info(f"Browser pool closed (closed {closed_count} browsers)")
 
+    # ------------------------------------------------------------------
+    # Introspection
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        live = [b for b in self._browsers if not b.closed]
+        return {
+            **self.stats,
+            "browsers": len(live),
+            "leased": sum(b.leased for b in live),
+            "idle_contexts": sum(len(b.idle_contexts) for b in live),
+            "waiting": len(self._waiters),
+            "fleet_rss_mb": round(sum(b.rss_bytes for b in live) / 2**20, 1),
+        }
+
     async def health_check(self) -> Dict[str, Any]:
         """
         Check the health status of the browser pool.
@@ -317,21 +631,22 @@ class BrowserPool:
         return {
             "status": "healthy",
             "available": True,
-            "pool_size": self._pool.qsize(),
-            "created_count": self._created_count,
+            "pool_size": self.pool_size,
+            "created_count": self.created_count,
             "max_browsers": self._max_browsers,
-            "utilization": f"{self._created_count}/{self._max_browsers}"
+            "utilization": f"{self.created_count}/{self._max_browsers}",
+            **self.get_stats()
         }
 
     @property
     def pool_size(self) -> int:
-        """Current number of available browsers in the pool."""
-        return self._pool.qsize()
+        """Current number of idle warm contexts in the fleet."""
+        return sum(len(b.idle_contexts) for b in self._browsers if not b.closed)
 
     @property
     def created_count(self) -> int:
-        """Total number of browsers created (in pool + in use)."""
-        return self._created_count
+        """Number of live (or launching) browsers."""
+        return sum(1 for b in self._browsers if not b.closed)
 
     @property
     def is_initialized(self) -> bool:
@@ -339,6 +654,41 @@ class BrowserPool:
         return self._initialized
 
 
+def _browser_roots() -> Set[int]:
+    """PIDs of Chromium main processes descended from this process"""
+    if not PSUTIL_AVAILABLE:
+        return set()
+    roots = set()
+    try:
+        for proc in psutil.Process().children(recursive=True):
+            try:
+                name = proc.name()
+                if name.startswith(("chrome", "chromium", "headless_shell")):
+                    parent = proc.parent()
+                    if parent is None or not parent.name().startswith(("chrome", "chromium", "headless_shell")):
+                        roots.add(proc.pid)
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+    except psutil.Error:
+        pass
+    return roots
+
+
+def _tree_rss(pid: int) -> int:
+    """RSS of a process and all its descendants, 0 once it has exited"""
+    try:
+        proc = psutil.Process(pid)
+        total = proc.memory_info().rss
+        for child in proc.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+        return total
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return 0
+
+
 # Module-level singleton
 _browser_pool: Optional[BrowserPool] = None
 _pool_lock = asyncio.Lock()
@@ -71,7 +71,8 @@ class SiteAgnosticExtractor:
         intent: Optional[str] = None,
         output_format: str = "json",
         skip_cache: bool = False,
-        include_screenshot: bool = False
+        include_screenshot: bool = False,
+        user_id: Optional[str] = None
     ) -> ExtractionResult:
         """
         Extract structured data from any URL
@@ -82,6 +83,7 @@ class SiteAgnosticExtractor:
             output_format: Output format - "json", "markdown", or "natural"
             skip_cache: Skip cache lookup (force fresh extraction)
             include_screenshot: Include page screenshot in result
+            user_id: Requesting user, for fair browser scheduling
 
         Returns:
             ExtractionResult with extracted data and metadata
@@ -105,7 +107,8 @@ class SiteAgnosticExtractor:
                 page_state = await self.browser_engine.capture_page_state(
                     url,
                     wait_for_network_idle=True,
-                    take_screenshot=include_screenshot
+                    take_screenshot=include_screenshot,
+                    user_id=user_id
                 )
             except NavigationTimeoutError as e:
                 logger.error(f"Navigation timeout for {url}: {str(e)}", exc_info=True)
@@ -0,0 +1,32 @@
+"""
+Geocoding Services Module
+Cached forward and reverse geocoding for PAM tools and the Mapbox proxy
+"""
+
+from .geocoding_service import (
+    GeocodingCache,
+    GeocodingService,
+    MapboxGeocoder,
+    forward_key,
+    geocoding_cache,
+    geocoding_service,
+    geohash_encode,
+    normalize_query,
+    quantize_point,
+    quantize_proximity,
+    reverse_key,
+)
+
+__all__ = [
+    'GeocodingCache',
+    'GeocodingService',
+    'MapboxGeocoder',
+    'forward_key',
+    'geocoding_cache',
+    'geocoding_service',
+    'geohash_encode',
+    'normalize_query',
+    'quantize_point',
+    'quantize_proximity',
+    'reverse_key',
+]
@@ -0,0 +1,314 @@
+"""
+Cached geocoding.
+
+Travellers look up the same towns over and over, and reverse geocodes of
+nearby GPS fixes differ only in the last decimal places. Lookups therefore
+go through a two-tier cache (in-process LRU, then Redis via the shared
+CacheService) keyed on:
+
+- forward queries: the normalized query text ("Dubbo, NSW " and
+  "dubbo new south wales" share a key) plus the request options
+- reverse queries: the geohash cell of the coordinates at a configurable
+  precision; the upstream is queried at the cell centre so the cached
+  answer depends only on the key
+
+Results with no features are cached too (negative caching) with a shorter
+TTL; upstream errors are never cached. Cached payloads are shared between
+callers and must be treated as read-only.
+
+Environment:
+    GEOCODE_CACHE_TTL          positive result TTL in seconds (default 30 days)
+    GEOCODE_NEGATIVE_TTL       no-result TTL in seconds (default 1 day)
+    GEOCODE_LRU_SIZE           in-process entries (default 10000)
+    GEOCODE_REVERSE_PRECISION  geohash length for reverse keys (default 7, ~150 m)
+"""
+
+import hashlib
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Protocol, Tuple
+from urllib.parse import quote
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_TTL = int(os.getenv("GEOCODE_CACHE_TTL", str(30 * 24 * 3600)))
+DEFAULT_NEGATIVE_TTL = int(os.getenv("GEOCODE_NEGATIVE_TTL", str(24 * 3600)))
+DEFAULT_LRU_SIZE = int(os.getenv("GEOCODE_LRU_SIZE", "10000"))
+DEFAULT_REVERSE_PRECISION = int(os.getenv("GEOCODE_REVERSE_PRECISION", "7"))
+
+KEY_PREFIX = "geocode"
+
+# Australian state names and abbreviations both map to the abbreviation
+STATE_ALIASES = {
+    "new south wales": "nsw",
+    "victoria": "vic",
+    "queensland": "qld",
+    "south australia": "sa",
+    "western australia": "wa",
+    "tasmania": "tas",
+    "northern territory": "nt",
+    "australian capital territory": "act",
+}
+_STATE_PATTERN = re.compile(r"\b(" + "|".join(STATE_ALIASES) + r")\b")
+_SEPARATORS = re.compile(r"[\s,;.]+")
+
+_GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+_GEOHASH_INDEX = {c: i for i, c in enumerate(_GEOHASH_ALPHABET)}
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a forward geocoding query for use as a cache key."""
+    text = unicodedata.normalize("NFKC", query).casefold()
+    text = _SEPARATORS.sub(" ", text).strip()
+    return _STATE_PATTERN.sub(lambda m: STATE_ALIASES[m.group(1)], text)
+
+
+def geohash_encode(latitude: float, longitude: float, precision: int = DEFAULT_REVERSE_PRECISION) -> str:
+    """Standard base32 geohash of a coordinate."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, coord = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        if coord >= mid:
+            value = (value << 1) | 1
+            rng[0] = mid
+        else:
+            value <<= 1
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+    return "".join(chars)
+
+
+def geohash_center(geohash: str) -> Tuple[float, float]:
+    """(latitude, longitude) of the centre of a geohash cell."""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _GEOHASH_INDEX[char]
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
+
+
+def quantize_point(latitude: float, longitude: float,
+                   precision: int = DEFAULT_REVERSE_PRECISION) -> Tuple[float, float]:
+    """Snap a coordinate to the centre of its geohash cell."""
+    center_lat, center_lon = geohash_center(geohash_encode(latitude, longitude, precision))
+    return round(center_lat, 6), round(center_lon, 6)
+
+
+def quantize_proximity(proximity: Optional[str], decimals: int = 2) -> Optional[str]:
+    """Round a "lon,lat" proximity bias (~1 km at 2 decimals) so nearby users share keys."""
+    if not proximity or "," not in proximity:
+        return proximity
+    try:
+        lon, lat = (float(part) for part in proximity.split(","))
+    except ValueError:
+        return proximity
+    return f"{round(lon, decimals)},{round(lat, decimals)}"
+
+
+def _options_digest(options: Dict[str, Any]) -> str:
+    items = sorted((k, str(v).lower()) for k, v in options.items() if v is not None and k != "access_token")
+    return hashlib.sha1(repr(items).encode()).hexdigest()[:16]
+
+
+def forward_key(query: str, namespace: str = "mapbox.places", **options: Any) -> str:
+    """Cache key for a forward geocode."""
+    digest = hashlib.sha1(normalize_query(query).encode()).hexdigest()
+    return f"{KEY_PREFIX}:fwd:{namespace}:{digest}:{_options_digest(options)}"
+
+
+def reverse_key(latitude: float, longitude: float, precision: int = DEFAULT_REVERSE_PRECISION,
+                namespace: str = "mapbox.places", **options: Any) -> str:
+    """Cache key for a reverse geocode: the geohash cell containing the point."""
+    cell = geohash_encode(latitude, longitude, precision)
+    return f"{KEY_PREFIX}:rev:{namespace}:{cell}:{_options_digest(options)}"
+
+
+def is_negative(payload: Optional[Dict[str, Any]]) -> bool:
+    """True for a geocoding response with no results."""
+    return not payload or not payload.get("features")
+
+
+class LRUCache:
+    """Bounded in-process cache with per-entry expiry."""
+
+    def __init__(self, max_size: int = DEFAULT_LRU_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class GeocodingCache:
+    """Two-tier (LRU + Redis) cache for geocoding responses."""
+
+    def __init__(self, redis_cache: Any = None, ttl: int = DEFAULT_TTL,
+                 negative_ttl: int = DEFAULT_NEGATIVE_TTL, lru_size: int = DEFAULT_LRU_SIZE):
+        self._redis_cache = redis_cache
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.local = LRUCache(lru_size)
+        self.stats = {"lookups": 0, "local_hits": 0, "redis_hits": 0, "negative_hits": 0, "upstream_calls": 0}
+
+    @property
+    def redis_cache(self):
+        if self._redis_cache is None:
+            from app.services.cache_service import cache_service
+            self._redis_cache = cache_service
+        return self._redis_cache
+
+    async def get_or_fetch(self, key: str,
+                           fetch: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> Optional[Dict[str, Any]]:
+        """Return the cached response for key, calling fetch() on a miss.
+
+        Exceptions from fetch() propagate and nothing is cached.
+        """
+        self.stats["lookups"] += 1
+        payload = self.local.get(key)
+        if payload is not None:
+            self.stats["local_hits"] += 1
+            return self._hit(payload)
+
+        payload = await self.redis_cache.get(key)
+        if payload is not None:
+            self.stats["redis_hits"] += 1
+            self.local.set(key, payload, self.negative_ttl if is_negative(payload) else self.ttl)
+            return self._hit(payload)
+
+        self.stats["upstream_calls"] += 1
+        payload = await fetch()
+        if payload is None:
+            payload = {"type": "FeatureCollection", "features": []}
+        ttl = self.negative_ttl if is_negative(payload) else self.ttl
+        self.local.set(key, payload, ttl)
+        await self.redis_cache.set(key, payload, ttl=ttl)
+        return payload
+
+    def _hit(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        if is_negative(payload):
+            self.stats["negative_hits"] += 1
+        return payload
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["lookups"]
+        hits = self.stats["local_hits"] + self.stats["redis_hits"]
+        return {
+            **self.stats,
+            "local_entries": len(self.local),
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+            # Share of lookups that did not reach the upstream geocoder
+            "upstream_call_reduction": round(1 - self.stats["upstream_calls"] / lookups, 4) if lookups else None,
+        }
+
+
+class Geocoder(Protocol):
+    """Upstream geocoder returning a GeoJSON FeatureCollection (Mapbox v5 shape)."""
+
+    async def forward(self, query: str, **options: Any) -> Dict[str, Any]: ...
+
+    async def reverse(self, latitude: float, longitude: float, **options: Any) -> Dict[str, Any]: ...
+
+
+class MapboxGeocoder:
+    """Mapbox v5 places geocoder over the pooled Mapbox HTTP client."""
+
+    TOKEN_ENV_VARS = (
+        "MAPBOX_SECRET_TOKEN", "MAPBOX_API_KEY", "MAPBOX_TOKEN",
+        "VITE_MAPBOX_PUBLIC_TOKEN", "VITE_MAPBOX_TOKEN",
+    )
+
+    def __init__(self, token: Optional[str] = None, timeout: float = 10.0):
+        self.token = token or next((os.getenv(name) for name in self.TOKEN_ENV_VARS if os.getenv(name)), None)
+        self.timeout = timeout
+
+    async def _places(self, search_text: str, options: Dict[str, Any]) -> Dict[str, Any]:
+        if not self.token:
+            raise RuntimeError("No Mapbox token available for geocoding")
+        from app.core.http_clients import get_http_client
+
+        params = {k: v for k, v in options.items() if v is not None}
+        params["access_token"] = self.token
+        response = await get_http_client("mapbox").get(
+            f"/geocoding/v5/mapbox.places/{quote(search_text, safe=',')}.json", params=params, timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json()
+
+    async def forward(self, query: str, **options: Any) -> Dict[str, Any]:
+        return await self._places(query, options)
+
+    async def reverse(self, latitude: float, longitude: float, **options: Any) -> Dict[str, Any]:
+        return await self._places(f"{longitude},{latitude}", options)
+
+
+class GeocodingService:
+    """Forward and reverse geocoding through the cache."""
+
+    def __init__(self, geocoder: Optional[Geocoder] = None, cache: Optional[GeocodingCache] = None,
+                 reverse_precision: int = DEFAULT_REVERSE_PRECISION):
+        self.geocoder = geocoder or MapboxGeocoder()
+        self.cache = cache or GeocodingCache()
+        self.reverse_precision = reverse_precision
+
+    async def forward(self, query: str, **options: Any) -> Dict[str, Any]:
+        key = forward_key(query, **options)
+        return await self.cache.get_or_fetch(key, lambda: self.geocoder.forward(query, **options))
+
+    async def reverse(self, latitude: float, longitude: float, **options: Any) -> Dict[str, Any]:
+        key = reverse_key(latitude, longitude, self.reverse_precision, **options)
+        center_lat, center_lon = quantize_point(latitude, longitude, self.reverse_precision)
+        return await self.cache.get_or_fetch(key, lambda: self.geocoder.reverse(center_lat, center_lon, **options))
+
+    async def coordinates(self, query: str, **options: Any) -> Optional[Tuple[float, float]]:
+        """(latitude, longitude) of the best match for a place name, or None."""
+        payload = await self.forward(query, **options)
+        if is_negative(payload):
+            return None
+        longitude, latitude = payload["features"][0]["center"]
+        return latitude, longitude
+
+    def get_stats(self) -> Dict[str, Any]:
+        return self.cache.get_stats()
+
+
+geocoding_cache = GeocodingCache()
+geocoding_service = GeocodingService(cache=geocoding_cache)
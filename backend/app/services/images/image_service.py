@@ -6,7 +6,6 @@ Integrates with Wikipedia, Unsplash, and generates location-based map images
 
 import os
 import asyncio
-import aiohttp
 import logging
 from typing import List, Dict, Optional, Any, Tuple
 from urllib.parse import quote
@@ -14,6 +13,7 @@ import hashlib
 from datetime import datetime
 
 from app.core.config import get_settings
+from app.core.http_clients import get_http_client
 from .wikipedia_scraper import WikipediaScraper
 
 logger = logging.getLogger(__name__)
@@ -27,15 +27,13 @@ class ImageService:
         self.unsplash_access_key = os.getenv('UNSPLASH_ACCESS_KEY')
         self.mapbox_token = os.getenv('VITE_MAPBOX_TOKEN') or os.getenv('MAPBOX_TOKEN')
         self.google_places_key = getattr(settings, 'GOOGLE_PLACES_API_KEY', None)
-        self.session = None
         
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            await self.session.close()
+        # Requests go through pooled clients (app.core.http_clients), closed on app shutdown
+        pass
     
     async def get_trip_template_image(self, template_data: Dict[str, Any]) -> Dict[str, str]:
         """Get appropriate image for a trip template"""
@@ -161,18 +159,18 @@ class ImageService:
             
             url = 'https://api.unsplash.com/search/photos'
             
-            async with self.session.get(url, params=params, headers=headers) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data['results']:
-                        photo = data['results'][0]
-                        return {
-                            'image_url': photo['urls']['regular'],
-                            'thumbnail_url': photo['urls']['small'],
-                            'image_source': 'unsplash',
-                            'image_attribution': f"Photo by {photo['user']['name']} on Unsplash"
-                        }
-                        
+            response = await get_http_client("unsplash").get(url, params=params, headers=headers)
+            if response.status_code == 200:
+                data = response.json()
+                if data['results']:
+                    photo = data['results'][0]
+                    return {
+                        'image_url': photo['urls']['regular'],
+                        'thumbnail_url': photo['urls']['small'],
+                        'image_source': 'unsplash',
+                        'image_attribution': f"Photo by {photo['user']['name']} on Unsplash"
+                    }
+                    
         except Exception as e:
             logger.error(f"Error fetching Unsplash image: {e}")
         
@@ -197,31 +195,31 @@ class ImageService:
             
             search_url = 'https://maps.googleapis.com/maps/api/place/findplacefromtext/json'
             
-            async with self.session.get(search_url, params=search_params) as response:
-                if response.status == 200:
-                    data = await response.json()
-                    if data.get('candidates') and data['candidates'][0].get('photos'):
-                        photo_ref = data['candidates'][0]['photos'][0]['photo_reference']
-                        place_name = data['candidates'][0]['name']
-                        
-                        # Get the photo URL
-                        photo_url = (
-                            f"https://maps.googleapis.com/maps/api/place/photo"
-                            f"?maxwidth=1200&photoreference={photo_ref}&key={self.google_places_key}"
-                        )
-                        
-                        thumb_url = (
-                            f"https://maps.googleapis.com/maps/api/place/photo"
-                            f"?maxwidth=400&photoreference={photo_ref}&key={self.google_places_key}"
-                        )
-                        
-                        return {
-                            'image_url': photo_url,
-                            'thumbnail_url': thumb_url,
-                            'image_source': 'google_places',
-                            'image_attribution': f"Google Places - {place_name}"
-                        }
-                        
+            response = await get_http_client("google_places").get(search_url, params=search_params)
+            if response.status_code == 200:
+                data = response.json()
+                if data.get('candidates') and data['candidates'][0].get('photos'):
+                    photo_ref = data['candidates'][0]['photos'][0]['photo_reference']
+                    place_name = data['candidates'][0]['name']
+                    
+                    # Get the photo URL
+                    photo_url = (
+                        f"https://maps.googleapis.com/maps/api/place/photo"
+                        f"?maxwidth=1200&photoreference={photo_ref}&key={self.google_places_key}"
+                    )
+                    
+                    thumb_url = (
+                        f"https://maps.googleapis.com/maps/api/place/photo"
+                        f"?maxwidth=400&photoreference={photo_ref}&key={self.google_places_key}"
+                    )
+                    
+                    return {
+                        'image_url': photo_url,
+                        'thumbnail_url': thumb_url,
+                        'image_source': 'google_places',
+                        'image_attribution': f"Google Places - {place_name}"
+                    }
+                    
         except Exception as e:
             logger.error(f"Error fetching Google Places image: {e}")
         
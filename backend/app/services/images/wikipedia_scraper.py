@@ -4,13 +4,14 @@ Fetches information and images about national parks and landmarks from Wikipedia
 """
 
 import asyncio
-import aiohttp
 import logging
 from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime
 import re
 from urllib.parse import quote, unquote
 
+from app.core.http_clients import get_http_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -19,15 +20,14 @@ class WikipediaScraper:
     
     def __init__(self):
         self.base_url = "https://en.wikipedia.org/w/api.php"
-        self.session = None
+        self.session = get_http_client("wikipedia")
         
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self.session:
-            await self.session.close()
+        # The pooled client outlives the scraper; it is closed on app shutdown
+        pass
     
     async def search_national_parks(self, country: str, limit: int = 50) -> List[Dict[str, Any]]:
         """Search for national parks in a specific country"""
@@ -132,9 +132,9 @@ class WikipediaScraper:
         }
         
         try:
-            async with self.session.get(self.base_url, params=params) as response:
-                data = await response.json()
-                return data.get('query', {}).get('search', [])
+            response = await self.session.get(self.base_url, params=params)
+            data = response.json()
+            return data.get('query', {}).get('search', [])
         except Exception as e:
             logger.error(f"Wikipedia search error: {e}")
             return []
@@ -153,11 +153,11 @@ class WikipediaScraper:
         }
         
         try:
-            async with self.session.get(self.base_url, params=params) as response:
-                data = await response.json()
-                pages = data.get('query', {}).get('pages', {})
-                # Return the first (and should be only) page
-                return next(iter(pages.values()), None)
+            response = await self.session.get(self.base_url, params=params)
+            data = response.json()
+            pages = data.get('query', {}).get('pages', {})
+            # Return the first (and should be only) page
+            return next(iter(pages.values()), None)
         except Exception as e:
             logger.error(f"Error getting page content: {e}")
             return None
@@ -174,13 +174,13 @@ class WikipediaScraper:
         }
         
         try:
-            async with self.session.get(self.base_url, params=params) as response:
-                data = await response.json()
-                pages = data.get('query', {}).get('pages', {})
-                page = next(iter(pages.values()), None)
-                if page and 'revisions' in page:
-                    return page['revisions'][0]['slots']['main']['*']
-                return None
+            response = await self.session.get(self.base_url, params=params)
+            data = response.json()
+            pages = data.get('query', {}).get('pages', {})
+            page = next(iter(pages.values()), None)
+            if page and 'revisions' in page:
+                return page['revisions'][0]['slots']['main']['*']
+            return None
         except Exception as e:
             logger.error(f"Error getting full page content: {e}")
             return None
@@ -196,15 +196,15 @@ class WikipediaScraper:
         }
         
         try:
-            async with self.session.get(self.base_url, params=params) as response:
-                data = await response.json()
-                pages = data.get('query', {}).get('pages', {})
-                page = next(iter(pages.values()), None)
-                
-                if page and 'coordinates' in page:
-                    coord = page['coordinates'][0]
-                    return (coord['lat'], coord['lon'])
-                return None
+            response = await self.session.get(self.base_url, params=params)
+            data = response.json()
+            pages = data.get('query', {}).get('pages', {})
+            page = next(iter(pages.values()), None)
+            
+            if page and 'coordinates' in page:
+                coord = page['coordinates'][0]
+                return (coord['lat'], coord['lon'])
+            return None
         except Exception as e:
             logger.error(f"Error getting coordinates: {e}")
             return None
@@ -220,31 +220,31 @@ class WikipediaScraper:
         }
         
         try:
-            async with self.session.get(self.base_url, params=params) as response:
-                data = await response.json()
-                pages = data.get('query', {}).get('pages', {})
-                page = next(iter(pages.values()), None)
-                
-                if not page or 'images' not in page:
-                    return []
-                
-                # Get image URLs for each image
-                images = []
-                for img in page['images']:
-                    img_title = img['title']
-                    # Skip common Wikipedia icons and logos
-                    if any(skip in img_title.lower() for skip in [
-                        'commons-logo', 'wikimedia', 'wiki.png', 'edit-icon',
-                        'red_pog.svg', 'compass', 'folder', 'question_mark'
-                    ]):
-                        continue
-                    
-                    img_info = await self._get_image_info(img_title)
-                    if img_info:
-                        images.append(img_info)
-                
-                return images
+            response = await self.session.get(self.base_url, params=params)
+            data = response.json()
+            pages = data.get('query', {}).get('pages', {})
+            page = next(iter(pages.values()), None)
+            
+            if not page or 'images' not in page:
+                return []
+            
+            # Get image URLs for each image
+            images = []
+            for img in page['images']:
+                img_title = img['title']
+                # Skip common Wikipedia icons and logos
+                if any(skip in img_title.lower() for skip in [
+                    'commons-logo', 'wikimedia', 'wiki.png', 'edit-icon',
+                    'red_pog.svg', 'compass', 'folder', 'question_mark'
+                ]):
+                    continue
                 
+                img_info = await self._get_image_info(img_title)
+                if img_info:
+                    images.append(img_info)
+            
+            return images
+            
         except Exception as e:
             logger.error(f"Error getting page images: {e}")
             return []
@@ -261,23 +261,23 @@ class WikipediaScraper:
         }
         
         try:
-            async with self.session.get(self.base_url, params=params) as response:
-                data = await response.json()
-                pages = data.get('query', {}).get('pages', {})
-                page = next(iter(pages.values()), None)
-                
-                if page and 'imageinfo' in page:
-                    info = page['imageinfo'][0]
-                    return {
-                        'title': image_title,
-                        'url': info.get('url'),
-                        'thumb_url': info.get('thumburl'),
-                        'width': info.get('width'),
-                        'height': info.get('height'),
-                        'mime': info.get('mime')
-                    }
-                return None
-                
+            response = await self.session.get(self.base_url, params=params)
+            data = response.json()
+            pages = data.get('query', {}).get('pages', {})
+            page = next(iter(pages.values()), None)
+            
+            if page and 'imageinfo' in page:
+                info = page['imageinfo'][0]
+                return {
+                    'title': image_title,
+                    'url': info.get('url'),
+                    'thumb_url': info.get('thumburl'),
+                    'width': info.get('width'),
+                    'height': info.get('height'),
+                    'mime': info.get('mime')
+                }
+            return None
+            
         except Exception as e:
             logger.error(f"Error getting image info: {e}")
             return None
@@ -17,6 +17,7 @@ import tiktoken
 from textstat import flesch_reading_ease
 
 from .vector_store import VectorKnowledgeBase, DocumentChunk
+from .ingestion_engine import KnowledgeIngestionEngine, SourceDocument
 
 logger = logging.getLogger(__name__)
 
@@ -67,8 +68,11 @@ class ContentCleaner:
     @staticmethod
     def extract_key_information(text: str) -> Dict[str, Any]:
         """Extract key information from text for metadata"""
-        # Calculate reading difficulty
-        reading_ease = flesch_reading_ease(text)
+        # Calculate reading difficulty; optional, some textstat builds fail on numeric tokens
+        try:
+            reading_ease = flesch_reading_ease(text)
+        except Exception:
+            reading_ease = None
         
         # Extract potential locations (basic regex)
         location_pattern = r'\b([A-Z][a-z]+ (?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Drive|Dr|Lane|Ln))\b'
@@ -124,10 +128,10 @@ class TextChunker:
             chunk_text = self.encoding.decode(chunk_tokens)
             chunks.append(chunk_text)
             
+            if end == len(tokens):
+                break
             # Move start position with overlap
             start = end - self.chunk_overlap
-            if start >= len(tokens):
-                break
         
         return chunks
     
@@ -143,9 +147,9 @@ class TextChunker:
             chunk_text = ' '.join(chunk_words)
             chunks.append(chunk_text)
             
-            start = end - self.chunk_overlap
-            if start >= len(words):
+            if end == len(words):
                 break
+            start = end - self.chunk_overlap
         
         return chunks
     
@@ -158,6 +162,10 @@ class TextChunker:
         paragraphs = text.split('\n\n')
         chunks = []
         current_chunk = ""
+        current_tokens = 0
+        # Each paragraph is counted once; the running total stands in for
+        # re-encoding the growing chunk on every paragraph
+        separator_tokens = self._get_token_count("\n\n") if self.encoding else 0
         
         for paragraph in paragraphs:
             paragraph = paragraph.strip()
@@ -165,22 +173,26 @@ class TextChunker:
                 continue
             
             # Check if adding this paragraph would exceed chunk size
-            potential_chunk = current_chunk + "\n\n" + paragraph if current_chunk else paragraph
+            paragraph_tokens = self._get_token_count(paragraph)
+            potential_tokens = current_tokens + separator_tokens + paragraph_tokens if current_chunk else paragraph_tokens
             
-            if self._get_token_count(potential_chunk) <= self.chunk_size:
-                current_chunk = potential_chunk
+            if potential_tokens <= self.chunk_size:
+                current_chunk = current_chunk + "\n\n" + paragraph if current_chunk else paragraph
+                current_tokens = potential_tokens
             else:
                 # Add current chunk if it exists
                 if current_chunk:
                     chunks.append(current_chunk.strip())
                 
                 # If paragraph itself is too large, split it
-                if self._get_token_count(paragraph) > self.chunk_size:
+                if paragraph_tokens > self.chunk_size:
                     sub_chunks = self.chunk_by_tokens(paragraph)
                     chunks.extend(sub_chunks)
                     current_chunk = ""
+                    current_tokens = 0
                 else:
                     current_chunk = paragraph
+                    current_tokens = paragraph_tokens
         
         # Add the last chunk
         if current_chunk:
@@ -203,6 +215,7 @@ class DocumentProcessor:
         self.cleaner = ContentCleaner()
         self.chunker = TextChunker()
         self.session = None
+        self.engine = None
     
     async def _get_session(self) -> aiohttp.ClientSession:
         """Get or create aiohttp session"""
@@ -211,6 +224,22 @@ class DocumentProcessor:
             self.session = aiohttp.ClientSession(timeout=timeout)
         return self.session
     
+    def _get_engine(self) -> KnowledgeIngestionEngine:
+        """Get or create the staged ingestion engine for bulk work"""
+        if not self.engine:
+            self.engine = KnowledgeIngestionEngine.for_vector_store(self.vector_store)
+        return self.engine
+    
+    async def _fetch_html(self, url: str) -> str:
+        """Fetch a page, raising on non-200 responses"""
+        session = await self._get_session()
+        
+        async with session.get(url) as response:
+            if response.status != 200:
+                raise Exception(f"HTTP {response.status}: {await response.text()}")
+            
+            return await response.text()
+    
     async def close(self):
         """Close the aiohttp session"""
         if self.session:
@@ -225,13 +254,7 @@ class DocumentProcessor:
     ) -> List[str]:
         """Process web content and store in vector database"""
         try:
-            session = await self._get_session()
-            
-            async with session.get(url) as response:
-                if response.status != 200:
-                    raise Exception(f"HTTP {response.status}: {await response.text()}")
-                
-                html_content = await response.text()
+            html_content = await self._fetch_html(url)
             
             # Clean HTML and extract text
             clean_text = self.cleaner.clean_html(html_content)
@@ -421,27 +444,68 @@ class DocumentProcessor:
         self, 
         urls: List[str], 
         content_type: str = "general",
-        max_concurrent: int = 5
+        max_concurrent: int = 5,
+        collection_name: str = "general_knowledge"
     ) -> Dict[str, List[str]]:
-        """Process multiple URLs concurrently"""
-        semaphore = asyncio.Semaphore(max_concurrent)
+        """
+        Fetch URLs with up to max_concurrent requests in flight and stream the
+        pages into the ingestion engine as they arrive. Fetching only runs as
+        far ahead as the engine consumes, and chunks already stored for a URL
+        are not re-embedded.
         
-        async def process_single_url(url: str) -> Tuple[str, List[str]]:
-            async with semaphore:
-                chunk_ids = await self.process_web_content(url, content_type)
-                await asyncio.sleep(1)  # Rate limiting
-                return url, chunk_ids
+        Returns:
+            Current chunk IDs per fetched URL; URLs that failed to fetch are omitted
+        """
+        if getattr(self.vector_store, "_fallback_mode", False):
+            return {}
+        if not self.vector_store._initialized:
+            await self.vector_store.initialize_collections()
         
-        tasks = [process_single_url(url) for url in urls]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        fetched = set()
         
-        processed_results = {}
-        for result in results:
-            if isinstance(result, Exception):
-                logger.error(f"❌ Batch processing error: {result}")
-                continue
-            
-            url, chunk_ids = result
-            processed_results[url] = chunk_ids
+        async def fetch_single_url(url: str) -> Tuple[str, Optional[str]]:
+            try:
+                html_content = await self._fetch_html(url)
+            except Exception as e:
+                logger.error(f"❌ Failed to fetch {url}: {e}")
+                return url, None
+            await asyncio.sleep(1)  # Rate limiting
+            return url, html_content
+        
+        async def fetched_documents():
+            remaining = iter(urls)
+            in_flight = set()
+            
+            def fetch_next() -> None:
+                url = next(remaining, None)
+                if url is not None:
+                    in_flight.add(asyncio.create_task(fetch_single_url(url)))
+            
+            for _ in range(max_concurrent):
+                fetch_next()
+            try:
+                while in_flight:
+                    done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        in_flight.discard(task)
+                        fetch_next()
+                        url, html_content = task.result()
+                        if html_content is None:
+                            continue
+                        fetched.add(url)
+                        yield SourceDocument(
+                            source_id=url,
+                            content=html_content,
+                            collection_name=collection_name,
+                            metadata={"content_type": content_type}
+                        )
+            finally:
+                for task in in_flight:
+                    task.cancel()
+        
+        stats = await self._get_engine().ingest(fetched_documents())
+        processed_results = {url: stats.chunk_ids_by_source.get(url, []) for url in urls if url in fetched}
         
-        return processed_results
\ No newline at end of file
+        logger.info(f"✅ Batch processed {len(processed_results)}/{len(urls)} URLs: "
+                    f"{stats.embedded_chunks} chunks embedded, {stats.unchanged_chunks} unchanged")
+        return processed_results
@@ -0,0 +1,518 @@
+"""
+Knowledge Ingestion Engine
+Staged producer/consumer pipeline that turns raw documents into stored
+vector chunks.
+
+    parse (process pool) -> diff -> embed (batched) -> store (bulk upsert)
+
+- Parsing (HTML cleaning, metadata extraction, token-aware chunking) is CPU
+  bound and runs in a shared process pool (spawned once, shut down with the
+  app), so it overlaps with embedding and storage.
+- Chunk IDs are content-addressed (source, chunk text), so a chunk already in
+  the collection is skipped before it reaches the embedder. Chunks a document
+  no longer produces are deleted once its new chunks have been stored, so a
+  failed embed or upsert never leaves a document without chunks.
+- Embedding and upserts are batched per collection.
+- Stages are connected by bounded queues: a slow embedder or store stalls
+  parsing instead of letting parsed documents pile up in memory.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, AsyncIterable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_COLLECTION = "general_knowledge"
+DEFAULT_CHUNK_SIZE = 1000
+DEFAULT_CHUNK_OVERLAP = 200
+MIN_DOCUMENT_CHARS = 100
+EMBED_BATCH_SIZE = 64
+UPSERT_BATCH_SIZE = 256
+# Parsed documents buffered between parsing and embedding
+PARSED_QUEUE_SIZE = 32
+# Embedded/unembedded batches buffered between the later stages
+BATCH_QUEUE_SIZE = 2
+
+_DONE = object()
+
+_parse_pool: Optional[ProcessPoolExecutor] = None
+
+Embedder = Callable[[List[str]], List[List[float]]]
+
+
+@dataclass
+class SourceDocument:
+    """A document to ingest. content_type is "html" or "text"."""
+    source_id: str
+    content: str
+    content_type: str = "html"
+    collection_name: str = DEFAULT_COLLECTION
+    source: Optional[str] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class ParsedDocument:
+    """Chunks of one document, ready to diff against the store"""
+    source_id: str
+    collection_name: str
+    chunk_ids: List[str]
+    texts: List[str]
+    metadatas: List[Dict[str, Any]]
+
+
+@dataclass
+class KnowledgeIngestStats:
+    """Counters for one ingestion run"""
+    documents: int = 0
+    skipped_documents: int = 0
+    failed_documents: int = 0
+    chunks: int = 0
+    unchanged_chunks: int = 0
+    embedded_chunks: int = 0
+    stale_chunks: int = 0
+    embed_batches: int = 0
+    store_calls: int = 0
+    elapsed_seconds: float = 0.0
+    chunk_ids_by_source: Dict[str, List[str]] = field(default_factory=dict)
+
+    @property
+    def docs_per_minute(self) -> float:
+        return round(self.documents / self.elapsed_seconds * 60, 1) if self.elapsed_seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("chunk_ids_by_source")
+        data["docs_per_minute"] = self.docs_per_minute
+        return data
+
+
+def chunk_id(source_id: str, text: str, occurrence: int = 0) -> str:
+    """Content-addressed chunk ID; occurrence separates repeats of the same text in one document"""
+    digest = hashlib.sha256(f"{source_id}\x00{occurrence}\x00{text}".encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+
+def _metadata_value(value: Any) -> Any:
+    """ChromaDB metadata values must be str, int, float or bool"""
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return ", ".join(str(item) for item in value)
+    return json.dumps(value, default=str)
+
+
+_chunkers: Dict[Tuple[int, int], Any] = {}
+
+
+def _chunker(chunk_size: int, chunk_overlap: int):
+    """One TextChunker per worker process, so the tokenizer loads once"""
+    from .document_processor import TextChunker
+
+    key = (chunk_size, chunk_overlap)
+    if key not in _chunkers:
+        _chunkers[key] = TextChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return _chunkers[key]
+
+
+def parse_document(
+    document: SourceDocument,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+    min_chars: int = MIN_DOCUMENT_CHARS,
+) -> Optional[ParsedDocument]:
+    """Clean, chunk and fingerprint one document. Runs in a pool worker."""
+    from .document_processor import ContentCleaner
+
+    text = ContentCleaner.clean_html(document.content) if document.content_type == "html" else document.content.strip()
+    if not text or len(text) < min_chars:
+        return None
+
+    base_metadata = {**ContentCleaner.extract_key_information(text), **document.metadata}
+    if "url" not in base_metadata and document.source_id.startswith(("http://", "https://")):
+        base_metadata["url"] = document.source_id
+        base_metadata["domain"] = urlparse(document.source_id).netloc
+    source = document.source or (f"web_scraping:{base_metadata['domain']}" if base_metadata.get("domain") else "ingestion")
+    processed_at = datetime.utcnow().isoformat()
+
+    chunks = _chunker(chunk_size, chunk_overlap).smart_chunk(text)
+    seen: Dict[str, int] = {}
+    chunk_ids, metadatas = [], []
+    for i, chunk in enumerate(chunks):
+        chunk_hash = hashlib.md5(chunk.encode()).hexdigest()
+        occurrence = seen.get(chunk_hash, 0)
+        seen[chunk_hash] = occurrence + 1
+        chunk_ids.append(chunk_id(document.source_id, chunk, occurrence))
+        metadata = {
+            **base_metadata,
+            "source_id": document.source_id,
+            "source": source,
+            "chunk_index": i,
+            "total_chunks": len(chunks),
+            "chunk_hash": chunk_hash,
+            "content_length": len(chunk),
+            "processed_at": processed_at,
+            "created_at": processed_at,
+        }
+        metadatas.append({k: _metadata_value(v) for k, v in metadata.items() if v is not None})
+
+    return ParsedDocument(document.source_id, document.collection_name, chunk_ids, chunks, metadatas)
+
+
+class ChromaChunkSink:
+    """Bulk reads and writes against one ChromaDB collection (blocking calls)"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def existing(self, source_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Stored chunk metadata by chunk ID for the given sources"""
+        result = self.collection.get(where={"source_id": {"$in": source_ids}}, include=["metadatas"])
+        return dict(zip(result["ids"], result["metadatas"]))
+
+    def upsert(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]],
+               embeddings: List[List[float]]) -> None:
+        self.collection.upsert(ids=ids, documents=documents, metadatas=metadatas, embeddings=embeddings)
+
+    def update_metadata(self, ids: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        self.collection.update(ids=ids, metadatas=metadatas)
+
+    def delete(self, ids: List[str]) -> None:
+        self.collection.delete(ids=ids)
+
+
+def _default_parse_workers() -> int:
+    configured = os.environ.get("KNOWLEDGE_PARSE_WORKERS")
+    if configured:
+        return max(0, int(configured))
+    return min(4, os.cpu_count() or 1)
+
+
+def get_parse_pool() -> ProcessPoolExecutor:
+    """Return the shared parser process pool, creating it on first use."""
+    global _parse_pool
+    if _parse_pool is None:
+        # spawn: forking the serving process would copy its threads' locks and the loaded encoder
+        _parse_pool = ProcessPoolExecutor(
+            max_workers=max(1, _default_parse_workers()),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _parse_pool
+
+
+def shutdown_parse_pool() -> None:
+    """Shut down the shared pool (called on application shutdown)."""
+    global _parse_pool
+    if _parse_pool is not None:
+        _parse_pool.shutdown(wait=False, cancel_futures=True)
+        _parse_pool = None
+
+
+async def _aiter(documents: Union[Iterable[SourceDocument], AsyncIterable[SourceDocument]]):
+    if hasattr(documents, "__aiter__"):
+        async for document in documents:
+            yield document
+    else:
+        for document in documents:
+            yield document
+
+
+class KnowledgeIngestionEngine:
+    """
+    Staged ingestion: parse -> diff -> embed -> store, connected by bounded queues.
+
+    Usage:
+        engine = KnowledgeIngestionEngine.for_vector_store(vector_kb)
+        stats = await engine.ingest(SourceDocument(url, html) for url, html in pages)
+    """
+
+    def __init__(
+        self,
+        sink_for: Callable[[str], ChromaChunkSink],
+        embed: Embedder,
+        parse_workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        chunk_overlap: int = DEFAULT_CHUNK_OVERLAP,
+        min_chars: int = MIN_DOCUMENT_CHARS,
+        embed_batch_size: int = EMBED_BATCH_SIZE,
+        upsert_batch_size: int = UPSERT_BATCH_SIZE,
+        queue_size: int = PARSED_QUEUE_SIZE,
+    ):
+        """
+        Args:
+            sink_for: Returns the chunk sink for a collection name
+            embed: Blocking embedder, texts -> vectors; runs in a thread
+            parse_workers: Documents parsed at once in the shared process pool;
+                0 parses in a thread instead (defaults to KNOWLEDGE_PARSE_WORKERS,
+                else the CPU count, at most 4)
+        """
+        self.sink_for = sink_for
+        self.embed = embed
+        self.parse_workers = _default_parse_workers() if parse_workers is None else parse_workers
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.min_chars = min_chars
+        self.embed_batch_size = embed_batch_size
+        self.upsert_batch_size = upsert_batch_size
+        self.queue_size = queue_size
+        self._sinks: Dict[str, ChromaChunkSink] = {}
+
+    @classmethod
+    def for_vector_store(cls, vector_store, **kwargs) -> "KnowledgeIngestionEngine":
+        """Engine writing to a VectorKnowledgeBase's collections with its encoder"""
+        def sink_for(collection_name: str) -> ChromaChunkSink:
+            if vector_store.collections.get(collection_name) is None:
+                raise ValueError(f"Collection {collection_name} not found")
+            return ChromaChunkSink(vector_store.collections[collection_name])
+
+        def embed(texts: List[str]) -> List[List[float]]:
+            return vector_store.encoder.encode(texts, batch_size=len(texts)).tolist()
+
+        return cls(sink_for, embed, **kwargs)
+
+    def _sink(self, collection_name: str) -> ChromaChunkSink:
+        if collection_name not in self._sinks:
+            self._sinks[collection_name] = self.sink_for(collection_name)
+        return self._sinks[collection_name]
+
+    async def ingest(
+        self,
+        documents: Union[Iterable[SourceDocument], AsyncIterable[SourceDocument]],
+    ) -> KnowledgeIngestStats:
+        """
+        Ingest documents
+
+        Args:
+            documents: SourceDocuments; consumed lazily, so a generator keeps
+                memory bounded by the queues rather than the input size
+
+        Returns:
+            KnowledgeIngestStats with unchanged/embedded chunk counts and docs/minute
+        """
+        stats = KnowledgeIngestStats()
+        start = time.perf_counter()
+        parsed = asyncio.Queue(maxsize=self.queue_size)
+        to_embed = asyncio.Queue(maxsize=BATCH_QUEUE_SIZE)
+        to_store = asyncio.Queue(maxsize=BATCH_QUEUE_SIZE)
+        # (collection, source) -> [new chunks not yet stored, chunk IDs to delete once they are]
+        replacing: Dict[Tuple[str, str], list] = {}
+
+        tasks = [
+            asyncio.create_task(self._parse_stage(documents, parsed, stats)),
+            asyncio.create_task(self._diff_stage(parsed, to_embed, replacing, stats)),
+            asyncio.create_task(self._embed_stage(to_embed, to_store, stats)),
+            asyncio.create_task(self._store_stage(to_store, replacing, stats)),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        stats.elapsed_seconds = time.perf_counter() - start
+        logger.info(f"📚 Knowledge ingestion complete: {stats.to_dict()}")
+        return stats
+
+    async def _parse(self, document: SourceDocument) -> Optional[ParsedDocument]:
+        args = (parse_document, document, self.chunk_size, self.chunk_overlap, self.min_chars)
+        if self.parse_workers <= 0:
+            return await asyncio.to_thread(*args)
+        pool = get_parse_pool()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, *args)
+        except BrokenProcessPool:
+            # A worker died (OOM killer): start a fresh pool next time, parse this one in a thread.
+            # Other documents fail on the same pool; only the first shuts it down.
+            if _parse_pool is pool:
+                shutdown_parse_pool()
+            return await asyncio.to_thread(*args)
+
+    async def _parse_stage(self, documents, out: asyncio.Queue, stats: KnowledgeIngestStats) -> None:
+        # A slot is held until the parsed document is queued, so a full queue stalls parsing
+        slots = asyncio.Semaphore(max(1, self.parse_workers) * 2)
+        pending = set()
+
+        async def parse_one(document: SourceDocument) -> None:
+            try:
+                result = await self._parse(document)
+                if result is None:
+                    stats.skipped_documents += 1
+                    logger.warning(f"⚠️ Insufficient content from {document.source_id}")
+                else:
+                    await out.put(result)
+            except Exception as e:
+                stats.failed_documents += 1
+                logger.error(f"❌ Failed to parse {document.source_id}: {e}")
+            finally:
+                slots.release()
+
+        try:
+            async for document in _aiter(documents):
+                await slots.acquire()
+                stats.documents += 1
+                task = asyncio.create_task(parse_one(document))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+
+            if pending:
+                await asyncio.gather(*pending)
+            await out.put(_DONE)
+        finally:
+            # A later stage failed: parses waiting on the full queue would block forever
+            for task in list(pending):
+                task.cancel()
+
+    async def _diff_stage(self, inbox: asyncio.Queue, out: asyncio.Queue, replacing: Dict,
+                          stats: KnowledgeIngestStats) -> None:
+        # Per collection: latest parse of each source, flushed once enough chunks are waiting
+        waiting: Dict[str, Dict[str, ParsedDocument]] = {}
+        counts: Dict[str, int] = {}
+
+        while True:
+            document = await inbox.get()
+            if document is _DONE:
+                break
+            docs = waiting.setdefault(document.collection_name, {})
+            docs[document.source_id] = document
+            counts[document.collection_name] = counts.get(document.collection_name, 0) + len(document.texts)
+            if counts[document.collection_name] >= self.embed_batch_size:
+                await self._diff(document.collection_name, waiting.pop(document.collection_name), out,
+                                 replacing, stats)
+                counts[document.collection_name] = 0
+
+        for collection_name, docs in waiting.items():
+            await self._diff(collection_name, docs, out, replacing, stats)
+        await out.put(_DONE)
+
+    async def _diff(
+        self,
+        collection_name: str,
+        docs: Dict[str, ParsedDocument],
+        out: asyncio.Queue,
+        replacing: Dict,
+        stats: KnowledgeIngestStats,
+    ) -> None:
+        sink = self._sink(collection_name)
+        stats.store_calls += 1
+        existing = await asyncio.to_thread(sink.existing, list(docs))
+        stale_by_source: Dict[str, set] = {}
+        for stored_id, stored in existing.items():
+            stale_by_source.setdefault(stored.get("source_id"), set()).add(stored_id)
+        stale, changed, moved = [], [], []
+
+        for doc in docs.values():
+            stats.chunks += len(doc.chunk_ids)
+            stats.chunk_ids_by_source[doc.source_id] = doc.chunk_ids
+            doc_stale = stale_by_source.get(doc.source_id, set())
+            doc_changed = 0
+            for item in zip(doc.chunk_ids, doc.texts, doc.metadatas):
+                stored = existing.get(item[0])
+                doc_stale.discard(item[0])
+                if stored is None:
+                    changed.append(item)
+                    doc_changed += 1
+                    continue
+                stats.unchanged_chunks += 1
+                # Same text at a new position: refresh position metadata without re-embedding
+                if (stored.get("chunk_index"), stored.get("total_chunks")) != \
+                        (item[2]["chunk_index"], item[2]["total_chunks"]):
+                    moved.append((item[0], {**stored, "chunk_index": item[2]["chunk_index"],
+                                            "total_chunks": item[2]["total_chunks"]}))
+            if not doc_stale:
+                continue
+            if doc_changed:
+                # Keep the old chunks until the replacements are stored
+                entry = replacing.setdefault((collection_name, doc.source_id), [0, set()])
+                entry[0] += doc_changed
+                entry[1].update(doc_stale)
+            else:
+                stale.extend(doc_stale)
+
+        await self._delete_stale(collection_name, stale, stats)
+        if moved:
+            stats.store_calls += 1
+            await asyncio.to_thread(sink.update_metadata, [m[0] for m in moved], [m[1] for m in moved])
+        if changed:
+            await out.put((collection_name, changed))
+
+    async def _embed_stage(self, inbox: asyncio.Queue, out: asyncio.Queue, stats: KnowledgeIngestStats) -> None:
+        buffers: Dict[str, List[Tuple[str, str, Dict[str, Any]]]] = {}
+
+        async def embed_batch(collection_name: str, batch) -> None:
+            vectors = await asyncio.to_thread(self.embed, [text for _, text, _ in batch])
+            stats.embed_batches += 1
+            stats.embedded_chunks += len(batch)
+            await out.put((collection_name, batch, vectors))
+
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                break
+            collection_name, chunks = item
+            buffer = buffers.setdefault(collection_name, [])
+            buffer.extend(chunks)
+            while len(buffer) >= self.embed_batch_size:
+                batch = buffer[:self.embed_batch_size]
+                del buffer[:self.embed_batch_size]
+                await embed_batch(collection_name, batch)
+
+        for collection_name, buffer in buffers.items():
+            if buffer:
+                await embed_batch(collection_name, buffer)
+        await out.put(_DONE)
+
+    async def _delete_stale(self, collection_name: str, stale: List[str], stats: KnowledgeIngestStats) -> None:
+        if stale:
+            stats.store_calls += 1
+            stats.stale_chunks += len(stale)
+            await asyncio.to_thread(self._sink(collection_name).delete, stale)
+
+    async def _store_stage(self, inbox: asyncio.Queue, replacing: Dict, stats: KnowledgeIngestStats) -> None:
+        buffers: Dict[str, List[Tuple[Tuple[str, str, Dict[str, Any]], List[float]]]] = {}
+
+        async def upsert(collection_name: str, rows) -> None:
+            stats.store_calls += 1
+            await asyncio.to_thread(
+                self._sink(collection_name).upsert,
+                [chunk[0] for chunk, _ in rows],
+                [chunk[1] for chunk, _ in rows],
+                [chunk[2] for chunk, _ in rows],
+                [vector for _, vector in rows],
+            )
+            # Documents whose new chunks are now all stored drop their old ones
+            stale = []
+            for chunk, _ in rows:
+                key = (collection_name, chunk[2]["source_id"])
+                entry = replacing.get(key)
+                if entry is not None:
+                    entry[0] -= 1
+                    if entry[0] == 0:
+                        stale.extend(replacing.pop(key)[1])
+            await self._delete_stale(collection_name, stale, stats)
+
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                break
+            collection_name, batch, vectors = item
+            buffer = buffers.setdefault(collection_name, [])
+            buffer.extend(zip(batch, vectors))
+            while len(buffer) >= self.upsert_batch_size:
+                rows = buffer[:self.upsert_batch_size]
+                del buffer[:self.upsert_batch_size]
+                await upsert(collection_name, rows)
+
+        for collection_name, rows in buffers.items():
+            if rows:
+                await upsert(collection_name, rows)
@@ -123,6 +123,28 @@ class MonitoringService:
             ['service'],
             registry=self.registry
         )
+        
+        # Outbound HTTP metrics (pooled clients in app.core.http_clients)
+        self.outbound_requests_total = Counter(
+            'outbound_http_requests_total',
+            'Total outbound HTTP requests',
+            ['upstream', 'status'],
+            registry=self.registry
+        )
+        
+        self.outbound_request_duration = Histogram(
+            'outbound_http_request_duration_seconds',
+            'Outbound HTTP request duration in seconds',
+            ['upstream'],
+            registry=self.registry
+        )
+        
+        self.outbound_connections_opened = Counter(
+            'outbound_http_connections_opened_total',
+            'New outbound connections (requests not served by a pooled connection)',
+            ['upstream'],
+            registry=self.registry
+        )
     
     def record_http_request(self, method: str, endpoint: str, status_code: int, duration: float):
         """Record HTTP request metrics"""
@@ -210,6 +232,22 @@ class MonitoringService:
             service=service
         ).observe(duration)
     
+    def record_outbound_request(self, upstream: str, status: str, duration: float, connections_opened: int):
+        """Record outbound HTTP request metrics"""
+        self.outbound_requests_total.labels(
+            upstream=upstream,
+            status=status
+        ).inc()
+        
+        self.outbound_request_duration.labels(
+            upstream=upstream
+        ).observe(duration)
+        
+        if connections_opened:
+            self.outbound_connections_opened.labels(
+                upstream=upstream
+            ).inc(connections_opened)
+    
     def get_metrics(self) -> str:
         """Get Prometheus metrics in text format"""
         return generate_latest(self.registry).decode('utf-8')
@@ -18,6 +18,8 @@ import logging
 from typing import Dict, Any, List, Optional
 import httpx
 
+from app.core.http_clients import get_http_client
+
 logger = logging.getLogger(__name__)
 
 
@@ -81,34 +83,34 @@ class EdamamService:
             }
 
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    self.BASE_URL,
-                    params={"app_id": self.app_id, "app_key": self.app_key},
-                    json={"title": "Recipe", "ingr": ingredients}
-                )
-                response.raise_for_status()
-                data = response.json()
-
-                # Extract key nutrition facts
-                total = data.get("totalNutrients", {})
-
-                nutrition = {
-                    "calories": round(data.get("calories", 0) / servings, 1),
-                    "protein": round(total.get("PROCNT", {}).get("quantity", 0) / servings, 1),
-                    "carbs": round(total.get("CHOCDF", {}).get("quantity", 0) / servings, 1),
-                    "fat": round(total.get("FAT", {}).get("quantity", 0) / servings, 1),
-                    "fiber": round(total.get("FIBTG", {}).get("quantity", 0) / servings, 1),
-                    "sodium": round(total.get("NA", {}).get("quantity", 0) / servings, 1),
-                    "sugar": round(total.get("SUGAR", {}).get("quantity", 0) / servings, 1),
-                }
+            client = get_http_client("edamam")
+            response = await client.post(
+                self.BASE_URL,
+                params={"app_id": self.app_id, "app_key": self.app_key},
+                json={"title": "Recipe", "ingr": ingredients}
+            )
+            response.raise_for_status()
+            data = response.json()
+
+            # Extract key nutrition facts
+            total = data.get("totalNutrients", {})
+
+            nutrition = {
+                "calories": round(data.get("calories", 0) / servings, 1),
+                "protein": round(total.get("PROCNT", {}).get("quantity", 0) / servings, 1),
+                "carbs": round(total.get("CHOCDF", {}).get("quantity", 0) / servings, 1),
+                "fat": round(total.get("FAT", {}).get("quantity", 0) / servings, 1),
+                "fiber": round(total.get("FIBTG", {}).get("quantity", 0) / servings, 1),
+                "sodium": round(total.get("NA", {}).get("quantity", 0) / servings, 1),
+                "sugar": round(total.get("SUGAR", {}).get("quantity", 0) / servings, 1),
+            }
 
-                logger.info(
-                    f"Fetched nutrition data for {len(ingredients)} ingredients, "
-                    f"{servings} servings: {nutrition['calories']} cal"
-                )
+            logger.info(
+                f"Fetched nutrition data for {len(ingredients)} ingredients, "
+                f"{servings} servings: {nutrition['calories']} cal"
+            )
 
-                return {"success": True, "nutrition": nutrition}
+            return {"success": True, "nutrition": nutrition}
 
         except httpx.HTTPStatusError as e:
             error_msg = f"Edamam API error: {e.response.status_code}"
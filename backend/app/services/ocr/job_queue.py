@@ -0,0 +1,429 @@
+"""Durable OCR job queue and background worker.
+
+Jobs live in Redis so they survive restarts and are visible to every worker:
+
+  ocr:job:{id}          JSON job record (status, result, error), expires after JOB_TTL_SECONDS
+  ocr:payload:{id}      uploaded file bytes, deleted once the job finishes
+  ocr:queue             list of pending job ids
+  ocr:processing        list of claimed job ids (reliable-queue pattern via BLMOVE)
+  ocr:inflight:{hash}   leader job id for a file currently being processed
+
+Duplicate uploads are deduplicated by content hash: files already in the
+ocr_cache table complete immediately, and files identical to a job still in
+flight follow that job instead of being processed twice.
+
+When Redis is unavailable the queue falls back to an in-process backend with
+the same semantics (lost on restart), matching how cache_service degrades.
+"""
+import asyncio
+import json
+import os
+import time
+import uuid
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core.logging import get_logger
+from app.services.ocr.models import OCRResult
+
+logger = get_logger(__name__)
+
+JOB_TTL_SECONDS = 3600
+VISIBILITY_TIMEOUT_SECONDS = 300
+MAX_ATTEMPTS = 3
+
+ACTIVE_STATUSES = ("queued", "processing")
+
+
+class _MemoryBackend:
+    """In-process fallback backend used when Redis is not reachable."""
+
+    def __init__(self):
+        self._values: Dict[str, Tuple[Any, float]] = {}
+        self._queue: deque = deque()
+        self._processing: List[str] = []
+        self._available = asyncio.Event()
+
+    def _get(self, key: str) -> Any:
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at < time.time():
+            self._values.pop(key, None)
+            return None
+        return value
+
+    async def set(self, key: str, value: Any, ttl: int, nx: bool = False) -> bool:
+        if nx and self._get(key) is not None:
+            return False
+        self._values[key] = (value, time.time() + ttl)
+        return True
+
+    async def get(self, key: str) -> Any:
+        return self._get(key)
+
+    async def delete(self, key: str) -> None:
+        self._values.pop(key, None)
+
+    async def push(self, job_id: str) -> None:
+        self._queue.appendleft(job_id)
+        self._available.set()
+
+    async def claim(self, timeout: float) -> Optional[str]:
+        if not self._queue:
+            self._available.clear()
+            try:
+                await asyncio.wait_for(self._available.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+            if not self._queue:
+                return None
+        job_id = self._queue.pop()
+        self._processing.append(job_id)
+        return job_id
+
+    async def ack(self, job_id: str) -> None:
+        if job_id in self._processing:
+            self._processing.remove(job_id)
+
+    async def requeue(self, job_id: str) -> None:
+        await self.ack(job_id)
+        await self.push(job_id)
+
+    async def processing_ids(self) -> List[str]:
+        return list(self._processing)
+
+    async def lengths(self) -> Tuple[int, int]:
+        return len(self._queue), len(self._processing)
+
+    async def close(self) -> None:
+        pass
+
+
+class _RedisBackend:
+    """Redis backend using a reliable queue (BLMOVE into a processing list)."""
+
+    def __init__(self, redis, prefix: str):
+        self.redis = redis
+        self.queue_key = f"{prefix}:queue"
+        self.processing_key = f"{prefix}:processing"
+
+    async def set(self, key: str, value: Any, ttl: int, nx: bool = False) -> bool:
+        return bool(await self.redis.set(key, value, ex=ttl, nx=nx))
+
+    async def get(self, key: str) -> Any:
+        return await self.redis.get(key)
+
+    async def delete(self, key: str) -> None:
+        await self.redis.delete(key)
+
+    async def push(self, job_id: str) -> None:
+        await self.redis.lpush(self.queue_key, job_id)
+
+    async def claim(self, timeout: float) -> Optional[str]:
+        job_id = await self.redis.blmove(
+            self.queue_key, self.processing_key, timeout, "RIGHT", "LEFT"
+        )
+        return job_id.decode() if isinstance(job_id, bytes) else job_id
+
+    async def ack(self, job_id: str) -> None:
+        await self.redis.lrem(self.processing_key, 1, job_id)
+
+    async def requeue(self, job_id: str) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.lrem(self.processing_key, 1, job_id)
+            pipe.lpush(self.queue_key, job_id)
+            await pipe.execute()
+
+    async def processing_ids(self) -> List[str]:
+        ids = await self.redis.lrange(self.processing_key, 0, -1)
+        return [i.decode() if isinstance(i, bytes) else i for i in ids]
+
+    async def lengths(self) -> Tuple[int, int]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.llen(self.queue_key)
+            pipe.llen(self.processing_key)
+            queued, processing = await pipe.execute()
+        return queued, processing
+
+    async def close(self) -> None:
+        await self.redis.close()
+
+
+class OCRJobQueue:
+    """Durable OCR job queue with status, TTL and content-hash dedup."""
+
+    def __init__(self, redis_url: Optional[str] = None, prefix: str = "ocr"):
+        self.redis_url = redis_url
+        self.prefix = prefix
+        self._backend = None
+        self._init_lock = asyncio.Lock()
+
+    async def initialize(self):
+        """Connect to Redis, falling back to the in-process backend."""
+        if self._backend is not None:
+            return
+
+        async with self._init_lock:
+            if self._backend is not None:
+                return
+
+            try:
+                import redis.asyncio as aioredis
+                from app.core.config import settings
+
+                redis_url = (
+                    self.redis_url
+                    or getattr(settings, "REDIS_URL", None)
+                    or os.environ.get("REDIS_URL", "redis://localhost:6379")
+                )
+                # Binary-safe client: payloads are raw file bytes
+                client = aioredis.from_url(
+                    redis_url,
+                    decode_responses=False,
+                    max_connections=10,
+                    socket_connect_timeout=5,
+                    health_check_interval=30,
+                )
+                await client.ping()
+                self._backend = _RedisBackend(client, self.prefix)
+                logger.info("OCR job queue using Redis backend")
+            except Exception as e:
+                logger.warning(f"OCR job queue falling back to in-memory backend: {e}")
+                self._backend = _MemoryBackend()
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{self.prefix}:job:{job_id}"
+
+    def _payload_key(self, job_id: str) -> str:
+        return f"{self.prefix}:payload:{job_id}"
+
+    def _inflight_key(self, file_hash: str, sensitivity: str) -> str:
+        return f"{self.prefix}:inflight:{file_hash}:{sensitivity}"
+
+    async def _save_job(self, job: Dict[str, Any]) -> None:
+        await self._backend.set(self._job_key(job["job_id"]), json.dumps(job), JOB_TTL_SECONDS)
+
+    async def _load_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = await self._backend.get(self._job_key(job_id))
+        return json.loads(raw) if raw else None
+
+    async def submit(
+        self,
+        user_id: str,
+        filename: str,
+        file_bytes: bytes,
+        sensitivity: str = "standard",
+        file_hash: str = "",
+        cached_result: Optional[OCRResult] = None,
+    ) -> Dict[str, Any]:
+        """Create a job. Cached files complete immediately; duplicates follow the in-flight job."""
+        await self.initialize()
+
+        job_id = str(uuid.uuid4())
+        now = time.time()
+        job: Dict[str, Any] = {
+            "job_id": job_id,
+            "status": "queued",
+            "created_at": now,
+            "user_id": user_id,
+            "filename": filename,
+            "file_hash": file_hash,
+            "sensitivity": sensitivity,
+            "attempts": 0,
+        }
+
+        if cached_result is not None:
+            job.update({
+                "status": "completed",
+                "result": cached_result.model_dump(),
+                "completed_at": now,
+            })
+            await self._save_job(job)
+            return job
+
+        if file_hash:
+            inflight_key = self._inflight_key(file_hash, sensitivity)
+            is_leader = await self._backend.set(
+                inflight_key, job_id, VISIBILITY_TIMEOUT_SECONDS * MAX_ATTEMPTS, nx=True
+            )
+            if not is_leader:
+                leader_id = await self._backend.get(inflight_key)
+                if isinstance(leader_id, bytes):
+                    leader_id = leader_id.decode()
+                if leader_id and await self._load_job(leader_id):
+                    job["follows"] = leader_id
+                    await self._save_job(job)
+                    return job
+
+        await self._backend.set(self._payload_key(job_id), file_bytes, JOB_TTL_SECONDS)
+        await self._save_job(job)
+        await self._backend.push(job_id)
+        return job
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the job record; jobs that follow a duplicate mirror their leader."""
+        await self.initialize()
+        job = await self._load_job(job_id)
+        if not job or not job.get("follows"):
+            return job
+
+        leader = await self._load_job(job["follows"])
+        if leader is None:
+            job.update({"status": "failed", "error": "Deduplicated job expired"})
+        else:
+            for field in ("status", "result", "error", "completed_at"):
+                if field in leader:
+                    job[field] = leader[field]
+        return job
+
+    async def claim(self, timeout: float = 5.0) -> Optional[Tuple[Dict[str, Any], bytes]]:
+        """Block up to timeout seconds for a job; returns (job, payload) or None."""
+        await self.initialize()
+        job_id = await self._backend.claim(timeout)
+        if not job_id:
+            return None
+
+        job = await self._load_job(job_id)
+        payload = await self._backend.get(self._payload_key(job_id))
+        if job is None or payload is None:
+            # Expired while queued; nothing left to process
+            await self._backend.ack(job_id)
+            return None
+
+        job["status"] = "processing"
+        job["started_at"] = time.time()
+        job["attempts"] = job.get("attempts", 0) + 1
+        await self._save_job(job)
+        return job, payload
+
+    async def complete(self, job: Dict[str, Any], result: OCRResult) -> None:
+        job.update({
+            "status": "completed",
+            "result": result.model_dump(),
+            "completed_at": time.time(),
+        })
+        await self._finish(job)
+
+    async def fail(self, job: Dict[str, Any], error: str) -> None:
+        job.update({
+            "status": "failed",
+            "error": error,
+            "completed_at": time.time(),
+        })
+        await self._finish(job)
+
+    async def _finish(self, job: Dict[str, Any]) -> None:
+        job_id = job["job_id"]
+        await self._save_job(job)
+        await self._backend.delete(self._payload_key(job_id))
+        if job.get("file_hash"):
+            await self._backend.delete(self._inflight_key(job["file_hash"], job.get("sensitivity", "standard")))
+        await self._backend.ack(job_id)
+
+    async def requeue_stalled(self) -> int:
+        """Requeue jobs whose worker died mid-processing. Returns the number requeued."""
+        await self.initialize()
+        requeued = 0
+        cutoff = time.time() - VISIBILITY_TIMEOUT_SECONDS
+
+        for job_id in await self._backend.processing_ids():
+            job = await self._load_job(job_id)
+            if job is None:
+                await self._backend.ack(job_id)
+                continue
+            if job.get("status") != "processing" or job.get("started_at", 0) >= cutoff:
+                continue
+            if job.get("attempts", 0) >= MAX_ATTEMPTS:
+                await self.fail(job, "OCR job exceeded maximum attempts")
+                continue
+            job["status"] = "queued"
+            await self._save_job(job)
+            await self._backend.requeue(job_id)
+            requeued += 1
+
+        return requeued
+
+    async def active_count(self) -> int:
+        await self.initialize()
+        queued, processing = await self._backend.lengths()
+        return queued + processing
+
+    async def close(self) -> None:
+        if self._backend is not None:
+            await self._backend.close()
+            self._backend = None
+
+
+class OCRJobWorker:
+    """Consumes OCR jobs from the queue with bounded concurrency."""
+
+    def __init__(self, queue: OCRJobQueue, concurrency: int = 2, claim_timeout: float = 5.0):
+        self.queue = queue
+        self.concurrency = concurrency
+        self.claim_timeout = claim_timeout
+        self._tasks: List[asyncio.Task] = []
+        self._running = False
+
+    async def start(self) -> None:
+        if self._running:
+            return
+        await self.queue.initialize()
+        self._running = True
+        self._tasks = [
+            asyncio.create_task(self._consume(i), name=f"ocr-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+        logger.info(f"OCR job worker started with concurrency={self.concurrency}")
+
+    async def stop(self) -> None:
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _consume(self, index: int) -> None:
+        from app.services.ocr.service import OCRService
+
+        service = OCRService()
+        last_sweep = 0.0
+
+        while self._running:
+            try:
+                # One consumer periodically recovers jobs orphaned by dead workers
+                if index == 0 and time.time() - last_sweep > 60:
+                    last_sweep = time.time()
+                    requeued = await self.queue.requeue_stalled()
+                    if requeued:
+                        logger.warning(f"Requeued {requeued} stalled OCR jobs")
+
+                claimed = await self.queue.claim(self.claim_timeout)
+                if claimed is None:
+                    continue
+
+                job, payload = claimed
+                await self.process(service, job, payload)
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"OCR worker loop error: {e}")
+                await asyncio.sleep(1)
+
+    async def process(self, service, job: Dict[str, Any], payload: bytes) -> None:
+        try:
+            result = await service.extract_text(
+                file_bytes=payload,
+                filename=job.get("filename", "unknown"),
+                sensitivity=job.get("sensitivity", "standard"),
+            )
+            await self.queue.complete(job, result)
+        except Exception as e:
+            logger.error("ocr_job_failed", extra={"job_id": job["job_id"], "error": str(e)})
+            await self.queue.fail(job, str(e))
+
+
+ocr_job_queue = OCRJobQueue()
+ocr_job_worker = OCRJobWorker(ocr_job_queue, concurrency=int(os.environ.get("OCR_JOB_CONCURRENCY", "2")))
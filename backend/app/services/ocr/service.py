@@ -1,12 +1,16 @@
 """Unified OCR service - single pipeline for all document text extraction.
 
 Pipeline: cache -> PDF text -> Google Vision -> Claude Vision -> Gemini
+
+PDF parsing and image preprocessing run in the OCR process pool
+(see app/workers/ocr_cpu.py) so they never block the event loop.
 """
 import hashlib
-import io
+import importlib.util
 import time
 from typing import Optional
 
+from app.workers import ocr_cpu
 from app.services.ocr.models import OCRResult
 from app.core.logging import get_logger
 
@@ -68,70 +72,26 @@ class OCRService:
         except Exception as e:
             logger.warning("Cache save failed", extra={"error": str(e)})
 
-    def _try_pdf_text(self, file_bytes: bytes) -> Optional[str]:
-        """Extract text from a digital PDF using pdfplumber. Returns None if
-        no text found (scanned PDF) or if file is not a valid PDF."""
-        try:
-            import pdfplumber
-        except ImportError:
+    async def lookup_cached(self, file_bytes: bytes) -> tuple[str, Optional[OCRResult]]:
+        """Return (file_hash, cached result or None) for content-hash dedup."""
+        file_hash = self._compute_hash(file_bytes)
+        return file_hash, await self._check_cache(file_hash)
+
+    async def _extract_pdf_text(self, file_bytes: bytes) -> tuple[Optional[str], int]:
+        """Extract PDF text with pages parsed in parallel in the process pool.
+
+        Returns (text, page_count); text is None for scanned or invalid PDFs.
+        """
+        # pdfplumber is imported in the pool workers; check it exists before spawning them
+        if importlib.util.find_spec("pdfplumber") is None:
             logger.warning("pdfplumber not installed, skipping PDF text extraction")
-            return None
+            return None, 0
 
         try:
-            with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
-                pages_text = []
-                for page in pdf.pages:
-                    text = page.extract_text()
-                    if text:
-                        pages_text.append(text)
-                if pages_text:
-                    return "\n\n".join(pages_text)
-            return None
+            return await ocr_cpu.extract_pdf_text_parallel(file_bytes)
         except Exception as e:
             logger.debug(f"PDF text extraction failed: {e}")
-            return None
-
-    def _preprocess_image(self, file_bytes: bytes, filename: str) -> bytes:
-        """Preprocess image: HEIC conversion, EXIF rotation, resize, RGB convert."""
-        from PIL import Image, ImageOps
-
-        # Try HEIC conversion
-        is_heic = filename.lower().endswith((".heic", ".heif"))
-        if is_heic:
-            try:
-                import pillow_heif
-                heif_file = pillow_heif.read_heif(file_bytes)
-                img = Image.frombytes(
-                    heif_file.mode, heif_file.size, heif_file.data,
-                    "raw", heif_file.mode, heif_file.stride,
-                )
-            except ImportError:
-                logger.warning("pillow-heif not installed, cannot convert HEIC server-side")
-                return file_bytes
-        else:
-            img = Image.open(io.BytesIO(file_bytes))
-
-        # Apply EXIF rotation using standard Pillow method
-        try:
-            img = ImageOps.exif_transpose(img)
-        except Exception:
-            pass  # No EXIF or no orientation tag
-
-        # Resize to max 2048px on longest side
-        max_dim = 2048
-        if max(img.size) > max_dim:
-            ratio = max_dim / max(img.size)
-            new_size = (int(img.width * ratio), int(img.height * ratio))
-            img = img.resize(new_size, Image.LANCZOS)
-
-        # Convert to RGB
-        if img.mode != "RGB":
-            img = img.convert("RGB")
-
-        # Save as JPEG
-        buf = io.BytesIO()
-        img.save(buf, format="JPEG", quality=95)
-        return buf.getvalue()
+            return None, 0
 
     async def _ocr_google_vision(self, image_bytes: bytes) -> OCRResult:
         """Extract text using Google Cloud Vision REST API with API key."""
@@ -325,7 +285,7 @@ class OCRService:
         # 2. Try PDF text extraction (free, 100% accurate for digital PDFs)
         is_pdf = filename.lower().endswith(".pdf")
         if is_pdf:
-            pdf_text = self._try_pdf_text(file_bytes)
+            pdf_text, page_count = await self._extract_pdf_text(file_bytes)
             if pdf_text and pdf_text.strip():
                 result = OCRResult(
                     text=pdf_text,
@@ -333,6 +293,7 @@ class OCRService:
                     confidence_method="pdf_text_exact",
                     method="pdf_text",
                     file_hash=file_hash,
+                    page_count=page_count or 1,
                     processing_time_ms=int((time.time() - start_time) * 1000),
                 )
                 await self._save_cache(file_hash, result)
@@ -340,7 +301,9 @@ class OCRService:
 
         # 3. Preprocess image
         try:
-            image_bytes = self._preprocess_image(file_bytes, filename)
+            image_bytes = await ocr_cpu.run_in_process_pool(
+                ocr_cpu.preprocess_image, file_bytes, filename
+            )
         except Exception as e:
             logger.warning("Image preprocessing failed, using raw bytes", extra={"error": str(e)})
             image_bytes = file_bytes
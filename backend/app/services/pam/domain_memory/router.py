@@ -273,6 +273,50 @@ class DomainMemoryRouter:
             for t in tasks
         ]
 
+    async def claim_tasks(
+        self,
+        worker_id: str,
+        limit: int = 10,
+        scope: Optional[TaskScope] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Lease runnable tasks for one worker (SKIP LOCKED work queue).
+
+        Args:
+            worker_id: Lease holder, passed back to release_task
+            limit: Maximum tasks to claim
+            scope: Optional scope filter
+
+        Returns:
+            List of claimed task info, same shape as list_pending_tasks
+        """
+        tasks = await self.store.claim_tasks(worker_id=worker_id, limit=limit, scope=scope)
+
+        return [
+            {
+                "task_id": str(t.id),
+                "user_id": str(t.user_id),
+                "task_type": t.task_type.value,
+                "priority": t.priority,
+                "scope": t.scope.value,
+                "created_at": t.created_at.isoformat(),
+            }
+            for t in tasks
+        ]
+
+    async def release_task(self, task_id: UUID, worker_id: str) -> bool:
+        """
+        Release a claimed task so another worker can run its next step.
+
+        Args:
+            task_id: Task to release
+            worker_id: Worker that claimed it
+
+        Returns:
+            True if this worker held the lease
+        """
+        return await self.store.release_task(task_id, worker_id=worker_id)
+
     async def pause_task(self, task_id: UUID) -> bool:
         """
         Pause a running task.
@@ -1,7 +1,18 @@
 """
 Database storage for Domain Memory artifacts using Supabase.
+
+Workers load a task's artifacts with one domain_memory_load_context RPC and
+keep the definition, constraints and tests they have seen; the RPC only
+returns those again when their updated_at changed. Schedulers claim work
+through domain_memory_claim_tasks (FOR UPDATE SKIP LOCKED with a lease)
+instead of polling, and can LISTEN on TASK_QUEUE_CHANNEL while idle. See the
+domain_memory_work_queue migration.
 """
 
+import asyncio
+import os
+import socket
+from collections import OrderedDict
 from datetime import datetime
 from typing import Any, Dict, List, Optional
 from uuid import UUID, uuid4
@@ -35,12 +46,142 @@ from ..models import (
     WorkItemStatus,
 )
 
+LOAD_CONTEXT_RPC = "domain_memory_load_context"
+CLAIM_TASKS_RPC = "domain_memory_claim_tasks"
+RELEASE_TASK_RPC = "domain_memory_release_task"
+TASK_QUEUE_CHANNEL = "domain_memory_tasks"
+
+PENDING_TASK_COLUMNS = "id, user_id, task_type, status, priority, scope, created_at, updated_at"
+
+# Tasks whose definition, constraints and tests a store keeps between runs
+ARTIFACT_CACHE_SIZE = 256
+CACHED_ARTIFACTS = ("definition", "constraints", "tests")
+CONTEXT_PROGRESS_LIMIT = 50
+DEFAULT_LEASE_SECONDS = 300
+
+
+def default_worker_id() -> str:
+    """Identifies this process as the holder of claimed tasks"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _timestamp(value) -> Optional[datetime]:
+    if not value:
+        return None
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _task_from_row(row: Dict[str, Any]) -> DomainTask:
+    return DomainTask(
+        id=UUID(row["id"]),
+        user_id=UUID(row["user_id"]),
+        task_type=TaskType(row["task_type"]),
+        status=TaskStatus(row["status"]),
+        priority=row["priority"],
+        scope=TaskScope(row["scope"]),
+        created_at=_timestamp(row["created_at"]),
+        updated_at=_timestamp(row["updated_at"]),
+        completed_at=_timestamp(row.get("completed_at")),
+        error_message=row.get("error_message"),
+    )
+
+
+def _definition_from_row(row: Dict[str, Any]) -> TaskDefinition:
+    return TaskDefinition(
+        id=UUID(row["id"]),
+        task_id=UUID(row["task_id"]),
+        original_request=row["original_request"],
+        parsed_intent=ParsedIntent(**row["parsed_intent"]),
+        work_items=[WorkItem(**item) for item in row["work_items"]],
+        success_criteria=[
+            SuccessCriterion(**crit) for crit in row["success_criteria"]
+        ],
+        created_at=_timestamp(row["created_at"]),
+        updated_at=_timestamp(row["updated_at"]),
+    )
+
+
+def _state_from_row(row: Dict[str, Any]) -> TaskState:
+    return TaskState(
+        id=UUID(row["id"]),
+        task_id=UUID(row["task_id"]),
+        current_work_item_id=row.get("current_work_item_id"),
+        completed_items=row.get("completed_items") or [],
+        failed_items=row.get("failed_items") or [],
+        blocked_items=row.get("blocked_items") or [],
+        context_snapshot=row.get("context_snapshot") or {},
+        last_worker_run=_timestamp(row.get("last_worker_run")),
+        worker_run_count=row.get("worker_run_count") or 0,
+        created_at=_timestamp(row["created_at"]),
+        updated_at=_timestamp(row["updated_at"]),
+    )
+
+
+def _constraints_from_row(row: Dict[str, Any]) -> TaskConstraints:
+    return TaskConstraints(
+        id=UUID(row["id"]),
+        task_id=UUID(row["task_id"]),
+        budget_constraints=(
+            BudgetConstraint(**row["budget_constraints"])
+            if row.get("budget_constraints")
+            else None
+        ),
+        time_constraints=(
+            TimeConstraint(**row["time_constraints"])
+            if row.get("time_constraints")
+            else None
+        ),
+        scope_constraints=(
+            ScopeConstraint(**row["scope_constraints"])
+            if row.get("scope_constraints")
+            else None
+        ),
+        safety_rules=row.get("safety_rules") or [],
+        created_at=_timestamp(row["created_at"]),
+        updated_at=_timestamp(row["updated_at"]),
+    )
+
+
+def _tests_from_row(row: Dict[str, Any]) -> TestCriteria:
+    return TestCriteria(
+        id=UUID(row["id"]),
+        task_id=UUID(row["task_id"]),
+        test_cases=[TestCase(**tc) for tc in row["test_cases"]],
+        validation_queries=row.get("validation_queries") or [],
+        created_at=_timestamp(row["created_at"]),
+        updated_at=_timestamp(row["updated_at"]),
+    )
+
+
+def _progress_from_row(row: Dict[str, Any]) -> ProgressEntry:
+    return ProgressEntry(
+        id=UUID(row["id"]),
+        task_id=UUID(row["task_id"]),
+        worker_run_id=UUID(row["worker_run_id"]),
+        entry_type=EntryType(row["entry_type"]),
+        work_item_id=row.get("work_item_id"),
+        content=row["content"],
+        metadata=row.get("metadata") or {},
+        created_at=_timestamp(row["created_at"]),
+    )
+
+
+_ARTIFACT_PARSERS = {
+    "definition": _definition_from_row,
+    "constraints": _constraints_from_row,
+    "tests": _tests_from_row,
+}
+
 
 class DomainMemoryStore:
     """Database operations for Domain Memory artifacts."""
 
-    def __init__(self):
+    def __init__(self, artifact_cache_size: int = ARTIFACT_CACHE_SIZE):
         self.supabase = get_supabase_service()
+        self._artifact_cache_size = artifact_cache_size
+        self._artifacts: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
 
     def _to_str(self, value) -> str:
         """Convert UUID or string to string for database operations."""
@@ -48,6 +189,25 @@ class DomainMemoryStore:
             return str(value)
         return value
 
+    def _cached_artifacts(self, task_id: str) -> Dict[str, Any]:
+        artifacts = self._artifacts.get(task_id)
+        if artifacts is None:
+            return {}
+        self._artifacts.move_to_end(task_id)
+        return artifacts
+
+    def _cache_artifacts(self, task_id: str, artifacts: Dict[str, Any]) -> None:
+        self._artifacts[task_id] = artifacts
+        self._artifacts.move_to_end(task_id)
+        while len(self._artifacts) > self._artifact_cache_size:
+            self._artifacts.popitem(last=False)
+
+    def _forget_artifact(self, task_id: str, name: Optional[str] = None) -> None:
+        if name is None:
+            self._artifacts.pop(task_id, None)
+        else:
+            self._artifacts.get(task_id, {}).pop(name, None)
+
     async def create_task(
         self,
         user_id,
@@ -72,17 +232,7 @@ class DomainMemoryStore:
         if not result.data:
             raise ValueError("Failed to create task")
 
-        row = result.data[0]
-        return DomainTask(
-            id=UUID(row["id"]),
-            user_id=UUID(row["user_id"]),
-            task_type=TaskType(row["task_type"]),
-            status=TaskStatus(row["status"]),
-            priority=row["priority"],
-            scope=TaskScope(row["scope"]),
-            created_at=datetime.fromisoformat(row["created_at"].replace("Z", "+00:00")),
-            updated_at=datetime.fromisoformat(row["updated_at"].replace("Z", "+00:00")),
-        )
+        return _task_from_row(result.data[0])
 
     async def get_task(self, task_id) -> Optional[DomainTask]:
         """Get a task by ID."""
@@ -97,23 +247,7 @@ class DomainMemoryStore:
         if not result.data:
             return None
 
-        row = result.data
-        return DomainTask(
-            id=UUID(row["id"]),
-            user_id=UUID(row["user_id"]),
-            task_type=TaskType(row["task_type"]),
-            status=TaskStatus(row["status"]),
-            priority=row["priority"],
-            scope=TaskScope(row["scope"]),
-            created_at=datetime.fromisoformat(row["created_at"].replace("Z", "+00:00")),
-            updated_at=datetime.fromisoformat(row["updated_at"].replace("Z", "+00:00")),
-            completed_at=(
-                datetime.fromisoformat(row["completed_at"].replace("Z", "+00:00"))
-                if row.get("completed_at")
-                else None
-            ),
-            error_message=row.get("error_message"),
-        )
+        return _task_from_row(result.data)
 
     async def update_task_status(
         self,
@@ -160,15 +294,39 @@ class DomainMemoryStore:
         if status:
             query = query.eq("status", status.value)
 
-        result = query.execute()
+        rows = query.execute().data or []
+        if not rows:
+            return []
+
+        # One read per artifact table for the whole page instead of two per task
+        task_ids = [row["id"] for row in rows]
+        definitions = {
+            d["task_id"]: d
+            for d in (
+                self.supabase.table("domain_memory_definitions")
+                .select("task_id, original_request, work_items")
+                .in_("task_id", task_ids)
+                .execute()
+                .data
+                or []
+            )
+        }
+        states = {
+            s["task_id"]: s
+            for s in (
+                self.supabase.table("domain_memory_states")
+                .select("task_id, completed_items, worker_run_count")
+                .in_("task_id", task_ids)
+                .execute()
+                .data
+                or []
+            )
+        }
 
         summaries = []
-        for row in result.data or []:
-            definition = await self.get_definition(row["id"])
-            state = await self.get_state(row["id"])
-
-            work_items_total = len(definition.work_items) if definition else 0
-            work_items_completed = len(state.completed_items) if state else 0
+        for row in rows:
+            definition = definitions.get(row["id"]) or {}
+            state = states.get(row["id"]) or {}
 
             summaries.append(
                 TaskSummary(
@@ -177,33 +335,28 @@ class DomainMemoryStore:
                     status=TaskStatus(row["status"]),
                     priority=row["priority"],
                     scope=TaskScope(row["scope"]),
-                    original_request=(
-                        definition.original_request if definition else ""
-                    ),
-                    work_items_total=work_items_total,
-                    work_items_completed=work_items_completed,
-                    worker_run_count=state.worker_run_count if state else 0,
-                    created_at=datetime.fromisoformat(
-                        row["created_at"].replace("Z", "+00:00")
-                    ),
-                    updated_at=datetime.fromisoformat(
-                        row["updated_at"].replace("Z", "+00:00")
-                    ),
-                    completed_at=(
-                        datetime.fromisoformat(row["completed_at"].replace("Z", "+00:00"))
-                        if row.get("completed_at")
-                        else None
-                    ),
+                    original_request=definition.get("original_request") or "",
+                    work_items_total=len(definition.get("work_items") or []),
+                    work_items_completed=len(state.get("completed_items") or []),
+                    worker_run_count=state.get("worker_run_count") or 0,
+                    created_at=_timestamp(row["created_at"]),
+                    updated_at=_timestamp(row["updated_at"]),
+                    completed_at=_timestamp(row.get("completed_at")),
                 )
             )
 
         return summaries
 
     async def list_pending_tasks(self, limit: int = 20) -> List[DomainTask]:
-        """List all pending or in-progress tasks ordered by priority."""
+        """
+        List all pending or in-progress tasks ordered by priority.
+
+        Read-only view for dashboards; workers should use claim_tasks so two
+        of them never pick the same task.
+        """
         result = (
             self.supabase.table("domain_memory_tasks")
-            .select("*")
+            .select(PENDING_TASK_COLUMNS)
             .in_("status", [TaskStatus.PENDING.value, TaskStatus.IN_PROGRESS.value])
             .order("priority", desc=True)
             .order("created_at", desc=False)
@@ -211,26 +364,64 @@ class DomainMemoryStore:
             .execute()
         )
 
-        tasks = []
-        for row in result.data or []:
-            tasks.append(
-                DomainTask(
-                    id=UUID(row["id"]),
-                    user_id=UUID(row["user_id"]),
-                    task_type=TaskType(row["task_type"]),
-                    status=TaskStatus(row["status"]),
-                    priority=row["priority"],
-                    scope=TaskScope(row["scope"]),
-                    created_at=datetime.fromisoformat(
-                        row["created_at"].replace("Z", "+00:00")
-                    ),
-                    updated_at=datetime.fromisoformat(
-                        row["updated_at"].replace("Z", "+00:00")
-                    ),
-                )
-            )
+        return [_task_from_row(row) for row in result.data or []]
+
+    async def claim_tasks(
+        self,
+        worker_id: Optional[str] = None,
+        limit: int = 10,
+        lease_seconds: int = DEFAULT_LEASE_SECONDS,
+        scope: Optional[TaskScope] = None,
+    ) -> List[DomainTask]:
+        """
+        Lease up to `limit` runnable tasks, highest priority first.
+
+        Tasks locked or leased by another worker are skipped, so concurrent
+        workers get disjoint batches. Call release_task when done; an
+        unreleased lease expires after lease_seconds.
+        """
+        result = self.supabase.rpc(CLAIM_TASKS_RPC, {
+            "p_worker_id": worker_id or default_worker_id(),
+            "p_limit": limit,
+            "p_lease_seconds": lease_seconds,
+            "p_scope": scope.value if scope else None,
+        }).execute()
+
+        return [_task_from_row(row) for row in result.data or []]
+
+    async def release_task(self, task_id, worker_id: Optional[str] = None) -> bool:
+        """Drop this worker's lease on a task; runnable tasks are re-announced."""
+        result = self.supabase.rpc(RELEASE_TASK_RPC, {
+            "p_task_id": self._to_str(task_id),
+            "p_worker_id": worker_id or default_worker_id(),
+        }).execute()
+
+        return bool(result.data)
+
+    async def wait_for_tasks(self, timeout: float = 60.0) -> bool:
+        """
+        Block until a task becomes runnable or `timeout` seconds pass.
+
+        LISTENs on TASK_QUEUE_CHANNEL over the asyncpg pool (DATABASE_URL).
+        Returns True when woken by a notification; callers claim either way.
+        """
+        from app.core.database_pool import db_pool
+
+        notified = asyncio.Event()
+
+        def on_notify(connection, pid, channel, payload):
+            notified.set()
 
-        return tasks
+        async with db_pool.acquire() as conn:
+            await conn.add_listener(TASK_QUEUE_CHANNEL, on_notify)
+            try:
+                await asyncio.wait_for(notified.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                await conn.remove_listener(TASK_QUEUE_CHANNEL, on_notify)
+
+        return notified.is_set()
 
     async def create_definition(
         self,
@@ -259,19 +450,7 @@ class DomainMemoryStore:
         if not result.data:
             raise ValueError("Failed to create definition")
 
-        row = result.data[0]
-        return TaskDefinition(
-            id=UUID(row["id"]),
-            task_id=UUID(row["task_id"]),
-            original_request=row["original_request"],
-            parsed_intent=ParsedIntent(**row["parsed_intent"]),
-            work_items=[WorkItem(**item) for item in row["work_items"]],
-            success_criteria=[
-                SuccessCriterion(**crit) for crit in row["success_criteria"]
-            ],
-            created_at=datetime.fromisoformat(row["created_at"].replace("Z", "+00:00")),
-            updated_at=datetime.fromisoformat(row["updated_at"].replace("Z", "+00:00")),
-        )
+        return _definition_from_row(result.data[0])
 
     async def get_definition(self, task_id) -> Optional[TaskDefinition]:
         """Get task definition by task ID."""
@@ -286,19 +465,7 @@ class DomainMemoryStore:
         if not result.data:
             return None
 
-        row = result.data
-        return TaskDefinition(
-            id=UUID(row["id"]),
-            task_id=UUID(row["task_id"]),
-            original_request=row["original_request"],
-            parsed_intent=ParsedIntent(**row["parsed_intent"]),
-            work_items=[WorkItem(**item) for item in row["work_items"]],
-            success_criteria=[
-                SuccessCriterion(**crit) for crit in row["success_criteria"]
-            ],
-            created_at=datetime.fromisoformat(row["created_at"].replace("Z", "+00:00")),
-            updated_at=datetime.fromisoformat(row["updated_at"].replace("Z", "+00:00")),
-        )
+        return _definition_from_row(result.data)
 
     async def update_work_items(
         self, task_id, work_items: List[WorkItem]
@@ -309,6 +476,7 @@ class DomainMemoryStore:
             "updated_at": datetime.utcnow().isoformat(),
         }
 
+        self._forget_artifact(self._to_str(task_id), "definition")
         result = (
             self.supabase.table("domain_memory_definitions")
             .update(data)
@@ -337,20 +505,7 @@ class DomainMemoryStore:
         if not result.data:
             raise ValueError("Failed to create state")
 
-        row = result.data[0]
-        return TaskState(
-            id=UUID(row["id"]),
-            task_id=UUID(row["task_id"]),
-            current_work_item_id=row.get("current_work_item_id"),
-            completed_items=row.get("completed_items", []),
-            failed_items=row.get("failed_items", []),
-            blocked_items=row.get("blocked_items", []),
-            context_snapshot=row.get("context_snapshot", {}),
-            last_worker_run=None,
-            worker_run_count=row.get("worker_run_count", 0),
-            created_at=datetime.fromisoformat(row["created_at"].replace("Z", "+00:00")),
-            updated_at=datetime.fromisoformat(row["updated_at"].replace("Z", "+00:00")),
-        )
+        return _state_from_row(result.data[0])
 
     async def get_state(self, task_id) -> Optional[TaskState]:
         """Get state by task ID."""
@@ -365,24 +520,7 @@ class DomainMemoryStore:
         if not result.data:
             return None
 
-        row = result.data
-        return TaskState(
-            id=UUID(row["id"]),
-            task_id=UUID(row["task_id"]),
-            current_work_item_id=row.get("current_work_item_id"),
-            completed_items=row.get("completed_items", []),
-            failed_items=row.get("failed_items", []),
-            blocked_items=row.get("blocked_items", []),
-            context_snapshot=row.get("context_snapshot", {}),
-            last_worker_run=(
-                datetime.fromisoformat(row["last_worker_run"].replace("Z", "+00:00"))
-                if row.get("last_worker_run")
-                else None
-            ),
-            worker_run_count=row.get("worker_run_count", 0),
-            created_at=datetime.fromisoformat(row["created_at"].replace("Z", "+00:00")),
-            updated_at=datetime.fromisoformat(row["updated_at"].replace("Z", "+00:00")),
-        )
+        return _state_from_row(result.data)
 
     async def update_state(
         self,
@@ -393,6 +531,8 @@ class DomainMemoryStore:
         blocked_items: Optional[List[str]] = None,
         context_snapshot: Optional[Dict[str, Any]] = None,
         increment_run_count: bool = False,
+        worker_run_count: Optional[int] = None,
+        last_worker_run: Optional[datetime] = None,
     ) -> bool:
         """Update state artifact."""
         task_id_str = self._to_str(task_id)
@@ -413,6 +553,12 @@ class DomainMemoryStore:
         if context_snapshot is not None:
             data["context_snapshot"] = context_snapshot
 
+        if worker_run_count is not None:
+            data["worker_run_count"] = worker_run_count
+
+        if last_worker_run is not None:
+            data["last_worker_run"] = last_worker_run.isoformat()
+
         if increment_run_count:
             data["last_worker_run"] = datetime.utcnow().isoformat()
             current_state = await self.get_state(task_id_str)
@@ -461,29 +607,7 @@ class DomainMemoryStore:
         if not result.data:
             raise ValueError("Failed to create constraints")
 
-        row = result.data[0]
-        return TaskConstraints(
-            id=UUID(row["id"]),
-            task_id=UUID(row["task_id"]),
-            budget_constraints=(
-                BudgetConstraint(**row["budget_constraints"])
-                if row.get("budget_constraints")
-                else None
-            ),
-            time_constraints=(
-                TimeConstraint(**row["time_constraints"])
-                if row.get("time_constraints")
-                else None
-            ),
-            scope_constraints=(
-                ScopeConstraint(**row["scope_constraints"])
-                if row.get("scope_constraints")
-                else None
-            ),
-            safety_rules=row.get("safety_rules", []),
-            created_at=datetime.fromisoformat(row["created_at"].replace("Z", "+00:00")),
-            updated_at=datetime.fromisoformat(row["updated_at"].replace("Z", "+00:00")),
-        )
+        return _constraints_from_row(result.data[0])
 
     async def get_constraints(self, task_id) -> Optional[TaskConstraints]:
         """Get constraints by task ID."""
@@ -498,29 +622,7 @@ class DomainMemoryStore:
         if not result.data:
             return None
 
-        row = result.data
-        return TaskConstraints(
-            id=UUID(row["id"]),
-            task_id=UUID(row["task_id"]),
-            budget_constraints=(
-                BudgetConstraint(**row["budget_constraints"])
-                if row.get("budget_constraints")
-                else None
-            ),
-            time_constraints=(
-                TimeConstraint(**row["time_constraints"])
-                if row.get("time_constraints")
-                else None
-            ),
-            scope_constraints=(
-                ScopeConstraint(**row["scope_constraints"])
-                if row.get("scope_constraints")
-                else None
-            ),
-            safety_rules=row.get("safety_rules", []),
-            created_at=datetime.fromisoformat(row["created_at"].replace("Z", "+00:00")),
-            updated_at=datetime.fromisoformat(row["updated_at"].replace("Z", "+00:00")),
-        )
+        return _constraints_from_row(result.data)
 
     async def create_tests(
         self,
@@ -543,15 +645,7 @@ class DomainMemoryStore:
         if not result.data:
             raise ValueError("Failed to create tests")
 
-        row = result.data[0]
-        return TestCriteria(
-            id=UUID(row["id"]),
-            task_id=UUID(row["task_id"]),
-            test_cases=[TestCase(**tc) for tc in row["test_cases"]],
-            validation_queries=row.get("validation_queries", []),
-            created_at=datetime.fromisoformat(row["created_at"].replace("Z", "+00:00")),
-            updated_at=datetime.fromisoformat(row["updated_at"].replace("Z", "+00:00")),
-        )
+        return _tests_from_row(result.data[0])
 
     async def get_tests(self, task_id) -> Optional[TestCriteria]:
         """Get test criteria by task ID."""
@@ -566,15 +660,7 @@ class DomainMemoryStore:
         if not result.data:
             return None
 
-        row = result.data
-        return TestCriteria(
-            id=UUID(row["id"]),
-            task_id=UUID(row["task_id"]),
-            test_cases=[TestCase(**tc) for tc in row["test_cases"]],
-            validation_queries=row.get("validation_queries", []),
-            created_at=datetime.fromisoformat(row["created_at"].replace("Z", "+00:00")),
-            updated_at=datetime.fromisoformat(row["updated_at"].replace("Z", "+00:00")),
-        )
+        return _tests_from_row(result.data)
 
     async def update_tests(self, task_id, test_cases: List[TestCase]) -> bool:
         """Update test cases."""
@@ -583,6 +669,7 @@ class DomainMemoryStore:
             "updated_at": datetime.utcnow().isoformat(),
         }
 
+        self._forget_artifact(self._to_str(task_id), "tests")
         result = (
             self.supabase.table("domain_memory_tests")
             .update(data)
@@ -617,17 +704,7 @@ class DomainMemoryStore:
         if not result.data:
             raise ValueError("Failed to log progress")
 
-        row = result.data[0]
-        return ProgressEntry(
-            id=UUID(row["id"]),
-            task_id=UUID(row["task_id"]),
-            worker_run_id=UUID(row["worker_run_id"]),
-            entry_type=EntryType(row["entry_type"]),
-            work_item_id=row.get("work_item_id"),
-            content=row["content"],
-            metadata=row.get("metadata", {}),
-            created_at=datetime.fromisoformat(row["created_at"].replace("Z", "+00:00")),
-        )
+        return _progress_from_row(result.data[0])
 
     async def get_progress(
         self, task_id, limit: int = 100
@@ -642,28 +719,61 @@ class DomainMemoryStore:
             .execute()
         )
 
-        entries = []
-        for row in result.data or []:
-            entries.append(
-                ProgressEntry(
-                    id=UUID(row["id"]),
-                    task_id=UUID(row["task_id"]),
-                    worker_run_id=UUID(row["worker_run_id"]),
-                    entry_type=EntryType(row["entry_type"]),
-                    work_item_id=row.get("work_item_id"),
-                    content=row["content"],
-                    metadata=row.get("metadata", {}),
-                    created_at=datetime.fromisoformat(
-                        row["created_at"].replace("Z", "+00:00")
-                    ),
-                )
-            )
-
-        return entries
+        return [_progress_from_row(row) for row in result.data or []]
 
     async def load_full_context(self, task_id) -> Optional[DomainContext]:
-        """Load all artifacts for a task (Worker Startup Protocol)."""
+        """
+        Load all artifacts for a task (Worker Startup Protocol).
+
+        One RPC round trip; definition, constraints and tests already held
+        by this store are sent back as their updated_at and only re-read
+        when they changed.
+        """
         task_id_str = self._to_str(task_id)
+        cached = self._cached_artifacts(task_id_str)
+
+        try:
+            result = self.supabase.rpc(LOAD_CONTEXT_RPC, {
+                "p_task_id": task_id_str,
+                "p_progress_limit": CONTEXT_PROGRESS_LIMIT,
+                **{
+                    f"p_{name}_version": cached[name].updated_at.isoformat()
+                    for name in CACHED_ARTIFACTS
+                    if name in cached
+                },
+            }).execute()
+        except Exception as e:
+            logger.warning(f"{LOAD_CONTEXT_RPC} unavailable, loading artifacts one by one: {e}")
+            return await self._load_full_context_serial(task_id_str)
+
+        payload = result.data
+        if not payload or not payload.get("task"):
+            self._forget_artifact(task_id_str)
+            return None
+
+        artifacts = {}
+        for name in CACHED_ARTIFACTS:
+            if payload.get(name):
+                artifacts[name] = _ARTIFACT_PARSERS[name](payload[name])
+            elif payload.get(f"{name}_updated_at") and name in cached:
+                artifacts[name] = cached[name]
+
+        state = payload.get("state")
+        if state is None or len(artifacts) < len(CACHED_ARTIFACTS):
+            logger.warning(f"Incomplete artifacts for task {task_id}")
+            return None
+
+        self._cache_artifacts(task_id_str, artifacts)
+
+        return DomainContext(
+            task=_task_from_row(payload["task"]),
+            state=_state_from_row(state),
+            recent_progress=[_progress_from_row(row) for row in payload.get("progress") or []],
+            **artifacts,
+        )
+
+    async def _load_full_context_serial(self, task_id_str: str) -> Optional[DomainContext]:
+        """Pre-RPC startup path, kept for databases without the migration."""
         task = await self.get_task(task_id_str)
         if not task:
             return None
@@ -672,10 +782,10 @@ class DomainMemoryStore:
         state = await self.get_state(task_id_str)
         constraints = await self.get_constraints(task_id_str)
         tests = await self.get_tests(task_id_str)
-        progress = await self.get_progress(task_id_str, limit=50)
+        progress = await self.get_progress(task_id_str, limit=CONTEXT_PROGRESS_LIMIT)
 
         if not all([definition, state, constraints, tests]):
-            logger.warning(f"Incomplete artifacts for task {task_id}")
+            logger.warning(f"Incomplete artifacts for task {task_id_str}")
             return None
 
         return DomainContext(
@@ -689,6 +799,7 @@ class DomainMemoryStore:
 
     async def delete_task(self, task_id) -> bool:
         """Delete a task and all its artifacts (cascade)."""
+        self._forget_artifact(self._to_str(task_id))
         result = (
             self.supabase.table("domain_memory_tasks")
             .delete()
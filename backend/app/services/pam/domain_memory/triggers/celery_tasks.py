@@ -12,7 +12,8 @@ from uuid import UUID
 from celery import shared_task
 
 from ..router import DomainMemoryRouter, get_domain_memory_router
-from ..models import TaskStatus
+from ..models import TaskScope, TaskStatus
+from ..storage.database_store import default_worker_id
 
 logger = logging.getLogger(__name__)
 
@@ -129,7 +130,9 @@ def process_pending_tasks(
     """
     Process all pending tasks (scheduled via Celery Beat).
 
-    Picks up pending tasks and runs one step for each.
+    Claims pending tasks through the SKIP LOCKED work queue, so overlapping
+    beats or several workers never run the same task, and runs one step for
+    each before releasing it.
 
     Args:
         limit: Maximum tasks to process
@@ -142,11 +145,13 @@ def process_pending_tasks(
 
     try:
         router = get_domain_memory_router()
+        worker_id = default_worker_id()
 
-        pending = run_async(router.list_pending_tasks(limit=limit))
-
-        if scope:
-            pending = [t for t in pending if t.get("scope") == scope]
+        pending = run_async(router.claim_tasks(
+            worker_id=worker_id,
+            limit=limit,
+            scope=TaskScope(scope) if scope else None,
+        ))
 
         results = []
         for task_info in pending:
@@ -168,6 +173,8 @@ def process_pending_tasks(
                     "success": False,
                     "error": str(e),
                 })
+            finally:
+                run_async(router.release_task(UUID(task_id), worker_id=worker_id))
 
         return {
             "processed": len(results),
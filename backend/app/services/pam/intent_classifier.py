@@ -1,22 +1,36 @@
 """
 Enhanced Intent Classification System for PAM
 Integrates with existing memory and context systems while providing sophisticated classification
+
+Classification is tiered: the user's own corrections, an LRU of recent
+normalized messages, then the local n-gram model (intent_model), and the LLM
+only when the model's probability is below its calibrated threshold. The
+model sees the message text only, so the shared cache is keyed by it alone;
+corrections are kept per user and never enter the shared cache. Results are
+queued on the analytics pipeline instead of being written on the request path.
 """
 
 from typing import Dict, Any, List, Optional, Tuple
 import re
 import json
+from collections import OrderedDict
 from datetime import datetime, timezone
 from dataclasses import dataclass, asdict
 import logging
 from enum import Enum
 import asyncio
+import uuid
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage
 import os
 
+from app.services.pam.intent_model import IntentModel, get_intent_model, normalize_message
+
 logger = logging.getLogger(__name__)
 
+# Normalized messages whose classification is kept per classifier
+INTENT_CACHE_SIZE = 4096
+
 
 class IntentType(Enum):
     """Predefined intent types with consistent naming"""
@@ -73,7 +87,17 @@ class EnhancedIntentClassifier:
     4. Maintains intent history for pattern recognition
     """
     
-    def __init__(self, openai_api_key: Optional[str] = None):
+    def __init__(
+        self,
+        openai_api_key: Optional[str] = None,
+        model: Optional[IntentModel] = None,
+        cache_size: int = INTENT_CACHE_SIZE
+    ):
+        self.model = model or get_intent_model()
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Tuple[IntentType, float, str, str]]" = OrderedDict()
+        # (user_id, normalized message) -> classification the user corrected to
+        self._corrections: "OrderedDict[Tuple[str, str], Tuple[IntentType, float, str, str]]" = OrderedDict()
         self.openai_api_key = openai_api_key or os.getenv('OPENAI_API_KEY')
         self.ai_model = None
         if self.openai_api_key:
@@ -112,6 +136,11 @@ class EnhancedIntentClassifier:
                 r'\d+\s*(?:hour|hr)\s*(?:drive|trip)',
             ]
         }
+        self._compiled_entity_patterns = [
+            (entity_type, re.compile(pattern, re.IGNORECASE))
+            for entity_type, patterns in self.entity_patterns.items()
+            for pattern in patterns
+        ]
         
         # Intent classification rules (keyword-based fallback)
         self.intent_rules = {
@@ -164,45 +193,52 @@ class EnhancedIntentClassifier:
         context: Optional[Dict[str, Any]] = None
     ) -> IntentClassification:
         """
-        Classify user intent using both rule-based and AI-powered methods
+        Classify user intent: cached result, local model, then AI below the
+        model's calibrated threshold
         """
         try:
+            context = context or {}
             # Step 1: Extract entities first
             entities = await self._extract_entities(message)
             
-            # Step 2: Get rule-based classification
-            rule_based_intent, rule_confidence, context_clues = self._classify_with_rules(
-                message, context or {}
-            )
+            # Step 2: Keywords as context clues for handlers
+            _, _, context_clues = self._classify_with_rules(message, context)
             
-            # Step 3: Use AI for complex cases or low confidence
-            if self.ai_model and (rule_confidence < 0.8 or len(entities) > 2):
-                ai_result = await self._classify_with_ai(message, entities, context or {})
-                if ai_result and ai_result.confidence > rule_confidence:
-                    intent = ai_result.intent
-                    confidence = ai_result.confidence
-                    reasoning = ai_result.reasoning
-                    context_clues.extend(ai_result.context_clues)
-                else:
-                    intent = rule_based_intent
-                    confidence = rule_confidence
-                    reasoning = f"Rule-based classification using keywords: {context_clues}"
+            # Step 3: This user's correction, a recent identical message, else the local model
+            cache_key = normalize_message(message)
+            cached = self._lru_get(self._corrections, (str(user_id), cache_key))
+            if cached is None:
+                cached = self._cache_get(cache_key)
+            if cached:
+                intent, confidence, reasoning, source = cached
             else:
-                intent = rule_based_intent
-                confidence = rule_confidence
-                reasoning = f"Rule-based classification using keywords: {context_clues}"
+                intent, confidence = self._classify_with_model(message, context)
+                reasoning = f"Local classifier probability {confidence:.2f}"
+                source = "model"
+                
+                # Step 4: Use AI only when the model is unsure
+                if self.ai_model and confidence < self.model.threshold:
+                    ai_result = await self._classify_with_ai(message, entities, context)
+                    if ai_result and ai_result.confidence > confidence:
+                        intent = ai_result.intent
+                        confidence = ai_result.confidence
+                        reasoning = ai_result.reasoning
+                        context_clues.extend(ai_result.context_clues)
+                        source = "ai"
+                
+                self._lru_put(self._cache, cache_key, (intent, confidence, reasoning, source))
             
-            # Step 4: Determine appropriate handler
+            # Step 5: Determine appropriate handler
             suggested_handler = self._get_handler_for_intent(intent)
             
-            # Step 5: Check if clarification is needed
+            # Step 6: Check if clarification is needed
             requires_clarification, clarification_questions = self._check_clarification_needed(
                 intent, entities, confidence
             )
             
-            # Step 6: Store classification for learning
-            await self._store_classification(
-                user_id, message, intent, confidence, entities, context or {}
+            # Step 7: Queue classification for learning (batched, off the request path)
+            self._store_classification(
+                user_id, message, intent, confidence, entities, context, source
             )
             
             classification = IntentClassification(
@@ -235,32 +271,61 @@ class EnhancedIntentClassifier:
         """Extract entities from the message using pattern matching"""
         entities = []
         
-        for entity_type, patterns in self.entity_patterns.items():
-            for pattern in patterns:
-                matches = re.finditer(pattern, message, re.IGNORECASE)
-                for match in matches:
-                    entity = Entity(
-                        type=entity_type,
-                        value=match.group(),
-                        position=(match.start(), match.end()),
-                        confidence=0.8  # Pattern-based confidence
-                    )
-                    
-                    # Normalize common entities
-                    if entity_type == 'amount':
-                        entity.normalized_value = self._normalize_amount(entity.value)
-                    elif entity_type == 'date':
-                        entity.normalized_value = self._normalize_date(entity.value)
-                    elif entity_type == 'location':
-                        entity.normalized_value = entity.value.strip()
-                    
-                    entities.append(entity)
+        for entity_type, pattern in self._compiled_entity_patterns:
+            for match in pattern.finditer(message):
+                entity = Entity(
+                    type=entity_type,
+                    value=match.group(),
+                    position=(match.start(), match.end()),
+                    confidence=0.8  # Pattern-based confidence
+                )
+                
+                # Normalize common entities
+                if entity_type == 'amount':
+                    entity.normalized_value = self._normalize_amount(entity.value)
+                elif entity_type == 'date':
+                    entity.normalized_value = self._normalize_date(entity.value)
+                elif entity_type == 'location':
+                    entity.normalized_value = entity.value.strip()
+                
+                entities.append(entity)
         
         # Remove overlapping entities (keep highest confidence)
         entities = self._remove_overlapping_entities(entities)
         
         return entities
     
+    def _classify_with_model(
+        self,
+        message: str,
+        context: Dict[str, Any]
+    ) -> Tuple[IntentType, float]:
+        """Local n-gram model prediction from the message text"""
+        label, probability = self.model.predict(message)
+        try:
+            return IntentType(label), probability
+        except ValueError:
+            return IntentType.GENERAL_QUERY, probability
+    
+    def _cache_get(self, key: str) -> Optional[Tuple[IntentType, float, str, str]]:
+        entry = self._lru_get(self._cache, key)
+        if entry is None:
+            return None
+        intent, confidence, reasoning, _ = entry
+        return intent, confidence, reasoning, "cache"
+    
+    def _lru_get(self, lru: OrderedDict, key: Any) -> Optional[Tuple[IntentType, float, str, str]]:
+        entry = lru.get(key)
+        if entry is not None:
+            lru.move_to_end(key)
+        return entry
+    
+    def _lru_put(self, lru: OrderedDict, key: Any, entry: Tuple[IntentType, float, str, str]) -> None:
+        lru[key] = entry
+        lru.move_to_end(key)
+        while len(lru) > self.cache_size:
+            lru.popitem(last=False)
+    
     def _classify_with_rules(
         self, 
         message: str, 
@@ -399,7 +464,7 @@ Classify the user's message and respond with JSON:
         questions = []
         
         # Low confidence requires clarification
-        if confidence < 0.7:
+        if confidence < min(0.7, self.model.threshold):
             questions.append("I'm not entirely sure what you're asking about. Could you provide more details?")
         
         # Intent-specific clarification
@@ -420,22 +485,38 @@ Classify the user's message and respond with JSON:
         
         return len(questions) > 0, questions
     
-    async def _store_classification(
+    def _store_classification(
         self,
         user_id: str,
         message: str,
         intent: IntentType,
         confidence: float,
         entities: List[Entity],
-        context: Dict[str, Any]
+        context: Dict[str, Any],
+        source: str = "model"
     ):
-        """Store classification for pattern learning"""
+        """Queue classification as an intent_detected analytics event (fire and forget)"""
         try:
-            from app.services.database import get_database
+            from app.services.analytics.pipeline import get_analytics_pipeline
             
-            # This would store in pam_intent_patterns table
-            # Implementation would depend on database service
-            logger.debug(f"Storing classification: {intent.value} for user {user_id}")
+            try:
+                row_user_id = str(uuid.UUID(str(user_id)))
+            except ValueError:
+                row_user_id = None
+            get_analytics_pipeline().submit({
+                "event_type": "intent_detected",
+                "user_id": row_user_id,
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "success": True,
+                "event_data": {
+                    "intent": intent.value,
+                    "confidence": round(confidence, 3),
+                    "source": source,
+                    "entity_types": sorted({e.type for e in entities}),
+                    "page": context.get('current_page'),
+                },
+                "metadata": {} if row_user_id else {"user_ref": str(user_id)},
+            })
             
         except Exception as e:
             logger.error(f"Failed to store classification: {e}")
@@ -509,8 +590,12 @@ Classify the user's message and respond with JSON:
                 "timestamp": datetime.now(timezone.utc).isoformat()
             }
             
-            # This would update the learning model/patterns
-            # For now, log the correction for future model improvements
+            # Serve the corrected intent to this user only; other users keep the shared result
+            self._lru_put(
+                self._corrections,
+                (str(user_id), normalize_message(original_message)),
+                (corrected_intent, 1.0, f"User correction: {feedback}" if feedback else "User correction", "correction")
+            )
             logger.info(f"Correction logged: {correction_data}")
             
         except Exception as e:
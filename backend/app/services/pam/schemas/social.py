@@ -108,7 +108,8 @@ class GetFeedInput(BaseToolInput):
     """Validation for get_feed tool"""
 
     limit: int = Field(20, gt=0, le=100, description="Maximum posts (default: 20, max: 100)")
-    offset: int = Field(0, ge=0, description="Pagination offset (default: 0)")
+    offset: int = Field(0, ge=0, description="Pagination offset (default: 0, deprecated in favour of cursor)")
+    cursor: Optional[str] = Field(None, max_length=512, description="Opaque cursor from the previous page's next_cursor")
     filter_type: Optional[str] = Field(None, description="Feed filter (friends, following, all)")
 
     @validator("filter_type")
@@ -12,14 +12,19 @@ import logging
 from datetime import datetime
 from typing import Any, Dict
 
-from app.core.database import get_supabase_client
+from app.services.budget_analytics import (
+    EXPENSE_DAILY_COLUMNS,
+    EXPENSE_DAILY_TABLE,
+    month_window,
+    summarize_daily_rows,
+)
 from app.services.pam.tools.exceptions import (
     ValidationError,
     DatabaseError,
 )
 from app.services.pam.tools.utils import (
     validate_uuid,
-    safe_db_select,
+    ToolQuery,
 )
 
 logger = logging.getLogger(__name__)
@@ -45,32 +50,27 @@ async def analyze_budget(
     try:
         validate_uuid(user_id, "user_id")
 
-        supabase = get_supabase_client()
-
-        month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        window = month_window(datetime.now().date())
 
-        expenses = await safe_db_select(
-            "expenses",
-            filters={"user_id": user_id},
-            user_id=user_id
+        daily_rows = await (
+            ToolQuery(EXPENSE_DAILY_TABLE, user_id=user_id)
+            .select(EXPENSE_DAILY_COLUMNS)
+            .eq("user_id", user_id)
+            .between("day", window.start.isoformat(), window.end.isoformat())
+            .fetch()
         )
 
-        expenses = [e for e in expenses if datetime.fromisoformat(e.get("date", "1970-01-01")) >= month_start]
-
-        budgets = await safe_db_select(
-            "budgets",
-            filters={"user_id": user_id},
-            user_id=user_id
+        budgets = await (
+            ToolQuery("budgets", user_id=user_id)
+            .select("category", "monthly_limit")
+            .eq("user_id", user_id)
+            .fetch()  # unbounded-ok: one row per budget category
         )
 
-        spending_by_category = {}
-        total_spending = 0
-
-        for expense in expenses:
-            category = expense.get("category", "other")
-            amount = float(expense.get("amount", 0))
-            spending_by_category[category] = spending_by_category.get(category, 0) + amount
-            total_spending += amount
+        month_totals = summarize_daily_rows(daily_rows)
+        spending_by_category = {cat: float(totals.total) for cat, totals in month_totals.items()}
+        total_spending = sum(spending_by_category.values())
+        expense_count = sum(totals.count for totals in month_totals.values())
 
         budget_status = []
         for budget in budgets:
@@ -94,7 +94,7 @@ async def analyze_budget(
             "total_spending": total_spending,
             "spending_by_category": spending_by_category,
             "budget_status": budget_status,
-            "expense_count": len(expenses)
+            "expense_count": expense_count
         }
 
     except ValidationError:
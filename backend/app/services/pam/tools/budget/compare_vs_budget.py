@@ -11,14 +11,19 @@ import logging
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-from app.core.database import get_supabase_client
+from app.services.budget_analytics import (
+    EXPENSE_DAILY_COLUMNS,
+    EXPENSE_DAILY_TABLE,
+    month_window,
+    summarize_daily_rows,
+)
 from app.services.pam.tools.exceptions import (
     ValidationError,
     DatabaseError,
 )
 from app.services.pam.tools.utils import (
     validate_uuid,
-    safe_db_select,
+    ToolQuery,
 )
 
 logger = logging.getLogger(__name__)
@@ -48,34 +53,24 @@ async def compare_vs_budget(
     try:
         validate_uuid(user_id, "user_id")
 
-        supabase = get_supabase_client()
-
-        month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        window = month_window(datetime.now().date())
 
-        expenses = await safe_db_select(
-            "expenses",
-            filters={"user_id": user_id},
-            user_id=user_id
+        spending_query = (
+            ToolQuery(EXPENSE_DAILY_TABLE, user_id=user_id)
+            .select(EXPENSE_DAILY_COLUMNS)
+            .eq("user_id", user_id)
+            .between("day", window.start.isoformat(), window.end.isoformat())
         )
-
-        expenses = [e for e in expenses if datetime.fromisoformat(e.get("date", "1970-01-01")) >= month_start]
-
+        budgets_query = ToolQuery("budgets", user_id=user_id).select("category", "monthly_limit").eq("user_id", user_id)
         if category:
-            expenses = [e for e in expenses if e.get("category") == category.lower()]
+            spending_query.eq("category", category.lower())
+            budgets_query.eq("category", category.lower())
 
-        budgets = await safe_db_select(
-            "budgets",
-            filters={"user_id": user_id},
-            user_id=user_id
-        )
-
-        if category:
-            budgets = [b for b in budgets if b.get("category") == category.lower()]
-
-        spending = {}
-        for exp in expenses:
-            cat = exp.get("category", "other")
-            spending[cat] = spending.get(cat, 0) + float(exp.get("amount", 0))
+        spending = {
+            cat: float(totals.total)
+            for cat, totals in summarize_daily_rows(await spending_query.fetch()).items()
+        }
+        budgets = await budgets_query.fetch()  # unbounded-ok: one row per budget category
 
         comparisons = []
         for budget in budgets:
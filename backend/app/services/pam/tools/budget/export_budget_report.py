@@ -11,7 +11,6 @@ import logging
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-from app.core.database import get_supabase_client
 from app.services.pam.tools.exceptions import (
     ValidationError,
     DatabaseError,
@@ -19,7 +18,7 @@ from app.services.pam.tools.exceptions import (
 from app.services.pam.tools.utils import (
     validate_uuid,
     validate_date_format,
-    safe_db_select,
+    ToolQuery,
 )
 
 logger = logging.getLogger(__name__)
@@ -67,25 +66,27 @@ async def export_budget_report(
 
         month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
 
-        expenses = await safe_db_select(
-            "expenses",
-            filters={"user_id": user_id},
-            user_id=user_id
+        expenses = await (
+            ToolQuery("expenses", user_id=user_id)
+            .eq("user_id", user_id)
+            .gte("date", month_start.date().isoformat())
+            .order("date")
+            .fetch()
         )
-        expenses = [e for e in expenses if datetime.fromisoformat(e.get("date", "1970-01-01")) >= month_start]
 
-        budgets = await safe_db_select(
-            "budgets",
-            filters={"user_id": user_id},
-            user_id=user_id
+        budgets = await (
+            ToolQuery("budgets", user_id=user_id)
+            .eq("user_id", user_id)
+            .fetch()  # unbounded-ok: one row per budget category
         )
 
-        savings = await safe_db_select(
-            "pam_savings_events",
-            filters={"user_id": user_id},
-            user_id=user_id
+        savings = await (
+            ToolQuery("pam_savings_events", user_id=user_id)
+            .eq("user_id", user_id)
+            .gte("created_at", month_start.isoformat())
+            .order("created_at")
+            .fetch()
         )
-        savings = [s for s in savings if datetime.fromisoformat(s.get("created_at", "1970-01-01")) >= month_start]
 
         total_expenses = sum(float(e.get("amount", 0)) for e in expenses)
         total_budgeted = sum(float(b.get("monthly_limit", 0)) for b in budgets)
@@ -11,14 +11,18 @@ import logging
 from datetime import datetime, timedelta
 from typing import Any, Dict
 
-from app.core.database import get_supabase_client
+from app.services.budget_analytics import (
+    EXPENSE_DAILY_COLUMNS,
+    EXPENSE_DAILY_TABLE,
+    summarize_daily_rows,
+)
 from app.services.pam.tools.exceptions import (
     ValidationError,
     DatabaseError,
 )
 from app.services.pam.tools.utils import (
     validate_uuid,
-    safe_db_select,
+    ToolQuery,
 )
 
 logger = logging.getLogger(__name__)
@@ -52,20 +56,21 @@ async def find_savings_opportunities(
     try:
         validate_uuid(user_id, "user_id")
 
-        start_date = datetime.now() - timedelta(days=LOOKBACK_DAYS)
+        # Expense dates are days; whole days strictly inside the lookback window
+        first_day = datetime.now().date() - timedelta(days=LOOKBACK_DAYS - 1)
 
-        expenses = await safe_db_select(
-            "expenses",
-            filters={"user_id": user_id},
-            user_id=user_id
+        daily_rows = await (
+            ToolQuery(EXPENSE_DAILY_TABLE, user_id=user_id)
+            .select(EXPENSE_DAILY_COLUMNS)
+            .eq("user_id", user_id)
+            .in_("category", ["gas", "campground", "food"])
+            .gte("day", first_day.isoformat())
+            .fetch()
         )
 
-        expenses = [e for e in expenses if datetime.fromisoformat(e.get("date", "1970-01-01")) >= start_date]
-
-        spending_by_category = {}
-        for exp in expenses:
-            cat = exp.get("category", "other")
-            spending_by_category[cat] = spending_by_category.get(cat, 0) + float(exp.get("amount", 0))
+        spending_by_category = {
+            cat: float(totals.total) for cat, totals in summarize_daily_rows(daily_rows).items()
+        }
 
         suggestions = []
 
@@ -9,10 +9,14 @@ Example usage:
 """
 
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, time, timedelta
 from typing import Any, Dict, Optional
 
-from app.core.database import get_supabase_client
+from app.services.budget_analytics import (
+    EXPENSE_DAILY_COLUMNS,
+    EXPENSE_DAILY_TABLE,
+    summarize_daily_rows,
+)
 from app.services.pam.tools.exceptions import (
     ValidationError,
     DatabaseError,
@@ -21,7 +25,7 @@ from app.services.pam.tools.utils import (
     validate_uuid,
     validate_date_format,
     normalize_date_format,
-    safe_db_select,
+    ToolQuery,
 )
 
 logger = logging.getLogger(__name__)
@@ -94,27 +98,21 @@ async def get_spending_summary(
             days_back = period_days.get(period, PERIOD_DAYS_MONTHLY)
             start_dt = end_dt - timedelta(days=days_back)
 
-        expenses = await safe_db_select(
-            "expenses",
-            filters={"user_id": user_id},
-            user_id=user_id
+        # Expense dates are days: the first whole day at or after start_dt through end_dt's day
+        first_day = start_dt.date() if start_dt.time() == time.min else start_dt.date() + timedelta(days=1)
+        query = (
+            ToolQuery(EXPENSE_DAILY_TABLE, user_id=user_id)
+            .select(EXPENSE_DAILY_COLUMNS)
+            .eq("user_id", user_id)
+            .between("day", first_day.isoformat(), end_dt.date().isoformat())
         )
-
-        expenses = [
-            e for e in expenses
-            if start_dt <= datetime.fromisoformat(e.get("date", "1970-01-01")) <= end_dt
-        ]
-
         if category:
-            expenses = [e for e in expenses if e.get("category") == category.lower()]
-
-        total_amount = sum(float(e.get("amount", 0)) for e in expenses)
+            query.eq("category", category.lower())
 
-        by_category = {}
-        for expense in expenses:
-            cat = expense.get("category", "other")
-            amount = float(expense.get("amount", 0))
-            by_category[cat] = by_category.get(cat, 0) + amount
+        totals = summarize_daily_rows(await query.fetch())
+        by_category = {cat: float(entry.total) for cat, entry in totals.items()}
+        total_amount = sum(by_category.values())
+        expense_count = sum(entry.count for entry in totals.values())
 
         days_diff = (end_dt - start_dt).days or 1
         daily_average = total_amount / days_diff
@@ -126,7 +124,7 @@ async def get_spending_summary(
             "end_date": end_dt.isoformat(),
             "days": days_diff,
             "total_amount": total_amount,
-            "expense_count": len(expenses),
+            "expense_count": expense_count,
             "daily_average": daily_average,
             "by_category": by_category,
             "category_filter": category
@@ -8,10 +8,17 @@ Example usage:
 """
 
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Any, Dict, Optional
 
-from app.core.database import get_supabase_client
+from app.services.budget_analytics import (
+    EXPENSE_DAILY_COLUMNS,
+    EXPENSE_DAILY_TABLE,
+    TREND_WINDOW_DAYS,
+    month_window,
+    spending_trend,
+    summarize_daily_rows,
+)
 from app.services.pam.tools.exceptions import (
     ValidationError,
     DatabaseError,
@@ -23,8 +30,6 @@ from app.services.pam.tools.utils import (
 
 logger = logging.getLogger(__name__)
 
-DECEMBER_MONTH_NUMBER = 12
-
 
 async def predict_end_of_month(
     user_id: str,
@@ -41,7 +46,8 @@ async def predict_end_of_month(
         include_trends: Include spending trends in prediction
 
     Returns:
-        Dict with predictions
+        Dict with predictions. Month-to-date spend is read from the daily
+        expense aggregates, so the cost grows with days, not expenses.
 
     Raises:
         ValidationError: Invalid input parameters
@@ -50,34 +56,30 @@ async def predict_end_of_month(
     try:
         validate_uuid(user_id, "user_id")
 
-        now = datetime.now()
-        month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        days_elapsed = now.day
-
-        if now.month == DECEMBER_MONTH_NUMBER:
-            next_month = now.replace(year=now.year + 1, month=1, day=1)
-        else:
-            next_month = now.replace(month=now.month + 1, day=1)
-        days_in_month = (next_month - month_start).days
-
-        expenses = await safe_db_select(
-            "expenses",
-            filters={"user_id": user_id},
-            user_id=user_id
-        )
-
-        expenses = [e for e in expenses if datetime.fromisoformat(e.get("date", "1970-01-01")) >= month_start]
+        today = datetime.now().date()
+        window = month_window(today)
+        days_elapsed = window.days_elapsed
+        days_in_month = window.days_in_month
 
+        # One row per category per day, maintained by triggers on expenses
+        filters = {"user_id": user_id}
         if category:
-            expenses = [e for e in expenses if e.get("category") == category.lower()]
+            filters["category"] = category.lower()
+        rows = await safe_db_select(
+            EXPENSE_DAILY_TABLE,
+            filters=filters,
+            user_id=user_id,
+            select=EXPENSE_DAILY_COLUMNS,
+            ranges={"day": {"gte": window.start.isoformat(), "lte": window.end.isoformat()}}
+        )
 
-        spending = {}
-        for exp in expenses:
-            cat = exp.get("category", "other")
-            spending[cat] = spending.get(cat, 0) + float(exp.get("amount", 0))
+        spending = summarize_daily_rows(rows)
+        recent_days = min(TREND_WINDOW_DAYS, days_elapsed)
+        recent = summarize_daily_rows(rows, since=today - timedelta(days=recent_days - 1)) if include_trends else {}
 
         predictions = {}
-        for cat, spent in spending.items():
+        for cat, totals in spending.items():
+            spent = float(totals.total)
             daily_rate = spent / days_elapsed if days_elapsed > 0 else 0
             projected = daily_rate * days_in_month
             predictions[cat] = {
@@ -85,6 +87,10 @@ async def predict_end_of_month(
                 "daily_rate": daily_rate,
                 "projected_total": projected
             }
+            if include_trends:
+                recent_rate = float(recent[cat].total) / recent_days if cat in recent else 0.0
+                predictions[cat]["recent_daily_rate"] = recent_rate
+                predictions[cat]["trend"] = spending_trend(daily_rate, recent_rate)
 
         total_projected = sum(p["projected_total"] for p in predictions.values())
 
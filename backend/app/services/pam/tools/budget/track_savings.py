@@ -12,7 +12,6 @@ import logging
 from datetime import datetime
 from typing import Any, Dict, Optional
 
-from app.core.database import get_supabase_client
 from app.services.pam.tools.exceptions import (
     ValidationError,
     DatabaseError,
@@ -21,7 +20,7 @@ from app.services.pam.tools.utils import (
     validate_uuid,
     validate_positive_number,
     safe_db_insert,
-    safe_db_select,
+    ToolQuery,
 )
 
 logger = logging.getLogger(__name__)
@@ -96,17 +95,14 @@ async def track_savings(
 
         month_start = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0).date()
 
-        monthly_savings = await safe_db_select(
-            "pam_savings_events",
-            filters={"user_id": user_id},
-            user_id=user_id
+        monthly_savings = await (
+            ToolQuery("pam_savings_events", user_id=user_id)
+            .select("actual_savings")
+            .eq("user_id", user_id)
+            .gte("saved_date", month_start.isoformat())
+            .fetch()
         )
 
-        monthly_savings = [
-            s for s in monthly_savings
-            if datetime.fromisoformat(s.get("saved_date", "1970-01-01")).date() >= month_start
-        ]
-
         monthly_total = sum(event.get("actual_savings", 0) for event in monthly_savings)
 
         return {
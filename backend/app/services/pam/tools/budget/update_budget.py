@@ -21,7 +21,7 @@ from app.services.pam.tools.utils import (
     validate_uuid,
     validate_positive_number,
     safe_db_insert,
-    safe_db_select,
+    ToolQuery,
 )
 
 logger = logging.getLogger(__name__)
@@ -60,15 +60,12 @@ async def update_budget(
 
         supabase = get_supabase_client()
 
-        existing = await safe_db_select(
-            "budgets",
-            filters={"user_id": user_id},
-            user_id=user_id
-        )
-
-        existing_budget = next(
-            (b for b in existing if b.get("category") == category.lower()),
-            None
+        existing_budget = await (
+            ToolQuery("budgets", user_id=user_id)
+            .select("id")
+            .eq("user_id", user_id)
+            .eq("category", category.lower())
+            .first()
         )
 
         budget_data = {
@@ -60,10 +60,10 @@ async def delete_calendar_event(
             .select("title")\
             .eq("id", event_id)\
             .eq("user_id", user_id)\
-            .maybeSingle()\
+            .maybe_single()\
             .execute()
 
-        if not existing_response.data:
+        if not existing_response or not existing_response.data:
             raise ResourceNotFoundError(
                 "Calendar event not found or you don't have permission to delete it",
                 context={"user_id": user_id, "event_id": event_id}
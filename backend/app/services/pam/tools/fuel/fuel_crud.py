@@ -251,7 +251,7 @@ async def update_fuel_entry(
                 .select("*")\
                 .eq("id", entry_id)\
                 .eq("user_id", user_id)\
-                .maybeSingle()\
+                .maybe_single()\
                 .execute()
         else:
             existing = supabase.table("fuel_log")\
@@ -260,10 +260,10 @@ async def update_fuel_entry(
                 .order("date", desc=True)\
                 .order("created_at", desc=True)\
                 .limit(1)\
-                .maybeSingle()\
+                .maybe_single()\
                 .execute()
 
-        if not existing.data:
+        if not existing or not existing.data:
             raise ResourceNotFoundError(
                 "No fuel entry found to update",
                 context={"user_id": user_id, "entry_id": entry_id}
@@ -379,7 +379,7 @@ async def delete_fuel_entry(
                 .select("*")\
                 .eq("id", entry_id)\
                 .eq("user_id", user_id)\
-                .maybeSingle()\
+                .maybe_single()\
                 .execute()
         else:
             existing = supabase.table("fuel_log")\
@@ -388,10 +388,10 @@ async def delete_fuel_entry(
                 .order("date", desc=True)\
                 .order("created_at", desc=True)\
                 .limit(1)\
-                .maybeSingle()\
+                .maybe_single()\
                 .execute()
 
-        if not existing.data:
+        if not existing or not existing.data:
             raise ResourceNotFoundError(
                 "No fuel entry found to delete",
                 context={"user_id": user_id, "entry_id": entry_id}
@@ -86,29 +86,23 @@ async def get_calendar_events(
             except ValueError:
                 raise ValidationError(f"Invalid end_date format: {end_date}")
 
-        # Execute query - safe_db_select doesn't support complex queries
-        # so we'll get all events for user and filter in Python for now
-        events = await safe_db_select(
-            "calendar_events",
-            filters,
-            user_id
-        )
-
-        # Apply date filtering in Python (since safe_db_select is limited)
+        # Date bounds, ordering and the limit are applied by the database
+        ranges = {}
         if not include_past:
-            now = datetime.now(timezone.utc)
-            events = [e for e in events if e.get('end_date') and datetime.fromisoformat(e['end_date'].replace('Z', '+00:00')) >= now]
-
+            ranges.setdefault("end_date", {})["gte"] = datetime.now(timezone.utc).isoformat()
         if start_dt:
-            events = [e for e in events if e.get('start_date') and datetime.fromisoformat(e['start_date'].replace('Z', '+00:00')) >= start_dt]
-
+            ranges.setdefault("start_date", {})["gte"] = start_dt.isoformat()
         if end_dt:
-            events = [e for e in events if e.get('end_date') and datetime.fromisoformat(e['end_date'].replace('Z', '+00:00')) <= end_dt]
+            ranges.setdefault("end_date", {})["lte"] = end_dt.isoformat()
 
-        # Sort by start_date and limit results
-        events.sort(key=lambda e: e.get('start_date', ''))
-        if limit:
-            events = events[:limit]
+        events = await safe_db_select(
+            "calendar_events",
+            filters,
+            user_id,
+            order_by="start_date",
+            limit=limit,
+            ranges=ranges
+        )
 
         # Format response
         if not events:
@@ -189,7 +189,7 @@ async def update_maintenance_record(
                 .select("*")\
                 .eq("id", record_id)\
                 .eq("user_id", user_id)\
-                .maybeSingle()\
+                .maybe_single()\
                 .execute()
         elif task_name:
             all_records = supabase.table("maintenance_records")\
@@ -224,7 +224,7 @@ async def update_maintenance_record(
                 context={"record_id": record_id, "task_name": task_name}
             )
 
-        if not existing.data:
+        if not existing or not existing.data:
             raise ResourceNotFoundError(
                 "Maintenance record not found",
                 context={"user_id": user_id, "record_id": record_id, "task_name": task_name}
@@ -320,7 +320,7 @@ async def delete_maintenance_record(
                 .select("*")\
                 .eq("id", record_id)\
                 .eq("user_id", user_id)\
-                .maybeSingle()\
+                .maybe_single()\
                 .execute()
         elif task_name:
             all_records = supabase.table("maintenance_records")\
@@ -355,7 +355,7 @@ async def delete_maintenance_record(
                 context={"record_id": record_id, "task_name": task_name}
             )
 
-        if not existing.data:
+        if not existing or not existing.data:
             raise ResourceNotFoundError(
                 "Maintenance record not found",
                 context={"user_id": user_id, "record_id": record_id, "task_name": task_name}
@@ -2,7 +2,9 @@
 PAM Tool: Search Recipes
 
 Searches user's recipe collection with dietary restriction enforcement
-Automatically filters out non-compliant recipes based on user preferences
+Automatically filters out non-compliant recipes based on user preferences;
+allergen, restriction and ingredient filters run in the database against
+indexed arrays, so every returned row already complies
 """
 
 import logging
@@ -17,12 +19,15 @@ from app.services.pam.tools.utils import (
     validate_uuid,
     validate_positive_number,
 )
+from app.services.text_search import (
+    search_recipes as ranked_recipes,
+    search_terms,
+)
 
 logger = logging.getLogger(__name__)
 
 DEFAULT_SEARCH_LIMIT = 10
 MAX_SEARCH_LIMIT = 100
-SEARCH_RESULT_MULTIPLIER = 3
 
 
 async def search_recipes(
@@ -42,7 +47,7 @@ async def search_recipes(
 
     Args:
         user_id: ID of the user searching
-        query: Text query (recipe name/description)
+        query: Text query (recipe name/description/cuisine), best match first
         ingredients: List of ingredients to search for
         meal_type: Filter by meal type (breakfast, lunch, dinner, snack)
         dietary_tags: Filter by dietary tags (vegan, gluten-free, etc.)
@@ -84,7 +89,7 @@ async def search_recipes(
 
         supabase = get_supabase_client()
 
-        prefs_result = supabase.table("user_dietary_preferences").select("*").eq("user_id", user_id).execute()
+        prefs_result = supabase.table("user_dietary_preferences").select("dietary_restrictions, allergies").eq("user_id", user_id).execute()
 
         user_restrictions = []
         user_allergies = []
@@ -93,60 +98,26 @@ async def search_recipes(
             user_restrictions = prefs_result.data[0].get("dietary_restrictions", []) or []
             user_allergies = prefs_result.data[0].get("allergies", []) or []
 
-        query_builder = supabase.table("recipes").select("*")
-
-        if query:
-            query_builder = query_builder.or_(f"title.ilike.%{query}%,description.ilike.%{query}%")
-
-        if meal_type:
-            query_builder = query_builder.contains("meal_type", [meal_type])
-
-        if dietary_tags:
-            for tag in dietary_tags:
-                query_builder = query_builder.contains("dietary_tags", [tag])
-
-        if max_prep_time:
-            query_builder = query_builder.lte("prep_time_minutes", max_prep_time)
-
-        result = query_builder.order("created_at", desc=True).limit(limit * SEARCH_RESULT_MULTIPLIER).execute()
-
-        filtered_recipes = []
-
-        for recipe in result.data:
-            recipe_tags = set(recipe.get("dietary_tags", []) or [])
-
-            if user_allergies:
-                recipe_ingredients_str = str(recipe.get("ingredients", [])).lower()
-                has_allergen = any(
-                    allergen.lower() in recipe_ingredients_str
-                    for allergen in user_allergies
-                )
-                if has_allergen:
-                    logger.info(f"Filtering out recipe with allergen: {recipe['title']}")
-                    continue
-
-            if user_restrictions:
-                if not all(restriction in recipe_tags for restriction in user_restrictions):
-                    logger.info(f"Filtering out non-compliant recipe: {recipe['title']}")
-                    continue
-
-            if ingredients:
-                recipe_ingredients_str = str(recipe.get("ingredients", [])).lower()
-                has_ingredient = any(
-                    ing.lower() in recipe_ingredients_str
-                    for ing in ingredients
-                )
-                if not has_ingredient:
-                    continue
-
-            filtered_recipes.append(recipe)
-
-            if len(filtered_recipes) >= limit:
-                break
+        terms = search_terms(query) if query else []
+        required_tags = list(dict.fromkeys(list(dietary_tags or []) + list(user_restrictions)))
+
+        hits = ranked_recipes(
+            supabase,
+            user_id,
+            terms=terms,
+            meal_type=meal_type,
+            required_tags=required_tags,
+            exclude_ingredients=user_allergies,
+            any_ingredients=ingredients,
+            max_prep_time=max_prep_time,
+            include_public=include_public,
+            limit=limit,
+        )
+        filtered_recipes = [hit.row for hit in hits]
 
         logger.info(
             f"Found {len(filtered_recipes)} recipes for user {user_id} "
-            f"(filtered from {len(result.data)} total, restrictions: {user_restrictions}, allergies: {user_allergies})"
+            f"(terms: {terms}, restrictions: {user_restrictions}, allergies: {user_allergies})"
         )
 
         return {
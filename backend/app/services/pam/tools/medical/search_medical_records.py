@@ -1,12 +1,12 @@
 """Search Medical Records Tool for PAM
 
 Full-text search across user's medical documents using OCR text.
-Splits multi-word queries into individual terms for OR-based matching.
+Splits multi-word queries into individual terms, matched as prefixes with
+OR logic against the records' ranked search index.
 """
 
 import logging
-import re
-from typing import Any, Dict, List
+from typing import Any, Dict
 from pydantic import ValidationError
 
 from app.integrations.supabase import get_supabase_client
@@ -16,72 +16,13 @@ from app.services.pam.tools.exceptions import (
     DatabaseError,
 )
 from app.services.pam.tools.utils import validate_uuid
+from app.services.text_search import (
+    search_medical_records as ranked_medical_records,
+    search_terms,
+)
 
 logger = logging.getLogger(__name__)
 
-SNIPPET_LENGTH = 500
-
-# Words too common to be useful search terms
-STOP_WORDS = {
-    "a", "an", "the", "is", "it", "in", "on", "at", "to", "for",
-    "of", "and", "or", "my", "me", "i", "do", "if", "no", "so",
-    "up", "can", "you", "has", "had", "was", "are", "be", "any",
-    "all", "about", "have", "what", "with", "that", "this", "from",
-}
-
-
-def _split_query(query: str) -> List[str]:
-    """Split a query into meaningful search terms, filtering stop words."""
-    words = re.split(r'\s+', query.lower().strip())
-    terms = [w for w in words if len(w) >= 3 and w not in STOP_WORDS]
-    # If all words were filtered out, use original words with len >= 2
-    if not terms:
-        terms = [w for w in words if len(w) >= 2]
-    return terms
-
-
-def _build_or_filter(terms: List[str]) -> str:
-    """Build a PostgREST OR filter searching across ocr_text, title, summary."""
-    conditions = []
-    for term in terms:
-        conditions.append(f"ocr_text.ilike.%{term}%")
-        conditions.append(f"title.ilike.%{term}%")
-        conditions.append(f"summary.ilike.%{term}%")
-    return ",".join(conditions)
-
-
-def _extract_snippet(text: str, terms: List[str], max_length: int = SNIPPET_LENGTH) -> str:
-    """Extract a text snippet around the first matching term."""
-    if not text:
-        return ""
-
-    lower_text = text.lower()
-
-    # Find first matching term position
-    best_pos = -1
-    matched_term = ""
-    for term in terms:
-        pos = lower_text.find(term.lower())
-        if pos != -1 and (best_pos == -1 or pos < best_pos):
-            best_pos = pos
-            matched_term = term
-
-    if best_pos == -1:
-        return text[:max_length] + ("..." if len(text) > max_length else "")
-
-    # Center the snippet around the match
-    half = max_length // 2
-    start = max(0, best_pos - half)
-    end = min(len(text), best_pos + len(matched_term) + half)
-
-    snippet = text[start:end]
-    if start > 0:
-        snippet = "..." + snippet
-    if end < len(text):
-        snippet = snippet + "..."
-
-    return snippet
-
 
 async def search_medical_records(
     user_id: str,
@@ -93,7 +34,8 @@ async def search_medical_records(
     Search through user's medical documents by keyword.
 
     Splits multi-word queries into individual terms and searches with OR logic
-    across OCR text, title, and summary fields.
+    across OCR text, title, and summary fields, best match first. Matching
+    text is highlighted by the database.
 
     Args:
         user_id: UUID of the user
@@ -124,7 +66,7 @@ async def search_medical_records(
             )
 
         supabase = get_supabase_client()
-        terms = _split_query(validated.query)
+        terms = search_terms(validated.query)
 
         if not terms:
             return {
@@ -140,19 +82,8 @@ async def search_medical_records(
             f"(original query: '{validated.query}')"
         )
 
-        # Single query searching across all fields with OR logic
-        or_filter = _build_or_filter(terms)
-        response = (
-            supabase.table("medical_records")
-            .select("id,type,title,summary,tags,test_date,ocr_text,content_json")
-            .eq("user_id", validated.user_id)
-            .or_(or_filter)
-            .limit(validated.limit)
-            .execute()
-        )
-
-        records = response.data if response.data else []
-        found_ids = {r["id"] for r in records}
+        hits = ranked_medical_records(supabase, validated.user_id, terms, validated.limit)
+        found_ids = {hit.row["id"] for hit in hits}
 
         # Also find records with no searchable text (NULL ocr_text and summary)
         # so PAM knows they exist but couldn't be text-searched
@@ -176,10 +107,10 @@ async def search_medical_records(
                         "note": "No OCR text available - document exists but content could not be read",
                     })
 
-        # Build results with snippets (strip full OCR text to save tokens)
+        # Highlighted snippets instead of the full OCR text to save tokens
         results = []
-        for record in records:
-            snippet = _extract_snippet(record.get("ocr_text", ""), terms)
+        for hit in hits:
+            record = hit.row
             results.append({
                 "id": record["id"],
                 "type": record.get("type"),
@@ -187,8 +118,9 @@ async def search_medical_records(
                 "summary": record.get("summary"),
                 "tags": record.get("tags"),
                 "test_date": record.get("test_date"),
-                "matching_text": snippet,
-                "has_structured_data": bool(record.get("content_json")),
+                "matching_text": hit.highlight or "",
+                "relevance": round(hit.rank, 4),
+                "has_structured_data": bool(record.get("has_structured_data")),
             })
 
         logger.info(
@@ -1,7 +1,8 @@
 """OpenMeteo Weather Tool - Free weather API integration (no API key required)."""
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
 from app.services.pam.tools.base_tool import BaseTool
@@ -11,10 +12,13 @@ from app.services.pam.tools.exceptions import (
     ExternalAPIError,
 )
 
-from app.services.pam.tools.weather import get_weather, get_weather_forecast
+from app.services.geocoding.geocoding_service import normalize_query
+from app.services.pam.tools.route_weather import route_weather_service
+from app.services.pam.tools.weather import _get_coordinates_for_city, get_weather, get_weather_forecast
 
 logger = logging.getLogger(__name__)
 
+# Place names are geocoded one at a time (Nominatim policy); coordinates are not limited
 MAX_ROUTE_POINTS = 10
 RV_WIND_SPEED_DANGEROUS = 30
 RV_WIND_SPEED_POOR = 25
@@ -235,27 +239,75 @@ class OpenMeteoWeatherTool(BaseTool):
 
         return recommendations
 
+    async def _resolve_route_points(self, route_points: list) -> Tuple[List[Tuple[float, float]], List[int], Dict[Tuple[float, float], str], list]:
+        """
+        Coordinates for route points given as "lat,lng", {"lat", "lng"} or place
+        names, and the indices of those that are stops rather than polyline
+        vertices (every point of a short route, named places on a long one).
+        """
+        # Geocode each place as written; normalize_query (casefolded, state names
+        # folded to abbreviations) is only the dedup key
+        names: Dict[str, str] = {}
+        for point in route_points:
+            if isinstance(point, str) and self._parse_coordinates(point) is None and point.strip():
+                names.setdefault(normalize_query(point), point.strip())
+        keys = list(names)[:MAX_ROUTE_POINTS]
+        resolved_names = dict(zip(keys, await asyncio.gather(*(_get_coordinates_for_city(names[key]) for key in keys))))
+
+        coordinates, stops, labels, unresolved = [], [], {}, []
+        for point in route_points:
+            if isinstance(point, dict):
+                lat = point.get("lat", point.get("latitude"))
+                lon = point.get("lng", point.get("lon", point.get("longitude")))
+                coords = (float(lat), float(lon)) if lat is not None and lon is not None else None
+            elif isinstance(point, str):
+                coords = self._parse_coordinates(point)
+                if coords is None:
+                    found = resolved_names.get(normalize_query(point), (None, None))
+                    coords = found if found[0] is not None else None
+            else:
+                coords = None
+
+            if coords is None:
+                unresolved.append(point)
+                continue
+            if len(route_points) <= MAX_ROUTE_POINTS or (isinstance(point, str) and self._parse_coordinates(point) is None):
+                stops.append(len(coordinates))
+            coordinates.append(coords)
+            labels.setdefault(coords, point if isinstance(point, str) else f"{coords[0]:.4f}, {coords[1]:.4f}")
+        return coordinates, stops, labels, unresolved
+
+    @staticmethod
+    def _parse_coordinates(point: str) -> Optional[Tuple[float, float]]:
+        parts = point.split(",")
+        if len(parts) != 2:
+            return None
+        try:
+            return float(parts[0]), float(parts[1])
+        except ValueError:
+            return None
+
     async def _get_route_weather(
         self,
         route_points: list,
         units: str
     ) -> Dict[str, Any]:
-        """Get weather along a route (limited to first 10 points)."""
-        route_weather = []
+        """Get weather along a route, sampled at a fixed distance interval."""
+        coordinates, stops, labels, unresolved = await self._resolve_route_points(route_points)
 
-        for point in route_points[:MAX_ROUTE_POINTS]:
-            weather = await get_weather(location=point, units=units)
-
-            if 'error' not in weather:
-                route_weather.append({
-                    "location": point,
-                    "weather": weather,
-                    "safe_for_rv": self._assess_rv_travel_safety(
-                        wind_speed=float(weather.get('wind_speed', '0 mph').split()[0]),
-                        conditions=weather.get('description', '').lower(),
-                        temperature=weather.get('temperature', 70)
-                    )
-                })
+        route_weather = []
+        for sample, weather in await route_weather_service.route_weather(coordinates, units, stops):
+            point = (sample.latitude, sample.longitude)
+            route_weather.append({
+                "location": labels.get(point, f"{sample.latitude:.4f}, {sample.longitude:.4f}"),
+                "distance_km": sample.distance_km,
+                "weather": weather,
+                "safe_for_rv": self._assess_rv_travel_safety(
+                    wind_speed=float(weather.get('wind_speed', '0 mph').split()[0]),
+                    conditions=weather.get('description', '').lower(),
+                    temperature=weather.get('temperature', 70)
+                )
+            })
 
         if not route_weather:
             return {
@@ -271,6 +323,7 @@ class OpenMeteoWeatherTool(BaseTool):
         return {
             "route_weather": route_weather,
             "total_points": len(route_weather),
+            "unresolved_points": unresolved,
             "hazardous_sections": hazards,
             "overall_safety": "Safe" if not hazards else "Caution Required",
             "data_source": "OpenMeteo (European Weather Service)"
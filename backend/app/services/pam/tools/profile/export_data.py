@@ -76,41 +76,49 @@ async def export_data(
         profile_data = await safe_db_select(
             "profiles",
             columns="*",
-            filters={"id": validated.user_id}
+            filters={"id": validated.user_id},
+            single=True
         )
-        export_data_obj["profile"] = profile_data[0] if profile_data else None
+        export_data_obj["profile"] = profile_data
 
         settings_data = await safe_db_select(
             "user_settings",
             columns="*",
-            filters={"user_id": validated.user_id}
+            filters={"user_id": validated.user_id},
+            single=True
         )
-        export_data_obj["settings"] = settings_data[0] if settings_data else None
+        export_data_obj["settings"] = settings_data
 
         privacy_data = await safe_db_select(
             "privacy_settings",
             columns="*",
-            filters={"user_id": validated.user_id}
+            filters={"user_id": validated.user_id},
+            single=True
         )
-        export_data_obj["privacy_settings"] = privacy_data[0] if privacy_data else None
+        export_data_obj["privacy_settings"] = privacy_data
 
         if validated.include_expenses:
+            # unbounded-ok: full data export
             expenses_data = await safe_db_select("expenses", columns="*", filters={"user_id": validated.user_id})
             export_data_obj["expenses"] = expenses_data or []
 
         if validated.include_budgets:
+            # unbounded-ok: full data export
             budgets_data = await safe_db_select("budgets", columns="*", filters={"user_id": validated.user_id})
             export_data_obj["budgets"] = budgets_data or []
 
         if validated.include_trips:
+            # unbounded-ok: full data export
             trips_data = await safe_db_select("user_trips", columns="*", filters={"user_id": validated.user_id})
             export_data_obj["trips"] = trips_data or []
 
         if validated.include_posts:
+            # unbounded-ok: full data export
             posts_data = await safe_db_select("posts", columns="*", filters={"user_id": validated.user_id})
             export_data_obj["posts"] = posts_data or []
 
         if validated.include_favorites:
+            # unbounded-ok: full data export
             favorites_data = await safe_db_select("favorite_locations", columns="*", filters={"user_id": validated.user_id})
             export_data_obj["favorite_locations"] = favorites_data or []
 
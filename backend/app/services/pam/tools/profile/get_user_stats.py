@@ -15,6 +15,7 @@ from datetime import datetime, timedelta
 from pydantic import ValidationError as PydanticValidationError
 
 from app.integrations.supabase import get_supabase_client
+from app.services.budget_analytics import EXPENSE_DAILY_TABLE
 from app.services.pam.schemas.profile import GetUserStatsInput
 from app.services.pam.tools.exceptions import (
     ValidationError,
@@ -64,10 +65,13 @@ async def get_user_stats(
 
         stats = {}
 
-        expenses_data = await safe_db_select("expenses", columns="amount", filters={"user_id": validated.user_id})
+        # unbounded-ok: pre-aggregated, one row per active day and category
+        expense_days = await safe_db_select(
+            EXPENSE_DAILY_TABLE, columns="total, expense_count", filters={"user_id": validated.user_id}
+        )
 
-        total_expenses = sum(expense["amount"] for expense in (expenses_data or []))
-        expense_count = len(expenses_data or [])
+        total_expenses = sum(float(day["total"]) for day in (expense_days or []))
+        expense_count = sum(day["expense_count"] for day in (expense_days or []))
 
         stats["budget"] = {
             "total_expenses": round(total_expenses, 2),
@@ -75,10 +79,11 @@ async def get_user_stats(
             "avg_expense": round(total_expenses / expense_count, 2) if expense_count > 0 else 0
         }
 
-        trips_data = await safe_db_select("user_trips", columns="*", filters={"user_id": validated.user_id})
+        # unbounded-ok: lifetime stats, one narrow column per trip
+        trips_data = await safe_db_select("user_trips", columns="distance_miles", filters={"user_id": validated.user_id})
 
         trip_count = len(trips_data or [])
-        total_miles = sum(trip.get("distance_miles", 0) for trip in (trips_data or []))
+        total_miles = sum(trip.get("distance_miles") or 0 for trip in (trips_data or []))
 
         stats["trips"] = {
             "trip_count": trip_count,
@@ -86,10 +91,11 @@ async def get_user_stats(
             "avg_miles_per_trip": round(total_miles / trip_count, 2) if trip_count > 0 else 0
         }
 
-        posts_data = await safe_db_select("posts", columns="*", filters={"user_id": validated.user_id})
+        # unbounded-ok: lifetime stats, one narrow column per post
+        posts_data = await safe_db_select("posts", columns="likes_count", filters={"user_id": validated.user_id})
 
         post_count = len(posts_data or [])
-        total_likes = sum(post.get("likes_count", 0) for post in (posts_data or []))
+        total_likes = sum(post.get("likes_count") or 0 for post in (posts_data or []))
 
         stats["social"] = {
             "post_count": post_count,
@@ -97,14 +103,16 @@ async def get_user_stats(
             "avg_likes_per_post": round(total_likes / post_count, 2) if post_count > 0 else 0
         }
 
-        profile_data = await safe_db_select("profiles", columns="created_at", filters={"id": validated.user_id})
+        profile_data = await safe_db_select(
+            "profiles", columns="created_at", filters={"id": validated.user_id}, single=True
+        )
 
         if profile_data:
-            created_at = datetime.fromisoformat(profile_data[0]["created_at"].replace("Z", "+00:00"))
+            created_at = datetime.fromisoformat(profile_data["created_at"].replace("Z", "+00:00"))
             days_member = (datetime.now(created_at.tzinfo) - created_at).days
 
             stats["account"] = {
-                "member_since": profile_data[0]["created_at"],
+                "member_since": profile_data["created_at"],
                 "days_as_member": days_member
             }
 
@@ -0,0 +1,262 @@
+"""Route weather sampling for PAM using the OpenMeteo API.
+
+Weather along a route is looked up in four steps:
+
+1. sample the route polyline every ``interval_km``, plus both ends and any
+   stops, so a dense polyline costs no more per kilometre than a few stops
+2. snap each sample to a geohash cell; samples in the same cell share one
+   forecast, fetched at the cell centre
+3. fetch every uncached cell concurrently, many cells per request (OpenMeteo
+   accepts comma-separated coordinate lists)
+4. cache each cell's conditions per UTC hour, in-process and in Redis
+
+Environment:
+    ROUTE_WEATHER_INTERVAL_KM     sampling interval (default 25)
+    ROUTE_WEATHER_CELL_PRECISION  geohash length of a weather cell (default 5, ~5 km)
+    ROUTE_WEATHER_BATCH_SIZE      coordinates per OpenMeteo request (default 50)
+    ROUTE_WEATHER_MAX_SAMPLES     samples per route (default 200)
+    ROUTE_WEATHER_CACHE_TTL       seconds a cell's conditions are kept (default 3600)
+"""
+
+import asyncio
+import logging
+import math
+import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.http_clients import get_http_client
+from app.services.geocoding.geocoding_service import LRUCache, geohash_center, geohash_encode
+from app.services.pam.tools.exceptions import ExternalAPIError
+from app.services.pam.tools.weather import (
+    CURRENT_HOURLY_FIELDS,
+    DEFAULT_FORECAST_DAYS,
+    format_current_weather,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL_KM = float(os.getenv("ROUTE_WEATHER_INTERVAL_KM", "25"))
+DEFAULT_CELL_PRECISION = int(os.getenv("ROUTE_WEATHER_CELL_PRECISION", "5"))
+DEFAULT_BATCH_SIZE = int(os.getenv("ROUTE_WEATHER_BATCH_SIZE", "50"))
+DEFAULT_MAX_SAMPLES = int(os.getenv("ROUTE_WEATHER_MAX_SAMPLES", "200"))
+DEFAULT_CACHE_TTL = int(os.getenv("ROUTE_WEATHER_CACHE_TTL", "3600"))
+
+EARTH_RADIUS_KM = 6371.0088
+KEY_PREFIX = "route_weather"
+
+Point = Tuple[float, float]
+
+
+@dataclass
+class RouteSample:
+    """A point on the route, its distance along it and its weather cell"""
+    latitude: float
+    longitude: float
+    distance_km: float
+    cell: str
+
+
+def haversine_km(a: Point, b: Point) -> float:
+    """Great-circle distance between two (latitude, longitude) points"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, h)))
+
+
+def sample_route(points: Sequence[Point], interval_km: float = DEFAULT_INTERVAL_KM,
+                 max_samples: int = DEFAULT_MAX_SAMPLES,
+                 stops: Sequence[int] = ()) -> List[Tuple[float, float, float]]:
+    """
+    (latitude, longitude, distance_km) every interval_km along the polyline,
+    always including its first and last point and the vertices listed in
+    stops. Positions between vertices are interpolated linearly, which is
+    accurate at these segment lengths. The interval is widened if the route
+    would need more than max_samples.
+    """
+    if not points:
+        return []
+    if len(points) == 1:
+        return [(points[0][0], points[0][1], 0.0)]
+
+    lengths = [haversine_km(points[i], points[i + 1]) for i in range(len(points) - 1)]
+    total = sum(lengths)
+    if total == 0:
+        return [(points[0][0], points[0][1], 0.0)]
+    interval = max(interval_km, total / max(max_samples - 1, 1))
+    stops = set(stops)
+
+    samples = [(points[0][0], points[0][1], 0.0)]
+    next_at = interval
+    travelled = 0.0
+    for index, ((start, end), length) in enumerate(zip(zip(points, points[1:]), lengths), start=1):
+        while length > 0 and next_at < travelled + length and next_at < total:
+            fraction = (next_at - travelled) / length
+            samples.append((
+                start[0] + (end[0] - start[0]) * fraction,
+                start[1] + (end[1] - start[1]) * fraction,
+                next_at,
+            ))
+            next_at += interval
+        travelled += length
+        if index in stops and index < len(points) - 1 and travelled > samples[-1][2]:
+            samples.append((end[0], end[1], travelled))
+    samples.append((points[-1][0], points[-1][1], total))
+    return samples
+
+
+def weather_cell(latitude: float, longitude: float, precision: int = DEFAULT_CELL_PRECISION) -> str:
+    """Geohash cell whose centre stands in for every point inside it"""
+    return geohash_encode(latitude, longitude, precision)
+
+
+def cell_key(cell: str, units: str, hour: Optional[str] = None) -> str:
+    """Cache key for a cell's conditions in one UTC hour"""
+    hour = hour or datetime.now(timezone.utc).strftime("%Y%m%d%H")
+    return f"{KEY_PREFIX}:{units}:{hour}:{cell}"
+
+
+class CellWeatherCache:
+    """Two-tier (LRU + Redis) cache of formatted conditions per cell and hour"""
+
+    def __init__(self, redis_cache: Any = None, ttl: int = DEFAULT_CACHE_TTL, lru_size: int = 5000):
+        self._redis_cache = redis_cache
+        self.ttl = ttl
+        self.local = LRUCache(lru_size)
+
+    @property
+    def redis_cache(self):
+        if self._redis_cache is None:
+            from app.services.cache_service import cache_service
+            self._redis_cache = cache_service
+        return self._redis_cache
+
+    async def get_many(self, keys: Sequence[str]) -> Dict[str, Dict[str, Any]]:
+        found = {}
+        remote = []
+        for key in keys:
+            value = self.local.get(key)
+            if value is not None:
+                found[key] = value
+            else:
+                remote.append(key)
+        if remote:
+            values = await asyncio.gather(*(self.redis_cache.get(key) for key in remote))
+            for key, value in zip(remote, values):
+                if value is not None:
+                    self.local.set(key, value, self.ttl)
+                    found[key] = value
+        return found
+
+    async def set_many(self, values: Dict[str, Dict[str, Any]]) -> None:
+        for key, value in values.items():
+            self.local.set(key, value, self.ttl)
+        await asyncio.gather(*(self.redis_cache.set(key, value, ttl=self.ttl) for key, value in values.items()))
+
+
+class OpenMeteoBatchClient:
+    """Current conditions for many coordinates per OpenMeteo request"""
+
+    def __init__(self, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.requests = 0
+
+    async def current(self, points: Sequence[Point], units: str) -> List[Dict[str, Any]]:
+        """Raw OpenMeteo responses in the order of points, batches fetched concurrently"""
+        batches = [points[i:i + self.batch_size] for i in range(0, len(points), self.batch_size)]
+        results = await asyncio.gather(*(self._fetch(batch, units) for batch in batches))
+        return [payload for batch in results for payload in batch]
+
+    async def _fetch(self, points: Sequence[Point], units: str) -> List[Dict[str, Any]]:
+        params = {
+            "latitude": ",".join(f"{lat:.4f}" for lat, _ in points),
+            "longitude": ",".join(f"{lon:.4f}" for _, lon in points),
+            "current_weather": "true",
+            "hourly": CURRENT_HOURLY_FIELDS,
+            "forecast_days": DEFAULT_FORECAST_DAYS,
+        }
+        if units == "imperial":
+            params["temperature_unit"] = "fahrenheit"
+            params["windspeed_unit"] = "mph"
+
+        self.requests += 1
+        response = await get_http_client("openmeteo").get("/v1/forecast", params=params)
+        if response.status_code != 200:
+            raise ExternalAPIError(
+                f"OpenMeteo API returned status {response.status_code}",
+                context={"api": "OpenMeteo", "status_code": response.status_code, "points": len(points)}
+            )
+        data = response.json()
+        # A single coordinate comes back as an object, several as a list
+        payloads = data if isinstance(data, list) else [data]
+        if len(payloads) != len(points):
+            raise ExternalAPIError(
+                "OpenMeteo returned a different number of locations than requested",
+                context={"api": "OpenMeteo", "requested": len(points), "returned": len(payloads)}
+            )
+        return payloads
+
+
+class RouteWeatherService:
+    """Samples a route and returns the current weather at each sample"""
+
+    def __init__(self, client: Optional[OpenMeteoBatchClient] = None, cache: Optional[CellWeatherCache] = None,
+                 interval_km: float = DEFAULT_INTERVAL_KM, precision: int = DEFAULT_CELL_PRECISION,
+                 max_samples: int = DEFAULT_MAX_SAMPLES):
+        self.client = client or OpenMeteoBatchClient()
+        self.cache = cache or CellWeatherCache()
+        self.interval_km = interval_km
+        self.precision = precision
+        self.max_samples = max_samples
+        self.stats = {"routes": 0, "samples": 0, "cells": 0, "cache_hits": 0, "cells_fetched": 0}
+
+    async def route_weather(self, points: Sequence[Point], units: str = "imperial",
+                            stops: Sequence[int] = ()) -> List[Tuple[RouteSample, Dict[str, Any]]]:
+        """
+        (sample, conditions) pairs along the route, nearest the start first.
+        Vertices listed in stops are always sampled.
+
+        Raises:
+            ExternalAPIError: An OpenMeteo request failed
+        """
+        samples = [
+            RouteSample(lat, lon, round(distance, 1), weather_cell(lat, lon, self.precision))
+            for lat, lon, distance in sample_route(points, self.interval_km, self.max_samples, stops)
+        ]
+        cells = list(dict.fromkeys(sample.cell for sample in samples))
+        hour = datetime.now(timezone.utc).strftime("%Y%m%d%H")
+        keys = {cell: cell_key(cell, units, hour) for cell in cells}
+
+        cached = await self.cache.get_many(list(keys.values()))
+        weather = {cell: cached[keys[cell]] for cell in cells if keys[cell] in cached}
+        missing = [cell for cell in cells if cell not in weather]
+
+        if missing:
+            centers = [geohash_center(cell) for cell in missing]
+            payloads = await self.client.current(centers, units)
+            fetched = {
+                cell: format_current_weather(payload, lat, lon, units)
+                for cell, (lat, lon), payload in zip(missing, centers, payloads)
+                if payload.get("current_weather")
+            }
+            await self.cache.set_many({keys[cell]: value for cell, value in fetched.items()})
+            weather.update(fetched)
+
+        self.stats["routes"] += 1
+        self.stats["samples"] += len(samples)
+        self.stats["cells"] += len(cells)
+        self.stats["cache_hits"] += len(cells) - len(missing)
+        self.stats["cells_fetched"] += len(missing)
+        return [(sample, weather[sample.cell]) for sample in samples if sample.cell in weather]
+
+    def get_stats(self) -> Dict[str, Any]:
+        cells = self.stats["cells"]
+        return {
+            **self.stats,
+            "cache_hit_rate": round(self.stats["cache_hits"] / cells, 4) if cells else None,
+            "upstream_requests": self.client.requests,
+        }
+
+
+route_weather_service = RouteWeatherService()
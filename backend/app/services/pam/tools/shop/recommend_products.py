@@ -22,6 +22,7 @@ from app.services.pam.tools.utils import (
     validate_uuid,
     validate_positive_number,
 )
+from app.services.text_search import search_products as ranked_products
 
 logger = logging.getLogger(__name__)
 
@@ -111,25 +112,16 @@ async def recommend_products(
             categories = ["tools_maintenance", "camping_expedition", "recovery_gear"]
             keywords = []
 
-        db_query = supabase.table("affiliate_products").select("*")
-        db_query = db_query.eq("is_active", True)
-
-        if categories:
-            db_query = db_query.in_("category", categories)
-
-        if budget:
-            db_query = db_query.lte("price", budget)
-
-        if keywords:
-            keyword_filter = " | ".join([f"title.ilike.%{kw}%" for kw in keywords])
-            keyword_filter += " | " + " | ".join([f"description.ilike.%{kw}%" for kw in keywords])
-            db_query = db_query.or_(keyword_filter)
-
-        db_query = db_query.order("price", desc=False).limit(limit)
-
-        response = db_query.execute()
-
-        products = response.data if response.data else []
+        # Products matching any keyword, best match first; cheapest first without keywords
+        hits = ranked_products(
+            supabase,
+            terms=keywords,
+            match_any=True,
+            categories=categories,
+            max_price=budget,
+            limit=limit,
+        )
+        products = [hit.row for hit in hits]
 
         recommendations = []
         for product in products:
@@ -26,6 +26,10 @@ from app.services.pam.tools.utils import (
     validate_uuid,
     validate_positive_number,
 )
+from app.services.text_search import (
+    search_products as ranked_products,
+    search_terms,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -149,26 +153,16 @@ async def search_products(
 
         supabase = get_supabase_client()
 
-        db_query = supabase.table("affiliate_products").select("*")
-        db_query = db_query.eq("is_active", True)
-
-        if category:
-            db_query = db_query.eq("category", category)
-
-        if max_price:
-            db_query = db_query.lte("price", max_price)
-        if min_price:
-            db_query = db_query.gte("price", min_price)
-
-        db_query = db_query.or_(
-            f"title.ilike.%{query}%,description.ilike.%{query}%"
+        # Every word must match (as a prefix); best match first
+        hits = ranked_products(
+            supabase,
+            terms=search_terms(query) or [query.strip().lower()],
+            categories=[category] if category else None,
+            min_price=min_price,
+            max_price=max_price,
+            limit=limit,
         )
-
-        db_query = db_query.order("created_at", desc=True).limit(limit)
-
-        response = db_query.execute()
-
-        products = response.data if response.data else []
+        products = [hit.row for hit in hits]
 
         formatted_products = []
         for product in products:
@@ -39,6 +39,7 @@ from app.services.pam.tools.utils import (
     validate_required,
     safe_db_insert,
 )
+from app.services.pam.tools.social.timeline_cache import fan_out_post, schedule, timeline_cache
 
 logger = logging.getLogger(__name__)
 
@@ -205,6 +206,9 @@ async def approve_and_publish_post(
 
         logger.info(f"Published approved post {draft_id} for user {user_id}")
 
+        if timeline_cache.enabled:
+            schedule(fan_out_post(published_post))
+
         return {
             "success": True,
             "published_post": published_post,
@@ -0,0 +1,66 @@
+"""Keyset pagination helpers for the social feed
+
+Feeds are ordered by (created_at DESC, id DESC). A page is fetched with
+"rows strictly after the last row of the previous page" instead of OFFSET,
+so the cost of a page does not grow with scroll depth and posts inserted
+while the user scrolls cannot shift rows into duplicates or gaps.
+
+The cursor handed to clients is opaque: url-safe base64 of the sort key of
+the last row served.
+"""
+
+import base64
+import binascii
+import json
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import UUID
+
+FeedCursor = Tuple[str, str]  # (created_at ISO timestamp, post id)
+
+
+def encode_cursor(created_at: str, post_id: str) -> str:
+    """Encode the sort key of the last row on a page"""
+    payload = json.dumps({"t": created_at, "i": str(post_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> FeedCursor:
+    """Decode and validate a cursor. Raises ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        created_at, post_id = payload["t"], payload["i"]
+        datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+        UUID(post_id)
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError, AttributeError):
+        raise ValueError("Invalid feed cursor")
+    return created_at, post_id
+
+
+def keyset_or_filter(cursor: FeedCursor) -> str:
+    """PostgREST or= filter for rows sorting after the cursor in DESC order"""
+    created_at, post_id = cursor
+    return f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{post_id})'
+
+
+def cursor_score(created_at: str) -> float:
+    """Sorted-set score for a timestamp: epoch microseconds (exact in a double)"""
+    parsed = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    delta = parsed - datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return float((delta.days * 86400 + delta.seconds) * 1_000_000 + delta.microseconds)
+
+
+def paginate(rows: List[Dict[str, Any]], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Trim a limit+1 fetch to one page and build the next cursor
+
+    Returns:
+        (page rows, next cursor or None when this is the last page)
+    """
+    page = rows[:limit]
+    if len(rows) <= limit or not page:
+        return page, None
+    last = page[-1]
+    return page, encode_cursor(last["created_at"], last["id"])
@@ -23,6 +23,7 @@ from app.services.pam.tools.utils import (
     safe_db_insert,
     safe_db_delete,
 )
+from app.services.pam.tools.social.timeline_cache import schedule, timeline_cache
 
 logger = logging.getLogger(__name__)
 
@@ -96,6 +97,9 @@ async def follow_user(
 
             logger.info(f"User {validated.user_id} unfollowed user {validated.target_user_id}")
 
+            if timeline_cache.enabled:
+                schedule(timeline_cache.invalidate(validated.user_id))
+
             return {
                 "success": True,
                 "following": False,
@@ -112,6 +116,9 @@ async def follow_user(
 
             logger.info(f"User {validated.user_id} followed user {validated.target_user_id}")
 
+            if timeline_cache.enabled:
+                schedule(timeline_cache.invalidate(validated.user_id))
+
             return {
                 "success": True,
                 "following": True,
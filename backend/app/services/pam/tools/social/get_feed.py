@@ -2,13 +2,16 @@
 
 Load social feed with posts from friends and community
 
+Pages are keyset-paginated on (created_at, id): pass the returned
+next_cursor back as cursor to load older posts.
+
 Example usage:
 - "Show me my feed"
 - "What's new in the community?"
 """
 
 import logging
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from pydantic import ValidationError as PydanticValidationError
 
 from app.integrations.supabase import get_supabase_client
@@ -21,6 +24,14 @@ from app.services.pam.tools.utils import (
     validate_uuid,
 )
 from app.services.pam.tools.social.constants import DEFAULT_FEED_LIMIT
+from app.services.pam.tools.social.feed_pagination import (
+    FeedCursor,
+    decode_cursor,
+    encode_cursor,
+    keyset_or_filter,
+    paginate,
+)
+from app.services.pam.tools.social.timeline_cache import schedule, timeline_cache
 
 logger = logging.getLogger(__name__)
 
@@ -30,6 +41,7 @@ async def get_feed(
     filter_type: Optional[str] = "all",
     limit: Optional[int] = DEFAULT_FEED_LIMIT,
     offset: Optional[int] = 0,
+    cursor: Optional[str] = None,
     **kwargs
 ) -> Dict[str, Any]:
     """
@@ -39,7 +51,8 @@ async def get_feed(
         user_id: UUID of the user
         filter_type: Type of feed (all, friends, following)
         limit: Maximum number of posts
-        offset: Pagination offset
+        offset: Pagination offset (deprecated, use cursor)
+        cursor: Opaque cursor from a previous page's next_cursor
 
     Returns:
         Dict with feed posts
@@ -56,7 +69,8 @@ async def get_feed(
                 user_id=user_id,
                 filter_type=filter_type,
                 limit=limit,
-                offset=offset
+                offset=offset,
+                cursor=cursor
             )
         except PydanticValidationError as e:
             error_msg = e.errors()[0]['msg']
@@ -67,35 +81,24 @@ async def get_feed(
 
         supabase = get_supabase_client()
 
+        cursor = None
+        if validated.cursor:
+            try:
+                cursor = decode_cursor(validated.cursor)
+            except ValueError as e:
+                raise ValidationError(str(e), context={"field": "cursor"})
+
+        # Offset paging is kept for older clients; everything else is keyset
+        use_offset = validated.offset > 0 and cursor is None
+
         try:
-            if validated.filter_type == "friends":
-                response = supabase.rpc(
-                    "get_friends_feed",
-                    {
-                        "p_user_id": validated.user_id,
-                        "p_limit": validated.limit,
-                        "p_offset": validated.offset
-                    }
-                ).execute()
-            elif validated.filter_type == "following":
-                response = supabase.rpc(
-                    "get_following_feed",
-                    {
-                        "p_user_id": validated.user_id,
-                        "p_limit": validated.limit,
-                        "p_offset": validated.offset
-                    }
-                ).execute()
+            if use_offset:
+                posts = _fetch_offset_page(supabase, validated)
+                next_cursor = None
+                has_more = len(posts) == validated.limit
             else:
-                response = supabase.table("posts").select(
-                    "*, profiles(username, avatar_url)"
-                ).order(
-                    "created_at", desc=True
-                ).range(
-                    validated.offset, validated.offset + validated.limit - 1
-                ).execute()
-
-            posts = response.data if response.data else []
+                posts, next_cursor = await _fetch_keyset_page(supabase, validated, cursor)
+                has_more = next_cursor is not None
 
         except Exception as db_error:
             logger.error(
@@ -119,7 +122,8 @@ async def get_feed(
             "filter_type": validated.filter_type,
             "posts_count": len(posts),
             "posts": posts,
-            "has_more": len(posts) == validated.limit,
+            "has_more": has_more,
+            "next_cursor": next_cursor,
             "message": f"Loaded {len(posts)} posts"
         }
 
@@ -137,3 +141,121 @@ async def get_feed(
             "Failed to retrieve feed",
             context={"user_id": user_id, "error": str(e)}
         )
+
+
+FEED_SELECT = "*, profiles(username, avatar_url)"
+FEED_RPCS = {"friends": "get_friends_feed", "following": "get_following_feed"}
+
+
+def _fetch_offset_page(supabase, validated: GetFeedInput) -> List[Dict[str, Any]]:
+    """Legacy OFFSET paging; cost grows with the offset"""
+    if validated.filter_type in FEED_RPCS:
+        response = supabase.rpc(
+            FEED_RPCS[validated.filter_type],
+            {
+                "p_user_id": validated.user_id,
+                "p_limit": validated.limit,
+                "p_offset": validated.offset
+            }
+        ).execute()
+    else:
+        response = supabase.table("posts").select(
+            FEED_SELECT
+        ).order(
+            "created_at", desc=True
+        ).range(
+            validated.offset, validated.offset + validated.limit - 1
+        ).execute()
+    return response.data or []
+
+
+async def _fetch_keyset_page(
+    supabase,
+    validated: GetFeedInput,
+    cursor: Optional[FeedCursor],
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page ordered by (created_at DESC, id DESC), starting after the cursor"""
+    if validated.filter_type == "following" and timeline_cache.enabled:
+        cached = await _fetch_from_timeline(supabase, validated, cursor)
+        if cached is not None:
+            return cached
+
+    rows = _query_keyset(supabase, validated.filter_type, validated.user_id, validated.limit + 1, cursor)
+
+    if validated.filter_type == "following" and timeline_cache.enabled and cursor is None:
+        schedule(_materialize_timeline(supabase, validated.user_id))
+
+    return paginate(rows, validated.limit)
+
+
+def _query_keyset(
+    supabase,
+    filter_type: Optional[str],
+    user_id: str,
+    fetch: int,
+    cursor: Optional[FeedCursor],
+) -> List[Dict[str, Any]]:
+    if filter_type in FEED_RPCS:
+        response = supabase.rpc(
+            f"{FEED_RPCS[filter_type]}_keyset",
+            {
+                "p_user_id": user_id,
+                "p_limit": fetch,
+                "p_cursor_created_at": cursor[0] if cursor else None,
+                "p_cursor_id": cursor[1] if cursor else None
+            }
+        ).select(
+            # Same author embed as the table and timeline-cache paths
+            FEED_SELECT
+        ).execute()
+    else:
+        query = supabase.table("posts").select(
+            FEED_SELECT
+        ).order(
+            "created_at", desc=True
+        ).order(
+            "id", desc=True
+        )
+        if cursor:
+            query = query.or_(keyset_or_filter(cursor))
+        response = query.limit(fetch).execute()
+    return response.data or []
+
+
+async def _fetch_from_timeline(
+    supabase,
+    validated: GetFeedInput,
+    cursor: Optional[FeedCursor],
+) -> Optional[Tuple[List[Dict[str, Any]], Optional[str]]]:
+    """Serve a following-feed page from the Redis timeline, or None on a miss"""
+    try:
+        entries = await timeline_cache.read_page(validated.user_id, validated.limit, cursor)
+    except Exception as e:
+        logger.warning(f"Timeline cache read failed, using database: {e}")
+        return None
+    if entries is None:
+        return None
+
+    ids = [post_id for post_id, _ in entries[:validated.limit]]
+    rows = []
+    if ids:
+        response = supabase.table("posts").select(FEED_SELECT).in_("id", ids).execute()
+        by_id = {str(row["id"]): row for row in (response.data or [])}
+        # Posts deleted since fan-out are simply absent
+        rows = [by_id[post_id] for post_id in ids if post_id in by_id]
+
+    if len(entries) <= validated.limit or not rows:
+        return rows, None
+    return rows, encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+
+
+async def _materialize_timeline(supabase, user_id: str) -> None:
+    """Build a reader's timeline from Postgres after a cache miss on page one"""
+    try:
+        if await timeline_cache.exists(user_id):
+            return
+        rows = _query_keyset(supabase, "following", user_id, timeline_cache.max_entries, None)
+        stored = await timeline_cache.store(user_id, rows)
+        logger.debug(f"Materialized timeline for {user_id} with {stored} posts")
+    except Exception as e:
+        logger.warning(f"Failed to materialize timeline for {user_id}: {e}")
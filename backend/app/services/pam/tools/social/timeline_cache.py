@@ -0,0 +1,221 @@
+"""Precomputed "following" timelines in Redis sorted sets
+
+Fan-out-on-write: when a post is published its id is pushed into the
+timeline of every follower whose timeline is already materialized, so a
+reader with many followed accounts pages through one ZSET instead of
+merging every author's posts in Postgres.
+
+- Key: timeline:{user_id}; member = post id, score = created_at in epoch µs
+- Ties on score are broken by member, matching ORDER BY created_at DESC, id DESC
+- Each timeline keeps the newest SOCIAL_TIMELINE_MAX_ENTRIES posts; pages past
+  the tail fall back to the keyset query in Postgres
+- Timelines are materialized lazily on the first cache miss and expire when idle
+- Disabled unless SOCIAL_TIMELINE_CACHE_ENABLED is set; any Redis failure
+  degrades to the database path
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.services.pam.tools.social.feed_pagination import FeedCursor, cursor_score
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 800
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+FAN_OUT_CHUNK_SIZE = 1000
+# Extra entries fetched per page to absorb posts sharing the cursor's timestamp
+TIE_SLACK = 16
+
+# Append to timelines that already exist and trim them to the newest N entries.
+# KEYS: timeline keys; ARGV: score, post id, max entries
+_FAN_OUT_SCRIPT = """
+local added = 0
+for _, key in ipairs(KEYS) do
+  if redis.call('EXISTS', key) == 1 then
+    redis.call('ZADD', key, ARGV[1], ARGV[2])
+    redis.call('ZREMRANGEBYRANK', key, 0, -(tonumber(ARGV[3]) + 1))
+    added = added + 1
+  end
+end
+return added
+"""
+
+
+class TimelineCache:
+    """Redis sorted-set timelines keyed by reader"""
+
+    def __init__(
+        self,
+        redis=None,
+        prefix: str = "timeline",
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+    ):
+        self._redis = redis
+        self.prefix = prefix
+        self.max_entries = int(max_entries or getattr(settings, "SOCIAL_TIMELINE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES))
+        self.ttl_seconds = int(ttl_seconds or getattr(settings, "SOCIAL_TIMELINE_TTL_SECONDS", DEFAULT_TTL_SECONDS))
+        self._fan_out = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._redis is not None or bool(getattr(settings, "SOCIAL_TIMELINE_CACHE_ENABLED", False))
+
+    def key(self, user_id: str) -> str:
+        return f"{self.prefix}:{user_id}"
+
+    async def _client(self):
+        if self._redis is not None:
+            return self._redis
+        from app.services.cache_service import get_cache
+
+        cache = await get_cache()
+        return cache.redis
+
+    async def read_page(
+        self,
+        user_id: str,
+        limit: int,
+        cursor: Optional[FeedCursor] = None,
+    ) -> Optional[List[Tuple[str, float]]]:
+        """Up to limit+1 (post_id, score) entries after the cursor
+
+        Returns None when the timeline is not materialized or does not reach
+        deep enough to fill the page; the caller should query Postgres.
+        """
+        redis = await self._client()
+        if redis is None:
+            return None
+
+        key = self.key(user_id)
+        max_score: Any = cursor_score(cursor[0]) if cursor else "+inf"
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.zcard(key)
+            pipe.zrevrangebyscore(key, max_score, "-inf", start=0, num=limit + 1 + TIE_SLACK, withscores=True)
+            pipe.expire(key, self.ttl_seconds)
+            size, entries, _ = await pipe.execute()
+
+        if not size:
+            return None
+
+        entries = [(_as_str(member), float(score)) for member, score in entries]
+        if cursor:
+            cursor_id = cursor[1]
+            entries = [
+                (member, score) for member, score in entries
+                if score < max_score or member < cursor_id
+            ]
+        entries = entries[:limit + 1]
+
+        if len(entries) <= limit and size >= self.max_entries:
+            # Timeline was trimmed; older posts are only in Postgres
+            return None
+        return entries
+
+    async def store(self, user_id: str, rows: Iterable[Dict[str, Any]]) -> int:
+        """Replace a reader's timeline with rows carrying id and created_at"""
+        redis = await self._client()
+        if redis is None:
+            return 0
+
+        mapping = {str(row["id"]): cursor_score(row["created_at"]) for row in rows if row.get("created_at")}
+        if not mapping:
+            return 0
+
+        key = self.key(user_id)
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.zadd(key, mapping)
+            pipe.zremrangebyrank(key, 0, -(self.max_entries + 1))
+            pipe.expire(key, self.ttl_seconds)
+            await pipe.execute()
+        return len(mapping)
+
+    async def fan_out(self, post_id: str, created_at: str, follower_ids: List[str]) -> int:
+        """Push a post into followers' materialized timelines, one script call per chunk"""
+        redis = await self._client()
+        if redis is None or not follower_ids:
+            return 0
+
+        if self._fan_out is None:
+            self._fan_out = redis.register_script(_FAN_OUT_SCRIPT)
+
+        score = cursor_score(created_at)
+        delivered = 0
+        for start in range(0, len(follower_ids), FAN_OUT_CHUNK_SIZE):
+            keys = [self.key(fid) for fid in follower_ids[start:start + FAN_OUT_CHUNK_SIZE]]
+            delivered += int(await self._fan_out(keys=keys, args=[score, str(post_id), self.max_entries]))
+        return delivered
+
+    async def exists(self, user_id: str) -> bool:
+        redis = await self._client()
+        return bool(redis is not None and await redis.exists(self.key(user_id)))
+
+    async def invalidate(self, user_id: str) -> None:
+        """Drop a reader's timeline, e.g. after they follow or unfollow someone"""
+        redis = await self._client()
+        if redis is not None:
+            await redis.delete(self.key(user_id))
+
+
+def _as_str(value: Any) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+timeline_cache = TimelineCache()
+
+# Strong references to fire-and-forget tasks so they are not garbage collected
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def schedule(coro) -> None:
+    """Run a timeline maintenance coroutine without blocking the request"""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def iter_follower_ids(supabase, author_id: str, page_size: int = FAN_OUT_CHUNK_SIZE):
+    """Yield follower id pages, keyset-paginated on follower_id"""
+    last: Optional[str] = None
+    while True:
+        query = (
+            supabase.table("user_follows")
+            .select("follower_id")
+            .eq("following_id", author_id)
+            .order("follower_id")
+            .limit(page_size)
+        )
+        if last:
+            query = query.gt("follower_id", last)
+        rows = query.execute().data or []
+        ids = [row["follower_id"] for row in rows if row.get("follower_id")]
+        if ids:
+            yield ids
+        if len(rows) < page_size:
+            return
+        last = rows[-1]["follower_id"]
+
+
+async def fan_out_post(post: Dict[str, Any], cache: Optional[TimelineCache] = None) -> int:
+    """Deliver a newly published post to every follower's timeline"""
+    from app.integrations.supabase import get_supabase_client
+
+    cache = cache or timeline_cache
+    author_id = post.get("user_id")
+    if not author_id or not post.get("id") or not post.get("created_at"):
+        return 0
+
+    delivered = 0
+    try:
+        supabase = get_supabase_client()
+        async for follower_ids in iter_follower_ids(supabase, author_id):
+            delivered += await cache.fan_out(post["id"], post["created_at"], follower_ids)
+    except Exception as e:
+        logger.warning(f"Timeline fan-out failed for post {post.get('id')}: {e}")
+    else:
+        logger.debug(f"Fanned out post {post['id']} to {delivered} timelines")
+    return delivered
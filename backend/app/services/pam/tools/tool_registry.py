@@ -1997,9 +1997,14 @@ async def _register_all_tools(registry: ToolRegistry):
                             "type": "integer",
                             "description": "Number of posts to return (default: 20)"
                         },
-                        "offset": {
-                            "type": "integer",
-                            "description": "Pagination offset"
+                        "cursor": {
+                            "type": "string",
+                            "description": "next_cursor from the previous page to load older posts"
+                        },
+                        "filter_type": {
+                            "type": "string",
+                            "enum": ["all", "friends", "following"],
+                            "description": "Which feed to load (default: all)"
                         }
                     }
                 }
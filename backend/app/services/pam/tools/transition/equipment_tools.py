@@ -90,10 +90,10 @@ async def add_equipment_item(
         profile_result = supabase.table("transition_profiles")\
             .select("id")\
             .eq("user_id", user_id)\
-            .maybeSingle()\
+            .maybe_single()\
             .execute()
 
-        if not profile_result.data:
+        if not profile_result or not profile_result.data:
             raise ResourceNotFoundError(
                 "No transition plan found. Start one at /transition in the app first.",
                 context={"user_id": user_id}
@@ -224,7 +224,7 @@ async def mark_equipment_purchased(
                 .select("*")\
                 .eq("id", item_id)\
                 .eq("user_id", user_id)\
-                .maybeSingle()\
+                .maybe_single()\
                 .execute()
         elif item_name:
             # Search by name (case-insensitive partial match)
@@ -253,7 +253,7 @@ async def mark_equipment_purchased(
 
             item_result = type("Result", (), {"data": matching_items[0]})()
 
-        if not item_result.data:
+        if not item_result or not item_result.data:
             raise ResourceNotFoundError(
                 "Equipment item not found.",
                 context={"user_id": user_id, "item_id": item_id}
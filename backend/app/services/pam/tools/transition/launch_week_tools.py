@@ -56,10 +56,10 @@ async def get_launch_week_status(user_id: str) -> Dict[str, Any]:
         profile_result = supabase.table("transition_profiles")\
             .select("id, departure_date")\
             .eq("user_id", user_id)\
-            .maybeSingle()\
+            .maybe_single()\
             .execute()
 
-        if not profile_result.data:
+        if not profile_result or not profile_result.data:
             raise ResourceNotFoundError(
                 "No transition plan found. Start one at /transition in the app first.",
                 context={"user_id": user_id}
@@ -212,10 +212,10 @@ async def complete_launch_task(
         task_result = supabase.table("launch_week_tasks")\
             .select("*")\
             .eq("id", task_id)\
-            .maybeSingle()\
+            .maybe_single()\
             .execute()
 
-        if not task_result.data:
+        if not task_result or not task_result.data:
             raise ResourceNotFoundError(
                 "Launch week task not found.",
                 context={"user_id": user_id, "task_id": task_id}
@@ -228,10 +228,10 @@ async def complete_launch_task(
             .select("*")\
             .eq("user_id", user_id)\
             .eq("task_id", task_id)\
-            .maybeSingle()\
+            .maybe_single()\
             .execute()
 
-        if existing.data and existing.data.get("completed"):
+        if existing and existing.data and existing.data.get("completed"):
             return {
                 "success": True,
                 "message": f"Task '{task['task']}' was already completed.",
@@ -247,7 +247,7 @@ async def complete_launch_task(
             "notes": notes
         }
 
-        if existing.data:
+        if existing and existing.data:
             await safe_db_update("user_launch_tasks", existing.data["id"], completion_data, user_id)
         else:
             await safe_db_insert("user_launch_tasks", completion_data, user_id)
@@ -63,10 +63,10 @@ async def get_transition_progress(user_id: str) -> Dict[str, Any]:
         profile_result = supabase.table("transition_profiles")\
             .select("*")\
             .eq("user_id", user_id)\
-            .maybeSingle()\
+            .maybe_single()\
             .execute()
 
-        if not profile_result.data:
+        if not profile_result or not profile_result.data:
             raise ResourceNotFoundError(
                 "No transition plan found. Start one at /transition in the app.",
                 context={"user_id": user_id, "has_profile": False}
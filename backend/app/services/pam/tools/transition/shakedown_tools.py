@@ -104,10 +104,10 @@ async def log_shakedown_trip(
         profile_result = supabase.table("transition_profiles")\
             .select("id")\
             .eq("user_id", user_id)\
-            .maybeSingle()\
+            .maybe_single()\
             .execute()
 
-        if not profile_result.data:
+        if not profile_result or not profile_result.data:
             raise ResourceNotFoundError(
                 "No transition plan found. Start one at /transition in the app first.",
                 context={"user_id": user_id}
@@ -236,10 +236,10 @@ async def add_shakedown_issue(
         profile_result = supabase.table("transition_profiles")\
             .select("id")\
             .eq("user_id", user_id)\
-            .maybeSingle()\
+            .maybe_single()\
             .execute()
 
-        if not profile_result.data:
+        if not profile_result or not profile_result.data:
             raise ResourceNotFoundError(
                 "No transition plan found. Start one at /transition in the app first.",
                 context={"user_id": user_id}
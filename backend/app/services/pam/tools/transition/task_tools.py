@@ -98,11 +98,11 @@ async def get_transition_tasks(
         profile_result = supabase.table("transition_profiles")\
             .select("departure_date")\
             .eq("user_id", user_id)\
-            .maybeSingle()\
+            .maybe_single()\
             .execute()
 
         days_until_departure = None
-        if profile_result.data and profile_result.data.get("departure_date"):
+        if profile_result and profile_result.data and profile_result.data.get("departure_date"):
             from datetime import date
             departure = datetime.fromisoformat(
                 profile_result.data["departure_date"].replace("Z", "+00:00")
@@ -227,10 +227,10 @@ async def create_transition_task(
         profile_result = supabase.table("transition_profiles")\
             .select("id")\
             .eq("user_id", user_id)\
-            .maybeSingle()\
+            .maybe_single()\
             .execute()
 
-        if not profile_result.data:
+        if not profile_result or not profile_result.data:
             raise ResourceNotFoundError(
                 "No transition plan found. Start one at /transition in the app first.",
                 context={"user_id": user_id}
@@ -351,10 +351,10 @@ async def update_transition_task(
             .select("*")\
             .eq("id", task_id)\
             .eq("user_id", user_id)\
-            .maybeSingle()\
+            .maybe_single()\
             .execute()
 
-        if not existing.data:
+        if not existing or not existing.data:
             raise ResourceNotFoundError(
                 "Task not found or you don't have permission to update it.",
                 context={"user_id": user_id, "task_id": task_id}
@@ -457,7 +457,7 @@ async def complete_transition_task(
                 .select("*")\
                 .eq("id", task_id)\
                 .eq("user_id", user_id)\
-                .maybeSingle()\
+                .maybe_single()\
                 .execute()
         elif task_title:
             # Search by title (case-insensitive partial match)
@@ -486,7 +486,7 @@ async def complete_transition_task(
 
             task_result = type("Result", (), {"data": matching_tasks[0]})()
 
-        if not task_result.data:
+        if not task_result or not task_result.data:
             raise ResourceNotFoundError(
                 "Task not found.",
                 context={"user_id": user_id, "task_id": task_id}
@@ -36,39 +36,15 @@ MINIMUM_SAVINGS_THRESHOLD = 2.0
 async def _geocode_location(location: str) -> Optional[Dict[str, float]]:
     """
     Geocode a location string to lat/lng coordinates using Mapbox.
+    Lookups go through the shared geocoding cache.
     Returns None if geocoding fails.
     """
     try:
-        import os
-        mapbox_token = (
-            os.getenv("MAPBOX_API_KEY")
-            or os.getenv("MAPBOX_TOKEN")
-            or os.getenv("MAPBOX_SECRET_TOKEN")
-            or os.getenv("VITE_MAPBOX_PUBLIC_TOKEN")
-            or os.getenv("VITE_MAPBOX_TOKEN")
-        )
-        if not mapbox_token:
-            logger.warning("No Mapbox token available for geocoding")
-            return None
-
-        from urllib.parse import quote_plus
-        import httpx
-
-        query = quote_plus(location)
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.get(
-                f"https://api.mapbox.com/geocoding/v5/mapbox.places/{query}.json",
-                params={
-                    "access_token": mapbox_token,
-                    "limit": 1,
-                    "country": "AU"
-                }
-            )
-            response.raise_for_status()
-            data = response.json()
+        from app.services.geocoding import geocoding_service
 
-        if data.get("features"):
-            lon, lat = data["features"][0]["center"]
+        coords = await geocoding_service.coordinates(location, limit=1, country="AU")
+        if coords:
+            lat, lon = coords
             logger.info(f"Geocoded '{location}' to ({lat}, {lon})")
             return {"latitude": lat, "longitude": lon}
 
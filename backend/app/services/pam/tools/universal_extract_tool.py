@@ -131,9 +131,7 @@ class UniversalExtractTool(BaseTool):
                 )
 
         intent = parameters.get("intent")
-        expected_type = parameters.get("expected_type", "auto")
         output_format = parameters.get("output_format", "natural_language")
-        priority_fields = parameters.get("priority_fields")
 
         try:
             logger.info(f"Extracting data from {url} for user {user_id}")
@@ -142,9 +140,8 @@ class UniversalExtractTool(BaseTool):
             result = await self._extractor.extract(
                 url=url,
                 intent=intent,
-                expected_type=expected_type if expected_type != "auto" else None,
                 output_format=output_format,
-                priority_fields=priority_fields
+                user_id=user_id
             )
 
             if not result.success:
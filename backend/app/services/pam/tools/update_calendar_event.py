@@ -86,10 +86,10 @@ async def update_calendar_event(
             .select("*")\
             .eq("id", event_id)\
             .eq("user_id", user_id)\
-            .maybeSingle()\
+            .maybe_single()\
             .execute()
 
-        if not existing_response.data:
+        if not existing_response or not existing_response.data:
             raise ResourceNotFoundError(
                 "Calendar event not found or you don't have permission to modify it",
                 context={"user_id": user_id, "event_id": event_id}
@@ -21,6 +21,11 @@ from .database import (
     safe_db_select,
 )
 
+from .query import (
+    Page,
+    ToolQuery,
+)
+
 __all__ = [
     # Validation
     "validate_uuid",
@@ -35,4 +40,7 @@ __all__ = [
     "safe_db_update",
     "safe_db_delete",
     "safe_db_select",
+    # Queries
+    "Page",
+    "ToolQuery",
 ]
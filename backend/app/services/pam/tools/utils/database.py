@@ -13,6 +13,7 @@ from app.services.pam.tools.exceptions import (
     AuthorizationError,
     ResourceNotFoundError,
 )
+from app.services.pam.tools.utils.query import ToolQuery
 
 logger = logging.getLogger(__name__)
 
@@ -192,22 +193,27 @@ async def safe_db_select(
     # Existing optional parameters
     order_by: Optional[str] = None,
     order_desc: bool = False,
-    limit: Optional[int] = None
+    limit: Optional[int] = None,
+    ranges: Optional[Dict[str, Dict[str, Any]]] = None
 ) -> Union[List[Dict[str, Any]], Dict[str, Any], None]:
     """
     Safely select records from database with error handling.
     Updated with backward compatibility for all PAM tool usage patterns.
+    New code can use ToolQuery directly for ILIKE, counts and keyset pages.
 
     Args:
         table: Table name
-        filters: Dict of column: value filters (optional for backward compatibility)
+        filters: Dict of column: value filters (optional for backward compatibility);
+            list, tuple or set values match any of the values (IN)
         user_id: User ID (optional for logging/context)
         select: Columns to select (default: '*')
         columns: Alias for select parameter (backward compatibility)
-        single: Return single record instead of list
+        single: Return single record instead of list (fetches one row)
         order_by: Column to order by (optional)
         order_desc: Sort descending (default: False)
         limit: Limit number of results (optional)
+        ranges: Dict of column: {operator: value} bounds, operators being
+            gt, gte, lt and lte, e.g. {"date": {"gte": "2026-03-01"}}
 
     Returns:
         List of matching records, or single record if single=True
@@ -215,45 +221,28 @@ async def safe_db_select(
     Raises:
         DatabaseError: If select fails
     """
-    try:
-        # Handle parameter compatibility
-        if columns is not None:
-            select = columns
-
-        if filters is None:
-            filters = {}
-
-        supabase = get_supabase_client()
-        query = supabase.table(table).select(select)
-
-        # Apply filters
-        for column, value in filters.items():
-            query = query.eq(column, value)
+    # Handle parameter compatibility
+    if columns is not None:
+        select = columns
 
-        # Apply ordering
-        if order_by:
-            query = query.order(order_by, desc=order_desc)
+    query = ToolQuery(table, user_id=user_id).select(select).where(filters)
 
-        # Apply limit
-        if limit:
-            query = query.limit(limit)
-
-        result = query.execute()
-        data = result.data or []
-
-        # Handle single record return
-        if single:
-            return data[0] if data else None
-
-        return data
-
-    except Exception as e:
-        logger.error(
-            f"Database error selecting from {table}",
-            extra={"table": table, "filters": filters, "user_id": user_id},
-            exc_info=True
-        )
+    try:
+        query.ranges(ranges)
+    except ValueError as e:
         raise DatabaseError(
             f"Database error selecting from {table}",
             context={"table": table, "filters": filters, "user_id": user_id, "error": str(e)}
         )
+
+    if order_by:
+        query.order(order_by, desc=order_desc)
+
+    # Handle single record return
+    if single:
+        return await query.first()
+
+    if limit:
+        query.limit(limit)
+
+    return await query.fetch()
@@ -0,0 +1,272 @@
+"""
+Tool Query Builder
+
+Typed, bounded reads for PAM tools. Projection, range/IN/ILIKE predicates,
+ordering, limits, keyset pagination and counts are all pushed into the
+PostgREST request, so tools no longer fetch whole tables to filter, sort
+and count them in Python.
+
+    rows = await (
+        ToolQuery("expenses", user_id=user_id)
+        .select("amount", "category", "date")
+        .eq("user_id", user_id)
+        .gte("date", month_start.isoformat())
+        .order("date", desc=True)
+        .limit(200)
+        .fetch()
+    )
+
+Reads should be bounded by a limit, a range predicate or a single-row
+lookup; scripts/check_unbounded_selects.py flags those that are not.
+"""
+
+import base64
+import binascii
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.database import get_supabase_client
+from app.services.pam.tools.exceptions import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+RANGE_OPERATORS = ("gt", "gte", "lt", "lte")
+COUNT_METHODS = ("exact", "planned", "estimated")
+
+
+@dataclass
+class Page:
+    """One keyset page and the cursor for the next (None on the last page)"""
+    rows: List[Dict[str, Any]]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(values: Iterable[Any]) -> str:
+    """Opaque cursor for the sort key of the last row served"""
+    payload = json.dumps([str(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[str]:
+    """Decode a cursor of `size` sort values. Raises ValueError if it is malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError, TypeError, AttributeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(values, list) or len(values) != size or not all(isinstance(v, str) for v in values):
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def quote_value(value: Any) -> str:
+    """Double-quote a value for a PostgREST logic-tree (or=) filter"""
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+class ToolQuery:
+    """Chainable select against one table; every method returns the query"""
+
+    def __init__(self, table: str, user_id: Optional[str] = None):
+        self.table = table
+        self.user_id = user_id
+        self.columns = "*"
+        self.filters: List[Tuple[str, str, Any]] = []  # (operator, column, value)
+        self.ordering: List[Tuple[str, bool]] = []  # (column, descending)
+        self.max_rows: Optional[int] = None
+
+    # Projection
+
+    def select(self, *columns: str) -> "ToolQuery":
+        self.columns = ", ".join(columns) if columns else "*"
+        return self
+
+    # Predicates
+
+    def eq(self, column: str, value: Any) -> "ToolQuery":
+        self.filters.append(("eq", column, value))
+        return self
+
+    def neq(self, column: str, value: Any) -> "ToolQuery":
+        self.filters.append(("neq", column, value))
+        return self
+
+    def gt(self, column: str, value: Any) -> "ToolQuery":
+        self.filters.append(("gt", column, value))
+        return self
+
+    def gte(self, column: str, value: Any) -> "ToolQuery":
+        self.filters.append(("gte", column, value))
+        return self
+
+    def lt(self, column: str, value: Any) -> "ToolQuery":
+        self.filters.append(("lt", column, value))
+        return self
+
+    def lte(self, column: str, value: Any) -> "ToolQuery":
+        self.filters.append(("lte", column, value))
+        return self
+
+    def between(self, column: str, start: Any = None, end: Any = None) -> "ToolQuery":
+        """Inclusive range; a None bound is left open"""
+        if start is not None:
+            self.gte(column, start)
+        if end is not None:
+            self.lte(column, end)
+        return self
+
+    def in_(self, column: str, values: Iterable[Any]) -> "ToolQuery":
+        self.filters.append(("in_", column, list(values)))
+        return self
+
+    def ilike(self, column: str, pattern: str) -> "ToolQuery":
+        self.filters.append(("ilike", column, pattern))
+        return self
+
+    def is_null(self, column: str, null: bool = True) -> "ToolQuery":
+        if null:
+            self.filters.append(("is_", column, "null"))
+        else:
+            self.filters.append(("not_is", column, "null"))
+        return self
+
+    def where(self, equals: Optional[Dict[str, Any]] = None) -> "ToolQuery":
+        """Equality filters from a dict; list/tuple/set values become IN"""
+        for column, value in (equals or {}).items():
+            if isinstance(value, (list, tuple, set)):
+                self.in_(column, value)
+            else:
+                self.eq(column, value)
+        return self
+
+    def ranges(self, bounds: Optional[Dict[str, Dict[str, Any]]] = None) -> "ToolQuery":
+        """{column: {operator: value}} with operators gt, gte, lt and lte"""
+        for column, column_bounds in (bounds or {}).items():
+            for operator, value in column_bounds.items():
+                if operator not in RANGE_OPERATORS:
+                    raise ValueError(f"Unsupported range operator: {operator}")
+                self.filters.append((operator, column, value))
+        return self
+
+    # Ordering and bounds
+
+    def order(self, column: str, desc: bool = False) -> "ToolQuery":
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, count: int) -> "ToolQuery":
+        if count < 1:
+            raise ValueError("limit must be positive")
+        self.max_rows = count
+        return self
+
+    def copy(self) -> "ToolQuery":
+        query = ToolQuery(self.table, self.user_id)
+        query.columns = self.columns
+        query.filters = list(self.filters)
+        query.ordering = list(self.ordering)
+        query.max_rows = self.max_rows
+        return query
+
+    # Execution
+
+    def _build(self, columns: Optional[str] = None, **select_options):
+        query = get_supabase_client().table(self.table).select(columns or self.columns, **select_options)
+        for operator, column, value in self.filters:
+            if operator == "not_is":
+                query = query.not_.is_(column, value)
+            elif operator == "or_":
+                query = query.or_(column)
+            else:
+                query = getattr(query, operator)(column, value)
+        for column, desc in self.ordering:
+            query = query.order(column, desc=desc)
+        return query
+
+    def _error(self, error: Exception) -> DatabaseError:
+        logger.error(
+            f"Database error selecting from {self.table}",
+            extra={"table": self.table, "user_id": self.user_id},
+            exc_info=True
+        )
+        return DatabaseError(
+            f"Database error selecting from {self.table}",
+            context={"table": self.table, "user_id": self.user_id, "error": str(error)}
+        )
+
+    async def fetch(self) -> List[Dict[str, Any]]:
+        """
+        Matching rows, ordered and limited as requested.
+
+        Raises:
+            DatabaseError: If the select fails
+        """
+        try:
+            query = self._build()
+            if self.max_rows:
+                query = query.limit(self.max_rows)
+            return query.execute().data or []
+        except Exception as e:
+            raise self._error(e)
+
+    async def first(self) -> Optional[Dict[str, Any]]:
+        """The first matching row, or None"""
+        query = self.copy()
+        query.max_rows = 1
+        rows = await query.fetch()
+        return rows[0] if rows else None
+
+    async def count(self, method: str = "exact") -> int:
+        """
+        Number of matching rows, without transferring any of them.
+
+        Args:
+            method: exact, planned (from the planner's estimate) or estimated
+                (exact below the server's max-rows, planned above it)
+        """
+        if method not in COUNT_METHODS:
+            raise ValueError(f"Unsupported count method: {method}")
+        try:
+            result = self._build(count=method, head=True).execute()
+            return result.count or 0
+        except Exception as e:
+            raise self._error(e)
+
+    async def page(self, size: int, cursor: Optional[str] = None, key: str = "id") -> Page:
+        """
+        Keyset pagination over the query's order column, with `key` as the
+        tie-breaker. The page after `cursor` is "rows strictly after the last
+        row served", so its cost does not grow with depth and rows inserted
+        meanwhile cannot cause duplicates or gaps. The order column must be
+        non-null.
+
+        Raises:
+            ValueError: No order column, more than one, or a malformed cursor
+            DatabaseError: If the select fails
+        """
+        if len(self.ordering) != 1:
+            raise ValueError("Keyset pagination needs exactly one order column")
+        column, desc = self.ordering[0]
+        query = self.copy()
+        if column != key:
+            query.ordering.append((key, desc))
+        if cursor is not None:
+            sort_value, key_value = decode_cursor(cursor, 2)
+            op = "lt" if desc else "gt"
+            if column == key:
+                query.filters.append((op, key, key_value))
+            else:
+                query.filters.append(("or_", (
+                    f"{column}.{op}.{quote_value(sort_value)},"
+                    f"and({column}.eq.{quote_value(sort_value)},{key}.{op}.{quote_value(key_value)})"
+                ), None))
+        query.max_rows = size + 1
+        rows = await query.fetch()
+        page = rows[:size]
+        if len(rows) <= size:
+            return Page(page, None)
+        last = page[-1]
+        return Page(page, encode_cursor([last[column], last[key]]))
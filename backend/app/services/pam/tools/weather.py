@@ -1,9 +1,10 @@
 """Weather function tools for PAM using OpenMeteo API (free, no API key required)"""
 
 import logging
-import aiohttp
 from typing import Dict, Any, Optional, Tuple
 
+from app.core.http_clients import get_http_client
+from app.services.geocoding.geocoding_service import LRUCache, normalize_query
 from app.services.pam.tools.exceptions import (
     ExternalAPIError,
     ValidationError,
@@ -16,6 +17,12 @@ DEFAULT_VISIBILITY_KM = 10
 MAX_FREE_FORECAST_DAYS = 7
 GEOCODING_RESULT_LIMIT = 1
 GEOCODING_USER_AGENT = "PAM-RV-Assistant/2.0"
+CURRENT_HOURLY_FIELDS = "relativehumidity_2m,visibility,windgusts_10m"
+
+# City name -> coordinates; misses are kept for a day, HTTP errors are not cached
+CITY_COORDINATES_TTL = 30 * 24 * 3600
+CITY_COORDINATES_NEGATIVE_TTL = 24 * 3600
+_city_coordinates = LRUCache(2000)
 
 async def get_weather(
     location: str,
@@ -63,12 +70,11 @@ async def get_weather(
                     "location": location
                 }
 
-        url = "https://api.open-meteo.com/v1/forecast"
         params = {
             "latitude": lat,
             "longitude": lon,
             "current_weather": "true",
-            "hourly": "relativehumidity_2m,visibility,windgusts_10m",
+            "hourly": CURRENT_HOURLY_FIELDS,
             "forecast_days": DEFAULT_FORECAST_DAYS
         }
 
@@ -76,51 +82,26 @@ async def get_weather(
             params["temperature_unit"] = "fahrenheit"
             params["windspeed_unit"] = "mph"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
-                if response.status != 200:
-                    raise ExternalAPIError(
-                        f"OpenMeteo API returned status {response.status}",
-                        context={
-                            "location": location,
-                            "api": "OpenMeteo",
-                            "status_code": response.status
-                        }
-                    )
-
-                data = await response.json()
-
-        current = data.get("current_weather", {})
-        if not current:
+        response = await get_http_client("openmeteo").get("/v1/forecast", params=params)
+        if response.status_code != 200:
             raise ExternalAPIError(
-                "No current weather data available from OpenMeteo",
-                context={"location": location, "api": "OpenMeteo"}
+                f"OpenMeteo API returned status {response.status_code}",
+                context={
+                    "location": location,
+                    "api": "OpenMeteo",
+                    "status_code": response.status_code
+                }
             )
 
-        weather_code = current.get("weathercode", 0)
-        description = _get_weather_description(weather_code)
+        data = response.json()
 
-        hourly = data.get("hourly", {})
-        humidity = hourly.get("relativehumidity_2m", [0])[0] if hourly.get("relativehumidity_2m") else None
-        visibility = hourly.get("visibility", [DEFAULT_VISIBILITY_KM])[0] if hourly.get("visibility") else DEFAULT_VISIBILITY_KM
-        wind_gusts = hourly.get("windgusts_10m", [0])[0] if hourly.get("windgusts_10m") else None
-
-        unit_symbol = "°F" if units == "imperial" else "°C"
-        wind_unit = "mph" if units == "imperial" else "km/h"
+        if not data.get("current_weather"):
+            raise ExternalAPIError(
+                "No current weather data available from OpenMeteo",
+                context={"location": location, "api": "OpenMeteo"}
+            )
 
-        return {
-            "location": f"{lat:.4f}, {lon:.4f}",
-            "temperature": current.get("temperature", 0),
-            "unit": unit_symbol,
-            "description": description,
-            "humidity": f"{humidity}%" if humidity else "N/A",
-            "wind_speed": f"{current.get('windspeed', 0)} {wind_unit}",
-            "wind_direction": f"{current.get('winddirection', 0)}°",
-            "visibility": f"{visibility} km",
-            "is_day": "Day" if current.get("is_day") else "Night",
-            "travel_advisory": f"Current conditions: {description}. Wind speed: {current.get('windspeed', 0)} {wind_unit}. Drive safely!",
-            "data_source": "OpenMeteo (European Weather Service)"
-        }
+        return format_current_weather(data, lat, lon, units)
 
     except ValidationError:
         raise
@@ -137,10 +118,39 @@ async def get_weather(
             context={"location": location, "error": str(e)}
         )
 
+def format_current_weather(data: Dict[str, Any], lat: float, lon: float, units: str) -> Dict[str, Any]:
+    """Shape an OpenMeteo current_weather response (with the first hourly values) for PAM"""
+    current = data.get("current_weather", {})
+    weather_code = current.get("weathercode", 0)
+    description = _get_weather_description(weather_code)
+
+    hourly = data.get("hourly", {})
+    humidity = hourly.get("relativehumidity_2m", [0])[0] if hourly.get("relativehumidity_2m") else None
+    visibility = hourly.get("visibility", [DEFAULT_VISIBILITY_KM])[0] if hourly.get("visibility") else DEFAULT_VISIBILITY_KM
+    wind_gusts = hourly.get("windgusts_10m", [0])[0] if hourly.get("windgusts_10m") else None
+
+    unit_symbol = "°F" if units == "imperial" else "°C"
+    wind_unit = "mph" if units == "imperial" else "km/h"
+
+    return {
+        "location": f"{lat:.4f}, {lon:.4f}",
+        "temperature": current.get("temperature", 0),
+        "unit": unit_symbol,
+        "description": description,
+        "humidity": f"{humidity}%" if humidity else "N/A",
+        "wind_speed": f"{current.get('windspeed', 0)} {wind_unit}",
+        "wind_direction": f"{current.get('winddirection', 0)}°",
+        "visibility": f"{visibility} km",
+        "is_day": "Day" if current.get("is_day") else "Night",
+        "travel_advisory": f"Current conditions: {description}. Wind speed: {current.get('windspeed', 0)} {wind_unit}. Drive safely!",
+        "data_source": "OpenMeteo (European Weather Service)"
+    }
+
 async def _get_coordinates_for_city(city_name: str) -> Tuple[Optional[float], Optional[float]]:
     """
     Get coordinates for a city name using Nominatim geocoding service.
     Returns (latitude, longitude) or (None, None) if not found.
+    Answers are cached by normalized name; failed requests are not.
 
     Raises:
         ExternalAPIError: Geocoding API request failed
@@ -148,82 +158,94 @@ async def _get_coordinates_for_city(city_name: str) -> Tuple[Optional[float], Op
     try:
         if not city_name or not city_name.strip():
             return None, None
-        url = "https://nominatim.openstreetmap.org/search"
-        headers = {
-            "User-Agent": GEOCODING_USER_AGENT
-        }
-        params = {
-            "q": city_name,
-            "format": "json",
-            "limit": GEOCODING_RESULT_LIMIT
-        }
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params, headers=headers) as response:
-                if response.status != 200:
-                    logger.error(f"Geocoding failed for {city_name}: HTTP {response.status}")
-                    return None, None
-
-                data = await response.json()
-
-                if data and len(data) > 0:
-                    result = data[0]
-                    lat = float(result["lat"])
-                    lon = float(result["lon"])
-                    logger.info(f"Found coordinates for {city_name}: {lat}, {lon}")
-                    return lat, lon
-                else:
-                    logger.warning(f"No coordinates found for {city_name}")
-
-                    common_cities = {
-                        "new york": (40.7128, -74.0060),
-                        "nyc": (40.7128, -74.0060),
-                        "los angeles": (34.0522, -118.2437),
-                        "la": (34.0522, -118.2437),
-                        "chicago": (41.8781, -87.6298),
-                        "houston": (29.7604, -95.3698),
-                        "phoenix": (33.4484, -112.0740),
-                        "philadelphia": (39.9526, -75.1652),
-                        "san antonio": (29.4241, -98.4936),
-                        "san diego": (32.7157, -117.1611),
-                        "dallas": (32.7767, -96.7970),
-                        "austin": (30.2672, -97.7431),
-                        "san francisco": (37.7749, -122.4194),
-                        "sf": (37.7749, -122.4194),
-                        "seattle": (47.6062, -122.3321),
-                        "denver": (39.7392, -104.9903),
-                        "boston": (42.3601, -71.0589),
-                        "miami": (25.7617, -80.1918),
-                        "atlanta": (33.7490, -84.3880),
-                        "las vegas": (36.1699, -115.1398),
-                        "portland": (45.5152, -122.6784),
-                        "paris": (48.8566, 2.3522),
-                        "london": (51.5074, -0.1278),
-                        "tokyo": (35.6762, 139.6503),
-                        "beijing": (39.9042, 116.4074),
-                        "moscow": (55.7558, 37.6173),
-                        "sydney": (33.8688, 151.2093),
-                        "toronto": (43.6532, -79.3832),
-                        "mexico city": (19.4326, -99.1332),
-                        "berlin": (52.5200, 13.4050),
-                        "rome": (41.9028, 12.4964),
-                        "madrid": (40.4168, -3.7038),
-                        "dubai": (25.2048, 55.2708),
-                        "singapore": (1.3521, 103.8198)
-                    }
 
-                    city_lower = city_name.lower().split(",")[0].strip()
-                    if city_lower in common_cities:
-                        lat, lon = common_cities[city_lower]
-                        logger.info(f"Using fallback coordinates for {city_name}: {lat}, {lon}")
-                        return lat, lon
+        cache_key = normalize_query(city_name)
+        cached = _city_coordinates.get(cache_key)
+        if cached is not None:
+            return cached
 
-                    return None, None
+        coordinates = await _lookup_city(city_name)
+        if coordinates is not None:
+            ttl = CITY_COORDINATES_TTL if coordinates[0] is not None else CITY_COORDINATES_NEGATIVE_TTL
+            _city_coordinates.set(cache_key, coordinates, ttl)
+            return coordinates
+        return None, None
 
     except Exception as e:
         logger.error(f"Error getting coordinates for {city_name}: {e}")
         return None, None
 
+async def _lookup_city(city_name: str) -> Optional[Tuple[Optional[float], Optional[float]]]:
+    """Nominatim lookup with the built-in fallback list; None when the request failed"""
+    params = {
+        "q": city_name,
+        "format": "json",
+        "limit": GEOCODING_RESULT_LIMIT
+    }
+
+    response = await get_http_client("nominatim").get(
+        "/search", params=params, headers={"User-Agent": GEOCODING_USER_AGENT}
+    )
+    if response.status_code != 200:
+        logger.error(f"Geocoding failed for {city_name}: HTTP {response.status_code}")
+        return None
+
+    data = response.json()
+
+    if data and len(data) > 0:
+        result = data[0]
+        lat = float(result["lat"])
+        lon = float(result["lon"])
+        logger.info(f"Found coordinates for {city_name}: {lat}, {lon}")
+        return lat, lon
+
+    logger.warning(f"No coordinates found for {city_name}")
+
+    common_cities = {
+        "new york": (40.7128, -74.0060),
+        "nyc": (40.7128, -74.0060),
+        "los angeles": (34.0522, -118.2437),
+        "la": (34.0522, -118.2437),
+        "chicago": (41.8781, -87.6298),
+        "houston": (29.7604, -95.3698),
+        "phoenix": (33.4484, -112.0740),
+        "philadelphia": (39.9526, -75.1652),
+        "san antonio": (29.4241, -98.4936),
+        "san diego": (32.7157, -117.1611),
+        "dallas": (32.7767, -96.7970),
+        "austin": (30.2672, -97.7431),
+        "san francisco": (37.7749, -122.4194),
+        "sf": (37.7749, -122.4194),
+        "seattle": (47.6062, -122.3321),
+        "denver": (39.7392, -104.9903),
+        "boston": (42.3601, -71.0589),
+        "miami": (25.7617, -80.1918),
+        "atlanta": (33.7490, -84.3880),
+        "las vegas": (36.1699, -115.1398),
+        "portland": (45.5152, -122.6784),
+        "paris": (48.8566, 2.3522),
+        "london": (51.5074, -0.1278),
+        "tokyo": (35.6762, 139.6503),
+        "beijing": (39.9042, 116.4074),
+        "moscow": (55.7558, 37.6173),
+        "sydney": (33.8688, 151.2093),
+        "toronto": (43.6532, -79.3832),
+        "mexico city": (19.4326, -99.1332),
+        "berlin": (52.5200, 13.4050),
+        "rome": (41.9028, 12.4964),
+        "madrid": (40.4168, -3.7038),
+        "dubai": (25.2048, 55.2708),
+        "singapore": (1.3521, 103.8198)
+    }
+
+    city_lower = city_name.lower().split(",")[0].strip()
+    if city_lower in common_cities:
+        lat, lon = common_cities[city_lower]
+        logger.info(f"Using fallback coordinates for {city_name}: {lat}, {lon}")
+        return lat, lon
+
+    return None, None
+
 def _get_weather_description(code: int) -> str:
     """Convert WMO weather codes to descriptions"""
     weather_codes = {
@@ -297,7 +319,6 @@ async def get_weather_forecast(
                 }
 
         forecast_days = min(days, MAX_FREE_FORECAST_DAYS)
-        url = "https://api.open-meteo.com/v1/forecast"
         params = {
             "latitude": lat,
             "longitude": lon,
@@ -310,19 +331,18 @@ async def get_weather_forecast(
             params["temperature_unit"] = "fahrenheit"
             params["windspeed_unit"] = "mph"
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as response:
-                if response.status != 200:
-                    raise ExternalAPIError(
-                        f"OpenMeteo forecast API returned status {response.status}",
-                        context={
-                            "location": location,
-                            "api": "OpenMeteo",
-                            "status_code": response.status
-                        }
-                    )
-
-                data = await response.json()
+        response = await get_http_client("openmeteo").get("/v1/forecast", params=params)
+        if response.status_code != 200:
+            raise ExternalAPIError(
+                f"OpenMeteo forecast API returned status {response.status_code}",
+                context={
+                    "location": location,
+                    "api": "OpenMeteo",
+                    "status_code": response.status_code
+                }
+            )
+
+        data = response.json()
 
         daily = data.get("daily", {})
         if not daily:
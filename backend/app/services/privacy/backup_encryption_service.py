@@ -14,6 +14,7 @@ from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
@@ -21,10 +22,26 @@ from cryptography.hazmat.backends import default_backend
 
 from app.core.logging import get_logger
 from app.core.config import settings
+from app.services.privacy.stream_aead import (
+    DEFAULT_CHUNK_SIZE,
+    StreamResult,
+    decrypt_stream,
+    encrypt_stream,
+    is_stream_format,
+)
 
 logger = get_logger(__name__)
 
 
+def _sha256_file(file_path: str, buffer_size: int = DEFAULT_CHUNK_SIZE) -> str:
+    """Blocking SHA-256 of a file using a fixed-size buffer"""
+    hash_sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(buffer_size):
+            hash_sha256.update(chunk)
+    return hash_sha256.hexdigest()
+
+
 class EncryptionAlgorithm(str, Enum):
     """Supported encryption algorithms"""
     AES_256_GCM = "AES-256-GCM"
@@ -93,6 +110,12 @@ class GDPRBackupEncryptionService:
             "audit_trails": 2555         # 7 years (legal requirement)
         }
 
+        # Streaming encryption: fixed plaintext chunk size and optional parallel sealing
+        self.chunk_size = int(getattr(settings, 'BACKUP_ENCRYPTION_CHUNK_SIZE', DEFAULT_CHUNK_SIZE))
+        self.parallel_workers = int(getattr(settings, 'BACKUP_ENCRYPTION_WORKERS', 0))
+        self.parallel_window = max(2, self.parallel_workers * 2)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
         # Initialize master encryption key
         self._initialize_master_key()
 
@@ -238,22 +261,20 @@ class GDPRBackupEncryptionService:
             # Load encryption key
             encryption_key = self._load_encryption_key(encryption_key_id)
 
-            # Calculate original file size and checksum
-            original_size = os.path.getsize(backup_file_path)
-            original_checksum = await self._calculate_file_checksum(backup_file_path)
-
-            # Encrypt the backup file
+            # Encrypt the backup file; size and checksum are taken in the same pass
             encrypted_filename = f"{backup_id}.enc"
             encrypted_path = self.backups_path / encrypted_filename
 
-            await self._encrypt_file(
+            stream_result = await self._encrypt_file(
                 backup_file_path,
                 str(encrypted_path),
                 encryption_key,
                 key_metadata.algorithm
             )
 
-            encrypted_size = os.path.getsize(encrypted_path)
+            original_size = stream_result.plaintext_bytes
+            original_checksum = stream_result.plaintext_sha256
+            encrypted_size = stream_result.ciphertext_bytes
 
             # Create encrypted backup metadata
             encrypted_backup = EncryptedBackup(
@@ -313,15 +334,18 @@ class GDPRBackupEncryptionService:
                 output_path = str(self.backups_path / f"{backup_id}_decrypted.json")
 
             # Decrypt the file
-            await self._decrypt_file(
+            stream_result = await self._decrypt_file(
                 backup_metadata.encrypted_path,
                 output_path,
                 encryption_key,
-                backup_metadata.algorithm
+                EncryptionAlgorithm(backup_metadata.algorithm)
             )
 
-            # Verify decrypted file checksum
-            decrypted_checksum = await self._calculate_file_checksum(output_path)
+            # Verify decrypted file checksum (streaming backups hash while decrypting)
+            if stream_result is not None:
+                decrypted_checksum = stream_result.plaintext_sha256
+            else:
+                decrypted_checksum = await self._calculate_file_checksum(output_path)
             if decrypted_checksum != backup_metadata.checksum:
                 raise ValueError("Backup integrity check failed after decryption")
 
@@ -566,86 +590,98 @@ class GDPRBackupEncryptionService:
 
         return self._decrypt_key_with_master(encrypted_key)
 
-    async def _encrypt_file(self, input_path: str, output_path: str, key: bytes, algorithm: EncryptionAlgorithm):
-        """Encrypt file using specified algorithm"""
-        if algorithm == EncryptionAlgorithm.AES_256_GCM:
-            await self._encrypt_file_aes_gcm(input_path, output_path, key)
-        elif algorithm == EncryptionAlgorithm.CHACHA20_POLY1305:
-            await self._encrypt_file_chacha20(input_path, output_path, key)
-        else:
+    async def _encrypt_file(self, input_path: str, output_path: str, key: bytes, algorithm: EncryptionAlgorithm) -> StreamResult:
+        """Encrypt file using the segmented streaming format off the event loop"""
+        if algorithm not in (EncryptionAlgorithm.AES_256_GCM, EncryptionAlgorithm.CHACHA20_POLY1305):
             raise ValueError(f"Unsupported encryption algorithm: {algorithm}")
 
-    async def _decrypt_file(self, input_path: str, output_path: str, key: bytes, algorithm: EncryptionAlgorithm):
-        """Decrypt file using specified algorithm"""
-        if algorithm == EncryptionAlgorithm.AES_256_GCM:
-            await self._decrypt_file_aes_gcm(input_path, output_path, key)
-        elif algorithm == EncryptionAlgorithm.CHACHA20_POLY1305:
-            await self._decrypt_file_chacha20(input_path, output_path, key)
-        else:
-            raise ValueError(f"Unsupported decryption algorithm: {algorithm}")
+        return await asyncio.to_thread(self._encrypt_file_stream, input_path, output_path, key, algorithm)
 
-    async def _encrypt_file_aes_gcm(self, input_path: str, output_path: str, key: bytes):
-        """Encrypt file using AES-256-GCM"""
-        iv = secrets.token_bytes(12)  # 96-bit IV for GCM
-        cipher = Cipher(algorithms.AES(key), modes.GCM(iv), backend=default_backend())
-        encryptor = cipher.encryptor()
+    async def _decrypt_file(self, input_path: str, output_path: str, key: bytes, algorithm: EncryptionAlgorithm) -> Optional[StreamResult]:
+        """Decrypt file using specified algorithm off the event loop
 
-        with open(input_path, 'rb') as infile, open(output_path, 'wb') as outfile:
-            # Write IV first
-            outfile.write(iv)
-
-            # Encrypt in chunks
-            while chunk := infile.read(8192):
-                encrypted_chunk = encryptor.update(chunk)
-                outfile.write(encrypted_chunk)
-
-            # Finalize and write tag
-            encryptor.finalize()
-            outfile.write(encryptor.tag)
+        Streaming backups return a StreamResult carrying the plaintext checksum.
+        Backups written before the streaming format return None.
+        """
+        if algorithm not in (EncryptionAlgorithm.AES_256_GCM, EncryptionAlgorithm.CHACHA20_POLY1305):
+            raise ValueError(f"Unsupported decryption algorithm: {algorithm}")
 
-    async def _decrypt_file_aes_gcm(self, input_path: str, output_path: str, key: bytes):
-        """Decrypt file using AES-256-GCM"""
-        with open(input_path, 'rb') as infile:
-            iv = infile.read(12)  # Read IV
-            file_content = infile.read()
-            tag = file_content[-16:]  # Last 16 bytes are the tag
-            ciphertext = file_content[:-16]
+        try:
+            if await asyncio.to_thread(is_stream_format, input_path):
+                return await asyncio.to_thread(self._decrypt_file_stream, input_path, output_path, key, algorithm)
 
-        cipher = Cipher(algorithms.AES(key), modes.GCM(iv, tag), backend=default_backend())
-        decryptor = cipher.decryptor()
+            # Legacy single-shot formats
+            if algorithm == EncryptionAlgorithm.AES_256_GCM:
+                await asyncio.to_thread(self._decrypt_file_aes_gcm_legacy, input_path, output_path, key)
+            else:
+                await asyncio.to_thread(self._decrypt_file_chacha20_legacy, input_path, output_path, key)
+            return None
 
-        with open(output_path, 'wb') as outfile:
-            # Decrypt in chunks
-            chunk_size = 8192
-            for i in range(0, len(ciphertext), chunk_size):
-                chunk = ciphertext[i:i+chunk_size]
-                decrypted_chunk = decryptor.update(chunk)
-                outfile.write(decrypted_chunk)
+        except Exception:
+            # Never leave unauthenticated plaintext behind
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            raise
 
-            decryptor.finalize()
+    def _encrypt_file_stream(self, input_path: str, output_path: str, key: bytes, algorithm: EncryptionAlgorithm) -> StreamResult:
+        """Encrypt file chunk by chunk with a fixed-size buffer"""
+        with open(input_path, 'rb') as infile, open(output_path, 'wb') as outfile:
+            return encrypt_stream(
+                infile,
+                outfile,
+                key,
+                algorithm.value,
+                chunk_size=self.chunk_size,
+                executor=self._get_executor(),
+                window=self.parallel_window
+            )
 
-    async def _encrypt_file_chacha20(self, input_path: str, output_path: str, key: bytes):
-        """Encrypt file using ChaCha20-Poly1305"""
-        from cryptography.hazmat.primitives.ciphers.aead import ChaCha20Poly1305
+    def _decrypt_file_stream(self, input_path: str, output_path: str, key: bytes, algorithm: EncryptionAlgorithm) -> StreamResult:
+        """Decrypt streaming backup chunk by chunk, authenticating each segment"""
+        with open(input_path, 'rb') as infile, open(output_path, 'wb') as outfile:
+            return decrypt_stream(
+                infile,
+                outfile,
+                key,
+                expected_algorithm=algorithm.value,
+                executor=self._get_executor(),
+                window=self.parallel_window
+            )
 
-        chacha = ChaCha20Poly1305(key)
-        nonce = secrets.token_bytes(12)
+    def _decrypt_file_aes_gcm_legacy(self, input_path: str, output_path: str, key: bytes):
+        """Decrypt legacy AES-256-GCM file (IV | ciphertext | tag) without loading it into memory"""
+        file_size = os.path.getsize(input_path)
+        if file_size < 28:
+            raise ValueError("Encrypted backup file is truncated")
 
         with open(input_path, 'rb') as infile:
-            data = infile.read()
-
-        ciphertext = chacha.encrypt(nonce, data, None)
-
-        with open(output_path, 'wb') as outfile:
-            outfile.write(nonce)
-            outfile.write(ciphertext)
-
-    async def _decrypt_file_chacha20(self, input_path: str, output_path: str, key: bytes):
-        """Decrypt file using ChaCha20-Poly1305"""
+            iv = infile.read(12)
+            infile.seek(-16, os.SEEK_END)
+            tag = infile.read(16)
+            infile.seek(12)
+
+            cipher = Cipher(algorithms.AES(key), modes.GCM(iv, tag), backend=default_backend())
+            decryptor = cipher.decryptor()
+
+            remaining = file_size - 28
+            with open(output_path, 'wb') as outfile:
+                while remaining > 0:
+                    chunk = infile.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        raise ValueError("Encrypted backup file is truncated")
+                    remaining -= len(chunk)
+                    outfile.write(decryptor.update(chunk))
+
+                decryptor.finalize()
+
+    def _decrypt_file_chacha20_legacy(self, input_path: str, output_path: str, key: bytes):
+        """Decrypt legacy single-shot ChaCha20-Poly1305 file (nonce | ciphertext+tag)"""
         from cryptography.hazmat.primitives.ciphers.aead import ChaCha20Poly1305
 
         chacha = ChaCha20Poly1305(key)
 
+        # The legacy format has a single tag over the whole file, so it can only be
+        # opened in one piece; new backups use the streaming format instead.
         with open(input_path, 'rb') as infile:
             nonce = infile.read(12)
             ciphertext = infile.read()
@@ -655,13 +691,20 @@ class GDPRBackupEncryptionService:
         with open(output_path, 'wb') as outfile:
             outfile.write(plaintext)
 
+    def _get_executor(self) -> Optional[ThreadPoolExecutor]:
+        """Lazily create the shared thread pool used for parallel chunk sealing"""
+        if self.parallel_workers <= 1:
+            return None
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.parallel_workers,
+                thread_name_prefix="backup-aead"
+            )
+        return self._executor
+
     async def _calculate_file_checksum(self, file_path: str) -> str:
-        """Calculate SHA-256 checksum of file"""
-        hash_sha256 = hashlib.sha256()
-        with open(file_path, 'rb') as f:
-            while chunk := f.read(8192):
-                hash_sha256.update(chunk)
-        return hash_sha256.hexdigest()
+        """Calculate SHA-256 checksum of file off the event loop"""
+        return await asyncio.to_thread(_sha256_file, file_path, self.chunk_size)
 
     async def _store_backup_metadata(self, backup: EncryptedBackup):
         """Store encrypted backup metadata"""
@@ -0,0 +1,258 @@
+"""
+Segmented Streaming AEAD for Backup Files
+Encrypts and decrypts arbitrarily large files with fixed-size buffers using the
+STREAM construction: every chunk is sealed on its own with a nonce derived from
+a random prefix, the chunk index and a final-chunk flag.
+
+File layout (integers are big-endian):
+    header  = MAGIC (6) | version (1) | algorithm id (1) | chunk size (4) | nonce prefix (7)
+    segment = AEAD(key, nonce_prefix | index (4) | final flag (1), chunk, aad=header)
+
+Because the index and final flag are bound into each nonce, reordered, dropped,
+duplicated or truncated segments fail authentication, and the header itself is
+authenticated as associated data on every segment.
+
+This module has no application imports so it can be used by benchmarks and
+offline tooling without loading settings.
+"""
+
+import hashlib
+import secrets
+import struct
+from collections import deque
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import BinaryIO, Callable, Iterator, Optional, Tuple
+
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+
+MAGIC = b"WWBAK\x00"
+FORMAT_VERSION = 1
+NONCE_PREFIX_SIZE = 7
+TAG_SIZE = 16
+HEADER_SIZE = len(MAGIC) + 1 + 1 + 4 + NONCE_PREFIX_SIZE
+DEFAULT_CHUNK_SIZE = 1024 * 1024  # 1 MiB plaintext per segment
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+MAX_SEGMENTS = 2 ** 32
+
+# Algorithm identifiers stored in the header; values match EncryptionAlgorithm
+ALGORITHM_IDS = {
+    "AES-256-GCM": 1,
+    "ChaCha20-Poly1305": 2,
+}
+_AEAD_BY_ID = {
+    1: AESGCM,
+    2: ChaCha20Poly1305,
+}
+
+_HEADER_STRUCT = struct.Struct(f">{len(MAGIC)}sBBI{NONCE_PREFIX_SIZE}s")
+
+
+class StreamFormatError(ValueError):
+    """Raised when an encrypted stream is malformed or fails authentication"""
+
+
+@dataclass
+class StreamResult:
+    """Outcome of a streaming encrypt/decrypt pass"""
+    plaintext_bytes: int
+    ciphertext_bytes: int
+    plaintext_sha256: str
+    segments: int
+
+
+def is_stream_format(path: str) -> bool:
+    """Return True if the file at path starts with the streaming header magic"""
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def _segment_nonce(prefix: bytes, index: int, final: bool) -> bytes:
+    return prefix + struct.pack(">IB", index, 1 if final else 0)
+
+
+def _read_segments(stream: BinaryIO, size: int) -> Iterator[Tuple[int, bytes, bool]]:
+    """Yield (index, data, is_final) using a single block of read-ahead"""
+    current = stream.read(size)
+    index = 0
+    while True:
+        following = stream.read(size) if len(current) == size else b""
+        final = not following
+        yield index, current, final
+        if final:
+            return
+        index += 1
+        if index >= MAX_SEGMENTS:
+            raise StreamFormatError("Stream exceeds maximum segment count")
+        current = following
+
+
+def _pipeline(
+    items: Iterator[Tuple[int, bytes, bool]],
+    transform: Callable[[int, bytes, bool], bytes],
+    sink: Callable[[bytes], None],
+    executor: Optional[Executor],
+    window: int,
+) -> int:
+    """Apply transform to each item in order, optionally fanning out to an executor.
+
+    At most ``window`` segments are in flight, which bounds memory to roughly
+    ``window * chunk_size`` regardless of file size.
+    """
+    count = 0
+    if executor is None:
+        for index, data, final in items:
+            sink(transform(index, data, final))
+            count += 1
+        return count
+
+    pending = deque()
+    try:
+        for index, data, final in items:
+            pending.append(executor.submit(transform, index, data, final))
+            if len(pending) >= window:
+                sink(pending.popleft().result())
+                count += 1
+        while pending:
+            sink(pending.popleft().result())
+            count += 1
+    finally:
+        for future in pending:
+            future.cancel()
+    return count
+
+
+def encrypt_stream(
+    source: BinaryIO,
+    destination: BinaryIO,
+    key: bytes,
+    algorithm: str,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    executor: Optional[Executor] = None,
+    window: int = 8,
+) -> StreamResult:
+    """
+    Encrypt source into destination using the segmented streaming format
+
+    Args:
+        source: Readable binary stream of plaintext
+        destination: Writable binary stream for the encrypted output
+        key: 256-bit encryption key
+        algorithm: EncryptionAlgorithm value ("AES-256-GCM" or "ChaCha20-Poly1305")
+        chunk_size: Plaintext bytes per segment
+        executor: Optional executor used to seal segments in parallel
+        window: Maximum segments in flight when an executor is supplied
+
+    Returns:
+        StreamResult with sizes and the SHA-256 of the plaintext
+    """
+    algorithm_id = ALGORITHM_IDS.get(algorithm)
+    if algorithm_id is None:
+        raise ValueError(f"Unsupported streaming algorithm: {algorithm}")
+    if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+        raise ValueError(f"Invalid chunk size: {chunk_size}")
+
+    aead = _AEAD_BY_ID[algorithm_id](key)
+    prefix = secrets.token_bytes(NONCE_PREFIX_SIZE)
+    header = _HEADER_STRUCT.pack(MAGIC, FORMAT_VERSION, algorithm_id, chunk_size, prefix)
+    destination.write(header)
+
+    digest = hashlib.sha256()
+    totals = {"plaintext": 0, "ciphertext": len(header)}
+
+    def _hashed_segments() -> Iterator[Tuple[int, bytes, bool]]:
+        # Hashing happens on the reader thread so digest order stays sequential
+        for index, data, final in _read_segments(source, chunk_size):
+            digest.update(data)
+            totals["plaintext"] += len(data)
+            yield index, data, final
+
+    def _seal(index: int, data: bytes, final: bool) -> bytes:
+        return aead.encrypt(_segment_nonce(prefix, index, final), data, header)
+
+    def _write(segment: bytes) -> None:
+        destination.write(segment)
+        totals["ciphertext"] += len(segment)
+
+    segments = _pipeline(_hashed_segments(), _seal, _write, executor, window)
+
+    return StreamResult(
+        plaintext_bytes=totals["plaintext"],
+        ciphertext_bytes=totals["ciphertext"],
+        plaintext_sha256=digest.hexdigest(),
+        segments=segments,
+    )
+
+
+def decrypt_stream(
+    source: BinaryIO,
+    destination: BinaryIO,
+    key: bytes,
+    expected_algorithm: Optional[str] = None,
+    executor: Optional[Executor] = None,
+    window: int = 8,
+) -> StreamResult:
+    """
+    Decrypt a segmented stream, authenticating every segment before it is written
+
+    Args:
+        source: Readable binary stream positioned at the header
+        destination: Writable binary stream for plaintext
+        key: 256-bit encryption key
+        expected_algorithm: If given, the header algorithm must match
+        executor: Optional executor used to open segments in parallel
+        window: Maximum segments in flight when an executor is supplied
+
+    Returns:
+        StreamResult with sizes and the SHA-256 of the plaintext
+
+    Raises:
+        StreamFormatError: On malformed headers, tampering, reordering or truncation
+    """
+    header = source.read(HEADER_SIZE)
+    if len(header) != HEADER_SIZE:
+        raise StreamFormatError("Encrypted stream header is truncated")
+
+    magic, version, algorithm_id, chunk_size, prefix = _HEADER_STRUCT.unpack(header)
+    if magic != MAGIC:
+        raise StreamFormatError("Not a streaming backup file")
+    if version != FORMAT_VERSION:
+        raise StreamFormatError(f"Unsupported stream format version: {version}")
+    if algorithm_id not in _AEAD_BY_ID:
+        raise StreamFormatError(f"Unknown algorithm id in header: {algorithm_id}")
+    if expected_algorithm is not None and ALGORITHM_IDS.get(expected_algorithm) != algorithm_id:
+        raise StreamFormatError("Stream algorithm does not match backup metadata")
+    if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+        raise StreamFormatError(f"Invalid chunk size in header: {chunk_size}")
+
+    aead = _AEAD_BY_ID[algorithm_id](key)
+    digest = hashlib.sha256()
+    totals = {"plaintext": 0, "ciphertext": len(header)}
+
+    def _counted_segments() -> Iterator[Tuple[int, bytes, bool]]:
+        for index, data, final in _read_segments(source, chunk_size + TAG_SIZE):
+            if len(data) < TAG_SIZE:
+                raise StreamFormatError(f"Segment {index} is truncated")
+            totals["ciphertext"] += len(data)
+            yield index, data, final
+
+    def _open(index: int, data: bytes, final: bool) -> bytes:
+        try:
+            return aead.decrypt(_segment_nonce(prefix, index, final), data, header)
+        except InvalidTag as e:
+            raise StreamFormatError(f"Authentication failed for segment {index}") from e
+
+    def _write(chunk: bytes) -> None:
+        digest.update(chunk)
+        totals["plaintext"] += len(chunk)
+        destination.write(chunk)
+
+    segments = _pipeline(_counted_segments(), _open, _write, executor, window)
+
+    return StreamResult(
+        plaintext_bytes=totals["plaintext"],
+        ciphertext_bytes=totals["ciphertext"],
+        plaintext_sha256=digest.hexdigest(),
+        segments=segments,
+    )
@@ -4,10 +4,15 @@ Universal Receipt Text Parser
 Detects receipt type from OCR text via keyword matching, extracts common
 fields (total, date, vendor, description), and maps to expense categories.
 Delegates fuel receipts to the specialized fuel parser for richer extraction.
+
+The text is tokenized once per receipt (ReceiptText) and shared by every
+extractor; parse_receipts_batch spreads bulk imports over a process pool.
 """
 
+import asyncio
 import re
-from typing import Dict, Any, Optional, List, Tuple
+from concurrent.futures import Executor
+from typing import Dict, Any, Optional, List, Sequence, Tuple, Union
 
 
 # Receipt type keyword sets - order matters for scoring priority
@@ -45,9 +50,103 @@ CATEGORY_MAP: Dict[str, str] = {
 }
 
 
-def _detect_type(text: str) -> str:
+class _FoldedPattern:
+    """
+    A case-insensitive pattern plus a case-sensitive copy of it for text that
+    is ASCII and already lowercased, where it gives the same matches and
+    runs several times faster (IGNORECASE defeats the regex engine's literal
+    prefix scan). Non-ASCII text uses the IGNORECASE pattern, since Unicode
+    case folding differs from str.lower(). Patterns must only use lowercase
+    escapes (\\d, \\s).
+    """
+
+    __slots__ = ("folded", "ascii")
+
+    def __init__(self, pattern: str, flags: int = 0):
+        self.folded = re.compile(pattern, flags | re.IGNORECASE)
+        self.ascii = re.compile(pattern.lower(), flags)
+
+    def search(self, text: str, lower: str, is_ascii: bool) -> Optional[re.Match]:
+        return self.ascii.search(lower) if is_ascii else self.folded.search(text)
+
+
+# Field patterns are compiled once at import; bulk imports run every extractor
+# on thousands of receipts.
+_TOTAL_LABEL = _FoldedPattern(r"(?:TOTAL|SALE|AMOUNT|DUE|BALANCE|SUBTOTAL)\s*:?\s*\$?\s*(\d+\.?\d*)", re.MULTILINE)
+_TOTAL_DOLLAR_PATTERNS: List[Tuple[re.Pattern, float]] = [
+    (re.compile(r"\$\s*(\d+\.\d{2})\s*$", re.MULTILINE), 0.7),
+    (re.compile(r"^\s*\$\s*(\d+\.\d{2})\s*$", re.MULTILINE), 0.6),
+]
+
+MONTH_MAP: Dict[str, int] = {
+    "Jan": 1, "Feb": 2, "Mar": 3, "Apr": 4, "May": 5, "Jun": 6,
+    "Jul": 7, "Aug": 8, "Sep": 9, "Oct": 10, "Nov": 11, "Dec": 12
+}
+_MONTHS_LOWER = tuple(month.lower() for month in MONTH_MAP)
+
+_DATE_PATTERNS: List[Tuple[_FoldedPattern, str, float, Optional[str]]] = [
+    # (pattern, format, confidence, separator the text must contain)
+    (_FoldedPattern(r"(\d{4})-(\d{1,2})-(\d{1,2})"), "ymd", 0.95, "-"),
+    (_FoldedPattern(r"(\d{1,2})/(\d{1,2})/(\d{4})"), "mdy", 0.85, "/"),
+    (_FoldedPattern(r"(\d{1,2})-(\d{1,2})-(\d{4})"), "mdy", 0.75, "-"),
+    # Handle "Mar 11, 2026" format
+    (_FoldedPattern(r"(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{1,2}),?\s+(\d{4})"), "text", 0.90, None),
+    # Handle "3/11/26" short year format
+    (_FoldedPattern(r"(\d{1,2})/(\d{1,2})/(\d{2})"), "mdy_short", 0.80, "/"),
+]
+
+# Skip obvious header/receipt info lines when looking for the vendor
+_VENDOR_SKIP = _FoldedPattern(
+    r"(^receipt|^invoice|^tax|^gst|^abn|issue date|payment|customer|subtotal|total|date:|#\s*\d+)"
+)
+# Any known keyword across every receipt type, for header matching
+_ANY_KEYWORD = re.compile("|".join(
+    re.escape(keyword) for keywords in TYPE_KEYWORDS.values() for keyword in keywords
+))
+_NUMERIC_LINE = re.compile(r"^[\d$./\-\s,]+$")
+_DATE_LINE = re.compile(r"^\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4}")
+
+_DESCRIPTION_SKIP = _FoldedPattern(
+    r"(^\s*$|^[\d$./\-\s,]+$|TOTAL|SUBTOTAL|TAX|CHANGE|CASH|CARD|VISA|MASTER"
+    r"|THANK|RECEIPT|ABN|GST|^\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4}|customer details"
+    r"|payment details|invoice|issue date|quantity|price|line total|australia"
+    r"|@.*\.com|^\+?\d+[\s\-\d]+$)"  # emails and phone numbers
+)
+# Lines that contain actual service/item descriptions
+_SERVICE_KEYWORDS = _FoldedPattern(
+    r"(repair|fix|install|replace|service|check|design|supply|fit|wire|top|clean"
+    r"|labour|labor|parts|maintenance|oil|brake|tire|engine|window|mirror)"
+)
+_ALL_CAPS_LINE = re.compile(r"^[A-Z\s]+$")
+
+
+class ReceiptText:
+    """
+    OCR text tokenized once and shared by every extractor: the lowercased
+    text, the split and stripped lines (and their lowercase forms), and a few
+    character features that let extractors skip patterns that cannot match.
+    """
+
+    __slots__ = ("text", "lower", "is_ascii", "lines", "lower_lines", "has_dollar", "has_slash", "has_dash")
+
+    def __init__(self, text: str):
+        self.text = text
+        self.lower = text.lower()
+        self.is_ascii = text.isascii()
+        self.lines = [line.strip() for line in text.strip().split("\n")]
+        self.lower_lines = [line.lower() for line in self.lines]
+        self.has_dollar = "$" in text
+        self.has_slash = "/" in text
+        self.has_dash = "-" in text
+
+
+def _prepare(text: Union[str, ReceiptText]) -> ReceiptText:
+    return text if isinstance(text, ReceiptText) else ReceiptText(text)
+
+
+def _detect_type(text: Union[str, ReceiptText]) -> str:
     """Score each receipt type by keyword hits and return the best match."""
-    text_lower = text.lower()
+    text_lower = _prepare(text).lower
     scores: Dict[str, int] = {}
 
     for rtype, keywords in TYPE_KEYWORDS.items():
@@ -61,51 +160,40 @@ def _detect_type(text: str) -> str:
     return max(scores, key=scores.get)
 
 
-def _extract_total(text: str) -> Tuple[Optional[float], float]:
+def _extract_total(text: Union[str, ReceiptText]) -> Tuple[Optional[float], float]:
     """Extract total cost from receipt text. Returns (value, confidence)."""
-    patterns = [
-        (r"(?:TOTAL|SALE|AMOUNT|DUE|BALANCE|SUBTOTAL)\s*:?\s*\$?\s*(\d+\.?\d*)", 0.95),
-        (r"\$\s*(\d+\.\d{2})\s*$", 0.7),
-        (r"^\s*\$\s*(\d+\.\d{2})\s*$", 0.6),
-    ]
-
-    for pattern, confidence in patterns:
-        match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-        if match:
-            try:
+    receipt = _prepare(text)
+    match = _TOTAL_LABEL.search(receipt.text, receipt.lower, receipt.is_ascii)
+    if match:
+        return float(match.group(1)), 0.95
+
+    if receipt.has_dollar:
+        for pattern, confidence in _TOTAL_DOLLAR_PATTERNS:
+            match = pattern.search(receipt.text)
+            if match:
                 return float(match.group(1)), confidence
-            except ValueError:
-                continue
 
     return None, 0.0
 
 
-def _extract_date(text: str) -> Tuple[Optional[str], float]:
+def _extract_date(text: Union[str, ReceiptText]) -> Tuple[Optional[str], float]:
     """Extract date and normalize to YYYY-MM-DD. Returns (date_str, confidence)."""
-    patterns = [
-        (r"(\d{4})-(\d{1,2})-(\d{1,2})", "ymd", 0.95),
-        (r"(\d{1,2})/(\d{1,2})/(\d{4})", "mdy", 0.85),
-        (r"(\d{1,2})-(\d{1,2})-(\d{4})", "mdy", 0.75),
-        # Handle "Mar 11, 2026" format
-        (r"(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{1,2}),?\s+(\d{4})", "text", 0.90),
-        # Handle "3/11/26" short year format
-        (r"(\d{1,2})/(\d{1,2})/(\d{2})", "mdy_short", 0.80),
-    ]
+    receipt = _prepare(text)
+    separators = {"-": receipt.has_dash, "/": receipt.has_slash}
 
-    month_map = {
-        "Jan": 1, "Feb": 2, "Mar": 3, "Apr": 4, "May": 5, "Jun": 6,
-        "Jul": 7, "Aug": 8, "Sep": 9, "Oct": 10, "Nov": 11, "Dec": 12
-    }
-
-    for pattern, fmt, confidence in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
+    for pattern, fmt, confidence, separator in _DATE_PATTERNS:
+        if separator is not None and not separators[separator]:
+            continue
+        if fmt == "text" and receipt.is_ascii and not any(month in receipt.lower for month in _MONTHS_LOWER):
+            continue
+        match = pattern.search(receipt.text, receipt.lower, receipt.is_ascii)
         if match:
             try:
                 if fmt == "ymd":
                     year, month, day = int(match.group(1)), int(match.group(2)), int(match.group(3))
                 elif fmt == "text":
                     month_name = match.group(1)
-                    month = month_map.get(month_name.capitalize(), 0)
+                    month = MONTH_MAP.get(month_name.capitalize(), 0)
                     day = int(match.group(2))
                     year = int(match.group(3))
                 elif fmt == "mdy_short":
@@ -123,45 +211,28 @@ def _extract_date(text: str) -> Tuple[Optional[str], float]:
     return None, 0.0
 
 
-def _extract_vendor(text: str) -> Tuple[Optional[str], float]:
+def _extract_vendor(text: Union[str, ReceiptText]) -> Tuple[Optional[str], float]:
     """
     Extract vendor/business name, looking for actual business names.
     """
-    lines = text.strip().split("\n")
-
-    # Skip obvious header/receipt info patterns
-    skip_patterns = re.compile(
-        r"(^receipt|^invoice|^tax|^gst|^abn|issue date|payment|customer|subtotal|total|date:|#\s*\d+)",
-        re.IGNORECASE
-    )
-
-    # All known keywords across every receipt type for header matching
-    all_keywords = []
-    for keywords in TYPE_KEYWORDS.values():
-        all_keywords.extend(keywords)
+    receipt = _prepare(text)
+    header = list(zip(receipt.lines[:8], receipt.lower_lines[:8]))  # Extended search range
+    skipped = [
+        not cleaned or bool(_VENDOR_SKIP.search(line_lower, line_lower, receipt.is_ascii))
+        for cleaned, line_lower in header
+    ]
 
     # First pass: Look for lines with business keywords
-    for line in lines[:8]:  # Extended search range
-        line_lower = line.strip().lower()
-        cleaned = line.strip()
-
-        if not cleaned or skip_patterns.search(line_lower):
-            continue
-
-        for keyword in all_keywords:
-            if keyword in line_lower:
-                return cleaned, 0.85
+    for (cleaned, line_lower), skip in zip(header, skipped):
+        if not skip and _ANY_KEYWORD.search(line_lower):
+            return cleaned, 0.85
 
     # Second pass: Look for business-like names (avoid obvious receipt artifacts)
-    for line in lines[:8]:
-        cleaned = line.strip()
-        line_lower = cleaned.lower()
-
-        if (cleaned and
+    for (cleaned, _), skip in zip(header, skipped):
+        if (not skip and
             len(cleaned) >= 3 and
-            not skip_patterns.search(line_lower) and
-            not re.match(r"^[\d$./\-\s,]+$", cleaned) and
-            not re.match(r"^\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4}", cleaned) and
+            not _NUMERIC_LINE.match(cleaned) and
+            not _DATE_LINE.match(cleaned) and
             "@" not in cleaned and  # Skip email addresses
             "+" not in cleaned):    # Skip phone numbers
 
@@ -171,46 +242,30 @@ def _extract_vendor(text: str) -> Tuple[Optional[str], float]:
     return None, 0.0
 
 
-def _extract_description(text: str) -> Tuple[Optional[str], float]:
+def _extract_description(text: Union[str, ReceiptText]) -> Tuple[Optional[str], float]:
     """
     Build a short description from item-like lines in the receipt body.
     Skips header/footer lines that look like totals, dates, or addresses.
     """
-    lines = text.strip().split("\n")
+    receipt = _prepare(text)
+    lines, is_ascii = receipt.lines, receipt.is_ascii
     item_lines: List[str] = []
 
-    skip_patterns = re.compile(
-        r"(^\s*$|^[\d$./\-\s,]+$|TOTAL|SUBTOTAL|TAX|CHANGE|CASH|CARD|VISA|MASTER"
-        r"|THANK|RECEIPT|ABN|GST|^\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4}|customer details"
-        r"|payment details|invoice|issue date|quantity|price|line total|australia"
-        r"|@.*\.com|^\+?\d+[\s\-\d]+$)",  # emails and phone numbers
-        re.IGNORECASE,
-    )
-
-    # Look for lines that contain actual service/item descriptions
-    service_keywords = re.compile(
-        r"(repair|fix|install|replace|service|check|design|supply|fit|wire|top|clean"
-        r"|labour|labor|parts|maintenance|oil|brake|tire|engine|window|mirror)",
-        re.IGNORECASE
-    )
-
     # Scan all lines for service-related content
-    for line in lines:
-        stripped = line.strip()
-        if (stripped and
-            len(stripped) > 5 and  # Minimum meaningful length
-            not skip_patterns.search(stripped) and
-            (service_keywords.search(stripped) or  # Contains service keywords
-             (len(stripped) > 15 and not re.match(r"^[A-Z\s]+$", stripped)))):  # Long line, not all caps header
+    for stripped, lower in zip(lines, receipt.lower_lines):
+        if (len(stripped) > 5 and  # Minimum meaningful length
+            not _DESCRIPTION_SKIP.search(stripped, lower, is_ascii) and
+            (_SERVICE_KEYWORDS.search(stripped, lower, is_ascii) or  # Contains service keywords
+             (len(stripped) > 15 and not _ALL_CAPS_LINE.match(stripped)))):  # Long line, not all caps header
 
             item_lines.append(stripped)
 
     # If we don't have service-specific lines, fall back to general body content
     if not item_lines:
-        body = lines[3:-3] if len(lines) > 6 else lines[2:-2] if len(lines) > 4 else lines
-        for line in body:
-            stripped = line.strip()
-            if stripped and not skip_patterns.search(stripped):
+        n = len(lines)
+        start, stop = (3, n - 3) if n > 6 else (2, n - 2) if n > 4 else (0, n)
+        for stripped, lower in zip(lines[start:stop], receipt.lower_lines[start:stop]):
+            if stripped and not _DESCRIPTION_SKIP.search(stripped, lower, is_ascii):
                 item_lines.append(stripped)
 
     if not item_lines:
@@ -252,7 +307,8 @@ def parse_receipt_text_universal(text: str) -> Dict[str, Any]:
             "fuel_data": None,
         }
 
-    receipt_type = _detect_type(text)
+    receipt = ReceiptText(text)
+    receipt_type = _detect_type(receipt)
 
     # Fuel receipts get richer extraction from the specialized parser
     fuel_data = None
@@ -263,10 +319,10 @@ def parse_receipt_text_universal(text: str) -> Dict[str, Any]:
         except ImportError:
             fuel_data = None
 
-    total, total_conf = _extract_total(text)
-    date_str, date_conf = _extract_date(text)
-    vendor, vendor_conf = _extract_vendor(text)
-    description, desc_conf = _extract_description(text)
+    total, total_conf = _extract_total(receipt)
+    date_str, date_conf = _extract_date(receipt)
+    vendor, vendor_conf = _extract_vendor(receipt)
+    description, desc_conf = _extract_description(receipt)
 
     # If the fuel parser found a better total or date, prefer those
     if fuel_data:
@@ -301,3 +357,59 @@ def parse_receipt_text_universal(text: str) -> Dict[str, Any]:
         "overall_confidence": round(overall, 4),
         "fuel_data": fuel_data,
     }
+
+
+BATCH_CHUNK_SIZE = 250
+
+
+def parse_receipt_chunk(texts: Sequence[str]) -> List[Dict[str, Any]]:
+    """Parse a chunk of receipts in order (the unit of work sent to pool workers)."""
+    return [parse_receipt_text_universal(text) for text in texts]
+
+
+def _chunks(texts: Sequence[str], chunk_size: int) -> List[Sequence[str]]:
+    return [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+
+
+def parse_receipts_batch(
+    texts: Sequence[str],
+    executor: Optional[Executor] = None,
+    chunk_size: int = BATCH_CHUNK_SIZE,
+) -> List[Dict[str, Any]]:
+    """
+    Parse many receipts, fanning chunks out across a process pool.
+
+    Batches of at most one chunk are parsed inline. Larger batches use the
+    given executor, or the shared CPU process pool from app.workers.ocr_cpu.
+    Pool workers import this module on their first chunk and stay warm for
+    the life of the pool. Results are returned in input order.
+    """
+    texts = list(texts)
+    if len(texts) <= chunk_size:
+        return parse_receipt_chunk(texts)
+
+    if executor is None:
+        from app.workers.ocr_cpu import get_process_pool
+        executor = get_process_pool()
+
+    results: List[Dict[str, Any]] = []
+    for parsed in executor.map(parse_receipt_chunk, _chunks(texts, chunk_size)):
+        results.extend(parsed)
+    return results
+
+
+async def parse_receipts_batch_async(
+    texts: Sequence[str],
+    chunk_size: int = BATCH_CHUNK_SIZE,
+) -> List[Dict[str, Any]]:
+    """Async variant of parse_receipts_batch for request handlers and jobs."""
+    texts = list(texts)
+    if len(texts) <= chunk_size:
+        return parse_receipt_chunk(texts)
+
+    from app.workers.ocr_cpu import run_in_process_pool
+
+    chunks = await asyncio.gather(*(
+        run_in_process_pool(parse_receipt_chunk, chunk) for chunk in _chunks(texts, chunk_size)
+    ))
+    return [parsed for chunk in chunks for parsed in chunk]
@@ -12,6 +12,7 @@ import logging
 from uuid import UUID
 
 from app.database.supabase_client import get_supabase_client
+from app.services.budget_analytics import expense_category_totals, savings_category_totals
 
 logger = logging.getLogger(__name__)
 
@@ -150,24 +151,14 @@ class PamSavingsCalculator:
             Average spending amount for the category
         """
         try:
-            # Calculate cutoff date
-            cutoff_date = (datetime.now() - timedelta(days=lookback_days)).isoformat()
-            
-            # Query expenses for baseline calculation
-            query = (
-                self.supabase.table("expenses")
-                .select("amount")
-                .eq("user_id", user_id)
-                .eq("category", category)
-                .gte("created_at", cutoff_date)
+            # Per-day buckets over the lookback window instead of every expense row
+            today = date.today()
+            totals = expense_category_totals(
+                self.supabase, user_id, today - timedelta(days=lookback_days), today, category
             )
             
-            result = query.execute()
-            
-            if result.data:
-                amounts = [Decimal(str(expense["amount"])) for expense in result.data]
-                if amounts:
-                    return sum(amounts) / len(amounts)
+            if category in totals:
+                return totals[category].average
             
             return Decimal("0")
             
@@ -557,24 +548,8 @@ class PamSavingsCalculator:
             Dictionary mapping categories to total savings
         """
         try:
-            result = (
-                self.supabase.table("pam_savings_events")
-                .select("category, actual_savings")
-                .eq("user_id", user_id)
-                .gte("saved_date", start_date.isoformat())
-                .lte("saved_date", end_date.isoformat())
-                .execute()
-            )
-            
-            savings_by_category = {}
-            if result.data:
-                for event in result.data:
-                    category = event["category"]
-                    savings = Decimal(str(event["actual_savings"]))
-                    if category in savings_by_category:
-                        savings_by_category[category] += savings
-                    else:
-                        savings_by_category[category] = savings
+            totals = savings_category_totals(self.supabase, user_id, start_date, end_date)
+            savings_by_category = {category: entry.total for category, entry in totals.items()}
             
             return savings_by_category
             
@@ -0,0 +1,367 @@
+"""
+Bulk YouTube Trip Ingestion
+Imports YouTube travel videos as user_trips rows in chunks instead of one
+video at a time.
+
+- Video metadata is fetched 50 IDs per videos.list call (the API maximum).
+- Each video is fingerprinted with a content hash over its source metadata;
+  videos whose stored hash is unchanged are skipped before the transcript
+  fetch and AI extraction, which are the expensive steps.
+- Changed videos are processed concurrently under a semaphore, then written
+  with one upsert per chunk keyed by (user_id, source_video_id).
+- After each chunk the position is checkpointed, so an interrupted import
+  resumes where it stopped instead of starting over.
+
+Two sinks are provided, mirroring camping_ingest:
+- SupabaseTripSink: batched PostgREST upsert (production path)
+- AsyncpgTripSink: COPY into a temp staging table, then one
+  INSERT ... ON CONFLICT DO UPDATE (direct Postgres, local benchmarks)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+TABLE_NAME = "user_trips"
+METADATA_BATCH_SIZE = 50  # videos.list accepts at most 50 IDs
+DEFAULT_CHUNK_SIZE = 100
+DEFAULT_CONCURRENCY = 4
+CHECKPOINT_TTL = 7 * 24 * 3600
+
+# Bump to re-extract every video after a prompt change
+EXTRACTION_VERSION = 1
+
+VIDEO_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{11}$")
+
+# Source fields covered by content_hash
+SOURCE_FIELDS = ("title", "description", "channel", "published_at")
+
+# user_trips CHECK constraints; AI output outside them would fail the whole batch
+TRIP_TYPES = ("road_trip", "camping", "rv_travel", "business", "vacation")
+TRIP_STATUSES = ("planning", "active", "completed", "cancelled")
+PRIVACY_LEVELS = ("private", "friends", "public")
+
+ROW_COLUMNS = (
+    "user_id",
+    "title",
+    "description",
+    "trip_type",
+    "status",
+    "privacy_level",
+    "metadata",
+    "source_video_id",
+    "content_hash",
+)
+
+
+@dataclass
+class VideoIngestStats:
+    """Counters for one import run"""
+    received: int = 0
+    invalid: int = 0
+    duplicates: int = 0
+    resumed: int = 0
+    not_found: int = 0
+    unchanged: int = 0
+    no_transcript: int = 0
+    extraction_failed: int = 0
+    upserted: int = 0
+    failed: int = 0
+    chunks: int = 0
+    api_calls: int = 0
+    round_trips: int = 0
+    elapsed_seconds: float = 0.0
+    trips: List[Dict[str, str]] = field(default_factory=list)
+
+    @property
+    def videos_per_sec(self) -> float:
+        processed = self.received - self.invalid - self.duplicates - self.resumed
+        return round(processed / self.elapsed_seconds, 1) if self.elapsed_seconds else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data.pop("trips")
+        data["videos_per_sec"] = self.videos_per_sec
+        return data
+
+
+def content_hash(video: Dict[str, Any]) -> str:
+    """SHA-256 over the video's source metadata and the extraction version"""
+    payload = {name: video.get(name) for name in SOURCE_FIELDS}
+    payload["extraction_version"] = EXTRACTION_VERSION
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def prepare_video_ids(video_ids: Iterable[str], stats: VideoIngestStats) -> List[str]:
+    """Validate and dedup, keeping first-seen order so checkpoints stay stable"""
+    seen: Dict[str, None] = {}
+    for video_id in video_ids:
+        stats.received += 1
+        video_id = (video_id or "").strip()
+        if not VIDEO_ID_PATTERN.match(video_id):
+            stats.invalid += 1
+        elif video_id in seen:
+            stats.duplicates += 1
+        else:
+            seen[video_id] = None
+    return list(seen)
+
+
+def build_trip_row(trip: Dict[str, Any], video: Dict[str, Any], owner_id: str, fingerprint: str) -> Dict[str, Any]:
+    """Map an extracted trip onto user_trips columns, clamped to the table's CHECK values"""
+    metadata = dict(trip.get("metadata") or {})
+    # Source links come from the API, not from the model's echo of them
+    metadata["youtube_url"] = video["url"]
+    metadata["youtube_channel"] = video.get("channel")
+
+    def allowed(value, choices, default):
+        return value if value in choices else default
+
+    return {
+        "user_id": str(owner_id),
+        "title": (trip.get("title") or video.get("title") or "Untitled trip").strip(),
+        "description": trip.get("description") or "",
+        "trip_type": allowed(trip.get("trip_type"), TRIP_TYPES, "road_trip"),
+        "status": allowed(trip.get("status"), TRIP_STATUSES, "completed"),
+        "privacy_level": allowed(trip.get("privacy_level"), PRIVACY_LEVELS, "public"),
+        "metadata": metadata,
+        "source_video_id": video["video_id"],
+        "content_hash": fingerprint,
+    }
+
+
+def checkpoint_key(owner_id: str, video_ids: List[str]) -> str:
+    """The same owner importing the same list resumes the same checkpoint"""
+    digest = hashlib.sha256("\n".join(video_ids).encode("utf-8")).hexdigest()[:32]
+    return f"youtube_import:{owner_id}:{digest}"
+
+
+def _batches(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class CacheCheckpoint:
+    """Import progress kept in the shared cache, so a restarted worker can resume"""
+
+    def __init__(self, cache, ttl: int = CHECKPOINT_TTL):
+        self.cache = cache
+        self.ttl = ttl
+
+    async def load(self, key: str) -> Optional[Dict[str, Any]]:
+        return await self.cache.get(key)
+
+    async def save(self, key: str, state: Dict[str, Any]) -> None:
+        await self.cache.set(key, state, ttl=self.ttl)
+
+    async def clear(self, key: str) -> None:
+        await self.cache.delete(key)
+
+
+class SupabaseTripSink:
+    """Batched upsert through the Supabase client (one request per chunk)"""
+
+    def __init__(self, supabase, table: str = TABLE_NAME):
+        self.supabase = supabase
+        self.table = table
+
+    async def existing_hashes(self, owner_id: str, video_ids: List[str]) -> Dict[str, str]:
+        response = (
+            self.supabase.table(self.table)
+            .select("source_video_id, content_hash")
+            .eq("user_id", str(owner_id))
+            .in_("source_video_id", video_ids)
+            .execute()
+        )
+        return {row["source_video_id"]: row.get("content_hash") for row in (response.data or [])}
+
+    async def upsert(self, rows: List[Dict[str, Any]]) -> int:
+        from postgrest.types import ReturnMethod
+
+        now = datetime.utcnow().isoformat()
+        payload = [{**row, "updated_at": now} for row in rows]
+        self.supabase.table(self.table).upsert(
+            payload, on_conflict="user_id,source_video_id", returning=ReturnMethod.minimal
+        ).execute()
+        return len(rows)
+
+
+class AsyncpgTripSink:
+    """COPY into a temp staging table, then one INSERT ... ON CONFLICT per chunk.
+
+    Rows whose content_hash is unchanged are left alone, so two workers
+    importing the same videos don't rewrite each other's rows.
+    """
+
+    def __init__(self, connection, table: str = TABLE_NAME):
+        self.connection = connection
+        self.table = table
+
+    async def existing_hashes(self, owner_id: str, video_ids: List[str]) -> Dict[str, str]:
+        rows = await self.connection.fetch(
+            f"SELECT source_video_id, content_hash FROM {self.table} "
+            f"WHERE user_id = $1 AND source_video_id = ANY($2::text[])",
+            UUID(str(owner_id)),
+            video_ids,
+        )
+        return {row["source_video_id"]: row["content_hash"] for row in rows}
+
+    async def upsert(self, rows: List[Dict[str, Any]]) -> int:
+        columns = ROW_COLUMNS
+        records = [tuple(self._copy_value(c, row[c]) for c in columns) for row in rows]
+        column_list = ", ".join(columns)
+        updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in columns if c not in ("user_id", "source_video_id"))
+
+        async with self.connection.transaction():
+            await self.connection.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS user_trips_staging "
+                f"(LIKE {self.table} INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+            )
+            await self.connection.copy_records_to_table(
+                "user_trips_staging", records=records, columns=list(columns)
+            )
+            status = await self.connection.execute(
+                f"INSERT INTO {self.table} ({column_list}) "
+                f"SELECT {column_list} FROM user_trips_staging "
+                f"ON CONFLICT (user_id, source_video_id) DO UPDATE SET {updates}, updated_at = now() "
+                f"WHERE {self.table}.content_hash IS DISTINCT FROM EXCLUDED.content_hash"
+            )
+        # Status is "INSERT 0 <rows>"
+        return int(status.split()[-1])
+
+    @staticmethod
+    def _copy_value(column: str, value: Any) -> Any:
+        """Convert a row value to the type asyncpg's binary COPY expects"""
+        if value is None:
+            return None
+        if column == "metadata":
+            return json.dumps(value)
+        if column == "user_id":
+            return UUID(str(value))
+        return value
+
+
+class YouTubeImportPipeline:
+    """Chunked import: metadata -> hash diff -> bounded transcript/AI work -> upsert -> checkpoint"""
+
+    def __init__(
+        self,
+        scraper,
+        sink,
+        checkpoint: Optional[CacheCheckpoint] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ):
+        self.scraper = scraper
+        self.sink = sink
+        self.checkpoint = checkpoint
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
+
+    async def run(self, video_ids: Iterable[str], owner_id: str) -> VideoIngestStats:
+        """
+        Import videos as trips owned by owner_id
+
+        Args:
+            video_ids: YouTube video IDs, in the order they should be processed
+            owner_id: User who owns the imported trips
+
+        Returns:
+            VideoIngestStats with skipped-unchanged counts, round trips and videos/sec
+        """
+        stats = VideoIngestStats()
+        start = time.perf_counter()
+        video_ids = prepare_video_ids(video_ids, stats)
+        key = checkpoint_key(owner_id, video_ids)
+
+        cursor = 0
+        if self.checkpoint:
+            state = await self.checkpoint.load(key) or {}
+            cursor = min(int(state.get("cursor", 0)), len(video_ids))
+            if cursor:
+                stats.resumed = cursor
+                logger.info(f"▶️ Resuming YouTube import at {cursor}/{len(video_ids)}")
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        for chunk in _batches(video_ids[cursor:], self.chunk_size):
+            stats.chunks += 1
+            try:
+                await self._import_chunk(chunk, owner_id, semaphore, stats)
+            except Exception as e:
+                stats.failed += len(chunk)
+                logger.error(f"❌ YouTube import chunk {stats.chunks} failed: {e}")
+
+            cursor += len(chunk)
+            if self.checkpoint:
+                await self.checkpoint.save(key, {"cursor": cursor})
+
+        if self.checkpoint:
+            await self.checkpoint.clear(key)
+        stats.elapsed_seconds = time.perf_counter() - start
+        logger.info(f"✅ YouTube import complete: {stats.to_dict()}")
+        return stats
+
+    async def _import_chunk(
+        self,
+        chunk: List[str],
+        owner_id: str,
+        semaphore: asyncio.Semaphore,
+        stats: VideoIngestStats,
+    ) -> None:
+        videos: Dict[str, Dict[str, Any]] = {}
+        for batch in _batches(chunk, METADATA_BATCH_SIZE):
+            stats.api_calls += 1
+            videos.update(await self.scraper.get_videos_metadata(batch))
+        stats.not_found += len(chunk) - len(videos)
+        if not videos:
+            return
+
+        fingerprints = {video_id: content_hash(video) for video_id, video in videos.items()}
+        stats.round_trips += 1
+        existing = await self.sink.existing_hashes(owner_id, list(videos))
+        changed = [video_id for video_id in videos if existing.get(video_id) != fingerprints[video_id]]
+        stats.unchanged += len(videos) - len(changed)
+
+        rows = await asyncio.gather(*(
+            self._extract(videos[video_id], fingerprints[video_id], owner_id, semaphore, stats)
+            for video_id in changed
+        ))
+        rows = [row for row in rows if row]
+        if rows:
+            stats.round_trips += 1
+            await self.sink.upsert(rows)
+            stats.upserted += len(rows)
+            stats.trips.extend({"video_id": row["source_video_id"], "title": row["title"]} for row in rows)
+
+    async def _extract(
+        self,
+        video: Dict[str, Any],
+        fingerprint: str,
+        owner_id: str,
+        semaphore: asyncio.Semaphore,
+        stats: VideoIngestStats,
+    ) -> Optional[Dict[str, Any]]:
+        try:
+            async with semaphore:
+                transcript = await self.scraper.get_video_transcript(video["video_id"])
+                if not transcript:
+                    stats.no_transcript += 1
+                    return None
+                trip = await self.scraper.extract_trip_info(transcript, video)
+        except Exception as e:
+            logger.error(f"❌ Trip extraction failed for video {video['video_id']}: {e}")
+            trip = None
+        if not trip:
+            stats.extraction_failed += 1
+            return None
+        return build_trip_row(trip, video, owner_id, fingerprint)
@@ -18,6 +18,16 @@ import openai
 
 from app.core.config import get_settings
 from app.core.database import get_supabase_client
+from app.services.cache_service import cache_service
+from app.services.scraping.youtube_ingest import (
+    DEFAULT_CONCURRENCY,
+    METADATA_BATCH_SIZE,
+    CacheCheckpoint,
+    SupabaseTripSink,
+    YouTubeImportPipeline,
+    build_trip_row,
+    content_hash,
+)
 from app.models.domain.pam import PamResponse
 from app.core.exceptions import PAMError, ErrorCode
 
@@ -128,9 +138,13 @@ class YouTubeTravelScraper:
         Returns:
             Full transcript text or None if unavailable
         """
+        logger.info(f"📝 Extracting transcript for video: {video_id}")
+        # The transcript client is blocking; keep it off the event loop
+        return await asyncio.to_thread(self._fetch_transcript, video_id)
+    
+    def _fetch_transcript(self, video_id: str) -> Optional[str]:
+        """Blocking transcript fetch for get_video_transcript"""
         try:
-            logger.info(f"📝 Extracting transcript for video: {video_id}")
-            
             # Try to get transcript in order of preference
             transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
             
@@ -170,6 +184,49 @@ class YouTubeTravelScraper:
             logger.error(f"❌ Transcript extraction failed: {e}")
             return None
     
+    async def get_videos_metadata(self, video_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch metadata for up to 50 videos in one videos.list call
+        
+        Args:
+            video_ids: YouTube video IDs (at most METADATA_BATCH_SIZE)
+            
+        Returns:
+            Video metadata keyed by video ID; missing videos are left out
+        """
+        if not self.youtube_service:
+            # Minimal metadata if API not available
+            return {
+                video_id: {
+                    'video_id': video_id,
+                    'title': 'Unknown',
+                    'description': '',
+                    'channel': 'Unknown',
+                    'url': f"https://www.youtube.com/watch?v={video_id}"
+                }
+                for video_id in video_ids
+            }
+        
+        video_response = await asyncio.to_thread(
+            self.youtube_service.videos().list(
+                part='snippet',
+                id=','.join(video_ids[:METADATA_BATCH_SIZE]),
+                maxResults=METADATA_BATCH_SIZE
+            ).execute
+        )
+        
+        videos = {}
+        for item in video_response.get('items', []):
+            videos[item['id']] = {
+                'video_id': item['id'],
+                'title': item['snippet']['title'],
+                'description': item['snippet']['description'],
+                'channel': item['snippet']['channelTitle'],
+                'published_at': item['snippet']['publishedAt'],
+                'url': f"https://www.youtube.com/watch?v={item['id']}"
+            }
+        return videos
+    
     def _clean_transcript(self, text: str) -> str:
         """Clean up transcript text"""
         # Remove music notations
@@ -284,16 +341,44 @@ Ensure the JSON is valid and properly formatted."""
             logger.error(f"❌ Trip extraction failed: {e}")
             return None
     
+    async def resolve_owner(self, user_id: Optional[UUID] = None) -> Optional[str]:
+        """Owner for imported trips: the given user, else the YouTube import system user"""
+        if user_id:
+            return str(user_id)
+        
+        # Get or create system user for YouTube imports
+        system_user = self.supabase.table('auth.users').select('id').eq(
+            'email', 'youtube-scraper@wheels-wins.ai'
+        ).execute()
+        
+        if system_user.data:
+            return system_user.data[0]['id']
+        
+        # For now, use the first available user
+        # In production, create a dedicated system user
+        users = self.supabase.table('auth.users').select('id').limit(1).execute()
+        if users.data:
+            return users.data[0]['id']
+        
+        logger.error("❌ No users found in database")
+        return None
+    
     async def save_trip_to_database(
         self, 
         trip_data: Dict[str, Any], 
+        video: Dict[str, Any],
         user_id: Optional[UUID] = None
     ) -> Optional[str]:
         """
         Save extracted trip data to database
         
+        The row is built and upserted the same way as bulk imports: keyed by
+        (user_id, source_video_id) and carrying the video's content hash, so
+        re-importing a video updates its trip and later bulk runs skip it.
+        
         Args:
             trip_data: Structured trip data
+            video: Video metadata from get_videos_metadata
             user_id: Optional user ID (defaults to system user)
             
         Returns:
@@ -301,57 +386,26 @@ Ensure the JSON is valid and properly formatted."""
         """
         try:
             # Use system user if no user specified
+            user_id = await self.resolve_owner(user_id)
             if not user_id:
-                # Get or create system user for YouTube imports
-                system_user = self.supabase.table('auth.users').select('id').eq(
-                    'email', 'youtube-scraper@wheels-wins.ai'
-                ).execute()
-                
-                if system_user.data:
-                    user_id = system_user.data[0]['id']
-                else:
-                    # For now, use the first available user
-                    # In production, create a dedicated system user
-                    users = self.supabase.table('auth.users').select('id').limit(1).execute()
-                    if users.data:
-                        user_id = users.data[0]['id']
-                    else:
-                        logger.error("❌ No users found in database")
-                        return None
+                return None
             
-            # Prepare trip record
-            trip_record = {
-                'user_id': str(user_id),
-                'title': trip_data['title'],
-                'description': trip_data.get('description', ''),
-                'trip_type': trip_data.get('trip_type', 'road_trip'),
-                'status': trip_data.get('status', 'completed'),
-                'privacy_level': trip_data.get('privacy_level', 'public'),
-                'metadata': trip_data.get('metadata', {}),
-                'created_at': datetime.utcnow().isoformat(),
-                'updated_at': datetime.utcnow().isoformat()
-            }
+            trip_record = build_trip_row(trip_data, video, user_id, content_hash(video))
+            await SupabaseTripSink(self.supabase).upsert([trip_record])
             
-            # Check for duplicates based on YouTube URL
-            youtube_url = trip_data.get('metadata', {}).get('youtube_url')
-            if youtube_url:
-                existing = self.supabase.table('user_trips').select('id').eq(
-                    'metadata->>youtube_url', youtube_url
-                ).execute()
-                
-                if existing.data:
-                    logger.warning(f"⚠️ Trip already exists for video: {youtube_url}")
-                    return existing.data[0]['id']
-            
-            # Insert trip
-            result = self.supabase.table('user_trips').insert(trip_record).execute()
+            # The upsert returns nothing; look the trip up by its conflict key
+            result = self.supabase.table('user_trips').select('id').eq(
+                'user_id', trip_record['user_id']
+            ).eq(
+                'source_video_id', trip_record['source_video_id']
+            ).limit(1).execute()
             
             if result.data:
                 trip_id = result.data[0]['id']
                 logger.info(f"✅ Saved trip to database: {trip_id}")
                 return trip_id
             else:
-                logger.error("❌ Failed to insert trip")
+                logger.error("❌ Failed to save trip")
                 return None
                 
         except Exception as e:
@@ -375,34 +429,10 @@ Ensure the JSON is valid and properly formatted."""
         """
         try:
             # Get video metadata
-            if self.youtube_service:
-                video_response = self.youtube_service.videos().list(
-                    part='snippet',
-                    id=video_id
-                ).execute()
-                
-                if not video_response['items']:
-                    logger.error(f"❌ Video not found: {video_id}")
-                    return None
-                
-                video_item = video_response['items'][0]
-                video_metadata = {
-                    'video_id': video_id,
-                    'title': video_item['snippet']['title'],
-                    'description': video_item['snippet']['description'],
-                    'channel': video_item['snippet']['channelTitle'],
-                    'published_at': video_item['snippet']['publishedAt'],
-                    'url': f"https://www.youtube.com/watch?v={video_id}"
-                }
-            else:
-                # Minimal metadata if API not available
-                video_metadata = {
-                    'video_id': video_id,
-                    'title': 'Unknown',
-                    'description': '',
-                    'channel': 'Unknown',
-                    'url': f"https://www.youtube.com/watch?v={video_id}"
-                }
+            video_metadata = (await self.get_videos_metadata([video_id])).get(video_id)
+            if not video_metadata:
+                logger.error(f"❌ Video not found: {video_id}")
+                return None
             
             # Get transcript
             transcript = await self.get_video_transcript(video_id)
@@ -417,7 +447,7 @@ Ensure the JSON is valid and properly formatted."""
                 return None
             
             # Save to database
-            trip_id = await self.save_trip_to_database(trip_data, user_id)
+            trip_id = await self.save_trip_to_database(trip_data, video_metadata, user_id)
             if trip_id:
                 trip_data['id'] = trip_id
                 return trip_data
@@ -431,14 +461,20 @@ Ensure the JSON is valid and properly formatted."""
     async def bulk_import_videos(
         self, 
         video_ids: List[str], 
-        user_id: Optional[UUID] = None
+        user_id: Optional[UUID] = None,
+        concurrency: int = DEFAULT_CONCURRENCY
     ) -> Dict[str, Any]:
         """
         Process multiple videos in batch
         
+        Videos whose source metadata is unchanged since they were last
+        imported are skipped, and an interrupted import resumes from its
+        last completed chunk (see youtube_ingest).
+        
         Args:
             video_ids: List of YouTube video IDs
             user_id: Optional user ID for trip ownership
+            concurrency: Videos transcribed and extracted at once
             
         Returns:
             Summary of import results
@@ -451,24 +487,25 @@ Ensure the JSON is valid and properly formatted."""
             'trips': []
         }
         
-        for video_id in video_ids:
-            try:
-                trip_data = await self.process_video(video_id, user_id)
-                if trip_data:
-                    results['successful'] += 1
-                    results['trips'].append({
-                        'id': trip_data['id'],
-                        'title': trip_data['title']
-                    })
-                else:
-                    results['failed'] += 1
-                    
-                # Rate limiting - avoid hitting API quotas
-                await asyncio.sleep(2)
-                
-            except Exception as e:
-                logger.error(f"❌ Failed to process video {video_id}: {e}")
-                results['failed'] += 1
+        owner_id = await self.resolve_owner(user_id)
+        if not owner_id:
+            results['failed'] = len(video_ids)
+            return results
+        
+        pipeline = YouTubeImportPipeline(
+            self,
+            SupabaseTripSink(self.supabase),
+            checkpoint=CacheCheckpoint(cache_service),
+            concurrency=concurrency
+        )
+        stats = await pipeline.run(video_ids, owner_id)
+        
+        results['successful'] = stats.upserted
+        results['skipped'] = stats.unchanged + stats.duplicates + stats.resumed
+        results['failed'] = (stats.invalid + stats.not_found + stats.no_transcript
+                             + stats.extraction_failed + stats.failed)
+        results['trips'] = stats.trips
+        results['stats'] = stats.to_dict()
         
         logger.info(f"✅ Bulk import complete: {results['successful']}/{results['total']} successful")
         return results
@@ -4,5 +4,13 @@ Provides web search capabilities for PAM
 """
 
 from .web_search import WebSearchService, web_search_service
+from .federated import FederatedSearch, ReciprocalRankFusion, canonicalize_url, normalize_query
 
-__all__ = ['WebSearchService', 'web_search_service']
\ No newline at end of file
+__all__ = [
+    'WebSearchService',
+    'web_search_service',
+    'FederatedSearch',
+    'ReciprocalRankFusion',
+    'canonicalize_url',
+    'normalize_query',
+]
\ No newline at end of file
@@ -0,0 +1,255 @@
+"""
+Federated Search
+Runs several search engines concurrently and merges their results as they
+arrive instead of waiting for the slowest one.
+
+- Each engine has its own deadline; an engine that misses it is cancelled.
+- Once a quorum of engines has returned results and the soft deadline has
+  passed, or the fused top N can no longer change, the search stops early.
+- Results are merged incrementally with reciprocal-rank fusion over
+  canonicalized URLs, so the same page from two engines counts once, higher.
+- Queries are normalized before caching so trivially different spellings of
+  the same query share a cache entry.
+"""
+
+import asyncio
+import heapq
+import logging
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit, urlunsplit
+
+logger = logging.getLogger(__name__)
+
+# Reciprocal-rank fusion constant (Cormack et al. use 60)
+RRF_K = 60
+
+ENGINE_DEADLINE_S = 4.0
+SOFT_DEADLINE_S = 1.5
+QUORUM = 2
+
+QUERY_CACHE_SIZE = 512
+# Responses missing a timed-out engine are cached briefly
+PARTIAL_RESULT_TTL = 60
+
+TRACKING_PARAMS = frozenset({
+    "gclid", "fbclid", "msclkid", "dclid", "yclid", "mc_cid", "mc_eid",
+    "ref", "ref_src", "igshid", "_ga", "_gl",
+})
+
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.]+$")
+
+
+def normalize_query(query: str) -> str:
+    """Cache identity of a query: Unicode-normalized, case-folded, single-spaced"""
+    query = " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+    return _TRAILING_PUNCTUATION.sub("", query)
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Identity of a result URL across engines.
+
+    Unwraps DuckDuckGo redirect links, lower-cases scheme and host, drops
+    "www.", default ports, fragments, tracking parameters and trailing
+    slashes, and sorts the remaining query parameters. Scheme is folded to
+    https so http/https duplicates merge.
+    """
+    if not url:
+        return ""
+    if url.startswith("//"):
+        url = "https:" + url
+    parts = urlsplit(url.strip())
+
+    # DuckDuckGo's HTML results link through /l/?uddg=<target>
+    if parts.netloc.endswith("duckduckgo.com") and parts.path.startswith("/l/"):
+        target = dict(parse_qsl(parts.query)).get("uddg")
+        if target:
+            return canonicalize_url(unquote(target))
+
+    host = (parts.hostname or "").lower()
+    if not host:
+        return url.strip()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or ""
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+class ReciprocalRankFusion:
+    """
+    Incremental reciprocal-rank fusion.
+
+    Each engine adds weight / (k + rank) to every URL it returns; a URL's
+    entry is the first engine's result plus the engines that returned it.
+    """
+
+    def __init__(self, k: int = RRF_K):
+        self.k = k
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._scores: Dict[str, float] = {}
+
+    def add(self, engine: str, results: List[Dict[str, Any]], weight: float = 1.0) -> None:
+        seen = set()
+        for rank, result in enumerate(results, 1):
+            url = canonicalize_url(result.get("url", ""))
+            if not url or url in seen:
+                continue
+            seen.add(url)
+            entry = self._entries.get(url)
+            if entry is None:
+                entry = {**result, "engines": []}
+                self._entries[url] = entry
+                self._scores[url] = 0.0
+            entry["engines"].append(engine)
+            self._scores[url] += weight / (self.k + rank)
+
+    def top(self, n: int) -> List[Dict[str, Any]]:
+        """Best n entries; ties keep first-seen order"""
+        best = heapq.nlargest(n, self._scores, key=self._scores.__getitem__)
+        return [{**self._entries[url], "rank_score": round(self._scores[url], 6)} for url in best]
+
+    def is_settled(self, n: int, pending_weight: float) -> bool:
+        """Whether engines still to answer (total weight given) can't change the top-n set"""
+        if len(self._scores) < n:
+            return False
+        scores = heapq.nlargest(n + 1, self._scores.values())
+        runner_up = scores[n] if len(scores) > n else 0.0
+        # At best a pending engine ranks a URL first
+        return scores[n - 1] - runner_up > pending_weight / (self.k + 1)
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+
+class FederatedSearch:
+    """
+    One federated query over a set of engine searches.
+
+    Usage:
+        federated = FederatedSearch({"google": google.search(q, 10), ...}, num_results=10,
+                                    deadlines={"google": 4.0, ...})
+        async for snapshot in federated.stream():
+            partial = snapshot.fusion.top(10)   # after each engine returns
+    """
+
+    def __init__(
+        self,
+        searches: Dict[str, Awaitable[List[Dict[str, Any]]]],
+        num_results: int,
+        deadlines: Optional[Dict[str, float]] = None,
+        soft_deadline_s: float = SOFT_DEADLINE_S,
+        quorum: int = QUORUM,
+    ):
+        self._searches = searches
+        self.num_results = num_results
+        self.deadlines = {name: (deadlines or {}).get(name, ENGINE_DEADLINE_S) for name in searches}
+        self.soft_deadline_s = soft_deadline_s
+        self.quorum = min(quorum, len(searches))
+        self.fusion = ReciprocalRankFusion()
+        self.results_by_engine: Dict[str, List[Dict[str, Any]]] = {}
+        self.timed_out: List[str] = []
+        self.stopped_early: List[str] = []
+        self.stop_reason: Optional[str] = None
+        self.elapsed_s = 0.0
+
+    @property
+    def complete(self) -> bool:
+        """Every engine answered in time"""
+        return not self.timed_out and not self.stopped_early
+
+    async def stream(self) -> AsyncIterator["FederatedSearch"]:
+        """Yield self each time one or more engines have returned"""
+        start = time.monotonic()
+        tasks = {asyncio.ensure_future(search): name for name, search in self._searches.items()}
+        pending = set(tasks)
+        answered = 0
+        try:
+            while pending:
+                now = time.monotonic() - start
+                wake = min(self.deadlines[tasks[t]] for t in pending)
+                if answered >= self.quorum:
+                    wake = min(wake, self.soft_deadline_s)
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(0.0, wake - now), return_when=asyncio.FIRST_COMPLETED
+                )
+
+                for task in done:
+                    name = tasks[task]
+                    results = self._result_of(name, task)
+                    self.results_by_engine[name] = results
+                    self.fusion.add(name, results)
+                    answered += bool(results)
+                self.elapsed_s = time.monotonic() - start
+                if done:
+                    yield self
+
+                for task in [t for t in pending if self.deadlines[tasks[t]] <= self.elapsed_s]:
+                    logger.warning(f"⏱️ {tasks[task]} search missed its {self.deadlines[tasks[task]]}s deadline")
+                    task.cancel()
+                    pending.discard(task)
+                    self.timed_out.append(tasks[task])
+
+                if not pending:
+                    self.stop_reason = "all_engines"
+                elif self.fusion.is_settled(self.num_results, len(pending)):
+                    self.stop_reason = "settled"
+                elif answered >= self.quorum and self.elapsed_s >= self.soft_deadline_s:
+                    self.stop_reason = "soft_deadline"
+                else:
+                    continue
+                break
+        finally:
+            for task in pending:
+                task.cancel()
+                self.stopped_early.append(tasks[task])
+            self.elapsed_s = time.monotonic() - start
+
+    @staticmethod
+    def _result_of(name: str, task: "asyncio.Task") -> List[Dict[str, Any]]:
+        try:
+            return task.result() or []
+        except Exception as e:
+            logger.error(f"❌ {name} search failed: {e}")
+            return []
+
+    async def run(self) -> "FederatedSearch":
+        """Consume the stream to the end"""
+        async for _ in self.stream():
+            pass
+        return self
+
+
+class QueryCache:
+    """In-process LRU of search responses with per-entry TTL"""
+
+    def __init__(self, max_entries: int = QUERY_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -8,61 +8,54 @@ import hashlib
 import json
 import logging
 import re
+from contextlib import aclosing
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from urllib.parse import quote_plus
 
-import aiohttp
 from bs4 import BeautifulSoup
 
 from app.core.config import get_settings
+from app.core.http_clients import UpstreamClient, get_http_client
 from app.services.cache import cache_service
+from .federated import (
+    ENGINE_DEADLINE_S,
+    PARTIAL_RESULT_TTL,
+    FederatedSearch,
+    QueryCache,
+    normalize_query,
+)
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',  # Avoid brotli compression
+    'DNT': '1',
+    'Upgrade-Insecure-Requests': '1'
+}
+
 
 class WebSearchEngine:
     """Base class for web search engines"""
     
+    upstream = ""
+    # Seconds a federated search waits for this engine
+    deadline_s = ENGINE_DEADLINE_S
+    
     def __init__(self):
-        self.session = None
         self.rate_limit_delay = 1.0  # Default 1 second between requests
         self.last_request_time = None
     
-    async def _get_session(self) -> aiohttp.ClientSession:
-        """Get aiohttp session with proper compression handling"""
-        if not self.session:
-            # Create connector with timeout and compression settings
-            connector = aiohttp.TCPConnector(
-                limit=10,
-                limit_per_host=5,
-                ttl_dns_cache=300
-            )
-
-            # Create timeout configuration
-            timeout = aiohttp.ClientTimeout(total=30, connect=10)
-
-            self.session = aiohttp.ClientSession(
-                connector=connector,
-                timeout=timeout,
-                headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                    'Accept-Encoding': 'gzip, deflate',  # Avoid brotli compression
-                    'DNT': '1',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1'
-                }
-            )
-        return self.session
+    async def _get_session(self) -> UpstreamClient:
+        """Get the pooled HTTP client for this engine's upstream"""
+        return get_http_client(self.upstream)
     
     async def close(self):
-        """Close the session"""
-        if self.session:
-            await self.session.close()
-            self.session = None
+        """Nothing to close: pooled clients are closed on application shutdown"""
     
     async def _rate_limit(self):
         """Implement rate limiting"""
@@ -80,6 +73,8 @@ class WebSearchEngine:
 class GoogleSearchAPI(WebSearchEngine):
     """Google Custom Search API integration"""
     
+    upstream = "google_search"
+    
     def __init__(self):
         super().__init__()
         # Support both naming conventions (GOOGLE_CUSTOM_SEARCH_* and GOOGLE_SEARCH_*)
@@ -137,38 +132,38 @@ class GoogleSearchAPI(WebSearchEngine):
             
             logger.info(f"🔍 Searching Google for: {query}")
             
-            async with session.get(self.base_url, params=params) as response:
-                if response.status != 200:
-                    logger.error(f"❌ Google Search API error: {response.status}")
-                    return []
-                
-                data = await response.json()
-                
-                results = []
-                for item in data.get('items', []):
-                    result = {
-                        'title': item.get('title', ''),
-                        'url': item.get('link', ''),
-                        'snippet': item.get('snippet', ''),
-                        'display_link': item.get('displayLink', ''),
-                        'source': 'google_search',
-                        'search_query': query,
-                        'timestamp': datetime.now().isoformat()
-                    }
-                    
-                    # Add metadata if available
-                    if 'pagemap' in item:
-                        pagemap = item['pagemap']
-                        if 'metatags' in pagemap and pagemap['metatags']:
-                            metatags = pagemap['metatags'][0]
-                            result['meta_description'] = metatags.get('og:description', '')
-                            result['meta_image'] = metatags.get('og:image', '')
-                    
-                    results.append(result)
+            response = await session.get(self.base_url, params=params, headers=BROWSER_HEADERS)
+            if response.status_code != 200:
+                logger.error(f"❌ Google Search API error: {response.status_code}")
+                return []
+            
+            data = response.json()
+            
+            results = []
+            for item in data.get('items', []):
+                result = {
+                    'title': item.get('title', ''),
+                    'url': item.get('link', ''),
+                    'snippet': item.get('snippet', ''),
+                    'display_link': item.get('displayLink', ''),
+                    'source': 'google_search',
+                    'search_query': query,
+                    'timestamp': datetime.now().isoformat()
+                }
                 
-                logger.info(f"✅ Found {len(results)} results from Google")
-                return results
+                # Add metadata if available
+                if 'pagemap' in item:
+                    pagemap = item['pagemap']
+                    if 'metatags' in pagemap and pagemap['metatags']:
+                        metatags = pagemap['metatags'][0]
+                        result['meta_description'] = metatags.get('og:description', '')
+                        result['meta_image'] = metatags.get('og:image', '')
                 
+                results.append(result)
+            
+            logger.info(f"✅ Found {len(results)} results from Google")
+            return results
+            
         except Exception as e:
             logger.error(f"❌ Google Search error: {e}")
             return []
@@ -177,6 +172,10 @@ class GoogleSearchAPI(WebSearchEngine):
 class DuckDuckGoSearch(WebSearchEngine):
     """DuckDuckGo search integration (no API key required)"""
     
+    upstream = "duckduckgo"
+    # Includes up to rate_limit_delay spent waiting for our turn
+    deadline_s = ENGINE_DEADLINE_S + 2.0
+    
     def __init__(self):
         super().__init__()
         self.base_url = "https://html.duckduckgo.com/html/"
@@ -203,57 +202,57 @@ class DuckDuckGoSearch(WebSearchEngine):
             
             logger.info(f"🔍 Searching DuckDuckGo for: {query}")
             
-            async with session.post(self.base_url, data=data) as response:
-                if response.status != 200:
-                    logger.error(f"❌ DuckDuckGo search error: {response.status}")
-                    return []
-                
-                html = await response.text()
-                soup = BeautifulSoup(html, 'html.parser')
-                
-                results = []
+            response = await session.post(self.base_url, data=data, headers=BROWSER_HEADERS)
+            if response.status_code != 200:
+                logger.error(f"❌ DuckDuckGo search error: {response.status_code}")
+                return []
+            
+            html = response.text
+            soup = BeautifulSoup(html, 'html.parser')
+            
+            results = []
+            
+            # Parse search results
+            for idx, result_div in enumerate(soup.find_all('div', class_='result')):
+                if idx >= num_results:
+                    break
                 
-                # Parse search results
-                for idx, result_div in enumerate(soup.find_all('div', class_='result')):
-                    if idx >= num_results:
-                        break
-                    
-                    try:
-                        # Extract title and URL
-                        title_elem = result_div.find('a', class_='result__a')
-                        if not title_elem:
-                            continue
-                        
-                        title = title_elem.text.strip()
-                        url = title_elem.get('href', '')
-                        
-                        # Extract snippet
-                        snippet_elem = result_div.find('a', class_='result__snippet')
-                        snippet = snippet_elem.text.strip() if snippet_elem else ''
-                        
-                        # Extract display URL
-                        url_elem = result_div.find('a', class_='result__url')
-                        display_url = url_elem.text.strip() if url_elem else ''
-                        
-                        result = {
-                            'title': title,
-                            'url': url,
-                            'snippet': snippet,
-                            'display_link': display_url,
-                            'source': 'duckduckgo',
-                            'search_query': query,
-                            'timestamp': datetime.now().isoformat()
-                        }
-                        
-                        results.append(result)
-                        
-                    except Exception as e:
-                        logger.warning(f"⚠️ Failed to parse DuckDuckGo result: {e}")
+                try:
+                    # Extract title and URL
+                    title_elem = result_div.find('a', class_='result__a')
+                    if not title_elem:
                         continue
-                
-                logger.info(f"✅ Found {len(results)} results from DuckDuckGo")
-                return results
-                
+                    
+                    title = title_elem.text.strip()
+                    url = title_elem.get('href', '')
+                    
+                    # Extract snippet
+                    snippet_elem = result_div.find('a', class_='result__snippet')
+                    snippet = snippet_elem.text.strip() if snippet_elem else ''
+                    
+                    # Extract display URL
+                    url_elem = result_div.find('a', class_='result__url')
+                    display_url = url_elem.text.strip() if url_elem else ''
+                    
+                    result = {
+                        'title': title,
+                        'url': url,
+                        'snippet': snippet,
+                        'display_link': display_url,
+                        'source': 'duckduckgo',
+                        'search_query': query,
+                        'timestamp': datetime.now().isoformat()
+                    }
+                    
+                    results.append(result)
+                    
+                except Exception as e:
+                    logger.warning(f"⚠️ Failed to parse DuckDuckGo result: {e}")
+                    continue
+            
+            logger.info(f"✅ Found {len(results)} results from DuckDuckGo")
+            return results
+            
         except Exception as e:
             logger.error(f"❌ DuckDuckGo search error: {e}")
             return []
@@ -262,6 +261,8 @@ class DuckDuckGoSearch(WebSearchEngine):
 class BingSearchAPI(WebSearchEngine):
     """Bing Web Search API integration"""
     
+    upstream = "bing_search"
+    
     def __init__(self):
         super().__init__()
         # Support multiple naming conventions for Bing API key
@@ -308,34 +309,34 @@ class BingSearchAPI(WebSearchEngine):
             
             logger.info(f"🔍 Searching Bing for: {query}")
             
-            async with session.get(self.base_url, headers=headers, params=params) as response:
-                if response.status != 200:
-                    logger.error(f"❌ Bing Search API error: {response.status}")
-                    return []
-                
-                data = await response.json()
-                
-                results = []
-                for item in data.get('webPages', {}).get('value', []):
-                    result = {
-                        'title': item.get('name', ''),
-                        'url': item.get('url', ''),
-                        'snippet': item.get('snippet', ''),
-                        'display_link': item.get('displayUrl', ''),
-                        'source': 'bing_search',
-                        'search_query': query,
-                        'timestamp': datetime.now().isoformat()
-                    }
-                    
-                    # Add additional metadata
-                    if 'dateLastCrawled' in item:
-                        result['last_crawled'] = item['dateLastCrawled']
-                    
-                    results.append(result)
+            response = await session.get(self.base_url, headers={**BROWSER_HEADERS, **headers}, params=params)
+            if response.status_code != 200:
+                logger.error(f"❌ Bing Search API error: {response.status_code}")
+                return []
+            
+            data = response.json()
+            
+            results = []
+            for item in data.get('webPages', {}).get('value', []):
+                result = {
+                    'title': item.get('name', ''),
+                    'url': item.get('url', ''),
+                    'snippet': item.get('snippet', ''),
+                    'display_link': item.get('displayUrl', ''),
+                    'source': 'bing_search',
+                    'search_query': query,
+                    'timestamp': datetime.now().isoformat()
+                }
                 
-                logger.info(f"✅ Found {len(results)} results from Bing")
-                return results
+                # Add additional metadata
+                if 'dateLastCrawled' in item:
+                    result['last_crawled'] = item['dateLastCrawled']
                 
+                results.append(result)
+            
+            logger.info(f"✅ Found {len(results)} results from Bing")
+            return results
+            
         except Exception as e:
             logger.error(f"❌ Bing Search error: {e}")
             return []
@@ -350,8 +351,9 @@ class WebSearchService:
         self.duckduckgo_search = DuckDuckGoSearch()
         self.bing_search = BingSearchAPI()
 
-        # Shared cache service
+        # Shared cache service, fronted by an in-process cache of hot queries
         self.cache = cache_service
+        self.query_cache = QueryCache()
         
         self.search_engines = {
             'google': self.google_search,
@@ -375,6 +377,48 @@ class WebSearchService:
         for engine in self.search_engines.values():
             await engine.close()
     
+    def _select_engines(self, engines: Optional[List[str]]) -> List[str]:
+        if not engines:
+            return self.available_engines
+        # Filter to only available engines
+        return [e for e in engines if e in self.available_engines and e in self.search_engines]
+
+    def _federate(self, query: str, num_results: int, engines: List[str]) -> FederatedSearch:
+        return FederatedSearch(
+            {name: self.search_engines[name].search(query, num_results) for name in engines},
+            num_results=num_results,
+            deadlines={
+                name: getattr(self.search_engines[name], 'deadline_s', ENGINE_DEADLINE_S)
+                for name in engines
+            },
+        )
+
+    def _build_response(
+        self,
+        query: str,
+        federated: FederatedSearch,
+        num_results: int,
+        aggregate: bool,
+    ) -> Dict[str, Any]:
+        response = {
+            'query': query,
+            'timestamp': datetime.now().isoformat(),
+            'engines_used': list(federated.results_by_engine.keys()),
+            'engines_timed_out': federated.timed_out + federated.stopped_early,
+            'results_by_engine': federated.results_by_engine,
+            'complete': federated.complete,
+            'stop_reason': federated.stop_reason,
+            'search_time_ms': round(federated.elapsed_s * 1000, 1),
+        }
+
+        # Aggregate results if requested
+        if aggregate:
+            aggregated = federated.fusion.top(num_results)
+            response['results'] = aggregated
+            response['total_results'] = len(aggregated)
+
+        return response
+
     async def search(
         self,
         query: str,
@@ -387,6 +431,11 @@ class WebSearchService:
         """
         Perform web search across multiple engines
         
+        Engines run concurrently, each under its own deadline; the search
+        returns once every engine has answered, or earlier when enough have
+        answered (see FederatedSearch). Results are cached under the
+        normalized query, in process and in the shared cache.
+        
         Args:
             query: Search query
             num_results: Number of results to return
@@ -397,18 +446,18 @@ class WebSearchService:
             Dictionary with search results
         """
         
-        if not engines:
-            engines = self.available_engines
-        else:
-            # Filter to only available engines
-            engines = [e for e in engines if e in self.available_engines]
+        engines = self._select_engines(engines)
 
         engine_key = ",".join(sorted(engines))
-        cache_key = f"web_search:{hashlib.sha1(f'{query}|{engine_key}|{num_results}|{aggregate}'.encode()).hexdigest()}"
+        cache_key = f"web_search:{hashlib.sha1(f'{normalize_query(query)}|{engine_key}|{num_results}|{aggregate}'.encode()).hexdigest()}"
 
         if use_cache:
+            cached = self.query_cache.get(cache_key)
+            if cached:
+                return cached
             cached = await self.cache.get(cache_key)
             if cached:
+                self.query_cache.set(cache_key, cached, ttl)
                 return cached
         
         if not engines:
@@ -417,73 +466,40 @@ class WebSearchService:
         
         logger.info(f"🌐 Performing web search for '{query}' using engines: {engines}")
         
-        # Run searches concurrently
-        tasks = {}
-        for engine_name in engines:
-            if engine_name in self.search_engines:
-                engine = self.search_engines[engine_name]
-                tasks[engine_name] = engine.search(query, num_results)
-        
-        # Gather results
-        results_by_engine = {}
-        for engine_name, task in tasks.items():
-            try:
-                results = await task
-                results_by_engine[engine_name] = results
-            except Exception as e:
-                logger.error(f"❌ {engine_name} search failed: {e}")
-                results_by_engine[engine_name] = []
-        
-        # Prepare response
-        response = {
-            'query': query,
-            'timestamp': datetime.now().isoformat(),
-            'engines_used': list(results_by_engine.keys()),
-            'results_by_engine': results_by_engine
-        }
-        
-        # Aggregate results if requested
-        if aggregate:
-            aggregated = self._aggregate_results(results_by_engine, num_results)
-            response['results'] = aggregated
-            response['total_results'] = len(aggregated)
+        federated = await self._federate(query, num_results, engines).run()
+        response = self._build_response(query, federated, num_results, aggregate)
 
         if use_cache:
-            await self.cache.set(cache_key, response, ttl=ttl)
+            # A response missing an engine is only kept briefly
+            effective_ttl = ttl if federated.complete else min(ttl, PARTIAL_RESULT_TTL)
+            self.query_cache.set(cache_key, response, effective_ttl)
+            await self.cache.set(cache_key, response, ttl=effective_ttl)
 
         return response
-    
-    def _aggregate_results(
-        self, 
-        results_by_engine: Dict[str, List[Dict[str, Any]]], 
-        max_results: int
-    ) -> List[Dict[str, Any]]:
-        """Aggregate and deduplicate results from multiple engines"""
-        
-        seen_urls = set()
-        aggregated = []
-        
-        # Combine results, prioritizing by order and removing duplicates
-        for engine, results in results_by_engine.items():
-            for result in results:
-                url = result.get('url', '')
-                if url and url not in seen_urls:
-                    seen_urls.add(url)
-                    result['engines'] = [engine]
-                    aggregated.append(result)
-                elif url in seen_urls:
-                    # Find existing result and add engine
-                    for agg_result in aggregated:
-                        if agg_result.get('url') == url:
-                            if 'engines' not in agg_result:
-                                agg_result['engines'] = []
-                            agg_result['engines'].append(engine)
-                            break
-        
-        # Sort by number of engines (more engines = more relevant)
-        aggregated.sort(key=lambda x: len(x.get('engines', [])), reverse=True)
-        
-        return aggregated[:max_results]
+
+    async def search_stream(
+        self,
+        query: str,
+        num_results: int = 10,
+        engines: Optional[List[str]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Perform web search, yielding the fused results so far each time an
+        engine returns. The last response yielded is the final one.
+        """
+        engines = self._select_engines(engines)
+        if not engines:
+            yield {'error': 'No search engines available', 'results': []}
+            return
+
+        federated = self._federate(query, num_results, engines)
+        async with aclosing(federated.stream()) as stream:
+            async for _ in stream:
+                yield self._build_response(query, federated, num_results, aggregate=True)
+
+        # Stopped before every engine answered: report which ones were dropped
+        if not federated.complete:
+            yield self._build_response(query, federated, num_results, aggregate=True)
     
     async def search_with_context(
         self,
@@ -509,7 +525,7 @@ class WebSearchService:
         enhanced_query = self._enhance_query_with_context(query, context)
 
         context_hash = hashlib.sha1(json.dumps(context, sort_keys=True).encode()).hexdigest()
-        cache_key = f"web_search_ctx:{hashlib.sha1(f'{query}|{context_hash}|{num_results}'.encode()).hexdigest()}"
+        cache_key = f"web_search_ctx:{hashlib.sha1(f'{normalize_query(query)}|{context_hash}|{num_results}'.encode()).hexdigest()}"
 
         if use_cache:
             cached = await self.cache.get(cache_key)
@@ -0,0 +1,30 @@
+"""
+Text Search Services Module
+Ranked full-text search over medical records, recipes and affiliate products
+"""
+
+from .ranked_search import (
+    MEDICAL_RECORDS_RPC,
+    PRODUCTS_RPC,
+    RECIPES_RPC,
+    STOP_WORDS,
+    SearchHit,
+    ingredient_terms,
+    search_medical_records,
+    search_products,
+    search_recipes,
+    search_terms,
+)
+
+__all__ = [
+    'MEDICAL_RECORDS_RPC',
+    'PRODUCTS_RPC',
+    'RECIPES_RPC',
+    'STOP_WORDS',
+    'SearchHit',
+    'ingredient_terms',
+    'search_medical_records',
+    'search_products',
+    'search_recipes',
+    'search_terms',
+]
@@ -0,0 +1,141 @@
+"""
+Ranked Text Search
+Query helpers and RPC wrappers for the full-text search indexes
+
+medical_records, recipes and affiliate_products carry a weighted, stored
+search_vector (see the text_search_indexes migration), GIN-indexed for
+recipes and products; medical searches only test the user's own rows. The
+*_ranked RPCs match every search term as a prefix, rank by ts_rank_cd and
+compute highlights for the returned rows only, instead of running ilike
+over every row's text.
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MEDICAL_RECORDS_RPC = "search_medical_records_ranked"
+RECIPES_RPC = "search_recipes_ranked"
+PRODUCTS_RPC = "search_affiliate_products_ranked"
+
+# Words too common to be useful search terms
+STOP_WORDS = {
+    "a", "an", "the", "is", "it", "in", "on", "at", "to", "for",
+    "of", "and", "or", "my", "me", "i", "do", "if", "no", "so",
+    "up", "can", "you", "has", "had", "was", "are", "be", "any",
+    "all", "about", "have", "what", "with", "that", "this", "from",
+}
+
+_SINGULAR = re.compile(r"[a-z]{2}[^s]s$")
+
+
+@dataclass
+class SearchHit:
+    """One ranked row; highlight marks matched words with **"""
+    row: Dict[str, Any]
+    rank: float = 0.0
+    highlight: Optional[str] = None
+
+
+def search_terms(query: Optional[str]) -> List[str]:
+    """Split a query into meaningful search terms, filtering stop words."""
+    words = re.split(r"\s+", (query or "").lower().strip())
+    terms = [w for w in words if len(w) >= 3 and w not in STOP_WORDS]
+    # If all words were filtered out, use original words with len >= 2
+    if not terms:
+        terms = [w for w in words if len(w) >= 2]
+    return terms
+
+
+def _singular(term: str) -> str:
+    return term[:-1] if _SINGULAR.search(term) else term
+
+
+def ingredient_terms(names: Optional[Iterable[str]]) -> List[str]:
+    """
+    The forms of each ingredient or allergen name that public.ingredient_terms
+    stores for a recipe: the lower-cased name and its naive singular. Both
+    p_any_ingredients and p_exclude_ingredients match these as substrings of
+    any stored term, so "tomato" finds "cherry tomatoes", a "peanuts" allergy
+    also drops "peanut butter" and "milk" drops "buttermilk".
+    """
+    terms = []
+    for name in names or []:
+        name = " ".join(str(name).lower().split())
+        if name:
+            terms.extend((name, _singular(name)))
+    return list(dict.fromkeys(terms))
+
+
+def _hits(rows, row_key: Optional[str] = None) -> List[SearchHit]:
+    hits = []
+    for row in rows or []:
+        row = dict(row)
+        rank = float(row.pop("rank", 0) or 0)
+        highlight = row.pop("highlight", None)
+        hits.append(SearchHit(row[row_key] if row_key else row, rank, highlight))
+    return hits
+
+
+def search_medical_records(client, user_id: str, terms: List[str], limit: int = 10) -> List[SearchHit]:
+    """A user's medical records matching any term, best match first"""
+    result = client.rpc(MEDICAL_RECORDS_RPC, {
+        "p_user_id": user_id,
+        "p_terms": terms,
+        "p_limit": limit,
+    }).execute()
+    return _hits(result.data)
+
+
+def search_recipes(
+    client,
+    user_id: str,
+    terms: Optional[List[str]] = None,
+    meal_type: Optional[str] = None,
+    required_tags: Optional[List[str]] = None,
+    exclude_ingredients: Optional[List[str]] = None,
+    any_ingredients: Optional[List[str]] = None,
+    max_prep_time: Optional[int] = None,
+    include_public: bool = True,
+    limit: int = 10
+) -> List[SearchHit]:
+    """
+    Recipes the user can see that match all terms and filters. Ingredient
+    names are normalized with ingredient_terms; empty lists mean no filter.
+    """
+    result = client.rpc(RECIPES_RPC, {
+        "p_user_id": user_id,
+        "p_terms": terms or None,
+        "p_meal_type": meal_type,
+        "p_required_tags": required_tags or None,
+        "p_exclude_ingredients": ingredient_terms(exclude_ingredients) or None,
+        "p_any_ingredients": ingredient_terms(any_ingredients) or None,
+        "p_max_prep_time": max_prep_time,
+        "p_include_public": include_public,
+        "p_limit": limit,
+    }).execute()
+    return _hits(result.data, row_key="recipe")
+
+
+def search_products(
+    client,
+    terms: Optional[List[str]] = None,
+    match_any: bool = False,
+    categories: Optional[List[str]] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    limit: int = 20
+) -> List[SearchHit]:
+    """Active affiliate products matching all (or any) terms, best match then cheapest first"""
+    result = client.rpc(PRODUCTS_RPC, {
+        "p_terms": terms or None,
+        "p_match_any": match_any,
+        "p_categories": categories or None,
+        "p_min_price": min_price,
+        "p_max_price": max_price,
+        "p_limit": limit,
+    }).execute()
+    return _hits(result.data)
@@ -14,7 +14,7 @@ Components:
 - data_extractor: Structured data extraction from pages
 - workflow_engine: Multi-step workflow execution
 - error_recovery: Error handling and recovery strategies
-- pattern_store: Learned site interaction patterns
+- pattern_store: Learned site interaction patterns and cached element indexes (SQLite)
 - models: Data models and types
 """
 
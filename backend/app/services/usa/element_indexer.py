@@ -6,15 +6,21 @@ Finds and indexes interactive elements on a page with:
 - Priority scoring (inputs > buttons > links)
 - Shadow DOM label injection (CSP-safe)
 - iframe support
+- Fingerprint cache: a page whose interactive elements are structurally
+  unchanged reuses the stored index (one evaluate instead of a tree walk)
 """
 
-from typing import List, Optional, TYPE_CHECKING
+import hashlib
+from typing import List, Optional, Dict, Any, TYPE_CHECKING
+from urllib.parse import urlparse
 import logging
 
 from .element_ref import ElementRef
+from .pattern_store import pattern_store
 
 if TYPE_CHECKING:
     from playwright.async_api import Page, ElementHandle
+    from .pattern_store import PatternStore
 
 logger = logging.getLogger(__name__)
 
@@ -31,8 +37,49 @@ PRIORITY_KEYWORDS = {
     'low': ['cancel', 'close', 'back', 'menu', 'more', 'skip'],
 }
 
+# Everything the index depends on, per candidate element: identity, text,
+# state and layout (document coordinates rounded to 8px). Each candidate is
+# tagged with its position so a cached index can be re-applied by ordinal.
+_FINGERPRINT_JS = """
+(selector) => {
+    const sx = window.scrollX || 0, sy = window.scrollY || 0;
+    const parts = [location.pathname, String(window.frames.length)];
+    document.querySelectorAll(selector).forEach((e, i) => {
+        e.setAttribute('data-usa-ordinal', String(i));
+        const r = e.getBoundingClientRect();
+        const style = getComputedStyle(e);
+        parts.push([
+            e.tagName, e.type || '', e.id, e.getAttribute('name') || '',
+            e.getAttribute('role') || '', e.getAttribute('aria-label') || '',
+            e.getAttribute('placeholder') || '', e.getAttribute('data-testid') || '',
+            (e.textContent || '').trim().slice(0, 80), e.disabled ? 1 : 0,
+            style.visibility, style.display,
+            Math.round((r.left + sx) / 8), Math.round((r.top + sy) / 8),
+            Math.round(r.width / 8), Math.round(r.height / 8),
+        ].join('\\u0001'));
+    });
+    return parts.join('\\u0002');
+}
+"""
+
+_APPLY_CACHED_INDEX_JS = """
+([selector, entries]) => {
+    const nodes = document.querySelectorAll(selector);
+    for (const [ordinal, index] of entries) {
+        if (!nodes[ordinal]) return false;
+        nodes[ordinal].setAttribute('data-usa-index', String(index));
+    }
+    return true;
+}
+"""
 
-async def index_page(page: 'Page', max_elements: int = 30) -> List[ElementRef]:
+
+async def index_page(
+    page: 'Page',
+    max_elements: int = 30,
+    use_cache: bool = True,
+    store: Optional['PatternStore'] = None,
+) -> List[ElementRef]:
     """
     Index visible, interactive elements on the page.
 
@@ -41,15 +88,28 @@ async def index_page(page: 'Page', max_elements: int = 30) -> List[ElementRef]:
     Args:
         page: Playwright page instance
         max_elements: Maximum elements to index (default 30 for LLM context)
+        use_cache: Reuse a stored index when the page fingerprint matches
+        store: Pattern store holding cached indexes (default: shared store)
 
     Returns:
         List of ElementRef objects for indexed elements
     """
     logger.info("Starting page indexing")
+    store = store or pattern_store
 
     # Clear any existing labels
     await _clear_existing_labels(page)
 
+    domain = urlparse(page.url).netloc
+    signature = await _page_signature(page, max_elements) if use_cache else None
+    if signature:
+        cached = store.get_element_index(domain, signature)
+        if cached is not None:
+            indexed = await _apply_cached_index(page, cached)
+            if indexed is not None:
+                logger.info(f"Indexed {len(indexed)} elements (fingerprint cache hit)")
+                return indexed
+
     all_elements: List['ElementHandle'] = []
 
     # Index main page
@@ -97,6 +157,7 @@ async def index_page(page: 'Page', max_elements: int = 30) -> List[ElementRef]:
 
     # Assign indices and inject markers
     indexed: List[ElementRef] = []
+    entries: List[Dict[str, Any]] = []
     for i, el in enumerate(prioritized[:max_elements], 1):
         try:
             ref = await _create_element_ref(el, i)
@@ -105,16 +166,71 @@ async def index_page(page: 'Page', max_elements: int = 30) -> List[ElementRef]:
             # Inject data attribute for stable reference
             await el.evaluate(f'e => e.setAttribute("data-usa-index", "{i}")')
 
-            # Inject visual label
-            await _inject_label(page, i)
+            # Elements inside iframes have no ordinal in the main document
+            ordinal = await el.get_attribute("data-usa-ordinal") if signature else None
+            entries.append(_ref_to_entry(ref, ordinal))
         except Exception as e:
             logger.debug(f"Failed to index element {i}: {e}")
             continue
 
+    # Inject visual labels
+    await _inject_labels(page, [ref.index for ref in indexed])
+
+    if signature and all(entry["ordinal"] is not None for entry in entries):
+        store.save_element_index(domain, signature, entries)
+
     logger.info(f"Indexed {len(indexed)} elements")
     return indexed
 
 
+async def _page_signature(page: 'Page', max_elements: int) -> Optional[str]:
+    """Structural fingerprint of the page's interactive elements, None if unavailable"""
+    try:
+        fingerprint = await page.evaluate(_FINGERPRINT_JS, INTERACTIVE_SELECTOR)
+    except Exception as e:
+        logger.debug(f"Page fingerprint failed, indexing without cache: {e}")
+        return None
+    key = f"{max_elements}\0{page.viewport_size}\0{fingerprint}"
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+
+async def _apply_cached_index(page: 'Page', entries: List[Dict[str, Any]]) -> Optional[List[ElementRef]]:
+    """Mark the cached elements by ordinal; None if the page no longer matches"""
+    try:
+        applied = await page.evaluate(
+            _APPLY_CACHED_INDEX_JS,
+            [INTERACTIVE_SELECTOR, [[entry["ordinal"], entry["index"]] for entry in entries]],
+        )
+        if not applied:
+            return None
+        await _inject_labels(page, [entry["index"] for entry in entries])
+    except Exception as e:
+        logger.debug(f"Cached index could not be applied: {e}")
+        return None
+
+    return [
+        ElementRef(
+            index=entry["index"],
+            tag=entry["tag"],
+            text_signature=entry["text"],
+            stable_selector=entry["selector"],
+            bounding_box=entry["bbox"],
+        )
+        for entry in entries
+    ]
+
+
+def _ref_to_entry(ref: ElementRef, ordinal: Optional[str]) -> Dict[str, Any]:
+    return {
+        "ordinal": int(ordinal) if ordinal is not None else None,
+        "index": ref.index,
+        "tag": ref.tag,
+        "text": ref.text_signature,
+        "selector": ref.stable_selector,
+        "bbox": ref.bounding_box,
+    }
+
+
 async def _prioritize_elements(elements: List['ElementHandle']) -> List['ElementHandle']:
     """Sort elements by priority: inputs first, then by keyword scoring"""
     scored = []
@@ -222,22 +338,24 @@ async def _clear_existing_labels(page: 'Page') -> None:
         await page.evaluate('''
             () => {
                 document.querySelectorAll('.usa-label-host').forEach(el => el.remove());
+                document.querySelectorAll('[data-usa-index]').forEach(el => el.removeAttribute('data-usa-index'));
             }
         ''')
     except Exception:
         pass
 
 
-async def _inject_label(page: 'Page', index: int) -> None:
+async def _inject_labels(page: 'Page', indices: List[int]) -> None:
     """
-    Inject visual label using Shadow DOM (CSP-safe).
+    Inject visual labels using Shadow DOM (CSP-safe), in one round trip.
 
     Uses safe DOM methods instead of innerHTML.
     Handles scroll position correctly.
     """
+    if not indices:
+        return
     await page.evaluate('''
-        (args) => {
-            const [index] = args;
+        (indices) => indices.forEach((index) => {
             const el = document.querySelector(`[data-usa-index="${index}"]`);
             if (!el) return;
 
@@ -283,5 +401,5 @@ async def _inject_label(page: 'Page', index: int) -> None:
             host.style.left = (rect.left + scrollX) + 'px';
 
             document.body.appendChild(host);
-        }
-    ''', [index])
+        })
+    ''', indices)
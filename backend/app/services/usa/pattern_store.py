@@ -3,6 +3,11 @@ Pattern Store for Universal Site Access
 
 Stores and retrieves learned patterns for interacting with specific websites.
 Enables faster automation by reusing successful interaction patterns.
+
+Patterns and cached element indexes live in an embedded SQLite database, so
+they survive restarts and are shared by every worker on the host. Writes are
+single-row transactions; usage statistics are updated in place by one UPDATE
+statement, so concurrent workers never overwrite each other's counts.
 """
 
 import hashlib
@@ -10,10 +15,14 @@ import json
 import logging
 import os
 import re
+import sqlite3
+import tempfile
+import threading
+from dataclasses import asdict
 from datetime import datetime
-from typing import Dict, Optional, List, TYPE_CHECKING
+from typing import Any, Dict, Optional, List, TYPE_CHECKING
 
-from .models import SitePattern, WorkflowStep
+from .models import SitePattern, WorkflowStep, ActionType, WaitCondition, RecoveryStrategy
 
 if TYPE_CHECKING:
     pass
@@ -29,6 +38,36 @@ class SecurityError(Exception):
 # Pattern ID validation: alphanumeric, underscore, hyphen only
 PATTERN_ID_REGEX = re.compile(r'^[a-zA-Z0-9_-]+$')
 
+DEFAULT_DB_PATH = os.path.join(tempfile.gettempdir(), "usa_patterns.sqlite3")
+
+# Cached element indexes kept per host; least recently used are pruned
+ELEMENT_INDEX_MAX_ROWS = 5000
+ELEMENT_INDEX_PRUNE_EVERY = 200
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS site_patterns (
+    pattern_id TEXT PRIMARY KEY,
+    domain TEXT NOT NULL,
+    page_type TEXT NOT NULL,
+    body TEXT NOT NULL,
+    success_rate REAL NOT NULL DEFAULT 0,
+    total_uses INTEGER NOT NULL DEFAULT 0,
+    last_used TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    UNIQUE (domain, page_type)
+);
+CREATE TABLE IF NOT EXISTS element_indexes (
+    domain TEXT NOT NULL,
+    signature TEXT NOT NULL,
+    elements TEXT NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0,
+    used_at TEXT NOT NULL,
+    PRIMARY KEY (domain, signature)
+);
+CREATE INDEX IF NOT EXISTS idx_element_indexes_used_at ON element_indexes (used_at);
+"""
+
 
 class PatternStore:
     """
@@ -39,27 +78,31 @@ class PatternStore:
     - Form mappings: Field type to typical element index mappings
     - Navigation flows: Successful workflow sequences
 
-    Currently uses in-memory storage. Can be extended to use
-    Redis or database for persistence.
+    Alongside patterns it caches element indexes keyed by domain and a
+    structural fingerprint of the page (see element_indexer), so a page
+    whose interactive elements haven't changed is not walked again.
+
+    Storage is SQLite at db_path (USA_PATTERN_DB, default in the system temp
+    directory); ":memory:" gives a private, non-persistent store.
 
     Security features:
     - Pattern ID validation (alphanumeric, underscore, hyphen only)
     - Path traversal protection for file-based storage
     """
 
-    def __init__(self, base_dir: Optional[str] = None):
+    def __init__(self, base_dir: Optional[str] = None, db_path: Optional[str] = None):
         """
-        Initialize pattern store with in-memory storage.
+        Initialize pattern store. The database is opened on first use.
 
         Args:
             base_dir: Optional base directory for file-based storage.
                       If provided, enables path traversal protection.
+            db_path: SQLite database path (default: USA_PATTERN_DB or temp dir)
         """
-        # In-memory storage: {pattern_id: SitePattern}
-        self._patterns: Dict[str, SitePattern] = {}
-
-        # Index for quick lookup: {domain: {page_type: pattern_id}}
-        self._index: Dict[str, Dict[str, str]] = {}
+        self._db_path = db_path or os.environ.get("USA_PATTERN_DB", DEFAULT_DB_PATH)
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._element_index_writes = 0
 
         # Base directory for file operations (if file-based storage is used)
         self._base_dir: Optional[str] = None
@@ -68,6 +111,31 @@ class PatternStore:
 
         logger.info("PatternStore initialized")
 
+    def _db(self) -> sqlite3.Connection:
+        """Open the database and create the schema on first use"""
+        if self._conn is None:
+            conn = sqlite3.connect(self._db_path, timeout=5.0, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            if self._db_path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+            logger.info(f"Pattern database opened at {self._db_path}")
+        return self._conn
+
+    def _execute(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        """Run one statement in its own transaction"""
+        with self._lock:
+            return self._db().execute(sql, params).fetchall()
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
     def _validate_pattern_id(self, pattern_id: str) -> None:
         """
         Validate pattern ID format to prevent injection attacks.
@@ -196,10 +264,13 @@ class PatternStore:
         domain = self._normalize_domain(domain)
         logger.debug(f"Looking up pattern for {domain}/{page_type}")
 
-        pattern_id = self._index.get(domain, {}).get(page_type)
-        if pattern_id and pattern_id in self._patterns:
-            pattern = self._patterns[pattern_id]
-            logger.info(f"Found pattern {pattern_id} with {pattern.success_rate:.0%} success rate")
+        rows = self._execute(
+            "SELECT * FROM site_patterns WHERE domain = ? AND page_type = ?",
+            (domain, page_type),
+        )
+        if rows:
+            pattern = self._row_to_pattern(rows[0])
+            logger.info(f"Found pattern {pattern.pattern_id} with {pattern.success_rate:.0%} success rate")
             return pattern
 
         logger.debug(f"No pattern found for {domain}/{page_type}")
@@ -231,13 +302,20 @@ class PatternStore:
         pattern.pattern_id = pattern_id
         pattern.updated_at = datetime.utcnow()
 
-        # Save
-        self._patterns[pattern_id] = pattern
-
-        # Update index
-        if domain not in self._index:
-            self._index[domain] = {}
-        self._index[domain][page_type] = pattern_id
+        self._execute(
+            """
+            INSERT INTO site_patterns (pattern_id, domain, page_type, body, success_rate,
+                                       total_uses, last_used, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (pattern_id) DO UPDATE SET
+                body = excluded.body,
+                success_rate = excluded.success_rate,
+                total_uses = excluded.total_uses,
+                last_used = excluded.last_used,
+                updated_at = excluded.updated_at
+            """,
+            self._pattern_to_row(pattern),
+        )
 
         logger.info(f"Saved pattern {pattern_id} for {domain}/{page_type}")
         return pattern_id
@@ -256,28 +334,29 @@ class PatternStore:
             success: Whether the pattern execution was successful
             execution_time_ms: Time taken to execute
         """
-        if pattern_id not in self._patterns:
+        outcome = 1.0 if success else 0.0
+        # Weighted update to prevent old data from dominating; the right-hand
+        # sides all see the pre-update row, so this is one atomic step
+        rows = self._execute(
+            """
+            UPDATE site_patterns SET
+                success_rate = CASE WHEN total_uses = 0 THEN ?1 ELSE
+                    (1 - MIN(0.1, 1.0 / (total_uses + 1))) * success_rate
+                    + MIN(0.1, 1.0 / (total_uses + 1)) * ?1 END,
+                total_uses = total_uses + 1,
+                last_used = ?2
+            WHERE pattern_id = ?3
+            RETURNING total_uses, success_rate
+            """,
+            (outcome, datetime.utcnow().isoformat(), pattern_id),
+        )
+        if not rows:
             logger.warning(f"Pattern {pattern_id} not found for stats update")
             return
 
-        pattern = self._patterns[pattern_id]
-
-        # Update counts
-        pattern.total_uses += 1
-        pattern.last_used = datetime.utcnow()
-
-        # Update success rate (rolling average)
-        old_rate = pattern.success_rate
-        if pattern.total_uses == 1:
-            pattern.success_rate = 1.0 if success else 0.0
-        else:
-            # Weighted update to prevent old data from dominating
-            weight = min(0.1, 1.0 / pattern.total_uses)
-            pattern.success_rate = (1 - weight) * old_rate + weight * (1.0 if success else 0.0)
-
         logger.debug(
-            f"Updated pattern {pattern_id}: uses={pattern.total_uses}, "
-            f"success_rate={pattern.success_rate:.2%}"
+            f"Updated pattern {pattern_id}: uses={rows[0]['total_uses']}, "
+            f"success_rate={rows[0]['success_rate']:.2%}"
         )
 
     def delete_pattern(
@@ -296,20 +375,15 @@ class PatternStore:
             True if pattern was deleted, False if not found
         """
         domain = self._normalize_domain(domain)
-        pattern_id = self._index.get(domain, {}).get(page_type)
+        rows = self._execute(
+            "DELETE FROM site_patterns WHERE domain = ? AND page_type = ? RETURNING pattern_id",
+            (domain, page_type),
+        )
 
-        if not pattern_id:
+        if not rows:
             return False
 
-        if pattern_id in self._patterns:
-            del self._patterns[pattern_id]
-
-        if domain in self._index and page_type in self._index[domain]:
-            del self._index[domain][page_type]
-            if not self._index[domain]:
-                del self._index[domain]
-
-        logger.info(f"Deleted pattern {pattern_id}")
+        logger.info(f"Deleted pattern {rows[0]['pattern_id']}")
         return True
 
     def list_patterns(
@@ -327,10 +401,11 @@ class PatternStore:
         """
         if domain:
             domain = self._normalize_domain(domain)
-            pattern_ids = list(self._index.get(domain, {}).values())
-            return [self._patterns[pid] for pid in pattern_ids if pid in self._patterns]
+            rows = self._execute("SELECT * FROM site_patterns WHERE domain = ?", (domain,))
+        else:
+            rows = self._execute("SELECT * FROM site_patterns")
 
-        return list(self._patterns.values())
+        return [self._row_to_pattern(row) for row in rows]
 
     def get_best_pattern_for_domain(
         self,
@@ -345,13 +420,15 @@ class PatternStore:
         Returns:
             Best performing SitePattern or None
         """
-        patterns = self.list_patterns(domain)
-        if not patterns:
-            return None
-
         # Sort by success rate and usage
-        patterns.sort(key=lambda p: (p.success_rate, p.total_uses), reverse=True)
-        return patterns[0]
+        rows = self._execute(
+            """
+            SELECT * FROM site_patterns WHERE domain = ?
+            ORDER BY success_rate DESC, total_uses DESC LIMIT 1
+            """,
+            (self._normalize_domain(domain),),
+        )
+        return self._row_to_pattern(rows[0]) if rows else None
 
     def create_pattern_from_workflow(
         self,
@@ -468,7 +545,7 @@ class PatternStore:
             JSON string of all patterns
         """
         export_data = []
-        for pattern in self._patterns.values():
+        for pattern in self.list_patterns():
             data = {
                 "domain": pattern.domain,
                 "page_type": pattern.page_type,
@@ -486,6 +563,9 @@ class PatternStore:
         """
         Import patterns from JSON.
 
+        All patterns are written in one transaction: either the whole
+        import lands or none of it does.
+
         Args:
             json_data: JSON string of patterns
 
@@ -494,28 +574,138 @@ class PatternStore:
         """
         try:
             data = json.loads(json_data)
-            count = 0
+            rows = []
 
             for item in data:
                 pattern = SitePattern(
-                    domain=item["domain"],
+                    domain=self._normalize_domain(item["domain"]),
                     page_type=item["page_type"],
-                    pattern_id=item["pattern_id"],
+                    pattern_id=self._generate_pattern_id(item["domain"], item["page_type"]),
                     element_patterns=item.get("element_patterns", {}),
                     form_mappings=item.get("form_mappings", {}),
                     success_rate=item.get("success_rate", 0.5),
                     total_uses=item.get("total_uses", 0),
                 )
-                self.save_site_pattern(pattern.domain, pattern.page_type, pattern)
-                count += 1
-
-            logger.info(f"Imported {count} patterns")
-            return count
+                rows.append(self._pattern_to_row(pattern))
+
+            with self._lock:
+                conn = self._db()
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO site_patterns VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        rows,
+                    )
+                    conn.execute("COMMIT")
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+
+            logger.info(f"Imported {len(rows)} patterns")
+            return len(rows)
 
         except Exception as e:
             logger.error(f"Pattern import failed: {e}")
             return 0
 
+    def get_element_index(self, domain: str, signature: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Look up a cached element index for a page fingerprint.
+
+        Args:
+            domain: Website domain
+            signature: Structural fingerprint of the page
+
+        Returns:
+            Stored element entries, or None on a miss
+        """
+        rows = self._execute(
+            """
+            UPDATE element_indexes SET hits = hits + 1, used_at = ?
+            WHERE domain = ? AND signature = ?
+            RETURNING elements
+            """,
+            (datetime.utcnow().isoformat(), self._normalize_domain(domain), signature),
+        )
+        return json.loads(rows[0]["elements"]) if rows else None
+
+    def save_element_index(self, domain: str, signature: str, elements: List[Dict[str, Any]]) -> None:
+        """
+        Cache the element index built for a page fingerprint.
+
+        Args:
+            domain: Website domain
+            signature: Structural fingerprint of the page
+            elements: JSON-serializable element entries
+        """
+        self._execute(
+            """
+            INSERT INTO element_indexes (domain, signature, elements, used_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT (domain, signature) DO UPDATE SET
+                elements = excluded.elements, used_at = excluded.used_at
+            """,
+            (self._normalize_domain(domain), signature, json.dumps(elements), datetime.utcnow().isoformat()),
+        )
+        self._element_index_writes += 1
+        if self._element_index_writes % ELEMENT_INDEX_PRUNE_EVERY == 0:
+            self._execute(
+                """
+                DELETE FROM element_indexes WHERE rowid IN (
+                    SELECT rowid FROM element_indexes ORDER BY used_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (ELEMENT_INDEX_MAX_ROWS,),
+            )
+
+    def _pattern_to_row(self, pattern: SitePattern) -> tuple:
+        body = {
+            "element_patterns": pattern.element_patterns,
+            "form_mappings": pattern.form_mappings,
+            "navigation_flows": {
+                name: [asdict(step) for step in steps]
+                for name, steps in pattern.navigation_flows.items()
+            },
+        }
+        return (
+            pattern.pattern_id,
+            pattern.domain,
+            pattern.page_type,
+            json.dumps(body, default=str),
+            pattern.success_rate,
+            pattern.total_uses,
+            pattern.last_used.isoformat() if pattern.last_used else None,
+            pattern.created_at.isoformat(),
+            pattern.updated_at.isoformat(),
+        )
+
+    def _row_to_pattern(self, row: sqlite3.Row) -> SitePattern:
+        body = json.loads(row["body"])
+        navigation_flows = {
+            name: [
+                WorkflowStep(**{
+                    **step,
+                    "action": ActionType(step["action"]),
+                    "wait_for": WaitCondition(step["wait_for"]),
+                    "on_error": RecoveryStrategy(step["on_error"]),
+                })
+                for step in steps
+            ]
+            for name, steps in body.get("navigation_flows", {}).items()
+        }
+        return SitePattern(
+            domain=row["domain"],
+            page_type=row["page_type"],
+            pattern_id=row["pattern_id"],
+            element_patterns=body.get("element_patterns", {}),
+            form_mappings=body.get("form_mappings", {}),
+            navigation_flows=navigation_flows,
+            success_rate=row["success_rate"],
+            total_uses=row["total_uses"],
+            last_used=datetime.fromisoformat(row["last_used"]) if row["last_used"] else None,
+            created_at=datetime.fromisoformat(row["created_at"]),
+            updated_at=datetime.fromisoformat(row["updated_at"]),
+        )
+
     def _normalize_domain(self, domain: str) -> str:
         """Normalize domain for consistent lookup"""
         domain = domain.lower().strip()
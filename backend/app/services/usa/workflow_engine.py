@@ -19,6 +19,7 @@ from .models import (
     RecoveryStrategy,
 )
 from .action_executor import ActionExecutor
+from .element_indexer import index_page
 from app.core.url_validator import validate_url_safe, SSRFProtectionError
 
 if TYPE_CHECKING:
@@ -129,6 +130,11 @@ class WorkflowEngine:
             if step.wait_for != WaitCondition.NONE:
                 await self._handle_wait_condition(step, page)
 
+            # Later targets refer to the new page; unchanged layouts hit the
+            # element index cache instead of a full walk
+            if result.success and result.page_changed:
+                self.session.elements = {e.index: e for e in await index_page(page)}
+
         execution_time = int((time.time() - start_time) * 1000)
         success = error_step is None and len(step_results) > 0
 
@@ -6,12 +6,14 @@ Core service for tracking PAM usage metrics
 import logging
 from datetime import date, datetime, timedelta
 from decimal import Decimal
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, List, Optional, Sequence
 from uuid import UUID
 
 from app.models.usage_tracking import (
     UsageEvent,
     estimate_event_cost,
+    RetentionCohort,
+    RetentionMatrix,
     RetentionMetrics,
     UsageDashboard
 )
@@ -19,6 +21,46 @@ from app.integrations.supabase import get_supabase_client
 
 logger = logging.getLogger(__name__)
 
+# Days per retention period for each cohort granularity
+RETENTION_GRANULARITIES = {'day': 1, 'week': 7}
+MAX_RETENTION_DAYS = 90
+
+
+def build_retention_matrix(
+    rows: Iterable[Dict[str, Any]],
+    granularity: str,
+    periods: Sequence[int],
+    today: date
+) -> RetentionMatrix:
+    """
+    Shape user_retention_matrix rows (cohort_start, period, cohort_size, retained)
+    into a cohort x period matrix. Periods that start after today are None.
+    """
+    period_days = RETENTION_GRANULARITIES[granularity]
+    cohorts: Dict[date, Dict[str, Any]] = {}
+    for row in rows:
+        cohort_start = row['cohort_start']
+        if isinstance(cohort_start, str):
+            cohort_start = date.fromisoformat(cohort_start)
+        cohort = cohorts.setdefault(cohort_start, {'size': int(row['cohort_size']), 'retained': {}})
+        cohort['retained'][int(row['period'])] = int(row['retained'])
+
+    result: List[RetentionCohort] = []
+    for cohort_start in sorted(cohorts):
+        size = cohorts[cohort_start]['size']
+        retained: Dict[int, Optional[int]] = {}
+        rates: Dict[int, Optional[float]] = {}
+        for period in periods:
+            if cohort_start + timedelta(days=period * period_days) > today:
+                retained[period] = rates[period] = None
+                continue
+            count = cohorts[cohort_start]['retained'].get(period, 0)
+            retained[period] = count
+            rates[period] = count / size if size else 0
+        result.append(RetentionCohort(cohort_start=cohort_start, cohort_size=size, retained=retained, rates=rates))
+
+    return RetentionMatrix(granularity=granularity, periods=list(periods), cohorts=result)
+
 
 class UsageTrackingService:
     """Service for tracking and analyzing PAM usage"""
@@ -121,63 +163,77 @@ class UsageTrackingService:
             logger.error(f"❌ Failed to get user activity: {e}")
             return None
 
+    async def get_retention_matrix(
+        self,
+        start: date,
+        end: date,
+        granularity: str = 'day',
+        periods: Sequence[int] = (1, 7, 30),
+        cohorts: Optional[Sequence[date]] = None
+    ) -> RetentionMatrix:
+        """
+        Cohort retention matrix from the user_activity activity bitmaps
+
+        One grouped aggregate in Postgres (user_retention_matrix) returns a
+        (cohort, period) -> count table; no user rows leave the database.
+
+        Args:
+            start: First cohort date (first_seen)
+            end: Last cohort date
+            granularity: 'day' (Dk = active on day k) or 'week' (Wk = active in week k)
+            periods: Day or week offsets, up to 90 days out
+            cohorts: Only these first_seen dates (day granularity)
+
+        Returns:
+            Retention matrix
+        """
+        if granularity not in RETENTION_GRANULARITIES:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+        periods = sorted(set(int(p) for p in periods))
+        if not periods or periods[0] < 0 or periods[-1] * RETENTION_GRANULARITIES[granularity] > MAX_RETENTION_DAYS:
+            raise ValueError(f"Retention periods must be between 0 and {MAX_RETENTION_DAYS} days")
+        if cohorts is not None and granularity != 'day':
+            raise ValueError("Explicit cohorts are only supported for daily retention")
+
+        result = self.supabase.rpc('user_retention_matrix', {
+            'p_start': start.isoformat(),
+            'p_end': end.isoformat(),
+            'p_granularity': granularity,
+            'p_periods': periods,
+            'p_cohorts': [c.isoformat() for c in cohorts] if cohorts is not None else None
+        }).execute()
+
+        return build_retention_matrix(result.data or [], granularity, periods, date.today())
+
     async def calculate_retention_rates(self) -> RetentionMetrics:
         """
         Calculate retention rates (D1, D7, D30)
 
+        Dk is the share of the cohort that first appeared k days ago and was
+        active again on day k.
+
         Returns:
             Retention metrics
         """
         try:
-            # Get users who first appeared 1, 7, and 30 days ago
             today = date.today()
+            matrix = await self.get_retention_matrix(
+                today - timedelta(days=30), today - timedelta(days=1), 'day', (1, 7, 30),
+                cohorts=[today - timedelta(days=d) for d in (1, 7, 30)]
+            )
+            by_start = {cohort.cohort_start: cohort for cohort in matrix.cohorts}
 
-            # D1 retention: users from yesterday who came back today
-            d1_cohort = await self.supabase.table('user_activity')\
-                .select('user_id')\
-                .eq('first_seen', (today - timedelta(days=1)).isoformat())\
-                .execute()
-
-            d1_returned = await self.supabase.table('user_activity')\
-                .select('user_id')\
-                .eq('first_seen', (today - timedelta(days=1)).isoformat())\
-                .eq('last_seen', today.isoformat())\
-                .execute()
-
-            # D7 retention
-            d7_cohort = await self.supabase.table('user_activity')\
-                .select('user_id')\
-                .eq('first_seen', (today - timedelta(days=7)).isoformat())\
-                .execute()
-
-            d7_returned = await self.supabase.table('user_activity')\
-                .select('user_id')\
-                .eq('first_seen', (today - timedelta(days=7)).isoformat())\
-                .gte('last_seen', (today - timedelta(days=1)).isoformat())\
-                .execute()
-
-            # D30 retention
-            d30_cohort = await self.supabase.table('user_activity')\
-                .select('user_id')\
-                .eq('first_seen', (today - timedelta(days=30)).isoformat())\
-                .execute()
-
-            d30_returned = await self.supabase.table('user_activity')\
-                .select('user_id')\
-                .eq('first_seen', (today - timedelta(days=30)).isoformat())\
-                .gte('last_seen', (today - timedelta(days=7)).isoformat())\
-                .execute()
+            def rate(days: int) -> float:
+                cohort = by_start.get(today - timedelta(days=days))
+                return (cohort.rates.get(days) or 0) if cohort else 0
 
-            # Calculate rates
-            d1_rate = len(d1_returned.data) / len(d1_cohort.data) if d1_cohort.data else 0
-            d7_rate = len(d7_returned.data) / len(d7_cohort.data) if d7_cohort.data else 0
-            d30_rate = len(d30_returned.data) / len(d30_cohort.data) if d30_cohort.data else 0
+            d1_cohort = by_start.get(today - timedelta(days=1))
 
             return RetentionMetrics(
-                d1_retention=d1_rate,
-                d7_retention=d7_rate,
-                d30_retention=d30_rate,
-                cohort_size=len(d1_cohort.data) if d1_cohort.data else 0
+                d1_retention=rate(1),
+                d7_retention=rate(7),
+                d30_retention=rate(30),
+                cohort_size=d1_cohort.cohort_size if d1_cohort else 0
             )
 
         except Exception as e:
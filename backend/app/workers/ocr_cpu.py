@@ -0,0 +1,182 @@
+"""CPU-bound OCR steps run in a process pool.
+
+pdfplumber parsing and PIL preprocessing hold the GIL for hundreds of
+milliseconds per page, so running them inside the async worker stalls every
+other request. The functions here are module-level (picklable) and free of
+app imports; the module lives outside app.services so spawned workers do not
+import the service layer and start quickly.
+
+Multi-page PDFs are split into page ranges that are extracted in parallel.
+"""
+import asyncio
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional, Tuple
+
+PAGES_PER_TASK = 4
+MAX_IMAGE_DIMENSION = 2048
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _default_workers() -> int:
+    configured = os.environ.get("OCR_PROCESS_WORKERS")
+    if configured:
+        return max(1, int(configured))
+    return max(1, min(4, (os.cpu_count() or 2) - 1))
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Return the shared OCR process pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=_default_workers(),
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_process_pool() -> None:
+    """Shut down the shared pool (called on application shutdown)."""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def run_in_process_pool(fn: Callable, *args):
+    """Run fn(*args) in the OCR process pool.
+
+    If the pool is broken (a worker was killed, e.g. by the OOM killer) it is
+    recreated once; if that also fails the call runs in a thread instead.
+    """
+    global _pool
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_process_pool(), fn, *args)
+    except BrokenProcessPool:
+        _pool = None
+        try:
+            return await loop.run_in_executor(get_process_pool(), fn, *args)
+        except BrokenProcessPool:
+            _pool = None
+            return await asyncio.to_thread(fn, *args)
+
+
+def page_batches(page_count: int, pages_per_task: int = PAGES_PER_TASK) -> List[Tuple[int, int]]:
+    """Split [0, page_count) into half-open page ranges of at most pages_per_task."""
+    return [
+        (start, min(start + pages_per_task, page_count))
+        for start in range(0, page_count, pages_per_task)
+    ]
+
+
+def pdf_page_count(file_bytes: bytes) -> int:
+    """Return the number of pages in a PDF (0 if it cannot be parsed)."""
+    import pdfplumber
+
+    try:
+        with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
+            return len(pdf.pages)
+    except Exception:
+        return 0
+
+
+def extract_pdf_pages(file_bytes: bytes, start: int, end: int) -> List[str]:
+    """Extract text for pages [start, end). Pages without text yield ''."""
+    import pdfplumber
+
+    texts = []
+    with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
+        for page in pdf.pages[start:end]:
+            texts.append(page.extract_text() or "")
+            # pdfplumber caches layout objects per page; release them early
+            page.flush_cache()
+    return texts
+
+
+def extract_pdf_text(file_bytes: bytes) -> Tuple[Optional[str], int]:
+    """Extract all PDF text sequentially. Returns (text or None, page_count)."""
+    page_count = pdf_page_count(file_bytes)
+    if page_count == 0:
+        return None, 0
+    return _join_pages(extract_pdf_pages(file_bytes, 0, page_count)), page_count
+
+
+async def extract_pdf_text_parallel(
+    file_bytes: bytes,
+    pages_per_task: int = PAGES_PER_TASK,
+) -> Tuple[Optional[str], int]:
+    """Extract PDF text with page ranges fanned out across the process pool.
+
+    Returns (text or None, page_count). Text is None for scanned PDFs with no
+    text layer so the caller can fall back to image OCR.
+    """
+    page_count = await run_in_process_pool(pdf_page_count, file_bytes)
+    if page_count == 0:
+        return None, 0
+
+    batches = page_batches(page_count, pages_per_task)
+    if len(batches) == 1:
+        pages = await run_in_process_pool(extract_pdf_pages, file_bytes, 0, page_count)
+    else:
+        results = await asyncio.gather(*(
+            run_in_process_pool(extract_pdf_pages, file_bytes, start, end)
+            for start, end in batches
+        ))
+        pages = [text for batch in results for text in batch]
+
+    return _join_pages(pages), page_count
+
+
+def _join_pages(pages: List[str]) -> Optional[str]:
+    text = "\n\n".join(page for page in pages if page)
+    return text or None
+
+
+def preprocess_image(file_bytes: bytes, filename: str) -> bytes:
+    """Preprocess image: HEIC conversion, EXIF rotation, resize, RGB convert."""
+    from PIL import Image, ImageOps
+
+    # Try HEIC conversion
+    is_heic = filename.lower().endswith((".heic", ".heif"))
+    if is_heic:
+        try:
+            import pillow_heif
+            heif_file = pillow_heif.read_heif(file_bytes)
+            img = Image.frombytes(
+                heif_file.mode, heif_file.size, heif_file.data,
+                "raw", heif_file.mode, heif_file.stride,
+            )
+        except ImportError:
+            # pillow-heif not installed, cannot convert HEIC server-side
+            return file_bytes
+    else:
+        img = Image.open(io.BytesIO(file_bytes))
+        # Let the JPEG decoder downscale during decode when the image is huge
+        img.draft("RGB", (MAX_IMAGE_DIMENSION, MAX_IMAGE_DIMENSION))
+
+    # Apply EXIF rotation using standard Pillow method
+    try:
+        img = ImageOps.exif_transpose(img)
+    except Exception:
+        pass  # No EXIF or no orientation tag
+
+    # Resize to max 2048px on longest side
+    if max(img.size) > MAX_IMAGE_DIMENSION:
+        ratio = MAX_IMAGE_DIMENSION / max(img.size)
+        new_size = (int(img.width * ratio), int(img.height * ratio))
+        img = img.resize(new_size, Image.LANCZOS)
+
+    # Convert to RGB
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+
+    # Save as JPEG
+    buf = io.BytesIO()
+    img.save(buf, format="JPEG", quality=95)
+    return buf.getvalue()
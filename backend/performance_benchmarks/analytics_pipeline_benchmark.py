@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Analytics Pipeline Benchmark
+============================
+
+Streams a synthetic PAM event log (default 10M events spread over 30 days,
+50k users, realistic event-type mix and log-normal latencies) through the
+analytics pipeline (app/services/analytics/pipeline.py) into a scratch
+schema in a local Postgres, then compares dashboard queries:
+
+  legacy  - SELECT * of the raw window and the old Python aggregation
+            (24h only; the 30d window would pull every row)
+  rollups - the pam_analytics_rollup_summary / hourly_counts functions from
+            the migration, merged with summarize_rollups()
+
+Also reports the per-event cost of the old one-INSERT-per-event path, and
+how close the sketch p95/p99 and HyperLogLog unique users are to exact.
+
+The rollup SQL is loaded from the migration file and created in its own
+schema, which is dropped afterwards.
+
+Usage:
+    TEST_DATABASE_URL=postgresql://postgres@127.0.0.1:5432/postgres \\
+        python performance_benchmarks/analytics_pipeline_benchmark.py --events 10000000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import asyncpg
+
+# Add backend to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.analytics.pipeline import (
+    ALL_EVENTS,
+    AnalyticsPipeline,
+    AsyncpgAnalyticsSink,
+    summarize_rollups,
+)
+
+SCHEMA = "analytics_bench"
+MIGRATION = Path(__file__).resolve().parents[2] / "supabase" / "migrations" / "20260315000000_pam_analytics_rollups.sql"
+
+EVENTS_DDL = f"""
+CREATE TABLE {SCHEMA}.pam_analytics_logs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    event_type TEXT NOT NULL,
+    user_id UUID,
+    session_id TEXT,
+    timestamp TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    response_time_ms INTEGER,
+    success BOOLEAN DEFAULT true,
+    error_message TEXT,
+    event_data JSONB,
+    metadata JSONB,
+    created_at TIMESTAMPTZ DEFAULT NOW()
+);
+CREATE INDEX ON {SCHEMA}.pam_analytics_logs (timestamp DESC);
+CREATE INDEX ON {SCHEMA}.pam_analytics_logs (user_id);
+"""
+
+EVENT_MIX = [
+    ("user_message", 30), ("pam_response", 30), ("node_execution", 15), ("api_call", 10),
+    ("intent_detected", 8), ("feature_usage", 5), ("error_occurred", 2),
+]
+NODES = ["wheels", "wins", "social", "memory", "you", "shop", "admin"]
+APIS = ["mapbox", "openroute", "openmeteo", "anthropic", "supabase"]
+INTENTS = ["trip_plan", "expense", "weather", "camping", "budget", "social", "general"]
+FEATURES = [("trip", "plan"), ("trip", "optimize"), ("budget", "track"), ("social", "post"), ("shop", "browse")]
+
+
+def rollup_sql() -> str:
+    """Migration SQL retargeted at the scratch schema (grants and RLS are not needed here)"""
+    sql = MIGRATION.read_text().replace("public.", f"{SCHEMA}.").replace("SET search_path = public", f"SET search_path = {SCHEMA}")
+    return "\n".join(
+        line for line in sql.splitlines()
+        if not re.match(r"^(REVOKE|GRANT|ALTER TABLE .* ENABLE ROW LEVEL SECURITY)", line)
+    )
+
+
+class EventGenerator:
+    def __init__(self, events: int, users: int, days: int, seed: int = 11):
+        self.rng = random.Random(seed)
+        self.events = events
+        self.users = [str(uuid.UUID(int=self.rng.getrandbits(128))) for _ in range(users)]
+        self.end = datetime(2026, 3, 31, tzinfo=timezone.utc)
+        self.start = self.end - timedelta(days=days)
+        self.step = (self.end - self.start).total_seconds() / events
+        self.types = [t for t, _ in EVENT_MIX]
+        self.weights = [w for _, w in EVENT_MIX]
+
+    def row(self, i: int) -> dict:
+        rng = self.rng
+        event_type = rng.choices(self.types, self.weights)[0]
+        ts = self.start.timestamp() + i * self.step
+        latency = None
+        data = {}
+        success = rng.random() > 0.03
+        if event_type == "pam_response":
+            latency = int(rng.lognormvariate(6.5, 0.6))
+            data = {"intent": rng.choice(INTENTS), "response_length": rng.randint(20, 2000)}
+        elif event_type == "node_execution":
+            latency = int(rng.lognormvariate(5.0, 0.8))
+            data = {"node_name": rng.choice(NODES), "method_name": "process"}
+        elif event_type == "api_call":
+            latency = int(rng.lognormvariate(5.5, 0.7))
+            data = {"api_name": rng.choice(APIS), "endpoint": "/v1", "status_code": 200}
+        elif event_type == "intent_detected":
+            data = {"intent": rng.choice(INTENTS), "confidence": rng.random()}
+        elif event_type == "feature_usage":
+            category, name = rng.choice(FEATURES)
+            data = {"feature_category": category, "feature_name": name, "usage_context": "chat"}
+        elif event_type == "error_occurred":
+            success = False
+            data = {"error_type": rng.choice(["api_error", "timeout_error", "validation_error"])}
+        else:
+            data = {"message_length": rng.randint(1, 500)}
+        return {
+            "event_type": event_type,
+            "user_id": rng.choice(self.users),
+            "timestamp": datetime.fromtimestamp(ts, tz=timezone.utc).isoformat(),
+            "session_id": None,
+            "response_time_ms": latency,
+            "success": success,
+            "error_message": None,
+            "event_data": data,
+            "metadata": {},
+        }
+
+
+async def ingest(pool, generator: EventGenerator, batch_size: int, flush_every: int):
+    sink = AsyncpgAnalyticsSink(pool, schema=SCHEMA)
+    pipeline = AnalyticsPipeline(sink=sink, max_queue=flush_every * 2, batch_size=batch_size)
+    submit_seconds = 0.0
+    flush_seconds = 0.0
+    started = time.perf_counter()
+    chunk = []
+    for i in range(generator.events):
+        chunk.append(generator.row(i))
+        if len(chunk) == flush_every or i == generator.events - 1:
+            t0 = time.perf_counter()
+            for row in chunk:
+                pipeline.submit(row)
+            submit_seconds += time.perf_counter() - t0
+            chunk = []
+            t0 = time.perf_counter()
+            await pipeline.flush()
+            flush_seconds += time.perf_counter() - t0
+            if (i + 1) % (flush_every * 20) == 0:
+                print(f"  {i + 1:,} events ({(i + 1) / (time.perf_counter() - started):,.0f}/s)", flush=True)
+    await pipeline.stop()
+    total = time.perf_counter() - started
+    rollup_rows = await pool.fetchval(f"SELECT count(*) FROM {SCHEMA}.pam_analytics_rollups")
+    return {
+        "events": generator.events,
+        "submit_us_per_event": round(submit_seconds / generator.events * 1e6, 2),
+        "flush_events_per_sec": round(generator.events / flush_seconds, 1),
+        "wall_seconds_including_generation": round(total, 1),
+        "dropped": pipeline.stats.dropped,
+        "rollup_rows_in_db": rollup_rows,
+        "rollup_rows_merged": pipeline.stats.rollup_rows,
+    }
+
+
+async def legacy_insert_rate(pool, generator: EventGenerator, samples: int):
+    """One INSERT per event, awaited (what track_event did, minus the HTTP hop)"""
+    rows = [generator.row(i) for i in range(samples)]
+    start = time.perf_counter()
+    for row in rows:
+        await pool.execute(
+            f"INSERT INTO {SCHEMA}.pam_analytics_logs (event_type, user_id, timestamp, response_time_ms, success, event_data, metadata) "
+            f"VALUES ($1, $2, $3, $4, $5, $6, $7)",
+            row["event_type"], row["user_id"], datetime.fromisoformat(row["timestamp"]),
+            row["response_time_ms"], row["success"], json.dumps(row["event_data"]), "{}",
+        )
+    elapsed = time.perf_counter() - start
+    await pool.execute(f"TRUNCATE {SCHEMA}.pam_analytics_logs")
+    return {"samples": samples, "us_per_event": round(elapsed / samples * 1e6, 1)}
+
+
+def legacy_performance(rows):
+    """The pre-rollup get_performance_metrics computation"""
+    response_times = sorted(r["response_time_ms"] for r in rows if r["response_time_ms"])
+    nodes = {}
+    for r in rows:
+        if r["event_type"] == "node_execution":
+            name = json.loads(r["event_data"]).get("node_name", "unknown")
+            stats = nodes.setdefault(name, {"calls": 0, "total_time": 0, "errors": 0})
+            stats["calls"] += 1
+            stats["total_time"] += r["response_time_ms"] or 0
+            stats["errors"] += 0 if r["success"] else 1
+    return {
+        "average": sum(response_times) / len(response_times),
+        "p95": response_times[int(len(response_times) * 0.95)],
+        "p99": response_times[int(len(response_times) * 0.99)],
+        "nodes": len(nodes),
+    }
+
+
+async def timed(fn, repeats: int):
+    times = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = await fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return result, round(statistics.median(times), 1)
+
+
+async def queries(pool, generator: EventGenerator, repeats: int):
+    end = generator.end
+    day_start = end - timedelta(hours=24)
+    month_start = generator.start
+    report = {}
+
+    async def legacy_24h():
+        rows = await pool.fetch(f"SELECT * FROM {SCHEMA}.pam_analytics_logs WHERE timestamp >= $1 AND timestamp <= $2", day_start, end)
+        return len(rows), legacy_performance(rows)
+
+    (raw_rows, exact), ms = await timed(legacy_24h, repeats)
+    report["legacy_24h_select_star"] = {"rows_read": raw_rows, "median_ms": ms}
+
+    async def rollup(resolution, start, types, include_dimensions=True):
+        rows = await pool.fetch(
+            f"SELECT * FROM {SCHEMA}.pam_analytics_rollup_summary($1, $2, $3, $4, $5)",
+            resolution, start, end, types, include_dimensions,
+        )
+        return len(rows), summarize_rollups([dict(r) for r in rows])
+
+    (groups, perf), ms = await timed(lambda: rollup("1h", day_start, [ALL_EVENTS, "node_execution", "api_call"]), repeats)
+    totals = perf[(ALL_EVENTS, "")]
+    report["rollup_24h_performance"] = {
+        "rows_returned": groups,
+        "median_ms": ms,
+        "p95_exact": exact["p95"], "p95_sketch": totals.quantile(0.95),
+        "p99_exact": exact["p99"], "p99_sketch": totals.quantile(0.99),
+        "avg_exact": round(exact["average"], 1), "avg_rollup": round(totals.average_latency, 1),
+    }
+
+    async def usage_30d():
+        count, summaries = await rollup("1d", month_start, None, include_dimensions=False)
+        hours = await pool.fetch(f"SELECT * FROM {SCHEMA}.pam_analytics_hourly_counts($1, $2)", month_start, end)
+        return count + len(hours), summaries
+
+    (rows_30d, usage), ms = await timed(usage_30d, repeats)
+    exact_users = await pool.fetchval(
+        f"SELECT count(DISTINCT user_id) FROM {SCHEMA}.pam_analytics_logs WHERE timestamp >= $1", month_start
+    )
+    report["rollup_30d_usage"] = {
+        "rows_returned": rows_30d,
+        "median_ms": ms,
+        "events": usage[(ALL_EVENTS, "")].events,
+        "unique_users_exact": exact_users,
+        "unique_users_hll": usage[(ALL_EVENTS, "")].users.estimate(),
+    }
+
+    (_, _), ms = await timed(lambda: rollup("1m", end - timedelta(hours=6), None), repeats)
+    report["rollup_6h_by_minute_all_dimensions"] = {"median_ms": ms}
+    return report
+
+
+async def run(dsn: str, args):
+    pool = await asyncpg.create_pool(dsn, min_size=2, max_size=4)
+    try:
+        await pool.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA};")
+        await pool.execute(EVENTS_DDL)
+        await pool.execute(rollup_sql())
+
+        generator = EventGenerator(args.events, args.users, args.days)
+        results = {"legacy_insert": await legacy_insert_rate(pool, EventGenerator(args.legacy_samples, args.users, args.days, seed=5), args.legacy_samples)}
+        print(json.dumps(results["legacy_insert"], indent=2))
+        results["ingest"] = await ingest(pool, generator, args.batch_size, args.flush_every)
+        print(json.dumps(results["ingest"], indent=2))
+        await pool.execute(f"ANALYZE {SCHEMA}.pam_analytics_logs; ANALYZE {SCHEMA}.pam_analytics_rollups")
+        results["queries"] = await queries(pool, generator, args.repeats)
+        print(json.dumps(results["queries"], indent=2))
+        return results
+    finally:
+        if not args.keep:
+            await pool.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analytics pipeline and rollup benchmark")
+    parser.add_argument("--dsn", default=os.getenv("TEST_DATABASE_URL", "postgresql://postgres@127.0.0.1:5432/postgres"))
+    parser.add_argument("--events", type=int, default=10_000_000)
+    parser.add_argument("--users", type=int, default=50_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=5000, help="Rows per COPY")
+    parser.add_argument("--flush-every", type=int, default=50_000, help="Events submitted between flushes")
+    parser.add_argument("--legacy-samples", type=int, default=5000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch schema")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.dsn, args))
+
+    report_file = f"analytics_pipeline_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "args": vars(args), "results": results}, f, indent=2)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Backup Encryption Benchmark
+===========================
+
+Measures throughput and peak RSS of the segmented streaming AEAD used for
+GDPR backup encryption (app/services/privacy/stream_aead.py).
+
+Each file size runs in its own subprocess so peak RSS is isolated per run.
+Input files are generated on disk before timing starts.
+
+Usage:
+    python performance_benchmarks/backup_encryption_benchmark.py
+    python performance_benchmarks/backup_encryption_benchmark.py --sizes 100M 1G 5G --workers 0 4
+
+Performance Targets:
+- Peak RSS independent of file size (bounded by chunk size x window)
+- Throughput > 300 MB/s per core for AES-256-GCM on AES-NI hardware
+"""
+
+import argparse
+import json
+import os
+import resource
+import secrets
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+# Add backend to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.privacy.stream_aead import DEFAULT_CHUNK_SIZE, decrypt_stream, encrypt_stream
+
+UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def parse_size(value: str) -> int:
+    value = value.strip().upper()
+    if value[-1] in UNITS:
+        return int(float(value[:-1]) * UNITS[value[-1]])
+    return int(value)
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def generate_file(path: str, size: int) -> None:
+    block = os.urandom(DEFAULT_CHUNK_SIZE)
+    with open(path, "wb") as f:
+        remaining = size
+        while remaining > 0:
+            f.write(block[:min(remaining, len(block))])
+            remaining -= len(block)
+
+
+def run_single(size: int, algorithm: str, workers: int, chunk_size: int, workdir: str) -> dict:
+    """Benchmark one size in the current process and return metrics"""
+    plain = os.path.join(workdir, "plain.bin")
+    encrypted = os.path.join(workdir, "plain.enc")
+    restored = os.path.join(workdir, "plain.out")
+    generate_file(plain, size)
+    rss_before = peak_rss_mb()
+
+    key = secrets.token_bytes(32)
+    executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    window = max(2, workers * 2)
+
+    try:
+        start = time.perf_counter()
+        with open(plain, "rb") as src, open(encrypted, "wb") as dst:
+            enc = encrypt_stream(src, dst, key, algorithm, chunk_size=chunk_size, executor=executor, window=window)
+        encrypt_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with open(encrypted, "rb") as src, open(restored, "wb") as dst:
+            dec = decrypt_stream(src, dst, key, executor=executor, window=window)
+        decrypt_seconds = time.perf_counter() - start
+    finally:
+        if executor:
+            executor.shutdown()
+        for path in (plain, encrypted, restored):
+            if os.path.exists(path):
+                os.remove(path)
+
+    mb = size / (1024 * 1024)
+    return {
+        "size_bytes": size,
+        "algorithm": algorithm,
+        "workers": workers,
+        "chunk_size": chunk_size,
+        "encrypt_mb_per_s": round(mb / encrypt_seconds, 1) if encrypt_seconds else None,
+        "decrypt_mb_per_s": round(mb / decrypt_seconds, 1) if decrypt_seconds else None,
+        "checksum_match": enc.plaintext_sha256 == dec.plaintext_sha256,
+        "peak_rss_mb_before": round(rss_before, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Streaming backup encryption benchmark")
+    parser.add_argument("--sizes", nargs="+", default=["100M", "1G", "5G"])
+    parser.add_argument("--algorithms", nargs="+", default=["AES-256-GCM", "ChaCha20-Poly1305"])
+    parser.add_argument("--workers", nargs="+", type=int, default=[0, 4])
+    parser.add_argument("--chunk-size", default=str(DEFAULT_CHUNK_SIZE))
+    parser.add_argument("--workdir", default=tempfile.gettempdir())
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    chunk_size = parse_size(args.chunk_size)
+
+    if args.single:
+        result = run_single(parse_size(args.sizes[0]), args.algorithms[0], args.workers[0], chunk_size, args.workdir)
+        print(json.dumps(result))
+        return
+
+    results = []
+    for size in args.sizes:
+        for algorithm in args.algorithms:
+            for workers in args.workers:
+                cmd = [
+                    sys.executable, os.path.abspath(__file__), "--single",
+                    "--sizes", size, "--algorithms", algorithm, "--workers", str(workers),
+                    "--chunk-size", str(chunk_size), "--workdir", args.workdir,
+                ]
+                output = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                results.append(result)
+                print(
+                    f"{size:>6} {algorithm:<18} workers={workers:<2} "
+                    f"enc={result['encrypt_mb_per_s']} MB/s dec={result['decrypt_mb_per_s']} MB/s "
+                    f"peak_rss={result['peak_rss_mb']} MB"
+                )
+
+    report_file = f"backup_encryption_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "results": results}, f, indent=2)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Browser Pool Benchmark
+======================
+
+Loads pages from a local static test site (served from a temporary directory
+on 127.0.0.1, no external network) and reports pages/minute and the peak RSS
+of all browser processes, for two strategies:
+
+  legacy - the previous extraction path: one shared browser, a fresh context
+           per page, every resource downloaded
+  fleet  - BrowserPool.page(): warm contexts reset between leases, images,
+           fonts and media aborted, browsers recycled by RSS and navigations
+
+Each generated page carries --images images (~200 KB each), a web font, a
+stylesheet and a short script, roughly the shape of a product listing.
+Pages are fetched with --concurrency in flight and wait for network idle,
+like BrowserEngine.capture_page_state. The site is served by the harness
+directly because capture_page_state rejects loopback URLs (SSRF guard).
+
+Requires Playwright and a Chromium build (playwright install chromium), or
+pass --executable-path to use an existing Chrome/Chromium binary.
+
+Usage:
+    python performance_benchmarks/browser_pool_benchmark.py --pages 200 --concurrency 8 --max-browsers 2
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import psutil
+
+# Add backend to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.extraction.browser_pool import BrowserPool, CONTEXT_OPTIONS, LAUNCH_ARGS, PLAYWRIGHT_AVAILABLE
+
+if PLAYWRIGHT_AVAILABLE:
+    from playwright.async_api import async_playwright
+
+PAGE_TEMPLATE = """<!doctype html>
+<html><head><title>Listing {n}</title>
+<link rel="stylesheet" href="/site.css">
+<script src="/site.js"></script>
+</head><body>
+<h1>Campground {n}</h1>
+<p class="price">${price}.00 per night</p>
+<ul>{items}</ul>
+{images}
+<a href="/page{next}.html">next</a>
+</body></html>
+"""
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p99_ms": round(ordered[max(0, int(len(ordered) * 0.99) - 1)] * 1000, 3),
+    }
+
+
+def build_site(root, pages, images):
+    """Write the static site and return the page paths"""
+    for i in range(images):
+        with open(os.path.join(root, f"img{i}.jpg"), "wb") as f:
+            f.write(os.urandom(200 * 1024))
+    with open(os.path.join(root, "font.woff2"), "wb") as f:
+        f.write(os.urandom(80 * 1024))
+    with open(os.path.join(root, "site.css"), "w") as f:
+        f.write("@font-face { font-family: Site; src: url(/font.woff2); }\n"
+                "body { font-family: Site, sans-serif; }\n")
+    with open(os.path.join(root, "site.js"), "w") as f:
+        f.write("document.addEventListener('DOMContentLoaded', () => "
+                "{ localStorage.setItem('visits', String(Number(localStorage.getItem('visits') || 0) + 1)); });\n")
+    paths = []
+    for n in range(pages):
+        items = "".join(f"<li>Amenity {j}</li>" for j in range(20))
+        imgs = "".join(f'<img src="/img{(n + i) % images}.jpg?p={n}">' for i in range(images))
+        with open(os.path.join(root, f"page{n}.html"), "w") as f:
+            f.write(PAGE_TEMPLATE.format(n=n, price=20 + n % 40, items=items, images=imgs, next=(n + 1) % pages))
+        paths.append(f"/page{n}.html")
+    return paths
+
+
+def serve(root):
+    class QuietHandler(SimpleHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=root))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class PeakRSS:
+    """Peak summed RSS of this process's descendants (the browsers), sampled every 100 ms"""
+
+    async def __aenter__(self):
+        self.peak = 0
+        self._running = True
+        self._task = asyncio.create_task(self._sample())
+        return self
+
+    async def _sample(self):
+        me = psutil.Process()
+        while self._running:
+            total = 0
+            for child in me.children(recursive=True):
+                try:
+                    total += child.memory_info().rss
+                except psutil.Error:
+                    continue
+            self.peak = max(self.peak, total)
+            await asyncio.sleep(0.1)
+
+    async def __aexit__(self, *exc):
+        self._running = False
+        await self._task
+
+
+async def load(page, url):
+    await page.goto(url, wait_until="networkidle", timeout=30000)
+    return await page.content()
+
+
+async def drive(urls, concurrency, fetch):
+    """Fetch every URL with `concurrency` in flight; returns throughput and latency"""
+    queue = list(reversed(urls))
+    timings = []
+
+    async def worker(index):
+        while queue:
+            url = queue.pop()
+            start = time.perf_counter()
+            await fetch(url, index)
+            timings.append(time.perf_counter() - start)
+
+    async with PeakRSS() as rss:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return {
+        "pages": len(timings),
+        "wall_s": round(elapsed, 2),
+        "pages_per_min": round(len(timings) / elapsed * 60, 1),
+        "peak_rss_mb": round(rss.peak / 2**20, 1),
+        **percentiles(timings),
+    }
+
+
+async def run_legacy(urls, args, launch_options):
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(**launch_options)
+
+        async def fetch(url, _):
+            context = await browser.new_context(**CONTEXT_OPTIONS)
+            try:
+                page = await context.new_page()
+                await load(page, url)
+            finally:
+                await context.close()
+
+        try:
+            return await drive(urls, args.concurrency, fetch)
+        finally:
+            await browser.close()
+
+
+async def run_fleet(urls, args, launch_options):
+    pool = BrowserPool(
+        max_browsers=args.max_browsers,
+        launch_options={k: v for k, v in launch_options.items() if k not in ("headless", "args")},
+    )
+    await pool.initialize()
+
+    async def fetch(url, index):
+        # Workers stand in for distinct users so the fair queue is exercised
+        async with pool.page(user_id=f"user{index % 3}") as page:
+            await load(page, url)
+
+    try:
+        result = await drive(urls, args.concurrency, fetch)
+        result["pool_stats"] = pool.get_stats()
+        return result
+    finally:
+        await pool.close()
+
+
+async def run(args):
+    if not PLAYWRIGHT_AVAILABLE:
+        raise SystemExit("Playwright is not installed: pip install playwright && playwright install chromium")
+
+    launch_options = {"headless": True, "args": LAUNCH_ARGS}
+    if args.executable_path:
+        launch_options["executable_path"] = args.executable_path
+
+    with tempfile.TemporaryDirectory() as root:
+        paths = build_site(root, args.pages, args.images)
+        server = serve(root)
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        urls = [base + path for path in paths]
+        try:
+            results = {"pages": args.pages, "concurrency": args.concurrency}
+            for strategy in args.strategies.split(","):
+                runner = run_legacy if strategy == "legacy" else run_fleet
+                results[strategy] = await runner(urls, args, launch_options)
+        finally:
+            server.shutdown()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Browser fleet benchmark against a local static site")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--images", type=int, default=6, help="Images per page")
+    parser.add_argument("--max-browsers", type=int, default=2)
+    parser.add_argument("--strategies", default="legacy,fleet")
+    parser.add_argument("--executable-path", help="Chrome/Chromium binary to launch instead of Playwright's")
+    args = parser.parse_args()
+    logging.getLogger("app").setLevel(logging.WARNING)
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+
+    report_file = f"browser_pool_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "args": vars(args), "results": results}, f, indent=2)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
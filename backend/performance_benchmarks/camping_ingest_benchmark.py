@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Campground Ingestion Benchmark
+==============================
+
+Compares the legacy per-site path (one SELECT plus one UPDATE/INSERT per
+site) with the bulk pipeline in app/services/camping_ingest.py against a
+local Postgres.
+
+Runs on a scratch table so it never touches real data. Reports rows/sec,
+round trips and skipped-unchanged counts for an initial load, an unchanged
+refresh and a refresh where 5% of sites changed.
+
+Usage:
+    TEST_DATABASE_URL=postgresql://postgres@127.0.0.1:5432/postgres \\
+        python performance_benchmarks/camping_ingest_benchmark.py --sites 20000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+import asyncpg
+
+# Add backend to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.camping_ingest import AsyncpgCampingSink, CampingSiteIngestor, normalize_site
+
+TABLE = "camping_locations_benchmark"
+
+SCHEMA = f"""
+CREATE TABLE {TABLE} (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    name TEXT NOT NULL,
+    location_type TEXT,
+    country TEXT NOT NULL,
+    latitude DECIMAL(10,6) NOT NULL,
+    longitude DECIMAL(10,6) NOT NULL,
+    address TEXT,
+    is_free BOOLEAN DEFAULT false,
+    price_per_night DECIMAL(10,2),
+    max_rig_length INTEGER,
+    amenities JSONB,
+    seasonal_info TEXT,
+    source_url TEXT,
+    data_source TEXT,
+    natural_key TEXT,
+    content_hash TEXT,
+    last_scraped TIMESTAMPTZ,
+    created_at TIMESTAMPTZ DEFAULT now(),
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
+CREATE UNIQUE INDEX ON {TABLE} (natural_key);
+CREATE INDEX ON {TABLE} (latitude, longitude);
+"""
+
+
+def make_sites(count: int, changed_every: int = 0):
+    sites = []
+    for i in range(count):
+        name = f"Camp {i}"
+        if changed_every and i % changed_every == 0:
+            name += " (renamed)"
+        sites.append({
+            "name": name,
+            "type": "free_camping",
+            "latitude": -10 - (i % 2000) / 100,
+            "longitude": 115 + (i // 2000) / 100,
+            "address": f"{i} Outback Rd",
+            "is_free": i % 3 == 0,
+            "price_per_night": 0 if i % 3 == 0 else 25,
+            "amenities": {"toilets": i % 2 == 0, "water": i % 5 == 0},
+            "source_url": f"https://example.test/camp/{i}",
+        })
+    return sites
+
+
+async def reset(conn):
+    await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    await conn.execute(SCHEMA)
+
+
+async def legacy_ingest(conn, sites):
+    """Emulates the old update_database: SELECT by coordinates, then UPDATE or INSERT"""
+    round_trips = 0
+    start = time.perf_counter()
+    for site in sites:
+        row = normalize_site(site, "benchmark", "US")
+        existing = await conn.fetchrow(
+            f"SELECT id FROM {TABLE} WHERE latitude = $1 AND longitude = $2",
+            AsyncpgCampingSink._copy_value("latitude", row["latitude"]),
+            AsyncpgCampingSink._copy_value("longitude", row["longitude"]),
+        )
+        round_trips += 2
+        if existing:
+            await conn.execute(
+                f"UPDATE {TABLE} SET is_free = $2, source_url = $3, amenities = $4, "
+                f"last_scraped = now(), updated_at = now() WHERE id = $1",
+                existing["id"], row["is_free"], row["source_url"], json.dumps(row["amenities"]),
+            )
+        else:
+            await conn.execute(
+                f"INSERT INTO {TABLE} (name, country, latitude, longitude, is_free, amenities, natural_key) "
+                f"VALUES ($1, $2, $3, $4, $5, $6, $7)",
+                row["name"], row["country"],
+                AsyncpgCampingSink._copy_value("latitude", row["latitude"]),
+                AsyncpgCampingSink._copy_value("longitude", row["longitude"]),
+                row["is_free"], json.dumps(row["amenities"]), row["natural_key"],
+            )
+    elapsed = time.perf_counter() - start
+    return {"rows_per_sec": round(len(sites) / elapsed, 1), "round_trips": round_trips, "seconds": round(elapsed, 2)}
+
+
+async def run(dsn: str, count: int, batch_size: int, include_legacy: bool):
+    conn = await asyncpg.connect(dsn)
+    results = {"sites": count, "batch_size": batch_size}
+    try:
+        if include_legacy:
+            await reset(conn)
+            results["legacy_initial"] = await legacy_ingest(conn, make_sites(count))
+            results["legacy_refresh"] = await legacy_ingest(conn, make_sites(count))
+
+        await reset(conn)
+        ingestor = CampingSiteIngestor(AsyncpgCampingSink(conn, table=TABLE), batch_size=batch_size)
+        for label, sites in (
+            ("bulk_initial", make_sites(count)),
+            ("bulk_refresh_unchanged", make_sites(count)),
+            ("bulk_refresh_5pct_changed", make_sites(count, changed_every=20)),
+        ):
+            stats = await ingestor.ingest(sites, data_source="benchmark")
+            results[label] = stats.to_dict()
+    finally:
+        await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        await conn.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Campground bulk ingestion benchmark")
+    parser.add_argument("--dsn", default=os.getenv("TEST_DATABASE_URL", "postgresql://postgres@127.0.0.1:5432/postgres"))
+    parser.add_argument("--sites", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.dsn, args.sites, args.batch_size, not args.skip_legacy))
+    print(json.dumps(results, indent=2))
+
+    report_file = f"camping_ingest_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "results": results}, f, indent=2)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Content Matcher Benchmark
+=========================
+
+Builds synthetic transcripts (default 10k segments over 20 media files,
+Zipf-distributed vocabulary, 6-20 words per segment, a few speakers) and a
+script of soundbite quotes: most are transcript segments with ASR-style
+character noise, the rest are not in the footage at all. It then compares
+quote matching in ContentMatcher:
+
+  legacy  - the original exhaustive scan: pure-Python Levenshtein against
+            every segment (timed on a few quotes, it takes seconds each)
+  indexed - SegmentIndex q-gram candidates plus bounded edit distance, with
+            rapidfuzz when installed and the bit-parallel fallback
+
+Every indexed result is checked against the exhaustive scan, on the quotes
+that were timed on the full corpus and on all quotes against a smaller
+corpus.
+
+Usage:
+    python performance_benchmarks/content_matcher_benchmark.py --segments 10000
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+# Add backend to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.content_matching import content_matcher as module
+from app.services.content_matching import ContentMatcher, TranscribedMedia, TranscribedSegment
+
+SPEAKERS = [None, "Host", "Guide", "Ranger"]
+THRESHOLD = 0.85
+
+
+def make_vocabulary(rng: random.Random, size: int = 2000):
+    letters = "etaoinshrdlucmfwypvbgkjqxz"
+    words = set()
+    while len(words) < size:
+        length = rng.randint(2, 9)
+        words.add("".join(rng.choice(letters[:18] if i % 2 else letters) for i in range(length)))
+    words = sorted(words)
+    weights = [1 / (rank + 1) for rank in range(size)]
+    return words, weights
+
+
+def make_corpus(rng: random.Random, segments: int, files: int):
+    words, weights = make_vocabulary(rng)
+    media = []
+    per_file = segments // files
+    for f in range(files):
+        segs = []
+        t = 0.0
+        for _ in range(per_file):
+            text = " ".join(rng.choices(words, weights, k=rng.randint(6, 20)))
+            text = text.capitalize() + rng.choice([".", "?", "!", ","])
+            duration = len(text) / 15
+            segs.append(TranscribedSegment(text=text, start=round(t, 2), end=round(t + duration, 2),
+                                           speaker=rng.choice(SPEAKERS)))
+            t += duration
+        media.append(TranscribedMedia(file_id=f"media-{f}", filename=f"clip_{f}.mp4", segments=segs))
+    return media, words, weights
+
+
+def noisy(rng: random.Random, text: str, edits: int) -> str:
+    chars = list(text)
+    for _ in range(edits):
+        pos = rng.randrange(len(chars))
+        op = rng.choice("sid")
+        if op == "s":
+            chars[pos] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+        elif op == "i":
+            chars.insert(pos, rng.choice("abcdefghijklmnopqrstuvwxyz "))
+        elif len(chars) > 1:
+            del chars[pos]
+    return "".join(chars)
+
+
+def make_quotes(rng: random.Random, media, words, weights, count: int):
+    segments = [seg for m in media for seg in m.segments]
+    quotes = []
+    for _ in range(count):
+        if rng.random() < 0.7:
+            seg = rng.choice(segments)
+            edits = rng.randint(0, max(1, len(seg.text) // 12))
+            quotes.append((noisy(rng, seg.text, edits), seg.speaker if rng.random() < 0.5 else None))
+        else:
+            quotes.append((" ".join(rng.choices(words, weights, k=rng.randint(6, 20))), None))
+    return quotes
+
+
+def legacy_find_best_quote_match(matcher, quote, media_files, threshold=THRESHOLD, speaker=None):
+    """The exhaustive scan _find_best_quote_match used before the index"""
+    best, best_score = None, threshold
+    for media in media_files:
+        for seg in media.segments:
+            if speaker and seg.speaker and seg.speaker.lower() != speaker.lower():
+                continue
+            score = matcher._similarity(quote, seg.text)
+            if score >= best_score:
+                best, best_score = (media.file_id, seg.start, score), score
+    return best
+
+
+def as_tuple(result):
+    return (result.file_id, result.start_time, result.score) if result else None
+
+
+def time_indexed(matcher, media, quotes, use_rapidfuzz: bool):
+    module.RAPIDFUZZ_AVAILABLE = use_rapidfuzz and module._rf_process is not None
+    start = time.perf_counter()
+    index = module.SegmentIndex(media)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    per_quote, candidates, results = [], [], []
+    for quote, speaker in quotes:
+        start = time.perf_counter()
+        results.append(as_tuple(matcher._find_best_quote_match(quote, media, THRESHOLD, speaker, index=index)))
+        per_quote.append((time.perf_counter() - start) * 1000)
+        candidates.append(len(index.candidates(module._normalize(quote), THRESHOLD, speaker)))
+    return {
+        "engine": "rapidfuzz" if module.RAPIDFUZZ_AVAILABLE else "bit-parallel",
+        "index_build_ms": round(build_ms, 1),
+        "median_ms_per_quote": round(statistics.median(per_quote), 3),
+        "p95_ms_per_quote": round(sorted(per_quote)[int(0.95 * (len(per_quote) - 1))], 3),
+        "total_ms": round(sum(per_quote) + build_ms, 1),
+        "mean_candidates": round(statistics.mean(candidates), 1),
+        "matched": sum(r is not None for r in results),
+    }, results
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    matcher = ContentMatcher()
+    media, words, weights = make_corpus(rng, args.segments, args.files)
+    quotes = make_quotes(rng, media, words, weights, args.quotes)
+    rapidfuzz_installed = module._rf_process is not None
+    results = {"segments": args.segments, "quotes": args.quotes, "rapidfuzz_installed": rapidfuzz_installed}
+
+    indexed = {}
+    for use_rapidfuzz in ([True, False] if rapidfuzz_installed else [False]):
+        stats, found = time_indexed(matcher, media, quotes, use_rapidfuzz)
+        indexed[stats["engine"]] = (stats, found)
+        results[f"indexed_{stats['engine']}"] = stats
+    module.RAPIDFUZZ_AVAILABLE = rapidfuzz_installed
+
+    # Legacy exhaustive scan on the first few quotes of the full corpus
+    legacy_ms, identical = [], True
+    for i, (quote, speaker) in enumerate(quotes[:args.legacy_quotes]):
+        start = time.perf_counter()
+        expected = legacy_find_best_quote_match(matcher, quote, media, THRESHOLD, speaker)
+        legacy_ms.append((time.perf_counter() - start) * 1000)
+        identical &= all(found[i] == expected for _, found in indexed.values())
+    results["legacy"] = {
+        "quotes_timed": len(legacy_ms),
+        "median_ms_per_quote": round(statistics.median(legacy_ms), 1),
+        "projected_total_s": round(statistics.median(legacy_ms) * args.quotes / 1000, 1),
+    }
+    for engine, (stats, _) in indexed.items():
+        results[f"speedup_{engine}"] = round(statistics.median(legacy_ms) / stats["median_ms_per_quote"], 1)
+
+    # Every quote against a smaller corpus
+    small = [TranscribedMedia(file_id=m.file_id, segments=m.segments[:args.check_segments // args.files]) for m in media]
+    expected = [legacy_find_best_quote_match(matcher, quote, small, THRESHOLD, speaker) for quote, speaker in quotes]
+    mismatches = 0
+    for use_rapidfuzz in ([True, False] if rapidfuzz_installed else [False]):
+        module.RAPIDFUZZ_AVAILABLE = use_rapidfuzz
+        index = module.SegmentIndex(small)
+        for (quote, speaker), want in zip(quotes, expected):
+            mismatches += as_tuple(matcher._find_best_quote_match(quote, small, THRESHOLD, speaker, index=index)) != want
+    module.RAPIDFUZZ_AVAILABLE = rapidfuzz_installed
+    results["identical_to_legacy"] = identical and mismatches == 0
+    results["checked_quotes"] = {"full_corpus": len(legacy_ms), f"{args.check_segments}_segments": args.quotes}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Content matcher quote matching benchmark")
+    parser.add_argument("--segments", type=int, default=10_000)
+    parser.add_argument("--files", type=int, default=20)
+    parser.add_argument("--quotes", type=int, default=200)
+    parser.add_argument("--legacy-quotes", type=int, default=5, help="Quotes timed with the exhaustive scan")
+    parser.add_argument("--check-segments", type=int, default=1000, help="Corpus size for the full equality check")
+    parser.add_argument("--seed", type=int, default=33)
+    args = parser.parse_args()
+
+    results = run(args)
+    print(json.dumps(results, indent=2))
+
+    report_file = f"content_matcher_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "args": vars(args), "results": results}, f, indent=2)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
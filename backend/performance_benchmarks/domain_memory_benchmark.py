@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Domain Memory Benchmark
+=======================
+
+Loads synthetic domain memory tasks (each with a definition of ~20 work
+items, state, constraints, tests and a progress log) into a scratch schema
+of a local Postgres, applies the domain_memory_work_queue migration and
+measures, with concurrent workers and a simulated client/database round
+trip:
+
+  startup - the Worker Startup Protocol load of one task's artifacts:
+              serial  - the old six sequential select("*") reads
+              rpc     - one domain_memory_load_context call
+              cached  - the same call from a store that already holds the
+                        definition, constraints and tests (sent as versions)
+  queue   - concurrent workers draining pending tasks:
+              poll        - the old list_pending_tasks scan, then each
+                            task's step; overlapping workers run the same
+                            task more than once
+              skip_locked - domain_memory_claim_tasks leases, step, release
+  wake    - NOTIFY delivery latency from a task becoming pending to an idle
+            LISTENing worker, against the Celery beat poll interval
+
+Usage:
+    TEST_DATABASE_URL=postgresql://postgres@127.0.0.1:5432/postgres \\
+        python performance_benchmarks/domain_memory_benchmark.py --tasks 20000 --workers 1 4 16
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import asyncpg
+
+# Add backend to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.pam.domain_memory.storage.database_store import (
+    CLAIM_TASKS_RPC,
+    CONTEXT_PROGRESS_LIMIT,
+    LOAD_CONTEXT_RPC,
+    PENDING_TASK_COLUMNS,
+    RELEASE_TASK_RPC,
+    TASK_QUEUE_CHANNEL,
+)
+
+SCHEMA = "domain_memory_bench"
+ROOT = Path(__file__).resolve().parents[2]
+BASE_SCHEMA = ROOT / "docs" / "sql-fixes" / "domain_memory_schema.sql"
+MIGRATION = ROOT / "supabase" / "migrations" / "20260405000000_domain_memory_work_queue.sql"
+ARTIFACT_TABLES = ("domain_memory_definitions", "domain_memory_states",
+                   "domain_memory_constraints", "domain_memory_tests")
+# Celery beat schedule of domain_memory.process_pending_tasks
+BEAT_INTERVAL_SECONDS = 60.0
+
+
+def base_schema_sql() -> str:
+    """The domain memory tables without auth.users, RLS and grants"""
+    statements = []
+    for statement in BASE_SCHEMA.read_text().split(";"):
+        if any(word in statement for word in ("POLICY", "ROW LEVEL SECURITY", "GRANT")):
+            continue
+        statements.append(statement.replace(" REFERENCES auth.users(id) ON DELETE CASCADE", ""))
+    # The trigger function body contains semicolons; rejoin what was split
+    return ";".join(statements)
+
+
+def migration_sql() -> str:
+    return (MIGRATION.read_text()
+            .replace("public.", f"{SCHEMA}.")
+            .replace("search_path = public", f"search_path = {SCHEMA}"))
+
+
+def task_rows(count, queue_count, rng):
+    now = datetime.now(timezone.utc)
+    tasks, definitions, states, constraints, tests, progress = [], [], [], [], [], []
+    for i in range(count):
+        task_id = uuid.uuid4()
+        created = now - timedelta(minutes=rng.randrange(60 * 24 * 30))
+        status = "pending" if i < queue_count else rng.choice(["completed", "completed", "failed", "paused"])
+        tasks.append((task_id, uuid.uuid4(), "trip_planning", status, rng.randint(1, 10), "user",
+                      created, created))
+        items = [{"id": f"w{n}", "description": f"Step {n}: research campsites and fuel stops near stop {n}",
+                  "status": "pending", "action_type": "search", "parameters": {"radius_km": 50 + n},
+                  "depends_on": [f"w{n - 1}"] if n else []} for n in range(20)]
+        definitions.append((task_id, "Plan a three week loop with dog friendly camps",
+                            json.dumps({"goal": "trip", "sub_goals": ["route", "camps", "budget"]}),
+                            json.dumps(items),
+                            json.dumps([{"id": f"c{n}", "description": f"Criterion {n}"} for n in range(5)]),
+                            created, created))
+        done = rng.randrange(20)
+        states.append((task_id, [f"w{n}" for n in range(done)], [], [], json.dumps({}), done, created, created))
+        constraints.append((task_id, json.dumps({"max_total": 2500, "currency": "AUD"}), None, None,
+                            ["no_payments", "confirm_bookings"], created, created))
+        tests.append((task_id, json.dumps([{"id": f"t{n}", "description": f"Check {n}"} for n in range(8)]),
+                      [], created, created))
+        for n in range(rng.randrange(10, 90)):
+            progress.append((task_id, uuid.uuid4(), "action", f"w{n % 20}",
+                             f"Completed lookup {n} for the current work item", json.dumps({"n": n}),
+                             created + timedelta(seconds=n)))
+    return {
+        "domain_memory_tasks": (("id", "user_id", "task_type", "status", "priority", "scope",
+                                 "created_at", "updated_at"), tasks),
+        "domain_memory_definitions": (("task_id", "original_request", "parsed_intent", "work_items",
+                                       "success_criteria", "created_at", "updated_at"), definitions),
+        "domain_memory_states": (("task_id", "completed_items", "failed_items", "blocked_items",
+                                  "context_snapshot", "worker_run_count", "created_at", "updated_at"), states),
+        "domain_memory_constraints": (("task_id", "budget_constraints", "time_constraints",
+                                       "scope_constraints", "safety_rules", "created_at", "updated_at"),
+                                      constraints),
+        "domain_memory_tests": (("task_id", "test_cases", "validation_queries", "created_at", "updated_at"),
+                                tests),
+        "domain_memory_progress": (("task_id", "worker_run_id", "entry_type", "work_item_id", "content",
+                                    "metadata", "created_at"), progress),
+    }
+
+
+async def load(conn, args, rng):
+    start = time.perf_counter()
+    for table, (columns, rows) in task_rows(args.tasks, args.queue_tasks, rng).items():
+        await conn.copy_records_to_table(table, records=rows, columns=columns, schema_name=SCHEMA)
+    await conn.execute("ANALYZE")
+    return round(time.perf_counter() - start, 1)
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 2),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95) - 1] * 1000, 2),
+    }
+
+
+async def round_trip(conn, rtt, query, *params):
+    """One PostgREST-style call: network round trip plus the JSON it returns"""
+    await asyncio.sleep(rtt)
+    return await conn.fetchval(query, *params) or ""
+
+
+def one_row(table, key="task_id"):
+    return f"SELECT to_jsonb(t)::text FROM {table} t WHERE t.{key} = $1"
+
+
+async def startup_serial(conn, rtt, task_id, versions):
+    body = await round_trip(conn, rtt, one_row("domain_memory_tasks", "id"), task_id)
+    for table in ARTIFACT_TABLES:
+        body += await round_trip(conn, rtt, one_row(table), task_id)
+    body += await round_trip(
+        conn, rtt,
+        f"""SELECT COALESCE(json_agg(p)::text, '[]') FROM (
+              SELECT * FROM domain_memory_progress WHERE task_id = $1
+              ORDER BY created_at DESC LIMIT {CONTEXT_PROGRESS_LIMIT}) p""", task_id)
+    return len(body)
+
+
+async def startup_rpc(conn, rtt, task_id, versions):
+    body = await round_trip(
+        conn, rtt, f"SELECT {LOAD_CONTEXT_RPC}($1, $2, $3, $4, $5)::text",
+        task_id, CONTEXT_PROGRESS_LIMIT, *versions.get(task_id, (None, None, None)))
+    return len(body)
+
+
+async def measure_startups(dsn, args, loader, task_ids, versions, workers):
+    samples, sizes = [], []
+
+    async def worker(seed):
+        rng = random.Random(seed)
+        conn = await asyncpg.connect(dsn, server_settings={"search_path": SCHEMA})
+        try:
+            for _ in range(args.startups):
+                task_id = rng.choice(task_ids)
+                start = time.perf_counter()
+                sizes.append(await loader(conn, args.rtt_ms / 1000, task_id, versions))
+                samples.append(time.perf_counter() - start)
+        finally:
+            await conn.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(args.seed + n) for n in range(workers)))
+    elapsed = time.perf_counter() - start
+    return {**percentiles(samples), "startups_per_s": round(len(samples) / elapsed, 1),
+            "mean_bytes": int(statistics.mean(sizes))}
+
+
+async def reset_queue(conn, queue_ids):
+    await conn.execute(
+        "UPDATE domain_memory_tasks SET status = 'pending', claimed_by = NULL, claimed_until = NULL "
+        "WHERE id = ANY($1)", queue_ids)
+
+
+async def run_step(conn, rtt, work, task_id):
+    """The worker's step: some work, then the task's status write"""
+    await asyncio.sleep(work)
+    await asyncio.sleep(rtt)
+    await conn.execute("UPDATE domain_memory_tasks SET status = 'completed' WHERE id = $1", task_id)
+
+
+async def drain_poll(conn, args, name, processed):
+    rtt, work = args.rtt_ms / 1000, args.work_ms / 1000
+    while True:
+        await asyncio.sleep(rtt)
+        rows = await conn.fetch(
+            f"""SELECT {PENDING_TASK_COLUMNS} FROM domain_memory_tasks
+                WHERE status IN ('pending', 'in_progress')
+                ORDER BY priority DESC, created_at LIMIT $1""", args.batch)
+        if not rows:
+            return
+        for row in rows:
+            await run_step(conn, rtt, work, row["id"])
+            processed.append(row["id"])
+
+
+async def drain_skip_locked(conn, args, name, processed):
+    rtt, work = args.rtt_ms / 1000, args.work_ms / 1000
+    while True:
+        await asyncio.sleep(rtt)
+        rows = await conn.fetch(f"SELECT id FROM {CLAIM_TASKS_RPC}($1, $2, 300, NULL)", name, args.batch)
+        if not rows:
+            return
+        for row in rows:
+            try:
+                await run_step(conn, rtt, work, row["id"])
+                processed.append(row["id"])
+            finally:
+                await asyncio.sleep(rtt)
+                await conn.execute(f"SELECT {RELEASE_TASK_RPC}($1, $2)", row["id"], name)
+
+
+async def measure_queue(dsn, args, drain, queue_ids, workers):
+    conn = await asyncpg.connect(dsn, server_settings={"search_path": SCHEMA})
+    try:
+        await reset_queue(conn, queue_ids)
+    finally:
+        await conn.close()
+    processed = []
+
+    async def worker(n):
+        conn = await asyncpg.connect(dsn, server_settings={"search_path": SCHEMA})
+        try:
+            await drain(conn, args, f"bench-worker-{n}", processed)
+        finally:
+            await conn.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(workers)))
+    elapsed = time.perf_counter() - start
+    distinct = len(set(processed))
+    assert distinct == len(queue_ids), (distinct, len(queue_ids))
+    return {"seconds": round(elapsed, 2), "tasks_per_s": round(distinct / elapsed, 1),
+            "steps_run": len(processed), "duplicate_steps": len(processed) - distinct}
+
+
+async def measure_wake(dsn, samples):
+    listener = await asyncpg.connect(dsn, server_settings={"search_path": SCHEMA})
+    writer = await asyncpg.connect(dsn, server_settings={"search_path": SCHEMA})
+    arrivals = {}
+
+    def on_notify(connection, pid, channel, payload):
+        arrivals[payload] = time.perf_counter()
+
+    await listener.add_listener(TASK_QUEUE_CHANNEL, on_notify)
+    latencies = []
+    try:
+        for _ in range(samples):
+            task_id = str(uuid.uuid4())
+            sent = time.perf_counter()
+            await writer.execute(
+                "INSERT INTO domain_memory_tasks (id, user_id, task_type) VALUES ($1, $2, 'trip_planning')",
+                task_id, str(uuid.uuid4()))
+            while task_id not in arrivals:
+                await asyncio.sleep(0.0005)
+            latencies.append(arrivals[task_id] - sent)
+    finally:
+        await listener.remove_listener(TASK_QUEUE_CHANNEL, on_notify)
+        await listener.close()
+        await writer.close()
+    return {**percentiles(latencies), "poll_mean_wait_ms": BEAT_INTERVAL_SECONDS / 2 * 1000}
+
+
+async def run(dsn, args):
+    rng = random.Random(args.seed)
+    conn = await asyncpg.connect(dsn, server_settings={"search_path": SCHEMA})
+    results = {"tasks": args.tasks, "queue_tasks": args.queue_tasks, "rtt_ms": args.rtt_ms,
+               "work_ms": args.work_ms}
+    try:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA};")
+        await conn.execute(base_schema_sql())
+        await conn.execute(migration_sql())
+        results["load_seconds"] = await load(conn, args, rng)
+
+        task_ids = [r["id"] for r in await conn.fetch("SELECT id FROM domain_memory_tasks")]
+        queue_ids = [r["id"] for r in await conn.fetch(
+            "SELECT id FROM domain_memory_tasks WHERE status = 'pending'")]
+
+        # Both startup paths must hand the worker the same artifacts
+        sample = task_ids[0]
+        context = json.loads(await conn.fetchval(f"SELECT {LOAD_CONTEXT_RPC}($1)::text", sample))
+        for table, key in zip(ARTIFACT_TABLES, ("definition", "state", "constraints", "tests")):
+            assert json.loads(await conn.fetchval(one_row(table), sample)) == context[key], key
+        versions = {
+            r["task_id"]: (r["d"], r["c"], r["t"]) for r in await conn.fetch(
+                """SELECT d.task_id, d.updated_at AS d, c.updated_at AS c, x.updated_at AS t
+                   FROM domain_memory_definitions d
+                   JOIN domain_memory_constraints c USING (task_id)
+                   JOIN domain_memory_tests x USING (task_id)""")
+        }
+        cached = json.loads(await conn.fetchval(
+            f"SELECT {LOAD_CONTEXT_RPC}($1, $2, $3, $4, $5)::text", sample, CONTEXT_PROGRESS_LIMIT,
+            *versions[sample]))
+        assert cached["definition"] is None and cached["definition_updated_at"] is not None
+
+        results["startup"] = {}
+        for workers in args.workers:
+            entry = {
+                "serial": await measure_startups(dsn, args, startup_serial, task_ids, {}, workers),
+                "rpc": await measure_startups(dsn, args, startup_rpc, task_ids, {}, workers),
+                "cached": await measure_startups(dsn, args, startup_rpc, task_ids, versions, workers),
+            }
+            results["startup"][workers] = entry
+            print(f"startup x{workers}: " + ", ".join(
+                f"{name} p50 {m['p50_ms']} ms ({m['mean_bytes']} B)" for name, m in entry.items()))
+
+        results["queue"] = {}
+        for workers in args.workers:
+            entry = {
+                "poll": await measure_queue(dsn, args, drain_poll, queue_ids, workers),
+                "skip_locked": await measure_queue(dsn, args, drain_skip_locked, queue_ids, workers),
+            }
+            results["queue"][workers] = entry
+            print(f"queue x{workers}: " + ", ".join(
+                f"{name} {m['tasks_per_s']} tasks/s, {m['duplicate_steps']} duplicate steps"
+                for name, m in entry.items()))
+
+        results["wake"] = await measure_wake(dsn, args.wake_samples)
+        print(f"wake: NOTIFY p50 {results['wake']['p50_ms']} ms vs {BEAT_INTERVAL_SECONDS:.0f} s beat")
+        return results
+    finally:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Domain memory startup and work queue benchmark")
+    parser.add_argument("--dsn", default=os.getenv("TEST_DATABASE_URL", "postgresql://postgres@127.0.0.1:5432/postgres"))
+    parser.add_argument("--tasks", type=int, default=20_000)
+    parser.add_argument("--queue-tasks", type=int, default=1_000, help="Tasks left pending for the queue runs")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--startups", type=int, default=200, help="Context loads per worker")
+    parser.add_argument("--batch", type=int, default=10, help="Tasks claimed per poll (Celery limit)")
+    parser.add_argument("--rtt-ms", type=float, default=2.0, help="Simulated client to database round trip")
+    parser.add_argument("--work-ms", type=float, default=5.0, help="Simulated work per task step")
+    parser.add_argument("--wake-samples", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.dsn, args))
+    print(json.dumps(results, indent=2))
+
+    report_file = f"domain_memory_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "args": vars(args), "results": results}, f, indent=2)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
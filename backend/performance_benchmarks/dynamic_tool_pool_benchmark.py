@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Dynamic Tool Worker Pool Benchmark
+==================================
+
+Runs generated-tool code three ways and reports latency, throughput and how
+long the serving event loop was blocked (a 1 ms heartbeat task measures the
+worst gap between its ticks):
+
+  inprocess - SandboxedExecutor.execute_compiled_code in the serving process
+  cold      - ToolWorkerPool start (forkserver boot + forking the workers)
+              and the first call, which ships the code object
+  warm      - further calls on started workers (code already cached there)
+
+Two tools are used: "echo" returns its parameters, "cpu" spends --cpu-ms of
+pure-Python arithmetic before returning. Throughput is measured with
+--concurrency calls in flight (gathered), warm latency with sequential calls.
+
+Usage:
+    python performance_benchmarks/dynamic_tool_pool_benchmark.py --workers 2 --concurrency 100 --cpu-ms 20
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Add backend to Python path for imports
+sys.path.insert(0, BACKEND_DIR)
+
+from app.services.dynamic_tools.sandbox_executor import SandboxedExecutor
+from app.services.dynamic_tools.worker_pool import ToolWorkerPool
+
+TOOL_TEMPLATE = '''
+class BenchTool(BaseTool):
+    def __init__(self):
+        super().__init__("bench_tool")
+
+    async def execute(self, user_id, parameters=None):
+%s
+'''
+ECHO_BODY = "        return ToolResult(success=True, data=parameters)"
+CPU_BODY = """        total = 0
+        for i in range(parameters["iterations"]):
+            total += i * i % 7
+        return ToolResult(success=True, data=total)"""
+
+
+def compile_tool(body):
+    return compile(TOOL_TEMPLATE % body, "<dynamic_tool>", "exec")
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p99_ms": round(ordered[max(0, int(len(ordered) * 0.99) - 1)] * 1000, 3),
+    }
+
+
+class LoopLag:
+    """Worst delay of a 1 ms heartbeat while a block of work runs"""
+
+    async def __aenter__(self):
+        self.worst = 0.0
+        self._running = True
+        self._task = asyncio.create_task(self._beat())
+        return self
+
+    async def _beat(self):
+        while self._running:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            self.worst = max(self.worst, time.perf_counter() - start - 0.001)
+
+    async def __aexit__(self, *exc):
+        self._running = False
+        await self._task
+
+
+def iterations_for(cpu_ms):
+    """Loop count that takes about cpu_ms in this interpreter"""
+    start = time.perf_counter()
+    total = 0
+    for i in range(200_000):
+        total += i * i % 7
+    per_iteration = (time.perf_counter() - start) / 200_000
+    return max(1, int(cpu_ms / 1000 / per_iteration))
+
+
+async def sequential(executor, code, parameters, calls):
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        result = await executor.execute_compiled_code(code, "BenchTool", "bench", parameters)
+        assert result.success, result.error
+        timings.append(time.perf_counter() - start)
+    return percentiles(timings)
+
+
+async def concurrent(executor, code, parameters, concurrency):
+    async with LoopLag() as lag:
+        start = time.perf_counter()
+        results = await asyncio.gather(*(
+            executor.execute_compiled_code(code, "BenchTool", "bench", parameters)
+            for _ in range(concurrency)
+        ))
+        elapsed = time.perf_counter() - start
+    assert all(r.success for r in results), [r.error for r in results if not r.success][:1]
+    return {
+        "wall_s": round(elapsed, 3),
+        "calls_per_s": round(concurrency / elapsed, 1),
+        "max_loop_lag_ms": round(lag.worst * 1000, 2),
+    }
+
+
+async def run(args):
+    echo = compile_tool(ECHO_BODY)
+    cpu = compile_tool(CPU_BODY)
+    cpu_params = {"iterations": iterations_for(args.cpu_ms)}
+    results = {"cpu_iterations": cpu_params["iterations"]}
+
+    executor = SandboxedExecutor()
+    results["inprocess"] = {
+        "echo_sequential": await sequential(executor, echo, {"n": 1}, args.calls),
+        "echo_concurrent": await concurrent(executor, echo, {"n": 1}, args.concurrency),
+        "cpu_concurrent": await concurrent(executor, cpu, cpu_params, args.concurrency),
+    }
+
+    pool = ToolWorkerPool(size=args.workers)
+    start = time.perf_counter()
+    await pool.start()
+    started = time.perf_counter() - start
+    start = time.perf_counter()
+    first = await pool.execute_compiled_code(echo, "BenchTool", "bench", {"n": 1})
+    assert first.success, first.error
+    results["cold"] = {
+        "pool_start_s": round(started, 3),
+        "first_call_ms": round((time.perf_counter() - start) * 1000, 3),
+    }
+
+    # A replacement worker: fork from the warm forkserver, then a cold code cache
+    start = time.perf_counter()
+    replacement = await asyncio.to_thread(pool._spawn)
+    results["cold"]["worker_fork_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    await asyncio.to_thread(pool._retire, replacement)
+
+    try:
+        results["warm"] = {
+            "echo_sequential": await sequential(pool, echo, {"n": 1}, args.calls),
+            "echo_concurrent": await concurrent(pool, echo, {"n": 1}, args.concurrency),
+            "cpu_concurrent": await concurrent(pool, cpu, cpu_params, args.concurrency),
+        }
+        results["pool_stats"] = pool.get_stats()
+    finally:
+        await pool.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dynamic tool worker pool benchmark")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--calls", type=int, default=300, help="Sequential calls for latency percentiles")
+    parser.add_argument("--cpu-ms", type=float, default=20.0, help="Work done by the cpu tool per call")
+    args = parser.parse_args()
+    logging.getLogger("app").setLevel(logging.WARNING)
+
+    # The forkserver resolves its preloads against the working directory
+    report_dir = os.getcwd()
+    os.chdir(BACKEND_DIR)
+    results = asyncio.run(run(args))
+    os.chdir(report_dir)
+    print(json.dumps(results, indent=2))
+
+    report_file = f"dynamic_tool_pool_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "args": vars(args), "results": results}, f, indent=2)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
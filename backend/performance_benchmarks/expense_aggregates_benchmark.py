@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Expense Aggregates Benchmark
+============================
+
+Builds a synthetic expenses history in a scratch schema of a local Postgres
+(one heavy user with 50k expenses over ~5 years plus background users, and
+savings events), applies the budget daily aggregates migration to it (the
+backfill runs over the loaded rows), and compares for the heavy user:
+
+  legacy     - the old tool queries: every expense row for the user
+               (predict_end_of_month), the last 90 days of rows for one
+               category (calculate_baseline_spending) and every savings
+               event in a year (get_savings_by_category), returned as JSON
+               the way PostgREST does and aggregated in Python
+  aggregates - the month's expense_daily_totals rows folded with
+               summarize_daily_rows, and the grouped expense/savings
+               category totals RPCs
+
+Both paths must produce the same numbers. Also measures the per-row cost the
+triggers add to single-row INSERTs, and checks the aggregates still match the
+raw tables after a burst of inserts, updates and deletes.
+
+Usage:
+    TEST_DATABASE_URL=postgresql://postgres@127.0.0.1:5432/postgres \\
+        python performance_benchmarks/expense_aggregates_benchmark.py --expenses 50000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+import asyncpg
+
+# Add backend to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.budget_analytics import month_window, summarize_daily_rows
+
+SCHEMA = "budget_bench"
+MIGRATION = Path(__file__).resolve().parents[2] / "supabase" / "migrations" / "20260325000000_budget_daily_aggregates.sql"
+CATEGORIES = ["fuel", "food", "camping", "maintenance", "shopping", "entertainment", "utilities", "other"]
+
+TABLE_DDL = f"""
+CREATE TABLE {SCHEMA}.users (id UUID PRIMARY KEY);
+CREATE FUNCTION {SCHEMA}.uid() RETURNS UUID LANGUAGE sql STABLE AS 'SELECT NULL::UUID';
+CREATE TABLE {SCHEMA}.expenses (
+  id BIGSERIAL PRIMARY KEY,
+  user_id UUID NOT NULL REFERENCES {SCHEMA}.users(id) ON DELETE CASCADE,
+  amount DECIMAL(10,2) NOT NULL CHECK (amount >= 0),
+  category TEXT NOT NULL,
+  date DATE NOT NULL DEFAULT CURRENT_DATE,
+  description TEXT,
+  receipt_url TEXT,
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+CREATE INDEX ON {SCHEMA}.expenses (user_id);
+CREATE INDEX ON {SCHEMA}.expenses (user_id, date);
+CREATE TABLE {SCHEMA}.pam_savings_events (
+  id BIGSERIAL PRIMARY KEY,
+  user_id UUID NOT NULL REFERENCES {SCHEMA}.users(id) ON DELETE CASCADE,
+  actual_savings DECIMAL(10,2) NOT NULL DEFAULT 0,
+  savings_description TEXT NOT NULL,
+  category TEXT NOT NULL,
+  saved_date DATE NOT NULL DEFAULT CURRENT_DATE,
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+CREATE INDEX ON {SCHEMA}.pam_savings_events (user_id, saved_date);
+"""
+
+
+def migration_sql() -> str:
+    return (MIGRATION.read_text()
+            .replace("public.", f"{SCHEMA}.")
+            .replace("auth.users", f"{SCHEMA}.users")
+            .replace("auth.uid()", f"{SCHEMA}.uid()"))
+
+
+def expense_rows(user_id, count, days, today, rng):
+    rows = []
+    for _ in range(count):
+        day = today - timedelta(days=rng.randrange(days))
+        created = datetime.combine(day, datetime.min.time()) + timedelta(seconds=rng.randrange(86400))
+        rows.append((user_id, Decimal(f"{rng.lognormvariate(3.3, 0.9):.2f}"), rng.choice(CATEGORIES), day,
+                     f"Expense at {rng.randrange(10_000)}", created))
+    return rows
+
+
+async def load(conn, args, heavy_user, today, rng):
+    users = [heavy_user] + [uuid.uuid4() for _ in range(args.background_users)]
+    await conn.copy_records_to_table("users", schema_name=SCHEMA, records=[(u,) for u in users])
+    columns = ["user_id", "amount", "category", "date", "description", "created_at"]
+    await conn.copy_records_to_table("expenses", schema_name=SCHEMA, columns=columns,
+                                     records=expense_rows(heavy_user, args.expenses, args.days, today, rng))
+    for user in users[1:]:
+        await conn.copy_records_to_table("expenses", schema_name=SCHEMA, columns=columns,
+                                         records=expense_rows(user, args.background_expenses, args.days, today, rng))
+    savings = [(u, Decimal(f"{rng.uniform(1, 80):.2f}"), "Cheaper fuel", rng.choice(CATEGORIES),
+                today - timedelta(days=rng.randrange(args.days)))
+               for u in users for _ in range(args.savings_events if u == heavy_user else 50)]
+    await conn.copy_records_to_table("pam_savings_events", schema_name=SCHEMA, records=savings,
+                                     columns=["user_id", "actual_savings", "savings_description", "category", "saved_date"])
+    return users
+
+
+async def timed(fn, repeats):
+    times, result = [], None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = await fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return result, round(statistics.median(times), 2)
+
+
+async def fetch_json(conn, query, *params):
+    """Rows serialised to JSON server-side and parsed client-side, as through PostgREST"""
+    payload = await conn.fetchval(f"SELECT COALESCE(json_agg(q), '[]') FROM ({query}) q", *params)
+    return json.loads(payload), len(payload)
+
+
+def forecast(spending, days_elapsed, days_in_month):
+    return {cat: round(float(total) / days_elapsed * days_in_month, 2) for cat, total in spending.items()}
+
+
+async def run(dsn, args):
+    rng = random.Random(39)
+    today = date.today()
+    window = month_window(today)
+    heavy_user = uuid.uuid4()
+    results = {"expenses": args.expenses, "history_days": args.days,
+               "background_users": args.background_users, "repeats": args.repeats}
+    conn = await asyncpg.connect(dsn, server_settings={"search_path": SCHEMA})
+    try:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA};")
+        await conn.execute(TABLE_DDL)
+        users = await load(conn, args, heavy_user, today, rng)
+
+        # Single-row insert cost before the triggers exist
+        async def insert_batch():
+            for row in expense_rows(users[1], args.insert_samples, 30, today, rng):
+                await conn.execute(f"INSERT INTO {SCHEMA}.expenses (user_id, amount, category, date, description,"
+                                   f" created_at) VALUES ($1, $2, $3, $4, $5, $6)", *row)
+        start = time.perf_counter()
+        await insert_batch()
+        insert_before = (time.perf_counter() - start) * 1000 / args.insert_samples
+
+        start = time.perf_counter()
+        async with conn.transaction():
+            await conn.execute(migration_sql())
+        results["migration_backfill_seconds"] = round(time.perf_counter() - start, 2)
+        for table in ("expenses", "expense_daily_totals", "pam_savings_events", "savings_daily_totals"):
+            await conn.execute(f"VACUUM ANALYZE {SCHEMA}.{table}")
+        results["aggregate_rows_total"] = await conn.fetchval(f"SELECT COUNT(*) FROM {SCHEMA}.expense_daily_totals")
+
+        start = time.perf_counter()
+        await insert_batch()
+        insert_after = (time.perf_counter() - start) * 1000 / args.insert_samples
+        results["single_row_insert_ms"] = {"without_trigger": round(insert_before, 3),
+                                           "with_trigger": round(insert_after, 3)}
+
+        # predict_end_of_month
+        async def legacy_predict():
+            rows, size = await fetch_json(conn, f"SELECT * FROM {SCHEMA}.expenses WHERE user_id = $1", heavy_user)
+            month_start = datetime.combine(window.start, datetime.min.time())
+            spending = {}
+            for e in rows:
+                if datetime.fromisoformat(e["date"]) >= month_start:
+                    spending[e["category"]] = spending.get(e["category"], 0) + float(e["amount"])
+            return forecast(spending, window.days_elapsed, window.days_in_month), len(rows), size
+
+        async def aggregate_predict():
+            rows, size = await fetch_json(
+                conn, f"SELECT category, day, total, expense_count FROM {SCHEMA}.expense_daily_totals"
+                      f" WHERE user_id = $1 AND day >= $2 AND day <= $3", heavy_user, window.start, window.end)
+            spending = {cat: entry.total for cat, entry in summarize_daily_rows(rows).items()}
+            return forecast(spending, window.days_elapsed, window.days_in_month), len(rows), size
+
+        (legacy, legacy_rows, legacy_bytes), legacy_ms = await timed(legacy_predict, args.repeats)
+        (fresh, fresh_rows, fresh_bytes), fresh_ms = await timed(aggregate_predict, args.repeats)
+        assert legacy == fresh, (legacy, fresh)
+        results["predict_end_of_month"] = {
+            "legacy": {"median_ms": legacy_ms, "rows": legacy_rows, "response_bytes": legacy_bytes},
+            "aggregates": {"median_ms": fresh_ms, "rows": fresh_rows, "response_bytes": fresh_bytes},
+            "speedup": round(legacy_ms / fresh_ms, 1),
+        }
+
+        # calculate_baseline_spending (fuel, 90 days; legacy filtered by created_at, aggregates by expense date)
+        cutoff = today - timedelta(days=90)
+
+        async def legacy_baseline():
+            rows, size = await fetch_json(
+                conn, f"SELECT amount FROM {SCHEMA}.expenses WHERE user_id = $1 AND category = 'fuel'"
+                      f" AND date >= $2", heavy_user, cutoff)
+            amounts = [Decimal(str(r["amount"])) for r in rows]
+            return round(sum(amounts) / len(amounts), 6), len(rows)
+
+        async def aggregate_baseline():
+            rows, _ = await fetch_json(
+                conn, f"SELECT * FROM {SCHEMA}.expense_category_totals($1, $2, $3, 'fuel')", heavy_user, cutoff, today)
+            return round(Decimal(str(rows[0]["total"])) / rows[0]["expense_count"], 6), len(rows)
+
+        (legacy, legacy_rows), legacy_ms = await timed(legacy_baseline, args.repeats)
+        (fresh, fresh_rows), fresh_ms = await timed(aggregate_baseline, args.repeats)
+        assert legacy == fresh, (legacy, fresh)
+        results["calculate_baseline_spending"] = {
+            "legacy": {"median_ms": legacy_ms, "rows": legacy_rows},
+            "aggregates": {"median_ms": fresh_ms, "rows": fresh_rows},
+            "speedup": round(legacy_ms / fresh_ms, 1),
+        }
+
+        # get_savings_by_category over the last year
+        year_start = today - timedelta(days=365)
+
+        async def legacy_savings():
+            rows, _ = await fetch_json(
+                conn, f"SELECT category, actual_savings FROM {SCHEMA}.pam_savings_events WHERE user_id = $1"
+                      f" AND saved_date >= $2 AND saved_date <= $3", heavy_user, year_start, today)
+            totals = {}
+            for r in rows:
+                totals[r["category"]] = totals.get(r["category"], Decimal("0")) + Decimal(str(r["actual_savings"]))
+            return totals, len(rows)
+
+        async def aggregate_savings():
+            rows, _ = await fetch_json(
+                conn, f"SELECT * FROM {SCHEMA}.savings_category_totals($1, $2, $3)", heavy_user, year_start, today)
+            return {r["category"]: Decimal(str(r["total_savings"])) for r in rows}, len(rows)
+
+        (legacy, legacy_rows), legacy_ms = await timed(legacy_savings, args.repeats)
+        (fresh, fresh_rows), fresh_ms = await timed(aggregate_savings, args.repeats)
+        assert legacy == fresh, (legacy, fresh)
+        results["get_savings_by_category"] = {
+            "legacy": {"median_ms": legacy_ms, "rows": legacy_rows},
+            "aggregates": {"median_ms": fresh_ms, "rows": fresh_rows},
+            "speedup": round(legacy_ms / fresh_ms, 1),
+        }
+
+        # Churn: moved amounts, categories and dates, deletes; buckets must still match the raw table
+        await conn.execute(f"""
+            UPDATE {SCHEMA}.expenses SET amount = amount + 1.25 WHERE id % 97 = 0;
+            UPDATE {SCHEMA}.expenses SET category = 'food', date = date - 3 WHERE id % 89 = 0;
+            DELETE FROM {SCHEMA}.expenses WHERE id % 83 = 0;
+            UPDATE {SCHEMA}.expenses SET description = 'edited' WHERE id % 79 = 0;
+        """)
+        mismatches = await conn.fetchval(f"""
+            SELECT COUNT(*) FROM (
+              SELECT user_id, category, date AS day, SUM(amount) AS total, COUNT(*)::INT AS expense_count
+              FROM {SCHEMA}.expenses GROUP BY 1, 2, 3
+            ) raw FULL JOIN {SCHEMA}.expense_daily_totals t USING (user_id, category, day)
+            WHERE raw.total IS DISTINCT FROM t.total OR raw.expense_count IS DISTINCT FROM t.expense_count
+        """)
+        assert mismatches == 0, mismatches
+        results["aggregates_consistent_after_churn"] = True
+        return results
+    finally:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Budget daily aggregates benchmark")
+    parser.add_argument("--dsn", default=os.getenv("TEST_DATABASE_URL", "postgresql://postgres@127.0.0.1:5432/postgres"))
+    parser.add_argument("--expenses", type=int, default=50_000, help="Expenses for the measured user")
+    parser.add_argument("--days", type=int, default=1_825, help="Days of history")
+    parser.add_argument("--background-users", type=int, default=200)
+    parser.add_argument("--background-expenses", type=int, default=500, help="Expenses per background user")
+    parser.add_argument("--savings-events", type=int, default=5_000, help="Savings events for the measured user")
+    parser.add_argument("--insert-samples", type=int, default=500)
+    parser.add_argument("--repeats", type=int, default=15)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.dsn, args))
+    print(json.dumps(results, indent=2))
+
+    report_file = f"expense_aggregates_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "args": vars(args), "results": results}, f, indent=2)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
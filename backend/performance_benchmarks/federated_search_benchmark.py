@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Federated Search Benchmark
+==========================
+
+Runs WebSearchService.search over simulated engines with different latency
+distributions and reports latency percentiles and result quality:
+
+  google     - lognormal, median 250 ms
+  bing       - lognormal, median 400 ms, 5% slow tail around 3 s
+  duckduckgo - lognormal, median 900 ms, 3% hangs (never answers)
+
+Each engine returns 10 results drawn from a shared pool per query, so the
+engines overlap the way real ones do. Strategies:
+
+  wait_all  - every engine concurrently, wait for all of them (hangs are cut
+              at the engine deadline), then aggregate: the previous design
+              minus its sequential awaits
+  federated - FederatedSearch: per-engine deadlines, stop once a quorum has
+              answered and the soft deadline has passed, RRF merge
+  cached    - federated with the normalized-query cache over a Zipf query
+              stream written with varying case, spacing and punctuation
+
+overlap@N is the share of the wait_all top N also in the strategy's top N.
+
+Usage:
+    python performance_benchmarks/federated_search_benchmark.py --queries 300 --distinct 60
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+import zlib
+from datetime import datetime
+from unittest.mock import AsyncMock
+
+# Add backend to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.search.federated import FederatedSearch
+from app.services.search.web_search import WebSearchService
+
+ENGINES = {
+    # name: (median seconds, sigma, tail probability, tail seconds or None for a hang)
+    "google": (0.25, 0.35, 0.0, None),
+    "bing": (0.40, 0.40, 0.05, 3.0),
+    "duckduckgo": (0.90, 0.50, 0.03, None),
+}
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p95_ms": round(ordered[max(0, int(len(ordered) * 0.95) - 1)] * 1000, 3),
+        "p99_ms": round(ordered[max(0, int(len(ordered) * 0.99) - 1)] * 1000, 3),
+    }
+
+
+class SimulatedEngine:
+    def __init__(self, name, median, sigma, tail_p, tail_s, seed):
+        self.name = name
+        self.median = median
+        self.sigma = sigma
+        self.tail_p = tail_p
+        self.tail_s = tail_s
+        self.rng = random.Random(seed)
+        self.deadline_s = 4.0
+        self.calls = 0
+
+    async def search(self, query, num_results):
+        self.calls += 1
+        if self.rng.random() < self.tail_p:
+            await asyncio.sleep(self.tail_s if self.tail_s else 3600)
+        else:
+            await asyncio.sleep(self.median * self.rng.lognormvariate(0, self.sigma))
+        # Each engine ranks a shuffled slice of the query's shared page pool
+        pool = [f"https://site{(zlib.crc32(query.casefold().encode()) + i) % 997}.example/page" for i in range(25)]
+        ranked = random.Random(f"{self.name}:{query.casefold()}").sample(pool[:18], 10)
+        return [{"title": url, "url": url, "source": self.name} for url in ranked[:num_results]]
+
+
+def make_service(seed):
+    service = WebSearchService()
+    service.search_engines = {
+        name: SimulatedEngine(name, *params, seed=seed + i) for i, (name, params) in enumerate(ENGINES.items())
+    }
+    service.available_engines = list(ENGINES)
+    service.cache = AsyncMock()
+    service.cache.get.return_value = None
+    return service
+
+
+async def wait_all(service, query, num_results):
+    federated = FederatedSearch(
+        {name: engine.search(query, num_results) for name, engine in service.search_engines.items()},
+        num_results=num_results,
+        deadlines={name: engine.deadline_s for name, engine in service.search_engines.items()},
+        soft_deadline_s=float("inf"),
+    )
+    await federated.run()
+    return [entry["url"] for entry in federated.fusion.top(num_results)]
+
+
+def variant(query, rng):
+    """The same query as a user might type it"""
+    forms = [query, query.upper(), query.title(), f"  {query}  ", query.replace(" ", "  "), f"{query}?"]
+    return rng.choice(forms)
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    distinct = [f"campgrounds near town {i}" for i in range(args.distinct)]
+    results = {"queries": args.queries, "distinct": args.distinct}
+
+    baseline_service = make_service(args.seed)
+    federated_service = make_service(args.seed)
+    timings = {"wait_all": [], "federated": []}
+    overlaps = []
+    stop_reasons = {}
+    for i in range(args.queries):
+        query = f"{distinct[i % args.distinct]} #{i}"  # never repeats: no caching here
+
+        start = time.perf_counter()
+        reference = await wait_all(baseline_service, query, args.num_results)
+        timings["wait_all"].append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        response = await federated_service.search(query, args.num_results, use_cache=False)
+        timings["federated"].append(time.perf_counter() - start)
+        stop_reasons[response["stop_reason"]] = stop_reasons.get(response["stop_reason"], 0) + 1
+        got = {entry["url"] for entry in response["results"]}
+        overlaps.append(len(got & set(reference)) / max(1, len(reference)))
+
+    results["wait_all"] = percentiles(timings["wait_all"])
+    results["federated"] = {
+        **percentiles(timings["federated"]),
+        f"overlap@{args.num_results}": round(statistics.mean(overlaps), 3),
+        "stop_reasons": stop_reasons,
+    }
+
+    # Zipf-distributed repeats, typed differently each time
+    cached_service = make_service(args.seed)
+    weights = [1 / (rank + 1) for rank in range(args.distinct)]
+    cached_timings = []
+    for _ in range(args.queries):
+        query = variant(rng.choices(distinct, weights)[0], rng)
+        start = time.perf_counter()
+        await cached_service.search(query, args.num_results, ttl=300)
+        cached_timings.append(time.perf_counter() - start)
+    misses = cached_service.search_engines["google"].calls
+    results["cached"] = {**percentiles(cached_timings), "hit_rate": round(1 - misses / args.queries, 3)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Federated web search benchmark with simulated engines")
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--distinct", type=int, default=60, help="Distinct queries in the cached stream")
+    parser.add_argument("--num-results", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    logging.getLogger("app").setLevel(logging.ERROR)
+    logging.getLogger("app.services.search").setLevel(logging.ERROR)
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+
+    report_file = f"federated_search_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "args": vars(args), "results": results}, f, indent=2)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
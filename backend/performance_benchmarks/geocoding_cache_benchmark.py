@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Geocoding Cache Benchmark
+=========================
+
+Replays a synthetic on-the-road workload through GeocodingService with an
+offline fake geocoder (fixed simulated upstream latency):
+
+  - forward lookups of towns drawn from a Zipf distribution, typed with
+    varying case, punctuation and state spelling ("Dubbo, NSW" /
+    "dubbo new south wales"); a share of queries match nothing
+  - reverse lookups along GPS tracks, each fix jittered by a few metres
+
+and compares it with the uncached path (every lookup hits the upstream).
+A second service instance with an empty LRU then replays the workload
+against the same Redis, as another worker process would.
+
+Uses a scratch key prefix in Redis and deletes it afterwards.
+
+Usage:
+    python performance_benchmarks/geocoding_cache_benchmark.py --lookups 20000 --redis-url redis://localhost:6379
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+import redis.asyncio as redis
+
+# Add backend to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.services.geocoding.geocoding_service as geocoding
+from app.services.geocoding.geocoding_service import GeocodingCache, GeocodingService, normalize_query
+
+STATES = [("NSW", "New South Wales"), ("VIC", "Victoria"), ("QLD", "Queensland"), ("SA", "South Australia"),
+          ("WA", "Western Australia"), ("TAS", "Tasmania"), ("NT", "Northern Territory")]
+
+
+class FakeGeocoder:
+    def __init__(self, places, latency: float):
+        self.places = places
+        self.latency = latency
+        self.calls = 0
+
+    async def forward(self, query, **options):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        center = self.places.get(normalize_query(query))
+        return {"type": "FeatureCollection", "features": [{"center": list(center)}] if center else []}
+
+    async def reverse(self, latitude, longitude, **options):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return {"type": "FeatureCollection", "features": [{"center": [longitude, latitude]}]}
+
+
+class RedisJSONCache:
+    """CacheService-compatible get/set on a scratch connection"""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def get(self, key):
+        value = await self.client.get(key)
+        return json.loads(value) if value is not None else None
+
+    async def set(self, key, value, ttl=None):
+        await self.client.setex(key, ttl, json.dumps(value))
+
+
+def build_workload(args, rng):
+    towns = []
+    places = {}
+    for i in range(args.towns):
+        abbr, full = rng.choice(STATES)
+        name = f"Town{i}"
+        towns.append((name, abbr, full))
+        places[normalize_query(f"{name} {abbr}")] = (rng.uniform(115, 153), rng.uniform(-43, -12))
+
+    weights = [1 / (rank + 1) ** args.zipf for rank in range(len(towns))]
+    tracks = [(rng.uniform(-38, -20), rng.uniform(130, 152)) for _ in range(args.tracks)]
+    lookups = []
+    for _ in range(args.lookups):
+        if rng.random() < args.reverse_share:
+            # A vehicle parked or crawling: fixes within ~10 m of the track point
+            lat, lon = rng.choice(tracks)
+            lookups.append(("reverse", lat + rng.gauss(0, 0.00005), lon + rng.gauss(0, 0.00005)))
+        elif rng.random() < args.miss_share:
+            lookups.append(("forward", f"Nowhere {rng.randrange(args.towns // 4)}"))
+        else:
+            name, abbr, full = rng.choices(towns, weights)[0]
+            variant = rng.choice([f"{name}, {abbr}", f"{name.lower()} {full}", f"{name.upper()} {abbr.lower()}",
+                                  f" {name}  {abbr}. "])
+            lookups.append(("forward", variant))
+    return places, lookups
+
+
+async def replay(service, lookups):
+    latencies = []
+    for lookup in lookups:
+        start = time.perf_counter()
+        if lookup[0] == "forward":
+            await service.forward(lookup[1], limit=1, country="AU")
+        else:
+            await service.reverse(lookup[1], lookup[2])
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return {
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "p50_ms": round(latencies[len(latencies) // 2], 3),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 3),
+    }
+
+
+async def run(args):
+    rng = random.Random(37)
+    places, lookups = build_workload(args, rng)
+    client = redis.from_url(args.redis_url, decode_responses=True)
+    geocoding.KEY_PREFIX = "geobench"
+    results = {"lookups": len(lookups), "towns": args.towns, "upstream_latency_ms": args.latency_ms}
+    try:
+        uncached_calls = len(lookups)
+        results["uncached"] = {"upstream_calls": uncached_calls,
+                               "mean_ms": args.latency_ms}
+
+        geocoder = FakeGeocoder(places, args.latency_ms / 1000)
+        service = GeocodingService(geocoder, GeocodingCache(RedisJSONCache(client), lru_size=args.lru_size),
+                                   reverse_precision=args.precision)
+        timings = await replay(service, lookups)
+        results["cached"] = {"upstream_calls": geocoder.calls, **timings, **service.get_stats()}
+
+        # Another worker: empty LRU, warm Redis
+        geocoder = FakeGeocoder(places, args.latency_ms / 1000)
+        service = GeocodingService(geocoder, GeocodingCache(RedisJSONCache(client), lru_size=args.lru_size),
+                                   reverse_precision=args.precision)
+        timings = await replay(service, lookups)
+        results["second_worker"] = {"upstream_calls": geocoder.calls, **timings, **service.get_stats()}
+
+        results["summary"] = {
+            "hit_rate": results["cached"]["hit_rate"],
+            "upstream_call_reduction": results["cached"]["upstream_call_reduction"],
+            "upstream_calls_saved_factor": round(uncached_calls / max(results["cached"]["upstream_calls"], 1), 1),
+            "second_worker_upstream_calls": results["second_worker"]["upstream_calls"],
+        }
+        return results
+    finally:
+        async for key in client.scan_iter("geobench:*", count=1000):
+            await client.unlink(key)
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Geocoding cache benchmark")
+    parser.add_argument("--redis-url", default=os.getenv("REDIS_URL", "redis://localhost:6379"))
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--towns", type=int, default=2_000)
+    parser.add_argument("--tracks", type=int, default=500, help="Distinct GPS track points for reverse lookups")
+    parser.add_argument("--zipf", type=float, default=1.0)
+    parser.add_argument("--reverse-share", type=float, default=0.3)
+    parser.add_argument("--miss-share", type=float, default=0.05, help="Share of forward queries with no result")
+    parser.add_argument("--precision", type=int, default=7, help="Geohash precision for reverse keys")
+    parser.add_argument("--lru-size", type=int, default=10_000)
+    parser.add_argument("--latency-ms", type=float, default=2.0, help="Simulated upstream latency")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+
+    report_file = f"geocoding_cache_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "args": vars(args), "results": results}, f, indent=2)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Outbound HTTP Client Pool Benchmark
+===================================
+
+Starts a local HTTPS mock upstream (uvicorn in a subprocess, self-signed
+certificate, a fixed simulated upstream latency and a ~1 KB JSON body) and
+drives it open-loop at a fixed request rate (default 500 rps) with:
+
+  per_request - a new httpx.AsyncClient per call, as the integrations did
+                before (TCP + TLS handshake and SSL context on every request)
+  pooled      - the shared UpstreamClient from app.core.http_clients
+
+Reports latency percentiles, achieved throughput, new connections (TLS
+handshakes) per request and client/server CPU per request. The mock server
+only speaks HTTP/1.1, so the pooled run measures keep-alive reuse; HTTP/2
+multiplexing against real upstreams needs the optional h2 package.
+
+Client, server and load generator share the host's CPUs; on small machines
+lower --rps until the per_request run is no longer saturated.
+
+Usage:
+    python performance_benchmarks/http_client_pool_benchmark.py --rps 500 --seconds 10
+"""
+
+import argparse
+import asyncio
+import datetime as dt
+import json
+import logging
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+from datetime import datetime
+
+import httpx
+import psutil
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+# Add backend to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.http_clients import UpstreamClient, UpstreamConfig
+
+SERVER_APP = textwrap.dedent("""
+    import asyncio, json, sys
+    LATENCY = float(sys.argv[1]) / 1000
+    BODY = json.dumps({"features": [{"id": i, "place_name": "Dubbo NSW 2830, Australia",
+                                     "center": [148.6, -32.2]} for i in range(12)]}).encode()
+
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        await asyncio.sleep(LATENCY)
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": BODY})
+
+    if __name__ == "__main__":
+        import uvicorn
+        uvicorn.run(app, host="127.0.0.1", port=int(sys.argv[2]), ssl_keyfile=sys.argv[3],
+                    ssl_certfile=sys.argv[4], log_level="warning", access_log=False)
+""")
+
+
+def write_certificate(directory: str):
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    now = dt.datetime.now(dt.timezone.utc)
+    cert = (
+        x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - dt.timedelta(days=1)).not_valid_after(now + dt.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName("localhost")]), critical=False)
+        .add_extension(x509.BasicConstraints(ca=True, path_length=None), critical=True)
+        .sign(key, hashes.SHA256())
+    )
+    key_path, cert_path = os.path.join(directory, "key.pem"), os.path.join(directory, "cert.pem")
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+    return key_path, cert_path
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_server(port: int, timeout: float = 15.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("mock upstream did not start")
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies, self.errors, self.connections, self.versions = [], 0, 0, set()
+
+    async def trace(self, event_name, info):
+        if event_name == "connection.connect_tcp.complete":
+            self.connections += 1
+
+
+async def per_request_call(url: str, recorder: Recorder):
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        return await client.get(url, extensions={"trace": recorder.trace})
+
+
+async def drive(call, rps: int, seconds: float, recorder: Recorder, server: psutil.Process):
+    async def one():
+        start = time.perf_counter()
+        try:
+            response = await call()
+            response.raise_for_status()
+            recorder.versions.add(response.http_version)
+            recorder.latencies.append((time.perf_counter() - start) * 1000)
+        except Exception:
+            recorder.errors += 1
+
+    total = int(rps * seconds)
+    server_cpu, client_cpu = sum(server.cpu_times()[:2]), time.process_time()
+    start = time.perf_counter()
+    tasks = []
+    for i in range(total):
+        delay = start + i / rps - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one()))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    latencies = sorted(recorder.latencies)
+    pct = lambda p: round(latencies[int(p * (len(latencies) - 1))], 1) if latencies else None
+    return {
+        "requests": total,
+        "ok": len(latencies),
+        "errors": recorder.errors,
+        "achieved_rps": round(len(latencies) / elapsed, 1),
+        "latency_ms_p50": round(statistics.median(latencies), 1) if latencies else None,
+        "latency_ms_p95": pct(0.95),
+        "latency_ms_p99": pct(0.99),
+        "new_connections": recorder.connections,
+        "handshakes_per_request": round(recorder.connections / total, 3),
+        "client_cpu_ms_per_request": round((time.process_time() - client_cpu) * 1000 / total, 3),
+        "server_cpu_ms_per_request": round((sum(server.cpu_times()[:2]) - server_cpu) * 1000 / total, 3),
+        "http_versions": sorted(recorder.versions),
+    }
+
+
+async def run(args, port: int, server: psutil.Process):
+    url = f"https://localhost:{port}/geocoding/v5/mapbox.places/dubbo.json"
+    results = {"rps": args.rps, "seconds": args.seconds, "upstream_latency_ms": args.latency_ms}
+
+    # Warm both paths (imports, first handshake) before measuring
+    await per_request_call(url, Recorder())
+    pooled = UpstreamClient("mock", UpstreamConfig(base_url=f"https://localhost:{port}", max_concurrency=200,
+                                                   max_connections=100, max_keepalive_connections=100))
+    await pooled.get("/warmup")
+
+    recorder = Recorder()
+    results["per_request"] = await drive(lambda: per_request_call(url, recorder), args.rps, args.seconds, recorder, server)
+    await asyncio.sleep(1)
+
+    # UpstreamClient installs its own trace hook; read new connections from its stats
+    recorder, opened_before = Recorder(), pooled.stats.connections_opened
+    results["pooled"] = await drive(lambda: pooled.get(url), args.rps, args.seconds, recorder, server)
+    opened = pooled.stats.connections_opened - opened_before
+    results["pooled"]["new_connections"] = opened
+    results["pooled"]["handshakes_per_request"] = round(opened / results["pooled"]["requests"], 3)
+    results["pooled"]["client_stats"] = pooled.stats.to_dict()
+    await pooled.aclose()
+
+    before, after = results["per_request"], results["pooled"]
+    results["summary"] = {
+        "handshakes_saved_per_request": round(before["handshakes_per_request"] - after["handshakes_per_request"], 3),
+        "p50_ms_saved": round(before["latency_ms_p50"] - after["latency_ms_p50"], 1),
+        "client_cpu_reduction": round(before["client_cpu_ms_per_request"] / max(after["client_cpu_ms_per_request"], 1e-9), 1),
+        "server_cpu_reduction": round(before["server_cpu_ms_per_request"] / max(after["server_cpu_ms_per_request"], 1e-9), 1),
+    }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pooled vs per-request outbound HTTP client benchmark")
+    parser.add_argument("--rps", type=int, default=500)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Simulated upstream processing time")
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # one INFO line per request skews client CPU
+
+    with tempfile.TemporaryDirectory() as tmp:
+        key_path, cert_path = write_certificate(tmp)
+        os.environ["SSL_CERT_FILE"] = cert_path  # trusted by every httpx client created below
+        server_script = os.path.join(tmp, "mock_upstream.py")
+        with open(server_script, "w") as f:
+            f.write(SERVER_APP)
+        port = free_port()
+        proc = subprocess.Popen([sys.executable, server_script, str(args.latency_ms), str(port), key_path, cert_path])
+        try:
+            wait_for_server(port)
+            results = asyncio.run(run(args, port, psutil.Process(proc.pid)))
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    print(json.dumps(results, indent=2))
+
+    report_file = f"http_client_pool_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "args": vars(args), "results": results}, f, indent=2)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Intent Classifier Benchmark
+===========================
+
+Classifies the held-out corpus (app/services/pam/intent_corpus/eval.jsonl)
+with four strategies and reports accuracy, p50/p99 latency and how many
+messages needed the AI:
+
+  rules  - keyword rules only (the old fallback path)
+  legacy - the old classify_intent: rules, plus the AI whenever the rule
+           confidence is below 0.8 or more than two entities were found
+  model  - the local n-gram model only
+  tiered - EnhancedIntentClassifier.classify_intent: LRU, local model, AI
+           only below the calibrated threshold (cold cache, then a warm
+           second pass over the same messages)
+
+The AI is simulated: after --ai-latency-ms it returns the labelled intent
+with probability --ai-accuracy (otherwise general_query), at confidence 0.9.
+Analytics submission is replaced by a no-op so nothing leaves the process.
+
+Usage:
+    python performance_benchmarks/intent_classifier_benchmark.py --ai-latency-ms 800 --ai-accuracy 0.95
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+# Add backend to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.analytics import pipeline as analytics_pipeline
+from app.services.pam.intent_classifier import EnhancedIntentClassifier, IntentClassification, IntentType
+from app.services.pam.intent_model import IntentModel, load_examples
+
+USER_ID = "11111111-1111-1111-1111-111111111111"
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p99_ms": round(ordered[max(0, int(len(ordered) * 0.99) - 1)] * 1000, 3),
+    }
+
+
+class SimulatedAI:
+    def __init__(self, labels, latency, accuracy, seed=11):
+        self.labels = labels
+        self.latency = latency
+        self.accuracy = accuracy
+        self.rng = random.Random(seed)
+        self.calls = 0
+
+    async def __call__(self, message, entities, context):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        intent = self.labels[message] if self.rng.random() < self.accuracy else "general_query"
+        return IntentClassification(
+            intent=IntentType(intent), confidence=0.9, entities=entities, context_clues=[],
+            suggested_handler="", reasoning="simulated", requires_clarification=False,
+            clarification_questions=[])
+
+
+async def legacy_classify(classifier, message):
+    """The pre-model decision: rules, AI for low rule confidence or many entities"""
+    entities = await classifier._extract_entities(message)
+    intent, confidence, _ = classifier._classify_with_rules(message, {})
+    if confidence < 0.8 or len(entities) > 2:
+        ai_result = await classifier._classify_with_ai(message, entities, {})
+        if ai_result and ai_result.confidence > confidence:
+            intent = ai_result.intent
+    return intent
+
+
+async def measure(examples, classify):
+    hits = 0
+    timings = []
+    for text, label in examples:
+        start = time.perf_counter()
+        intent = await classify(text)
+        timings.append(time.perf_counter() - start)
+        hits += intent.value == label
+    return {"accuracy": round(hits / len(examples), 4), **percentiles(timings)}
+
+
+async def run(args):
+    examples = load_examples("eval")
+    labels = dict(examples)
+
+    start = time.perf_counter()
+    model = IntentModel.train(load_examples("train"))
+    training_s = round(time.perf_counter() - start, 2)
+
+    def classifier_with(ai):
+        classifier = EnhancedIntentClassifier(openai_api_key="", model=model)
+        classifier.ai_model = MagicMock()
+        classifier._classify_with_ai = ai
+        return classifier
+
+    results = {"training_s": training_s, "threshold": round(model.threshold, 3),
+               "eval_messages": len(examples)}
+
+    rules = classifier_with(None)
+    results["rules"] = await measure(examples, lambda m: asyncio.sleep(0, rules._classify_with_rules(m, {})[0]))
+
+    async def model_only(message):
+        return rules._classify_with_model(message, {})[0]
+    results["model"] = await measure(examples, model_only)
+
+    ai = SimulatedAI(labels, args.ai_latency_ms / 1000, args.ai_accuracy)
+    legacy = classifier_with(ai)
+    results["legacy"] = await measure(examples, lambda m: legacy_classify(legacy, m))
+    results["legacy"]["ai_calls"] = ai.calls
+
+    ai = SimulatedAI(labels, args.ai_latency_ms / 1000, args.ai_accuracy)
+    tiered = classifier_with(ai)
+
+    async def tiered_classify(message):
+        return (await tiered.classify_intent(message, USER_ID)).intent
+    with patch.object(analytics_pipeline, "get_analytics_pipeline", return_value=MagicMock()):
+        results["tiered_cold"] = await measure(examples, tiered_classify)
+        results["tiered_cold"]["ai_calls"] = ai.calls
+        results["tiered_warm"] = await measure(examples, tiered_classify)
+        results["tiered_warm"]["ai_calls"] = ai.calls - results["tiered_cold"]["ai_calls"]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiered intent classification benchmark")
+    parser.add_argument("--ai-latency-ms", type=float, default=800.0, help="Simulated LLM round trip")
+    parser.add_argument("--ai-accuracy", type=float, default=0.95, help="Simulated LLM accuracy")
+    args = parser.parse_args()
+    logging.getLogger("app").setLevel(logging.WARNING)
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+
+    report_file = f"intent_classifier_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "args": vars(args), "results": results}, f, indent=2)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
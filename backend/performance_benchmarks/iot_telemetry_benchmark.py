@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+IoT Telemetry Benchmark
+=======================
+
+Drives the telemetry pipeline (app/integrations/iot_telemetry.py) with a
+simulated fleet of devices reporting at a fixed rate, all on one event loop,
+and writes into a scratch pam_device_readings table in a local Postgres.
+
+The simulator stands in for real devices: every tick it emits one battery
+voltage reading per device (a slow random walk with occasional dips so the
+alert evaluator has work), spread across the second in 10 slices.
+
+Reports offered vs ingested vs flushed samples/sec, event-loop lag, flush
+latency, alert evaluation cost and the number of rows that reached the
+database. --legacy also measures the old path (one INSERT per sample plus
+an inline threshold check) for comparison.
+
+Usage:
+    TEST_DATABASE_URL=postgresql://postgres@127.0.0.1:5432/postgres \\
+        python performance_benchmarks/iot_telemetry_benchmark.py --devices 10000 --seconds 30
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+
+import asyncpg
+
+# Add backend to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.integrations.iot_telemetry import (
+    DEFAULT_THRESHOLD_RULES,
+    AlertEvaluator,
+    AsyncpgTelemetrySink,
+    TelemetryPipeline,
+)
+
+READINGS = "iot_benchmark_readings"
+ROLLUPS = "iot_benchmark_rollups"
+SLICES_PER_TICK = 10
+
+SCHEMA = f"""
+DROP TABLE IF EXISTS {READINGS};
+DROP TABLE IF EXISTS {ROLLUPS};
+CREATE TABLE {READINGS} (
+    reading_id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    device_id TEXT NOT NULL,
+    sensor_type TEXT NOT NULL,
+    value JSONB NOT NULL,
+    unit TEXT,
+    timestamp TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    quality DECIMAL(3,2) NOT NULL DEFAULT 1.0,
+    metadata JSONB NOT NULL DEFAULT '{{}}'
+);
+CREATE INDEX ON {READINGS} (device_id, sensor_type, timestamp DESC);
+CREATE TABLE {ROLLUPS} (
+    device_id TEXT NOT NULL,
+    sensor_type TEXT NOT NULL,
+    resolution TEXT NOT NULL,
+    bucket_start TIMESTAMPTZ NOT NULL,
+    min_value DOUBLE PRECISION NOT NULL,
+    max_value DOUBLE PRECISION NOT NULL,
+    sample_sum DOUBLE PRECISION NOT NULL,
+    sample_count INTEGER NOT NULL,
+    PRIMARY KEY (device_id, sensor_type, resolution, bucket_start)
+);
+"""
+
+
+class DeviceSimulator:
+    """Fleet of devices emitting one voltage reading per tick"""
+
+    def __init__(self, devices: int, seed: int = 7):
+        self.rng = random.Random(seed)
+        self.device_ids = [f"sim-{i:05d}" for i in range(devices)]
+        self.voltages = [12.6 + self.rng.uniform(-0.3, 0.3) for _ in range(devices)]
+
+    def reading(self, index: int) -> float:
+        voltage = self.voltages[index] + self.rng.uniform(-0.05, 0.05)
+        if self.rng.random() < 0.0005:
+            voltage = 11.2  # sag that should trip battery_low after a few samples
+        voltage = min(max(voltage, 10.5), 14.4)
+        self.voltages[index] = voltage
+        return voltage
+
+
+async def heartbeat(stop: asyncio.Event, lags: list):
+    while not stop.is_set():
+        before = time.perf_counter()
+        await asyncio.sleep(0.01)
+        lags.append((time.perf_counter() - before - 0.01) * 1000)
+
+
+async def drive(simulator: DeviceSimulator, rate_hz: float, seconds: float, emit):
+    """Call emit(device_id, value, ts) for every device at rate_hz, paced in slices"""
+    devices = len(simulator.device_ids)
+    per_slice = -(-devices // SLICES_PER_TICK)
+    slice_interval = 1.0 / rate_hz / SLICES_PER_TICK
+    start = time.perf_counter()
+    next_at = start
+    offered = 0
+    while time.perf_counter() - start < seconds:
+        for s in range(SLICES_PER_TICK):
+            now = time.time()
+            for i in range(s * per_slice, min(devices, (s + 1) * per_slice)):
+                result = emit(simulator.device_ids[i], simulator.reading(i), now)
+                if result is not None:
+                    await result
+                offered += 1
+            next_at += slice_interval
+            await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+    return offered, time.perf_counter() - start
+
+
+async def run_pipeline(pool, devices: int, rate_hz: float, seconds: float, flush_samples: int, flush_seconds: float):
+    pipeline = TelemetryPipeline(
+        sink=AsyncpgTelemetrySink(pool, readings_table=READINGS, rollups_table=ROLLUPS),
+        flush_samples=flush_samples,
+        flush_seconds=flush_seconds,
+    )
+    flush_times = []
+    original_flush = pipeline.flush
+
+    async def timed_flush(force_rollups: bool = False):
+        start = time.perf_counter()
+        written = await original_flush(force_rollups)
+        if written:
+            flush_times.append((time.perf_counter() - start) * 1000)
+        return written
+
+    pipeline.flush = timed_flush
+
+    alerts = []
+
+    async def on_alert(device_id, rule, value, ts):
+        alerts.append((device_id, rule.alert_type))
+
+    evaluator = AlertEvaluator(pipeline, rules=DEFAULT_THRESHOLD_RULES, on_alert=on_alert)
+    eval_times = []
+    original_evaluate = evaluator.evaluate
+
+    async def timed_evaluate():
+        start = time.perf_counter()
+        changes = await original_evaluate()
+        eval_times.append((time.perf_counter() - start) * 1000)
+        return changes
+
+    evaluator.evaluate = timed_evaluate
+
+    simulator = DeviceSimulator(devices)
+    lags, stop = [], asyncio.Event()
+    beat = asyncio.create_task(heartbeat(stop, lags))
+    pipeline.start()
+    evaluator.start()
+    max_pending = 0
+
+    def emit(device_id, value, ts):
+        nonlocal max_pending
+        pipeline.record(device_id, "battery_voltage", value, ts, "V")
+        if pipeline.pending > max_pending:
+            max_pending = pipeline.pending
+
+    offered, elapsed = await drive(simulator, rate_hz, seconds, emit)
+    drain_start = time.perf_counter()
+    await evaluator.stop()
+    await pipeline.stop()
+    drain_seconds = time.perf_counter() - drain_start
+    stop.set()
+    await beat
+
+    rows = await pool.fetchval(f"SELECT count(*) FROM {READINGS}")
+    rollups = await pool.fetchval(f"SELECT count(*) FROM {ROLLUPS}")
+    lags.sort()
+    return {
+        "mode": "pipeline",
+        "devices": devices,
+        "offered_per_sec": round(offered / elapsed, 1),
+        "target_per_sec": devices * rate_hz,
+        "flushed_per_sec": round(pipeline.stats.flushed / (elapsed + drain_seconds), 1),
+        "rows_in_db": rows,
+        "rollup_rows": rollups,
+        "dropped": pipeline.stats.dropped,
+        "max_pending": max_pending,
+        "flushes": pipeline.stats.flushes,
+        "flush_ms_p50": round(statistics.median(flush_times), 1) if flush_times else None,
+        "flush_ms_max": round(max(flush_times), 1) if flush_times else None,
+        "alert_eval_ms_p50": round(statistics.median(eval_times), 2) if eval_times else None,
+        "alerts_fired": len(alerts),
+        "loop_lag_ms_p99": round(lags[int(len(lags) * 0.99)], 1) if lags else None,
+        "loop_lag_ms_max": round(lags[-1], 1) if lags else None,
+        "drain_seconds": round(drain_seconds, 2),
+    }
+
+
+async def run_legacy(pool, devices: int, rate_hz: float, seconds: float):
+    """One INSERT and an inline threshold check per sample (the old monitor loop)"""
+    rule = next(r for r in DEFAULT_THRESHOLD_RULES if r.sensor_type == "battery_voltage")
+    simulator = DeviceSimulator(devices)
+
+    async def emit(device_id, value, ts):
+        await pool.execute(
+            f"INSERT INTO {READINGS} (device_id, sensor_type, value, unit, timestamp, quality) "
+            f"VALUES ($1, $2, $3, $4, $5, $6)",
+            device_id, "battery_voltage", json.dumps(value), "V",
+            datetime.fromtimestamp(ts, tz=timezone.utc), 1.0,
+        )
+        rule.breached(value)
+
+    offered, elapsed = await drive(simulator, rate_hz, seconds, emit)
+    return {
+        "mode": "legacy_per_sample_insert",
+        "devices": devices,
+        "target_per_sec": devices * rate_hz,
+        "achieved_per_sec": round(offered / elapsed, 1),
+    }
+
+
+async def run(dsn: str, args):
+    pool = await asyncpg.create_pool(dsn, min_size=2, max_size=4)
+    results = []
+    try:
+        await pool.execute(SCHEMA)
+        result = await run_pipeline(pool, args.devices, args.rate, args.seconds, args.flush_samples, args.flush_seconds)
+        results.append(result)
+        print(json.dumps(result, indent=2))
+
+        if args.legacy:
+            await pool.execute(SCHEMA)
+            result = await run_legacy(pool, args.devices, args.rate, min(args.seconds, 10))
+            results.append(result)
+            print(json.dumps(result, indent=2))
+    finally:
+        await pool.execute(f"DROP TABLE IF EXISTS {READINGS}; DROP TABLE IF EXISTS {ROLLUPS}")
+        await pool.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IoT telemetry pipeline benchmark")
+    parser.add_argument("--dsn", default=os.getenv("TEST_DATABASE_URL", "postgresql://postgres@127.0.0.1:5432/postgres"))
+    parser.add_argument("--devices", type=int, default=10_000)
+    parser.add_argument("--rate", type=float, default=1.0, help="Readings per device per second")
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--flush-samples", type=int, default=5000)
+    parser.add_argument("--flush-seconds", type=float, default=2.0)
+    parser.add_argument("--legacy", action="store_true", help="Also measure the per-sample INSERT path")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.dsn, args))
+
+    report_file = f"iot_telemetry_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "results": results}, f, indent=2)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
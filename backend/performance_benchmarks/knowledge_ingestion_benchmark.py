@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Knowledge Ingestion Benchmark
+=============================
+
+Ingests generated HTML manuals into a local ChromaDB (persistent, in a temp
+directory) with a local embedding stub, and reports docs/minute and peak
+memory (RSS of this process and its parser workers, sampled every 20 ms):
+
+  sequential - the previous per-document path: clean, extract metadata,
+               chunk, embed and add one document after another
+  pipeline   - KnowledgeIngestionEngine: process-pool parsing, batched
+               embedding and bulk upserts with bounded queues in between
+  rerun      - pipeline over the same documents (every chunk unchanged)
+  changed    - pipeline with 10% of documents edited
+
+The embedding stub returns deterministic 384-d vectors and sleeps
+--embed-batch-ms per call plus --embed-text-ms per text, like a local model.
+
+Requires chromadb (pip install chromadb).
+
+Usage:
+    python performance_benchmarks/knowledge_ingestion_benchmark.py --docs 500 --workers 4
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import numpy as np
+import psutil
+
+# Add backend to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.knowledge.document_processor import ContentCleaner, TextChunker
+from app.services.knowledge.ingestion_engine import (
+    ChromaChunkSink,
+    KnowledgeIngestionEngine,
+    SourceDocument,
+    shutdown_parse_pool,
+)
+
+try:
+    import chromadb
+    from chromadb.config import Settings
+    CHROMADB_AVAILABLE = True
+except ImportError:
+    CHROMADB_AVAILABLE = False
+
+DIMENSIONS = 384
+WORDS = ("tyre pressure hitch coupling brake controller battery inverter solar panel water pump grey tank "
+         "awning jack stand wheel bearing torque fuse isolator ventilation gas regulator sway bar").split()
+
+
+class EmbeddingStub:
+    """Deterministic vectors with model-like latency"""
+
+    def __init__(self, batch_ms, text_ms):
+        self.batch_ms = batch_ms
+        self.text_ms = text_ms
+        self.calls = 0
+
+    def __call__(self, texts):
+        self.calls += 1
+        time.sleep((self.batch_ms + self.text_ms * len(texts)) / 1000)
+        vectors = []
+        for text in texts:
+            seed = int.from_bytes(hashlib.md5(text.encode()).digest()[:4], "little")
+            vectors.append(np.random.default_rng(seed).standard_normal(DIMENSIONS).astype(np.float32).tolist())
+        return vectors
+
+
+class PeakMemory:
+    """Samples RSS of this process and its children until stopped"""
+
+    def __init__(self, interval=0.02):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _rss(self):
+        process = psutil.Process()
+        total = process.memory_info().rss
+        for child in process.children(recursive=True):
+            try:
+                total += child.memory_info().rss
+            except psutil.Error:
+                pass
+        return total
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._rss())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    @property
+    def peak_mb(self):
+        return round(self.peak / 1024 / 1024, 1)
+
+
+def manual_html(i, sections, edited=False):
+    rng = random.Random(i)
+    body = []
+    for s in range(sections):
+        words = " ".join(rng.choice(WORDS) for _ in range(120))
+        body.append(f"<h2>Section {s}</h2><p>{words}.</p>")
+    if edited:
+        body.append("<p>Revised: re-torque wheel nuts after the first 100 km.</p>")
+    return (f"<html><head><style>p {{margin: 0}}</style></head><body><nav>Home | Manuals</nav>"
+            f"<h1>Caravan manual {i}</h1>{''.join(body)}<footer>Copyright</footer></body></html>")
+
+
+def documents(args, edited_every=0):
+    for i in range(args.docs):
+        edited = bool(edited_every) and i % edited_every == 0
+        yield SourceDocument(source_id=f"https://manuals.example/{i}", content=manual_html(i, args.sections, edited))
+
+
+def sequential(collection, embed, args):
+    """The previous DocumentProcessor path, one document at a time"""
+    chunker = TextChunker()
+    for document in documents(args):
+        text = ContentCleaner.clean_html(document.content)
+        metadata = ContentCleaner.extract_key_information(text)
+        chunks = chunker.smart_chunk(text)
+        embeddings = embed(chunks)
+        collection.add(
+            ids=[str(uuid.uuid4()) for _ in chunks],
+            documents=chunks,
+            metadatas=[{"url": document.source_id, "chunk_index": n, "word_count": metadata["word_count"]}
+                       for n in range(len(chunks))],
+            embeddings=embeddings,
+        )
+
+
+def timed(fn):
+    start = time.perf_counter()
+    with PeakMemory() as memory:
+        result = fn()
+    return result, time.perf_counter() - start, memory.peak_mb
+
+
+async def run(args):
+    if not CHROMADB_AVAILABLE:
+        raise SystemExit("ChromaDB is not installed: pip install chromadb")
+
+    results = {"docs": args.docs, "sections": args.sections}
+    with tempfile.TemporaryDirectory() as root:
+        client = chromadb.PersistentClient(path=root, settings=Settings(anonymized_telemetry=False))
+
+        embed = EmbeddingStub(args.embed_batch_ms, args.embed_text_ms)
+        legacy = client.create_collection("sequential", metadata={"hnsw:space": "cosine"})
+        _, elapsed, peak = timed(lambda: sequential(legacy, embed, args))
+        results["sequential"] = {
+            "elapsed_seconds": round(elapsed, 3),
+            "docs_per_minute": round(args.docs / elapsed * 60, 1),
+            "peak_rss_mb": peak,
+            "embed_calls": embed.calls,
+            "chunks": legacy.count(),
+        }
+
+        collection = client.create_collection("pipeline", metadata={"hnsw:space": "cosine"})
+        for phase, edited_every in (("pipeline", 0), ("rerun", 0), ("changed", 10)):
+            embed = EmbeddingStub(args.embed_batch_ms, args.embed_text_ms)
+            engine = KnowledgeIngestionEngine(
+                lambda name: ChromaChunkSink(collection), embed, parse_workers=args.workers,
+                embed_batch_size=args.embed_batch_size, upsert_batch_size=args.upsert_batch_size,
+            )
+            start = time.perf_counter()
+            with PeakMemory() as memory:
+                stats = await engine.ingest(documents(args, edited_every))
+            results[phase] = {
+                **stats.to_dict(),
+                "elapsed_seconds": round(time.perf_counter() - start, 3),
+                "peak_rss_mb": memory.peak_mb,
+                "embed_calls": embed.calls,
+                "chunks_in_collection": collection.count(),
+            }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Knowledge ingestion benchmark with local ChromaDB and an embedding stub")
+    parser.add_argument("--docs", type=int, default=500)
+    parser.add_argument("--sections", type=int, default=20, help="Sections (about 120 words each) per manual")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1), help="Parser processes")
+    parser.add_argument("--embed-batch-size", type=int, default=64)
+    parser.add_argument("--upsert-batch-size", type=int, default=256)
+    parser.add_argument("--embed-batch-ms", type=float, default=20.0, help="Stub latency per embedding call")
+    parser.add_argument("--embed-text-ms", type=float, default=1.0, help="Stub latency per embedded text")
+    args = parser.parse_args()
+    logging.getLogger("app").setLevel(logging.WARNING)
+
+    # Size the shared parser pool before the engine creates it
+    os.environ["KNOWLEDGE_PARSE_WORKERS"] = str(args.workers)
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        shutdown_parse_pool()
+    print(json.dumps(results, indent=2))
+
+    report_file = f"knowledge_ingestion_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "args": vars(args), "results": results}, f, indent=2)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+OCR Pipeline Benchmark
+======================
+
+Measures PDF text extraction throughput (pages/sec) for the sequential
+in-loop path versus page-level parallel extraction in the OCR process pool
+(app/workers/ocr_cpu.py), using locally generated PDF fixtures.
+
+Also reports event-loop responsiveness: the worst observed delay of a 10ms
+heartbeat task while extraction runs. The old in-loop path blocks the loop
+for the full parse; the process-pool path should keep it near zero.
+
+Usage:
+    python performance_benchmarks/ocr_pipeline_benchmark.py
+    python performance_benchmarks/ocr_pipeline_benchmark.py --pages 10 50 200 --workers 4
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+# Add backend to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.workers import ocr_cpu
+from tests.fixtures.pdf_fixtures import build_text_pdf
+
+
+def make_pdf(page_count: int) -> bytes:
+    line = "Invoice 0042 Diesel 54.20L @ 1.899 Total 102.93 Caravan Park Site 17 " * 2
+    return build_text_pdf([f"{i}: {line}" for i in range(page_count)])
+
+
+async def _measure(coro_factory):
+    """Run coroutine while sampling event-loop lag; returns (result, seconds, max_lag_ms)."""
+    max_lag = 0.0
+    done = False
+
+    async def heartbeat():
+        nonlocal max_lag
+        while not done:
+            before = time.perf_counter()
+            await asyncio.sleep(0.01)
+            max_lag = max(max_lag, (time.perf_counter() - before - 0.01) * 1000)
+
+    beat = asyncio.create_task(heartbeat())
+    await asyncio.sleep(0)  # let the heartbeat start its first sleep
+    start = time.perf_counter()
+    result = await coro_factory()
+    elapsed = time.perf_counter() - start
+    done = True
+    await beat
+    return result, elapsed, max_lag
+
+
+async def bench(page_counts, repeats: int):
+    results = []
+    # Warm the pool so worker spawn cost is not attributed to the first run
+    await ocr_cpu.run_in_process_pool(ocr_cpu.pdf_page_count, make_pdf(1))
+
+    for pages in page_counts:
+        pdf = make_pdf(pages)
+
+        async def sequential():
+            return ocr_cpu.extract_pdf_text(pdf)
+
+        async def parallel():
+            return await ocr_cpu.extract_pdf_text_parallel(pdf)
+
+        for label, factory in (("sequential_in_loop", sequential), ("process_pool_parallel", parallel)):
+            timings, lags = [], []
+            for _ in range(repeats):
+                (text, count), elapsed, lag = await _measure(factory)
+                assert count == pages and text
+                timings.append(elapsed)
+                lags.append(lag)
+            best = min(timings)
+            results.append({
+                "pages": pages,
+                "mode": label,
+                "pages_per_sec": round(pages / best, 1),
+                "best_seconds": round(best, 3),
+                "max_event_loop_lag_ms": round(max(lags), 1),
+            })
+            print(f"{pages:>5} pages {label:<22} {pages / best:8.1f} pages/s  loop lag {max(lags):7.1f} ms")
+
+    ocr_cpu.shutdown_process_pool()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR PDF extraction benchmark")
+    parser.add_argument("--pages", nargs="+", type=int, default=[10, 50, 200])
+    parser.add_argument("--workers", type=int, default=None, help="OCR process pool size")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.workers:
+        os.environ["OCR_PROCESS_WORKERS"] = str(args.workers)
+
+    results = asyncio.run(bench(args.pages, args.repeats))
+
+    report_file = f"ocr_pipeline_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "results": results}, f, indent=2)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Proxy Cache Benchmark
+=====================
+
+Replays a production-like request log against a local mock upstream
+(uvicorn in a subprocess: ~19 KB JSON route bodies sent gzip-encoded, ETag and
+Cache-Control headers, a fixed simulated latency, and a request counter)
+in two modes:
+
+  passthrough - every proxied request goes upstream (the old behaviour)
+  proxy_cache - requests go through app.core.proxy_cache.ProxyCache
+                (canonical keys, coalescing, LRU + Redis, gzip passthrough)
+
+The log mimics the map proxies' traffic: popular directions/isochrones
+drawn from a Zipf distribution, arriving in bursts of clients opening the
+same trip together, with coordinates jittered below the rounding precision
+and parameters in varying order. Upstream QPS is counted by the mock
+server.
+
+Redis keys use a scratch upstream name and are deleted afterwards.
+
+Usage:
+    python performance_benchmarks/proxy_cache_benchmark.py --requests 6000 --seconds 30
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+from datetime import datetime
+
+import httpx
+import redis.asyncio as redis
+
+# Add backend to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.http_clients import UpstreamClient, UpstreamConfig
+from app.core.proxy_cache import ProxyCache
+
+UPSTREAM_NAME = "proxybench"
+
+SERVER_APP = textwrap.dedent("""
+    import asyncio, gzip, hashlib, json, sys
+    LATENCY = float(sys.argv[1]) / 1000
+    COUNT = {"requests": 0, "bytes": 0}
+
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        if scope["path"] == "/__stats":
+            body = json.dumps(COUNT).encode()
+            await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"application/json")]})
+            await send({"type": "http.response.body", "body": body})
+            return
+        COUNT["requests"] += 1
+        await asyncio.sleep(LATENCY)
+        seed = scope["path"] + "?" + scope["query_string"].decode()
+        geometry = hashlib.sha256(seed.encode()).hexdigest() * 300
+        body = gzip.compress(json.dumps({"routes": [{"geometry": geometry, "distance": len(seed)}]}).encode())
+        COUNT["bytes"] += len(body)
+        etag = '"' + hashlib.md5(seed.encode()).hexdigest() + '"'
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"application/json"), (b"content-encoding", b"gzip"),
+            (b"etag", etag.encode()), (b"cache-control", b"max-age=300")]})
+        await send({"type": "http.response.body", "body": body})
+
+    if __name__ == "__main__":
+        import uvicorn
+        uvicorn.run(app, host="127.0.0.1", port=int(sys.argv[2]), log_level="warning", access_log=False)
+""")
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_server(port: int, timeout: float = 15.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("mock upstream did not start")
+
+
+def build_log(args, rng):
+    """(offset_seconds, path, params) entries, sorted by arrival time"""
+    trips = []
+    for _ in range(args.distinct):
+        a = (rng.uniform(115, 153), rng.uniform(-43, -12))
+        b = (rng.uniform(115, 153), rng.uniform(-43, -12))
+        trips.append((a, b, rng.random() < 0.3))
+    weights = [1 / (rank + 1) ** args.zipf for rank in range(len(trips))]
+
+    log = []
+    while len(log) < args.requests:
+        (a, b, isochrone) = rng.choices(trips, weights)[0]
+        burst_start = rng.uniform(0, args.seconds)
+        for _ in range(min(rng.randint(1, args.max_burst), args.requests - len(log))):
+            # Each client's coordinates differ below the 5th decimal, its params come in any order
+            jitter = lambda v: f"{v + rng.uniform(-4e-6, 4e-6):.7f}"
+            if isochrone:
+                path = "/isochrone/v1/mapbox/driving"
+                params = {"coordinates": f"{jitter(a[0])},{jitter(a[1])}", "contours_minutes": "30,60",
+                          "polygons": rng.choice([True, "true"])}
+            else:
+                path = f"/directions/v5/mapbox/driving/{jitter(a[0])},{jitter(a[1])};{jitter(b[0])},{jitter(b[1])}"
+                params = {"geometries": "geojson", "overview": "full", "steps": rng.choice([True, "true"])}
+            items = list(params.items())
+            rng.shuffle(items)
+            params = dict(items, access_token=f"pk.client{rng.randrange(1000)}")
+            log.append((burst_start + rng.uniform(0, args.burst_window), path, params))
+    log.sort(key=lambda entry: entry[0])
+    return log
+
+
+async def upstream_stats(port: int):
+    async with httpx.AsyncClient() as client:
+        return (await client.get(f"http://127.0.0.1:{port}/__stats")).json()
+
+
+async def replay(log, send, speed: float):
+    latencies, errors = [], 0
+    start = time.perf_counter()
+
+    async def one(path, params):
+        nonlocal errors
+        t0 = time.perf_counter()
+        try:
+            await send(path, params)
+            latencies.append((time.perf_counter() - t0) * 1000)
+        except Exception:
+            errors += 1
+
+    tasks = []
+    for offset, path, params in log:
+        delay = start + offset / speed - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(one(path, params)))
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "seconds": round(elapsed, 1),
+        "errors": errors,
+        "latency_ms_p50": round(latencies[len(latencies) // 2], 1),
+        "latency_ms_p95": round(latencies[int(0.95 * (len(latencies) - 1))], 1),
+    }
+
+
+class RedisJSONCache:
+    def __init__(self, client):
+        self.client = client
+
+    async def get(self, key):
+        value = await self.client.get(key)
+        return json.loads(value) if value is not None else None
+
+    async def set(self, key, value, ttl=None):
+        await self.client.setex(key, ttl, json.dumps(value))
+
+
+async def run(args, port: int):
+    log = build_log(args, random.Random(38))
+    config = UpstreamConfig(base_url=f"http://127.0.0.1:{port}", max_concurrency=200, max_connections=100,
+                            max_keepalive_connections=100, http2=False)
+    results = {"requests": len(log), "log_seconds": args.seconds, "distinct_trips": args.distinct}
+    redis_client = redis.from_url(args.redis_url, decode_responses=True)
+    try:
+        # Passthrough: the old proxy, one upstream request per client request
+        client = UpstreamClient(UPSTREAM_NAME, config)
+        async def passthrough(path, params):
+            response = await client.get(path, params=params, headers={"Accept-Encoding": "gzip"})
+            response.raise_for_status()
+        before = await upstream_stats(port)
+        timings = await replay(log, passthrough, args.speed)
+        after = await upstream_stats(port)
+        await client.aclose()
+        upstream = after["requests"] - before["requests"]
+        results["passthrough"] = {**timings, "upstream_requests": upstream,
+                                  "upstream_qps": round(upstream / timings["seconds"], 1),
+                                  "upstream_bytes": after["bytes"] - before["bytes"]}
+
+        client = UpstreamClient(UPSTREAM_NAME, config)
+        proxy = ProxyCache(UPSTREAM_NAME, client=client, redis_cache=RedisJSONCache(redis_client))
+        async def cached(path, params):
+            entry, _ = await proxy.fetch("GET", path, params=params, ttl=600)
+            assert entry.status_code == 200
+        before = await upstream_stats(port)
+        timings = await replay(log, cached, args.speed)
+        after = await upstream_stats(port)
+        await client.aclose()
+        upstream = after["requests"] - before["requests"]
+        results["proxy_cache"] = {**timings, "upstream_requests": upstream,
+                                  "upstream_qps": round(upstream / timings["seconds"], 1),
+                                  "upstream_bytes": after["bytes"] - before["bytes"],
+                                  "stats": proxy.get_stats()}
+
+        results["summary"] = {
+            "upstream_qps_reduction": round(1 - results["proxy_cache"]["upstream_requests"]
+                                            / results["passthrough"]["upstream_requests"], 4),
+            "coalesced_share": round(proxy.stats["coalesced"] / len(log), 4),
+            "cache_hit_share": round((proxy.stats["local_hits"] + proxy.stats["redis_hits"]) / len(log), 4),
+        }
+        return results
+    finally:
+        async for key in redis_client.scan_iter(f"proxy:{UPSTREAM_NAME}:*", count=1000):
+            await redis_client.unlink(key)
+        await redis_client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Map proxy coalescing and response cache benchmark")
+    parser.add_argument("--redis-url", default=os.getenv("REDIS_URL", "redis://localhost:6379"))
+    parser.add_argument("--requests", type=int, default=6000)
+    parser.add_argument("--seconds", type=float, default=30.0, help="Span of the request log")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier")
+    parser.add_argument("--distinct", type=int, default=400, help="Distinct trips/isochrones in the log")
+    parser.add_argument("--zipf", type=float, default=1.1)
+    parser.add_argument("--max-burst", type=int, default=12, help="Clients requesting the same trip together")
+    parser.add_argument("--burst-window", type=float, default=0.3, help="Seconds over which a burst arrives")
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="Simulated upstream latency")
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server_script = os.path.join(tmp, "mock_upstream.py")
+        with open(server_script, "w") as f:
+            f.write(SERVER_APP)
+        port = free_port()
+        proc = subprocess.Popen([sys.executable, server_script, str(args.latency_ms), str(port)])
+        try:
+            wait_for_server(port)
+            results = asyncio.run(run(args, port))
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    print(json.dumps(results, indent=2))
+
+    report_file = f"proxy_cache_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "args": vars(args), "results": results}, f, indent=2)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Receipt Parser Benchmark
+========================
+
+Generates a synthetic OCR receipt corpus (default 20k receipts: fuel dockets,
+cafe and shop receipts with item lists, mechanic invoices, caravan park
+bookings and bank statement attachments, with assorted date and total
+formats) and measures parse_receipt_text_universal throughput in docs/sec:
+
+  legacy      - the previous extractors, each rescanning the text with
+                regexes compiled on every call (copied below)
+  single_pass - ReceiptText tokenized once and shared by the extractors
+  batch       - parse_receipts_batch over a process pool (--workers), timed
+                after a warm-up batch so worker start-up is reported apart
+
+Every receipt's legacy output is compared with the single-pass and batch
+output.
+
+Usage:
+    python performance_benchmarks/receipt_parser_benchmark.py --receipts 20000 --workers 4
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+# Add backend to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.receipts import universal_parser as module
+
+STATIONS = ["SHELL COLES EXPRESS", "BP Connect", "Caltex Woolworths", "Ampol Foodary", "United Petroleum", "Mobil Roadhouse"]
+CAFES = ["Bean There Cafe", "The Coffee Club", "Ozzie Pizza Bar", "Roadside Diner", "Grill'd Burger"]
+SHOPS = ["Woolworths Supermarket", "Bunnings Store", "BIG W", "Kmart", "Aldi Grocery"]
+MECHANICS = ["Outback Auto Repair", "Tyrepower", "Midas Brake & Service", "Ultra Tune"]
+PARKS = ["Big4 Holiday Park", "Discovery Caravan Park", "Bush Camp Lodge", "Seaside Motel"]
+ITEMS = ["Milk 2L", "Bread wholemeal", "Eggs dozen", "Bananas 1kg", "Chicken breast", "Tomatoes",
+         "Sunscreen SPF50", "Water 24pk", "Firewood bag", "Gas bottle refill", "Ice 5kg", "Pasta 500g"]
+SERVICES = ["Replace front brake pads", "Engine oil and filter change", "Wheel alignment check",
+            "Supply and fit 2x tyres", "Labour 1.5 hrs", "Clean and adjust rear drums", "Top up coolant"]
+
+
+def fmt_date(rng: random.Random, d: date) -> str:
+    return rng.choice([
+        d.strftime("%Y-%m-%d"), d.strftime("%d/%m/%Y"), f"{d.month}/{d.day}/{d.year % 100:02d}",
+        d.strftime("%b %d, %Y"), d.strftime("%d-%m-%Y"), d.strftime("%d %B %Y"),
+    ])
+
+
+def money(rng: random.Random, low: float, high: float) -> float:
+    return round(rng.uniform(low, high), 2)
+
+
+def fuel(rng, d):
+    litres, price = money(rng, 20, 160), money(rng, 1.6, 2.3)
+    return [rng.choice(STATIONS), f"{rng.randint(1, 999)} Highway Rd", f"ABN {rng.randint(10**10, 10**11)}",
+            f"Date: {fmt_date(rng, d)} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+            f"Pump {rng.randint(1, 12)} {rng.choice(['Unleaded 91', 'Diesel', 'Premium 98'])}",
+            f"{litres:.2f}L @ ${price:.3f}/L", f"TOTAL ${litres * price:.2f}",
+            rng.choice(["EFTPOS", "VISA CARD", "CASH"]), "Thank you for your visit"]
+
+
+def cafe(rng, d):
+    lines = [rng.choice(CAFES), fmt_date(rng, d), f"Table {rng.randint(1, 30)}"]
+    total = 0.0
+    for _ in range(rng.randint(2, 8)):
+        price = money(rng, 3.5, 28)
+        total += price
+        lines.append(f"{rng.choice(['Flat white', 'Big breakfast', 'Lunch special', 'Cheeseburger', 'Pizza Margherita'])}  ${price:.2f}")
+    lines += [f"GST included ${total / 11:.2f}", f"Total: ${total:.2f}", "Thank you!"]
+    return lines
+
+
+def shop(rng, d):
+    lines = [rng.choice(SHOPS), f"Store #{rng.randint(100, 9999)}", f"{d.strftime('%d/%m/%Y')} {rng.randint(8, 21)}:{rng.randint(0, 59):02d}"]
+    total = 0.0
+    for _ in range(rng.randint(8, 45)):
+        price = money(rng, 0.9, 39)
+        total += price
+        lines.append(f"{rng.choice(ITEMS)}    {price:.2f}")
+    lines += [f"SUBTOTAL {total:.2f}", f"BALANCE DUE ${total:.2f}", "Card: XXXX XXXX XXXX 1234", "Thank you for shopping"]
+    return lines
+
+
+def mechanic(rng, d):
+    lines = ["TAX INVOICE", rng.choice(MECHANICS), f"Invoice #{rng.randint(1000, 99999)}",
+             f"Issue date: {fmt_date(rng, d)}", "Customer details", "J Smith", f"+61 4{rng.randint(10**7, 10**8)}",
+             f"jsmith{rng.randint(1, 99)}@example.com", "Quantity  Price  Line total"]
+    total = 0.0
+    for _ in range(rng.randint(2, 7)):
+        price = money(rng, 25, 480)
+        total += price
+        lines.append(f"{rng.choice(SERVICES)}  1  {price:.2f}  {price:.2f}")
+    lines += [f"Subtotal {total:.2f}", f"GST {total / 10:.2f}", f"Amount due: ${total * 1.1:.2f}", "Payment details", "BSB 062-000 ACC 1234 5678"]
+    return lines
+
+
+def accommodation(rng, d):
+    nights = rng.randint(1, 7)
+    rate = money(rng, 35, 180)
+    return [rng.choice(PARKS), "Powered site booking", f"Arrive {fmt_date(rng, d)}",
+            f"Depart {fmt_date(rng, d + timedelta(days=nights))}", f"{nights} nights x ${rate:.2f}",
+            f"Total ${nights * rate:.2f}", "Check out 10am"]
+
+
+def statement(rng, d):
+    lines = ["Account statement attachment", f"Statement period {d.strftime('%d/%m/%Y')} to {(d + timedelta(days=30)).strftime('%d/%m/%Y')}"]
+    for i in range(rng.randint(20, 80)):
+        day = d + timedelta(days=i % 30)
+        merchant = rng.choice(STATIONS + CAFES + SHOPS + PARKS)
+        lines.append(f"{day.strftime('%d/%m/%Y')} {merchant.upper()} {money(rng, 3, 300):.2f}")
+    lines.append(f"Closing balance ${money(rng, 100, 9000):.2f}")
+    return lines
+
+
+KINDS = [(fuel, 0.3), (cafe, 0.2), (shop, 0.2), (mechanic, 0.1), (accommodation, 0.1), (statement, 0.1)]
+
+
+def make_corpus(rng: random.Random, count: int) -> List[str]:
+    makers, weights = zip(*KINDS)
+    texts = []
+    for _ in range(count):
+        d = date(2024, 1, 1) + timedelta(days=rng.randint(0, 900))
+        lines = rng.choices(makers, weights)[0](rng, d)
+        # OCR noise: stray indentation and blank lines
+        texts.append("\n".join(("  " if rng.random() < 0.2 else "") + line for line in lines
+                                if rng.random() > 0.02) + ("\n" if rng.random() < 0.5 else ""))
+    return texts
+
+
+# --- The extractors as they were before the single-pass rewrite ---
+
+def legacy_detect_type(text: str) -> str:
+    """Score each receipt type by keyword hits and return the best match."""
+    text_lower = text.lower()
+    scores: Dict[str, int] = {}
+
+    for rtype, keywords in module.TYPE_KEYWORDS.items():
+        score = sum(1 for kw in keywords if kw in text_lower)
+        if score > 0:
+            scores[rtype] = score
+
+    if not scores:
+        return "general"
+
+    return max(scores, key=scores.get)
+
+
+def legacy_extract_total(text: str) -> Tuple[Optional[float], float]:
+    """Extract total cost from receipt text. Returns (value, confidence)."""
+    patterns = [
+        (r"(?:TOTAL|SALE|AMOUNT|DUE|BALANCE|SUBTOTAL)\s*:?\s*\$?\s*(\d+\.?\d*)", 0.95),
+        (r"\$\s*(\d+\.\d{2})\s*$", 0.7),
+        (r"^\s*\$\s*(\d+\.\d{2})\s*$", 0.6),
+    ]
+
+    for pattern, confidence in patterns:
+        match = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
+        if match:
+            try:
+                return float(match.group(1)), confidence
+            except ValueError:
+                continue
+
+    return None, 0.0
+
+
+def legacy_extract_date(text: str) -> Tuple[Optional[str], float]:
+    """Extract date and normalize to YYYY-MM-DD. Returns (date_str, confidence)."""
+    patterns = [
+        (r"(\d{4})-(\d{1,2})-(\d{1,2})", "ymd", 0.95),
+        (r"(\d{1,2})/(\d{1,2})/(\d{4})", "mdy", 0.85),
+        (r"(\d{1,2})-(\d{1,2})-(\d{4})", "mdy", 0.75),
+        # Handle "Mar 11, 2026" format
+        (r"(Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)\s+(\d{1,2}),?\s+(\d{4})", "text", 0.90),
+        # Handle "3/11/26" short year format
+        (r"(\d{1,2})/(\d{1,2})/(\d{2})", "mdy_short", 0.80),
+    ]
+
+    month_map = {
+        "Jan": 1, "Feb": 2, "Mar": 3, "Apr": 4, "May": 5, "Jun": 6,
+        "Jul": 7, "Aug": 8, "Sep": 9, "Oct": 10, "Nov": 11, "Dec": 12
+    }
+
+    for pattern, fmt, confidence in patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            try:
+                if fmt == "ymd":
+                    year, month, day = int(match.group(1)), int(match.group(2)), int(match.group(3))
+                elif fmt == "text":
+                    month_name = match.group(1)
+                    month = month_map.get(month_name.capitalize(), 0)
+                    day = int(match.group(2))
+                    year = int(match.group(3))
+                elif fmt == "mdy_short":
+                    month, day, short_year = int(match.group(1)), int(match.group(2)), int(match.group(3))
+                    # Assume 20xx for years < 50, 19xx for years >= 50
+                    year = 2000 + short_year if short_year < 50 else 1900 + short_year
+                else:  # mdy
+                    month, day, year = int(match.group(1)), int(match.group(2)), int(match.group(3))
+
+                if 1 <= month <= 12 and 1 <= day <= 31 and 1900 <= year <= 2100:
+                    return f"{year:04d}-{month:02d}-{day:02d}", confidence
+            except (ValueError, IndexError, KeyError):
+                continue
+
+    return None, 0.0
+
+
+def legacy_extract_vendor(text: str) -> Tuple[Optional[str], float]:
+    """
+    Extract vendor/business name, looking for actual business names.
+    """
+    lines = text.strip().split("\n")
+
+    # Skip obvious header/receipt info patterns
+    skip_patterns = re.compile(
+        r"(^receipt|^invoice|^tax|^gst|^abn|issue date|payment|customer|subtotal|total|date:|#\s*\d+)",
+        re.IGNORECASE
+    )
+
+    # All known keywords across every receipt type for header matching
+    all_keywords = []
+    for keywords in module.TYPE_KEYWORDS.values():
+        all_keywords.extend(keywords)
+
+    # First pass: Look for lines with business keywords
+    for line in lines[:8]:  # Extended search range
+        line_lower = line.strip().lower()
+        cleaned = line.strip()
+
+        if not cleaned or skip_patterns.search(line_lower):
+            continue
+
+        for keyword in all_keywords:
+            if keyword in line_lower:
+                return cleaned, 0.85
+
+    # Second pass: Look for business-like names (avoid obvious receipt artifacts)
+    for line in lines[:8]:
+        cleaned = line.strip()
+        line_lower = cleaned.lower()
+
+        if (cleaned and
+            len(cleaned) >= 3 and
+            not skip_patterns.search(line_lower) and
+            not re.match(r"^[\d$./\-\s,]+$", cleaned) and
+            not re.match(r"^\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4}", cleaned) and
+            "@" not in cleaned and  # Skip email addresses
+            "+" not in cleaned):    # Skip phone numbers
+
+            # This looks like it could be a business name
+            return cleaned, 0.6
+
+    return None, 0.0
+
+
+def legacy_extract_description(text: str) -> Tuple[Optional[str], float]:
+    """
+    Build a short description from item-like lines in the receipt body.
+    Skips header/footer lines that look like totals, dates, or addresses.
+    """
+    lines = text.strip().split("\n")
+    item_lines: List[str] = []
+
+    skip_patterns = re.compile(
+        r"(^\s*$|^[\d$./\-\s,]+$|TOTAL|SUBTOTAL|TAX|CHANGE|CASH|CARD|VISA|MASTER"
+        r"|THANK|RECEIPT|ABN|GST|^\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4}|customer details"
+        r"|payment details|invoice|issue date|quantity|price|line total|australia"
+        r"|@.*\.com|^\+?\d+[\s\-\d]+$)",  # emails and phone numbers
+        re.IGNORECASE,
+    )
+
+    # Look for lines that contain actual service/item descriptions
+    service_keywords = re.compile(
+        r"(repair|fix|install|replace|service|check|design|supply|fit|wire|top|clean"
+        r"|labour|labor|parts|maintenance|oil|brake|tire|engine|window|mirror)",
+        re.IGNORECASE
+    )
+
+    # Scan all lines for service-related content
+    for line in lines:
+        stripped = line.strip()
+        if (stripped and
+            len(stripped) > 5 and  # Minimum meaningful length
+            not skip_patterns.search(stripped) and
+            (service_keywords.search(stripped) or  # Contains service keywords
+             (len(stripped) > 15 and not re.match(r"^[A-Z\s]+$", stripped)))):  # Long line, not all caps header
+
+            item_lines.append(stripped)
+
+    # If we don't have service-specific lines, fall back to general body content
+    if not item_lines:
+        body = lines[3:-3] if len(lines) > 6 else lines[2:-2] if len(lines) > 4 else lines
+        for line in body:
+            stripped = line.strip()
+            if stripped and not skip_patterns.search(stripped):
+                item_lines.append(stripped)
+
+    if not item_lines:
+        return None, 0.0
+
+    # Join first few item lines into a summary
+    description = "; ".join(item_lines[:5])
+    if len(description) > 200:
+        description = description[:197] + "..."
+
+    return description, 0.7
+
+LEGACY_EXTRACTORS = {
+    "_detect_type": legacy_detect_type,
+    "_extract_total": legacy_extract_total,
+    "_extract_date": legacy_extract_date,
+    "_extract_vendor": legacy_extract_vendor,
+    "_extract_description": legacy_extract_description,
+    "ReceiptText": lambda text: text,
+}
+
+
+def parse_legacy(texts: List[str]) -> List[Dict]:
+    """parse_receipt_text_universal with the legacy extractors swapped in"""
+    current = {name: getattr(module, name) for name in LEGACY_EXTRACTORS}
+    for name, fn in LEGACY_EXTRACTORS.items():
+        setattr(module, name, fn)
+    try:
+        return [module.parse_receipt_text_universal(text) for text in texts]
+    finally:
+        for name, fn in current.items():
+            setattr(module, name, fn)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def run(args):
+    rng = random.Random(args.seed)
+    texts = make_corpus(rng, args.receipts)
+    results = {
+        "receipts": len(texts),
+        "mean_lines": round(sum(t.count("\n") + 1 for t in texts) / len(texts), 1),
+        "mean_chars": round(sum(map(len, texts)) / len(texts)),
+    }
+
+    # Warm the fuel parser import before timing anything
+    module.parse_receipt_text_universal(texts[0])
+    expected, legacy_s = timed(parse_legacy, texts)
+    single, single_s = timed(module.parse_receipt_chunk, texts)
+    results["legacy_docs_per_sec"] = round(len(texts) / legacy_s)
+    results["single_pass_docs_per_sec"] = round(len(texts) / single_s)
+    results["single_pass_speedup"] = round(legacy_s / single_s, 2)
+
+    executor = ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        _, startup_s = timed(module.parse_receipts_batch, texts[:(args.workers + 1) * args.chunk_size], executor, args.chunk_size)
+        batch, batch_s = timed(module.parse_receipts_batch, texts, executor, args.chunk_size)
+    finally:
+        executor.shutdown()
+    results["batch"] = {
+        "workers": args.workers,
+        "chunk_size": args.chunk_size,
+        "cpu_count": os.cpu_count(),
+        "warm_up_seconds": round(startup_s, 2),
+        "docs_per_sec": round(len(texts) / batch_s),
+        "speedup_vs_legacy": round(legacy_s / batch_s, 2),
+    }
+    results["identical_to_legacy"] = single == expected and batch == expected
+    results["receipt_types"] = {t: sum(r["receipt_type"] == t for r in expected) for t in module.CATEGORY_MAP}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Universal receipt parser throughput benchmark")
+    parser.add_argument("--receipts", type=int, default=20_000)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--chunk-size", type=int, default=module.BATCH_CHUNK_SIZE)
+    parser.add_argument("--seed", type=int, default=35)
+    args = parser.parse_args()
+
+    results = run(args)
+    print(json.dumps(results, indent=2))
+
+    report_file = f"receipt_parser_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "args": vars(args), "results": results}, f, indent=2)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Retention Matrix Benchmark
+==========================
+
+Builds a synthetic user_activity table (default 1M users, first_seen spread
+over 120 days, activity decaying with age) in a scratch schema of a local
+Postgres, applies the retention bitmap migration to it, and compares:
+
+  legacy  - the old calculate_retention_rates pattern: two row-returning
+            selects per (cohort, period) cell, counted with len() client-side
+  matrix  - user_retention_matrix(): one grouped aggregate returning counts
+
+for the D1/D7/D30 dashboard and for a full 90-day x 6-period daily matrix
+and a weekly matrix. Matrix cells are checked against the generated bitmaps.
+Also times the incremental bitmap update the usage_events trigger performs.
+
+Usage:
+    TEST_DATABASE_URL=postgresql://postgres@127.0.0.1:5432/postgres \\
+        python performance_benchmarks/retention_matrix_benchmark.py --users 1000000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import asyncpg
+import numpy as np
+
+SCHEMA = "retention_bench"
+MIGRATION = Path(__file__).resolve().parents[2] / "supabase" / "migrations" / "20260320000000_user_activity_retention_bitmap.sql"
+DAILY_PERIODS = [1, 3, 7, 14, 30, 60]
+
+TABLE_DDL = f"""
+CREATE TABLE {SCHEMA}.user_activity (
+  user_id UUID PRIMARY KEY,
+  first_seen DATE NOT NULL,
+  last_seen DATE NOT NULL,
+  total_sessions INT DEFAULT 0,
+  total_voice_minutes INT DEFAULT 0,
+  total_tool_calls INT DEFAULT 0,
+  lifetime_cost_estimate DECIMAL(10,2) DEFAULT 0,
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+CREATE INDEX ON {SCHEMA}.user_activity (last_seen DESC);
+"""
+
+
+def generate_users(users: int, days: int, today: date, seed: int = 3):
+    """first_seen offsets and activity bitmaps as '0'/'1' strings (bit n = day first_seen + n)"""
+    rng = np.random.default_rng(seed)
+    age = rng.integers(0, days, size=users)  # days since first_seen
+    offsets = np.arange(days)
+    # Day-n activity probability decays like 0.6 / sqrt(n); day 0 is always active
+    p = np.minimum(1.0, 0.6 / np.sqrt(np.maximum(offsets, 1)))
+    p[0] = 1.0
+    active = rng.random((users, days)) < p
+    active &= offsets[None, :] <= age[:, None]
+    chars = (active.astype(np.uint8) + ord("0")).tobytes()
+    bitmaps = [chars[i * days:i * days + int(age[i]) + 1].decode() for i in range(users)]
+    last_active = np.where(active, offsets[None, :], -1).max(axis=1)
+    first_seen = [today - timedelta(days=int(a)) for a in age]
+    last_seen = [f + timedelta(days=int(l)) for f, l in zip(first_seen, last_active)]
+    return first_seen, last_seen, bitmaps
+
+
+async def load(pool, users: int, days: int, today: date):
+    first_seen, last_seen, bitmaps = generate_users(users, days, today)
+    records = [
+        (f"00000000-0000-4000-8000-{i:012x}", first_seen[i], last_seen[i])
+        for i in range(users)
+    ]
+    async with pool.acquire() as conn:
+        await conn.copy_records_to_table("user_activity", schema_name=SCHEMA, records=records,
+                                         columns=["user_id", "first_seen", "last_seen"])
+        await conn.execute(MIGRATION.read_text().replace("public.", f"{SCHEMA}."))
+        # Replace the DEFAULT B'1' with the generated history
+        await conn.execute(f"CREATE TEMP TABLE bitmaps (user_id UUID, bits TEXT)")
+        await conn.copy_records_to_table("bitmaps", records=[(records[i][0], bitmaps[i]) for i in range(users)])
+        await conn.execute(
+            f"UPDATE {SCHEMA}.user_activity a SET active_days = b.bits::BIT VARYING FROM bitmaps b WHERE b.user_id = a.user_id"
+        )
+        await conn.execute(f"VACUUM ANALYZE {SCHEMA}.user_activity")
+    return first_seen, bitmaps
+
+
+def expected_cell(first_seen, bitmaps, cohort: date, period: int):
+    size = retained = 0
+    for f, bits in zip(first_seen, bitmaps):
+        if f == cohort:
+            size += 1
+            retained += len(bits) > period and bits[period] == "1"
+    return size, retained
+
+
+async def timed(fn, repeats: int):
+    times, result = [], None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = await fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return result, round(statistics.median(times), 1)
+
+
+async def legacy_cells(pool, cells):
+    """Two row-returning selects per cell, counted client-side"""
+    rows_read = 0
+    for cohort, period in cells:
+        cohort_rows = await pool.fetch(f"SELECT user_id FROM {SCHEMA}.user_activity WHERE first_seen = $1", cohort)
+        returned = await pool.fetch(
+            f"SELECT user_id FROM {SCHEMA}.user_activity WHERE first_seen = $1 AND last_seen >= $2",
+            cohort, cohort + timedelta(days=period),
+        )
+        rows_read += len(cohort_rows) + len(returned)
+    return rows_read
+
+
+async def matrix(pool, start: date, end: date, granularity: str, periods, cohorts=None):
+    return await pool.fetch(
+        f"SELECT * FROM {SCHEMA}.user_retention_matrix($1, $2, $3, $4, $5)", start, end, granularity, periods, cohorts
+    )
+
+
+async def run(dsn: str, args):
+    pool = await asyncpg.create_pool(dsn, min_size=1, max_size=2, server_settings={"search_path": SCHEMA})
+    today = date.today()
+    results = {"users": args.users}
+    try:
+        await pool.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA};")
+        await pool.execute(TABLE_DDL)
+        start = time.perf_counter()
+        first_seen, bitmaps = await load(pool, args.users, args.days, today)
+        results["load_seconds"] = round(time.perf_counter() - start, 1)
+        results["bitmap_bytes_total"] = await pool.fetchval(
+            f"SELECT SUM(pg_column_size(active_days)) FROM {SCHEMA}.user_activity"
+        )
+
+        # D1 / D7 / D30 dashboard
+        dashboard_cells = [(today - timedelta(days=d), d) for d in (1, 7, 30)]
+        legacy_rows, legacy_ms = await timed(lambda: legacy_cells(pool, dashboard_cells), args.repeats)
+        _, matrix_ms = await timed(
+            lambda: matrix(pool, today - timedelta(days=30), today - timedelta(days=1), "day", [1, 7, 30],
+                           [cohort for cohort, _ in dashboard_cells]),
+            args.repeats,
+        )
+        results["dashboard_d1_d7_d30"] = {
+            "legacy_queries": 6, "legacy_rows_read": legacy_rows, "legacy_ms": legacy_ms,
+            "matrix_queries": 1, "matrix_ms": matrix_ms,
+        }
+
+        # Full 90-day daily matrix
+        cohorts = [today - timedelta(days=d) for d in range(1, 91)]
+        cells = [(c, p) for c in cohorts for p in DAILY_PERIODS if c + timedelta(days=p) <= today]
+        legacy_rows, legacy_ms = await timed(lambda: legacy_cells(pool, cells), 1)
+        rows, matrix_ms = await timed(lambda: matrix(pool, cohorts[-1], cohorts[0], "day", DAILY_PERIODS), args.repeats)
+        results["daily_matrix_90x6"] = {
+            "cells": len(cells), "legacy_queries": 2 * len(cells), "legacy_rows_read": legacy_rows,
+            "legacy_ms": legacy_ms, "matrix_rows_returned": len(rows), "matrix_ms": matrix_ms,
+        }
+
+        # Weekly cohorts, W0..W12
+        weekly, weekly_ms = await timed(
+            lambda: matrix(pool, today - timedelta(days=91), today, "week", list(range(13))), args.repeats
+        )
+        results["weekly_matrix_13x13"] = {"matrix_rows_returned": len(weekly), "matrix_ms": weekly_ms}
+
+        # Spot-check cells against the generated bitmaps
+        by_cell = {(r["cohort_start"], r["period"]): (r["cohort_size"], r["retained"]) for r in rows}
+        checks = [(today - timedelta(days=d), p) for d, p in ((8, 7), (31, 30), (61, 60), (15, 1))]
+        results["cells_match_generated_data"] = all(
+            by_cell[cell] == expected_cell(first_seen, bitmaps, *cell) for cell in checks
+        )
+
+        # Incremental maintenance: what the usage_events trigger does for one active day of users
+        sample = min(args.users, 50_000)
+        start = time.perf_counter()
+        await pool.execute(
+            f"UPDATE {SCHEMA}.user_activity SET last_seen = CURRENT_DATE, "
+            f"active_days = {SCHEMA}.activity_bitmap_set(active_days, CURRENT_DATE - first_seen) "
+            f"WHERE user_id IN (SELECT user_id FROM {SCHEMA}.user_activity LIMIT {sample})"
+        )
+        bitmap_update = time.perf_counter() - start
+        start = time.perf_counter()
+        await pool.execute(
+            f"UPDATE {SCHEMA}.user_activity SET last_seen = CURRENT_DATE "
+            f"WHERE user_id IN (SELECT user_id FROM {SCHEMA}.user_activity LIMIT {sample})"
+        )
+        plain_update = time.perf_counter() - start
+        results["incremental_update_us_per_user"] = {
+            "with_bitmap": round(bitmap_update / sample * 1e6, 2),
+            "last_seen_only": round(plain_update / sample * 1e6, 2),
+        }
+        return results
+    finally:
+        if not args.keep:
+            await pool.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await pool.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cohort retention matrix benchmark")
+    parser.add_argument("--dsn", default=os.getenv("TEST_DATABASE_URL", "postgresql://postgres@127.0.0.1:5432/postgres"))
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=120, help="Spread of first_seen dates")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch schema")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.dsn, args))
+    print(json.dumps(results, indent=2))
+
+    report_file = f"retention_matrix_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "results": results}, f, indent=2)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
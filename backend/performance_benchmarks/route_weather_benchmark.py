@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Route Weather Benchmark
+=======================
+
+Starts a local fake OpenMeteo server (fixed simulated latency per request,
+answering one or many comma-separated coordinates like the real API) and
+fetches the weather along synthetic 10, 100 and 1000-point routes of about
+1000 km:
+
+  legacy - one request per route point, one after another, each on a fresh
+           aiohttp session (the old _get_route_weather loop, without its
+           10-point cap so the whole route is covered)
+  cold   - RouteWeatherService with empty caches: samples every interval,
+           snaps to weather cells and fetches the cells in concurrent batches
+  warm   - the same route again within the hour (served from the cell cache)
+
+Routes are given as coordinates, so no geocoding is involved.
+
+Usage:
+    python performance_benchmarks/route_weather_benchmark.py --latency-ms 40 --points 10 100 1000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+from datetime import datetime
+
+import aiohttp
+
+# Add backend to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.http_clients import UpstreamConfig, http_clients
+from app.services.pam.tools.route_weather import CellWeatherCache, OpenMeteoBatchClient, RouteWeatherService
+
+START = (-33.8688, 151.2093)  # Sydney
+END = (-31.9539, 141.4539)  # Broken Hill
+
+SERVER_APP = textwrap.dedent("""
+    import asyncio, json, sys
+    from urllib.parse import parse_qs
+    LATENCY = float(sys.argv[1]) / 1000
+    REQUESTS = {"count": 0, "locations": 0}
+
+    def conditions(lat, lon):
+        return {"latitude": lat, "longitude": lon,
+                "current_weather": {"temperature": 68.0, "windspeed": 9.5, "winddirection": 240,
+                                    "weathercode": 2, "is_day": 1, "time": "2026-03-20T10:00"},
+                "hourly": {"time": ["2026-03-20T%02d:00" % h for h in range(24)],
+                           "relativehumidity_2m": [45] * 24, "visibility": [24000] * 24,
+                           "windgusts_10m": [18.0] * 24}}
+
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        if scope["path"] == "/stats":
+            body = json.dumps(REQUESTS).encode()
+        else:
+            query = parse_qs(scope["query_string"].decode())
+            lats = [float(v) for v in query["latitude"][0].split(",")]
+            lons = [float(v) for v in query["longitude"][0].split(",")]
+            REQUESTS["count"] += 1
+            REQUESTS["locations"] += len(lats)
+            await asyncio.sleep(LATENCY)
+            payloads = [conditions(a, b) for a, b in zip(lats, lons)]
+            body = json.dumps(payloads if len(payloads) > 1 else payloads[0]).encode()
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/json")]})
+        await send({"type": "http.response.body", "body": body})
+
+    if __name__ == "__main__":
+        import uvicorn
+        uvicorn.run(app, host="127.0.0.1", port=int(sys.argv[2]), log_level="warning", access_log=False)
+""")
+
+
+class MemoryCache:
+    """Stands in for Redis so runs are independent"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ttl=None):
+        self.data[key] = value
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_server(port: int, timeout: float = 15.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("fake weather server did not start")
+
+
+def make_route(points: int, seed: int = 3):
+    """A polyline of `points` vertices from START to END with small lateral wiggle"""
+    rng = random.Random(seed)
+    route = []
+    for i in range(points):
+        t = i / max(points - 1, 1)
+        wiggle = 0.0 if i in (0, points - 1) else rng.uniform(-0.02, 0.02)
+        route.append((START[0] + (END[0] - START[0]) * t + wiggle, START[1] + (END[1] - START[1]) * t))
+    return route
+
+
+async def server_stats(session: aiohttp.ClientSession, base_url: str):
+    async with session.get(f"{base_url}/stats") as response:
+        return await response.json()
+
+
+async def legacy(route, base_url: str):
+    """The old loop: one fresh session and one request per point, serially"""
+    for lat, lon in route:
+        params = {"latitude": lat, "longitude": lon, "current_weather": "true",
+                  "hourly": "relativehumidity_2m,visibility,windgusts_10m", "forecast_days": 1,
+                  "temperature_unit": "fahrenheit", "windspeed_unit": "mph"}
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"{base_url}/v1/forecast", params=params) as response:
+                await response.json()
+
+
+async def measure(call, base_url, stats_session):
+    before = await server_stats(stats_session, base_url)
+    start = time.perf_counter()
+    samples = await call()
+    elapsed = time.perf_counter() - start
+    after = await server_stats(stats_session, base_url)
+    return {
+        "wall_ms": round(elapsed * 1000, 1),
+        "upstream_requests": after["count"] - before["count"],
+        "locations_fetched": after["locations"] - before["locations"],
+        "samples": samples,
+    }
+
+
+async def run(args, base_url: str):
+    http_clients.upstreams["openmeteo"] = UpstreamConfig(base_url=base_url, max_concurrency=10, http2=False)
+    results = {"upstream_latency_ms": args.latency_ms, "interval_km": args.interval_km, "routes": {}}
+
+    async with aiohttp.ClientSession() as stats_session:
+        # Open the pooled connection (and build its SSL context) before measuring
+        await OpenMeteoBatchClient().current([START], "imperial")
+        for points in args.points:
+            route = make_route(points)
+            service = RouteWeatherService(OpenMeteoBatchClient(args.batch_size), CellWeatherCache(MemoryCache()),
+                                          interval_km=args.interval_km)
+
+            async def legacy_call():
+                await legacy(route, base_url)
+                return len(route)
+
+            async def service_call():
+                return len(await service.route_weather(route, "imperial"))
+
+            entry = {
+                "legacy": await measure(legacy_call, base_url, stats_session),
+                "cold": await measure(service_call, base_url, stats_session),
+                "warm": await measure(service_call, base_url, stats_session),
+                "service_stats": service.get_stats(),
+            }
+            entry["speedup_cold"] = round(entry["legacy"]["wall_ms"] / entry["cold"]["wall_ms"], 1)
+            entry["speedup_warm"] = round(entry["legacy"]["wall_ms"] / max(entry["warm"]["wall_ms"], 0.01), 1)
+            results["routes"][str(points)] = entry
+            print(f"{points:>5} points: legacy {entry['legacy']['wall_ms']:>9.1f} ms "
+                  f"({entry['legacy']['upstream_requests']} req), cold {entry['cold']['wall_ms']:>7.1f} ms "
+                  f"({entry['cold']['upstream_requests']} req, {entry['cold']['samples']} samples), "
+                  f"warm {entry['warm']['wall_ms']:>6.2f} ms ({entry['warm']['upstream_requests']} req)")
+
+    await http_clients.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Route weather sampling benchmark")
+    parser.add_argument("--points", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="Simulated upstream processing time")
+    parser.add_argument("--interval-km", type=float, default=25.0)
+    parser.add_argument("--batch-size", type=int, default=50)
+    args = parser.parse_args()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server_script = os.path.join(tmp, "fake_openmeteo.py")
+        with open(server_script, "w") as f:
+            f.write(SERVER_APP)
+        port = free_port()
+        proc = subprocess.Popen([sys.executable, server_script, str(args.latency_ms), str(port)])
+        try:
+            wait_for_server(port)
+            results = asyncio.run(run(args, f"http://127.0.0.1:{port}"))
+        finally:
+            proc.terminate()
+            proc.wait(timeout=10)
+
+    print(json.dumps(results, indent=2))
+
+    report_file = f"route_weather_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "args": vars(args), "results": results}, f, indent=2)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Session Sweep Benchmark
+=======================
+
+Loads a local Redis with synthetic sessions (default 1M sessions over 400k
+users, half of them past expiry) under a scratch key prefix, then compares
+expired-session cleanup in SecureSessionManager:
+
+  legacy - the old _cleanup_expired_sessions: KEYS user_sessions:* and a GET
+           (plus ZREM / ZCARD) per session; KEYS runs on the full keyspace,
+           the per-session loop on --legacy-users users and is extrapolated
+  sweep  - sweep_expired_sessions(): Lua batches over the expiry index
+
+Redis-side stall time is read from SLOWLOG (every command is logged during
+the run), and a probe task pings Redis every millisecond to measure what
+other clients see. Also compares one-at-a-time vs pipelined invalidation.
+
+All keys use a scratch prefix and are deleted afterwards with SCAN/UNLINK.
+
+Usage:
+    python performance_benchmarks/session_sweep_benchmark.py --redis-url redis://localhost:6379 --sessions 1000000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import redis.asyncio as redis
+
+# Add backend to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.auth.session_manager import SWEEP_EXPIRED_SCRIPT, SecureSessionManager, SessionInfo
+
+PREFIX = "sessbench:"
+
+
+def make_manager(client, batch_size: int) -> SecureSessionManager:
+    manager = SecureSessionManager()
+    manager.redis_client = client
+    manager.sweep_batch_size = batch_size
+    manager.session_prefix = f"{PREFIX}session:"
+    manager.user_sessions_prefix = f"{PREFIX}user_sessions:"
+    manager.blacklist_prefix = f"{PREFIX}blacklist_jti:"
+    manager.cleanup_key = f"{PREFIX}session_cleanup:last_run"
+    manager.expiry_key = f"{PREFIX}session_expiry"
+    manager.expiry_backfill_key = f"{PREFIX}session_expiry:backfilled"
+    return manager
+
+
+async def load(manager, client, sessions: int, users: int, expired_share: float, seed: int = 34):
+    """Write sessions straight through pipelines; expired ones keep their key (as if just past expiry)"""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    expired_ids = []
+    chunk = 5000
+    for start in range(0, sessions, chunk):
+        async with client.pipeline(transaction=False) as pipe:
+            for _ in range(min(chunk, sessions - start)):
+                user_id = str(uuid.UUID(int=rng.randrange(users)))
+                session_id = str(uuid.uuid4())
+                expired = rng.random() < expired_share
+                created = now - timedelta(hours=30 if expired else rng.uniform(0, 20))
+                info = SessionInfo(
+                    session_id=session_id, user_id=user_id, jti=str(uuid.uuid4()),
+                    created_at=created, last_activity=created, expires_at=created + manager.session_timeout,
+                    user_agent="Mozilla/5.0 (benchmark)", ip_address="10.0.0.1",
+                )
+                pipe.setex(f"{manager.session_prefix}{session_id}", 3600 if expired else 86400, json.dumps(info.to_dict()))
+                pipe.zadd(f"{manager.user_sessions_prefix}{user_id}", {session_id: created.timestamp()})
+                pipe.zadd(manager.expiry_key, {manager._expiry_member(session_id, user_id): info.expires_at.timestamp()})
+                if expired:
+                    expired_ids.append(session_id)
+            await pipe.execute()
+    return expired_ids
+
+
+async def legacy_cleanup(manager, client, user_session_keys):
+    """The removed per-session loop (without its KEYS call, which is timed separately)"""
+    now = datetime.now(timezone.utc)
+    cleaned = 0
+    for user_sessions_key in user_session_keys:
+        for session_id in await client.zrange(user_sessions_key, 0, -1):
+            session_info = await manager.get_session(session_id)
+            if not session_info or (session_info.expires_at and session_info.expires_at < now):
+                await client.zrem(user_sessions_key, session_id)
+                cleaned += 1
+        if await client.zcard(user_sessions_key) == 0:
+            await client.delete(user_sessions_key)
+    return cleaned
+
+
+async def legacy_invalidate(manager, client, session_id):
+    """The removed invalidate_session: GET, DEL, ZREM, SETEX"""
+    session_info = await manager.get_session(session_id)
+    if not session_info:
+        return False
+    await client.delete(f"{manager.session_prefix}{session_id}")
+    await client.zrem(f"{manager.user_sessions_prefix}{session_info.user_id}", session_id)
+    await client.setex(f"{manager.blacklist_prefix}{session_info.jti}", 86400, "1")
+    return True
+
+
+async def probe(url: str, stop: asyncio.Event, samples: list):
+    client = redis.from_url(url)
+    try:
+        while not stop.is_set():
+            start = time.perf_counter()
+            await client.ping()
+            samples.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.001)
+    finally:
+        await client.close()
+
+
+async def slowlog_durations_ms(client, command: str):
+    entries = await client.slowlog_get(100_000)
+    durations = []
+    for entry in entries:
+        name = entry["command"]
+        name = name.decode() if isinstance(name, bytes) else name
+        if name.upper().startswith(command):
+            durations.append(entry["duration"] / 1000)
+    return durations
+
+
+async def cleanup_keys(client):
+    async for keys in _batched(client.scan_iter(f"{PREFIX}*", count=5000), 5000):
+        await client.unlink(*keys)
+
+
+async def _batched(iterator, size):
+    batch = []
+    async for item in iterator:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def run(args):
+    client = redis.from_url(args.redis_url, decode_responses=True)
+    manager = make_manager(client, args.batch_size)
+    results = {"sessions": args.sessions, "users": args.users, "batch_size": args.batch_size}
+    config = await client.config_get("slowlog-*")
+    try:
+        await cleanup_keys(client)
+        start = time.perf_counter()
+        expired_ids = await load(manager, client, args.sessions, args.users, args.expired_share)
+        results["load_seconds"] = round(time.perf_counter() - start, 1)
+        results["expired_sessions"] = len(expired_ids)
+        results["redis_keys"] = await client.dbsize()
+
+        # Pipelined vs one-at-a-time invalidation (on sessions that are expired anyway)
+        sample = expired_ids[:args.invalidate_sample]
+        half = len(sample) // 2
+        start = time.perf_counter()
+        for session_id in sample[:half]:
+            await legacy_invalidate(manager, client, session_id)
+        legacy_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        for i in range(half, len(sample), 100):
+            await manager.invalidate_sessions(sample[i:i + 100])
+        pipelined_ms = (time.perf_counter() - start) * 1000
+        results["invalidate_us_per_session"] = {
+            "one_at_a_time": round(legacy_ms / half * 1000, 1),
+            "pipelined_batches_of_100": round(pipelined_ms / (len(sample) - half) * 1000, 1),
+        }
+
+        await client.config_set("slowlog-log-slower-than", 0)
+        await client.config_set("slowlog-max-len", 100_000)
+
+        # Legacy: KEYS blocks Redis for the whole keyspace walk
+        await client.slowlog_reset()
+        start = time.perf_counter()
+        user_session_keys = await client.keys(f"{manager.user_sessions_prefix}*")
+        keys_ms = (time.perf_counter() - start) * 1000
+        keys_server_ms = max(await slowlog_durations_ms(client, "KEYS"))
+        subset = user_session_keys[:args.legacy_users]
+        sessions_in_subset = sum(await asyncio.gather(*(client.zcard(k) for k in subset)))
+        start = time.perf_counter()
+        legacy_cleaned = await legacy_cleanup(manager, client, subset)
+        loop_s = time.perf_counter() - start
+        results["legacy"] = {
+            "keys_round_trip_ms": round(keys_ms, 1),
+            "keys_redis_blocked_ms": round(keys_server_ms, 1),
+            "users_processed": len(subset),
+            "sessions_processed": sessions_in_subset,
+            "cleaned": legacy_cleaned,
+            "loop_seconds": round(loop_s, 2),
+            "projected_full_cleanup_seconds": round(loop_s * len(user_session_keys) / max(len(subset), 1), 1),
+        }
+
+        # Sweep, with a probe measuring what other clients see
+        script, call_ms = client.register_script(SWEEP_EXPIRED_SCRIPT), []
+
+        async def timed_script(**kwargs):
+            start = time.perf_counter()
+            swept = await script(**kwargs)
+            call_ms.append((time.perf_counter() - start) * 1000)
+            return swept
+
+        manager._sweep_script = timed_script
+        await client.slowlog_reset()
+        stop, pings = asyncio.Event(), []
+        probe_task = asyncio.create_task(probe(args.redis_url, stop, pings))
+        await asyncio.sleep(0.2)
+        baseline = list(pings)
+        start = time.perf_counter()
+        swept = await manager.sweep_expired_sessions()
+        sweep_s = time.perf_counter() - start
+        stop.set()
+        await probe_task
+        durations = await slowlog_durations_ms(client, "EVALSHA")
+        during = pings[len(baseline):]
+        results["sweep"] = {
+            "swept": swept,
+            "seconds": round(sweep_s, 2),
+            "sessions_per_second": round(swept / sweep_s),
+            "batches": len(call_ms),
+            "batch_round_trip_ms_median": round(statistics.median(call_ms), 2),
+            "script_ms_median": round(statistics.median(durations), 2),
+            "script_ms_max": round(max(durations), 2),
+            "slowlog_entries": len(durations),
+            "probe_ping_ms_baseline_p50": round(statistics.median(baseline), 2) if baseline else None,
+            "probe_ping_ms_p99": round(sorted(during)[int(0.99 * (len(during) - 1))], 2),
+            "probe_ping_ms_max": round(max(during), 2),
+        }
+
+        # Everything left is live and consistent
+        remaining_due = await client.zcount(manager.expiry_key, "-inf", time.time())
+        results["after_sweep"] = {
+            "due_in_index": remaining_due,
+            "indexed_sessions": await client.zcard(manager.expiry_key),
+            "stats": await manager.get_session_stats(),
+        }
+        return results
+    finally:
+        await client.config_set("slowlog-log-slower-than", config["slowlog-log-slower-than"])
+        await client.config_set("slowlog-max-len", config["slowlog-max-len"])
+        await client.slowlog_reset()
+        await cleanup_keys(client)
+        await client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Expired session sweep benchmark")
+    parser.add_argument("--redis-url", default=os.getenv("REDIS_URL", "redis://localhost:6379"))
+    parser.add_argument("--sessions", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=400_000)
+    parser.add_argument("--expired-share", type=float, default=0.5)
+    parser.add_argument("--batch-size", type=int, default=100, help="Sessions per Lua sweep batch")
+    parser.add_argument("--legacy-users", type=int, default=20_000, help="Users walked by the legacy loop")
+    parser.add_argument("--invalidate-sample", type=int, default=10_000)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2, default=str))
+
+    report_file = f"session_sweep_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "args": vars(args), "results": results}, f, indent=2, default=str)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
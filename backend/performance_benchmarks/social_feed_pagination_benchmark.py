@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Social Feed Pagination Benchmark
+================================
+
+Compares OFFSET paging (the old get_feed path) with keyset paging on
+(created_at, id) for page 1 and page 500 of the social feed, against a
+synthetic posts table in a local Postgres.
+
+Two feeds are measured:
+- all:       global feed, ORDER BY created_at DESC, id DESC
+- following: posts by the ~200 authors a reader follows (same query shape as
+             get_following_feed_keyset)
+
+The scratch tables get the same indexes as the keyset pagination migration.
+Reports p50/p99 latency per (feed, mode, page).
+
+Usage:
+    TEST_DATABASE_URL=postgresql://postgres@127.0.0.1:5432/postgres \\
+        python performance_benchmarks/social_feed_pagination_benchmark.py --posts 5000000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from datetime import datetime
+
+import asyncpg
+
+POSTS = "feed_benchmark_posts"
+FOLLOWS = "feed_benchmark_follows"
+READER = "00000000-0000-0000-0000-000000000001"
+
+SCHEMA = f"""
+CREATE TABLE {POSTS} (
+    id UUID PRIMARY KEY,
+    user_id UUID NOT NULL,
+    content TEXT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL
+);
+CREATE TABLE {FOLLOWS} (
+    follower_id UUID NOT NULL,
+    following_id UUID NOT NULL
+);
+"""
+
+INDEXES = f"""
+CREATE INDEX ON {POSTS} (created_at DESC, id DESC);
+CREATE INDEX ON {POSTS} (user_id, created_at DESC, id DESC);
+CREATE INDEX ON {FOLLOWS} (follower_id, following_id);
+ANALYZE {POSTS};
+ANALYZE {FOLLOWS};
+"""
+
+FOLLOWING = f"user_id IN (SELECT following_id FROM {FOLLOWS} WHERE follower_id = '{READER}')"
+
+QUERIES = {
+    ("all", "offset"): f"SELECT * FROM {POSTS} ORDER BY created_at DESC, id DESC OFFSET $1 LIMIT $2",
+    ("all", "keyset"): (
+        f"SELECT * FROM {POSTS} WHERE ($1::timestamptz IS NULL OR (created_at, id) < ($1, $2::uuid)) "
+        f"ORDER BY created_at DESC, id DESC LIMIT $3"
+    ),
+    ("following", "offset"): (
+        f"SELECT * FROM {POSTS} WHERE {FOLLOWING} ORDER BY created_at DESC, id DESC OFFSET $1 LIMIT $2"
+    ),
+    ("following", "keyset"): (
+        f"SELECT * FROM {POSTS} WHERE {FOLLOWING} "
+        f"AND ($1::timestamptz IS NULL OR (created_at, id) < ($1, $2::uuid)) "
+        f"ORDER BY created_at DESC, id DESC LIMIT $3"
+    ),
+}
+
+
+async def build_dataset(conn, posts: int, authors: int, followed: int):
+    await conn.execute(f"DROP TABLE IF EXISTS {POSTS}; DROP TABLE IF EXISTS {FOLLOWS}")
+    await conn.execute(SCHEMA)
+    start = time.perf_counter()
+    # Deterministic author ids; one post per second going back from now
+    await conn.execute(f"""
+        INSERT INTO {POSTS} (id, user_id, content, created_at)
+        SELECT gen_random_uuid(),
+               ('00000000-0000-0000-0001-' || lpad(to_hex(g % {authors}), 12, '0'))::uuid,
+               'Synthetic post ' || g,
+               now() - g * interval '1 second'
+        FROM generate_series(1, {posts}) g
+    """)
+    await conn.execute(f"""
+        INSERT INTO {FOLLOWS} (follower_id, following_id)
+        SELECT '{READER}'::uuid, ('00000000-0000-0000-0001-' || lpad(to_hex(a * {authors // followed}), 12, '0'))::uuid
+        FROM generate_series(0, {followed - 1}) a
+    """)
+    await conn.execute(INDEXES)
+    return round(time.perf_counter() - start, 1)
+
+
+async def keyset_cursor(conn, feed: str, page: int, limit: int):
+    """Sort key of the last row before `page`, found by walking the keyset pages"""
+    cursor = (None, None)
+    for _ in range(page - 1):
+        rows = await conn.fetch(QUERIES[(feed, "keyset")], cursor[0], cursor[1], limit)
+        cursor = (rows[-1]["created_at"], rows[-1]["id"])
+    return cursor
+
+
+async def measure(conn, feed: str, mode: str, page: int, limit: int, samples: int):
+    sql = QUERIES[(feed, mode)]
+    if mode == "offset":
+        args = ((page - 1) * limit, limit)
+    else:
+        args = (*(await keyset_cursor(conn, feed, page, limit)), limit)
+
+    stmt = await conn.prepare(sql)
+    await stmt.fetch(*args)  # warm cache and plan
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        rows = await stmt.fetch(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    assert len(rows) == limit, f"{feed}/{mode} page {page} returned {len(rows)} rows"
+
+    timings.sort()
+    return {
+        "feed": feed,
+        "mode": mode,
+        "page": page,
+        "p50_ms": round(statistics.median(timings), 3),
+        "p99_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.99))], 3),
+    }
+
+
+async def run(dsn: str, posts: int, authors: int, followed: int, pages, limit: int, samples: int, keep: bool):
+    conn = await asyncpg.connect(dsn)
+    results = {"posts": posts, "authors": authors, "followed": followed, "limit": limit, "samples": samples}
+    try:
+        results["build_seconds"] = await build_dataset(conn, posts, authors, followed)
+        print(f"Built {posts} posts in {results['build_seconds']}s")
+        results["measurements"] = []
+        for feed in ("all", "following"):
+            for mode in ("offset", "keyset"):
+                for page in pages:
+                    m = await measure(conn, feed, mode, page, limit, samples)
+                    results["measurements"].append(m)
+                    print(f"{feed:<10} {mode:<7} page {page:>4}  p50 {m['p50_ms']:9.3f} ms  p99 {m['p99_ms']:9.3f} ms")
+    finally:
+        if not keep:
+            await conn.execute(f"DROP TABLE IF EXISTS {POSTS}; DROP TABLE IF EXISTS {FOLLOWS}")
+        await conn.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Social feed offset vs keyset pagination benchmark")
+    parser.add_argument("--dsn", default=os.getenv("TEST_DATABASE_URL", "postgresql://postgres@127.0.0.1:5432/postgres"))
+    parser.add_argument("--posts", type=int, default=5_000_000)
+    parser.add_argument("--authors", type=int, default=50_000)
+    parser.add_argument("--followed", type=int, default=200)
+    parser.add_argument("--pages", nargs="+", type=int, default=[1, 500])
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch tables for inspection")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(
+        args.dsn, args.posts, args.authors, args.followed, args.pages, args.limit, args.samples, args.keep
+    ))
+
+    report_file = f"social_feed_pagination_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "results": results}, f, indent=2)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Text Search Benchmark
+=====================
+
+Loads synthetic medical records, recipes and affiliate products (1M rows
+each by default, words drawn from a Zipf-like vocabulary so search terms
+range from very common to rare) into a scratch schema of a local Postgres
+and compares, per frequency band of the searched words:
+
+  legacy - the old PostgREST filters: `ilike '%term%'` OR chains over
+           ocr_text/title/summary for a user's medical records, title or
+           description for recipes (newest 3x limit rows, allergens and
+           dietary restrictions then dropped in Python) and products
+  ranked - the text_search_indexes migration applied to the same rows: the
+           *_ranked RPCs over the stored search vectors (GIN-indexed
+           for recipes and products, per-user scans for medical), with
+           allergen/restriction filters on the indexed arrays
+
+Also reports the migration's build time, index sizes and the per-row cost
+the generated search columns add to INSERTs.
+
+Usage:
+    TEST_DATABASE_URL=postgresql://postgres@127.0.0.1:5432/postgres \\
+        python performance_benchmarks/text_search_benchmark.py --documents 1000000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+
+import asyncpg
+
+# Add backend to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.text_search import ingredient_terms, search_terms
+
+SCHEMA = "text_search_bench"
+MIGRATION = Path(__file__).resolve().parents[2] / "supabase" / "migrations" / "20260330000000_text_search_indexes.sql"
+TABLES = ("medical_records", "recipes", "affiliate_products")
+# Vocabulary ranks each band's search words are drawn from (1 = most common)
+BANDS = {"common": (10, 50), "medium": (300, 1_000), "rare": (10_000, 30_000)}
+DIETARY_TAGS = ["vegan", "vegetarian", "gluten-free", "dairy-free", "keto"]
+ALLERGENS = ["peanuts", "shellfish"]
+
+TABLE_DDL = f"""
+CREATE TABLE {SCHEMA}.medical_records (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  user_id UUID NOT NULL,
+  type TEXT NOT NULL,
+  title TEXT NOT NULL,
+  summary TEXT,
+  tags TEXT[],
+  test_date TIMESTAMPTZ,
+  document_url TEXT,
+  content_json JSONB,
+  ocr_text TEXT,
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+CREATE INDEX ON {SCHEMA}.medical_records (user_id);
+CREATE TABLE {SCHEMA}.recipes (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  user_id UUID NOT NULL,
+  title TEXT NOT NULL,
+  description TEXT,
+  ingredients JSONB NOT NULL,
+  instructions JSONB NOT NULL,
+  prep_time_minutes INTEGER,
+  meal_type TEXT[],
+  cuisine TEXT,
+  dietary_tags TEXT[],
+  is_public BOOLEAN DEFAULT false,
+  shared_with UUID[],
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+CREATE INDEX ON {SCHEMA}.recipes (user_id);
+CREATE INDEX ON {SCHEMA}.recipes USING GIN (meal_type);
+CREATE INDEX ON {SCHEMA}.recipes USING GIN (dietary_tags);
+CREATE INDEX ON {SCHEMA}.recipes (is_public) WHERE is_public = true;
+CREATE INDEX ON {SCHEMA}.recipes USING GIN (shared_with);
+CREATE TYPE {SCHEMA}.product_category AS ENUM ('tools_maintenance', 'camping_expedition', 'recovery_gear',
+  'parts_upgrades', 'safety_equipment', 'power_electronics', 'comfort_living', 'navigation_tech');
+CREATE TABLE {SCHEMA}.affiliate_products (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  title TEXT NOT NULL,
+  description TEXT,
+  short_description TEXT,
+  category {SCHEMA}.product_category NOT NULL,
+  price NUMERIC,
+  image_url TEXT,
+  affiliate_url TEXT NOT NULL,
+  is_active BOOLEAN DEFAULT true,
+  tags TEXT[],
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+CREATE INDEX ON {SCHEMA}.affiliate_products (category);
+CREATE INDEX ON {SCHEMA}.affiliate_products (is_active);
+CREATE INDEX ON {SCHEMA}.affiliate_products (created_at);
+
+"""
+
+COLUMNS = {
+    "medical_records": ["user_id", "type", "title", "summary", "test_date", "content_json", "ocr_text"],
+    "recipes": ["user_id", "title", "description", "ingredients", "instructions", "prep_time_minutes",
+                "meal_type", "cuisine", "dietary_tags", "is_public", "created_at"],
+    "affiliate_products": ["title", "short_description", "description", "category", "price", "affiliate_url",
+                           "is_active", "created_at"],
+}
+RECORD_TYPES = ["document", "lab_result", "prescription", "doctor_note", "imaging"]
+MEAL_TYPES = ["breakfast", "lunch", "dinner", "snack"]
+CUISINES = ["italian", "thai", "mexican", "indian", "australian"]
+CATEGORIES = ["tools_maintenance", "camping_expedition", "recovery_gear", "parts_upgrades", "safety_equipment",
+              "power_electronics", "comfort_living", "navigation_tech"]
+
+
+class Corpus:
+    """Synthetic rows; word rank r is drawn with probability ~ 1 / r"""
+
+    def __init__(self, vocab, ingredients, users, seed):
+        self.vocab = vocab
+        self.ingredients = ingredients
+        self.users = users
+        self.rng = random.Random(seed)
+        self.now = datetime.now(timezone.utc)
+        total, self.cum_weights = 0.0, []
+        for rank in range(1, len(vocab) + 1):
+            total += 1 / rank
+            self.cum_weights.append(total)
+
+    def words(self, n):
+        return " ".join(self.rng.choices(self.vocab, cum_weights=self.cum_weights, k=n))
+
+    def row(self, table, g):
+        rng = self.rng
+        if table == "medical_records":
+            return (self.users[g % len(self.users)], RECORD_TYPES[g % 5], self.words(3), self.words(10),
+                    self.now - timedelta(days=g % 2000), '{"findings": []}' if g % 3 == 0 else None,
+                    self.words(60) if g % 5 else None)
+        if table == "recipes":
+            ingredients = [{"name": rng.choice(self.ingredients), "quantity": 1, "unit": "cup"}
+                           for _ in range(4 + g % 7)]
+            return (self.users[g % len(self.users)], self.words(4), self.words(25), json.dumps(ingredients), "[]",
+                    5 + g % 90, [m for m in MEAL_TYPES if rng.random() < 0.4], CUISINES[g % 5],
+                    [t for t in DIETARY_TAGS if rng.random() < 0.3], g % 5 == 0,
+                    self.now - timedelta(minutes=g % 100_000))
+        return (self.words(5), self.words(10), self.words(40), CATEGORIES[g % 8], Decimal(5 + g % 995),
+                f"https://example.com/p/{g}", g % 20 != 0, self.now - timedelta(minutes=g % 100_000))
+
+
+def make_vocabulary(size: int, rng: random.Random):
+    """Distinct pronounceable synthetic words; list position is frequency rank"""
+    consonants, vowels = "bdfgklmnprstvz", "aeiou"
+    words = set()
+    while len(words) < size:
+        syllables = rng.randint(2, 4)
+        words.add("".join(rng.choice(consonants) + rng.choice(vowels) for _ in range(syllables)))
+    words = sorted(words)
+    rng.shuffle(words)
+    return words
+
+
+def make_ingredients(vocab, rng: random.Random):
+    names = [" ".join(rng.sample(vocab[:2000], rng.randint(1, 2))) for _ in range(400)]
+    # A few allergen-bearing names, in the forms people write them
+    return names + ["peanut butter", "salted peanuts", "peanut oil", "prawns", "shellfish stock"]
+
+
+def migration_sql() -> str:
+    return MIGRATION.read_text().replace("public.", f"{SCHEMA}.")
+
+
+def sample_queries(vocab, count: int, rng: random.Random):
+    queries = {}
+    for band, (low, high) in BANDS.items():
+        queries[band] = [vocab[rng.randrange(low, high) - 1] for _ in range(count)]
+    queries["two_words"] = [f"{vocab[rng.randrange(10, 300) - 1]} {vocab[rng.randrange(10, 300) - 1]}"
+                            for _ in range(count)]
+    return queries
+
+
+async def fetch_json(conn, query, *params):
+    """Rows serialised to JSON server-side and parsed client-side, as through PostgREST"""
+    payload = await conn.fetchval(f"SELECT COALESCE(json_agg(q), '[]') FROM ({query}) q", *params)
+    return json.loads(payload), len(payload)
+
+
+async def measure(call, queries):
+    times, sizes, rows = [], [], []
+    for query in queries:
+        start = time.perf_counter()
+        result, size = await call(query)
+        times.append((time.perf_counter() - start) * 1000)
+        sizes.append(size)
+        rows.append(len(result))
+    times.sort()
+    return {
+        "p50_ms": round(statistics.median(times), 2),
+        "p95_ms": round(times[min(len(times) - 1, int(len(times) * 0.95))], 2),
+        "mean_rows": round(statistics.mean(rows), 1),
+        "mean_bytes": round(statistics.mean(sizes)),
+    }
+
+
+def legacy_medical(conn, user_id):
+    async def call(query):
+        terms = search_terms(query)
+        patterns = [f"%{term}%" for term in terms]
+        clauses = " OR ".join(f"ocr_text ILIKE ${i + 2} OR title ILIKE ${i + 2} OR summary ILIKE ${i + 2}"
+                              for i in range(len(patterns)))
+        return await fetch_json(
+            conn, f"SELECT id, type, title, summary, tags, test_date, ocr_text, content_json "
+                  f"FROM {SCHEMA}.medical_records WHERE user_id = $1 AND ({clauses}) LIMIT 10",
+            user_id, *patterns)
+    return call
+
+
+def ranked_medical(conn, user_id):
+    async def call(query):
+        return await fetch_json(conn, f"SELECT * FROM {SCHEMA}.search_medical_records_ranked($1, $2, 10)",
+                                user_id, search_terms(query))
+    return call
+
+
+def legacy_recipes(conn, restrictions, allergies, limit=10):
+    async def call(query):
+        rows, size = await fetch_json(
+            conn, f"SELECT * FROM {SCHEMA}.recipes WHERE (title ILIKE $1 OR description ILIKE $1) "
+                  f"ORDER BY created_at DESC LIMIT {limit * 3}", f"%{query}%")
+        kept = []
+        for recipe in rows:
+            ingredients = str(recipe.get("ingredients", [])).lower()
+            if any(allergen.lower() in ingredients for allergen in allergies):
+                continue
+            if not all(tag in (recipe.get("dietary_tags") or []) for tag in restrictions):
+                continue
+            kept.append(recipe)
+            if len(kept) >= limit:
+                break
+        return kept, size
+    return call
+
+
+def ranked_recipes(conn, user_id, restrictions, allergies, limit=10):
+    async def call(query):
+        return await fetch_json(
+            conn, f"SELECT * FROM {SCHEMA}.search_recipes_ranked($1, $2, NULL, $3, $4, NULL, NULL, true, {limit})",
+            user_id, search_terms(query), restrictions, ingredient_terms(allergies))
+    return call
+
+
+def legacy_products(conn):
+    async def call(query):
+        return await fetch_json(
+            conn, f"SELECT * FROM {SCHEMA}.affiliate_products WHERE is_active "
+                  f"AND (title ILIKE $1 OR description ILIKE $1) ORDER BY created_at DESC LIMIT 20", f"%{query}%")
+    return call
+
+
+def ranked_products(conn):
+    async def call(query):
+        return await fetch_json(
+            conn, f"SELECT * FROM {SCHEMA}.search_affiliate_products_ranked($1, false, NULL, NULL, NULL, 20)",
+            search_terms(query))
+    return call
+
+
+async def load(conn, args, corpus):
+    timings = {}
+    for table in args.tables:
+        start = time.perf_counter()
+        for first in range(0, args.documents, args.batch):
+            rows = [corpus.row(table, g) for g in range(first, min(first + args.batch, args.documents))]
+            await conn.copy_records_to_table(table, schema_name=SCHEMA, columns=COLUMNS[table], records=rows)
+        timings[table] = round(time.perf_counter() - start, 1)
+        print(f"loaded {args.documents} {table} in {timings[table]} s")
+    for table in args.tables:
+        await conn.execute(f"VACUUM ANALYZE {SCHEMA}.{table}")
+    return timings
+
+
+async def insert_cost(conn, args, corpus, table):
+    """Milliseconds per row for single-row INSERTs, rolled back afterwards"""
+    columns = COLUMNS[table]
+    casts = {"content_json": "::JSONB", "ingredients": "::JSONB", "instructions": "::JSONB",
+             "category": f"::{SCHEMA}.product_category"}
+    values = ", ".join(f"${i + 1}{casts.get(column, '')}" for i, column in enumerate(columns))
+    sql = f"INSERT INTO {SCHEMA}.{table} ({', '.join(columns)}) VALUES ({values})"
+    rows = [corpus.row(table, args.documents + g) for g in range(args.insert_samples)]
+    transaction = conn.transaction()
+    await transaction.start()
+    try:
+        start = time.perf_counter()
+        for row in rows:
+            await conn.execute(sql, *row)
+        return round((time.perf_counter() - start) * 1000 / args.insert_samples, 3)
+    finally:
+        await transaction.rollback()
+
+
+async def run(dsn, args):
+    rng = random.Random(args.seed)
+    vocab = make_vocabulary(args.vocabulary, rng)
+    ingredients = make_ingredients(vocab, rng)
+    users = [uuid.uuid4() for _ in range(args.users)]
+    searcher = users[0]
+    queries = sample_queries(vocab, args.queries, rng)
+    restrictions, allergies = ["vegan"], ALLERGENS
+
+    conn = await asyncpg.connect(dsn, server_settings={"search_path": f"{SCHEMA}, public",
+                                                       "maintenance_work_mem": "256MB"})
+    results = {"documents_per_table": args.documents, "tables": {}}
+    try:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE; CREATE SCHEMA {SCHEMA};")
+        await conn.execute(TABLE_DDL)
+        corpus = Corpus(vocab, ingredients, users, args.seed)
+        results["load_seconds"] = await load(conn, args, corpus)
+
+        calls = {
+            "medical_records": (legacy_medical(conn, searcher), ranked_medical(conn, searcher)),
+            "recipes": (legacy_recipes(conn, restrictions, allergies),
+                        ranked_recipes(conn, searcher, restrictions, allergies)),
+            "affiliate_products": (legacy_products(conn), ranked_products(conn)),
+        }
+
+        for table in args.tables:
+            legacy = calls[table][0]
+            await legacy(queries["common"][0])
+            results["tables"][table] = {
+                "legacy": {band: await measure(legacy, qs) for band, qs in queries.items()},
+                "legacy_insert_ms_per_row": await insert_cost(conn, args, corpus, table),
+            }
+            print(f"{table}: legacy measured")
+
+        start = time.perf_counter()
+        await conn.execute(migration_sql())
+        results["migration_seconds"] = round(time.perf_counter() - start, 1)
+        for table in args.tables:
+            await conn.execute(f"VACUUM ANALYZE {SCHEMA}.{table}")
+
+        for table in args.tables:
+            ranked = calls[table][1]
+            await ranked(queries["common"][0])
+            entry = results["tables"][table]
+            entry["ranked"] = {band: await measure(ranked, qs) for band, qs in queries.items()}
+            entry["ranked_insert_ms_per_row"] = await insert_cost(conn, args, corpus, table)
+            entry["table_mb"] = round(await conn.fetchval(
+                f"SELECT pg_table_size('{SCHEMA}.{table}')") / 2 ** 20, 1)
+            entry["search_index_mb"] = round(float(await conn.fetchval(
+                f"""SELECT COALESCE(SUM(pg_relation_size(indexrelid)), 0) FROM pg_index i
+                    JOIN pg_class c ON c.oid = i.indexrelid
+                    WHERE i.indrelid = '{SCHEMA}.{table}'::regclass
+                      AND (c.relname LIKE '%search_vector%' OR c.relname LIKE '%ingredient_terms%')""")) / 2 ** 20, 1)
+            entry["speedup_p50"] = {
+                band: round(entry["legacy"][band]["p50_ms"] / max(entry["ranked"][band]["p50_ms"], 0.01), 1)
+                for band in queries
+            }
+            print(f"{table}: " + ", ".join(
+                f"{band} {entry['legacy'][band]['p50_ms']} -> {entry['ranked'][band]['p50_ms']} ms"
+                for band in queries))
+
+        if "recipes" in args.tables:
+            # Nothing the ranked search returns may contain an allergen or miss a restriction
+            leaked = await conn.fetchval(
+                f"""SELECT COUNT(*) FROM {SCHEMA}.search_recipes_ranked($1, NULL, NULL, $2, $3, NULL, NULL, true, 1000) s
+                    WHERE s.recipe->>'ingredients' ILIKE ANY (ARRAY['%peanut%', '%shellfish%'])
+                       OR NOT (s.recipe->'dietary_tags') ? 'vegan'""",
+                searcher, restrictions, ingredient_terms(allergies))
+            assert leaked == 0, leaked
+            results["recipes_filters_hold"] = True
+        return results
+    finally:
+        await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        await conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Full-text search vs ilike benchmark")
+    parser.add_argument("--dsn", default=os.getenv("TEST_DATABASE_URL", "postgresql://postgres@127.0.0.1:5432/postgres"))
+    parser.add_argument("--documents", type=int, default=1_000_000, help="Rows per table")
+    parser.add_argument("--tables", nargs="+", choices=TABLES, default=list(TABLES))
+    parser.add_argument("--users", type=int, default=2_000, help="Owners of the medical records and recipes")
+    parser.add_argument("--vocabulary", type=int, default=30_000)
+    parser.add_argument("--queries", type=int, default=20, help="Queries per frequency band")
+    parser.add_argument("--batch", type=int, default=50_000, help="Rows per COPY")
+    parser.add_argument("--insert-samples", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.dsn, args))
+    print(json.dumps(results, indent=2))
+
+    report_file = f"text_search_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "args": vars(args), "results": results}, f, indent=2)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Tool Query Bytes Benchmark
+==========================
+
+Runs PAM tool calls against an in-memory PostgREST stand-in holding a heavy
+user's synthetic history (years of expenses with their daily aggregates,
+budgets, savings events, calendar events, trips and posts) and records, per
+tool call, the rows and JSON bytes the database sends back and the number of
+requests made. The stand-in implements the builder surface the tools use:
+projection, eq/neq/gt/gte/lt/lte/in_/ilike/is_/or_ filters, order, limit,
+single/maybe_single, count with head, insert and update.
+
+To compare before and after, run it against an older checkout with --backend
+and pass that report to a run on the current tree with --baseline:
+
+    git worktree add /tmp/before HEAD
+    python performance_benchmarks/tool_query_bytes_benchmark.py --backend /tmp/before/backend
+    python performance_benchmarks/tool_query_bytes_benchmark.py --baseline tool_query_bytes_report_<ts>.json
+
+Usage:
+    python performance_benchmarks/tool_query_bytes_benchmark.py --expenses 20000
+"""
+
+import argparse
+import asyncio
+import fnmatch
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+USER_ID = "11111111-1111-1111-1111-111111111111"
+CATEGORIES = ["fuel", "food", "camping", "maintenance", "shopping", "entertainment", "utilities", "gas", "campground"]
+
+# (label, module, function, kwargs)
+TOOL_CALLS = [
+    ("analyze_budget", "app.services.pam.tools.budget.analyze_budget", "analyze_budget", {}),
+    ("compare_vs_budget", "app.services.pam.tools.budget.compare_vs_budget", "compare_vs_budget", {}),
+    ("compare_vs_budget(fuel)", "app.services.pam.tools.budget.compare_vs_budget", "compare_vs_budget",
+     {"category": "fuel"}),
+    ("get_spending_summary", "app.services.pam.tools.budget.get_spending_summary", "get_spending_summary", {}),
+    ("find_savings_opportunities", "app.services.pam.tools.budget.find_savings_opportunities",
+     "find_savings_opportunities", {}),
+    ("predict_end_of_month", "app.services.pam.tools.budget.predict_end_of_month", "predict_end_of_month", {}),
+    ("export_budget_report", "app.services.pam.tools.budget.export_budget_report", "export_budget_report",
+     {"format": "json"}),
+    ("track_savings", "app.services.pam.tools.budget.track_savings", "track_savings",
+     {"amount": 12.5, "category": "fuel", "description": "Cheaper diesel"}),
+    ("update_budget", "app.services.pam.tools.budget.update_budget", "update_budget",
+     {"category": "fuel", "amount": 450}),
+    ("get_calendar_events", "app.services.pam.tools.get_calendar_events", "get_calendar_events", {"limit": 20}),
+    ("get_user_stats", "app.services.pam.tools.profile.get_user_stats", "get_user_stats", {}),
+]
+
+
+def _matches(row, operator, column, value):
+    actual = row.get(column)
+    if operator == "eq":
+        return actual is not None and str(actual) == str(value)
+    if operator == "neq":
+        return actual is None or str(actual) != str(value)
+    if operator == "in_":
+        return actual is not None and str(actual) in {str(v) for v in value}
+    if operator == "is_":
+        return actual is None if str(value) == "null" else actual == value
+    if operator == "not_is":
+        return actual is not None if str(value) == "null" else actual != value
+    if operator == "ilike":
+        pattern = str(value).lower().replace("%", "*").replace("_", "?")
+        return actual is not None and fnmatch.fnmatchcase(str(actual).lower(), pattern)
+    if actual is None:
+        return False
+    if isinstance(actual, (int, float)) and not isinstance(value, str):
+        left, right = actual, value
+    else:
+        left, right = str(actual), str(value)
+    return {"gt": left > right, "gte": left >= right, "lt": left < right, "lte": left <= right}[operator]
+
+
+def _or_matches(row, expression):
+    """Evaluates the or=(col.op."v",and(col.op."v",col.op."v")) keyset filter"""
+    terms, depth, current = [], 0, ""
+    for char in expression:
+        if char == "," and depth == 0:
+            terms.append(current)
+            current = ""
+            continue
+        depth += char == "("
+        depth -= char == ")"
+        current += char
+    terms.append(current)
+
+    def single(term):
+        column, operator, value = term.split(".", 2)
+        return _matches(row, operator, column, json.loads(value))
+
+    for term in terms:
+        if term.startswith("and("):
+            if all(single(t) for t in term[4:-1].split(",")):
+                return True
+        elif single(term):
+            return True
+    return False
+
+
+class FakeRequest:
+    def __init__(self, client, table):
+        self.client = client
+        self.table_name = table
+        self.columns = "*"
+        self.filters = []
+        self.ordering = []
+        self.max_rows = None
+        self.mode = "select"
+        self.payload = None
+        self.count_method = None
+        self.head = False
+        self.one = None
+        self.negate = False
+
+    def select(self, columns="*", count=None, head=False):
+        self.columns, self.count_method, self.head = columns, count, head
+        return self
+
+    def insert(self, data):
+        self.mode, self.payload = "insert", data
+        return self
+
+    def update(self, data):
+        self.mode, self.payload = "update", data
+        return self
+
+    @property
+    def not_(self):
+        self.negate = True
+        return self
+
+    def _filter(self, operator):
+        def apply(column, value):
+            if self.negate and operator == "is_":
+                self.filters.append(("not_is", column, value))
+            else:
+                self.filters.append((operator, column, value))
+            self.negate = False
+            return self
+        return apply
+
+    def __getattr__(self, name):
+        if name in ("eq", "neq", "gt", "gte", "lt", "lte", "in_", "ilike", "is_"):
+            return self._filter(name)
+        raise AttributeError(name)
+
+    def or_(self, expression):
+        self.filters.append(("or_", expression, None))
+        return self
+
+    def order(self, column, desc=False):
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, count):
+        self.max_rows = count
+        return self
+
+    def single(self):
+        self.one = "single"
+        return self
+
+    def maybe_single(self):
+        self.one = "maybe"
+        return self
+
+    def _project(self, row):
+        if self.columns.strip() == "*":
+            return dict(row)
+        return {c.strip(): row.get(c.strip()) for c in self.columns.split(",")}
+
+    def execute(self):
+        self.client.requests += 1
+        rows = self.client.tables[self.table_name]
+        if self.mode == "insert":
+            row = dict(self.payload, id=self.payload.get("id", str(uuid.uuid4())))
+            rows.append(row)
+            return self.client.respond([row])
+
+        matched = [r for r in rows if all(
+            _or_matches(r, column) if op == "or_" else _matches(r, op, column, value)
+            for op, column, value in self.filters)]
+        if self.mode == "update":
+            for row in matched:
+                row.update(self.payload)
+            return self.client.respond([dict(r) for r in matched])
+
+        for column, desc in reversed(self.ordering):
+            matched.sort(key=lambda r: (r.get(column) is None, r.get(column)), reverse=desc)
+        total = len(matched)
+        if self.head:
+            return self.client.respond([], count=total)
+        if self.max_rows is not None:
+            matched = matched[:self.max_rows]
+        data = [self._project(r) for r in matched]
+        if self.one:
+            data = data[0] if data else None
+        return self.client.respond(data, count=total if self.count_method else None)
+
+
+class FakeSupabase:
+    """In-memory tables behind the subset of the PostgREST builder the tools use"""
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.requests = 0
+        self.rows = 0
+        self.bytes = 0
+
+    def table(self, name):
+        return FakeRequest(self, name)
+
+    def respond(self, data, count=None):
+        body = json.dumps(data, separators=(",", ":"), default=str)
+        self.bytes += len(body.encode("utf-8"))
+        self.rows += len(data) if isinstance(data, list) else int(data is not None)
+        return MagicMock(data=data, count=count)
+
+    def reset(self):
+        self.requests = self.rows = self.bytes = 0
+
+
+def build_tables(args):
+    rng = random.Random(7)
+    today = date.today()
+    now = datetime.now(timezone.utc)
+    tables = defaultdict(list)
+
+    for i in range(args.expenses):
+        day = today - timedelta(days=rng.randrange(args.days))
+        tables["expenses"].append({
+            "id": i + 1, "user_id": USER_ID, "amount": round(rng.uniform(3, 180), 2),
+            "category": rng.choice(CATEGORIES), "date": day.isoformat(),
+            "description": f"Purchase {i} at store {rng.randrange(400)}",
+            "created_at": f"{day.isoformat()}T12:00:00+00:00", "updated_at": f"{day.isoformat()}T12:00:00+00:00",
+        })
+    daily = defaultdict(lambda: [0.0, 0])
+    for expense in tables["expenses"]:
+        bucket = daily[(expense["category"], expense["date"])]
+        bucket[0] += expense["amount"]
+        bucket[1] += 1
+    for (category, day), (total, count) in daily.items():
+        tables["expense_daily_totals"].append({
+            "user_id": USER_ID, "category": category, "day": day,
+            "total": f"{total:.2f}", "expense_count": count, "updated_at": now.isoformat()})
+
+    for category in CATEGORIES:
+        tables["budgets"].append({
+            "id": str(uuid.uuid4()), "user_id": USER_ID, "category": category,
+            "monthly_limit": rng.choice([150, 300, 500]), "created_at": now.isoformat(), "updated_at": now.isoformat()})
+
+    for i in range(args.savings_events):
+        day = today - timedelta(days=rng.randrange(args.days))
+        tables["pam_savings_events"].append({
+            "id": str(uuid.uuid4()), "user_id": USER_ID, "actual_savings": round(rng.uniform(1, 40), 2),
+            "category": rng.choice(CATEGORIES), "saved_date": day.isoformat(), "savings_type": "other",
+            "description": f"Saving {i}", "created_at": f"{day.isoformat()}T09:00:00+00:00"})
+
+    for i in range(args.calendar_events):
+        start = now + timedelta(days=rng.randrange(-args.days, 120), hours=rng.randrange(24))
+        tables["calendar_events"].append({
+            "id": str(uuid.uuid4()), "user_id": USER_ID, "title": f"Event {i}", "description": "Stop " * 12,
+            "event_type": rng.choice(["personal", "trip", "maintenance"]),
+            "start_date": start.isoformat(), "end_date": (start + timedelta(hours=2)).isoformat(),
+            "location_name": f"Town {rng.randrange(300)}", "all_day": False})
+
+    for i in range(args.trips):
+        tables["user_trips"].append({
+            "id": str(uuid.uuid4()), "user_id": USER_ID, "title": f"Trip {i}", "description": "Leg " * 40,
+            "distance_miles": round(rng.uniform(20, 900), 1), "route_data": {"waypoints": [[0.1, 0.2]] * 20}})
+    for i in range(args.posts):
+        tables["posts"].append({
+            "id": str(uuid.uuid4()), "user_id": USER_ID, "content": "Great campsite " * 20,
+            "likes_count": rng.randrange(60), "image_url": f"https://example.com/{i}.jpg"})
+    tables["profiles"].append({"id": USER_ID, "created_at": "2021-04-01T00:00:00+00:00", "full_name": "Bench User"})
+    return tables
+
+
+def install(client):
+    """Points every tool module's get_supabase_client at the fake"""
+    for name, module in list(sys.modules.items()):
+        if name.startswith("app.services.pam.tools") and hasattr(module, "get_supabase_client"):
+            module.get_supabase_client = lambda *a, **k: client
+
+
+async def run(args):
+    import importlib
+
+    functions = {}
+    for label, module_name, function, _ in TOOL_CALLS:
+        functions[label] = getattr(importlib.import_module(module_name), function)
+
+    client = FakeSupabase(build_tables(args))
+    install(client)
+
+    results = {}
+    for label, _, _, kwargs in TOOL_CALLS:
+        client.reset()
+        started = time.perf_counter()
+        try:
+            await functions[label](USER_ID, **kwargs)
+            error = None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        results[label] = {
+            "requests": client.requests,
+            "rows": client.rows,
+            "bytes": client.bytes,
+            "ms": round((time.perf_counter() - started) * 1000, 2),
+            "error": error,
+        }
+        print(f"{label:<30} {client.requests:>3} req {client.rows:>7} rows {client.bytes:>10,} bytes"
+              + (f"  ({error})" if error else ""))
+    return results
+
+
+def compare(results, baseline):
+    print(f"\n{'tool call':<30} {'before':>12} {'after':>12} {'reduction':>10}")
+    comparison = {}
+    for label, after in results.items():
+        before = baseline.get(label)
+        if not before:
+            continue
+        ratio = before["bytes"] / after["bytes"] if after["bytes"] else float("inf")
+        comparison[label] = {"bytes_before": before["bytes"], "bytes_after": after["bytes"], "reduction": round(ratio, 1)}
+        print(f"{label:<30} {before['bytes']:>12,} {after['bytes']:>12,} {ratio:>9.1f}x")
+    return comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes returned per PAM tool call")
+    parser.add_argument("--backend", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        help="Backend checkout to import the tools from")
+    parser.add_argument("--baseline", help="Report from an earlier run to compare against")
+    parser.add_argument("--expenses", type=int, default=20_000)
+    parser.add_argument("--days", type=int, default=1_825, help="Days of history")
+    parser.add_argument("--savings-events", type=int, default=2_000)
+    parser.add_argument("--calendar-events", type=int, default=3_000)
+    parser.add_argument("--trips", type=int, default=500)
+    parser.add_argument("--posts", type=int, default=300)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.abspath(args.backend))
+    results = asyncio.run(run(args))
+
+    report = {"generated_at": datetime.now().isoformat(), "args": vars(args), "results": results}
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["comparison"] = compare(results, json.load(f)["results"])
+
+    report_file = f"tool_query_bytes_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
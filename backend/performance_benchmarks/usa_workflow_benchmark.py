@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+USA Workflow Step Benchmark
+===========================
+
+Runs a search workflow against a local fixture site (a search page with a
+navigation bar and filter controls, and a results page with result links)
+--runs times, and reports per-step latency for each run:
+
+  walk   - index_page without the fingerprint cache: every index re-walks
+           the DOM (the previous behaviour)
+  cached - index_page with the SQLite element index cache; run 1 is cold,
+           later runs find each page's fingerprint and reuse its index
+
+Each run indexes the search page, types a query, submits (the engine
+re-indexes the results page after navigation) and extracts the first
+result. index_page timings are reported separately from the step timings.
+The fixture is served on 127.0.0.1 and loaded with page.goto directly,
+since the workflow NAVIGATE step rejects loopback URLs (SSRF guard).
+
+Requires Playwright and a Chromium build (playwright install chromium), or
+pass --executable-path to use an existing Chrome/Chromium binary.
+
+Usage:
+    python performance_benchmarks/usa_workflow_benchmark.py --runs 20 --links 60
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+# Add backend to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.usa import element_indexer, workflow_engine
+from app.services.usa.element_indexer import index_page
+from app.services.usa.models import ActionType, WaitCondition, WorkflowStep
+from app.services.usa.pattern_store import PatternStore
+from app.services.usa.session_manager import BrowserSession
+
+try:
+    from playwright.async_api import async_playwright
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    PLAYWRIGHT_AVAILABLE = False
+
+SEARCH_PAGE = """<!doctype html><html><body>
+<nav>{nav}</nav>
+<form action="/results.html" method="get">
+  <input name="q" placeholder="Search campgrounds" style="width:300px;height:30px">
+  <select name="state" style="width:200px;height:30px"><option>NSW</option><option>QLD</option></select>
+  {filters}
+  <button type="submit" style="width:120px;height:30px">Search</button>
+</form>
+</body></html>"""
+
+RESULTS_PAGE = """<!doctype html><html><body>
+<nav>{nav}</nav>
+<ol>{results}</ol>
+</body></html>"""
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p99_ms": round(ordered[max(0, int(len(ordered) * 0.99) - 1)] * 1000, 3),
+    }
+
+
+def build_site(root, links):
+    nav = "".join(f'<a href="/section{i}.html" style="display:inline-block;width:90px;height:20px">Section {i}</a>'
+                  for i in range(links))
+    filters = "".join(f'<label><input type="checkbox" name="f{i}" style="width:20px;height:20px">Filter {i}</label>'
+                      for i in range(links // 3))
+    results = "".join(f'<li><a href="/site{i}.html" style="display:block;height:24px">Campground {i}</a></li>'
+                      for i in range(links))
+    with open(os.path.join(root, "search.html"), "w") as f:
+        f.write(SEARCH_PAGE.format(nav=nav, filters=filters))
+    with open(os.path.join(root, "results.html"), "w") as f:
+        f.write(RESULTS_PAGE.format(nav=nav, results=results))
+
+
+def serve(root):
+    class QuietHandler(SimpleHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=root))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def timed_index(timings, use_cache):
+    async def wrapper(page, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await index_page(page, *args, use_cache=use_cache, **kwargs)
+        finally:
+            timings.append(time.perf_counter() - start)
+    return wrapper
+
+
+async def run_mode(browser, base, args, use_cache, store):
+    per_run = []
+    for run in range(args.runs):
+        context = await browser.new_context()
+        page = await context.new_page()
+        session = BrowserSession(user_id="bench", context=context, page=page)
+        engine = workflow_engine.WorkflowEngine(session)
+        index_timings = []
+        indexer = timed_index(index_timings, use_cache)
+
+        with patch.object(workflow_engine, "index_page", indexer), \
+                patch.object(element_indexer, "pattern_store", store):
+            await page.goto(f"{base}/search.html")
+            session.elements = {e.index: e for e in await indexer(page)}
+            query = next(ref.index for ref in session.elements.values() if ref.tag == "input")
+            submit = next(ref.index for ref in session.elements.values() if ref.tag == "button")
+            steps = [
+                WorkflowStep(name="enter_query", action=ActionType.TYPE, target=query, value="beach"),
+                WorkflowStep(name="submit", action=ActionType.CLICK, target=submit,
+                             wait_for=WaitCondition.NAVIGATION),
+                WorkflowStep(name="first_result", action=ActionType.EXTRACT, target=1),
+            ]
+            start = time.perf_counter()
+            result = await engine.execute_workflow(steps, page, stop_on_error=True)
+            elapsed = time.perf_counter() - start
+
+        assert result.success, result.error_message
+        per_run.append({
+            "run": run + 1,
+            "workflow_ms": round(elapsed * 1000, 2),
+            "step_ms": [r.execution_time_ms for r in result.step_results],
+            "index_ms": [round(t * 1000, 2) for t in index_timings],
+        })
+        await context.close()
+
+    later = [r["workflow_ms"] / 1000 for r in per_run[1:]] or [per_run[0]["workflow_ms"] / 1000]
+    index_later = [t / 1000 for r in per_run[1:] for t in r["index_ms"]] or [0.0]
+    return {
+        "first_run": per_run[0],
+        "later_runs_workflow": percentiles(later),
+        "later_runs_index": percentiles(index_later),
+        "runs": per_run,
+    }
+
+
+async def run(args):
+    if not PLAYWRIGHT_AVAILABLE:
+        raise SystemExit("Playwright is not installed: pip install playwright && playwright install chromium")
+
+    launch_options = {"headless": True}
+    if args.executable_path:
+        launch_options["executable_path"] = args.executable_path
+
+    with tempfile.TemporaryDirectory() as root:
+        build_site(root, args.links)
+        server = serve(root)
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        store = PatternStore(db_path=os.path.join(root, "patterns.sqlite3"))
+        try:
+            async with async_playwright() as playwright:
+                browser = await playwright.chromium.launch(**launch_options)
+                try:
+                    return {
+                        "links": args.links,
+                        "walk": await run_mode(browser, base, args, False, store),
+                        "cached": await run_mode(browser, base, args, True, store),
+                    }
+                finally:
+                    await browser.close()
+        finally:
+            store.close()
+            server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="USA workflow step latency with and without the element index cache")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--links", type=int, default=60, help="Interactive elements per fixture page")
+    parser.add_argument("--executable-path", help="Chrome/Chromium binary to launch instead of Playwright's")
+    args = parser.parse_args()
+    logging.getLogger("app").setLevel(logging.WARNING)
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+
+    report_file = f"usa_workflow_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "args": vars(args), "results": results}, f, indent=2)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+YouTube Trip Import Benchmark
+=============================
+
+Compares the legacy per-video import (videos.list, transcript and AI
+extraction, then one duplicate SELECT plus one INSERT per video) with the
+chunked pipeline in app/services/scraping/youtube_ingest.py against a local
+Postgres.
+
+YouTube, transcript and OpenAI calls are simulated with fixed latencies
+(--api-ms per videos.list call, --transcript-ms and --extract-ms per video)
+over generated fixture videos, so only the database is real. The legacy path
+runs without its 2 s sleep between videos and on --legacy-videos videos,
+since it is sequential.
+
+Runs on scratch tables so it never touches real data. Reports videos/sec,
+DB round trips and API calls for:
+
+  legacy     - the previous per-video loop
+  initial    - pipeline, empty table
+  rerun      - pipeline, same videos unchanged (nothing re-extracted)
+  changed    - pipeline, 5% of videos with edited titles
+  resume     - pipeline interrupted half way, then resumed from its checkpoint
+
+Usage:
+    TEST_DATABASE_URL=postgresql://postgres@127.0.0.1:5432/postgres \\
+        python performance_benchmarks/youtube_ingest_benchmark.py --videos 10000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+from datetime import datetime
+
+import asyncpg
+
+# Add backend to Python path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.scraping.youtube_ingest import AsyncpgTripSink, CacheCheckpoint, YouTubeImportPipeline
+
+TABLE = "user_trips_benchmark"
+LEGACY_TABLE = "user_trips_benchmark_legacy"
+
+SCHEMA = """
+CREATE TABLE {table} (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID,
+    title TEXT NOT NULL,
+    description TEXT,
+    status TEXT DEFAULT 'planning',
+    trip_type TEXT DEFAULT 'road_trip',
+    privacy_level TEXT DEFAULT 'private',
+    metadata JSONB DEFAULT '{{}}',
+    source_video_id TEXT,
+    content_hash TEXT,
+    created_at TIMESTAMPTZ DEFAULT now(),
+    updated_at TIMESTAMPTZ DEFAULT now()
+);
+CREATE UNIQUE INDEX ON {table} (user_id, source_video_id);
+"""
+
+
+class Interrupted(BaseException):
+    """Simulated worker restart"""
+
+
+class FixtureScraper:
+    """Scraper double with simulated API latencies over generated videos"""
+
+    def __init__(self, args, edited=0, interrupt_after=None):
+        self.args = args
+        self.edited = edited
+        self.interrupt_after = interrupt_after
+        self.extractions = 0
+
+    def video(self, video_id):
+        i = int(video_id[3:])
+        title = f"Overlanding trip {i}" + (" (re-edit)" if i < self.edited else "")
+        return {
+            "video_id": video_id,
+            "title": title,
+            "description": f"Day {i % 14 + 1} of the loop: river crossings, bush camps and a broken shackle. " * 4,
+            "channel": f"Channel {i % 50}",
+            "published_at": "2024-05-01T00:00:00Z",
+            "url": f"https://www.youtube.com/watch?v={video_id}",
+        }
+
+    async def get_videos_metadata(self, video_ids):
+        await asyncio.sleep(self.args.api_ms / 1000)
+        return {video_id: self.video(video_id) for video_id in video_ids}
+
+    async def get_video_transcript(self, video_id):
+        await asyncio.sleep(self.args.transcript_ms / 1000)
+        # About 3% of videos have no English transcript
+        return None if int(video_id[3:]) % 33 == 0 else "we aired down before the sand and crossed at low tide"
+
+    async def extract_trip_info(self, transcript, video):
+        if self.interrupt_after is not None and self.extractions >= self.interrupt_after:
+            raise Interrupted()
+        await asyncio.sleep(self.args.extract_ms / 1000)
+        self.extractions += 1
+        return {
+            "title": video["title"],
+            "description": "A two week loop through the high country.",
+            "trip_type": "road_trip",
+            "status": "completed",
+            "privacy_level": "public",
+            "metadata": {"country": "Australia", "difficulty": "Moderate", "key_stops": ["Dargo", "Wonnangatta"]},
+        }
+
+
+class MemoryCache:
+    """Stands in for the Redis cache behind CacheCheckpoint"""
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ttl=None):
+        self.values[key] = value
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+
+def fixture_ids(count):
+    return [f"yt_{i:08d}" for i in range(count)]
+
+
+async def reset(conn, table):
+    await conn.execute(f"DROP TABLE IF EXISTS {table}")
+    await conn.execute(SCHEMA.format(table=table))
+
+
+async def run_legacy(conn, args, owner):
+    """The previous bulk_import_videos loop, minus its sleep(2)"""
+    scraper = FixtureScraper(args)
+    round_trips = api_calls = saved = 0
+    start = time.perf_counter()
+    for video_id in fixture_ids(args.legacy_videos):
+        api_calls += 1
+        video = (await scraper.get_videos_metadata([video_id]))[video_id]
+        transcript = await scraper.get_video_transcript(video_id)
+        if not transcript:
+            continue
+        trip = await scraper.extract_trip_info(transcript, video)
+        trip["metadata"]["youtube_url"] = video["url"]
+
+        round_trips += 1
+        existing = await conn.fetchval(
+            f"SELECT id FROM {LEGACY_TABLE} WHERE metadata->>'youtube_url' = $1", video["url"]
+        )
+        if existing:
+            continue
+        round_trips += 1
+        await conn.execute(
+            f"INSERT INTO {LEGACY_TABLE} (user_id, title, description, trip_type, status, privacy_level, metadata) "
+            f"VALUES ($1, $2, $3, $4, $5, $6, $7)",
+            owner, trip["title"], trip["description"], trip["trip_type"], trip["status"],
+            trip["privacy_level"], json.dumps(trip["metadata"]),
+        )
+        saved += 1
+    elapsed = time.perf_counter() - start
+    return {
+        "videos": args.legacy_videos,
+        "saved": saved,
+        "elapsed_seconds": round(elapsed, 3),
+        "videos_per_sec": round(args.legacy_videos / elapsed, 1),
+        "round_trips": round_trips,
+        "api_calls": api_calls,
+        "estimated_seconds_for_all": round(elapsed / args.legacy_videos * args.videos, 1),
+    }
+
+
+def summarize(stats):
+    data = stats.to_dict()
+    data["elapsed_seconds"] = round(data["elapsed_seconds"], 3)
+    return data
+
+
+async def run(args):
+    conn = await asyncpg.connect(args.dsn)
+    owner = uuid.uuid4()
+    video_ids = fixture_ids(args.videos)
+    results = {"videos": args.videos}
+    try:
+        await reset(conn, LEGACY_TABLE)
+        results["legacy"] = await run_legacy(conn, args, owner)
+
+        await reset(conn, TABLE)
+        sink = AsyncpgTripSink(conn, table=TABLE)
+
+        def pipeline(scraper, checkpoint=None):
+            return YouTubeImportPipeline(scraper, sink, checkpoint=checkpoint,
+                                         chunk_size=args.chunk_size, concurrency=args.concurrency)
+
+        results["initial"] = summarize(await pipeline(FixtureScraper(args)).run(video_ids, owner))
+        results["rerun"] = summarize(await pipeline(FixtureScraper(args)).run(video_ids, owner))
+        edited = FixtureScraper(args, edited=args.videos // 20)
+        results["changed"] = summarize(await pipeline(edited).run(video_ids, owner))
+
+        # Interrupt a fresh import half way, then resume it
+        await reset(conn, TABLE)
+        cache = MemoryCache()
+        crashing = FixtureScraper(args, interrupt_after=args.videos // 2)
+        start = time.perf_counter()
+        try:
+            await pipeline(crashing, CacheCheckpoint(cache)).run(video_ids, owner)
+        except Interrupted:
+            pass
+        interrupted_after = time.perf_counter() - start
+        resumed = FixtureScraper(args)
+        stats = await pipeline(resumed, CacheCheckpoint(cache)).run(video_ids, owner)
+        results["resume"] = {
+            "interrupted_after_seconds": round(interrupted_after, 3),
+            "extractions_before_interrupt": crashing.extractions,
+            "extractions_on_resume": resumed.extractions,
+            **summarize(stats),
+            "rows_in_table": await conn.fetchval(f"SELECT count(*) FROM {TABLE}"),
+        }
+    finally:
+        await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+        await conn.execute(f"DROP TABLE IF EXISTS {LEGACY_TABLE}")
+        await conn.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="YouTube trip import benchmark against local Postgres")
+    parser.add_argument("--dsn", default=os.getenv("TEST_DATABASE_URL", "postgresql://postgres@127.0.0.1:5432/postgres"))
+    parser.add_argument("--videos", type=int, default=10000)
+    parser.add_argument("--legacy-videos", type=int, default=500, help="Videos for the sequential legacy path")
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--api-ms", type=float, default=30.0, help="Simulated videos.list latency")
+    parser.add_argument("--transcript-ms", type=float, default=10.0, help="Simulated transcript fetch latency")
+    parser.add_argument("--extract-ms", type=float, default=40.0, help="Simulated AI extraction latency")
+    args = parser.parse_args()
+    logging.getLogger("app").setLevel(logging.WARNING)
+
+    results = asyncio.run(run(args))
+    print(json.dumps(results, indent=2))
+
+    report_file = f"youtube_ingest_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(report_file, "w") as f:
+        json.dump({"generated_at": datetime.now().isoformat(), "args": vars(args), "results": results}, f, indent=2)
+    print(f"Report written to {report_file}")
+
+
+if __name__ == "__main__":
+    main()
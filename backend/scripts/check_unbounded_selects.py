@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Unbounded Select Check
+
+Statically flags PAM tool reads that can return every row of a table:
+
+  - safe_db_select(...) without limit=, single=True or ranges=
+  - ToolQuery(...)...fetch() without limit/range/between/gt/gte/lt/lte
+  - raw supabase .table(...).select(...)...execute() chains without
+    limit/range/single/maybe_single, a range predicate or a head count
+
+An equality or IN filter on "id" counts as bounded (primary-key lookup). Queries
+assembled across statements are followed through the variable they are
+assigned to within the same function.
+
+A read that is deliberately unbounded (a full data export, one row per
+budget category) is accepted with a comment on its line or the line above:
+
+    budgets = await query.fetch()  # unbounded-ok: one row per category
+
+Usage:
+    python scripts/check_unbounded_selects.py [paths...]   (default: app/services/pam/tools)
+
+Exits 1 when anything is flagged.
+"""
+
+import ast
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Set
+
+BACKEND = Path(__file__).resolve().parents[1]
+DEFAULT_PATHS = [BACKEND / "app" / "services" / "pam" / "tools"]
+SUPPRESS_MARKER = "unbounded-ok"
+
+BOUNDING_METHODS = {"limit", "range", "single", "maybe_single", "between", "ranges",
+                    "gt", "gte", "lt", "lte", "first", "page", "count"}
+SAFE_DB_SELECT_BOUNDS = {"limit", "single", "ranges"}
+QUERY_CONSTRUCTORS = {"table", "ToolQuery"}
+
+
+@dataclass
+class Finding:
+    path: str
+    line: int
+    kind: str
+    detail: str
+
+    def __str__(self) -> str:
+        return f"{self.path}:{self.line}: unbounded {self.kind} ({self.detail})"
+
+
+def _chain(node: ast.AST) -> List[ast.Call]:
+    """Method calls of a fluent chain, innermost first"""
+    calls = []
+    while isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute):
+        calls.append(node)
+        node = node.func.value
+    if isinstance(node, ast.Call):
+        calls.append(node)
+    calls.reverse()
+    return calls
+
+
+def _root(node: ast.AST) -> ast.AST:
+    while True:
+        if isinstance(node, ast.Call):
+            node = node.func
+        elif isinstance(node, ast.Attribute):
+            node = node.value
+        elif isinstance(node, ast.Await):
+            node = node.value
+        else:
+            return node
+
+
+def _name(call: ast.Call) -> Optional[str]:
+    if isinstance(call.func, ast.Attribute):
+        return call.func.attr
+    if isinstance(call.func, ast.Name):
+        return call.func.id
+    return None
+
+
+def _is_bounding(call: ast.Call) -> bool:
+    name = _name(call)
+    if name in BOUNDING_METHODS:
+        return True
+    if name in ("eq", "in_") and call.args and isinstance(call.args[0], ast.Constant) and call.args[0].value == "id":
+        return True
+    if name == "select":
+        return any(k.arg == "head" for k in call.keywords)
+    return False
+
+
+class _FunctionScan(ast.NodeVisitor):
+    """Collects, per query variable, every method called on it or assigned to it"""
+
+    def __init__(self):
+        self.calls_on = {}
+
+    def visit_Assign(self, node: ast.Assign):
+        value = node.value.value if isinstance(node.value, ast.Await) else node.value
+        calls = _chain(value)
+        root = _root(value)
+        inherited = self.calls_on.get(root.id, []) if isinstance(root, ast.Name) else []
+        if inherited or any(_name(c) in QUERY_CONSTRUCTORS for c in calls):
+            for target in node.targets:
+                if isinstance(target, ast.Name):
+                    self.calls_on[target.id] = inherited + calls
+        self.generic_visit(node)
+
+    def visit_Call(self, node: ast.Call):
+        root = _root(node)
+        if isinstance(root, ast.Name) and root.id in self.calls_on:
+            self.calls_on[root.id] = self.calls_on[root.id] + _chain(node)
+        self.generic_visit(node)
+
+
+class Checker:
+    def __init__(self, path: Path, source: str):
+        self.path = path
+        self.lines = source.splitlines()
+        self.tree = ast.parse(source)
+        self.findings: List[Finding] = []
+        self.seen: Set[int] = set()
+
+    def _suppressed(self, node: ast.AST) -> bool:
+        first = max(node.lineno - 2, 0)
+        last = getattr(node, "end_lineno", node.lineno)
+        return any(SUPPRESS_MARKER in line for line in self.lines[first:last])
+
+    def _flag(self, node: ast.AST, kind: str, detail: str):
+        if node.lineno in self.seen or self._suppressed(node):
+            return
+        self.seen.add(node.lineno)
+        self.findings.append(Finding(str(self.path), node.lineno, kind, detail))
+
+    def run(self) -> List[Finding]:
+        scopes = [n for n in ast.walk(self.tree) if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))]
+        for scope in scopes or [self.tree]:
+            scan = _FunctionScan()
+            scan.visit(scope)
+            for node in ast.walk(scope):
+                if isinstance(node, ast.Call):
+                    self._check_call(node, scan)
+        return sorted(self.findings, key=lambda f: f.line)
+
+    def _all_calls(self, node: ast.Call, scan: _FunctionScan) -> List[ast.Call]:
+        calls = _chain(node)
+        root = _root(node)
+        if isinstance(root, ast.Name):
+            calls = calls + scan.calls_on.get(root.id, [])
+        return calls
+
+    def _check_call(self, node: ast.Call, scan: _FunctionScan):
+        name = _name(node)
+        if name == "safe_db_select":
+            if any(k.arg in SAFE_DB_SELECT_BOUNDS and not (isinstance(k.value, ast.Constant) and not k.value.value)
+                   for k in node.keywords):
+                return
+            table = node.args[0].value if node.args and isinstance(node.args[0], ast.Constant) else "?"
+            self._flag(node, "safe_db_select", str(table))
+        elif name == "fetch":
+            calls = self._all_calls(node, scan)
+            if any(_name(c) == "ToolQuery" for c in calls) and not any(_is_bounding(c) for c in calls):
+                self._flag(node, "ToolQuery", self._table(calls, "ToolQuery"))
+        elif name == "execute":
+            calls = self._all_calls(node, scan)
+            names = {_name(c) for c in calls}
+            if "select" in names and "table" in names and not any(_is_bounding(c) for c in calls):
+                self._flag(node, "select", self._table(calls, "table"))
+
+    @staticmethod
+    def _table(calls: List[ast.Call], constructor: str) -> str:
+        for call in calls:
+            if _name(call) == constructor and call.args and isinstance(call.args[0], ast.Constant):
+                return str(call.args[0].value)
+        return "?"
+
+
+def check_paths(paths: Iterable[Path]) -> List[Finding]:
+    findings = []
+    for root in paths:
+        files = [root] if root.is_file() else sorted(root.rglob("*.py"))
+        for path in files:
+            try:
+                display = path.relative_to(BACKEND)
+            except ValueError:
+                display = path
+            findings.extend(Checker(display, path.read_text()).run())
+    return findings
+
+
+def main(argv: List[str]) -> int:
+    paths = [Path(p).resolve() for p in argv] or DEFAULT_PATHS
+    findings = check_paths(paths)
+    for finding in findings:
+        print(finding)
+    print(f"{len(findings)} unbounded select(s)")
+    return 1 if findings else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
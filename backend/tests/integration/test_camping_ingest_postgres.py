@@ -0,0 +1,80 @@
+import os
+
+import pytest
+
+from app.services.camping_ingest import AsyncpgCampingSink, CampingSiteIngestor
+
+# Local Postgres DSN; DATABASE_URL is overridden by the autouse mock_environment fixture
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+if os.getenv("RUN_INTEGRATION_TESTS") != "1" or not TEST_DATABASE_URL:
+    pytest.skip("Skipping integration tests", allow_module_level=True)
+
+asyncpg = pytest.importorskip("asyncpg")
+
+TABLE = "camping_locations_ingest_test"
+
+
+@pytest.fixture
+async def connection():
+    conn = await asyncpg.connect(TEST_DATABASE_URL)
+    await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    await conn.execute(f"""
+        CREATE TABLE {TABLE} (
+            id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+            name TEXT NOT NULL,
+            location_type TEXT,
+            country TEXT NOT NULL,
+            latitude DECIMAL(10,6) NOT NULL,
+            longitude DECIMAL(10,6) NOT NULL,
+            address TEXT,
+            is_free BOOLEAN DEFAULT false,
+            price_per_night DECIMAL(10,2),
+            max_rig_length INTEGER,
+            amenities JSONB,
+            seasonal_info TEXT,
+            source_url TEXT,
+            data_source TEXT,
+            natural_key TEXT,
+            content_hash TEXT,
+            last_scraped TIMESTAMPTZ,
+            created_at TIMESTAMPTZ DEFAULT now(),
+            updated_at TIMESTAMPTZ DEFAULT now()
+        )
+    """)
+    await conn.execute(f"CREATE UNIQUE INDEX ON {TABLE} (natural_key)")
+    yield conn
+    await conn.execute(f"DROP TABLE IF EXISTS {TABLE}")
+    await conn.close()
+
+
+def _sites(n, suffix=""):
+    return [
+        {
+            "name": f"Camp {i}{suffix if i % 100 == 0 else ''}",
+            "type": "free_camping",
+            "latitude": -30 - i / 10000,
+            "longitude": 150 + i / 10000,
+            "is_free": True,
+            "price_per_night": 0,
+            "amenities": {"toilets": i % 2 == 0},
+        }
+        for i in range(n)
+    ]
+
+
+async def test_bulk_ingest_round_trip(connection):
+    ingestor = CampingSiteIngestor(AsyncpgCampingSink(connection, table=TABLE), batch_size=500)
+
+    first = await ingestor.ingest(_sites(2000), data_source="test")
+    assert first.upserted == 2000
+    assert await connection.fetchval(f"SELECT count(*) FROM {TABLE}") == 2000
+
+    second = await ingestor.ingest(_sites(2000), data_source="test")
+    assert second.unchanged == 2000
+    assert second.upserted == 0
+
+    third = await ingestor.ingest(_sites(2000, suffix=" (updated)"), data_source="test")
+    assert third.upserted == 20
+    assert await connection.fetchval(f"SELECT count(*) FROM {TABLE} WHERE name LIKE '%(updated)'") == 20
+    assert await connection.fetchval(f"SELECT count(*) FROM {TABLE}") == 2000
@@ -0,0 +1,74 @@
+import json
+import os
+import re
+from pathlib import Path
+
+import pytest
+
+from app.services.text_search import ingredient_terms
+
+# Local Postgres DSN; DATABASE_URL is overridden by the autouse mock_environment fixture
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+if os.getenv("RUN_INTEGRATION_TESTS") != "1" or not TEST_DATABASE_URL:
+    pytest.skip("Skipping integration tests", allow_module_level=True)
+
+asyncpg = pytest.importorskip("asyncpg")
+
+MIGRATION = (Path(__file__).resolve().parents[3] / "supabase" / "migrations"
+             / "20260330000000_text_search_indexes.sql")
+
+
+def _function_sql(name):
+    match = re.search(rf"CREATE OR REPLACE FUNCTION public\.{name}\(.*?\n\$\$;", MIGRATION.read_text(), re.S)
+    return match.group(0)
+
+
+@pytest.fixture
+async def connection():
+    conn = await asyncpg.connect(TEST_DATABASE_URL)
+    transaction = conn.transaction()
+    await transaction.start()
+    await conn.execute(_function_sql("ingredient_terms"))
+    await conn.execute(_function_sql("ingredient_terms_contain"))
+    yield conn
+    await transaction.rollback()
+    await conn.close()
+
+
+async def _contains(conn, ingredients, allergies):
+    return await conn.fetchval(
+        "SELECT public.ingredient_terms_contain(public.ingredient_terms($1::jsonb), $2)",
+        json.dumps(ingredients), ingredient_terms(allergies),
+    )
+
+
+@pytest.mark.parametrize("ingredients, allergies", [
+    ([{"name": "Buttermilk", "amount": "1 cup"}], ["milk"]),
+    ([{"name": "Peanut butter"}], ["nut"]),
+    (["Walnuts, chopped"], ["nut"]),
+    ([{"name": "Cajun catfish fillets"}], ["fish"]),
+    ([{"name": "Salted peanuts"}], ["Peanuts"]),
+    ([{"name": "Egg noodles"}], ["eggs"]),
+])
+async def test_allergies_exclude_compound_ingredients(connection, ingredients, allergies):
+    assert await _contains(connection, ingredients, allergies) is True
+
+
+async def test_unrelated_ingredients_are_kept(connection):
+    recipe = [{"name": "Chickpeas"}, {"name": "Coconut cream"}, "Basmati rice"]
+
+    assert await _contains(connection, recipe, ["shellfish", "peanuts", "dairy"]) is False
+    assert await _contains(connection, [], ["milk"]) is False
+
+
+@pytest.mark.parametrize("ingredients, wanted", [
+    ([{"name": "Cherry tomatoes"}], ["tomato"]),
+    ([{"name": "Diced tomatoes"}], ["tomatoes"]),
+    ([{"name": "Tomato paste"}], ["tomato"]),
+    ([{"name": "Chicken thighs"}], ["chicken"]),
+    (["Button mushrooms"], ["Mushroom"]),
+])
+async def test_ingredient_filter_matches_plurals_and_compounds(connection, ingredients, wanted):
+    # p_any_ingredients goes through the same containment check as allergies
+    assert await _contains(connection, ingredients, wanted) is True
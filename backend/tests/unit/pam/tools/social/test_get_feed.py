@@ -0,0 +1,215 @@
+import importlib
+import re
+import sys
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Other tool tests stub this module at collection time; the social package needs the real one
+_utils = sys.modules.get("app.services.pam.tools.utils")
+if _utils is not None and not hasattr(_utils, "__file__"):
+    del sys.modules["app.services.pam.tools.utils"]
+
+from app.services.pam.tools.exceptions import ValidationError
+from app.services.pam.tools.social.feed_pagination import (
+    cursor_score,
+    decode_cursor,
+    encode_cursor,
+    keyset_or_filter,
+)
+from app.services.pam.tools.social.timeline_cache import TimelineCache
+
+# The package re-exports the get_feed function under the module's name
+get_feed_module = importlib.import_module("app.services.pam.tools.social.get_feed")
+
+USER_ID = "11111111-1111-1111-1111-111111111111"
+KEYSET_RE = re.compile(r'created_at\.lt\."(?P<t>[^"]+)",and\(created_at\.eq\."[^"]+",id\.lt\.(?P<i>[0-9a-f-]+)\)')
+
+
+def _post(minute, post_id=None):
+    created = datetime(2026, 1, 1, tzinfo=timezone.utc) + timedelta(minutes=minute)
+    return {"id": post_id or str(uuid.uuid4()), "created_at": created.isoformat(), "content": f"post {minute}"}
+
+
+class FakePostsQuery:
+    """Minimal PostgREST builder over an in-memory posts list"""
+
+    def __init__(self, store):
+        self.store = store
+        self.keyset = None
+        self.limit_n = None
+        self.range_args = None
+
+    def select(self, *args):
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def or_(self, expression):
+        match = KEYSET_RE.fullmatch(expression)
+        assert match, expression
+        self.keyset = (match["t"], match["i"])
+        return self
+
+    def limit(self, n):
+        self.limit_n = n
+        return self
+
+    def range(self, start, end):
+        self.range_args = (start, end)
+        return self
+
+    def execute(self):
+        rows = sorted(self.store, key=lambda r: (r["created_at"], r["id"]), reverse=True)
+        if self.keyset:
+            rows = [r for r in rows if (r["created_at"], r["id"]) < self.keyset]
+        if self.range_args:
+            rows = rows[self.range_args[0]:self.range_args[1] + 1]
+        if self.limit_n is not None:
+            rows = rows[:self.limit_n]
+        return MagicMock(data=rows)
+
+
+@pytest.fixture
+def posts():
+    return [_post(i) for i in range(45)]
+
+
+@pytest.fixture
+def supabase(posts):
+    client = MagicMock()
+    client.queries = []
+
+    def table(name):
+        query = FakePostsQuery(posts)
+        client.queries.append(query)
+        return query
+
+    client.table.side_effect = table
+    with patch.object(get_feed_module, "get_supabase_client", return_value=client):
+        yield client
+
+
+def test_cursor_round_trip():
+    post = _post(3)
+    assert decode_cursor(encode_cursor(post["created_at"], post["id"])) == (post["created_at"], post["id"])
+
+
+@pytest.mark.parametrize("bad", ["not-a-cursor", encode_cursor("yesterday", str(uuid.uuid4())), encode_cursor("2026-01-01T00:00:00", "x")])
+def test_decode_cursor_rejects_garbage(bad):
+    with pytest.raises(ValueError):
+        decode_cursor(bad)
+
+
+def test_keyset_filter_quotes_timestamps():
+    post_id = str(uuid.uuid4())
+    assert keyset_or_filter(("2026-01-01T00:00:00+00:00", post_id)) == (
+        f'created_at.lt."2026-01-01T00:00:00+00:00",and(created_at.eq."2026-01-01T00:00:00+00:00",id.lt.{post_id})'
+    )
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_a_validation_error(supabase):
+    with pytest.raises(ValidationError):
+        await get_feed_module.get_feed(USER_ID, cursor="%%%")
+
+
+@pytest.mark.asyncio
+async def test_keyset_scroll_has_no_duplicates_when_posts_arrive(supabase, posts):
+    seen, cursor, pages = [], None, 0
+    while True:
+        result = await get_feed_module.get_feed(USER_ID, limit=10, cursor=cursor)
+        seen.extend(p["id"] for p in result["posts"])
+        pages += 1
+        # New posts land at the head of the feed while the user scrolls
+        posts.append(_post(1000 + pages))
+        if not result["has_more"]:
+            assert result["next_cursor"] is None
+            break
+        cursor = result["next_cursor"]
+
+    assert pages == 5
+    assert len(seen) == len(set(seen)) == 45
+    assert all(q.limit_n == 11 for q in supabase.queries)
+
+
+@pytest.mark.asyncio
+async def test_offset_is_still_supported(supabase):
+    result = await get_feed_module.get_feed(USER_ID, limit=10, offset=40)
+    assert result["posts_count"] == 5
+    assert result["has_more"] is False
+    assert result["next_cursor"] is None
+    assert supabase.queries[0].range_args == (40, 49)
+
+
+@pytest.mark.asyncio
+async def test_following_feed_uses_keyset_rpc(supabase, posts):
+    supabase.rpc.return_value.select.return_value.execute.return_value = MagicMock(data=posts[:3])
+    cursor = encode_cursor(posts[10]["created_at"], posts[10]["id"])
+
+    result = await get_feed_module.get_feed(USER_ID, filter_type="following", limit=2, cursor=cursor)
+
+    supabase.rpc.assert_called_once_with(
+        "get_following_feed_keyset",
+        {
+            "p_user_id": USER_ID,
+            "p_limit": 3,
+            "p_cursor_created_at": posts[10]["created_at"],
+            "p_cursor_id": posts[10]["id"],
+        },
+    )
+    assert result["posts_count"] == 2
+    assert decode_cursor(result["next_cursor"]) == (posts[1]["created_at"], posts[1]["id"])
+    # Rows carry the same author embed whether they come from the RPC or the timeline cache
+    supabase.rpc.return_value.select.assert_called_once_with(get_feed_module.FEED_SELECT)
+
+
+class TestTimelineCache:
+    @pytest.fixture
+    def cache(self):
+        fakeredis = pytest.importorskip("fakeredis")
+        return TimelineCache(redis=fakeredis.FakeAsyncRedis(), max_entries=20)
+
+    @pytest.mark.asyncio
+    async def test_pages_match_database_order_including_ties(self, cache):
+        rows = [_post(i // 3) for i in range(15)]  # groups of three share a timestamp
+        await cache.store(USER_ID, rows)
+        expected = [r["id"] for r in sorted(rows, key=lambda r: (r["created_at"], r["id"]), reverse=True)]
+
+        seen, cursor = [], None
+        while True:
+            entries = await cache.read_page(USER_ID, 4, cursor)
+            page = [post_id for post_id, _ in entries[:4]]
+            seen.extend(page)
+            if len(entries) <= 4:
+                break
+            last = next(r for r in rows if r["id"] == page[-1])
+            cursor = (last["created_at"], last["id"])
+
+        assert seen == expected
+
+    @pytest.mark.asyncio
+    async def test_fan_out_only_reaches_materialized_timelines(self, cache):
+        await cache.store(USER_ID, [_post(1)])
+        post = _post(5)
+        other = "22222222-2222-2222-2222-222222222222"
+
+        delivered = await cache.fan_out(post["id"], post["created_at"], [USER_ID, other])
+
+        assert delivered == 1
+        entries = await cache.read_page(USER_ID, 10)
+        assert entries[0] == (post["id"], cursor_score(post["created_at"]))
+        assert not await cache.exists(other)
+
+    @pytest.mark.asyncio
+    async def test_trimmed_timeline_defers_to_database_past_its_tail(self, cache):
+        await cache.store(USER_ID, [_post(i) for i in range(30)])
+        entries = await cache.read_page(USER_ID, 10)
+        assert len(entries) == 11
+
+        oldest_cached = _post(10)
+        assert await cache.read_page(USER_ID, 10, (oldest_cached["created_at"], "f" * 8 + "-ffff-ffff-ffff-" + "f" * 12)) is None
+        assert await cache.read_page("33333333-3333-3333-3333-333333333333", 10) is None
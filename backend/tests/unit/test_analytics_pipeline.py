@@ -0,0 +1,133 @@
+import random
+
+import pytest
+
+from app.services.analytics.pipeline import AnalyticsPipeline, summarize_rollups
+from app.services.analytics.sketches import HyperLogLog, LatencySketch
+
+
+class RecordingSink:
+    def __init__(self, fail_times=0):
+        self.batches = []
+        self.rollups = []
+        self.fail_times = fail_times
+
+    async def write_events(self, rows):
+        if self.fail_times:
+            self.fail_times -= 1
+            raise ConnectionError("db down")
+        self.batches.append(list(rows))
+
+    async def merge_rollups(self, rows):
+        self.rollups.extend(rows)
+
+
+def make_row(event_type="pam_response", ts="2026-03-01T10:15:30", user=None, latency=100, success=True, data=None):
+    return {
+        "event_type": event_type,
+        "user_id": user,
+        "timestamp": ts,
+        "response_time_ms": latency,
+        "success": success,
+        "event_data": data or {},
+        "metadata": {},
+    }
+
+
+def test_latency_sketch_quantiles_within_relative_error_and_merge():
+    rng = random.Random(3)
+    values = [rng.lognormvariate(5, 1) for _ in range(20_000)]
+    left, right = LatencySketch(), LatencySketch()
+    for i, value in enumerate(values):
+        (left if i % 2 else right).add(value)
+
+    merged = LatencySketch.from_json(left.to_json()).merge(LatencySketch.from_json(right.to_json()))
+    values.sort()
+    for q in (0.5, 0.95, 0.99):
+        exact = values[int(q * (len(values) - 1))]
+        assert abs(merged.quantile(q) - exact) / exact < 0.03
+    assert merged.count == 20_000
+
+
+def test_hyperloglog_estimate_and_merge():
+    a, b = HyperLogLog(), HyperLogLog()
+    for i in range(30_000):
+        a.add(f"user-{i}")
+    for i in range(20_000, 50_000):
+        b.add(f"user-{i}")
+
+    assert abs(a.estimate() - 30_000) / 30_000 < 0.06
+    union = HyperLogLog.from_json(a.to_json()).merge(b)
+    assert abs(union.estimate() - 50_000) / 50_000 < 0.06
+    assert HyperLogLog().estimate() == 0
+
+
+@pytest.mark.asyncio
+async def test_events_are_written_in_batches_with_one_rollup_merge():
+    sink = RecordingSink()
+    pipeline = AnalyticsPipeline(sink=sink, batch_size=100)
+    for i in range(250):
+        assert pipeline.submit(make_row(latency=i))
+
+    assert await pipeline.flush() == 250
+    assert [len(b) for b in sink.batches] == [100, 100, 50]
+    keys = {(r["resolution"], r["event_type"], r["dimension"]) for r in sink.rollups}
+    assert keys == {(res, t, "") for res in ("1m", "1h", "1d") for t in ("*", "pam_response")}
+    await pipeline.stop()
+
+
+@pytest.mark.asyncio
+async def test_rollups_track_dimensions_users_and_sketches():
+    sink = RecordingSink()
+    pipeline = AnalyticsPipeline(sink=sink)
+    user = "8b9c1c1e-8a8a-4d3e-9d7e-2a4f0e1b2c3d"
+    pipeline.submit(make_row("node_execution", user=user, latency=40, data={"node_name": "wheels"}))
+    pipeline.submit(make_row("node_execution", ts="2026-03-01T10:16:05", latency=400, success=False,
+                             data={"node_name": "wheels"}))
+    pipeline.submit(make_row("feature_usage", latency=None,
+                             data={"feature_category": "trip", "feature_name": "plan"}))
+    await pipeline.stop()
+
+    rows = {(r["resolution"], r["bucket_start"], r["event_type"], r["dimension"]): r for r in sink.rollups}
+    node_hour = rows[("1h", "2026-03-01T10:00:00+00:00", "node_execution", "wheels")]
+    assert (node_hour["event_count"], node_hour["error_count"], node_hour["latency_sum"]) == (2, 1, 440)
+    assert node_hour["users_hll"] is None
+    assert ("1m", "2026-03-01T10:16:00+00:00", "node_execution", "wheels") in rows
+    assert ("1d", "2026-03-01T00:00:00+00:00", "feature_usage", "trip:plan") in rows
+
+    all_hour = rows[("1h", "2026-03-01T10:00:00+00:00", "*", "")]
+    assert all_hour["event_count"] == 3
+    assert rows[("1m", "2026-03-01T10:15:00+00:00", "*", "")]["users_hll"] is None
+
+    summary = summarize_rollups([all_hour, all_hour])[("*", "")]
+    assert summary.events == 6
+    assert summary.users.estimate() == 1
+    assert summary.average_latency == 220
+    assert 380 < summary.quantile(0.99) < 420
+
+
+def test_queue_is_bounded_and_sheds_new_events():
+    pipeline = AnalyticsPipeline(max_queue=10)
+    accepted = [pipeline.submit(make_row()) for _ in range(25)]
+
+    assert accepted.count(True) == 10
+    assert pipeline.queued == 10
+    assert pipeline.stats.dropped == 15
+
+
+@pytest.mark.asyncio
+async def test_failed_write_requeues_events_and_keeps_rollup_deltas():
+    sink = RecordingSink(fail_times=1)
+    pipeline = AnalyticsPipeline(sink=sink)
+    pipeline.submit(make_row())
+
+    assert await pipeline.flush() == 0
+    assert pipeline.stats.failed_flushes == 1
+    assert pipeline.queued == 1
+    pipeline.submit(make_row(ts="2026-03-01T10:15:40"))
+
+    assert await pipeline.flush() == 2
+    assert len(sink.batches[0]) == 2
+    hour_totals = [r for r in sink.rollups if r["resolution"] == "1h" and r["event_type"] == "*"]
+    assert sum(r["event_count"] for r in hour_totals) == 2
+    await pipeline.stop()
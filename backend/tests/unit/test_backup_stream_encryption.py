@@ -0,0 +1,101 @@
+import io
+import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services.privacy.stream_aead import (
+    HEADER_SIZE,
+    TAG_SIZE,
+    StreamFormatError,
+    decrypt_stream,
+    encrypt_stream,
+)
+
+ALGORITHMS = ["AES-256-GCM", "ChaCha20-Poly1305"]
+
+
+def _encrypt(data: bytes, key: bytes, algorithm: str, chunk_size: int = 64, executor=None) -> bytes:
+    out = io.BytesIO()
+    encrypt_stream(io.BytesIO(data), out, key, algorithm, chunk_size=chunk_size, executor=executor)
+    return out.getvalue()
+
+
+def _decrypt(blob: bytes, key: bytes, executor=None) -> bytes:
+    out = io.BytesIO()
+    decrypt_stream(io.BytesIO(blob), out, key, executor=executor)
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("algorithm", ALGORITHMS)
+@pytest.mark.parametrize("size", [0, 1, 63, 64, 65, 640, 1000])
+def test_round_trip(algorithm, size):
+    key = secrets.token_bytes(32)
+    data = os.urandom(size)
+
+    blob = _encrypt(data, key, algorithm)
+
+    assert _decrypt(blob, key) == data
+
+
+def test_result_reports_sizes_and_checksum():
+    import hashlib
+
+    key = secrets.token_bytes(32)
+    data = os.urandom(300)
+    out = io.BytesIO()
+
+    result = encrypt_stream(io.BytesIO(data), out, key, "AES-256-GCM", chunk_size=100)
+
+    assert result.plaintext_bytes == 300
+    assert result.segments == 3
+    assert result.ciphertext_bytes == len(out.getvalue()) == HEADER_SIZE + 300 + 3 * TAG_SIZE
+    assert result.plaintext_sha256 == hashlib.sha256(data).hexdigest()
+
+
+def test_parallel_matches_sequential():
+    key = secrets.token_bytes(32)
+    data = os.urandom(10_000)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        blob = _encrypt(data, key, "ChaCha20-Poly1305", chunk_size=128, executor=executor)
+        assert _decrypt(blob, key, executor=executor) == data
+
+    assert _decrypt(blob, key) == data
+
+
+def test_tampered_segment_is_rejected():
+    key = secrets.token_bytes(32)
+    blob = bytearray(_encrypt(os.urandom(500), key, "AES-256-GCM"))
+    blob[HEADER_SIZE + 10] ^= 0x01
+
+    with pytest.raises(StreamFormatError):
+        _decrypt(bytes(blob), key)
+
+
+def test_truncation_at_segment_boundary_is_rejected():
+    key = secrets.token_bytes(32)
+    blob = _encrypt(os.urandom(64 * 4), key, "AES-256-GCM", chunk_size=64)
+    segment = 64 + TAG_SIZE
+
+    with pytest.raises(StreamFormatError):
+        _decrypt(blob[:-segment], key)
+
+
+def test_reordered_segments_are_rejected():
+    key = secrets.token_bytes(32)
+    blob = _encrypt(os.urandom(64 * 3), key, "AES-256-GCM", chunk_size=64)
+    segment = 64 + TAG_SIZE
+    header, body = blob[:HEADER_SIZE], blob[HEADER_SIZE:]
+    first, second, rest = body[:segment], body[segment:2 * segment], body[2 * segment:]
+
+    with pytest.raises(StreamFormatError):
+        _decrypt(header + second + first + rest, key)
+
+
+def test_wrong_key_is_rejected():
+    blob = _encrypt(b"backup", secrets.token_bytes(32), "AES-256-GCM")
+
+    with pytest.raises(StreamFormatError):
+        _decrypt(blob, secrets.token_bytes(32))
@@ -0,0 +1,224 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.extraction import browser_pool as browser_pool_module
+from app.services.extraction.browser_pool import (
+    BrowserPool,
+    FairRequestQueue,
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+)
+
+
+class FakeRoute:
+    def __init__(self, resource_type, url="https://site.test/"):
+        self.request = SimpleNamespace(resource_type=resource_type, url=url)
+        self.outcome = None
+
+    async def abort(self):
+        self.outcome = "aborted"
+
+    async def continue_(self):
+        self.outcome = "continued"
+
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.listeners = {}
+
+    def on(self, event, handler):
+        self.listeners[event] = handler
+
+    async def goto(self, url):
+        self.listeners["framenavigated"](SimpleNamespace(parent_frame=None))
+
+    async def close(self):
+        self.context.pages.remove(self)
+
+
+class FakeCDPSession:
+    def __init__(self, context):
+        self.context = context
+
+    async def send(self, method, params):
+        if self.context.fail_storage_clear:
+            raise RuntimeError("Target closed")
+        self.context.cleared.append((method, params["origin"], params["storageTypes"]))
+
+    async def detach(self):
+        pass
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+        self.handler = None
+        self.cookies_cleared = 0
+        self.cleared = []
+        self.fail_storage_clear = False
+        self.closed = False
+
+    async def route(self, pattern, handler):
+        self.handler = handler
+
+    async def new_page(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+
+    async def new_cdp_session(self, page):
+        assert page in self.pages
+        return FakeCDPSession(self)
+
+    async def clear_cookies(self):
+        self.cookies_cleared += 1
+
+    async def clear_permissions(self):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+        self.closed = False
+
+    async def new_context(self, **options):
+        context = FakeContext()
+        self.contexts.append(context)
+        return context
+
+    def is_connected(self):
+        return not self.closed
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeChromium:
+    def __init__(self):
+        self.browsers = []
+
+    async def launch(self, **options):
+        browser = FakeBrowser()
+        self.browsers.append(browser)
+        return browser
+
+
+def fake_pool(**kwargs):
+    pool = BrowserPool(**kwargs)
+    pool._playwright = SimpleNamespace(chromium=FakeChromium())
+    pool._initialized = True
+    return pool
+
+
+@pytest.fixture(autouse=True)
+def no_process_scan(monkeypatch):
+    monkeypatch.setattr(browser_pool_module, "_browser_roots", lambda: set())
+
+
+@pytest.mark.asyncio
+async def test_context_is_reset_and_reused_with_heavy_resources_blocked():
+    pool = fake_pool(max_browsers=1, context_max_uses=2)
+
+    async with pool.page(user_id="a") as page:
+        first_context = page.context
+        image, script = FakeRoute("image"), FakeRoute("script", "https://cdn.test:8443/app.js")
+        await first_context.handler(image)
+        await first_context.handler(script)
+        await first_context.handler(FakeRoute("document", "data:text/html,hi"))
+        assert (image.outcome, script.outcome) == ("aborted", "continued")
+
+    assert first_context.pages == [] and first_context.cookies_cleared == 1
+    # Every origin the lease touched, third parties included, loses all of its storage
+    assert first_context.cleared == [
+        ("Storage.clearDataForOrigin", "https://cdn.test:8443", "all"),
+        ("Storage.clearDataForOrigin", "https://site.test", "all"),
+    ]
+
+    async with pool.page(user_id="b", block_resources=False) as page:
+        assert page.context is first_context
+        font = FakeRoute("font")
+        await first_context.handler(font)
+        assert font.outcome == "continued"
+
+    assert first_context.cleared[-1][1] == "https://site.test"
+    # Second use was the last one: the context is closed, not pooled
+    await asyncio.sleep(0)
+    assert first_context.closed and pool.pool_size == 0
+    stats = pool.get_stats()
+    assert (stats["contexts_created"], stats["contexts_reused"], stats["blocked_requests"]) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_context_whose_storage_cannot_be_cleared_is_not_reused():
+    pool = fake_pool(max_browsers=1)
+
+    async with pool.page(user_id="a") as page:
+        first_context = page.context
+        await page.close()  # the reset opens a page of its own for the CDP session
+        await first_context.handler(FakeRoute("document"))
+        first_context.fail_storage_clear = True
+
+    await asyncio.sleep(0)
+    assert first_context.closed and pool.pool_size == 0
+
+    async with pool.page(user_id="b") as page:
+        assert page.context is not first_context
+
+
+@pytest.mark.asyncio
+async def test_browser_is_recycled_after_its_navigation_budget():
+    pool = fake_pool(max_browsers=1, browser_max_navigations=3)
+    chromium = pool._playwright.chromium
+
+    for _ in range(3):
+        async with pool.page() as page:
+            await page.goto("http://example.test/")
+    await asyncio.sleep(0)
+    assert chromium.browsers[0].closed and pool.stats["recycled_navigations"] == 1
+
+    async with pool.page() as page:
+        await page.goto("http://example.test/")
+    assert len(chromium.browsers) == 2 and pool.created_count == 1
+
+
+@pytest.mark.asyncio
+async def test_waiters_are_served_by_priority_then_round_robin_across_users():
+    pool = fake_pool(max_browsers=1, contexts_per_browser=1)
+    order = []
+    release = asyncio.Event()
+
+    async def job(user_id, label, priority=PRIORITY_INTERACTIVE):
+        async with pool.page(user_id=user_id, priority=priority):
+            order.append(label)
+            if label == "hold":
+                await release.wait()
+
+    holder = asyncio.create_task(job("x", "hold"))
+    await asyncio.sleep(0)
+    tasks = [asyncio.create_task(job("bulk", f"bulk{i}")) for i in range(3)]
+    tasks.append(asyncio.create_task(job("cron", "cron", PRIORITY_BACKGROUND)))
+    tasks.append(asyncio.create_task(job("alice", "alice")))
+    await asyncio.sleep(0)
+    assert pool.get_stats()["waiting"] == 5
+
+    release.set()
+    await asyncio.gather(holder, *tasks)
+    assert order == ["hold", "bulk0", "alice", "bulk1", "bulk2", "cron"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_hold_a_turn():
+    queue = FairRequestQueue()
+    gone = queue.push(PRIORITY_INTERACTIVE, "a")
+    kept = queue.push(PRIORITY_INTERACTIVE, "b")
+    gone.cancel()
+
+    assert len(queue) == 1
+    assert queue.pop() is kept and queue.pop() is None
@@ -0,0 +1,123 @@
+import importlib
+import sys
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Other tool tests stub this module at collection time; the budget tools need the real one
+_utils = sys.modules.get("app.services.pam.tools.utils")
+if _utils is not None and not hasattr(_utils, "__file__"):
+    del sys.modules["app.services.pam.tools.utils"]
+
+from app.services.budget_analytics import month_window, summarize_daily_rows
+from app.services.pam.tools.exceptions import DatabaseError
+from app.services.pam.tools.utils import safe_db_select
+from app.services.savings_calculator import PamSavingsCalculator
+
+# The package re-exports the tool function under the module's name
+predict_module = importlib.import_module("app.services.pam.tools.budget.predict_end_of_month")
+
+USER_ID = "11111111-1111-1111-1111-111111111111"
+
+
+class FakeQuery:
+    """Records the PostgREST builder calls and returns fixed rows"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def table(self, name):
+        self.calls.append(("table", name))
+        return self
+
+    def __getattr__(self, name):
+        def record(*args, **kwargs):
+            self.calls.append((name, *args))
+            return self
+        return record
+
+    def execute(self):
+        return MagicMock(data=self.rows)
+
+
+def test_month_window_and_daily_rows_fold_per_category():
+    window = month_window(date(2028, 2, 10))
+    assert (window.start, window.end) == (date(2028, 2, 1), date(2028, 2, 29))
+    assert (window.days_elapsed, window.days_in_month) == (10, 29)
+    assert month_window(date(2026, 12, 31)).end == date(2026, 12, 31)
+
+    rows = [
+        {"category": "fuel", "day": "2026-03-01", "total": "120.50", "expense_count": 2},
+        {"category": "fuel", "day": "2026-03-18", "total": "80.00", "expense_count": 1},
+        {"category": "food", "day": "2026-03-19", "total": "42.10", "expense_count": 3},
+    ]
+    totals = summarize_daily_rows(rows)
+    assert totals["fuel"].total == Decimal("200.50")
+    assert (totals["fuel"].count, totals["fuel"].active_days) == (3, 2)
+    assert summarize_daily_rows(rows, since=date(2026, 3, 18))["fuel"].total == Decimal("80.00")
+
+
+@pytest.mark.asyncio
+async def test_forecast_reads_month_buckets_not_expenses():
+    rows = [
+        {"category": "fuel", "day": "2026-03-02", "total": "300.00", "expense_count": 3},
+        {"category": "fuel", "day": "2026-03-19", "total": "150.00", "expense_count": 1},
+        {"category": "food", "day": "2026-03-05", "total": "200.00", "expense_count": 4},
+    ]
+    client = FakeQuery(rows)
+
+    with patch("app.services.pam.tools.utils.query.get_supabase_client", return_value=client), \
+            patch.object(predict_module, "datetime") as fake_datetime:
+        fake_datetime.now.return_value = datetime(2026, 3, 20, 9, 30)
+        result = await predict_module.predict_end_of_month(USER_ID)
+
+    assert ("table", "expense_daily_totals") in client.calls
+    assert ("gte", "day", "2026-03-01") in client.calls
+    assert ("lte", "day", "2026-03-31") in client.calls
+    assert (result["days_elapsed"], result["days_in_month"]) == (20, 31)
+    fuel = result["predictions"]["fuel"]
+    assert fuel["spent_so_far"] == 450.0
+    assert fuel["projected_total"] == pytest.approx(450.0 / 20 * 31)
+    assert fuel["recent_daily_rate"] == pytest.approx(150.0 / 7)
+    assert fuel["trend"] == "steady"
+    assert result["predictions"]["food"]["trend"] == "decreasing"
+    assert result["total_projected"] == pytest.approx(650.0 / 20 * 31)
+
+
+@pytest.mark.asyncio
+async def test_safe_db_select_applies_range_bounds_and_rejects_unknown_operators():
+    client = FakeQuery([])
+    with patch("app.services.pam.tools.utils.query.get_supabase_client", return_value=client):
+        await safe_db_select("expense_daily_totals", filters={"user_id": USER_ID},
+                             ranges={"day": {"gt": "2026-01-01", "lt": "2026-02-01"}})
+        with pytest.raises(DatabaseError):
+            await safe_db_select("expense_daily_totals", ranges={"day": {"like": "2026-%"}})
+
+    assert ("gt", "day", "2026-01-01") in client.calls
+    assert ("lt", "day", "2026-02-01") in client.calls
+
+
+@pytest.mark.asyncio
+async def test_savings_calculator_uses_grouped_range_queries():
+    calculator = PamSavingsCalculator.__new__(PamSavingsCalculator)
+    calculator.logger = MagicMock()
+    calculator.supabase = MagicMock()
+    rpc_result = calculator.supabase.rpc.return_value.execute
+
+    rpc_result.return_value = MagicMock(data=[
+        {"category": "fuel", "total": "900.00", "expense_count": 12, "active_days": 9}])
+    assert await calculator.calculate_baseline_spending(USER_ID, "fuel") == Decimal("75")
+    name, params = calculator.supabase.rpc.call_args.args
+    assert name == "expense_category_totals"
+    assert params["p_category"] == "fuel"
+    assert (date.fromisoformat(params["p_end"]) - date.fromisoformat(params["p_start"])).days == 90
+
+    rpc_result.return_value = MagicMock(data=[
+        {"category": "fuel", "total_savings": "35.20", "event_count": 4},
+        {"category": "camping", "total_savings": "60.00", "event_count": 2}])
+    savings = await calculator.get_savings_by_category(USER_ID, date(2026, 3, 1), date(2026, 3, 31))
+    assert savings == {"fuel": Decimal("35.20"), "camping": Decimal("60.00")}
+    assert calculator.supabase.rpc.call_args.args[0] == "savings_category_totals"
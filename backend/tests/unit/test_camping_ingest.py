@@ -0,0 +1,82 @@
+import pytest
+
+from app.services.camping_ingest import (
+    CampingSiteIngestor,
+    content_hash,
+    natural_key,
+    normalize_site,
+)
+
+
+class FakeSink:
+    def __init__(self):
+        self.rows = {}
+        self.upsert_calls = 0
+        self.touch_calls = 0
+
+    async def existing_hashes(self, keys):
+        return {k: self.rows[k]["content_hash"] for k in keys if k in self.rows}
+
+    async def upsert(self, rows):
+        self.upsert_calls += 1
+        for row in rows:
+            self.rows[row["natural_key"]] = row
+        return len(rows)
+
+    async def touch(self, keys, last_scraped):
+        self.touch_calls += 1
+
+
+def _site(i, **overrides):
+    site = {
+        "name": f"Camp {i}",
+        "type": "free_camping",
+        "latitude": -30 - i / 1000,
+        "longitude": 150 + i / 1000,
+        "is_free": True,
+        "amenities": {"toilets": True},
+    }
+    site.update(overrides)
+    return site
+
+
+def test_natural_key_rounds_to_column_precision():
+    assert natural_key(-33.1234564, 151.2) == "-33.123456,151.200000"
+
+
+def test_normalize_rejects_unusable_sites():
+    assert normalize_site({"name": "x", "latitude": 0, "longitude": 0}, "s", "US") is None
+    assert normalize_site({"name": "", "latitude": 1, "longitude": 1}, "s", "US") is None
+    assert normalize_site({"name": "x", "latitude": "bad", "longitude": 1}, "s", "US") is None
+
+
+def test_content_hash_ignores_scrape_time():
+    a = normalize_site(_site(1, last_scraped="2024-01-01T00:00:00"), "s", "AU")
+    b = normalize_site(_site(1, last_scraped="2025-01-01T00:00:00"), "s", "AU")
+    assert a["content_hash"] == b["content_hash"] == content_hash(a)
+    assert a["country"] == "AU"
+    assert a["location_type"] == "free_camping"
+
+
+@pytest.mark.asyncio
+async def test_ingest_batches_dedups_and_skips_unchanged():
+    sink = FakeSink()
+    ingestor = CampingSiteIngestor(sink, batch_size=100)
+    sites = [_site(i) for i in range(250)] + [_site(0), {"name": "bad"}]
+
+    first = await ingestor.ingest(sites, data_source="test")
+
+    assert first.received == 252
+    assert first.invalid == 1
+    assert first.duplicates == 1
+    assert first.upserted == 250
+    assert first.batches == 3
+    assert sink.upsert_calls == 3
+
+    changed = [_site(i) for i in range(250)]
+    changed[5]["name"] = "Renamed Camp"
+    second = await ingestor.ingest(changed, data_source="test")
+
+    assert second.upserted == 1
+    assert second.unchanged == 249
+    assert sink.rows[natural_key(-30.005, 150.005)]["name"] == "Renamed Camp"
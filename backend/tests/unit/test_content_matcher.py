@@ -37,3 +37,80 @@ async def test_match_broll_by_keywords():
     assert len(matches) == 1
     assert matches[0].media_file_id == "b1"
 
+
+
+def brute_force_match(matcher, quote, media_files, threshold=0.85, speaker=None):
+    """The original exhaustive scan the index has to agree with"""
+    best, best_score = None, threshold
+    for media in media_files:
+        for seg in media.segments:
+            if speaker and seg.speaker and seg.speaker.lower() != speaker.lower():
+                continue
+            score = matcher._similarity(quote, seg.text)
+            if score >= best_score:
+                best, best_score = (media.file_id, seg.start, score), score
+    return best
+
+
+def random_corpus(rng):
+    words = ["we", "will", "win", "the", "road", "trip", "camp", "van", "north", "coast", "fuel", "night"]
+    media = []
+    for f in range(3):
+        segments = []
+        for s in range(30):
+            text = " ".join(rng.choice(words) for _ in range(rng.randint(0, 8)))
+            segments.append(TranscribedSegment(text=text, start=float(s), end=s + 1.0,
+                                               speaker=rng.choice([None, "", "Ana", "ben"])))
+        media.append(TranscribedMedia(file_id=f"f{f}", segments=segments))
+    return media
+
+
+def mutate(rng, text):
+    chars = list(text)
+    for _ in range(rng.randint(0, 3)):
+        op, pos = rng.choice("sid"), rng.randint(0, len(chars))
+        if op == "i" or not chars:
+            chars.insert(pos, rng.choice("abcdefghij ,!"))
+        elif op == "s":
+            chars[min(pos, len(chars) - 1)] = rng.choice("abcdefghij")
+        else:
+            del chars[min(pos, len(chars) - 1)]
+    return "".join(chars).upper() if rng.random() < 0.2 else "".join(chars)
+
+
+@pytest.mark.parametrize("use_rapidfuzz", [True, False])
+def test_indexed_quote_match_agrees_with_exhaustive_scan(monkeypatch, use_rapidfuzz):
+    import random
+
+    from app.services.content_matching import content_matcher as module
+
+    if use_rapidfuzz and not module.RAPIDFUZZ_AVAILABLE:
+        pytest.skip("rapidfuzz not installed")
+    monkeypatch.setattr(module, "RAPIDFUZZ_AVAILABLE", use_rapidfuzz)
+
+    rng = random.Random(7)
+    matcher = ContentMatcher()
+    media = random_corpus(rng)
+    index = module.SegmentIndex(media)
+    segments = [seg for m in media for seg in m.segments]
+    for _ in range(120):
+        quote = mutate(rng, rng.choice(segments).text)
+        speaker = rng.choice([None, "ana", "Ben"])
+        threshold = rng.choice([0.5, 0.7, 0.85, 1.0])
+        expected = brute_force_match(matcher, quote, media, threshold, speaker)
+        result = matcher._find_best_quote_match(quote, media, threshold, speaker, index=index)
+        assert (result and (result.file_id, result.start_time, result.score)) == expected
+
+
+def test_bounded_levenshtein_matches_full_distance():
+    import random
+
+    from app.services.content_matching.content_matcher import bounded_levenshtein
+
+    rng = random.Random(11)
+    for _ in range(500):
+        a = "".join(rng.choice("abc ") for _ in range(rng.randint(0, 80)))
+        b = mutate(rng, a) if rng.random() < 0.7 else "".join(rng.choice("abc") for _ in range(rng.randint(0, 80)))
+        exact = ContentMatcher._levenshtein(a, b)
+        limit = rng.randint(0, 20)
+        assert bounded_levenshtein(a, b, limit) == (exact if exact <= limit else limit + 1)
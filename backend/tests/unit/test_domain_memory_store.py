@@ -0,0 +1,162 @@
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.services.pam.domain_memory.models import TaskScope, TaskStatus
+from app.services.pam.domain_memory.storage import database_store
+
+TASK_ID = "22222222-2222-2222-2222-222222222222"
+USER_ID = "11111111-1111-1111-1111-111111111111"
+T0 = "2026-04-05T10:00:00.123456+00:00"
+T1 = "2026-04-05T10:05:00+00:00"
+
+TASK = {"id": TASK_ID, "user_id": USER_ID, "task_type": "trip_planning", "status": "pending", "priority": 7,
+        "scope": "user", "created_at": T0, "updated_at": T0, "completed_at": None, "error_message": None}
+DEFINITION = {"id": "33333333-3333-3333-3333-333333333333", "task_id": TASK_ID, "original_request": "Plan a trip",
+              "parsed_intent": {"goal": "trip"}, "work_items": [{"id": "w1", "description": "Find route"}],
+              "success_criteria": [], "created_at": T0, "updated_at": T0}
+STATE = {"id": "44444444-4444-4444-4444-444444444444", "task_id": TASK_ID, "completed_items": [],
+         "failed_items": [], "blocked_items": [], "context_snapshot": None, "worker_run_count": 2,
+         "created_at": T0, "updated_at": T1}
+CONSTRAINTS = {"id": "55555555-5555-5555-5555-555555555555", "task_id": TASK_ID, "budget_constraints": None,
+               "time_constraints": None, "scope_constraints": None, "safety_rules": None,
+               "created_at": T0, "updated_at": T0}
+TESTS = {"id": "66666666-6666-6666-6666-666666666666", "task_id": TASK_ID, "test_cases": [],
+         "validation_queries": None, "created_at": T0, "updated_at": T0}
+
+
+def context_payload(**overrides):
+    payload = {"task": TASK, "state": STATE, "progress": [],
+               "definition": DEFINITION, "definition_updated_at": T0,
+               "constraints": CONSTRAINTS, "constraints_updated_at": T0,
+               "tests": TESTS, "tests_updated_at": T0}
+    payload.update(overrides)
+    return payload
+
+
+class FakeClient:
+    """Records PostgREST builder and RPC calls; answers each with fixed rows"""
+
+    def __init__(self, rpc_data=None, table_rows=None, rpc_error=None):
+        self.rpc_data = rpc_data or {}
+        self.table_rows = table_rows or {}
+        self.rpc_error = rpc_error
+        self.calls = []
+        self.rpcs = []
+        self._data = None
+
+    def table(self, name):
+        self.calls.append(("table", name))
+        self._data = self.table_rows.get(name, [])
+        return self
+
+    def rpc(self, name, params):
+        self.rpcs.append((name, params))
+        if self.rpc_error:
+            raise self.rpc_error
+        self._data = self.rpc_data.get(name)
+        return self
+
+    def __getattr__(self, name):
+        def record(*args, **kwargs):
+            self.calls.append((name, *args))
+            if name == "maybe_single" and isinstance(self._data, list):
+                self._data = self._data[0] if self._data else None
+            return self
+        return record
+
+    def execute(self):
+        return MagicMock(data=self._data)
+
+
+def make_store(client):
+    with patch.object(database_store, "get_supabase_service", return_value=client):
+        return database_store.DomainMemoryStore()
+
+
+@pytest.mark.asyncio
+async def test_context_loads_in_one_rpc_and_reuses_unchanged_artifacts():
+    client = FakeClient(rpc_data={"domain_memory_load_context": context_payload()})
+    store = make_store(client)
+
+    context = await store.load_full_context(TASK_ID)
+    assert context.definition.work_items[0].id == "w1"
+    assert context.state.worker_run_count == 2
+    assert client.rpcs == [("domain_memory_load_context", {"p_task_id": TASK_ID, "p_progress_limit": 50})]
+
+    # Second start: the held artifacts are sent as versions and come back as updated_at only
+    client.rpc_data["domain_memory_load_context"] = context_payload(definition=None, constraints=None, tests=None)
+    again = await store.load_full_context(TASK_ID)
+    params = client.rpcs[-1][1]
+    assert params["p_definition_version"] == params["p_tests_version"] == T0
+    assert again.definition == context.definition and again.tests == context.tests
+    assert [call for call in client.calls if call[0] == "table"] == []
+
+    # A local write drops that artifact, so the next load fetches it again
+    await store.update_work_items(TASK_ID, context.definition.work_items)
+    client.rpc_data["domain_memory_load_context"] = context_payload(constraints=None, tests=None)
+    await store.load_full_context(TASK_ID)
+    assert "p_definition_version" not in client.rpcs[-1][1]
+    assert "p_constraints_version" in client.rpcs[-1][1]
+
+
+@pytest.mark.asyncio
+async def test_context_is_incomplete_when_an_artifact_is_missing():
+    client = FakeClient(rpc_data={"domain_memory_load_context": context_payload(tests=None, tests_updated_at=None)})
+    assert await make_store(client).load_full_context(TASK_ID) is None
+
+    client = FakeClient(rpc_data={"domain_memory_load_context": {"task": None}})
+    assert await make_store(client).load_full_context(TASK_ID) is None
+
+
+@pytest.mark.asyncio
+async def test_context_falls_back_to_serial_reads_without_the_rpc():
+    client = FakeClient(rpc_error=RuntimeError("PGRST202"), table_rows={
+        "domain_memory_tasks": [TASK], "domain_memory_definitions": [DEFINITION],
+        "domain_memory_states": [STATE], "domain_memory_constraints": [CONSTRAINTS],
+        "domain_memory_tests": [TESTS], "domain_memory_progress": [],
+    })
+
+    context = await make_store(client).load_full_context(TASK_ID)
+
+    assert context.task.priority == 7
+    assert [c[1] for c in client.calls if c[0] == "table"] == [
+        "domain_memory_tasks", "domain_memory_definitions", "domain_memory_states",
+        "domain_memory_constraints", "domain_memory_tests", "domain_memory_progress",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_claim_and_release_go_through_the_queue_rpcs():
+    claimed = {k: TASK[k] for k in ("id", "user_id", "task_type", "status", "priority", "scope",
+                                    "created_at", "updated_at")}
+    client = FakeClient(rpc_data={"domain_memory_claim_tasks": [claimed], "domain_memory_release_task": True})
+    store = make_store(client)
+
+    tasks = await store.claim_tasks(worker_id="host:1", limit=5, scope=TaskScope.USER)
+    assert [str(t.id) for t in tasks] == [TASK_ID] and tasks[0].status == TaskStatus.PENDING
+    assert client.rpcs[0] == ("domain_memory_claim_tasks", {
+        "p_worker_id": "host:1", "p_limit": 5, "p_lease_seconds": 300, "p_scope": "user"})
+
+    assert await store.release_task(TASK_ID, worker_id="host:1") is True
+    assert client.rpcs[1] == ("domain_memory_release_task", {"p_task_id": TASK_ID, "p_worker_id": "host:1"})
+
+
+@pytest.mark.asyncio
+async def test_user_task_list_reads_artifacts_per_page_not_per_task():
+    other = dict(TASK, id="77777777-7777-7777-7777-777777777777")
+    client = FakeClient(table_rows={
+        "domain_memory_tasks": [TASK, other],
+        "domain_memory_definitions": [{"task_id": TASK_ID, "original_request": "Plan a trip",
+                                       "work_items": [{"id": "w1"}, {"id": "w2"}]}],
+        "domain_memory_states": [{"task_id": TASK_ID, "completed_items": ["w1"], "worker_run_count": 3}],
+    })
+
+    summaries = await make_store(client).list_user_tasks(USER_ID)
+
+    assert [c[1] for c in client.calls if c[0] == "table"] == [
+        "domain_memory_tasks", "domain_memory_definitions", "domain_memory_states"]
+    assert ("in_", "task_id", [TASK_ID, other["id"]]) in client.calls
+    first, second = summaries
+    assert (first.work_items_total, first.work_items_completed, first.worker_run_count) == (2, 1, 3)
+    assert (second.original_request, second.work_items_total) == ("", 0)
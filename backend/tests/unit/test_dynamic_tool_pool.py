@@ -0,0 +1,95 @@
+import asyncio
+import os
+
+import pytest
+
+from app.services.dynamic_tools.sandbox_executor import SandboxedExecutor
+from app.services.dynamic_tools.worker_pool import ToolWorkerPool, _sandbox_audit_hook
+
+TOOL = '''
+class ProbeTool(BaseTool):
+    def __init__(self):
+        super().__init__("probe_tool")
+
+    async def execute(self, user_id, parameters=None):
+%s
+'''
+
+
+def probe(body):
+    return compile(TOOL % body, "<dynamic_tool>", "exec")
+
+
+@pytest.mark.asyncio
+async def test_generated_tool_class_can_be_defined_in_sandbox():
+    result = await SandboxedExecutor().execute_code_string(
+        TOOL % "        return ToolResult(success=True, data=parameters)", "ProbeTool", "user", {"a": 1})
+
+    assert result.success, result.error
+    assert result.data == {"a": 1}
+
+
+def test_audit_hook_allows_only_reads_and_allowlisted_hosts():
+    # Addresses the worker resolved for allowlisted hosts
+    hook = _sandbox_audit_hook({"api.open-meteo.com"}, {"104.18.2.1", "10.0.0.5"})
+
+    hook("open", ("/etc/hosts", "r", os.O_RDONLY))
+    hook("socket.getaddrinfo", ("api.open-meteo.com", 443, 0, 0, 0))
+    hook("socket.connect", (None, ("104.18.2.1", 443)))
+    for event, args in [
+        # Public, but never resolved from an allowlisted host
+        ("socket.connect", (None, ("1.1.1.1", 443))),
+        # Resolved, but private (DNS pointing into the internal network)
+        ("socket.connect", (None, ("10.0.0.5", 443))),
+        ("open", ("/tmp/x", "w", os.O_WRONLY | os.O_CREAT)),
+        ("open", ("/tmp/x", None, os.O_RDWR)),
+        ("socket.getaddrinfo", ("example.com", 80, 0, 0, 0)),
+        ("socket.connect", (None, ("127.0.0.1", 5432))),
+        ("socket.connect", (None, "/var/run/docker.sock")),
+        ("subprocess.Popen", ("sh", ["sh"], None, None)),
+    ]:
+        with pytest.raises(PermissionError):
+            hook(event, args)
+
+
+@pytest.mark.asyncio
+async def test_pool_runs_warm_and_replaces_a_worker_past_its_timeout():
+    pool = ToolWorkerPool(size=1)
+    await pool.start()
+    try:
+        echo = probe("        return ToolResult(success=True, data=parameters)")
+        first = await pool.execute_compiled_code(echo, "ProbeTool", "user", {"n": 1})
+        second = await pool.execute_compiled_code(echo, "ProbeTool", "user", {"n": 2})
+        assert (first.data, second.data) == ({"n": 1}, {"n": 2})
+        assert pool.stats["code_transfers"] == 1
+
+        # C-level loop: no signal handler runs, only the parent's kill stops it
+        spin = probe("        return ToolResult(success=True, data=sum(range(10 ** 12)))")
+        killed = await pool.execute_compiled_code(spin, "ProbeTool", "user", {}, timeout=1)
+        assert not killed.success and killed.metadata["worker_killed"]
+
+        after = await pool.execute_compiled_code(echo, "ProbeTool", "user", {"n": 3})
+        assert after.success and after.metadata["worker_pid"] != first.metadata["worker_pid"]
+        assert pool.stats["timeouts_killed"] == 1
+    finally:
+        await pool.close()
+
+
+@pytest.mark.asyncio
+async def test_cancelled_call_never_leaks_its_reply_to_the_next_caller():
+    pool = ToolWorkerPool(size=1)
+    await pool.start()
+    try:
+        slow = probe("        return ToolResult(success=True, data={'owner': user_id, 'n': sum(range(3 * 10 ** 7))})")
+        alice = asyncio.create_task(pool.execute_compiled_code(slow, "ProbeTool", "alice", {}))
+        await asyncio.sleep(0.3)
+        alice.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await alice
+
+        echo = probe("        return ToolResult(success=True, data={'owner': user_id})")
+        bob = await pool.execute_compiled_code(echo, "ProbeTool", "bob", {})
+        assert bob.data == {"owner": "bob"}
+        assert pool.stats["workers_started"] == 2
+    finally:
+        await pool.close()
@@ -0,0 +1,88 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services.search.federated import FederatedSearch, ReciprocalRankFusion, canonicalize_url
+from app.services.search.web_search import WebSearchService
+
+
+class TimedEngine:
+    def __init__(self, delay, urls, deadline_s=1.0):
+        self.delay = delay
+        self.urls = urls
+        self.deadline_s = deadline_s
+        self.calls = 0
+
+    async def search(self, query, num_results):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return [{"title": url, "url": url} for url in self.urls[:num_results]]
+
+
+def service_with(engines):
+    service = WebSearchService()
+    service.search_engines = engines
+    service.available_engines = list(engines)
+    service.cache = AsyncMock()
+    service.cache.get.return_value = None
+    return service
+
+
+def test_urls_from_different_engines_canonicalize_together():
+    same = [
+        "https://www.example.com/camps/?utm_source=x&b=2&a=1#top",
+        "http://example.com/camps?a=1&b=2",
+        "//duckduckgo.com/l/?uddg=https%3A%2F%2Fexample.com%2Fcamps%3Fb%3D2%26a%3D1&rut=abc",
+    ]
+    assert {canonicalize_url(url) for url in same} == {"https://example.com/camps?a=1&b=2"}
+
+    fusion = ReciprocalRankFusion()
+    fusion.add("google", [{"url": same[0]}, {"url": "https://a.example/"}])
+    fusion.add("duckduckgo", [{"url": "https://b.example/"}, {"url": same[2]}])
+    top = fusion.top(3)
+    assert top[0]["url"] == same[0] and top[0]["engines"] == ["google", "duckduckgo"]
+    assert [entry["url"] for entry in top[1:]] == ["https://b.example/", "https://a.example/"]
+
+
+@pytest.mark.asyncio
+async def test_slow_engine_is_dropped_after_quorum_and_soft_deadline():
+    fast = TimedEngine(0.01, ["https://a.example/", "https://b.example/"])
+    also_fast = TimedEngine(0.02, ["https://b.example/", "https://c.example/"])
+    slow = TimedEngine(5, ["https://d.example/"], deadline_s=10)
+
+    federated = FederatedSearch(
+        {"fast": fast.search("q", 10), "also_fast": also_fast.search("q", 10), "slow": slow.search("q", 10)},
+        num_results=10, deadlines={"slow": 10}, soft_deadline_s=0.1)
+    snapshots = [len(s.results_by_engine) async for s in federated.stream()]
+
+    assert snapshots == [1, 2]
+    assert federated.stop_reason == "soft_deadline" and federated.stopped_early == ["slow"]
+    assert federated.elapsed_s < 1
+    assert federated.fusion.top(1)[0]["url"] == "https://b.example/"
+
+
+@pytest.mark.asyncio
+async def test_engine_past_its_deadline_is_cancelled_and_partial_result_cached_briefly():
+    service = service_with({
+        "fast": TimedEngine(0.01, ["https://a.example/"]),
+        "hung": TimedEngine(5, ["https://z.example/"], deadline_s=0.05),
+    })
+
+    response = await service.search("campgrounds", ttl=300)
+
+    assert response["engines_used"] == ["fast"] and response["engines_timed_out"] == ["hung"]
+    assert not response["complete"]
+    assert service.cache.set.await_args.kwargs["ttl"] == 60
+
+
+@pytest.mark.asyncio
+async def test_normalized_query_is_served_from_the_in_process_cache():
+    engine = TimedEngine(0, ["https://a.example/"])
+    service = service_with({"dummy": engine})
+
+    first = await service.search("Campgrounds  near Cairns?")
+    second = await service.search("campgrounds near cairns")
+
+    assert second is first and engine.calls == 1
+    service.cache.get.assert_awaited_once()
@@ -0,0 +1,136 @@
+import pytest
+
+from app.services.geocoding.geocoding_service import (
+    GeocodingCache,
+    GeocodingService,
+    forward_key,
+    geohash_encode,
+    normalize_query,
+    quantize_proximity,
+    reverse_key,
+)
+
+
+class FakeGeocoder:
+    """Offline geocoder answering from a small gazetteer"""
+
+    PLACES = {"dubbo nsw": (148.6011, -32.2569), "broken hill nsw": (141.4539, -31.9539)}
+
+    def __init__(self):
+        self.forward_calls = []
+        self.reverse_calls = []
+
+    async def forward(self, query, **options):
+        self.forward_calls.append(query)
+        center = self.PLACES.get(normalize_query(query))
+        features = [{"place_name": query, "center": list(center)}] if center else []
+        return {"type": "FeatureCollection", "features": features}
+
+    async def reverse(self, latitude, longitude, **options):
+        self.reverse_calls.append((latitude, longitude))
+        return {"type": "FeatureCollection", "features": [{"center": [longitude, latitude]}]}
+
+
+class FakeRedisCache:
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ttl=None):
+        self.data[key] = value
+        self.ttls[key] = ttl
+
+
+def make_service(redis_cache=None, **cache_options):
+    geocoder = FakeGeocoder()
+    cache = GeocodingCache(redis_cache or FakeRedisCache(), **cache_options)
+    return GeocodingService(geocoder, cache, reverse_precision=7), geocoder
+
+
+def test_normalize_query_folds_case_punctuation_and_state_names():
+    assert normalize_query("  Dubbo, NSW ") == "dubbo nsw"
+    assert normalize_query("DUBBO   New South Wales") == "dubbo nsw"
+    assert forward_key("Dubbo, NSW", limit=1) == forward_key("dubbo new south wales", limit=1)
+    assert forward_key("Dubbo, NSW", limit=1) != forward_key("Dubbo, NSW", limit=5)
+
+
+def test_geohash_matches_reference_and_groups_nearby_fixes():
+    assert geohash_encode(57.64911, 10.40744, 11) == "u4pruydqqvj"
+    # GPS jitter in the fifth decimal place stays in the same ~150 m cell
+    assert reverse_key(-33.86881, 151.20929, 7) == reverse_key(-33.86884, 151.20931, 7)
+    assert reverse_key(-33.86881, 151.20929, 7) != reverse_key(-33.87881, 151.20929, 7)
+    assert quantize_proximity("151.20929,-33.86881") == "151.21,-33.87"
+    assert quantize_proximity("ip") == "ip"
+
+
+@pytest.mark.asyncio
+async def test_forward_lookups_hit_the_cache():
+    service, geocoder = make_service()
+
+    first = await service.coordinates("Dubbo, NSW", limit=1)
+    second = await service.coordinates("dubbo new south wales", limit=1)
+
+    assert first == second == (-32.2569, 148.6011)
+    assert geocoder.forward_calls == ["Dubbo, NSW"]
+    stats = service.get_stats()
+    assert stats["local_hits"] == 1
+    assert stats["upstream_call_reduction"] == 0.5
+
+
+@pytest.mark.asyncio
+async def test_misses_are_cached_with_the_negative_ttl():
+    redis_cache = FakeRedisCache()
+    service, geocoder = make_service(redis_cache, ttl=1000, negative_ttl=60)
+
+    assert await service.coordinates("Nowhere Creek") is None
+    assert await service.coordinates("nowhere creek") is None
+
+    assert len(geocoder.forward_calls) == 1
+    assert service.get_stats()["negative_hits"] == 1
+    assert list(redis_cache.ttls.values()) == [60]
+
+
+@pytest.mark.asyncio
+async def test_reverse_lookups_share_a_cell_and_query_its_centre():
+    service, geocoder = make_service()
+
+    await service.reverse(-33.86881, 151.20929)
+    await service.reverse(-33.86884, 151.20931)
+
+    assert len(geocoder.reverse_calls) == 1
+    center_lat, center_lon = geocoder.reverse_calls[0]
+    assert geohash_encode(center_lat, center_lon, 7) == geohash_encode(-33.86881, 151.20929, 7)
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_is_shared_between_processes():
+    redis_cache = FakeRedisCache()
+    service_a, geocoder_a = make_service(redis_cache)
+    service_b, geocoder_b = make_service(redis_cache)
+
+    await service_a.forward("Broken Hill NSW")
+    await service_b.forward("broken hill, nsw")
+
+    assert len(geocoder_a.forward_calls) == 1
+    assert geocoder_b.forward_calls == []
+    assert service_b.get_stats()["redis_hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_upstream_errors_are_not_cached():
+    service, geocoder = make_service()
+    calls = []
+
+    async def failing(query, **options):
+        calls.append(query)
+        raise RuntimeError("upstream down")
+
+    geocoder.forward = failing
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await service.forward("Dubbo")
+    assert len(calls) == 2
@@ -0,0 +1,116 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app.core.http_clients import HTTPClientRegistry, UpstreamClient, UpstreamConfig
+
+
+def make_client(handler, **config):
+    config.setdefault("retry_backoff", 0.0)
+    return UpstreamClient("test", UpstreamConfig(base_url="https://upstream.test", **config),
+                          transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_get_retries_transient_status_then_succeeds():
+    statuses = iter([503, 502, 200])
+    client = make_client(lambda request: httpx.Response(next(statuses), json={"ok": True}))
+
+    response = await client.get("/items")
+
+    assert response.status_code == 200
+    assert response.json() == {"ok": True}
+    assert client.stats.requests == 3
+    assert client.stats.retries == 2
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_post_is_not_retried_after_it_was_sent():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    client = make_client(handler)
+
+    response = await client.post("/orders", json={"id": 1})
+
+    assert response.status_code == 503
+    assert len(calls) == 1
+    assert client.stats.errors == 1
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_connect_errors_are_retried_for_any_method():
+    attempts = []
+
+    def handler(request):
+        attempts.append(request)
+        if len(attempts) == 1:
+            raise httpx.ConnectError("refused", request=request)
+        return httpx.Response(201)
+
+    client = make_client(handler)
+
+    assert (await client.post("/orders")).status_code == 201
+    assert len(attempts) == 2
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_retry_budget_caps_retries_during_an_outage():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(503)
+
+    client = make_client(handler, retries=3, retry_budget_burst=2.0, retry_budget_ratio=0.1)
+
+    for _ in range(5):
+        assert (await client.get("/down")).status_code == 503
+
+    # 5 requests, 2 burst retries, then the budget refills too slowly for more
+    assert len(calls) == 7
+    assert client.stats.retries == 2
+    assert client.stats.retries_denied == 5
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_per_upstream():
+    active, peak = 0, 0
+
+    async def handler(request):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+        return httpx.Response(200)
+
+    client = make_client(handler, max_concurrency=3)
+
+    await asyncio.gather(*(client.get(f"/{i}") for i in range(10)))
+
+    assert peak == 3
+    assert client.stats.to_dict()["requests"] == 10
+    await client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_registry_reuses_clients_and_closes_them():
+    registry = HTTPClientRegistry({"maps": UpstreamConfig(base_url="https://maps.test")})
+
+    client = registry.get("maps")
+    assert registry.get("maps") is client
+    assert registry.get("other", base_url="https://other.test").config.base_url == "https://other.test"
+
+    client._get_client()
+    await registry.close()
+    assert client._client is None
+    assert registry.get("maps") is not client
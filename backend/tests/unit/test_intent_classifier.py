@@ -0,0 +1,104 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services.analytics import pipeline as analytics_pipeline
+from app.services.pam.intent_classifier import EnhancedIntentClassifier, IntentClassification, IntentType
+from app.services.pam.intent_model import get_intent_model, load_examples
+
+USER_ID = "11111111-1111-1111-1111-111111111111"
+OTHER_USER_ID = "22222222-2222-2222-2222-222222222222"
+
+
+@pytest.fixture
+def submitted():
+    rows = []
+    fake = MagicMock(submit=rows.append)
+    with patch.object(analytics_pipeline, "get_analytics_pipeline", return_value=fake):
+        yield rows
+
+
+def make_classifier(ai_result=None):
+    classifier = EnhancedIntentClassifier(openai_api_key="")
+    classifier.ai_model = MagicMock()
+    classifier._classify_with_ai = AsyncMock(return_value=ai_result)
+    return classifier
+
+
+def test_model_beats_keyword_rules_on_held_out_corpus():
+    model = get_intent_model()
+    classifier = make_classifier()
+    examples = load_examples("eval")
+
+    model_hits = sum(model.predict(text)[0] == intent for text, intent in examples)
+    rule_hits = sum(classifier._classify_with_rules(text, {})[0].value == intent for text, intent in examples)
+
+    assert model_hits / len(examples) >= 0.8
+    assert model_hits > rule_hits
+    assert 0.0 < model.threshold < 1.0
+
+
+@pytest.mark.asyncio
+async def test_confident_prediction_skips_ai_and_repeat_is_served_from_cache(submitted):
+    classifier = make_classifier()
+    message = "How much have I spent on fuel this month?"
+
+    first = await classifier.classify_intent(message, USER_ID)
+    assert first.intent == IntentType.EXPENSE_TRACKING
+    assert first.confidence >= classifier.model.threshold
+    classifier._classify_with_ai.assert_not_awaited()
+
+    with patch.object(classifier.model, "predict", side_effect=AssertionError("cache miss")):
+        again = await classifier.classify_intent("  how much have I spent on FUEL this month ", USER_ID)
+    assert (again.intent, again.confidence) == (first.intent, first.confidence)
+
+    assert [row["event_data"]["source"] for row in submitted] == ["model", "cache"]
+    assert submitted[0]["user_id"] == USER_ID
+    assert submitted[0]["event_data"]["intent"] == "expense_tracking"
+
+
+@pytest.mark.asyncio
+async def test_ai_is_consulted_only_below_calibrated_threshold(submitted):
+    ai_answer = IntentClassification(
+        intent=IntentType.WEATHER_INQUIRY, confidence=0.95, entities=[], context_clues=["ai"],
+        suggested_handler="weather_handler", reasoning="llm", requires_clarification=False,
+        clarification_questions=[])
+    classifier = make_classifier(ai_answer)
+
+    with patch.object(classifier.model, "predict", return_value=("general_query", classifier.model.threshold / 2)):
+        result = await classifier.classify_intent("hmm", "not-a-uuid")
+
+    classifier._classify_with_ai.assert_awaited_once()
+    assert (result.intent, result.reasoning) == (IntentType.WEATHER_INQUIRY, "llm")
+    assert submitted[0]["user_id"] is None and submitted[0]["metadata"] == {"user_ref": "not-a-uuid"}
+    assert submitted[0]["event_data"]["source"] == "ai"
+
+
+@pytest.mark.asyncio
+async def test_correction_overrides_classification_for_that_user_only(submitted):
+    classifier = make_classifier()
+    message = "Is it going to be windy at the coast tomorrow?"
+    original = await classifier.classify_intent(message, USER_ID)
+
+    await classifier.learn_from_correction(USER_ID, message, original, IntentType.ROUTE_OPTIMIZATION)
+    corrected = await classifier.classify_intent(message, USER_ID)
+
+    assert (corrected.intent, corrected.confidence) == (IntentType.ROUTE_OPTIMIZATION, 1.0)
+    assert submitted[-1]["event_data"]["source"] == "correction"
+
+    other = await classifier.classify_intent(message, OTHER_USER_ID)
+    assert (other.intent, other.confidence) == (original.intent, original.confidence)
+    assert submitted[-1]["event_data"]["source"] == "cache"
+
+
+@pytest.mark.asyncio
+async def test_page_is_not_part_of_the_cached_prediction(submitted):
+    classifier = make_classifier()
+    message = "Find a caravan park near Broome for tonight"
+
+    on_budget = await classifier.classify_intent(message, USER_ID, {"current_page": "/budget"})
+    with patch.object(classifier, "_cache_get", return_value=None):
+        on_trips = await classifier.classify_intent(message, USER_ID, {"current_page": "/wheels/trips"})
+
+    # The model is trained on text alone, so a cached result is right on any page
+    assert (on_trips.intent, on_trips.confidence) == (on_budget.intent, on_budget.confidence)
@@ -0,0 +1,191 @@
+import pytest
+
+from app.integrations.iot_telemetry import (
+    AlertEvaluator,
+    DeviceAlertSink,
+    RingBuffer,
+    TelemetryPipeline,
+    ThresholdRule,
+)
+
+
+class RecordingSink:
+    def __init__(self, fail_times=0):
+        self.readings = []
+        self.rollups = []
+        self.calls = 0
+        self.fail_times = fail_times
+
+    async def write_readings(self, rows):
+        self.calls += 1
+        if self.fail_times:
+            self.fail_times -= 1
+            raise ConnectionError("db down")
+        self.readings.extend(rows)
+
+    async def write_rollups(self, rows):
+        self.rollups.extend(rows)
+
+
+class FakeClock:
+    def __init__(self, now=1_700_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_ring_buffer_keeps_newest_samples():
+    buffer = RingBuffer(capacity=3)
+    for i in range(5):
+        buffer.append(float(i), float(i * 10))
+
+    assert len(buffer) == 3
+    assert buffer.latest(5) == [40.0, 30.0, 20.0]
+    assert buffer.since(2.5) == [(3.0, 30.0), (4.0, 40.0)]
+    assert buffer.last_timestamp() == 4.0
+
+
+@pytest.mark.asyncio
+async def test_readings_are_written_in_batches():
+    sink = RecordingSink()
+    pipeline = TelemetryPipeline(sink=sink, flush_samples=100)
+    for i in range(250):
+        pipeline.record(f"dev-{i % 10}", "voltage", 12.5, ts=1000.0 + i)
+
+    assert pipeline._flush_event.is_set()
+    assert await pipeline.flush() == 250
+    assert sink.calls == 1
+    assert len(sink.readings) == 250
+    assert pipeline.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_rollups_close_per_bucket_with_min_max_avg():
+    clock = FakeClock(now=0)
+    sink = RecordingSink()
+    pipeline = TelemetryPipeline(sink=sink, clock=clock)
+    base = 3600.0 * 10
+    for second, value in ((0, 12.0), (20, 14.0), (59, 10.0), (60, 13.0)):
+        pipeline.record("dev", "voltage", value, ts=base + second)
+    pipeline.record("dev", "door", "open", ts=base)  # non-numeric: raw only
+
+    clock.now = base + 61
+    await pipeline.flush()
+    assert sink.rollups == [("dev", "voltage", "1m", base, 10.0, 14.0, 36.0, 3)]
+    assert len(sink.readings) == 5
+
+    await pipeline.stop()
+    by_resolution = {r[2]: r for r in sink.rollups[1:]}
+    assert by_resolution["1m"][3:] == (base + 60, 13.0, 13.0, 13.0, 1)
+    assert by_resolution["1h"][3:] == (base, 10.0, 14.0, 49.0, 4)
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_batch_for_retry():
+    sink = RecordingSink(fail_times=1)
+    pipeline = TelemetryPipeline(sink=sink)
+    pipeline.record("dev", "voltage", 12.0, ts=1.0)
+
+    assert await pipeline.flush() == 0
+    assert pipeline.stats.failed_flushes == 1
+    pipeline.record("dev", "voltage", 12.1, ts=2.0)
+
+    assert await pipeline.flush() == 2
+    assert [row[4] for row in sink.readings] == [1.0, 2.0]
+
+
+def test_pending_is_bounded_when_database_is_behind():
+    pipeline = TelemetryPipeline(flush_samples=10, max_pending=50)
+    for i in range(200):
+        pipeline.record("dev", "voltage", 12.0, ts=float(i))
+
+    assert pipeline.pending <= 50
+    assert pipeline.stats.dropped == 150
+    assert len(pipeline.buffers[("dev", "voltage")]) == 120
+
+
+@pytest.mark.asyncio
+async def test_alert_evaluator_fires_once_after_sustained_breach_and_resolves():
+    pipeline = TelemetryPipeline()
+    fired, resolved = [], []
+
+    async def on_alert(device_id, rule, value, ts):
+        fired.append((device_id, rule.alert_type, value))
+
+    async def on_resolve(device_id, rule, value, ts):
+        resolved.append((device_id, rule.alert_type, value))
+
+    rule = ThresholdRule("voltage", "battery_low", "high", "Low", min_value=11.8, sustain_samples=3)
+    evaluator = AlertEvaluator(pipeline, rules=[rule], on_alert=on_alert, on_resolve=on_resolve)
+
+    for ts, value in enumerate((11.5, 11.4)):
+        pipeline.record("dev", "voltage", value, ts=float(ts))
+    await evaluator.evaluate()
+    assert fired == []
+
+    pipeline.record("dev", "voltage", 11.3, ts=2.0)
+    pipeline.record("other", "temperature", 99.0, ts=2.0)
+    await evaluator.evaluate()
+    pipeline.record("dev", "voltage", 11.2, ts=3.0)
+    await evaluator.evaluate()
+    assert fired == [("dev", "battery_low", 11.3)]
+
+    pipeline.record("dev", "voltage", 12.6, ts=4.0)
+    assert await evaluator.evaluate() == 1
+    assert resolved == [("dev", "battery_low", 12.6)]
+    assert evaluator.active == {}
+
+
+class FakeAlertPool:
+    """acquire() context over a connection recording pam_device_alerts writes"""
+
+    def __init__(self):
+        self.inserted = []
+        self.resolved = []
+
+    def acquire(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def fetchval(self, query, *args):
+        assert query.startswith("INSERT INTO pam_device_alerts")
+        self.inserted.append(args)
+        return f"alert-{len(self.inserted)}"
+
+    async def execute(self, query, *args):
+        assert query.startswith("UPDATE pam_device_alerts SET resolved_at")
+        self.resolved.append(args)
+
+
+@pytest.mark.asyncio
+async def test_threshold_alerts_are_stored_notified_and_resolved():
+    pipeline = TelemetryPipeline()
+    pool, notified = FakeAlertPool(), []
+
+    async def notify(user_id, alert):
+        notified.append((user_id, alert))
+
+    sink = DeviceAlertSink(pool, owner_of={"rv-1": "user-1"}.get, notify=notify)
+    evaluator = AlertEvaluator(pipeline, on_alert=sink.on_alert, on_resolve=sink.on_resolve)
+
+    for ts, value in enumerate((11.6, 11.5, 11.4)):
+        pipeline.record("rv-1", "battery_voltage", value, ts=1000.0 + ts)
+        pipeline.record("gone", "battery_voltage", value, ts=1000.0 + ts)
+    await evaluator.evaluate()
+
+    assert len(pool.inserted) == 1
+    device_id, user_id, alert_type, severity = pool.inserted[0][:4]
+    assert (device_id, user_id, alert_type, severity) == ("rv-1", "user-1", "battery_low", "high")
+    [(notified_user, alert)] = notified
+    assert notified_user == "user-1" and alert["alert_id"] == "alert-1"
+    assert alert["metadata"]["value"] == 11.4
+
+    pipeline.record("rv-1", "battery_voltage", 12.7, ts=1003.0)
+    await evaluator.evaluate()
+    assert [args[:3] for args in pool.resolved] == [("rv-1", "battery_low", "battery_voltage")]
@@ -0,0 +1,207 @@
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.services.knowledge import ingestion_engine
+from app.services.knowledge.document_processor import DocumentProcessor, TextChunker
+from app.services.knowledge.ingestion_engine import (
+    ChromaChunkSink,
+    KnowledgeIngestionEngine,
+    SourceDocument,
+    shutdown_parse_pool,
+)
+
+
+class FakeCollection:
+    """The slice of the ChromaDB collection API the sink uses"""
+
+    def __init__(self):
+        self.rows = {}
+        self.upserts = 0
+
+    def get(self, where, include):
+        sources = set(where["source_id"]["$in"])
+        ids = [i for i, row in self.rows.items() if row["metadata"]["source_id"] in sources]
+        return {"ids": ids, "metadatas": [self.rows[i]["metadata"] for i in ids]}
+
+    def upsert(self, ids, documents, metadatas, embeddings):
+        self.upserts += 1
+        for i, document, metadata, embedding in zip(ids, documents, metadatas, embeddings):
+            self.rows[i] = {"document": document, "metadata": metadata, "embedding": embedding}
+
+    def update(self, ids, metadatas):
+        for i, metadata in zip(ids, metadatas):
+            self.rows[i]["metadata"] = metadata
+
+    def delete(self, ids):
+        for i in ids:
+            del self.rows[i]
+
+
+class FailingUpserts(FakeCollection):
+    def upsert(self, ids, documents, metadatas, embeddings):
+        raise ConnectionError("vector store down")
+
+
+class CountingEmbedder:
+    def __init__(self, gate=None):
+        self.texts = 0
+        self.calls = 0
+        self.gate = gate
+
+    def __call__(self, texts):
+        if self.gate:
+            self.gate.wait(5)
+        self.calls += 1
+        self.texts += len(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+def _manual(i, sections=6, edited=None):
+    paragraphs = [
+        f"Manual {i} section {s}: check tyre pressures, torque the wheel nuts and inspect the "
+        f"hitch before every leg of the trip." + (" Revised." if s == edited else "")
+        for s in range(sections)
+    ]
+    return SourceDocument(source_id=f"manual-{i}", content="\n\n".join(paragraphs), content_type="text")
+
+
+def _engine(collection, embed, **kwargs):
+    return KnowledgeIngestionEngine(lambda name: ChromaChunkSink(collection), embed,
+                                    chunk_size=40, chunk_overlap=5, **kwargs)
+
+
+def test_long_text_chunking_terminates_with_overlap():
+    chunker = TextChunker(chunk_size=50, chunk_overlap=10)
+    words = [f"w{i}" for i in range(175)]
+
+    chunks = chunker.chunk_by_words(" ".join(words))
+
+    assert [len(c.split()) for c in chunks] == [50, 50, 50, 50, 15]
+    assert chunks[1].split()[0] == "w40" and chunks[-1].split()[-1] == "w174"
+
+
+@pytest.mark.asyncio
+async def test_reingest_embeds_only_changed_chunks_and_drops_stale_ones():
+    collection, embed = FakeCollection(), CountingEmbedder()
+    engine = _engine(collection, embed, parse_workers=1, embed_batch_size=8, upsert_batch_size=16)
+
+    first = await engine.ingest(_manual(i) for i in range(10))
+
+    assert first.documents == 10 and first.embedded_chunks == first.chunks == len(collection.rows) > 10
+    assert embed.calls == -(-first.chunks // 8)
+
+    second = await engine.ingest([_manual(i) for i in range(10)])
+    assert second.unchanged_chunks == second.chunks and second.embedded_chunks == 0
+    assert embed.texts == first.chunks
+
+    third = await engine.ingest([_manual(3, edited=0)] + [_manual(i) for i in range(10) if i != 3])
+    shutdown_parse_pool()
+    assert third.embedded_chunks == third.stale_chunks == 1
+    assert len(collection.rows) == first.chunks
+    assert any("Revised." in row["document"] for row in collection.rows.values())
+    assert set(third.chunk_ids_by_source["manual-3"]) <= set(collection.rows)
+
+
+@pytest.mark.asyncio
+async def test_slow_embedder_stalls_parsing():
+    gate = threading.Event()
+    pulled = []
+
+    def documents():
+        for i in range(100):
+            pulled.append(i)
+            yield _manual(i)
+
+    engine = _engine(FakeCollection(), CountingEmbedder(gate), parse_workers=0, embed_batch_size=4, queue_size=4)
+    task = asyncio.create_task(engine.ingest(documents()))
+    await asyncio.sleep(0.5)
+
+    assert len(pulled) < 40  # bounded by the queues, not the input
+    gate.set()
+    stats = await task
+    assert stats.documents == 100 and stats.failed_documents == 0
+
+
+@pytest.mark.asyncio
+async def test_old_chunks_survive_a_failed_store_of_their_replacements():
+    collection = FakeCollection()
+    await _engine(collection, CountingEmbedder(), parse_workers=0).ingest([_manual(1)])
+    before = dict(collection.rows)
+
+    broken = FailingUpserts()
+    broken.rows = collection.rows
+    with pytest.raises(ConnectionError):
+        await _engine(broken, CountingEmbedder(), parse_workers=0).ingest([_manual(1, edited=0)])
+    assert collection.rows == before
+
+    stats = await _engine(collection, CountingEmbedder(), parse_workers=0).ingest([_manual(1, edited=0)])
+    assert stats.stale_chunks == 1 and len(collection.rows) == len(before)
+    assert any("Revised." in row["document"] for row in collection.rows.values())
+
+
+@pytest.mark.asyncio
+async def test_failed_store_cancels_parses_blocked_on_the_queue():
+    engine = _engine(FailingUpserts(), CountingEmbedder(), parse_workers=0, queue_size=1,
+                     embed_batch_size=1, upsert_batch_size=1)
+    with pytest.raises(ConnectionError):
+        await engine.ingest(_manual(i) for i in range(50))
+
+    parses = [t for t in asyncio.all_tasks() if "parse_one" in repr(t.get_coro())]
+    if parses:
+        _, stuck = await asyncio.wait(parses, timeout=1)
+        assert not stuck
+
+
+class BrokenPool(ProcessPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.shut_down = False
+
+    def submit(self, *args, **kwargs):
+        raise BrokenProcessPool("worker killed")
+
+    def shutdown(self, *args, **kwargs):
+        self.shut_down = True
+        super().shutdown(*args, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_broken_parse_pool_is_shut_down_and_the_document_parsed_in_a_thread(monkeypatch):
+    broken = BrokenPool()
+    monkeypatch.setattr(ingestion_engine, "_parse_pool", broken)
+    collection = FakeCollection()
+
+    stats = await _engine(collection, CountingEmbedder(), parse_workers=1).ingest([_manual(1)])
+
+    assert broken.shut_down and ingestion_engine._parse_pool is None
+    assert stats.failed_documents == 0 and collection.rows
+
+
+@pytest.mark.asyncio
+async def test_batch_urls_stream_bounded_fetches_and_omit_failures():
+    vector_store = type("VectorStore", (), {"_initialized": True, "_fallback_mode": False})()
+    processor = DocumentProcessor(vector_store)
+    processor.engine = _engine(FakeCollection(), CountingEmbedder(), parse_workers=0)
+    in_flight, peak = 0, 0
+
+    async def fetch_html(url):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if url.endswith("/2"):
+            raise ConnectionError("HTTP 503")
+        return f"<html><body><p>{_manual(url[-1]).content}</p></body></html>"
+
+    processor._fetch_html = fetch_html
+    urls = [f"https://manuals.example/{i}" for i in range(4)]
+    results = await processor.batch_process_urls(urls, max_concurrent=2)
+
+    assert peak == 2
+    assert list(results) == [urls[0], urls[1], urls[3]]
+    assert all(results.values())
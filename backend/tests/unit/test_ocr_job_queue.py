@@ -0,0 +1,103 @@
+import time
+
+import pytest
+
+from app.services.ocr.job_queue import (
+    MAX_ATTEMPTS,
+    VISIBILITY_TIMEOUT_SECONDS,
+    OCRJobQueue,
+    _MemoryBackend,
+)
+from app.services.ocr.models import OCRResult
+from app.workers import ocr_cpu
+from tests.fixtures.pdf_fixtures import build_text_pdf
+
+
+@pytest.fixture
+def queue():
+    q = OCRJobQueue()
+    q._backend = _MemoryBackend()
+    return q
+
+
+def _result(text="hello"):
+    return OCRResult(text=text, confidence=1.0, confidence_method="pdf_text_exact", method="pdf_text")
+
+
+@pytest.mark.asyncio
+async def test_submit_claim_complete(queue):
+    job = await queue.submit("user-1", "a.pdf", b"data", file_hash="sha256:a")
+    assert job["status"] == "queued"
+    assert await queue.active_count() == 1
+
+    claimed_job, payload = await queue.claim(timeout=0.1)
+    assert claimed_job["job_id"] == job["job_id"]
+    assert payload == b"data"
+    assert (await queue.get_job(job["job_id"]))["status"] == "processing"
+
+    await queue.complete(claimed_job, _result())
+
+    stored = await queue.get_job(job["job_id"])
+    assert stored["status"] == "completed"
+    assert stored["result"]["text"] == "hello"
+    assert await queue.active_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_cached_result_completes_without_queueing(queue):
+    job = await queue.submit("user-1", "a.pdf", b"data", file_hash="sha256:a", cached_result=_result())
+
+    assert job["status"] == "completed"
+    assert await queue.active_count() == 0
+    assert await queue.claim(timeout=0.01) is None
+
+
+@pytest.mark.asyncio
+async def test_duplicate_in_flight_follows_leader(queue):
+    leader = await queue.submit("user-1", "a.pdf", b"data", file_hash="sha256:a")
+    follower = await queue.submit("user-2", "b.pdf", b"data", file_hash="sha256:a")
+
+    assert follower["follows"] == leader["job_id"]
+    assert await queue.active_count() == 1
+
+    claimed_job, _ = await queue.claim(timeout=0.1)
+    await queue.complete(claimed_job, _result("shared"))
+
+    mirrored = await queue.get_job(follower["job_id"])
+    assert mirrored["status"] == "completed"
+    assert mirrored["result"]["text"] == "shared"
+    assert mirrored["user_id"] == "user-2"
+
+
+@pytest.mark.asyncio
+async def test_stalled_jobs_are_requeued_then_failed(queue):
+    job = await queue.submit("user-1", "a.pdf", b"data", file_hash="sha256:a")
+
+    for attempt in range(MAX_ATTEMPTS):
+        claimed_job, _ = await queue.claim(timeout=0.1)
+        claimed_job["started_at"] = time.time() - VISIBILITY_TIMEOUT_SECONDS - 1
+        await queue._save_job(claimed_job)
+        requeued = await queue.requeue_stalled()
+        assert requeued == (1 if attempt < MAX_ATTEMPTS - 1 else 0)
+
+    assert (await queue.get_job(job["job_id"]))["status"] == "failed"
+    assert await queue.active_count() == 0
+
+
+def test_page_batches_cover_all_pages():
+    assert ocr_cpu.page_batches(0) == []
+    assert ocr_cpu.page_batches(3, 4) == [(0, 3)]
+    assert ocr_cpu.page_batches(9, 4) == [(0, 4), (4, 8), (8, 9)]
+
+
+@pytest.mark.asyncio
+async def test_parallel_pdf_extraction_matches_sequential():
+    pdf = build_text_pdf([f"Page number {i}" for i in range(9)])
+
+    sequential = ocr_cpu.extract_pdf_text(pdf)
+    parallel = await ocr_cpu.extract_pdf_text_parallel(pdf, pages_per_task=2)
+    ocr_cpu.shutdown_process_pool()
+
+    assert parallel == sequential
+    assert parallel[1] == 9
+    assert "Page number 8" in parallel[0]
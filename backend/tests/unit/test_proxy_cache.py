@@ -0,0 +1,168 @@
+import asyncio
+import gzip
+import json
+import time
+
+import httpx
+import pytest
+from starlette.requests import Request
+
+from app.core.http_clients import UpstreamClient, UpstreamConfig
+from app.core.proxy_cache import ProxyCache, canonical_request, to_response
+
+ROUTE = {"routes": [{"distance": 412345.6, "geometry": "abc" * 200}]}
+
+
+class FakeRedisCache:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ttl=None):
+        self.data[key] = json.loads(json.dumps(value))
+
+
+def make_proxy(handler, redis_cache=None, **options):
+    client = UpstreamClient("mock", UpstreamConfig(base_url="https://upstream.test", retry_backoff=0.0),
+                            transport=httpx.MockTransport(handler))
+    return ProxyCache("mock", client=client, redis_cache=redis_cache or FakeRedisCache(), **options)
+
+
+def raw_response(status, body, **headers):
+    # A streamed body, as a network transport returns it, so aiter_raw() sees the encoded bytes
+    return httpx.Response(status, stream=httpx.ByteStream(body), headers=headers)
+
+
+def gzip_json(payload, **headers):
+    return raw_response(200, gzip.compress(json.dumps(payload).encode()),
+                        **{"content-type": "application/json", "content-encoding": "gzip", **headers})
+
+
+def client_request(**headers):
+    return Request({"type": "http", "method": "GET", "path": "/", "query_string": b"",
+                    "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()]})
+
+
+def test_canonical_request_sorts_params_rounds_coordinates_and_skips_tokens():
+    path_a, params_a, _, key_a = canonical_request(
+        "GET", "/directions/v5/mapbox/driving/151.2093123,-33.8688456;150.1,-34.2",
+        {"steps": True, "access_token": "pk.a", "alternatives": False})
+    path_b, _, _, key_b = canonical_request(
+        "GET", "/directions/v5/mapbox/driving/151.2093121,-33.8688459;150.1,-34.2",
+        {"alternatives": False, "access_token": "pk.b", "steps": True})
+
+    assert path_a == "/directions/v5/mapbox/driving/151.20931,-33.86885;150.1,-34.2"
+    assert list(params_a) == ["access_token", "alternatives", "steps"]
+    assert params_a["steps"] == "true"
+    assert key_a == key_b
+    assert "pk.a" not in key_a
+
+    _, _, body_a, key_c = canonical_request("POST", "/v2/directions", json_body={
+        "profile": "driving-hgv", "coordinates": [[151.2093123, -33.8688456]]})
+    _, _, body_b, key_d = canonical_request("POST", "/v2/directions", json_body={
+        "coordinates": [[151.2093121, -33.8688459]], "profile": "driving-hgv"})
+    assert body_a == body_b and key_c == key_d
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_share_one_upstream_call():
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        await asyncio.sleep(0.02)
+        return gzip_json(ROUTE)
+
+    proxy = make_proxy(handler)
+
+    results = await asyncio.gather(*(proxy.fetch("GET", "/directions/a", params={"steps": "true"})
+                                     for _ in range(10)))
+
+    assert len(calls) == 1
+    assert sorted(status for _, status in results) == ["COALESCED"] * 9 + ["MISS"]
+    assert (await proxy.fetch("GET", "/directions/a", params={"steps": "true"}))[1] == "HIT"
+    assert proxy.get_stats()["upstream_request_reduction"] == round(10 / 11, 4)
+
+
+@pytest.mark.asyncio
+async def test_gzip_body_is_passed_through_without_re_encoding():
+    raw = gzip.compress(json.dumps(ROUTE).encode(), mtime=0)
+    proxy = make_proxy(lambda request: raw_response(
+        200, raw, **{"content-type": "application/json", "content-encoding": "gzip"}))
+
+    result = await proxy.fetch("GET", "/route")
+    gzip_response = to_response(result, client_request(**{"Accept-Encoding": "gzip, br"}))
+    plain_response = to_response(result, client_request())
+
+    assert result[0].body == raw
+    assert gzip_response.headers["content-encoding"] == "gzip"
+    assert gzip_response.body == raw
+    assert "content-encoding" not in plain_response.headers
+    assert json.loads(plain_response.body) == ROUTE
+
+
+@pytest.mark.asyncio
+async def test_cache_control_is_honoured():
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        cache_control = "no-store" if request.url.path == "/private" else "max-age=60"
+        return gzip_json(ROUTE, **{"cache-control": cache_control})
+
+    redis_cache = FakeRedisCache()
+    proxy = make_proxy(handler, redis_cache, default_ttl=600)
+
+    await proxy.fetch("GET", "/private")
+    await proxy.fetch("GET", "/private")
+    entry, _ = await proxy.fetch("GET", "/public")
+    await proxy.fetch("GET", "/public")
+
+    assert calls == ["/private", "/private", "/public"]
+    assert proxy.stats["not_stored"] == 2
+    assert len(redis_cache.data) == 1
+    assert 0 < entry.expires_at - time.time() <= 60
+
+
+@pytest.mark.asyncio
+async def test_stale_entries_are_revalidated_with_etag():
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304, headers={"etag": '"v1"', "cache-control": "no-cache"})
+        return gzip_json(ROUTE, etag='"v1"', **{"cache-control": "no-cache"})
+
+    proxy = make_proxy(handler)
+
+    first, first_status = await proxy.fetch("GET", "/isochrone")
+    second, second_status = await proxy.fetch("GET", "/isochrone")
+
+    assert seen == [None, '"v1"']
+    assert (first_status, second_status) == ("MISS", "REVALIDATED")
+    assert second.body == first.body
+    assert to_response((second, second_status), client_request(**{"If-None-Match": '"v1"'})).status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_redis_tier_serves_other_workers_and_errors_are_not_cached():
+    redis_cache = FakeRedisCache()
+
+    def handler(request):
+        if request.url.path == "/missing":
+            return raw_response(404, b'{"message": "Not Found"}', **{"content-type": "application/json"})
+        return gzip_json(ROUTE)
+
+    worker_a = make_proxy(handler, redis_cache)
+    worker_b = make_proxy(lambda request: pytest.fail("worker B should be served from Redis"), redis_cache)
+
+    await worker_a.fetch("GET", "/route")
+    entry, status = await worker_b.fetch("GET", "/route")
+    assert status == "HIT" and entry.json() == ROUTE
+
+    assert (await worker_a.fetch("GET", "/missing"))[0].status_code == 404
+    assert (await worker_a.fetch("GET", "/missing"))[0].status_code == 404
+    assert worker_a.stats["upstream_requests"] == 3
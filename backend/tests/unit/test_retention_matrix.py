@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.services.usage_tracking_service import UsageTrackingService, build_retention_matrix
+
+
+def matrix_rows(today):
+    return [
+        {"cohort_start": (today - timedelta(days=30)).isoformat(), "period": 1, "cohort_size": 200, "retained": 90},
+        {"cohort_start": (today - timedelta(days=30)).isoformat(), "period": 30, "cohort_size": 200, "retained": 20},
+        {"cohort_start": (today - timedelta(days=7)).isoformat(), "period": 7, "cohort_size": 50, "retained": 10},
+        {"cohort_start": (today - timedelta(days=1)).isoformat(), "period": 1, "cohort_size": 40, "retained": 18},
+        {"cohort_start": (today - timedelta(days=1)).isoformat(), "period": 7, "cohort_size": 40, "retained": 0},
+    ]
+
+
+def make_service(rows):
+    service = UsageTrackingService.__new__(UsageTrackingService)
+    service.supabase = MagicMock()
+    service.supabase.rpc.return_value.execute.return_value = MagicMock(data=rows)
+    return service
+
+
+def test_build_retention_matrix_fills_missing_and_future_periods():
+    today = date(2026, 3, 31)
+    matrix = build_retention_matrix(matrix_rows(today), "day", [1, 7, 30], today)
+
+    assert [c.cohort_start for c in matrix.cohorts] == [today - timedelta(days=d) for d in (30, 7, 1)]
+    oldest, week_ago, yesterday = matrix.cohorts
+    assert oldest.retained == {1: 90, 7: 0, 30: 20}
+    assert oldest.rates[30] == pytest.approx(0.1)
+    assert week_ago.retained == {1: 0, 7: 10, 30: None}
+    assert yesterday.rates == {1: pytest.approx(0.45), 7: None, 30: None}
+
+
+def test_weekly_periods_start_a_week_apart():
+    today = date(2026, 3, 31)
+    rows = [{"cohort_start": "2026-03-16", "period": 2, "cohort_size": 10, "retained": 3}]
+    matrix = build_retention_matrix(rows, "week", [1, 2, 3], today)
+
+    assert matrix.cohorts[0].retained == {1: 0, 2: 3, 3: None}
+
+
+@pytest.mark.asyncio
+async def test_retention_rates_come_from_one_matrix_query():
+    today = date.today()
+    service = make_service(matrix_rows(today))
+
+    metrics = await service.calculate_retention_rates()
+
+    service.supabase.rpc.assert_called_once()
+    name, params = service.supabase.rpc.call_args.args
+    assert name == "user_retention_matrix"
+    assert params["p_periods"] == [1, 7, 30]
+    assert params["p_cohorts"] == [(today - timedelta(days=d)).isoformat() for d in (1, 7, 30)]
+    assert metrics.d1_retention == pytest.approx(0.45)
+    assert metrics.d7_retention == pytest.approx(0.2)
+    assert metrics.d30_retention == pytest.approx(0.1)
+    assert metrics.cohort_size == 40
+
+
+@pytest.mark.asyncio
+async def test_retention_matrix_rejects_periods_past_ninety_days():
+    service = make_service([])
+    with pytest.raises(ValueError):
+        await service.get_retention_matrix(date(2026, 1, 1), date(2026, 3, 1), "week", [1, 13])
+    with pytest.raises(ValueError):
+        await service.get_retention_matrix(date(2026, 1, 1), date(2026, 3, 1), "month")
+    with pytest.raises(ValueError):
+        await service.get_retention_matrix(date(2026, 1, 1), date(2026, 3, 1), "week", [1], cohorts=[date(2026, 1, 5)])
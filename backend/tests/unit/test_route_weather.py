@@ -0,0 +1,133 @@
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from app.services.pam.tools import route_weather
+from app.services.pam.tools.openmeteo_weather_tool import OpenMeteoWeatherTool
+from app.services.pam.tools.route_weather import (
+    CellWeatherCache,
+    OpenMeteoBatchClient,
+    RouteWeatherService,
+    haversine_km,
+    sample_route,
+    weather_cell,
+)
+
+SYDNEY = (-33.8688, 151.2093)
+DUBBO = (-32.2569, 148.6011)
+BROKEN_HILL = (-31.9539, 141.4539)
+
+
+def conditions(windspeed=8.0, code=1):
+    return {
+        "current_weather": {"temperature": 71.0, "windspeed": windspeed, "winddirection": 200,
+                            "weathercode": code, "is_day": 1},
+        "hourly": {"relativehumidity_2m": [40], "visibility": [24000], "windgusts_10m": [12]},
+    }
+
+
+class FakeOpenMeteo:
+    """Stands in for the pooled OpenMeteo client, answering any number of coordinates"""
+
+    def __init__(self):
+        self.requests = []
+
+    async def get(self, path, params=None):
+        latitudes = params["latitude"].split(",")
+        self.requests.append(len(latitudes))
+        payloads = [conditions() for _ in latitudes]
+        return MagicMock(status_code=200, json=lambda: payloads if len(payloads) > 1 else payloads[0])
+
+
+class FakeRedisCache:
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ttl=None):
+        self.data[key] = value
+
+
+def test_route_is_sampled_at_the_interval_and_keeps_stops():
+    route = [SYDNEY, DUBBO, BROKEN_HILL]
+    total = haversine_km(SYDNEY, DUBBO) + haversine_km(DUBBO, BROKEN_HILL)
+
+    samples = sample_route(route, interval_km=50)
+    assert samples[0] == (*SYDNEY, 0.0)
+    assert samples[-1][:2] == BROKEN_HILL and samples[-1][2] == pytest.approx(total)
+    assert [round(s[2]) for s in samples[1:4]] == [50, 100, 150]
+    assert len(samples) == int(total // 50) + 2
+
+    with_stop = sample_route(route, interval_km=50, stops=[1])
+    assert (*DUBBO, pytest.approx(haversine_km(SYDNEY, DUBBO))) in with_stop
+    assert [s[2] for s in with_stop] == sorted(s[2] for s in with_stop)
+
+    # A dense polyline is capped at max_samples
+    dense = [(SYDNEY[0] + i * 0.001, SYDNEY[1]) for i in range(1000)]
+    assert len(sample_route(dense, interval_km=0.01, max_samples=20)) <= 21
+
+
+@pytest.mark.asyncio
+async def test_nearby_samples_share_a_cell_and_cells_are_fetched_in_batches():
+    upstream = FakeOpenMeteo()
+    service = RouteWeatherService(OpenMeteoBatchClient(batch_size=10), CellWeatherCache(FakeRedisCache()),
+                                  interval_km=1, precision=5)
+    route = [SYDNEY, DUBBO]
+
+    with patch.object(route_weather, "get_http_client", return_value=upstream):
+        first = await service.route_weather(route, "imperial")
+        cells = {sample.cell for sample, _ in first}
+        assert len(first) > len(cells)
+        assert sum(upstream.requests) == len(cells)
+        assert max(upstream.requests) == 10
+        assert first[0][1]["wind_speed"] == "8.0 mph"
+
+        upstream.requests.clear()
+        again = await service.route_weather(route, "imperial")
+
+    assert upstream.requests == []
+    assert len(again) == len(first)
+    stats = service.get_stats()
+    assert stats["cache_hit_rate"] == 0.5
+    assert stats["cells_fetched"] == len(cells)
+
+
+@pytest.mark.asyncio
+async def test_cache_is_shared_through_redis_and_keyed_by_units():
+    redis_cache = FakeRedisCache()
+    upstream = FakeOpenMeteo()
+    with patch.object(route_weather, "get_http_client", return_value=upstream):
+        await RouteWeatherService(cache=CellWeatherCache(redis_cache)).route_weather([SYDNEY], "imperial")
+        # Another worker: empty LRU, same Redis
+        await RouteWeatherService(cache=CellWeatherCache(redis_cache)).route_weather([SYDNEY], "imperial")
+        assert upstream.requests == [1]
+        await RouteWeatherService(cache=CellWeatherCache(redis_cache)).route_weather([SYDNEY], "metric")
+    assert upstream.requests == [1, 1]
+    assert all(weather_cell(*SYDNEY) in key for key in redis_cache.data)
+
+
+@pytest.mark.asyncio
+async def test_tool_resolves_names_once_and_labels_stops():
+    tool = OpenMeteoWeatherTool()
+    service = RouteWeatherService(cache=CellWeatherCache(FakeRedisCache()), interval_km=100)
+    lookup = AsyncMock(side_effect=lambda name: {"Dubbo, NSW": DUBBO}.get(name, (None, None)))
+
+    with patch("app.services.pam.tools.openmeteo_weather_tool.route_weather_service", service), \
+            patch("app.services.pam.tools.openmeteo_weather_tool._get_coordinates_for_city", lookup), \
+            patch.object(route_weather, "get_http_client", return_value=FakeOpenMeteo()):
+        result = await tool._get_route_weather(
+            [f"{SYDNEY[0]},{SYDNEY[1]}", "Dubbo, NSW", "dubbo nsw", "Atlantis",
+             {"lat": BROKEN_HILL[0], "lng": BROKEN_HILL[1]}],
+            "imperial",
+        )
+
+    # Looked up as the user wrote them; "dubbo nsw" is the same place and isn't looked up again
+    assert [c.args[0] for c in lookup.await_args_list] == ["Dubbo, NSW", "Atlantis"]
+    assert result["unresolved_points"] == ["Atlantis"]
+    labels = [point["location"] for point in result["route_weather"]]
+    assert labels[0] == f"{SYDNEY[0]},{SYDNEY[1]}"
+    assert "Dubbo, NSW" in labels
+    assert labels[-1] == "-31.9539, 141.4539"
+    assert result["overall_safety"] == "Safe"
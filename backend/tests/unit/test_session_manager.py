@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+from app.services.auth.session_manager import SecureSessionManager
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")  # fakeredis needs it for EVALSHA
+
+
+@pytest.fixture
+def manager():
+    manager = SecureSessionManager()
+    manager.redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    manager.max_sessions_per_user = 3
+    manager.sweep_batch_size = 2
+    return manager
+
+
+async def expire(manager, session):
+    """Backdate a session in the expiry index (the key TTL is not needed for the sweep)"""
+    member = manager._expiry_member(session.session_id, session.user_id)
+    await manager.redis_client.zadd(manager.expiry_key, {member: time.time() - 10})
+
+
+@pytest.mark.asyncio
+async def test_session_limit_invalidates_oldest_in_one_batch(manager):
+    sessions = [await manager.create_session("user-1", f"jti-{i}") for i in range(5)]
+    r = manager.redis_client
+
+    remaining = await r.zrange("user_sessions:user-1", 0, -1)
+    assert remaining == [s.session_id for s in sessions[2:]]
+    assert await r.zcard(manager.expiry_key) == 3
+    assert await manager.is_jwt_blacklisted("jti-0")
+    assert await manager.is_jwt_blacklisted("jti-1")
+    assert not await manager.is_jwt_blacklisted("jti-2")
+    assert await manager.get_session(sessions[0].session_id) is None
+
+
+@pytest.mark.asyncio
+async def test_sweep_removes_due_sessions_in_batches(manager):
+    r = manager.redis_client
+    old = [await manager.create_session(f"user-{i}", f"jti-{i}") for i in range(5)]
+    live = await manager.create_session("user-0", "jti-live")
+    for session in old:
+        await expire(manager, session)
+
+    assert await manager.sweep_expired_sessions(max_batches=1) == 2
+    assert await manager.sweep_expired_sessions() == 3
+
+    assert await r.zrange(manager.expiry_key, 0, -1) == [manager._expiry_member(live.session_id, "user-0")]
+    assert await r.zrange("user_sessions:user-0", 0, -1) == [live.session_id]
+    assert not await r.exists("user_sessions:user-3")
+    assert await r.exists(f"session:{old[0].session_id}") == 0
+    assert (await manager.get_session_stats())["total_sessions"] == 1
+
+
+@pytest.mark.asyncio
+async def test_activity_pushes_expiry_back(manager):
+    session = await manager.create_session("user-1", "jti-1")
+    await expire(manager, session)
+
+    assert await manager.update_session_activity(session.session_id)
+    assert await manager.sweep_expired_sessions() == 0
+    assert await manager.get_session(session.session_id) is not None
+
+
+@pytest.mark.asyncio
+async def test_invalidate_all_user_sessions_pipelined(manager):
+    sessions = [await manager.create_session("user-1", f"jti-{i}") for i in range(3)]
+    other = await manager.create_session("user-2", "jti-other")
+
+    assert await manager.invalidate_all_user_sessions("user-1") == 3
+    assert await manager.get_user_sessions("user-1") == []
+    assert [s.session_id for s in await manager.get_user_sessions("user-2")] == [other.session_id]
+    assert all([await manager.is_jwt_blacklisted(s.jti) for s in sessions])
+    assert await manager.redis_client.zcard(manager.expiry_key) == 1
+
+
+@pytest.mark.asyncio
+async def test_backfill_indexes_sessions_created_before_the_index(manager):
+    r = manager.redis_client
+    await r.setex("session:live", 3600, '{"session_id": "live"}')
+    await r.zadd("user_sessions:user-1", {"live": 1, "gone": 2})
+    await r.zadd("user_sessions:user-2", {"gone-too": 1})
+
+    await manager._cleanup_expired_sessions()
+
+    scores = dict(await r.zrange(manager.expiry_key, 0, -1, withscores=True))
+    assert list(scores) == ["live:user-1"]
+    assert 3500 < scores["live:user-1"] - time.time() <= 3600
+    assert await r.zrange("user_sessions:user-1", 0, -1) == ["live"]
+    assert not await r.exists("user_sessions:user-2")
+    assert await r.exists(manager.expiry_backfill_key)
@@ -0,0 +1,143 @@
+import importlib
+import importlib.util
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Other tool tests stub this module at collection time; the search tools need the real one
+_utils = sys.modules.get("app.services.pam.tools.utils")
+if _utils is not None and not hasattr(_utils, "__file__"):
+    del sys.modules["app.services.pam.tools.utils"]
+
+from app.services.text_search import ingredient_terms, search_terms
+
+# The packages re-export the tool functions under the modules' names
+medical_module = importlib.import_module("app.services.pam.tools.medical.search_medical_records")
+products_module = importlib.import_module("app.services.pam.tools.shop.search_products")
+recommend_module = importlib.import_module("app.services.pam.tools.shop.recommend_products")
+
+USER_ID = "11111111-1111-1111-1111-111111111111"
+
+# The meals package imports the recipe scrapers on load; this test only needs the search tool
+_spec = importlib.util.spec_from_file_location(
+    "search_recipes_tool",
+    Path(__file__).resolve().parents[2] / "app" / "services" / "pam" / "tools" / "meals" / "search_recipes.py")
+recipes_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(recipes_module)
+
+
+class FakeClient:
+    """Records PostgREST builder and RPC calls; answers each with fixed rows"""
+
+    def __init__(self, rpc_rows=None, table_rows=None):
+        self.rpc_rows = rpc_rows or []
+        self.table_rows = table_rows or {}
+        self.calls = []
+        self.rpcs = []
+        self._rows = []
+
+    def table(self, name):
+        self.calls.append(("table", name))
+        self._rows = self.table_rows.get(name, [])
+        return self
+
+    def rpc(self, name, params):
+        self.rpcs.append((name, params))
+        self._rows = self.rpc_rows
+        return self
+
+    def __getattr__(self, name):
+        def record(*args, **kwargs):
+            self.calls.append((name, *args))
+            return self
+        return record
+
+    def execute(self):
+        return MagicMock(data=self._rows)
+
+
+def test_terms_drop_stop_words_and_ingredients_match_the_stored_forms():
+    assert search_terms("What is my cholesterol level") == ["cholesterol", "level"]
+    assert search_terms("is it ok") == ["is", "it", "ok"]
+    assert search_terms("  ") == []
+
+    # Same normalization as public.ingredient_terms: lower-cased name plus naive singular
+    assert ingredient_terms(["Peanuts", "  Tree   Nuts ", "eggs", "gas", "peanuts"]) == [
+        "peanuts", "peanut", "tree nuts", "tree nut", "eggs", "egg", "gas",
+    ]
+    assert ingredient_terms(None) == []
+
+
+@pytest.mark.asyncio
+async def test_medical_search_returns_server_side_highlights():
+    hit = {"id": "rec-1", "type": "lab_result", "title": "Blood test", "summary": "Lipids", "tags": None,
+           "test_date": "2026-02-01", "has_structured_data": True, "rank": 0.4213,
+           "highlight": "elevated LDL **cholesterol**"}
+    client = FakeClient(rpc_rows=[hit], table_rows={"medical_records": [
+        {"id": "rec-1", "type": "lab_result", "title": "Blood test", "test_date": "2026-02-01"},
+        {"id": "rec-2", "type": "imaging", "title": "Knee scan", "test_date": "2026-01-09"},
+    ]})
+
+    with patch.object(medical_module, "get_supabase_client", return_value=client):
+        result = await medical_module.search_medical_records(USER_ID, "my cholesterol results", limit=5)
+
+    assert client.rpcs == [("search_medical_records_ranked",
+                            {"p_user_id": USER_ID, "p_terms": ["cholesterol", "results"], "p_limit": 5})]
+    # The only table read left is the bounded lookup of records without OCR text
+    assert ("select", "id,type,title,test_date") in client.calls
+    assert result["results"][0]["matching_text"] == "elevated LDL **cholesterol**"
+    assert result["results"][0]["has_structured_data"] is True
+    assert [r["id"] for r in result["unsearchable_records"]] == ["rec-2"]
+
+
+@pytest.mark.asyncio
+async def test_recipe_filters_run_in_the_database():
+    recipe = {"id": "r1", "title": "Chickpea curry", "dietary_tags": ["vegan", "gluten-free"]}
+    client = FakeClient(rpc_rows=[{"recipe": recipe, "rank": 0.3}], table_rows={
+        "user_dietary_preferences": [{"dietary_restrictions": ["vegan"], "allergies": ["Peanuts"]}],
+    })
+
+    with patch.object(recipes_module, "get_supabase_client", return_value=client):
+        result = await recipes_module.search_recipes(
+            USER_ID, query="quick curry", ingredients=["chickpeas"], dietary_tags=["gluten-free", "vegan"],
+            max_prep_time=30, limit=5)
+
+    name, params = client.rpcs[0]
+    assert name == "search_recipes_ranked"
+    assert params["p_terms"] == ["quick", "curry"]
+    assert params["p_required_tags"] == ["gluten-free", "vegan"]
+    assert params["p_exclude_ingredients"] == ["peanuts", "peanut"]
+    assert params["p_any_ingredients"] == ["chickpeas", "chickpea"]
+    assert (params["p_max_prep_time"], params["p_limit"]) == (30, 5)
+    assert result["recipes"] == [recipe]
+    assert result["allergies_filtered"] == ["Peanuts"]
+
+
+@pytest.mark.asyncio
+async def test_product_tools_use_ranked_search():
+    product = {"id": "p1", "title": "Solar panel", "description": "Portable", "price": 299, "category":
+               "power_electronics", "affiliate_url": "https://example.com/p1", "image_url": None,
+               "rank": 0.39, "highlight": "Portable **solar**"}
+    client = FakeClient(rpc_rows=[product])
+
+    with patch.object(recommend_module, "get_supabase_client", return_value=client):
+        result = await recommend_module.recommend_products(USER_ID, use_case="power", budget=500, limit=5)
+
+    name, params = client.rpcs[0]
+    assert name == "search_affiliate_products_ranked"
+    # Keywords are OR-ed by the database instead of a malformed " | " filter string
+    assert params["p_match_any"] is True
+    assert params["p_terms"] == ["solar", "battery", "inverter", "charger", "power"]
+    assert (params["p_categories"], params["p_max_price"]) == (["power_electronics"], 500)
+    assert result["recommendations"][0]["title"] == "Solar panel"
+
+    client.rpcs.clear()
+    with patch.object(products_module, "get_supabase_client", return_value=client):
+        result = await products_module.search_products(USER_ID, "tire deflators", category="tools_maintenance",
+                                                       limit=1)
+    _, params = client.rpcs[0]
+    assert (params["p_terms"], params["p_match_any"]) == (["tire", "deflators"], False)
+    assert params["p_categories"] == ["tools_maintenance"]
+    assert result["internal_count"] == 1
@@ -0,0 +1,211 @@
+import importlib.util
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+# Other tool tests stub this module at collection time; these tests need the real one
+_utils = sys.modules.get("app.services.pam.tools.utils")
+if _utils is not None and not hasattr(_utils, "__file__"):
+    del sys.modules["app.services.pam.tools.utils"]
+
+from app.services.pam.tools.utils.query import ToolQuery, decode_cursor, encode_cursor
+
+BACKEND = Path(__file__).resolve().parents[2]
+USER_ID = "11111111-1111-1111-1111-111111111111"
+
+_spec = importlib.util.spec_from_file_location(
+    "check_unbounded_selects", BACKEND / "scripts" / "check_unbounded_selects.py")
+check_unbounded_selects = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(check_unbounded_selects)
+
+
+class FakeQuery:
+    """Records the PostgREST builder calls and returns fixed rows"""
+
+    def __init__(self, rows, count=None):
+        self.rows = rows
+        self.count = count
+        self.calls = []
+
+    def table(self, name):
+        self.calls.append(("table", name))
+        return self
+
+    def select(self, *args, **kwargs):
+        self.calls.append(("select", *args, kwargs))
+        return self
+
+    @property
+    def not_(self):
+        self.calls.append(("not",))
+        return self
+
+    def __getattr__(self, name):
+        def record(*args, **kwargs):
+            self.calls.append((name, *args))
+            return self
+        return record
+
+    def execute(self):
+        return MagicMock(data=self.rows, count=self.count)
+
+
+@pytest.mark.asyncio
+async def test_query_pushes_projection_predicates_order_and_limit():
+    client = FakeQuery([{"amount": 12}])
+    with patch("app.services.pam.tools.utils.query.get_supabase_client", return_value=client):
+        rows = await (
+            ToolQuery("expenses", user_id=USER_ID)
+            .select("amount", "category")
+            .where({"user_id": USER_ID, "category": ["fuel", "food"]})
+            .between("date", "2026-03-01", "2026-03-31")
+            .ilike("description", "%diesel%")
+            .is_null("deleted_at", null=False)
+            .order("date", desc=True)
+            .limit(50)
+            .fetch()
+        )
+
+    assert rows == [{"amount": 12}]
+    assert ("select", "amount, category", {}) in client.calls
+    assert ("in_", "category", ["fuel", "food"]) in client.calls
+    assert ("gte", "date", "2026-03-01") in client.calls
+    assert ("lte", "date", "2026-03-31") in client.calls
+    assert ("ilike", "description", "%diesel%") in client.calls
+    assert ("is_", "deleted_at", "null") in client.calls
+    assert client.calls[-2:] == [("order", "date"), ("limit", 50)]
+
+
+@pytest.mark.asyncio
+async def test_count_transfers_no_rows():
+    client = FakeQuery([], count=42)
+    with patch("app.services.pam.tools.utils.query.get_supabase_client", return_value=client):
+        assert await ToolQuery("expenses").eq("user_id", USER_ID).count(method="planned") == 42
+        with pytest.raises(ValueError):
+            await ToolQuery("expenses").count(method="guess")
+
+    assert ("select", "*", {"count": "planned", "head": True}) in client.calls
+
+
+@pytest.mark.asyncio
+async def test_keyset_page_returns_cursor_for_the_next_page():
+    rows = [{"id": f"id-{i}", "date": f"2026-03-0{i}"} for i in range(1, 4)]
+    client = FakeQuery(rows)
+    query = ToolQuery("expenses").eq("user_id", USER_ID).order("date", desc=True)
+
+    with patch("app.services.pam.tools.utils.query.get_supabase_client", return_value=client):
+        first = await query.page(2)
+        assert [r["id"] for r in first.rows] == ["id-1", "id-2"]
+        assert decode_cursor(first.next_cursor, 2) == ["2026-03-02", "id-2"]
+        assert ("limit", 3) in client.calls
+
+        client.calls.clear()
+        client.rows = rows[2:]
+        last = await query.page(2, cursor=first.next_cursor)
+
+    assert last.next_cursor is None
+    assert ("or_", 'date.lt."2026-03-02",and(date.eq."2026-03-02",id.lt."id-2")') in client.calls
+    assert query.filters == [("eq", "user_id", USER_ID)]
+    with pytest.raises(ValueError):
+        decode_cursor(encode_cursor(["a"]), 2)
+    with pytest.raises(ValueError):
+        await ToolQuery("expenses").page(10)
+
+
+def test_checker_flags_unbounded_reads_and_honours_suppression():
+    source = '''
+async def tool(user_id):
+    rows = await safe_db_select("expenses", {"user_id": user_id})
+    recent = await safe_db_select("expenses", {"user_id": user_id}, limit=20)
+    query = ToolQuery("budgets").eq("user_id", user_id)
+    budgets = await query.fetch()
+    ranged = await ToolQuery("expenses").gte("date", "2026-03-01").fetch()
+    raw = supabase.table("trips").select("*").eq("user_id", user_id).execute()
+    one = supabase.table("trips").select("*").eq("id", user_id).execute()
+    everything = await ToolQuery("posts").fetch()  # unbounded-ok: export
+'''
+    findings = check_unbounded_selects.Checker(Path("tool.py"), source).run()
+    assert [(f.line, f.kind, f.detail) for f in findings] == [
+        (3, "safe_db_select", "expenses"),
+        (6, "ToolQuery", "budgets"),
+        (8, "select", "trips"),
+    ]
+
+
+def test_pam_tools_have_no_unbounded_helper_reads():
+    findings = check_unbounded_selects.check_paths(check_unbounded_selects.DEFAULT_PATHS)
+    assert [str(f) for f in findings if f.kind != "select"] == []
+    # Raw supabase chains not yet moved onto ToolQuery; this number may only go down
+    assert len(findings) <= 34
+
+
+class MaybeSingleClient(FakeQuery):
+    """
+    supabase-py 2.x / postgrest 1.x: maybe_single().execute() returns None,
+    not a response with data=None, when no row matches
+    """
+
+    def __init__(self, rows_by_table):
+        super().__init__([])
+        self.rows_by_table = rows_by_table
+        self._table = None
+        self._single = False
+
+    def table(self, name):
+        self._table, self._single = name, False
+        return super().table(name)
+
+    def maybe_single(self):
+        self._single = True
+        return self
+
+    def execute(self):
+        rows = self.rows_by_table.get(self._table, [])
+        if self._single:
+            return MagicMock(data=rows[0]) if rows else None
+        return MagicMock(data=rows)
+
+
+TASK_ID = "22222222-2222-2222-2222-222222222222"
+
+
+@pytest.mark.asyncio
+async def test_first_launch_task_completion_inserts_when_no_row_matches():
+    import app.services.pam.tools.transition.launch_week_tools as launch_week
+
+    client = MaybeSingleClient({"launch_week_tasks": [{"id": TASK_ID, "task": "Final walkthrough"}]})
+    with patch.object(launch_week, "get_supabase_client", return_value=client), \
+            patch.object(launch_week, "safe_db_insert") as insert, \
+            patch.object(launch_week, "safe_db_update") as update:
+        result = await launch_week.complete_launch_task(USER_ID, TASK_ID)
+
+    assert result["success"] and "already_completed" not in result
+    insert.assert_awaited_once()
+    update.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_single_row_lookups_report_not_found():
+    import app.services.pam.tools.delete_calendar_event as delete_event
+    import app.services.pam.tools.fuel.fuel_crud as fuel_crud
+    import app.services.pam.tools.transition.launch_week_tools as launch_week
+    import app.services.pam.tools.transition.task_tools as task_tools
+    from app.services.pam.tools.exceptions import ResourceNotFoundError
+
+    client = MaybeSingleClient({})
+    with patch.object(launch_week, "get_supabase_client", return_value=client), \
+            patch.object(task_tools, "get_supabase_client", return_value=client), \
+            patch.object(fuel_crud, "get_supabase_client", return_value=client), \
+            patch("app.database.supabase_client.get_supabase_service", return_value=client):
+        for call in (
+            launch_week.complete_launch_task(USER_ID, TASK_ID),
+            launch_week.get_launch_week_status(USER_ID),
+            task_tools.complete_transition_task(USER_ID, task_id=TASK_ID),
+            task_tools.create_transition_task(USER_ID, title="Sell the couch", category="downsizing"),
+            fuel_crud.update_fuel_entry(USER_ID, entry_id=TASK_ID, volume=10),
+            delete_event.delete_calendar_event(USER_ID, TASK_ID),
+        ):
+            with pytest.raises(ResourceNotFoundError):
+                await call
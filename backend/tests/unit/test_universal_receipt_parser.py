@@ -5,14 +5,18 @@ Covers: type detection, field extraction, category mapping,
 fuel delegation, and edge cases.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from app.services.receipts.universal_parser import (
+    ReceiptText,
     _detect_type,
     _extract_total,
     _extract_date,
     _extract_vendor,
     _extract_description,
     parse_receipt_text_universal,
+    parse_receipts_batch,
     CATEGORY_MAP,
 )
 
@@ -274,3 +278,85 @@ TOTAL: $259.00
         conf = result["confidence"]
         for field in ["total", "date", "vendor", "description"]:
             assert field in conf, f"Missing confidence field: {field}"
+
+
+# -- Receipt Corpus Regression --
+
+# (ocr text, (receipt_type, total, date, vendor, description)); expectations
+# were produced by the per-extractor parser before the single-pass rewrite
+RECEIPT_CORPUS = [
+    (
+        "  COLES EXPRESS\n  Shell Coles Express Dubbo\nABN 12 345 678 901\nDate: 14/03/2025 07:42\n"
+        "Pump 4 Diesel\n68.20L @ $1.979/L\nTOTAL $134.97\nEFTPOS\n",
+        ("fuel", 134.97, None, "Shell Coles Express Dubbo",
+         "Shell Coles Express Dubbo; Date: 14/03/2025 07:42; 68.20L @ $1.979/L"),
+    ),
+    (
+        "Bean There Cafe\nMar 11, 2026\nTable 7\nFlat white  $5.50\nBig breakfast  $24.00\n"
+        "GST included $2.68\nTotal: $29.50\nThank you!",
+        ("food", 29.5, "2026-03-11", "Bean There Cafe", "Flat white  $5.50; Big breakfast  $24.00"),
+    ),
+    (
+        "TAX INVOICE\nOutback Auto Repair\nInvoice #40213\nIssue date: 2025-06-02\nCustomer details\n"
+        "J Smith\n+61 412345678\njsmith@example.com\nReplace front brake pads  1  220.00  220.00\n"
+        "Labour 1.5 hrs  1  165.00  165.00\nSubtotal 385.00\nAmount due: $423.50\nPayment details",
+        ("maintenance", 385.0, "2025-06-02", "Outback Auto Repair",
+         "Outback Auto Repair; Replace front brake pads  1  220.00  220.00; "
+         "Labour 1.5 hrs  1  165.00  165.00; Amount due: $423.50"),
+    ),
+    (
+        "Big4 Holiday Park\nPowered site booking\nArrive 3/9/25\nDepart 3/12/25\n3 nights x $52.00\n"
+        "Total $156.00\nCheck out 10am",
+        ("accommodation", 156.0, "2025-03-09", "Big4 Holiday Park",
+         "Big4 Holiday Park; Powered site booking; 3 nights x $52.00; Check out 10am"),
+    ),
+    (
+        "Woolworths Supermarket\nStore #1234\n02-11-2024 14:05\nMilk 2L    3.10\nBread wholemeal    4.50\n"
+        "Sunscreen SPF50    12.00\nSUBTOTAL 19.60\nBALANCE DUE $19.60",
+        ("shopping", 19.6, "2024-02-11", "Woolworths Supermarket",
+         "Woolworths Supermarket; Bread wholemeal    4.50; Sunscreen SPF50    12.00; BALANCE DUE $19.60"),
+    ),
+    (
+        "Account statement attachment\n01/07/2025 SHELL DUBBO 88.10\n02/07/2025 BEAN THERE CAFE 12.40\n"
+        "Closing balance $1,204.55",
+        ("fuel", 1.0, "2025-01-07", "01/07/2025 SHELL DUBBO 88.10",
+         "Account statement attachment; Closing balance $1,204.55"),
+    ),
+    (
+        "Café Zürich\n12 Rue de la Gare\nCroissant au beurre  €3.20\nGrand crème  €4.80\nTOTAL 8.00\n17.05.2025",
+        ("general", 8.0, None, "Café Zürich", "12 Rue de la Gare; Croissant au beurre  €3.20; Grand crème  €4.80"),
+    ),
+    (
+        "Ferienpark Müritz\nStellplatz mit Strom 2 Nächte\nGESAMT €64.00\n2025-08-14",
+        ("general", None, "2025-08-14", "Ferienpark Müritz", "Ferienpark Müritz; Stellplatz mit Strom 2 Nächte"),
+    ),
+    (
+        # Unicode case folding: the long s matches "SALE" case-insensitively
+        "Kiosk Ωmega\nWater  2.50\nſale 12.50",
+        ("general", 12.5, None, "Kiosk Ωmega", "Kiosk Ωmega; Water  2.50; ſale 12.50"),
+    ),
+    ("Joe's Place\n$18.00\n", ("general", 18.0, None, "Joe's Place", "Joe's Place")),
+]
+
+
+class TestReceiptCorpus:
+    @pytest.mark.parametrize("text,expected", RECEIPT_CORPUS)
+    def test_fields_match_previous_parser(self, text, expected):
+        result = parse_receipt_text_universal(text)
+        fields = ("receipt_type", "total", "date", "vendor", "description")
+        assert tuple(result[f] for f in fields) == expected
+
+    @pytest.mark.parametrize("text,expected", RECEIPT_CORPUS)
+    def test_extractors_accept_str_or_receipt_text(self, text, expected):
+        receipt = ReceiptText(text)
+        for extract in (_detect_type, _extract_total, _extract_date, _extract_vendor, _extract_description):
+            assert extract(receipt) == extract(text)
+
+    def test_batch_keeps_input_order(self):
+        texts = [text for text, _ in RECEIPT_CORPUS] * 5
+        expected = [parse_receipt_text_universal(text) for text in texts]
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            assert parse_receipts_batch(texts, executor=executor, chunk_size=4) == expected
+        # A batch of at most one chunk is parsed inline
+        assert parse_receipts_batch(texts[:4], chunk_size=4) == expected[:4]
@@ -0,0 +1,100 @@
+import pytest
+
+from app.services.usa.element_indexer import index_page
+from app.services.usa.models import ActionType, SitePattern, WaitCondition, WorkflowStep
+from app.services.usa.pattern_store import PatternStore
+
+
+class FakeElement:
+    def __init__(self, ordinal, tag, text, **attrs):
+        self.tag = tag
+        self.text = text
+        self.attrs = {"data-usa-ordinal": str(ordinal), **attrs}
+
+    async def is_visible(self):
+        return True
+
+    async def is_enabled(self):
+        return True
+
+    async def bounding_box(self):
+        return {"x": 0, "y": 0, "width": 120, "height": 30}
+
+    async def evaluate(self, script):
+        if script == "e => e.tagName":
+            return self.tag.upper()
+
+    async def text_content(self):
+        return self.text
+
+    async def get_attribute(self, name):
+        return self.attrs.get(name)
+
+
+class FakePage:
+    url = "https://www.campsites.example/search"
+    viewport_size = {"width": 1920, "height": 1080}
+
+    def __init__(self, elements):
+        self.elements = elements
+        self.fingerprint = "layout-1"
+        self.main_frame = object()
+        self.frames = [self.main_frame]
+        self.walks = 0
+        self.applied = None
+
+    async def query_selector_all(self, selector):
+        self.walks += 1
+        return self.elements
+
+    async def evaluate(self, script, arg=None):
+        if "data-usa-ordinal" in script:
+            return self.fingerprint
+        if "nodes[ordinal]" in script:
+            self.applied = arg[1]
+            return True
+
+
+def test_patterns_persist_and_stats_update_in_place(tmp_path):
+    db_path = str(tmp_path / "patterns.sqlite3")
+    writer = PatternStore(db_path=db_path)
+    step = WorkflowStep(name="submit", action=ActionType.CLICK, target=2, wait_for=WaitCondition.NAVIGATION)
+    pattern_id = writer.save_site_pattern("https://www.Example.com", "search", SitePattern(
+        domain="", page_type="", pattern_id="", form_mappings={"email": 1},
+        navigation_flows={"search": [step]}, success_rate=1.0, total_uses=1))
+
+    # A second process sees the pattern and both stats updates land
+    reader = PatternStore(db_path=db_path)
+    reader.update_pattern_stats(pattern_id, success=False, execution_time_ms=10)
+    writer.update_pattern_stats(pattern_id, success=True, execution_time_ms=10)
+
+    stored = reader.get_site_pattern("example.com", "search")
+    assert stored.navigation_flows["search"] == [step]
+    assert stored.form_mappings == {"email": 1}
+    assert stored.total_uses == 3
+    assert stored.success_rate == pytest.approx(0.9 * (0.9 * 1.0) + 0.1)
+    assert reader.delete_pattern("example.com", "search")
+    assert writer.list_patterns() == []
+
+
+@pytest.mark.asyncio
+async def test_unchanged_page_reuses_the_cached_element_index():
+    store = PatternStore(db_path=":memory:")
+    page = FakePage([
+        FakeElement(0, "a", "Help"),
+        FakeElement(1, "input", "", placeholder="Where to?", name="q"),
+        FakeElement(2, "button", "Search", id="go"),
+    ])
+
+    first = await index_page(page, store=store)
+    second = await index_page(page, store=store)
+
+    assert page.walks == 1
+    assert [(r.index, r.tag, r.text_signature, r.stable_selector) for r in second] == \
+        [(r.index, r.tag, r.text_signature, r.stable_selector) for r in first]
+    assert [r.stable_selector for r in first[:2]] == ['input[name="q"]', "#go"]
+    assert page.applied == [[1, 1], [2, 2], [0, 3]]
+
+    page.fingerprint = "layout-2"
+    await index_page(page, store=store)
+    assert page.walks == 2
@@ -0,0 +1,198 @@
+import asyncio
+
+import pytest
+
+from app.services.scraping.youtube_ingest import (
+    CacheCheckpoint,
+    SupabaseTripSink,
+    YouTubeImportPipeline,
+    build_trip_row,
+    content_hash,
+)
+
+OWNER = "00000000-0000-0000-0000-000000000001"
+
+
+class WorkerKilled(BaseException):
+    pass
+
+
+def _video_id(i):
+    return f"vid{i:08d}"
+
+
+class FakeScraper:
+    def __init__(self, count, fail_after=None):
+        self.videos = {
+            _video_id(i): {
+                "video_id": _video_id(i),
+                "title": f"Trip {i}",
+                "description": "Corrugations and river crossings",
+                "channel": "Overlanders",
+                "published_at": "2024-05-01T00:00:00Z",
+                "url": f"https://www.youtube.com/watch?v={_video_id(i)}",
+            }
+            for i in range(count)
+        }
+        self.fail_after = fail_after
+        self.metadata_calls = 0
+        self.extractions = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get_videos_metadata(self, video_ids):
+        self.metadata_calls += 1
+        return {video_id: dict(self.videos[video_id]) for video_id in video_ids if video_id in self.videos}
+
+    async def get_video_transcript(self, video_id):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        return None if video_id.endswith("7") else "we aired down and crossed the river"
+
+    async def extract_trip_info(self, transcript, video):
+        if self.fail_after is not None and self.extractions >= self.fail_after:
+            raise WorkerKilled  # the worker dies mid-import
+        self.extractions += 1
+        return {"title": video["title"], "trip_type": "overlanding", "metadata": {"youtube_url": "garbled"}}
+
+
+class FakeSink:
+    def __init__(self):
+        self.rows = {}
+        self.upsert_calls = 0
+
+    async def existing_hashes(self, owner_id, video_ids):
+        return {v: self.rows[(owner_id, v)]["content_hash"] for v in video_ids if (owner_id, v) in self.rows}
+
+    async def upsert(self, rows):
+        self.upsert_calls += 1
+        for row in rows:
+            self.rows[(row["user_id"], row["source_video_id"])] = row
+        return len(rows)
+
+
+class FakeCache:
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value, ttl=None):
+        self.values[key] = value
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+
+def test_trip_row_is_clamped_to_table_constraints_and_trusts_api_links():
+    video = FakeScraper(1).videos[_video_id(0)]
+    row = build_trip_row({"title": " Trip ", "trip_type": "overlanding", "status": "done",
+                          "metadata": {"youtube_url": "garbled"}}, video, OWNER, content_hash(video))
+
+    assert (row["title"], row["trip_type"], row["status"], row["privacy_level"]) == \
+        ("Trip", "road_trip", "completed", "public")
+    assert row["metadata"]["youtube_url"] == video["url"]
+    assert row["source_video_id"] == _video_id(0)
+
+
+@pytest.mark.asyncio
+async def test_reimport_skips_unchanged_videos_before_transcripts():
+    scraper, sink = FakeScraper(120), FakeSink()
+    pipeline = YouTubeImportPipeline(scraper, sink, chunk_size=100, concurrency=3)
+    video_ids = [_video_id(i) for i in range(120)] + [_video_id(0), "not a video id"]
+
+    first = await pipeline.run(video_ids, OWNER)
+
+    assert (first.received, first.invalid, first.duplicates) == (122, 1, 1)
+    assert first.no_transcript == 12 and first.upserted == 108
+    assert first.api_calls == 3 and first.round_trips == 4 and sink.upsert_calls == 2
+    assert scraper.max_in_flight <= 3
+
+    scraper.videos[_video_id(5)]["title"] = "Trip 5 (re-edited)"
+    second = await pipeline.run(video_ids, OWNER)
+
+    assert second.unchanged == 107 and second.upserted == 1
+    assert scraper.extractions == 109
+    assert sink.rows[(OWNER, _video_id(5))]["title"] == "Trip 5 (re-edited)"
+
+
+@pytest.mark.asyncio
+async def test_interrupted_import_resumes_from_its_checkpoint():
+    cache, sink = FakeCache(), FakeSink()
+    video_ids = [_video_id(i) for i in range(250)]
+
+    crashing = FakeScraper(250, fail_after=150)
+    with pytest.raises(WorkerKilled):
+        await YouTubeImportPipeline(crashing, sink, checkpoint=CacheCheckpoint(cache), chunk_size=100).run(video_ids, OWNER)
+    assert list(cache.values.values()) == [{"cursor": 100}]
+
+    scraper = FakeScraper(250)
+    resumed = await YouTubeImportPipeline(scraper, sink, checkpoint=CacheCheckpoint(cache), chunk_size=100).run(video_ids, OWNER)
+
+    assert resumed.resumed == 100 and resumed.chunks == 2
+    assert scraper.metadata_calls == 3
+    assert len(sink.rows) == 225 and cache.values == {}
+
+
+class FakeTripsTable:
+    """user_trips behind the PostgREST calls the scraper and SupabaseTripSink make"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.filters = []
+        self.payload = None
+
+    def upsert(self, payload, on_conflict, returning=None):
+        assert on_conflict == "user_id,source_video_id"
+        self.payload = payload
+        return self
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def limit(self, n):
+        return self
+
+    def execute(self):
+        for row in self.payload or []:
+            key = (row["user_id"], row["source_video_id"])
+            self.rows[key] = {**self.rows.get(key, {"id": f"trip-{len(self.rows) + 1}"}), **row}
+        data = [row for row in self.rows.values() if all(f(row) for f in self.filters)]
+        return type("Response", (), {"data": data})()
+
+
+@pytest.mark.asyncio
+async def test_single_video_import_shares_the_bulk_conflict_key_and_hash():
+    from app.services.scraping.youtube_travel_scraper import YouTubeTravelScraper
+
+    rows = {}
+    fake = FakeScraper(1)
+    scraper = YouTubeTravelScraper.__new__(YouTubeTravelScraper)
+    scraper.supabase = type("Supabase", (), {"table": lambda self, name: FakeTripsTable(rows)})()
+    scraper.get_videos_metadata = fake.get_videos_metadata
+    scraper.get_video_transcript = fake.get_video_transcript
+    scraper.extract_trip_info = fake.extract_trip_info
+    video_id = _video_id(0)
+
+    first = await scraper.process_video(video_id, OWNER)
+    again = await scraper.process_video(video_id, OWNER)
+
+    # Re-importing updates the same row instead of tripping the unique index
+    assert first["id"] == again["id"] == "trip-1" and len(rows) == 1
+    row = rows[(OWNER, video_id)]
+    assert row["content_hash"] == content_hash(fake.videos[video_id])
+    assert row["metadata"]["youtube_url"] == fake.videos[video_id]["url"]
+
+    bulk = await YouTubeImportPipeline(fake, SupabaseTripSink(scraper.supabase)).run([video_id], OWNER)
+    assert bulk.unchanged == 1 and fake.extractions == 2
@@ -0,0 +1,26 @@
+-- Bulk ingestion support for the campground scraper.
+-- Adds a natural key (coordinates rounded to 6 dp) for ON CONFLICT upserts and a
+-- content hash so unchanged sites are skipped instead of rewritten.
+
+ALTER TABLE public.camping_locations
+  ADD COLUMN IF NOT EXISTS natural_key TEXT,
+  ADD COLUMN IF NOT EXISTS content_hash TEXT,
+  ADD COLUMN IF NOT EXISTS source_url TEXT,
+  ADD COLUMN IF NOT EXISTS seasonal_info TEXT,
+  ADD COLUMN IF NOT EXISTS last_scraped TIMESTAMPTZ;
+
+-- Backfill natural keys for existing rows, keeping the newest row per location
+UPDATE public.camping_locations
+SET natural_key = to_char(latitude, 'FM990.000000') || ',' || to_char(longitude, 'FM9990.000000')
+WHERE natural_key IS NULL;
+
+DELETE FROM public.camping_locations c
+USING public.camping_locations newer
+WHERE c.natural_key = newer.natural_key
+  AND (c.updated_at, c.id) < (newer.updated_at, newer.id);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_camping_locations_natural_key
+  ON public.camping_locations (natural_key);
+
+COMMENT ON COLUMN public.camping_locations.natural_key IS 'lat,lng rounded to 6 decimals; upsert conflict target for the scraper';
+COMMENT ON COLUMN public.camping_locations.content_hash IS 'SHA-256 of scraped content columns; unchanged rows are skipped on refresh';
@@ -0,0 +1,68 @@
+-- Keyset pagination for the social feed.
+-- Feeds page on (created_at DESC, id DESC) instead of OFFSET, so every page is an
+-- index range scan regardless of depth and concurrent inserts cannot cause
+-- duplicates or skipped rows. Column names follow the live schema used by the
+-- backend tools (posts.user_id, user_follows.following_id,
+-- user_friendships.requester_id/addressee_id).
+
+-- Global feed: ORDER BY created_at DESC, id DESC LIMIT n
+CREATE INDEX IF NOT EXISTS idx_posts_feed_keyset
+  ON public.posts (created_at DESC, id DESC);
+
+-- Per-author feeds (friends/following): one index range per followed author
+CREATE INDEX IF NOT EXISTS idx_posts_user_feed_keyset
+  ON public.posts (user_id, created_at DESC, id DESC);
+
+-- Who does a user follow (feed reads) and who follows an author (fan-out on publish)
+CREATE INDEX IF NOT EXISTS idx_user_follows_follower_following
+  ON public.user_follows (follower_id, following_id);
+CREATE INDEX IF NOT EXISTS idx_user_follows_following_follower
+  ON public.user_follows (following_id, follower_id);
+
+CREATE OR REPLACE FUNCTION public.get_following_feed_keyset(
+  p_user_id UUID,
+  p_limit INTEGER DEFAULT 21,
+  p_cursor_created_at TIMESTAMPTZ DEFAULT NULL,
+  p_cursor_id UUID DEFAULT NULL
+)
+RETURNS SETOF public.posts
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+AS $$
+  SELECT p.*
+  FROM public.posts p
+  WHERE p.user_id IN (
+      SELECT f.following_id FROM public.user_follows f WHERE f.follower_id = p_user_id
+    )
+    AND (p_cursor_created_at IS NULL OR (p.created_at, p.id) < (p_cursor_created_at, p_cursor_id))
+  ORDER BY p.created_at DESC, p.id DESC
+  LIMIT LEAST(GREATEST(p_limit, 1), 1000);
+$$;
+
+CREATE OR REPLACE FUNCTION public.get_friends_feed_keyset(
+  p_user_id UUID,
+  p_limit INTEGER DEFAULT 21,
+  p_cursor_created_at TIMESTAMPTZ DEFAULT NULL,
+  p_cursor_id UUID DEFAULT NULL
+)
+RETURNS SETOF public.posts
+LANGUAGE sql
+STABLE
+SECURITY INVOKER
+AS $$
+  SELECT p.*
+  FROM public.posts p
+  WHERE p.user_id IN (
+      SELECT CASE WHEN fr.requester_id = p_user_id THEN fr.addressee_id ELSE fr.requester_id END
+      FROM public.user_friendships fr
+      WHERE fr.status = 'accepted'
+        AND (fr.requester_id = p_user_id OR fr.addressee_id = p_user_id)
+    )
+    AND (p_cursor_created_at IS NULL OR (p.created_at, p.id) < (p_cursor_created_at, p_cursor_id))
+  ORDER BY p.created_at DESC, p.id DESC
+  LIMIT LEAST(GREATEST(p_limit, 1), 1000);
+$$;
+
+GRANT EXECUTE ON FUNCTION public.get_following_feed_keyset(UUID, INTEGER, TIMESTAMPTZ, UUID) TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION public.get_friends_feed_keyset(UUID, INTEGER, TIMESTAMPTZ, UUID) TO authenticated, service_role;
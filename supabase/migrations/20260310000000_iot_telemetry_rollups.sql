@@ -0,0 +1,42 @@
+-- Downsampled IoT telemetry.
+-- The telemetry pipeline writes raw readings in batches and one row per
+-- device sensor per closed 1m / 1h bucket. Buckets can be flushed more than
+-- once (worker restart, several workers), so writers merge into the existing
+-- row: min/max via LEAST/GREATEST, sum and count added.
+
+CREATE TABLE IF NOT EXISTS public.pam_device_reading_rollups (
+  device_id TEXT NOT NULL,
+  sensor_type TEXT NOT NULL,
+  resolution TEXT NOT NULL CHECK (resolution IN ('1m', '1h')),
+  bucket_start TIMESTAMPTZ NOT NULL,
+  min_value DOUBLE PRECISION NOT NULL,
+  max_value DOUBLE PRECISION NOT NULL,
+  sample_sum DOUBLE PRECISION NOT NULL,
+  sample_count INTEGER NOT NULL,
+  avg_value DOUBLE PRECISION GENERATED ALWAYS AS (sample_sum / NULLIF(sample_count, 0)) STORED,
+  PRIMARY KEY (device_id, sensor_type, resolution, bucket_start)
+);
+
+CREATE INDEX IF NOT EXISTS idx_device_reading_rollups_range
+  ON public.pam_device_reading_rollups (device_id, resolution, bucket_start DESC);
+
+-- Raw readings are queried per device sensor over a time range
+DO $$
+BEGIN
+  IF to_regclass('public.pam_device_readings') IS NOT NULL THEN
+    CREATE INDEX IF NOT EXISTS idx_device_readings_device_sensor_time
+      ON public.pam_device_readings (device_id, sensor_type, "timestamp" DESC);
+  END IF;
+END $$;
+
+ALTER TABLE public.pam_device_reading_rollups ENABLE ROW LEVEL SECURITY;
+
+DO $$
+BEGIN
+  IF to_regclass('public.pam_iot_devices') IS NOT NULL THEN
+    DROP POLICY IF EXISTS "Users can read their own device rollups" ON public.pam_device_reading_rollups;
+    CREATE POLICY "Users can read their own device rollups"
+      ON public.pam_device_reading_rollups FOR SELECT
+      USING (device_id IN (SELECT device_id FROM public.pam_iot_devices WHERE user_id = auth.uid()::text));
+  END IF;
+END $$;
@@ -0,0 +1,193 @@
+-- Continuous PAM analytics rollups.
+-- The analytics pipeline batches raw pam_analytics_logs inserts and keeps
+-- per-bucket deltas (1m / 1h / 1d) for every event type, every tracked
+-- dimension (node, API, feature, intent, error type) and all events ('*').
+-- Each flush merges its deltas here: counts are added, latency sketches
+-- (log-bucket histograms, bucket -> count) are summed key-wise and unique
+-- user HyperLogLog registers are combined with an element-wise max, so any
+-- number of workers can flush the same bucket and dashboards read a bounded
+-- number of rows regardless of event volume.
+--
+-- Rollups start empty; history before this migration stays in
+-- pam_analytics_logs and is not backfilled.
+
+CREATE TABLE IF NOT EXISTS public.pam_analytics_rollups (
+  resolution TEXT NOT NULL CHECK (resolution IN ('1m', '1h', '1d')),
+  bucket_start TIMESTAMPTZ NOT NULL,
+  event_type TEXT NOT NULL,
+  dimension TEXT NOT NULL DEFAULT '',
+  event_count BIGINT NOT NULL DEFAULT 0,
+  success_count BIGINT NOT NULL DEFAULT 0,
+  error_count BIGINT NOT NULL DEFAULT 0,
+  latency_count BIGINT NOT NULL DEFAULT 0,
+  latency_sum BIGINT NOT NULL DEFAULT 0,
+  latency_sketch JSONB NOT NULL DEFAULT '{}',
+  users_hll SMALLINT[],
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (resolution, bucket_start, event_type, dimension)
+);
+
+CREATE INDEX IF NOT EXISTS idx_pam_analytics_rollups_type_range
+  ON public.pam_analytics_rollups (resolution, event_type, bucket_start DESC);
+
+CREATE OR REPLACE FUNCTION public.analytics_sketch_merge(a JSONB, b JSONB)
+RETURNS JSONB
+LANGUAGE sql
+IMMUTABLE
+AS $$
+  SELECT COALESCE(jsonb_object_agg(key, total), '{}'::jsonb)
+  FROM (
+    SELECT key, SUM(value::BIGINT) AS total
+    FROM (
+      SELECT * FROM jsonb_each_text(COALESCE(a, '{}'::jsonb))
+      UNION ALL
+      SELECT * FROM jsonb_each_text(COALESCE(b, '{}'::jsonb))
+    ) entries
+    GROUP BY key
+  ) merged;
+$$;
+
+CREATE OR REPLACE FUNCTION public.analytics_hll_merge(a SMALLINT[], b SMALLINT[])
+RETURNS SMALLINT[]
+LANGUAGE sql
+IMMUTABLE
+AS $$
+  SELECT CASE
+    WHEN a IS NULL THEN b
+    WHEN b IS NULL THEN a
+    ELSE ARRAY(SELECT GREATEST(x, y) FROM unnest(a, b) AS registers(x, y))
+  END;
+$$;
+
+-- p_rows: JSON array of rollup deltas, unique per key within one call
+CREATE OR REPLACE FUNCTION public.merge_pam_analytics_rollups(p_rows JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  merged INTEGER;
+BEGIN
+  INSERT INTO public.pam_analytics_rollups AS r (
+    resolution, bucket_start, event_type, dimension,
+    event_count, success_count, error_count,
+    latency_count, latency_sum, latency_sketch, users_hll
+  )
+  SELECT
+    d.resolution, d.bucket_start, d.event_type, COALESCE(d.dimension, ''),
+    d.event_count, d.success_count, d.error_count,
+    d.latency_count, d.latency_sum, COALESCE(d.latency_sketch, '{}'::jsonb), d.users_hll
+  FROM jsonb_to_recordset(p_rows) AS d(
+    resolution TEXT, bucket_start TIMESTAMPTZ, event_type TEXT, dimension TEXT,
+    event_count BIGINT, success_count BIGINT, error_count BIGINT,
+    latency_count BIGINT, latency_sum BIGINT, latency_sketch JSONB, users_hll SMALLINT[]
+  )
+  ON CONFLICT (resolution, bucket_start, event_type, dimension) DO UPDATE SET
+    event_count = r.event_count + EXCLUDED.event_count,
+    success_count = r.success_count + EXCLUDED.success_count,
+    error_count = r.error_count + EXCLUDED.error_count,
+    latency_count = r.latency_count + EXCLUDED.latency_count,
+    latency_sum = r.latency_sum + EXCLUDED.latency_sum,
+    latency_sketch = public.analytics_sketch_merge(r.latency_sketch, EXCLUDED.latency_sketch),
+    users_hll = public.analytics_hll_merge(r.users_hll, EXCLUDED.users_hll),
+    updated_at = NOW();
+
+  GET DIAGNOSTICS merged = ROW_COUNT;
+  RETURN merged;
+END;
+$$;
+
+-- Dashboard reads: one merged row per (event_type, dimension) over a window,
+-- so the response size depends on cardinality, not on window length or volume.
+-- NULL p_start / p_event_types mean unbounded / all event types.
+CREATE OR REPLACE FUNCTION public.pam_analytics_rollup_summary(
+  p_resolution TEXT,
+  p_start TIMESTAMPTZ,
+  p_end TIMESTAMPTZ,
+  p_event_types TEXT[] DEFAULT NULL,
+  p_include_dimensions BOOLEAN DEFAULT TRUE
+)
+RETURNS TABLE (
+  event_type TEXT,
+  dimension TEXT,
+  event_count BIGINT,
+  success_count BIGINT,
+  error_count BIGINT,
+  latency_count BIGINT,
+  latency_sum BIGINT,
+  latency_sketch JSONB,
+  users_hll SMALLINT[]
+)
+LANGUAGE sql
+STABLE
+AS $$
+  -- Sketches and registers are merged set-wise (one GROUP BY over all
+  -- entries) rather than folded row by row, which would rebuild the jsonb
+  -- for every bucket.
+  WITH selected AS (
+    SELECT *
+    FROM public.pam_analytics_rollups r
+    WHERE r.resolution = p_resolution
+      AND (p_start IS NULL OR r.bucket_start >= p_start)
+      AND r.bucket_start <= p_end
+      AND (p_event_types IS NULL OR r.event_type = ANY (p_event_types))
+      AND (p_include_dimensions OR r.dimension = '')
+  ),
+  counts AS (
+    SELECT s.event_type, s.dimension,
+      SUM(s.event_count)::BIGINT AS event_count,
+      SUM(s.success_count)::BIGINT AS success_count,
+      SUM(s.error_count)::BIGINT AS error_count,
+      SUM(s.latency_count)::BIGINT AS latency_count,
+      SUM(s.latency_sum)::BIGINT AS latency_sum
+    FROM selected s
+    GROUP BY s.event_type, s.dimension
+  ),
+  sketches AS (
+    SELECT b.event_type, b.dimension, jsonb_object_agg(b.bucket, b.total) AS latency_sketch
+    FROM (
+      SELECT s.event_type, s.dimension, e.key AS bucket, SUM(e.value::BIGINT) AS total
+      FROM selected s, jsonb_each_text(s.latency_sketch) e
+      GROUP BY s.event_type, s.dimension, e.key
+    ) b
+    GROUP BY b.event_type, b.dimension
+  ),
+  registers AS (
+    SELECT g.event_type, g.dimension, array_agg(g.rank ORDER BY g.idx) AS users_hll
+    FROM (
+      SELECT s.event_type, s.dimension, u.idx, MAX(u.rank) AS rank
+      FROM selected s, unnest(s.users_hll) WITH ORDINALITY AS u(rank, idx)
+      WHERE s.users_hll IS NOT NULL
+      GROUP BY s.event_type, s.dimension, u.idx
+    ) g
+    GROUP BY g.event_type, g.dimension
+  )
+  SELECT c.event_type, c.dimension, c.event_count, c.success_count, c.error_count,
+    c.latency_count, c.latency_sum, COALESCE(k.latency_sketch, '{}'::jsonb), h.users_hll
+  FROM counts c
+  LEFT JOIN sketches k ON k.event_type = c.event_type AND k.dimension = c.dimension
+  LEFT JOIN registers h ON h.event_type = c.event_type AND h.dimension = c.dimension;
+$$;
+
+-- Event counts by hour of day (UTC) from the hourly all-events rollups
+CREATE OR REPLACE FUNCTION public.pam_analytics_hourly_counts(p_start TIMESTAMPTZ, p_end TIMESTAMPTZ)
+RETURNS TABLE (hour INTEGER, event_count BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT EXTRACT(HOUR FROM r.bucket_start AT TIME ZONE 'UTC')::INTEGER, SUM(r.event_count)::BIGINT
+  FROM public.pam_analytics_rollups r
+  WHERE r.resolution = '1h'
+    AND r.event_type = '*'
+    AND r.dimension = ''
+    AND r.bucket_start >= p_start
+    AND r.bucket_start <= p_end
+  GROUP BY 1;
+$$;
+
+REVOKE ALL ON FUNCTION public.merge_pam_analytics_rollups(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.merge_pam_analytics_rollups(JSONB) TO service_role;
+
+ALTER TABLE public.pam_analytics_rollups ENABLE ROW LEVEL SECURITY;
+-- Aggregates only; read and written by the backend with the service role
@@ -0,0 +1,181 @@
+-- Incrementally maintained budget aggregates.
+-- Budget forecasting and savings tools used to fetch every expense (or
+-- savings event) a user ever recorded and sum them in Python. These tables
+-- hold one row per (user, category, day) with a running total and row count,
+-- kept current by row-level triggers on the source tables: an INSERT adds
+-- the new row, a DELETE subtracts the old one and an UPDATE does both, so a
+-- changed amount, category or date moves between buckets. Buckets whose
+-- count drops to zero are removed.
+--
+-- Reads over any date range touch at most days x categories rows, however
+-- many expenses the user has.
+
+CREATE TABLE IF NOT EXISTS public.expense_daily_totals (
+  user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+  category TEXT NOT NULL,
+  day DATE NOT NULL,
+  total NUMERIC(14,2) NOT NULL DEFAULT 0,
+  expense_count INTEGER NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (user_id, day, category)
+);
+
+CREATE INDEX IF NOT EXISTS idx_expense_daily_totals_user_category_day
+  ON public.expense_daily_totals (user_id, category, day);
+
+CREATE TABLE IF NOT EXISTS public.savings_daily_totals (
+  user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+  category TEXT NOT NULL,
+  day DATE NOT NULL,
+  total_savings NUMERIC(14,2) NOT NULL DEFAULT 0,
+  event_count INTEGER NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  PRIMARY KEY (user_id, day, category)
+);
+
+CREATE OR REPLACE FUNCTION public.maintain_expense_daily_totals()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP = 'UPDATE'
+     AND NEW.user_id = OLD.user_id AND NEW.category = OLD.category
+     AND NEW.date = OLD.date AND NEW.amount = OLD.amount THEN
+    RETURN NULL;
+  END IF;
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    UPDATE public.expense_daily_totals SET
+      total = total - OLD.amount,
+      expense_count = expense_count - 1,
+      updated_at = NOW()
+    WHERE user_id = OLD.user_id AND day = OLD.date AND category = OLD.category;
+    DELETE FROM public.expense_daily_totals
+    WHERE user_id = OLD.user_id AND day = OLD.date AND category = OLD.category AND expense_count <= 0;
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    INSERT INTO public.expense_daily_totals AS t (user_id, category, day, total, expense_count)
+    VALUES (NEW.user_id, NEW.category, NEW.date, NEW.amount, 1)
+    ON CONFLICT (user_id, day, category) DO UPDATE SET
+      total = t.total + EXCLUDED.total,
+      expense_count = t.expense_count + 1,
+      updated_at = NOW();
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.maintain_savings_daily_totals()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP = 'UPDATE'
+     AND NEW.user_id = OLD.user_id AND NEW.category = OLD.category
+     AND NEW.saved_date = OLD.saved_date AND NEW.actual_savings = OLD.actual_savings THEN
+    RETURN NULL;
+  END IF;
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    UPDATE public.savings_daily_totals SET
+      total_savings = total_savings - OLD.actual_savings,
+      event_count = event_count - 1,
+      updated_at = NOW()
+    WHERE user_id = OLD.user_id AND day = OLD.saved_date AND category = OLD.category;
+    DELETE FROM public.savings_daily_totals
+    WHERE user_id = OLD.user_id AND day = OLD.saved_date AND category = OLD.category AND event_count <= 0;
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    INSERT INTO public.savings_daily_totals AS t (user_id, category, day, total_savings, event_count)
+    VALUES (NEW.user_id, NEW.category, NEW.saved_date, NEW.actual_savings, 1)
+    ON CONFLICT (user_id, day, category) DO UPDATE SET
+      total_savings = t.total_savings + EXCLUDED.total_savings,
+      event_count = t.event_count + 1,
+      updated_at = NOW();
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+-- Block writes while the triggers are installed and the history is backfilled,
+-- so no row is counted twice or missed.
+LOCK TABLE public.expenses IN SHARE ROW EXCLUSIVE MODE;
+LOCK TABLE public.pam_savings_events IN SHARE ROW EXCLUSIVE MODE;
+
+DROP TRIGGER IF EXISTS trigger_expense_daily_totals ON public.expenses;
+CREATE TRIGGER trigger_expense_daily_totals
+  AFTER INSERT OR UPDATE OR DELETE ON public.expenses
+  FOR EACH ROW
+  EXECUTE FUNCTION public.maintain_expense_daily_totals();
+
+DROP TRIGGER IF EXISTS trigger_savings_daily_totals ON public.pam_savings_events;
+CREATE TRIGGER trigger_savings_daily_totals
+  AFTER INSERT OR UPDATE OR DELETE ON public.pam_savings_events
+  FOR EACH ROW
+  EXECUTE FUNCTION public.maintain_savings_daily_totals();
+
+TRUNCATE public.expense_daily_totals;
+INSERT INTO public.expense_daily_totals (user_id, category, day, total, expense_count)
+SELECT user_id, category, date, SUM(amount), COUNT(*)
+FROM public.expenses
+GROUP BY user_id, category, date;
+
+TRUNCATE public.savings_daily_totals;
+INSERT INTO public.savings_daily_totals (user_id, category, day, total_savings, event_count)
+SELECT user_id, category, saved_date, SUM(actual_savings), COUNT(*)
+FROM public.pam_savings_events
+GROUP BY user_id, category, saved_date;
+
+-- Per-category totals over [p_start, p_end] (inclusive); NULL p_category means all
+CREATE OR REPLACE FUNCTION public.expense_category_totals(
+  p_user_id UUID,
+  p_start DATE,
+  p_end DATE,
+  p_category TEXT DEFAULT NULL
+)
+RETURNS TABLE (category TEXT, total NUMERIC, expense_count BIGINT, active_days BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT t.category, SUM(t.total), SUM(t.expense_count)::BIGINT, COUNT(*)::BIGINT
+  FROM public.expense_daily_totals t
+  WHERE t.user_id = p_user_id
+    AND t.day >= p_start
+    AND t.day <= p_end
+    AND (p_category IS NULL OR t.category = p_category)
+  GROUP BY t.category;
+$$;
+
+CREATE OR REPLACE FUNCTION public.savings_category_totals(
+  p_user_id UUID,
+  p_start DATE,
+  p_end DATE,
+  p_category TEXT DEFAULT NULL
+)
+RETURNS TABLE (category TEXT, total_savings NUMERIC, event_count BIGINT)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT t.category, SUM(t.total_savings), SUM(t.event_count)::BIGINT
+  FROM public.savings_daily_totals t
+  WHERE t.user_id = p_user_id
+    AND t.day >= p_start
+    AND t.day <= p_end
+    AND (p_category IS NULL OR t.category = p_category)
+  GROUP BY t.category;
+$$;
+
+ALTER TABLE public.expense_daily_totals ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.savings_daily_totals ENABLE ROW LEVEL SECURITY;
+
+-- Written only by the triggers; users may read their own buckets
+CREATE POLICY "Users can view their own expense totals" ON public.expense_daily_totals
+  FOR SELECT USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can view their own savings totals" ON public.savings_daily_totals
+  FOR SELECT USING (auth.uid() = user_id);
+
+GRANT SELECT ON public.expense_daily_totals TO authenticated;
+GRANT SELECT ON public.savings_daily_totals TO authenticated;
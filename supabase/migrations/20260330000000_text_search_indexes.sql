@@ -0,0 +1,322 @@
+-- Full-text search for medical records, recipes and affiliate products.
+-- The PAM search tools used chains of `ilike '%term%'` OR filters, which
+-- Postgres can only answer with a sequential scan, and recipe search then
+-- fetched three times the requested rows to drop allergens and dietary
+-- misses in Python.
+--
+-- Each table now carries a weighted tsvector (title A, summary/description
+-- B, body text C) as a stored generated column, so it is rewritten with the
+-- row and never drifts. Recipe and product vectors are GIN-indexed; medical
+-- records are only ever searched per user, so their search scans the
+-- user's rows by user_id and tests the stored vectors. Recipes also store the
+-- normalized ingredient names as a GIN-indexed TEXT[] so allergen,
+-- ingredient and dietary filtering happen in the query.
+--
+-- The *_ranked RPCs take pre-split search terms, match them as prefixes
+-- (`term:*`), rank with ts_rank_cd normalized by document length and
+-- saturated with rank / (rank + 1) -- a BM25-style score without corpus
+-- statistics -- and build ts_headline highlights for the returned rows only.
+
+-- Prefix tsquery from search terms: every lexeme the english config keeps,
+-- as `lexeme:*`, joined with AND (or OR when p_match_any). NULL when no
+-- term survives stemming and stop-word removal.
+CREATE OR REPLACE FUNCTION public.prefix_tsquery(p_terms TEXT[], p_match_any BOOLEAN DEFAULT false)
+RETURNS tsquery
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+AS $$
+  SELECT to_tsquery('simple', string_agg(quote_literal(lexeme) || ':*',
+                                         CASE WHEN p_match_any THEN ' | ' ELSE ' & ' END))
+  FROM unnest(tsvector_to_array(to_tsvector('english', array_to_string(p_terms, ' ')))) AS lexeme;
+$$;
+
+-- Lower-cased ingredient names, the words in them and a naive singular of
+-- each ("Salted Peanuts" -> salted peanuts, salted peanut, salted, peanuts,
+-- peanut). Ingredients are [{"name": ...}] objects or plain strings.
+-- app/services/text_search/ranked_search.py:ingredient_terms mirrors this
+-- for the values searched against it.
+CREATE OR REPLACE FUNCTION public.ingredient_terms(p_ingredients JSONB)
+RETURNS TEXT[]
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+AS $$
+  SELECT COALESCE(array_agg(DISTINCT variant) FILTER (WHERE variant <> ''), '{}')
+  FROM (
+    SELECT regexp_replace(lower(trim(
+             CASE WHEN jsonb_typeof(item) = 'string' THEN item #>> '{}' ELSE item ->> 'name' END
+           )), '\s+', ' ', 'g') AS name
+    FROM jsonb_array_elements(
+      CASE WHEN jsonb_typeof(p_ingredients) = 'array' THEN p_ingredients ELSE '[]'::jsonb END
+    ) AS item
+  ) names
+  CROSS JOIN LATERAL unnest(array_append(regexp_split_to_array(names.name, '[^a-z0-9]+'), names.name)) AS term
+  CROSS JOIN LATERAL unnest(ARRAY[
+    term,
+    CASE WHEN term ~ '[a-z]{2}[^s]s$' THEN left(term, -1) ELSE term END
+  ]) AS variant
+  WHERE names.name IS NOT NULL;
+$$;
+
+-- Whether any stored ingredient term contains any of p_needles as a
+-- substring, which is how ingredient filters have always matched. Allergen
+-- exclusion needs it rather than exact array overlap: a "milk" allergy must
+-- drop "buttermilk", "nut" must drop "walnuts" and "peanut butter", "fish"
+-- must drop "catfish". Inclusion needs it for plurals: "tomato" must find
+-- "cherry tomatoes". It only runs on rows the other filters already
+-- selected, so it needs no index of its own.
+CREATE OR REPLACE FUNCTION public.ingredient_terms_contain(p_terms TEXT[], p_needles TEXT[])
+RETURNS BOOLEAN
+LANGUAGE sql
+IMMUTABLE
+PARALLEL SAFE
+AS $$
+  SELECT EXISTS (
+    SELECT 1
+    FROM unnest(p_terms) AS term, unnest(p_needles) AS needle
+    WHERE needle <> '' AND strpos(term, needle) > 0
+  );
+$$;
+
+-- 1. Search columns and indexes
+
+ALTER TABLE public.medical_records
+  ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(summary, '')), 'B') ||
+    -- tsvectors are capped at 1 MB; long scans are indexed by their first 100k characters
+    setweight(to_tsvector('english', left(coalesce(ocr_text, ''), 100000)), 'C')
+  ) STORED;
+-- No GIN index: medical searches are always per user, and scanning one
+-- user's stored vectors (idx on user_id) beats intersecting a table-wide
+-- posting list, which for common prefixes covers most of the table.
+
+ALTER TABLE public.recipes
+  ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(cuisine, '')), 'C')
+  ) STORED,
+  ADD COLUMN IF NOT EXISTS ingredient_terms TEXT[] GENERATED ALWAYS AS (
+    public.ingredient_terms(ingredients)
+  ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_recipes_search_vector
+  ON public.recipes USING GIN (search_vector);
+
+ALTER TABLE public.affiliate_products
+  ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(short_description, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'C')
+  ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_affiliate_products_search_vector
+  ON public.affiliate_products USING GIN (search_vector);
+
+-- 2. Ranked search RPCs
+
+-- Upper bound on the matches a recipe or product search ranks. A term that
+-- appears in most of the table would otherwise rank every matching row;
+-- past this many matches the best of the first N are returned.
+CREATE OR REPLACE FUNCTION public.search_candidate_limit()
+RETURNS INTEGER
+LANGUAGE sql
+IMMUTABLE
+AS $$ SELECT 2000 $$;
+
+-- Security invoker, so RLS on the underlying tables still applies to
+-- callers using a user's JWT. The text-free branches exist so a missing
+-- query never turns into `OR query IS NULL`, which would hide the index.
+
+CREATE OR REPLACE FUNCTION public.search_medical_records_ranked(
+  p_user_id UUID,
+  p_terms TEXT[],
+  p_limit INTEGER DEFAULT 10
+)
+RETURNS TABLE (
+  id UUID,
+  type TEXT,
+  title TEXT,
+  summary TEXT,
+  tags TEXT[],
+  test_date TIMESTAMPTZ,
+  has_structured_data BOOLEAN,
+  rank REAL,
+  highlight TEXT
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+#variable_conflict use_column
+DECLARE
+  v_query tsquery := public.prefix_tsquery(p_terms, true);
+BEGIN
+  IF v_query IS NULL THEN
+    RETURN;
+  END IF;
+  RETURN QUERY
+  WITH mine AS MATERIALIZED (
+    SELECT m.id, m.test_date, m.search_vector
+    FROM public.medical_records m
+    WHERE m.user_id = p_user_id
+  ), ranked AS (
+    SELECT v.id, ts_rank_cd('{0.1, 0.2, 0.4, 1.0}', v.search_vector, v_query, 1 | 32) AS rank
+    FROM mine v
+    WHERE v.search_vector @@ v_query
+    ORDER BY rank DESC, v.test_date DESC NULLS LAST
+    LIMIT p_limit
+  )
+  SELECT m.id, m.type, m.title, m.summary, m.tags, m.test_date, m.content_json IS NOT NULL, r.rank,
+         ts_headline('english', left(coalesce(nullif(m.ocr_text, ''), m.summary, m.title), 100000), v_query,
+                     'StartSel=**, StopSel=**, MaxWords=60, MinWords=20, MaxFragments=2, FragmentDelimiter=" ... "')
+  FROM ranked r
+  JOIN public.medical_records m ON m.id = r.id
+  ORDER BY r.rank DESC, m.test_date DESC NULLS LAST;
+END;
+$$;
+
+-- Recipes visible to p_user_id (own, shared with them, optionally public)
+-- that match every filter. Rows with an ingredient term containing any of
+-- p_exclude_ingredients (allergies) are dropped, p_required_tags (dietary
+-- restrictions) must all be present, and one ingredient term must contain
+-- one of p_any_ingredients.
+CREATE OR REPLACE FUNCTION public.search_recipes_ranked(
+  p_user_id UUID,
+  p_terms TEXT[] DEFAULT NULL,
+  p_meal_type TEXT DEFAULT NULL,
+  p_required_tags TEXT[] DEFAULT NULL,
+  p_exclude_ingredients TEXT[] DEFAULT NULL,
+  p_any_ingredients TEXT[] DEFAULT NULL,
+  p_max_prep_time INTEGER DEFAULT NULL,
+  p_include_public BOOLEAN DEFAULT true,
+  p_limit INTEGER DEFAULT 10
+)
+RETURNS TABLE (recipe JSONB, rank REAL)
+LANGUAGE plpgsql
+STABLE
+AS $$
+#variable_conflict use_column
+DECLARE
+  v_query tsquery := public.prefix_tsquery(p_terms);
+BEGIN
+  IF v_query IS NULL AND coalesce(cardinality(p_terms), 0) > 0 THEN
+    -- Only stop words: nothing can match
+    RETURN;
+  END IF;
+
+  IF v_query IS NULL THEN
+    RETURN QUERY
+    SELECT to_jsonb(r) - 'search_vector' - 'ingredient_terms', 0::REAL
+    FROM public.recipes r
+    WHERE (r.user_id = p_user_id OR r.shared_with @> ARRAY[p_user_id] OR (p_include_public AND r.is_public))
+      AND (p_meal_type IS NULL OR r.meal_type @> ARRAY[p_meal_type])
+      AND (p_required_tags IS NULL OR r.dietary_tags @> p_required_tags)
+      AND (p_exclude_ingredients IS NULL OR NOT public.ingredient_terms_contain(r.ingredient_terms, p_exclude_ingredients))
+      AND (p_any_ingredients IS NULL OR public.ingredient_terms_contain(r.ingredient_terms, p_any_ingredients))
+      AND (p_max_prep_time IS NULL OR r.prep_time_minutes <= p_max_prep_time)
+    ORDER BY r.created_at DESC
+    LIMIT p_limit;
+  ELSE
+    RETURN QUERY
+    WITH candidates AS (
+      SELECT r.id, r.created_at, r.search_vector
+      FROM public.recipes r
+      WHERE r.search_vector @@ v_query
+        AND (r.user_id = p_user_id OR r.shared_with @> ARRAY[p_user_id] OR (p_include_public AND r.is_public))
+        AND (p_meal_type IS NULL OR r.meal_type @> ARRAY[p_meal_type])
+        AND (p_required_tags IS NULL OR r.dietary_tags @> p_required_tags)
+        AND (p_exclude_ingredients IS NULL OR NOT public.ingredient_terms_contain(r.ingredient_terms, p_exclude_ingredients))
+        AND (p_any_ingredients IS NULL OR public.ingredient_terms_contain(r.ingredient_terms, p_any_ingredients))
+        AND (p_max_prep_time IS NULL OR r.prep_time_minutes <= p_max_prep_time)
+      LIMIT public.search_candidate_limit()
+    ), ranked AS (
+      SELECT c.id, c.created_at, ts_rank_cd('{0.1, 0.2, 0.4, 1.0}', c.search_vector, v_query, 1 | 32) AS rank
+      FROM candidates c
+      ORDER BY rank DESC, c.created_at DESC
+      LIMIT p_limit
+    )
+    SELECT to_jsonb(r) - 'search_vector' - 'ingredient_terms', k.rank
+    FROM ranked k
+    JOIN public.recipes r ON r.id = k.id
+    ORDER BY k.rank DESC, k.created_at DESC;
+  END IF;
+END;
+$$;
+
+-- Active products matching all terms (any term when p_match_any), best
+-- match first and cheapest first among equals. Without terms the cheapest
+-- products in the filters come back.
+CREATE OR REPLACE FUNCTION public.search_affiliate_products_ranked(
+  p_terms TEXT[] DEFAULT NULL,
+  p_match_any BOOLEAN DEFAULT false,
+  p_categories TEXT[] DEFAULT NULL,
+  p_min_price NUMERIC DEFAULT NULL,
+  p_max_price NUMERIC DEFAULT NULL,
+  p_limit INTEGER DEFAULT 20
+)
+RETURNS TABLE (
+  id UUID,
+  title TEXT,
+  description TEXT,
+  price NUMERIC,
+  category TEXT,
+  affiliate_url TEXT,
+  image_url TEXT,
+  rank REAL,
+  highlight TEXT
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+#variable_conflict use_column
+DECLARE
+  v_query tsquery := public.prefix_tsquery(p_terms, p_match_any);
+BEGIN
+  IF v_query IS NULL AND coalesce(cardinality(p_terms), 0) > 0 THEN
+    RETURN;
+  END IF;
+
+  IF v_query IS NULL THEN
+    RETURN QUERY
+    SELECT p.id, p.title, p.description, p.price, p.category::TEXT, p.affiliate_url, p.image_url,
+           0::REAL, NULL::TEXT
+    FROM public.affiliate_products p
+    WHERE p.is_active
+      AND (p_categories IS NULL OR p.category::TEXT = ANY (p_categories))
+      AND (p_min_price IS NULL OR p.price >= p_min_price)
+      AND (p_max_price IS NULL OR p.price <= p_max_price)
+    ORDER BY p.price ASC
+    LIMIT p_limit;
+  ELSE
+    RETURN QUERY
+    WITH candidates AS (
+      SELECT p.id, p.title, p.description, p.price, p.category::TEXT AS category, p.affiliate_url,
+             p.image_url, p.search_vector
+      FROM public.affiliate_products p
+      WHERE p.search_vector @@ v_query
+        AND p.is_active
+        AND (p_categories IS NULL OR p.category::TEXT = ANY (p_categories))
+        AND (p_min_price IS NULL OR p.price >= p_min_price)
+        AND (p_max_price IS NULL OR p.price <= p_max_price)
+      LIMIT public.search_candidate_limit()
+    ), ranked AS (
+      SELECT c.id, c.title, c.description, c.price, c.category, c.affiliate_url, c.image_url,
+             ts_rank_cd('{0.1, 0.2, 0.4, 1.0}', c.search_vector, v_query, 1 | 32) AS rank
+      FROM candidates c
+      ORDER BY rank DESC, c.price ASC
+      LIMIT p_limit
+    )
+    SELECT r.id, r.title, r.description, r.price, r.category, r.affiliate_url, r.image_url, r.rank,
+           ts_headline('english', coalesce(r.description, r.title), v_query,
+                       'StartSel=**, StopSel=**, MaxWords=35, MinWords=15')
+    FROM ranked r
+    ORDER BY r.rank DESC, r.price ASC;
+  END IF;
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.search_medical_records_ranked(UUID, TEXT[], INTEGER) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.search_recipes_ranked(UUID, TEXT[], TEXT, TEXT[], TEXT[], TEXT[], INTEGER, BOOLEAN, INTEGER) TO authenticated;
+GRANT EXECUTE ON FUNCTION public.search_affiliate_products_ranked(TEXT[], BOOLEAN, TEXT[], NUMERIC, NUMERIC, INTEGER) TO authenticated, anon;
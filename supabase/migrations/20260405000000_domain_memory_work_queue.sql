@@ -0,0 +1,153 @@
+-- Domain memory: one-round-trip context loading and a leased work queue.
+-- A worker used to start a task with six sequential reads (task, definition,
+-- state, constraints, tests, progress) and the scheduler found work by
+-- polling every pending row with select("*"), so two schedulers could pick
+-- the same task.
+--
+-- domain_memory_load_context returns every artifact in one JSONB document.
+-- Callers pass the updated_at of the definition, constraints and tests they
+-- already hold; those artifacts come back only when they changed, otherwise
+-- just their updated_at is returned so the caller can keep its copy.
+--
+-- domain_memory_claim_tasks hands out runnable tasks with
+-- FOR UPDATE SKIP LOCKED and records a lease (claimed_by, claimed_until), so
+-- concurrent workers never receive the same task and a crashed worker's
+-- tasks become claimable again once the lease expires. New or released
+-- runnable tasks are announced on the 'domain_memory_tasks' channel so idle
+-- workers can LISTEN instead of polling.
+
+ALTER TABLE public.domain_memory_tasks
+  ADD COLUMN IF NOT EXISTS claimed_by TEXT,
+  ADD COLUMN IF NOT EXISTS claimed_until TIMESTAMPTZ;
+
+-- Claim order; small because finished tasks drop out
+CREATE INDEX IF NOT EXISTS idx_domain_memory_tasks_queue
+  ON public.domain_memory_tasks (priority DESC, created_at)
+  WHERE status IN ('pending', 'in_progress');
+
+CREATE OR REPLACE FUNCTION public.domain_memory_load_context(
+  p_task_id UUID,
+  p_progress_limit INTEGER DEFAULT 50,
+  p_definition_version TIMESTAMPTZ DEFAULT NULL,
+  p_constraints_version TIMESTAMPTZ DEFAULT NULL,
+  p_tests_version TIMESTAMPTZ DEFAULT NULL
+)
+RETURNS JSONB
+LANGUAGE sql
+STABLE
+SET search_path = public
+AS $$
+  SELECT jsonb_build_object(
+    'task', to_jsonb(t) - 'claimed_by' - 'claimed_until',
+    'state', (SELECT to_jsonb(s) FROM domain_memory_states s WHERE s.task_id = t.id),
+    'definition_updated_at', d.updated_at,
+    'definition', CASE WHEN d.updated_at IS DISTINCT FROM p_definition_version THEN to_jsonb(d) END,
+    'constraints_updated_at', c.updated_at,
+    'constraints', CASE WHEN c.updated_at IS DISTINCT FROM p_constraints_version THEN to_jsonb(c) END,
+    'tests_updated_at', x.updated_at,
+    'tests', CASE WHEN x.updated_at IS DISTINCT FROM p_tests_version THEN to_jsonb(x) END,
+    'progress', COALESCE((
+      SELECT jsonb_agg(to_jsonb(p) ORDER BY p.created_at DESC)
+      FROM (
+        SELECT * FROM domain_memory_progress
+        WHERE task_id = t.id
+        ORDER BY created_at DESC
+        LIMIT p_progress_limit
+      ) p
+    ), '[]'::jsonb)
+  )
+  FROM domain_memory_tasks t
+  LEFT JOIN domain_memory_definitions d ON d.task_id = t.id
+  LEFT JOIN domain_memory_constraints c ON c.task_id = t.id
+  LEFT JOIN domain_memory_tests x ON x.task_id = t.id
+  WHERE t.id = p_task_id;
+$$;
+
+CREATE OR REPLACE FUNCTION public.domain_memory_claim_tasks(
+  p_worker_id TEXT,
+  p_limit INTEGER DEFAULT 10,
+  p_lease_seconds INTEGER DEFAULT 300,
+  p_scope TEXT DEFAULT NULL
+)
+RETURNS TABLE (
+  id UUID,
+  user_id UUID,
+  task_type TEXT,
+  status TEXT,
+  priority INTEGER,
+  scope TEXT,
+  created_at TIMESTAMPTZ,
+  updated_at TIMESTAMPTZ,
+  claimed_until TIMESTAMPTZ
+)
+LANGUAGE sql
+VOLATILE
+SET search_path = public
+AS $$
+  UPDATE domain_memory_tasks t SET
+    claimed_by = p_worker_id,
+    claimed_until = NOW() + make_interval(secs => p_lease_seconds)
+  FROM (
+    SELECT q.id
+    FROM domain_memory_tasks q
+    WHERE q.status IN ('pending', 'in_progress')
+      AND (q.claimed_until IS NULL OR q.claimed_until < NOW())
+      AND (p_scope IS NULL OR q.scope = p_scope)
+    ORDER BY q.priority DESC, q.created_at
+    LIMIT p_limit
+    FOR UPDATE SKIP LOCKED
+  ) next_tasks
+  WHERE t.id = next_tasks.id
+  RETURNING t.id, t.user_id, t.task_type, t.status, t.priority, t.scope,
+            t.created_at, t.updated_at, t.claimed_until;
+$$;
+
+CREATE OR REPLACE FUNCTION public.domain_memory_release_task(
+  p_task_id UUID,
+  p_worker_id TEXT
+)
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+VOLATILE
+SET search_path = public
+AS $$
+DECLARE
+  v_status TEXT;
+BEGIN
+  UPDATE domain_memory_tasks SET claimed_by = NULL, claimed_until = NULL
+  WHERE id = p_task_id AND claimed_by = p_worker_id
+  RETURNING status INTO v_status;
+
+  IF NOT FOUND THEN
+    RETURN false;
+  END IF;
+  -- Still runnable: let an idle worker pick the next step straight away
+  IF v_status IN ('pending', 'in_progress') THEN
+    PERFORM pg_notify('domain_memory_tasks', p_task_id::TEXT);
+  END IF;
+  RETURN true;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.notify_domain_memory_task()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  PERFORM pg_notify('domain_memory_tasks', NEW.id::TEXT);
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trigger_tasks_notify_runnable ON public.domain_memory_tasks;
+CREATE TRIGGER trigger_tasks_notify_runnable
+  AFTER INSERT OR UPDATE OF status ON public.domain_memory_tasks
+  FOR EACH ROW
+  WHEN (NEW.status = 'pending')
+  EXECUTE FUNCTION public.notify_domain_memory_task();
+
+-- Workers run with the service role; users only read their own context
+GRANT EXECUTE ON FUNCTION public.domain_memory_load_context(UUID, INTEGER, TIMESTAMPTZ, TIMESTAMPTZ, TIMESTAMPTZ)
+  TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION public.domain_memory_claim_tasks(TEXT, INTEGER, INTEGER, TEXT) TO service_role;
+GRANT EXECUTE ON FUNCTION public.domain_memory_release_task(UUID, TEXT) TO service_role;
@@ -0,0 +1,29 @@
+-- Bulk ingestion support for the YouTube trip importer.
+-- Adds the source video ID as the upsert key (per owner) and a content hash of
+-- the video's source metadata so unchanged videos are skipped on re-import.
+
+ALTER TABLE public.user_trips
+  ADD COLUMN IF NOT EXISTS source_video_id TEXT,
+  ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+-- Backfill video IDs for trips imported before this column existed
+UPDATE public.user_trips
+SET source_video_id = substring(metadata->>'youtube_url' FROM '[?&]v=([A-Za-z0-9_-]{11})')
+WHERE source_video_id IS NULL
+  AND metadata->>'youtube_url' IS NOT NULL;
+
+-- Keep the newest trip per owner and video (updated_at is nullable, so it is
+-- coalesced: a NULL in the row comparison would keep both duplicates)
+DELETE FROM public.user_trips t
+USING public.user_trips newer
+WHERE t.user_id = newer.user_id
+  AND t.source_video_id = newer.source_video_id
+  AND (COALESCE(t.updated_at, t.created_at, '-infinity'), t.id)
+    < (COALESCE(newer.updated_at, newer.created_at, '-infinity'), newer.id);
+
+-- Trips without a source video have a NULL key and never conflict
+CREATE UNIQUE INDEX IF NOT EXISTS idx_user_trips_user_source_video
+  ON public.user_trips (user_id, source_video_id);
+
+COMMENT ON COLUMN public.user_trips.source_video_id IS 'YouTube video ID for imported trips; upsert conflict target with user_id';
+COMMENT ON COLUMN public.user_trips.content_hash IS 'SHA-256 of the source video metadata; unchanged videos are skipped on re-import';